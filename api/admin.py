@@ -1,15 +1,18 @@
 # admin.py 
 # API Authentication Admin
 
-from .models import APIClient, APIKey, APIUsageLog
+from .models import APIClient, APIKey, APIUsageLog, APIUsageLogPartition
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 from django.contrib import admin
 from django.contrib import messages
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import render
 from django.utils import timezone
 from unfold.admin import ModelAdmin
 from .models import ScriptRunner
+from .services.usage_log_service import UsageLogService
 import sys
 from io import StringIO
 import traceback
@@ -375,9 +378,14 @@ class APIKeyAdmin(ModelAdmin):
 
 @admin.register(APIUsageLog)
 class APIUsageLogAdmin(ModelAdmin):
-    list_display = ['client', 'endpoint', 'method', 'get_status_code', 'response_time', 'timestamp', 'ip_address']
-    list_filter = ['method', 'status_code', 'timestamp', 'client']
-    search_fields = ['client__name', 'endpoint', 'ip_address', 'user_agent']
+    """
+    Recent API usage across the monthly partitions.
+
+    Requests are logged to the partition tables, so the APIUsageLog table
+    only holds rows from before partitioning. The changelist reads the
+    newest rows through UsageLogService.recent() instead.
+    """
+    per_page = 100
     readonly_fields = ['client', 'api_key', 'endpoint', 'method', 'status_code', 'response_time', 
                       'timestamp', 'ip_address', 'user_agent', 'request_size', 'response_size', 'error_message']
     
@@ -406,8 +414,63 @@ class APIUsageLogAdmin(ModelAdmin):
             return format_html('<span style="color: red;">❌ {}</span>', obj.status_code)
     get_status_code.short_description = 'Status'
     
+    def changelist_view(self, request, extra_context=None):
+        """List the newest usage log rows, optionally for one client"""
+        if not self.has_view_or_change_permission(request):
+            raise PermissionDenied
+        
+        try:
+            page = max(int(request.GET.get('p', 1)), 1)
+        except ValueError:
+            page = 1
+        
+        filters = {}
+        client_id = request.GET.get('client', '')
+        client = APIClient.objects.filter(pk=client_id).first() if client_id.isdigit() else None
+        if client:
+            filters['client'] = client
+        
+        # One extra row tells whether there is a next page
+        rows = UsageLogService.recent(self.per_page + 1, offset=(page - 1) * self.per_page, **filters)
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Recent API Usage',
+            'opts': self.model._meta,
+            'rows': [(row, self.get_status_code(row)) for row in rows[:self.per_page]],
+            'client': client,
+            'clients': APIClient.objects.order_by('name'),
+            'page': page,
+            'has_previous': page > 1,
+            'has_next': len(rows) > self.per_page,
+            **(extra_context or {}),
+        }
+        return render(request, 'admin/api/apiusagelog/recent.html', context)
+    
     def has_add_permission(self, request):
         return False  # Usage logs are created automatically
     
     def has_change_permission(self, request, obj=None):
-        return False  # Usage logs are read-only
\ No newline at end of file
+        return False  # Usage logs are read-only
+
+
+@admin.register(APIUsageLogPartition)
+class APIUsageLogPartitionAdmin(ModelAdmin):
+    list_display = ['table_name', 'month', 'get_state', 'archived_rows', 'created_at', 'archived_at']
+    list_filter = ['archived_at']
+    readonly_fields = ['month', 'table_name', 'created_at', 'archived_at', 'archive_file', 'archived_rows']
+    
+    def get_state(self, obj):
+        if obj.is_live:
+            return mark_safe('<span style="color: green;">🟢 Live</span>')
+        return mark_safe('<span style="color: gray;">📦 Archived</span>')
+    get_state.short_description = 'State'
+    
+    def has_add_permission(self, request):
+        return False  # Partitions are created by UsageLogService
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False  # Tables are dropped by archiving
@@ -3,7 +3,6 @@
 import uuid
 from datetime import timedelta
 from django.utils import timezone
-from django.db.models import Count, Avg, Q
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
@@ -16,7 +15,7 @@ from rest_framework.decorators import action
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
-from .models import APIClient, APIKey, APIUsageLog
+from .models import APIClient, APIKey
 from .serializers import (
     APIClientSerializer, APIClientRegistrationSerializer,
     APIKeySerializer, APIKeyGenerationSerializer, APIKeyResponseSerializer,
@@ -24,6 +23,7 @@ from .serializers import (
     APIEndpointSerializer, ClientUsageStatsSerializer, ErrorResponseSerializer
 )
 from .authentication import get_authenticated_client, get_authenticated_api_key
+from .services.usage_log_service import UsageLogService
 from .utils import log_api_usage, get_api_config
 import logging
 
@@ -93,49 +93,43 @@ class APIClientViewSet(ModelViewSet):
         this_hour = now.replace(minute=0, second=0, microsecond=0)
         this_minute = now.replace(second=0, microsecond=0)
         
-        # Get usage statistics
-        logs = APIUsageLog.objects.filter(client=client)
+        # Get usage statistics; the recent counts only read this month's partition
+        summary = UsageLogService.summary(client=client)
+        requests_this_hour = UsageLogService.count(start=this_hour, client=client)
+        requests_this_minute = UsageLogService.count(start=this_minute, client=client)
         
         stats = {
-            'total_requests': logs.count(),
-            'requests_today': logs.filter(timestamp__gte=today).count(),
-            'requests_this_hour': logs.filter(timestamp__gte=this_hour).count(),
-            'requests_this_minute': logs.filter(timestamp__gte=this_minute).count(),
-            'average_response_time': logs.aggregate(avg=Avg('response_time'))['avg'] or 0,
-            'success_rate': self._calculate_success_rate(logs),
-            'most_used_endpoints': self._get_most_used_endpoints(logs),
+            'total_requests': summary['total_requests'],
+            'requests_today': UsageLogService.count(start=today, client=client),
+            'requests_this_hour': requests_this_hour,
+            'requests_this_minute': requests_this_minute,
+            'average_response_time': summary['average_response_time'],
+            'success_rate': self._calculate_success_rate(summary),
+            'most_used_endpoints': self._get_most_used_endpoints(summary),
             'rate_limit_status': {
                 'requests_per_minute_limit': client.requests_per_minute,
                 'requests_per_hour_limit': client.requests_per_hour,
-                'current_minute_usage': logs.filter(timestamp__gte=this_minute).count(),
-                'current_hour_usage': logs.filter(timestamp__gte=this_hour).count(),
+                'current_minute_usage': requests_this_minute,
+                'current_hour_usage': requests_this_hour,
             }
         }
         
         return Response(ClientUsageStatsSerializer(stats).data)
     
-    def _calculate_success_rate(self, logs):
+    def _calculate_success_rate(self, summary):
         """Calculate success rate (2xx status codes)"""
-        total = logs.count()
+        total = summary['total_requests']
         if total == 0:
             return 100.0
         
-        successful = logs.filter(status_code__gte=200, status_code__lt=300).count()
+        successful = summary['successful_requests']
         return round((successful / total) * 100, 2)
     
-    def _get_most_used_endpoints(self, logs, limit=5):
+    def _get_most_used_endpoints(self, summary, limit=5):
         """Get most frequently used endpoints"""
-        endpoints = logs.values('endpoint', 'method').annotate(
-            count=Count('id')
-        ).order_by('-count')[:limit]
-        
         return [
-            {
-                'endpoint': ep['endpoint'],
-                'method': ep['method'],
-                'count': ep['count']
-            }
-            for ep in endpoints
+            {'endpoint': endpoint, 'method': method, 'count': count}
+            for (endpoint, method), count in summary['endpoints'].most_common(limit)
         ]
 
 
@@ -380,12 +374,12 @@ def get_client_usage(request, client_id):
     limit = int(request.GET.get('limit', 100))
     offset = int(request.GET.get('offset', 0))
     
-    logs = APIUsageLog.objects.filter(client=client).order_by('-timestamp')[offset:offset+limit]
+    logs = UsageLogService.recent(limit, offset, client=client)
     
     serializer = APIUsageLogSerializer(logs, many=True)
     
     return Response({
-        'count': APIUsageLog.objects.filter(client=client).count(),
+        'count': UsageLogService.count(client=client),
         'results': serializer.data
     })
 
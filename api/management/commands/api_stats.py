@@ -2,8 +2,8 @@
 
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from django.db.models import Count, Avg, Q
-from api.models import APIClient, APIKey, APIUsageLog
+from api.models import APIClient, APIKey
+from api.services.usage_log_service import UsageLogService
 from datetime import timedelta
 
 
@@ -68,16 +68,12 @@ class Command(BaseCommand):
         self.stdout.write(f'  Expired: {expired_keys}')
         
         # Usage statistics
-        logs = APIUsageLog.objects.filter(timestamp__gte=since_date)
-        total_requests = logs.count()
+        summary = UsageLogService.summary(start=since_date)
+        total_requests = summary['total_requests']
         
         if total_requests > 0:
-            successful_requests = logs.filter(
-                status_code__gte=200, 
-                status_code__lt=300
-            ).count()
-            
-            avg_response_time = logs.aggregate(avg=Avg('response_time'))['avg']
+            successful_requests = summary['successful_requests']
+            avg_response_time = summary['average_response_time']
             
             self.stdout.write(f'\n📈 Usage (Last {(timezone.now() - since_date).days} days):')
             self.stdout.write(f'  Total requests: {total_requests:,}')
@@ -85,19 +81,17 @@ class Command(BaseCommand):
             self.stdout.write(f'  Average response time: {avg_response_time:.3f}s')
             
             # Top endpoints
-            top_endpoints = logs.values('endpoint', 'method').annotate(
-                count=Count('id')
-            ).order_by('-count')[:5]
+            top_endpoints = summary['endpoints'].most_common(5)
             
             self.stdout.write(f'\n🔥 Top Endpoints:')
-            for i, endpoint in enumerate(top_endpoints, 1):
+            for i, ((endpoint, method), count) in enumerate(top_endpoints, 1):
                 self.stdout.write(
-                    f'  {i}. {endpoint["method"]} {endpoint["endpoint"]} '
-                    f'({endpoint["count"]:,} requests)'
+                    f'  {i}. {method} {endpoint} '
+                    f'({count:,} requests)'
                 )
             
             if detailed:
-                self.show_detailed_stats(logs)
+                self.show_detailed_stats(summary, since_date)
         else:
             self.stdout.write(f'\n📈 No usage data found for the last {(timezone.now() - since_date).days} days')
 
@@ -146,16 +140,12 @@ class Command(BaseCommand):
         self.stdout.write(f'  Active: {active_keys.count()}')
         
         # Usage statistics
-        logs = APIUsageLog.objects.filter(client=client, timestamp__gte=since_date)
-        total_requests = logs.count()
+        summary = UsageLogService.summary(start=since_date, client=client)
+        total_requests = summary['total_requests']
         
         if total_requests > 0:
-            successful_requests = logs.filter(
-                status_code__gte=200, 
-                status_code__lt=300
-            ).count()
-            
-            avg_response_time = logs.aggregate(avg=Avg('response_time'))['avg']
+            successful_requests = summary['successful_requests']
+            avg_response_time = summary['average_response_time']
             
             self.stdout.write(f'\n📈 Usage (Last {(timezone.now() - since_date).days} days):')
             self.stdout.write(f'  Total requests: {total_requests:,}')
@@ -163,29 +153,23 @@ class Command(BaseCommand):
             self.stdout.write(f'  Average response time: {avg_response_time:.3f}s')
             
             # Endpoints used
-            endpoints = logs.values('endpoint', 'method').annotate(
-                count=Count('id')
-            ).order_by('-count')
+            endpoints = summary['endpoints'].most_common()
             
             self.stdout.write(f'\n🎯 Endpoints Used:')
-            for endpoint in endpoints:
+            for (endpoint, method), count in endpoints:
                 self.stdout.write(
-                    f'  {endpoint["method"]} {endpoint["endpoint"]} '
-                    f'({endpoint["count"]:,} requests)'
+                    f'  {method} {endpoint} '
+                    f'({count:,} requests)'
                 )
         else:
             self.stdout.write(f'\n📈 No usage data found for the last {(timezone.now() - since_date).days} days')
 
-    def show_detailed_stats(self, logs):
+    def show_detailed_stats(self, summary, since_date):
         # Status code breakdown
-        status_codes = logs.values('status_code').annotate(
-            count=Count('id')
-        ).order_by('status_code')
+        status_codes = sorted(summary['status_codes'].items())
         
         self.stdout.write(f'\n📊 Status Code Breakdown:')
-        for status in status_codes:
-            code = status['status_code']
-            count = status['count']
+        for code, count in status_codes:
             if 200 <= code < 300:
                 icon = '✅'
             elif 400 <= code < 500:
@@ -196,16 +180,11 @@ class Command(BaseCommand):
             self.stdout.write(f'  {icon} {code}: {count:,} requests')
         
         # Daily breakdown
-        from django.db.models import TruncDate
-        daily_stats = logs.annotate(
-            date=TruncDate('timestamp')
-        ).values('date').annotate(
-            count=Count('id')
-        ).order_by('date')
+        daily_stats = UsageLogService.daily_counts(start=since_date)
         
         if daily_stats:
             self.stdout.write(f'\n📅 Daily Breakdown:')
-            for day in daily_stats:
+            for day, count in daily_stats:
                 self.stdout.write(
-                    f'  {day["date"].strftime("%Y-%m-%d")}: {day["count"]:,} requests'
-                )
\ No newline at end of file
+                    f'  {day.strftime("%Y-%m-%d")}: {count:,} requests'
+                )
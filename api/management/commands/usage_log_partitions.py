@@ -0,0 +1,126 @@
+"""
+Management command to manage the monthly API usage log partitions.
+
+Without options it lists the partitions. ``--maintain`` creates the current
+and next month's partitions and archives the ones past the retention period
+to compressed JSON Lines files before dropping their tables.
+``--migrate-legacy`` moves rows logged before partitioning out of the
+APIUsageLog table. ``--schedule`` sets up the daily Celery Beat task that
+runs the maintenance.
+
+Usage:
+    python manage.py usage_log_partitions
+    python manage.py usage_log_partitions --maintain
+    python manage.py usage_log_partitions --maintain --retention-months 3 --archive-dir /backups/api
+    python manage.py usage_log_partitions --archive 202601
+    python manage.py usage_log_partitions --migrate-legacy
+    python manage.py usage_log_partitions --schedule
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import APIUsageLogPartition
+from api.services.usage_log_service import UsageLogService
+
+
+class Command(BaseCommand):
+    help = 'List, maintain and archive the monthly API usage log partitions'
+
+    MAINTENANCE_TASK = 'API Usage Log Partitions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--maintain',
+            action='store_true',
+            help='Create upcoming partitions and archive expired ones'
+        )
+        parser.add_argument(
+            '--archive',
+            type=int,
+            metavar='YYYYMM',
+            help='Archive one partition and drop its table'
+        )
+        parser.add_argument(
+            '--retention-months',
+            type=int,
+            help='Months kept live, including the current one (default: API_USAGE_LOG_RETENTION_MONTHS)'
+        )
+        parser.add_argument(
+            '--archive-dir',
+            type=str,
+            help='Directory for archive files (default: API_USAGE_LOG_ARCHIVE_DIR)'
+        )
+        parser.add_argument(
+            '--migrate-legacy',
+            action='store_true',
+            help='Move rows from the unpartitioned APIUsageLog table into the partitions'
+        )
+        parser.add_argument(
+            '--schedule',
+            action='store_true',
+            help='Create or update the daily Celery Beat maintenance task'
+        )
+
+    def handle(self, *args, **options):
+        if options['schedule']:
+            self.schedule()
+
+        if options['migrate_legacy']:
+            moved = UsageLogService.migrate_legacy()
+            self.stdout.write(self.style.SUCCESS(f'Moved {moved:,} legacy rows into partitions'))
+
+        if options['archive']:
+            try:
+                partition = UsageLogService.archive_partition(options['archive'], options['archive_dir'])
+            except APIUsageLogPartition.DoesNotExist:
+                raise CommandError(f'No partition for {options["archive"]}')
+            self.stdout.write(self.style.SUCCESS(
+                f'Archived {partition.archived_rows:,} rows to {partition.archive_file}'
+            ))
+
+        if options['maintain']:
+            summary = UsageLogService.maintain(options['retention_months'], options['archive_dir'])
+            self.stdout.write(self.style.SUCCESS(
+                f'Created {len(summary["created"])} and archived {len(summary["archived"])} partitions'
+            ))
+
+        self.list_partitions()
+
+    def list_partitions(self):
+        partitions = APIUsageLogPartition.objects.order_by('month')
+        if not partitions:
+            self.stdout.write('No partitions yet')
+            return
+
+        for partition in partitions:
+            if partition.is_live:
+                rows = UsageLogService.model_for(partition.month.year * 100 + partition.month.month).objects.count()
+                self.stdout.write(f'  {partition.table_name}: live, {rows:,} rows')
+            else:
+                self.stdout.write(
+                    f'  {partition.table_name}: archived {partition.archived_at:%Y-%m-%d}, '
+                    f'{partition.archived_rows:,} rows in {partition.archive_file}'
+                )
+
+    def schedule(self):
+        """Create or update the daily maintenance task"""
+        from django_celery_beat.models import CrontabSchedule, PeriodicTask
+
+        # Daily at 2 AM
+        nightly, _ = CrontabSchedule.objects.get_or_create(
+            minute=0,
+            hour=2,
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+        )
+        _, created = PeriodicTask.objects.update_or_create(
+            name=self.MAINTENANCE_TASK,
+            defaults={
+                'crontab': nightly,
+                'interval': None,
+                'task': 'api.tasks.maintain_usage_log_partitions',
+                'enabled': True,
+            }
+        )
+        self.stdout.write(f'{"Created" if created else "Updated"} task: {self.MAINTENANCE_TASK}')
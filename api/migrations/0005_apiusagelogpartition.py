@@ -0,0 +1,30 @@
+# Generated by Django 5.2.3 on 2026-10-19 01:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_rename_api_apiusag_client__b8e7a5_idx_api_apiusag_client__b69323_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='APIUsageLogPartition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month (UTC) held by the partition', unique=True)),
+                ('table_name', models.CharField(max_length=64, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('archived_at', models.DateTimeField(blank=True, help_text='When the partition was archived and its table dropped', null=True)),
+                ('archive_file', models.CharField(blank=True, help_text='Compressed JSON Lines archive of the partition rows', max_length=500)),
+                ('archived_rows', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'API Usage Log Partition',
+                'verbose_name_plural': 'API Usage Log Partitions',
+                'ordering': ['-month'],
+            },
+        ),
+    ]
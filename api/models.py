@@ -286,6 +286,11 @@ class APIKey(models.Model):
 class APIUsageLog(models.Model):
     """
     Log of API usage for monitoring and analytics
+
+    New rows are written to monthly partition tables with the same columns
+    (see api.services.usage_log_service). This table keeps the rows logged
+    before partitioning until they are moved with
+    ``manage.py usage_log_partitions --migrate-legacy``.
     """
     client = models.ForeignKey(
         APIClient, 
@@ -345,4 +350,40 @@ class APIUsageLog(models.Model):
     
     def __str__(self):
         status_emoji = "✅" if 200 <= self.status_code < 300 else "❌"
-        return f"{status_emoji} {self.client.name} - {self.method} {self.endpoint} ({self.status_code})"
\ No newline at end of file
+        return f"{status_emoji} {self.client.name} - {self.method} {self.endpoint} ({self.status_code})"
+
+
+class APIUsageLogPartition(models.Model):
+    """
+    Registry of the monthly API usage log partition tables
+    """
+    month = models.DateField(
+        unique=True,
+        help_text="First day of the month (UTC) held by the partition"
+    )
+    table_name = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    archived_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the partition was archived and its table dropped"
+    )
+    archive_file = models.CharField(
+        max_length=500,
+        blank=True,
+        help_text="Compressed JSON Lines archive of the partition rows"
+    )
+    archived_rows = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "API Usage Log Partition"
+        verbose_name_plural = "API Usage Log Partitions"
+        ordering = ['-month']
+
+    def __str__(self):
+        state = f"archived {self.archived_rows:,} rows" if self.archived_at else "live"
+        return f"{self.table_name} ({state})"
+
+    @property
+    def is_live(self):
+        return self.archived_at is None
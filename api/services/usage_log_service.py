@@ -0,0 +1,501 @@
+"""
+API Usage Log Service
+
+API usage logs are stored in one table per UTC month, ``api_apiusagelog_YYYYMM``,
+with the columns of ``APIUsageLog``. This is the same layout on every
+backend, so SQLite behaves like production. Each partition table has two
+indexes, (timestamp) and (client, timestamp). The log table had three
+composite indexes, and every insert had to update all of them.
+
+``APIUsageLogPartition`` records which partitions exist. Readers ask for a
+time range and only query the partitions overlapping it. A partition that
+lies entirely inside the range is read without a timestamp predicate.
+Statistics are computed per partition with one grouped query and merged in
+Python.
+
+Partitions older than the retention period are archived. The rows are
+streamed in keyset pages to a gzip-compressed JSON Lines file, and then the
+table is dropped. Dropping a table costs the same whatever its size, unlike
+deleting its rows. ``maintain()`` also creates next month's partition ahead
+of time, so a request rarely has to create one.
+
+Rows logged before partitioning stay in the ``APIUsageLog`` table and are
+read alongside the partitions until ``migrate_legacy()`` moves them.
+"""
+
+import logging
+import os
+from collections import Counter
+from datetime import date, datetime, timezone as dt_timezone
+from typing import Any, Dict, List, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection, models, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from blog.services.engagement_backup_service import keyset_pages
+from blog.utils.jsonl_stream import encode_line, open_jsonl
+
+from ..models import APIUsageLog, APIUsageLogPartition
+
+
+logger = logging.getLogger(__name__)
+
+RETENTION_MONTHS = getattr(settings, 'API_USAGE_LOG_RETENTION_MONTHS', 6)
+ARCHIVE_DIR = getattr(
+    settings, 'API_USAGE_LOG_ARCHIVE_DIR', os.path.join(settings.BASE_DIR, 'archives', 'api_usage')
+)
+
+# Columns written to archives, in table order
+ARCHIVE_FIELDS = [field.attname for field in APIUsageLog._meta.concrete_fields]
+
+# Partition models built in this process, by month key
+_partition_models = {}
+
+
+def month_key(value: datetime) -> int:
+    """
+    Get the partition key (YYYYMM, UTC) of a timestamp.
+
+    Args:
+        value: Aware datetime
+
+    Returns:
+        int: Month key, e.g. 202610
+    """
+    value = value.astimezone(dt_timezone.utc)
+    return value.year * 100 + value.month
+
+
+def month_bounds(key: int):
+    """
+    Get the UTC start and end of a partition month.
+
+    Args:
+        key: Month key (YYYYMM)
+
+    Returns:
+        tuple: (start, end) aware datetimes, end exclusive
+    """
+    year, month = divmod(key, 100)
+    start = datetime(year, month, 1, tzinfo=dt_timezone.utc)
+    end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=dt_timezone.utc)
+    return start, end
+
+
+def add_months(key: int, months: int) -> int:
+    """Shift a month key by a number of months."""
+    year, month = divmod(key, 100)
+    index = year * 12 + month - 1 + months
+    return (index // 12) * 100 + index % 12 + 1
+
+
+class UsageLogService:
+    """
+    Service for writing, reading and archiving partitioned API usage logs.
+    """
+
+    TABLE_PREFIX = 'api_apiusagelog_'
+    PARTITIONS_CACHE_KEY = 'api_usage_log_partitions'
+    PARTITIONS_CACHE_TIMEOUT = 300  # 5 minutes
+    BATCH_SIZE = 5000
+
+    # Partitions
+
+    @classmethod
+    def table_name(cls, key: int) -> str:
+        return f'{cls.TABLE_PREFIX}{key}'
+
+    @classmethod
+    def model_for(cls, key: int):
+        """
+        Get the model of a partition table.
+
+        The model mirrors APIUsageLog with unmanaged storage. Its relations
+        have no reverse accessors and no database constraints, so a
+        partition can be dropped without touching other tables.
+
+        Args:
+            key: Month key (YYYYMM)
+
+        Returns:
+            Model class
+        """
+        model = _partition_models.get(key)
+        if model is not None:
+            return model
+
+        model_name = f'APIUsageLog{key}'
+        try:
+            model = apps.get_model('api', model_name)
+        except LookupError:
+            attrs = {'__module__': APIUsageLog.__module__, '__str__': APIUsageLog.__str__}
+            for field in APIUsageLog._meta.local_fields:
+                name, path, args, kwargs = field.deconstruct()
+                if field.is_relation:
+                    kwargs.update(related_name='+', db_constraint=False)
+                if kwargs.pop('auto_now_add', False):
+                    # Set by the writer, so migrated and archived rows keep theirs
+                    kwargs['default'] = timezone.now
+                attrs[name] = field.__class__(*args, **kwargs)
+
+            attrs['Meta'] = type('Meta', (), {
+                'app_label': 'api',
+                'db_table': cls.table_name(key),
+                'managed': False,
+                'ordering': ['-timestamp'],
+                'verbose_name': f'API Usage Log {key}',
+                'indexes': [
+                    models.Index(fields=['timestamp'], name=f'api_usage_{key}_ts'),
+                    models.Index(fields=['client', 'timestamp'], name=f'api_usage_{key}_client_ts'),
+                ],
+            })
+            model = type(model_name, (models.Model,), attrs)
+
+        _partition_models[key] = model
+        return model
+
+    @classmethod
+    def get_partitions(cls) -> Dict[str, Any]:
+        """
+        Get the live partitions and whether the legacy table still has rows.
+
+        Returns:
+            dict: 'keys' (sorted month keys) and 'legacy' (bool)
+        """
+        state = cache.get(cls.PARTITIONS_CACHE_KEY)
+        if state is None:
+            months = APIUsageLogPartition.objects.filter(archived_at__isnull=True).values_list('month', flat=True)
+            state = {
+                'keys': sorted(month.year * 100 + month.month for month in months),
+                'legacy': APIUsageLog.objects.exists(),
+            }
+            cache.set(cls.PARTITIONS_CACHE_KEY, state, cls.PARTITIONS_CACHE_TIMEOUT)
+        return state
+
+    @classmethod
+    def invalidate_partitions(cls):
+        cache.delete(cls.PARTITIONS_CACHE_KEY)
+
+    @classmethod
+    def ensure_partition(cls, key: int):
+        """
+        Create the table of a partition if it doesn't exist yet.
+
+        Args:
+            key: Month key (YYYYMM)
+
+        Returns:
+            Model class of the partition
+        """
+        model = cls.model_for(key)
+        if key in cls.get_partitions()['keys']:
+            return model
+
+        table = cls.table_name(key)
+        with connection.cursor() as cursor:
+            existing = set(connection.introspection.table_names(cursor))
+            if table not in existing:
+                editor = connection.schema_editor()
+                sql, params = editor.table_sql(model)
+                try:
+                    cursor.execute(sql, params)
+                    for index in model._meta.indexes:
+                        cursor.execute(str(index.create_sql(model, editor)))
+                except DatabaseError:
+                    # Another process created it first
+                    if table not in connection.introspection.table_names(cursor):
+                        raise
+
+        year, month = divmod(key, 100)
+        APIUsageLogPartition.objects.get_or_create(
+            month=date(year, month, 1),
+            defaults={'table_name': table},
+        )
+        cls.invalidate_partitions()
+        logger.info(f"Created API usage log partition {table}")
+        return model
+
+    # Writing
+
+    @classmethod
+    def log(cls, **fields):
+        """
+        Write one usage log row to the partition of its timestamp.
+
+        Args:
+            **fields: APIUsageLog field values; timestamp defaults to now
+
+        Returns:
+            The created row
+        """
+        fields.setdefault('timestamp', timezone.now())
+        model = cls.ensure_partition(month_key(fields['timestamp']))
+        return model.objects.create(**fields)
+
+    @classmethod
+    def bulk_log(cls, rows: List[Dict[str, Any]]) -> int:
+        """
+        Write usage log rows, grouped by partition.
+
+        Args:
+            rows: Dicts of APIUsageLog field values including 'timestamp'
+
+        Returns:
+            int: Number of rows written
+        """
+        by_key = {}
+        for row in rows:
+            by_key.setdefault(month_key(row['timestamp']), []).append(row)
+
+        for key, partition_rows in by_key.items():
+            model = cls.ensure_partition(key)
+            model.objects.bulk_create(
+                [model(**row) for row in partition_rows], batch_size=cls.BATCH_SIZE
+            )
+        return len(rows)
+
+    # Reading
+
+    @classmethod
+    def querysets(cls, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                  **filters) -> List[models.QuerySet]:
+        """
+        Get one queryset per partition overlapping a time range.
+
+        Args:
+            start: Inclusive start of the range, unbounded if None
+            end: Exclusive end of the range, unbounded if None
+            **filters: Extra filters applied to every partition
+
+        Returns:
+            list: Querysets, newest partition first
+        """
+        state = cls.get_partitions()
+        result = []
+        for key in reversed(state['keys']):
+            lower, upper = month_bounds(key)
+            if (start and upper <= start) or (end and lower >= end):
+                continue
+            queryset = cls.model_for(key).objects.filter(**filters)
+            if start and start > lower:
+                queryset = queryset.filter(timestamp__gte=start)
+            if end and end < upper:
+                queryset = queryset.filter(timestamp__lt=end)
+            result.append(queryset)
+
+        if state['legacy']:
+            queryset = APIUsageLog.objects.filter(**filters)
+            if start:
+                queryset = queryset.filter(timestamp__gte=start)
+            if end:
+                queryset = queryset.filter(timestamp__lt=end)
+            result.append(queryset)
+        return result
+
+    @classmethod
+    def count(cls, start: Optional[datetime] = None, end: Optional[datetime] = None, **filters) -> int:
+        """Count usage log rows in a time range."""
+        return sum(queryset.count() for queryset in cls.querysets(start, end, **filters))
+
+    @classmethod
+    def summary(cls, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                **filters) -> Dict[str, Any]:
+        """
+        Summarize usage in a time range with one grouped query per partition.
+
+        Args:
+            start: Inclusive start of the range, unbounded if None
+            end: Exclusive end of the range, unbounded if None
+            **filters: Extra filters, e.g. client=client
+
+        Returns:
+            dict: Request, success, error and rate limited counts, average
+            response time, and Counters of requests by (endpoint, method),
+            status code and client id
+        """
+        total = successful = errors = rate_limited = 0
+        response_time = 0.0
+        endpoints, status_codes, clients = Counter(), Counter(), Counter()
+
+        for queryset in cls.querysets(start, end, **filters):
+            rows = queryset.order_by().values('client_id', 'endpoint', 'method', 'status_code').annotate(
+                count=Count('id'), response_time=Sum('response_time')
+            )
+            for row in rows:
+                count, code = row['count'], row['status_code']
+                total += count
+                response_time += row['response_time'] or 0
+                if 200 <= code < 300:
+                    successful += count
+                if code >= 400:
+                    errors += count
+                if code == 429:
+                    rate_limited += count
+                endpoints[(row['endpoint'], row['method'])] += count
+                status_codes[code] += count
+                clients[row['client_id']] += count
+
+        return {
+            'total_requests': total,
+            'successful_requests': successful,
+            'error_requests': errors,
+            'rate_limited_requests': rate_limited,
+            'average_response_time': response_time / total if total else 0,
+            'endpoints': endpoints,
+            'status_codes': status_codes,
+            'clients': clients,
+        }
+
+    @classmethod
+    def daily_counts(cls, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                     **filters) -> List[tuple]:
+        """
+        Count requests per day in a time range.
+
+        Returns:
+            list: (date, count) tuples in date order
+        """
+        counts = Counter()
+        for queryset in cls.querysets(start, end, **filters):
+            rows = queryset.order_by().annotate(date=TruncDate('timestamp')).values('date').annotate(count=Count('id'))
+            for row in rows:
+                counts[row['date']] += row['count']
+        return sorted(counts.items())
+
+    @classmethod
+    def recent(cls, limit: int, offset: int = 0, start: Optional[datetime] = None,
+               end: Optional[datetime] = None, fields: Optional[List[str]] = None, **filters) -> List:
+        """
+        Get the newest usage log rows, reading partitions newest first.
+
+        Older partitions are only queried while the page isn't full.
+
+        Args:
+            limit: Number of rows
+            offset: Number of newest rows to skip
+            start: Inclusive start of the range, unbounded if None
+            end: Exclusive end of the range, unbounded if None
+            fields: Return dicts of these fields instead of model instances
+            **filters: Extra filters, e.g. client=client
+
+        Returns:
+            list: Rows, newest first
+        """
+        needed = offset + limit
+        rows = []
+        for queryset in cls.querysets(start, end, **filters):
+            queryset = queryset.order_by('-timestamp')
+            queryset = queryset.values(*fields) if fields else queryset.select_related('client')
+            rows.extend(queryset[:needed - len(rows)])
+            if len(rows) >= needed:
+                break
+        return rows[offset:needed]
+
+    # Retention
+
+    @classmethod
+    def archive_partition(cls, key: int, directory: Optional[str] = None) -> APIUsageLogPartition:
+        """
+        Archive a partition to a compressed JSON Lines file and drop its table.
+
+        The file is written under a temporary name and renamed once
+        complete, so a failed archive leaves the table in place.
+
+        Args:
+            key: Month key (YYYYMM)
+            directory: Archive directory, defaults to API_USAGE_LOG_ARCHIVE_DIR
+
+        Returns:
+            The updated APIUsageLogPartition
+        """
+        partition = APIUsageLogPartition.objects.get(month=date(*divmod(key, 100), 1))
+        if not partition.is_live:
+            return partition
+
+        directory = directory or ARCHIVE_DIR
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{partition.table_name}.jsonl.gz')
+        temporary_path = path + '.tmp.gz'
+
+        model = cls.model_for(key)
+        rows = 0
+        with open_jsonl(temporary_path, 'w') as archive:
+            for page in keyset_pages(model.objects.values(*ARCHIVE_FIELDS), cls.BATCH_SIZE):
+                archive.write(''.join(encode_line(row) for row in page))
+                rows += len(page)
+        os.replace(temporary_path, path)
+
+        with connection.cursor() as cursor:
+            cursor.execute(connection.schema_editor().sql_delete_table % {
+                'table': connection.ops.quote_name(partition.table_name),
+            })
+
+        partition.archived_at = timezone.now()
+        partition.archive_file = path
+        partition.archived_rows = rows
+        partition.save(update_fields=['archived_at', 'archive_file', 'archived_rows'])
+        cls.invalidate_partitions()
+        logger.info(f"Archived {rows} API usage log rows from {partition.table_name} to {path}")
+        return partition
+
+    @classmethod
+    def maintain(cls, retention_months: Optional[int] = None, directory: Optional[str] = None,
+                 now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Create the current and next month's partitions and archive expired ones.
+
+        Args:
+            retention_months: Months kept live, including the current one
+            directory: Archive directory, defaults to API_USAGE_LOG_ARCHIVE_DIR
+            now: Current time, defaults to now
+
+        Returns:
+            dict: 'created' and 'archived' month keys
+        """
+        retention_months = retention_months or RETENTION_MONTHS
+        current = month_key(now or timezone.now())
+
+        before = set(cls.get_partitions()['keys'])
+        for key in (current, add_months(current, 1)):
+            cls.ensure_partition(key)
+
+        oldest_kept = add_months(current, 1 - retention_months)
+        archived = []
+        for key in cls.get_partitions()['keys']:
+            if key < oldest_kept:
+                cls.archive_partition(key, directory)
+                archived.append(key)
+
+        return {
+            'created': sorted({current, add_months(current, 1)} - before),
+            'archived': archived,
+        }
+
+    @classmethod
+    def migrate_legacy(cls) -> int:
+        """
+        Move rows from the APIUsageLog table into the monthly partitions.
+
+        Rows are copied and deleted one keyset page at a time, each page in
+        its own transaction.
+
+        Returns:
+            int: Number of rows moved
+        """
+        moved = 0
+        queryset = APIUsageLog.objects.values(*ARCHIVE_FIELDS)
+        for page in keyset_pages(queryset, cls.BATCH_SIZE):
+            # Create tables before the transaction; DDL commits it on MySQL
+            for key in {month_key(row['timestamp']) for row in page}:
+                cls.ensure_partition(key)
+            with transaction.atomic():
+                cls.bulk_log([{name: value for name, value in row.items() if name != 'id'} for row in page])
+                APIUsageLog.objects.filter(pk__in=[row['id'] for row in page]).delete()
+            moved += len(page)
+        cls.invalidate_partitions()
+        return moved
@@ -0,0 +1,22 @@
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def maintain_usage_log_partitions():
+    """
+    Create next month's API usage log partition and archive expired ones.
+    This task should be run daily, so the partition for a new month exists
+    before the first request of that month is logged.
+    """
+    from .services.usage_log_service import UsageLogService
+
+    try:
+        summary = UsageLogService.maintain()
+        logger.info(f"API usage log partitions maintained: {summary}")
+        return summary
+    except Exception as e:
+        logger.error(f"Failed to maintain API usage log partitions: {str(e)}")
+        raise
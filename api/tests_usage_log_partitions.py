@@ -0,0 +1,303 @@
+"""
+Tests for the partitioned API usage log storage.
+
+Covers routing writes and reads to monthly partitions, the merged
+statistics, the legacy table, archiving and dropping expired partitions,
+the API health check reading the partitions and a benchmark against the
+single indexed table.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Avg, Count
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from api.models import APIClient, APIUsageLog, APIUsageLogPartition
+from api.services.usage_log_service import UsageLogService, add_months, month_key
+from api.utils import log_api_usage
+from blog.services.engagement_backup_service import stored_timestamps
+from blog.utils.jsonl_stream import iter_jsonl
+from core.services.health_service import APIHealthChecker
+
+
+BENCHMARK_ROWS = int(os.environ.get('API_USAGE_LOG_BENCHMARK_ROWS', 60000))
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class UsageLogTestCase(TestCase):
+    """Shared fixtures for usage log tests."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='owner', password='testpass123')
+        self.client_a = APIClient.objects.create(name='Client A', created_by=self.user)
+        self.client_b = APIClient.objects.create(name='Client B', created_by=self.user)
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir, ignore_errors=True)
+
+    def row(self, timestamp, client=None, endpoint='/api/v1/posts/', method='GET', status_code=200,
+            response_time=0.1):
+        return {
+            'client_id': (client or self.client_a).pk, 'endpoint': endpoint, 'method': method,
+            'status_code': status_code, 'response_time': response_time, 'timestamp': timestamp,
+            'ip_address': '10.0.0.1',
+        }
+
+    def table_exists(self, key):
+        return UsageLogService.table_name(key) in connection.introspection.table_names()
+
+
+class PartitionRoutingTest(UsageLogTestCase):
+    """Test writing to and reading from monthly partitions."""
+
+    def setUp(self):
+        super().setUp()
+        UsageLogService.bulk_log(
+            [self.row(utc(2026, 8, day)) for day in (1, 15, 31)]
+            + [self.row(utc(2026, 9, 10), status_code=500, response_time=0.4)]
+            + [self.row(utc(2026, 10, 5), client=self.client_b, endpoint='/api/v1/categories/', status_code=429)]
+        )
+
+    def test_rows_go_to_the_partition_of_their_month(self):
+        self.assertEqual(UsageLogService.get_partitions()['keys'], [202608, 202609, 202610])
+        self.assertEqual(UsageLogService.model_for(202608).objects.count(), 3)
+        self.assertEqual(UsageLogService.model_for(202610).objects.get().client, self.client_b)
+        self.assertFalse(APIUsageLog.objects.exists())
+
+    def test_reads_only_touch_overlapping_partitions(self):
+        UsageLogService.get_partitions()
+        with CaptureQueriesContext(connection) as queries:
+            count = UsageLogService.count(start=utc(2026, 9, 1), end=utc(2026, 10, 1))
+
+        # Only usage log queries count, the cache backend may use the database too
+        log_queries = [query['sql'] for query in queries if 'api_apiusagelog' in query['sql']]
+        self.assertEqual(count, 1)
+        self.assertEqual(len(log_queries), 1)
+        self.assertIn('api_apiusagelog_202609', log_queries[0])
+        # A partition inside the range is read without a timestamp predicate
+        self.assertNotIn('timestamp', log_queries[0])
+
+    def test_summary_merges_partitions(self):
+        summary = UsageLogService.summary(start=utc(2026, 8, 15))
+
+        self.assertEqual(summary['total_requests'], 4)
+        self.assertEqual(summary['successful_requests'], 2)
+        self.assertEqual(summary['error_requests'], 2)
+        self.assertEqual(summary['rate_limited_requests'], 1)
+        self.assertAlmostEqual(summary['average_response_time'], (0.1 + 0.1 + 0.4 + 0.1) / 4)
+        self.assertEqual(summary['endpoints'].most_common(1), [(('/api/v1/posts/', 'GET'), 3)])
+        self.assertEqual(summary['clients'], {self.client_a.pk: 3, self.client_b.pk: 1})
+        self.assertEqual(UsageLogService.summary(client=self.client_b)['total_requests'], 1)
+
+    def test_recent_pages_across_partitions(self):
+        timestamps = [row.timestamp for row in UsageLogService.recent(3, offset=1)]
+
+        self.assertEqual(timestamps, [utc(2026, 9, 10), utc(2026, 8, 31), utc(2026, 8, 15)])
+        self.assertEqual(
+            UsageLogService.recent(5, client=self.client_b, fields=['endpoint', 'client__name']),
+            [{'endpoint': '/api/v1/categories/', 'client__name': 'Client B'}],
+        )
+        self.assertEqual(UsageLogService.daily_counts(start=utc(2026, 8, 15), end=utc(2026, 9, 1)),
+                         [(utc(2026, 8, 15).date(), 1), (utc(2026, 8, 31).date(), 1)])
+
+    def test_legacy_rows_are_read_until_migrated(self):
+        legacy = APIUsageLog.objects.create(
+            client=self.client_a, endpoint='/api/v1/legacy/', method='GET', status_code=200,
+            response_time=0.2, ip_address='10.0.0.2'
+        )
+        APIUsageLog.objects.filter(pk=legacy.pk).update(timestamp=utc(2026, 7, 20))
+        UsageLogService.invalidate_partitions()
+
+        self.assertEqual(UsageLogService.count(), 6)
+        self.assertEqual(UsageLogService.migrate_legacy(), 1)
+
+        self.assertFalse(APIUsageLog.objects.exists())
+        self.assertFalse(UsageLogService.get_partitions()['legacy'])
+        self.assertEqual(UsageLogService.model_for(202607).objects.get().endpoint, '/api/v1/legacy/')
+        self.assertEqual(UsageLogService.count(), 6)
+
+    def test_api_stats_command(self):
+        out = StringIO()
+        call_command('api_stats', '--days', str((timezone.now() - utc(2026, 8, 1)).days + 1), '--detailed', stdout=out)
+
+        self.assertIn('Total requests: 5', out.getvalue())
+        self.assertIn('❌ 500: 1 requests', out.getvalue())
+        self.assertIn('2026-09-10: 1 requests', out.getvalue())
+
+    def test_log_api_usage_writes_to_the_current_partition(self):
+        request = RequestFactory().get('/api/v1/posts/', HTTP_USER_AGENT='test-agent')
+        log_api_usage(self.client_a, '/api/v1/posts/', 'GET', 200, 0.05, request)
+
+        current = month_key(timezone.now())
+        row = UsageLogService.model_for(current).objects.get(endpoint='/api/v1/posts/', user_agent='test-agent')
+        self.assertEqual(row.ip_address, '127.0.0.1')
+
+    def test_admin_lists_rows_from_the_partitions(self):
+        self.user.is_staff = self.user.is_superuser = True
+        self.user.save()
+        self.client.force_login(self.user)
+        url = reverse('admin:api_apiusagelog_changelist')
+
+        response = self.client.get(url)
+        filtered = self.client.get(url, {'client': self.client_b.pk})
+
+        self.assertEqual([row.timestamp for row, _ in response.context['rows']][:2],
+                         [utc(2026, 10, 5), utc(2026, 9, 10)])
+        self.assertContains(response, '/api/v1/categories/')
+        self.assertEqual([row.endpoint for row, _ in filtered.context['rows']], ['/api/v1/categories/'])
+
+
+class RetentionTest(UsageLogTestCase):
+    """Test archiving expired partitions."""
+
+    def test_maintain_archives_and_drops_expired_partitions(self):
+        now = utc(2026, 10, 19)
+        UsageLogService.bulk_log([self.row(utc(2026, month, 3) + timedelta(minutes=i))
+                                  for month in (6, 7, 8, 9, 10) for i in range(7)])
+
+        summary = UsageLogService.maintain(retention_months=3, directory=self.archive_dir, now=now)
+
+        self.assertEqual(summary, {'created': [202611], 'archived': [202606, 202607]})
+        self.assertEqual(UsageLogService.get_partitions()['keys'], [202608, 202609, 202610, 202611])
+        self.assertFalse(self.table_exists(202606))
+        self.assertTrue(self.table_exists(202611))
+
+        partition = APIUsageLogPartition.objects.get(table_name='api_apiusagelog_202607')
+        self.assertEqual(partition.archived_rows, 7)
+        rows = list(iter_jsonl(partition.archive_file))
+        self.assertEqual([row['timestamp'][:16] for row in rows[:2]], ['2026-07-03T00:00', '2026-07-03T00:01'])
+        self.assertEqual(rows[0]['client_id'], self.client_a.pk)
+        self.assertEqual(UsageLogService.count(), 21)
+
+        # Nothing more to do on a second run
+        self.assertEqual(UsageLogService.maintain(retention_months=3, directory=self.archive_dir, now=now),
+                         {'created': [], 'archived': []})
+
+    def test_command(self):
+        UsageLogService.bulk_log([self.row(utc(2020, 1, 5))])
+
+        call_command('usage_log_partitions', '--archive', '202001', '--archive-dir', self.archive_dir, stdout=StringIO())
+
+        self.assertTrue(os.path.exists(os.path.join(self.archive_dir, 'api_apiusagelog_202001.jsonl.gz')))
+        self.assertEqual(UsageLogService.get_partitions()['keys'], [])
+
+
+class APIHealthCheckTest(UsageLogTestCase):
+    """Test the API health check reading the partitions."""
+
+    def test_error_rate_from_partitions(self):
+        now = timezone.now()
+        UsageLogService.bulk_log(
+            [self.row(now - timedelta(minutes=i)) for i in range(18)]
+            + [self.row(now - timedelta(minutes=30), client=self.client_b, status_code=500)] * 2
+            + [self.row(now - timedelta(days=3), status_code=500)] * 10
+        )
+
+        result = APIHealthChecker().check()
+
+        self.assertEqual(result.status, 'warning')
+        self.assertEqual(result.details['total_requests_24h'], 20)
+        self.assertEqual(result.details['error_rate_24h'], 10.0)
+        self.assertEqual(result.details['active_clients_24h'], 2)
+        self.assertEqual(result.details['top_clients_24h'][0], {'client__name': 'Client A', 'request_count': 18})
+        self.assertEqual([error['client__name'] for error in result.details['recent_errors']], ['Client B'] * 2)
+
+
+@skipUnless('API_USAGE_LOG_BENCHMARK_ROWS' in os.environ, 'Set API_USAGE_LOG_BENCHMARK_ROWS to run the benchmark')
+class UsageLogBenchmarkTest(UsageLogTestCase):
+    """
+    Benchmark partitioned usage logs against the single indexed table.
+
+    Runs when API_USAGE_LOG_BENCHMARK_ROWS is set to the number of rows
+    (for example 50000000), spread over twelve months.
+    """
+
+    def timed(self, function, repeat=1):
+        start_time = time.perf_counter()
+        for _ in range(repeat):
+            result = function()
+        return (time.perf_counter() - start_time) / repeat, result
+
+    def rows(self, now):
+        span = timedelta(days=365).total_seconds()
+        for i in range(BENCHMARK_ROWS):
+            yield self.row(
+                now - timedelta(seconds=span * i / BENCHMARK_ROWS),
+                client=self.client_b if i % 4 == 0 else self.client_a,
+                endpoint=f'/api/v1/endpoint-{i % 12}/', status_code=500 if i % 25 == 0 else 200,
+                response_time=(i % 100) / 100,
+            )
+
+    def old_stats(self, since):
+        logs = APIUsageLog.objects.filter(timestamp__gte=since)
+        total = logs.count()
+        errors = logs.filter(status_code__gte=400).count()
+        logs.aggregate(avg=Avg('response_time'))
+        list(logs.values('endpoint').annotate(count=Count('endpoint')).order_by('-count')[:5])
+        list(logs.values('client__name').annotate(count=Count('id')).order_by('-count')[:5])
+        list(logs.values('status_code').annotate(count=Count('status_code')).order_by('status_code'))
+        return total, errors
+
+    def new_stats(self, since):
+        summary = UsageLogService.summary(start=since)
+        return summary['total_requests'], summary['error_requests']
+
+    def test_benchmark(self):
+        now = timezone.now()
+        rows = list(self.rows(now))
+        single = [self.row(now) for _ in range(200)]
+        since = now - timedelta(hours=24)
+        month_ago = now - timedelta(days=30)
+
+        # Before: one table with three composite indexes
+        with stored_timestamps(APIUsageLog, ['timestamp']):
+            old_insert_time, _ = self.timed(lambda: APIUsageLog.objects.bulk_create(
+                [APIUsageLog(**row) for row in rows], batch_size=5000
+            ))
+        old_single_time, _ = self.timed(lambda: [APIUsageLog.objects.create(**row) for row in single])
+        self.old_stats(since)
+        old_time, old_result = self.timed(lambda: self.old_stats(since), repeat=3)
+        old_month_time, _ = self.timed(lambda: self.old_stats(month_ago), repeat=3)
+        APIUsageLog.objects.all().delete()
+        UsageLogService.invalidate_partitions()
+
+        # After: monthly partitions
+        new_insert_time, _ = self.timed(lambda: UsageLogService.bulk_log(rows))
+        new_single_time, _ = self.timed(lambda: [UsageLogService.log(**row) for row in single])
+        self.new_stats(since)
+        new_time, new_result = self.timed(lambda: self.new_stats(since), repeat=3)
+        new_month_time, _ = self.timed(lambda: self.new_stats(month_ago), repeat=3)
+
+        archive_time, archived = self.timed(lambda: UsageLogService.maintain(
+            retention_months=6, directory=self.archive_dir, now=now
+        ))
+
+        print(f"\nAPI Usage Log Benchmark ({BENCHMARK_ROWS:,} rows over 12 months):")
+        print(f"  Bulk insert (table):        {BENCHMARK_ROWS / old_insert_time:10,.0f} rows/s")
+        print(f"  Bulk insert (partitions):   {BENCHMARK_ROWS / new_insert_time:10,.0f} rows/s")
+        print(f"  Single insert (table):      {len(single) / old_single_time:10,.0f} rows/s")
+        print(f"  Single insert (partitions): {len(single) / new_single_time:10,.0f} rows/s")
+        print(f"  24h stats (table):          {old_time * 1000:10.1f}ms")
+        print(f"  24h stats (partitions):     {new_time * 1000:10.1f}ms")
+        print(f"  30d stats (table):          {old_month_time * 1000:10.1f}ms")
+        print(f"  30d stats (partitions):     {new_month_time * 1000:10.1f}ms")
+        print(f"  Archive and drop:           {archive_time * 1000:10.1f}ms  ({len(archived['archived'])} partitions)")
+
+        self.assertEqual(new_result, old_result)
+        self.assertEqual(UsageLogService.get_partitions()['keys'][0], add_months(month_key(now), -5))
@@ -355,13 +355,13 @@ def log_api_usage(client, endpoint: str, method: str, status_code: int,
         error_message: Error message if any
     """
     try:
-        from .models import APIUsageLog
+        from .services.usage_log_service import UsageLogService
         
         # Get request/response sizes (approximate)
         request_size = len(request.body) if hasattr(request, 'body') else 0
         response_size = 0  # This would need to be calculated in middleware
         
-        APIUsageLog.objects.create(
+        UsageLogService.log(
             client=client,
             api_key=api_key,
             endpoint=endpoint,
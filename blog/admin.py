@@ -1,24 +1,153 @@
 from django.contrib import admin
+from django.contrib.admin import helpers
 from django.db import models
-from django.http import HttpResponse
+from django.http import FileResponse, Http404, JsonResponse
 from django.urls import path, reverse
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from django.shortcuts import render, redirect
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.db.models import Count, Sum, Q
+from django.db.models import Count, Sum, F, OuterRef, Subquery, Prefetch
+from django.db.models.functions import Coalesce
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
 from django.utils import timezone
 from datetime import timedelta
-import csv
-import json
-from unfold.admin import ModelAdmin
+import hashlib
+from unfold.admin import ModelAdmin, TabularInline
 from unfold.contrib.forms.widgets import WysiwygWidget
-from .models import Post, Category, NewsletterSubscriber, Tag, Comment, SocialShare, AuthorProfile, MediaItem
-from .linkedin_models import LinkedInConfig, LinkedInPost
+from .models import Post, Category, NewsletterSubscriber, Tag, Comment, CommenterReputation, SocialShare, AuthorProfile, MediaItem
+from .linkedin_models import LinkedInConfig, LinkedInPost, LinkedInTask, LinkedInTaskEvent, LinkedInPublishQueueEntry
+from .services.comment_moderation_service import CommentModerationService
+from .services.engagement_warehouse_service import EngagementWarehouseService
+from .services.export_service import ExportService
 from ckeditor.widgets import CKEditorWidget
 
 
+# Changelist helpers
+#
+# Computed list_display columns are declared as annotations in get_queryset,
+# so a page of any size renders with the same number of queries and the
+# columns can be sorted through admin_order_field.
+
+def subquery_count(queryset, column):
+    """
+    Count rows of a queryset correlated to the outer row, as an expression.
+
+    Args:
+        queryset: Rows to count, filtered with OuterRef()
+        column: Column to group the rows by
+
+    Returns:
+        Expression evaluating to the count, 0 when there are no rows
+    """
+    counts = queryset.order_by().values(column).annotate(total=Count('*')).values('total')
+    return Coalesce(Subquery(counts), 0)
+
+
+def subquery_sum(queryset, column, field):
+    """
+    Sum a field of rows correlated to the outer row, as an expression.
+
+    Args:
+        queryset: Rows to sum, filtered with OuterRef()
+        column: Column to group the rows by
+        field: Field to sum
+
+    Returns:
+        Expression evaluating to the sum, 0 when there are no rows
+    """
+    sums = queryset.order_by().values(column).annotate(total=Sum(field)).values('total')
+    return Coalesce(Subquery(sums), 0)
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator that caches the row count of a changelist query.
+
+    Counting a large table is the most expensive query of a changelist
+    page; paging through the same filters reuses the count for
+    COUNT_TIMEOUT seconds.
+    """
+
+    COUNT_TIMEOUT = 60
+
+    @cached_property
+    def count(self):
+        try:
+            sql, params = self.object_list.query.sql_with_params()
+        except Exception:
+            return super().count
+        cache_key = 'admin_count:' + hashlib.md5(f"{sql}{params}".encode()).hexdigest()
+        count = cache.get(cache_key)
+        if count is None:
+            count = super().count
+            cache.set(cache_key, count, self.COUNT_TIMEOUT)
+        return count
+
+
+class StreamingExportMixin:
+    """
+    Bulk export actions that stream, or run in the background when large.
+
+    Selections up to ExportService.BACKGROUND_THRESHOLD rows are streamed
+    as the action's response. Larger ones are written to storage by a
+    Celery task; the admin polls the job's status URL and downloads the
+    file from it once done.
+    """
+
+    def export_selection(self, request, queryset, spec_name, export_format='csv', compress=False):
+        """Stream an export of the selected rows, or start a background export job"""
+        total = queryset.count()
+        if total <= ExportService.BACKGROUND_THRESHOLD:
+            return ExportService.stream_response(spec_name, queryset, export_format, compress)
+
+        # The worker rebuilds the rows from the changelist filters and the ticked rows
+        selected = None if request.POST.get('select_across') == '1' \
+            else request.POST.getlist(helpers.ACTION_CHECKBOX_NAME)
+        selection = ExportService.selection(self.model, request.GET.urlencode(), selected)
+        job = ExportService.start_job(spec_name, selection, export_format, compress=True, user_id=request.user.id)
+        opts = self.model._meta
+        status_url = reverse(f'admin:{opts.app_label}_{opts.model_name}_export_job', args=[job['id']])
+        self.message_user(request, format_html(
+            'Exporting {} rows in the background. <a href="{}">Check progress</a> and download the file from there.',
+            total, status_url
+        ))
+        return None
+
+    def get_urls(self):
+        """Add the export job status URL"""
+        opts = self.model._meta
+        return [
+            path('export-jobs/<str:job_id>/', self.admin_site.admin_view(self.export_job_view),
+                 name=f'{opts.app_label}_{opts.model_name}_export_job'),
+        ] + super().get_urls()
+
+    def export_job_view(self, request, job_id):
+        """Report the progress of an export job, or download its file with ?download=1"""
+        job = ExportService.get_job(job_id)
+        if job is None or (job['user_id'] != request.user.id and not request.user.is_superuser):
+            raise Http404('Export job not found')
+
+        if request.GET.get('download'):
+            if job['status'] != 'done':
+                return JsonResponse({'error': 'Export not finished'}, status=409)
+            return FileResponse(ExportService.storage().open(job['path'], 'rb'), as_attachment=True,
+                                filename=job['filename'])
+
+        return JsonResponse({
+            'id': job['id'],
+            'status': job['status'],
+            'rows': job['rows'],
+            'total': job['total'],
+            'progress': ExportService.progress(job),
+            'error': job['error'],
+            'download_url': f'{request.path}?download=1' if job['status'] == 'done' else None,
+        })
+
+
 @admin.register(Post)
 class PostAdmin(ModelAdmin):
     list_display = ('title', 'author', 'status', 'is_featured', 'view_count', 'engagement_score', 'linkedin_status', 'created_at')
@@ -28,6 +157,7 @@ class PostAdmin(ModelAdmin):
     list_editable = ('status', 'is_featured')
     filter_horizontal = ('categories', 'tags')
     ordering = ('-created_at',)
+    paginator = CachedCountPaginator
 
     # Use CKEditor for content fields
     formfield_overrides = {
@@ -65,14 +195,10 @@ class PostAdmin(ModelAdmin):
     actions = ['mark_as_featured', 'unmark_as_featured', 'clear_content_cache', 'post_to_linkedin', 'retry_linkedin_posting']
     
     def engagement_score(self, obj):
-        """Calculate and display engagement score based on views, comments, and shares"""
-        from django.db.models import Count
-        comment_count = obj.comments.filter(is_approved=True).count()
-        share_count = obj.social_shares.aggregate(total=Count('share_count'))['total'] or 0
-        score = obj.view_count + (comment_count * 2) + (share_count * 3)
-        return score
+        """Display engagement score based on views, approved comments, and shares"""
+        return obj.engagement
     engagement_score.short_description = 'Engagement Score'
-    engagement_score.admin_order_field = 'view_count'
+    engagement_score.admin_order_field = 'engagement'
     
     def mark_as_featured(self, request, queryset):
         """Mark selected posts as featured"""
@@ -102,7 +228,8 @@ class PostAdmin(ModelAdmin):
     def linkedin_status(self, obj):
         """Display LinkedIn posting status"""
         try:
-            linkedin_post = obj.linkedin_posts.first()
+            # Newest first from the prefetch; .first() would query again
+            linkedin_post = next(iter(obj.linkedin_posts.all()), None)
             if not linkedin_post:
                 return format_html('<span style="color: gray;">Not Posted</span>')
             
@@ -348,8 +475,16 @@ class PostAdmin(ModelAdmin):
     retry_linkedin_posting.short_description = "Retry failed LinkedIn postings"
     
     def get_queryset(self, request):
-        """Optimize queryset with prefetch_related for LinkedIn posts"""
-        return super().get_queryset(request).prefetch_related('linkedin_posts')
+        """Annotate the engagement columns and prefetch the newest LinkedIn posts"""
+        return super().get_queryset(request).annotate(
+            approved_comment_total=subquery_count(
+                Comment.objects.filter(post=OuterRef('pk'), is_approved=True), 'post'
+            ),
+            share_total=subquery_sum(SocialShare.objects.filter(post=OuterRef('pk')), 'post', 'share_count'),
+            engagement=F('view_count') + F('approved_comment_total') * 2 + F('share_total') * 3,
+        ).prefetch_related(
+            Prefetch('linkedin_posts', queryset=LinkedInPost.objects.order_by('-created_at'))
+        )
 
 @admin.register(Category)
 class CategoryAdmin(ModelAdmin):
@@ -392,11 +527,20 @@ class TagAdmin(ModelAdmin):
     
     def get_post_count(self, obj):
         """Display the number of published posts with this tag"""
-        return obj.get_post_count()
+        return obj.published_post_count
     get_post_count.short_description = 'Published Posts'
+    get_post_count.admin_order_field = 'published_post_count'
+    
+    def get_queryset(self, request):
+        """Annotate the published post count"""
+        return super().get_queryset(request).annotate(
+            published_post_count=subquery_count(
+                Post.tags.through.objects.filter(tag=OuterRef('pk'), post__status='published'), 'tag'
+            )
+        )
 
 @admin.register(NewsletterSubscriber)
-class NewsletterSubscriberAdmin(ModelAdmin):
+class NewsletterSubscriberAdmin(StreamingExportMixin, ModelAdmin):
     """
     Admin configuration for Newsletter Subscribers with enhanced confirmation workflow and export functionality.
     """
@@ -421,7 +565,7 @@ class NewsletterSubscriberAdmin(ModelAdmin):
         }),
     )
     
-    actions = ['mark_as_confirmed', 'mark_as_unconfirmed', 'resend_confirmation_email', 'export_subscribers_csv', 'export_subscribers_json']
+    actions = ['mark_as_confirmed', 'mark_as_unconfirmed', 'resend_confirmation_email', 'export_subscribers_csv', 'export_subscribers_json', 'export_subscribers_jsonl']
     
     def preferences_display(self, obj):
         """Display subscriber preferences in a readable format"""
@@ -462,43 +606,18 @@ class NewsletterSubscriberAdmin(ModelAdmin):
     
     def export_subscribers_csv(self, request, queryset):
         """Export selected subscribers to CSV"""
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="newsletter_subscribers_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['Email', 'Confirmed', 'Subscribed At', 'Confirmed At', 'Preferences'])
-        
-        for subscriber in queryset:
-            preferences_str = json.dumps(subscriber.preferences) if subscriber.preferences else ''
-            writer.writerow([
-                subscriber.email,
-                'Yes' if subscriber.is_confirmed else 'No',
-                subscriber.subscribed_at.strftime('%Y-%m-%d %H:%M:%S') if subscriber.subscribed_at else '',
-                subscriber.confirmed_at.strftime('%Y-%m-%d %H:%M:%S') if subscriber.confirmed_at else '',
-                preferences_str
-            ])
-        
-        return response
+        return self.export_selection(request, queryset, 'subscribers', 'csv')
     export_subscribers_csv.short_description = "Export selected subscribers to CSV"
     
     def export_subscribers_json(self, request, queryset):
-        """Export selected subscribers to JSON"""
-        response = HttpResponse(content_type='application/json')
-        response['Content-Disposition'] = f'attachment; filename="newsletter_subscribers_{timezone.now().strftime("%Y%m%d_%H%M%S")}.json"'
-        
-        subscribers_data = []
-        for subscriber in queryset:
-            subscribers_data.append({
-                'email': subscriber.email,
-                'is_confirmed': subscriber.is_confirmed,
-                'subscribed_at': subscriber.subscribed_at.isoformat() if subscriber.subscribed_at else None,
-                'confirmed_at': subscriber.confirmed_at.isoformat() if subscriber.confirmed_at else None,
-                'preferences': subscriber.preferences
-            })
-        
-        response.write(json.dumps(subscribers_data, indent=2))
-        return response
+        """Export selected subscribers to a JSON document"""
+        return self.export_selection(request, queryset, 'subscribers', 'json')
     export_subscribers_json.short_description = "Export selected subscribers to JSON"
+
+    def export_subscribers_jsonl(self, request, queryset):
+        """Export selected subscribers to gzipped JSON Lines"""
+        return self.export_selection(request, queryset, 'subscribers', 'jsonl', compress=True)
+    export_subscribers_jsonl.short_description = "Export selected subscribers to JSON Lines (gzip)"
     
     def get_urls(self):
         """Add custom URLs for subscriber management"""
@@ -533,29 +652,30 @@ class NewsletterSubscriberAdmin(ModelAdmin):
 
 
 @admin.register(Comment)
-class CommentAdmin(ModelAdmin):
+class CommentAdmin(StreamingExportMixin, ModelAdmin):
     """
     Admin configuration for Comments with enhanced moderation dashboard and bulk actions.
     """
-    list_display = ('author_name', 'post', 'is_approved', 'is_reply', 'created_at', 'content_preview', 'moderation_status')
-    list_filter = ('is_approved', 'created_at', 'post__categories', 'post__author')
+    list_display = ('author_name', 'post', 'is_approved', 'is_reply', 'created_at', 'content_preview', 'risk_score', 'moderation_status')
+    list_filter = ('is_approved', 'is_spam', 'created_at', 'post__categories', 'post__author')
     search_fields = ('author_name', 'author_email', 'content', 'post__title')
     list_editable = ('is_approved',)
-    readonly_fields = ('created_at', 'ip_address', 'user_agent', 'get_reply_count', 'get_author_comment_count')
+    readonly_fields = ('created_at', 'ip_address', 'user_agent', 'risk_score', 'risk_features', 'get_reply_count', 'get_author_comment_count')
     raw_id_fields = ('post', 'parent')
     date_hierarchy = 'created_at'
     list_per_page = 50
+    paginator = CachedCountPaginator
     
     fieldsets = (
         ("Comment Information", {
             'fields': ('post', 'parent', 'author_name', 'author_email', 'author_website')
         }),
         ("Content", {
-            'fields': ('content', 'is_approved')
+            'fields': ('content', 'is_approved', 'is_spam')
         }),
         ("Moderation Info", {
             'classes': ('collapse',),
-            'fields': ('get_reply_count', 'get_author_comment_count'),
+            'fields': ('risk_score', 'risk_features', 'get_reply_count', 'get_author_comment_count'),
             'description': 'Additional information for moderation decisions.'
         }),
         ("Technical Metadata", {
@@ -566,8 +686,8 @@ class CommentAdmin(ModelAdmin):
     )
     
     actions = [
-        'approve_comments', 'unapprove_comments', 'delete_spam_comments', 
-        'bulk_approve_by_author', 'bulk_block_by_ip', 'export_comments_csv'
+        'approve_comments', 'unapprove_comments', 'reject_comments', 'delete_spam_comments',
+        'bulk_approve_by_author', 'bulk_block_by_ip', 'bulk_block_by_email', 'export_comments_csv'
     ]
     
     def content_preview(self, obj):
@@ -582,38 +702,49 @@ class CommentAdmin(ModelAdmin):
         """Display moderation status with color coding"""
         if obj.is_approved:
             return format_html('<span style="color: green; font-weight: bold;">✓ Approved</span>')
+        elif obj.is_spam:
+            return format_html('<span style="color: gray; font-weight: bold;">🚫 Spam</span>')
         else:
             return format_html('<span style="color: red; font-weight: bold;">⏳ Pending</span>')
     moderation_status.short_description = 'Status'
     
     def is_reply(self, obj):
         """Show if this comment is a reply"""
-        return obj.parent is not None
+        return obj.parent_id is not None
     is_reply.boolean = True
     is_reply.short_description = 'Is Reply'
+    is_reply.admin_order_field = 'parent'
     
     def get_reply_count(self, obj):
         """Get the number of replies to this comment"""
-        return obj.replies.count()
+        return obj.reply_count
     get_reply_count.short_description = 'Replies'
+    get_reply_count.admin_order_field = 'reply_count'
     
     def get_author_comment_count(self, obj):
         """Get total comments by this author"""
-        return Comment.objects.filter(author_email=obj.author_email).count()
+        return obj.author_comment_count
     get_author_comment_count.short_description = 'Author Total Comments'
+    get_author_comment_count.admin_order_field = 'author_comment_count'
     
     def approve_comments(self, request, queryset):
         """Approve selected comments"""
-        updated = queryset.update(is_approved=True)
+        updated = CommentModerationService.set_state(queryset, 'approved')
         self.message_user(request, f'{updated} comments approved.')
     approve_comments.short_description = "✓ Approve selected comments"
     
     def unapprove_comments(self, request, queryset):
         """Unapprove selected comments"""
-        updated = queryset.update(is_approved=False)
+        updated = CommentModerationService.set_state(queryset, 'pending')
         self.message_user(request, f'{updated} comments unapproved.')
     unapprove_comments.short_description = "⏳ Unapprove selected comments"
     
+    def reject_comments(self, request, queryset):
+        """Reject selected comments as spam"""
+        updated = CommentModerationService.set_state(queryset, 'spam')
+        self.message_user(request, f'{updated} comments rejected as spam.')
+    reject_comments.short_description = "🚫 Reject selected comments as spam"
+    
     def delete_spam_comments(self, request, queryset):
         """Delete selected comments (for spam)"""
         count = queryset.count()
@@ -622,39 +753,31 @@ class CommentAdmin(ModelAdmin):
     delete_spam_comments.short_description = "🗑️ Delete selected comments (spam)"
     
     def bulk_approve_by_author(self, request, queryset):
-        """Approve all comments by the same authors as selected comments"""
-        author_emails = queryset.values_list('author_email', flat=True).distinct()
-        updated = Comment.objects.filter(author_email__in=author_emails, is_approved=False).update(is_approved=True)
+        """Approve all pending comments by the same authors as selected comments"""
+        author_emails = set(queryset.values_list('author_email', flat=True))
+        updated = CommentModerationService.set_state(
+            Comment.objects.filter(author_email__in=author_emails, is_approved=False, is_spam=False), 'approved'
+        )
         self.message_user(request, f'Approved {updated} comments from {len(author_emails)} authors.')
     bulk_approve_by_author.short_description = "✓ Approve all comments by selected authors"
     
     def bulk_block_by_ip(self, request, queryset):
-        """Mark all comments from the same IP addresses as spam"""
-        ip_addresses = queryset.values_list('ip_address', flat=True).distinct()
-        updated = Comment.objects.filter(ip_address__in=ip_addresses).update(is_approved=False)
+        """Block the IP addresses of selected comments and reject all their comments"""
+        ip_addresses = set(queryset.values_list('ip_address', flat=True))
+        updated = CommentModerationService.set_blocked('ip', ip_addresses)
         self.message_user(request, f'Blocked {updated} comments from {len(ip_addresses)} IP addresses.')
     bulk_block_by_ip.short_description = "🚫 Block all comments from selected IP addresses"
     
+    def bulk_block_by_email(self, request, queryset):
+        """Block the emails of selected comments and reject all their comments"""
+        author_emails = set(queryset.values_list('author_email', flat=True))
+        updated = CommentModerationService.set_blocked('email', author_emails)
+        self.message_user(request, f'Blocked {updated} comments from {len(author_emails)} authors.')
+    bulk_block_by_email.short_description = "🚫 Block all comments by selected authors"
+    
     def export_comments_csv(self, request, queryset):
         """Export selected comments to CSV"""
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="comments_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['Post Title', 'Author Name', 'Author Email', 'Content', 'Approved', 'Created At', 'IP Address'])
-        
-        for comment in queryset.select_related('post'):
-            writer.writerow([
-                comment.post.title,
-                comment.author_name,
-                comment.author_email,
-                comment.content[:200] + '...' if len(comment.content) > 200 else comment.content,
-                'Yes' if comment.is_approved else 'No',
-                comment.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                comment.ip_address
-            ])
-        
-        return response
+        return self.export_selection(request, queryset, 'comments', 'csv')
     export_comments_csv.short_description = "📊 Export selected comments to CSV"
     
     def get_urls(self):
@@ -667,48 +790,60 @@ class CommentAdmin(ModelAdmin):
     
     def moderation_dashboard_view(self, request):
         """Display comment moderation dashboard"""
-        # Get moderation statistics
-        total_comments = Comment.objects.count()
-        pending_comments = Comment.objects.filter(is_approved=False).count()
-        approved_comments = total_comments - pending_comments
-        
-        # Recent activity
-        last_24_hours = timezone.now() - timedelta(hours=24)
-        recent_comments = Comment.objects.filter(created_at__gte=last_24_hours).count()
-        recent_pending = Comment.objects.filter(created_at__gte=last_24_hours, is_approved=False).count()
-        
-        # Top commenters
-        top_commenters = Comment.objects.values('author_name', 'author_email').annotate(
-            comment_count=Count('id'),
-            approved_count=Count('id', filter=Q(is_approved=True))
-        ).order_by('-comment_count')[:10]
-        
-        # Comments by post
-        top_commented_posts = Post.objects.annotate(
-            comment_count=Count('comments', filter=Q(comments__is_approved=True))
-        ).filter(comment_count__gt=0).order_by('-comment_count')[:10]
-        
         context = {
             'title': 'Comment Moderation Dashboard',
-            'total_comments': total_comments,
-            'pending_comments': pending_comments,
-            'approved_comments': approved_comments,
-            'approval_rate': (approved_comments / total_comments * 100) if total_comments > 0 else 0,
-            'recent_comments': recent_comments,
-            'recent_pending': recent_pending,
-            'top_commenters': top_commenters,
-            'top_commented_posts': top_commented_posts,
+            **CommentModerationService.dashboard_stats(),
         }
         
         return render(request, 'admin/blog/comment/moderation_dashboard.html', context)
     
+    def save_model(self, request, obj, form, change):
+        """Approving a comment takes it out of spam"""
+        if obj.is_approved:
+            obj.is_spam = False
+        super().save_model(request, obj, form, change)
+    
     def get_queryset(self, request):
-        """Optimize queryset with select_related"""
-        return super().get_queryset(request).select_related('post', 'parent')
+        """Annotate the reply and author comment counts"""
+        return super().get_queryset(request).select_related('post').annotate(
+            reply_count=subquery_count(Comment.objects.filter(parent=OuterRef('pk')), 'parent'),
+            author_comment_count=subquery_count(
+                Comment.objects.filter(author_email=OuterRef('author_email')), 'author_email'
+            ),
+        )
+
+
+@admin.register(CommenterReputation)
+class CommenterReputationAdmin(ModelAdmin):
+    """
+    Admin configuration for commenter reputation counters and blocking.
+    """
+    list_display = ('value', 'kind', 'display_name', 'comment_count', 'approved_count', 'spam_count', 'is_blocked', 'last_seen')
+    list_filter = ('kind', 'is_blocked')
+    search_fields = ('value', 'display_name')
+    readonly_fields = ('kind', 'value', 'display_name', 'comment_count', 'approved_count', 'spam_count', 'last_seen')
+    ordering = ('kind', '-comment_count')
+    
+    actions = ['block_commenters', 'unblock_commenters']
+    
+    def block_commenters(self, request, queryset):
+        """Block selected IP addresses and emails and reject all their comments"""
+        updated = 0
+        for kind in ('ip', 'email'):
+            updated += CommentModerationService.set_blocked(kind, queryset.filter(kind=kind).values_list('value', flat=True))
+        self.message_user(request, f'Blocked selected commenters and rejected {updated} comments.')
+    block_commenters.short_description = "🚫 Block selected commenters"
+    
+    def unblock_commenters(self, request, queryset):
+        """Unblock selected IP addresses and emails"""
+        for kind in ('ip', 'email'):
+            CommentModerationService.set_blocked(kind, queryset.filter(kind=kind).values_list('value', flat=True), blocked=False)
+        self.message_user(request, 'Unblocked selected commenters.')
+    unblock_commenters.short_description = "Unblock selected commenters"
 
 
 @admin.register(SocialShare)
-class SocialShareAdmin(ModelAdmin):
+class SocialShareAdmin(StreamingExportMixin, ModelAdmin):
     """
     Admin configuration for Social Share tracking with analytics.
     """
@@ -750,22 +885,7 @@ class SocialShareAdmin(ModelAdmin):
     
     def export_share_data_csv(self, request, queryset):
         """Export social share data to CSV"""
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="social_shares_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['Post Title', 'Platform', 'Share Count', 'Last Shared', 'Created At'])
-        
-        for share in queryset.select_related('post'):
-            writer.writerow([
-                share.post.title,
-                share.get_platform_display(),
-                share.share_count,
-                share.last_shared.strftime('%Y-%m-%d %H:%M:%S') if share.last_shared else '',
-                share.created_at.strftime('%Y-%m-%d %H:%M:%S')
-            ])
-        
-        return response
+        return self.export_selection(request, queryset, 'social_shares', 'csv')
     export_share_data_csv.short_description = "📊 Export share data to CSV"
     
     def get_urls(self):
@@ -815,6 +935,7 @@ class AuthorProfileAdmin(ModelAdmin):
     list_filter = ('is_guest_author', 'is_active', 'created_at')
     search_fields = ('user__username', 'user__first_name', 'user__last_name', 'user__email', 'bio', 'guest_author_company')
     list_editable = ('is_active',)
+    list_select_related = ('user',)
     readonly_fields = ('created_at', 'updated_at', 'get_post_count', 'get_recent_posts_display')
     raw_id_fields = ('user',)
     
@@ -851,8 +972,9 @@ class AuthorProfileAdmin(ModelAdmin):
     
     def get_post_count(self, obj):
         """Display the number of published posts by this author"""
-        return obj.get_post_count()
+        return obj.published_post_count
     get_post_count.short_description = 'Published Posts'
+    get_post_count.admin_order_field = 'published_post_count'
     
     def get_recent_posts_display(self, obj):
         """Display recent posts by this author"""
@@ -893,8 +1015,13 @@ class AuthorProfileAdmin(ModelAdmin):
     mark_as_regular_authors.short_description = "Mark selected authors as regular authors"
     
     def get_queryset(self, request):
-        """Optimize queryset with select_related"""
-        return super().get_queryset(request).select_related('user')
+        """Annotate the published post count, from the author stats when they exist"""
+        return super().get_queryset(request).select_related('user').annotate(
+            published_post_count=Coalesce(
+                'user__author_stats__published_post_count',
+                subquery_count(Post.objects.filter(author=OuterRef('user'), status='published'), 'author'),
+            )
+        )
 
 @admin.register(MediaItem)
 class MediaItemAdmin(ModelAdmin):
@@ -905,7 +1032,7 @@ class MediaItemAdmin(ModelAdmin):
     list_filter = ('media_type', 'is_featured', 'created_at', 'post__categories')
     search_fields = ('title', 'description', 'post__title', 'alt_text')
     list_editable = ('order', 'is_featured')
-    readonly_fields = ('created_at', 'updated_at', 'file_size', 'width', 'height', 'get_responsive_images_display')
+    readonly_fields = ('created_at', 'updated_at', 'file_size', 'width', 'height', 'renditions', 'get_responsive_images_display')
     raw_id_fields = ('post',)
     ordering = ('post', 'order', '-created_at')
     
@@ -933,7 +1060,7 @@ class MediaItemAdmin(ModelAdmin):
         }),
         ("Technical Information", {
             'classes': ('collapse',),
-            'fields': ('file_size', 'width', 'height', 'get_responsive_images_display'),
+            'fields': ('file_size', 'width', 'height', 'renditions', 'get_responsive_images_display'),
             'description': 'Automatically populated technical metadata'
         }),
         ("Timestamps", {
@@ -965,6 +1092,8 @@ class MediaItemAdmin(ModelAdmin):
                 for size, data in responsive_images.items():
                     if isinstance(data, dict) and 'url' in data:
                         sizes.append(f'<a href="{data["url"]}" target="_blank">{size.title()}</a>')
+                    elif isinstance(data, list):
+                        sizes.append(f'{size.upper()} ({", ".join(str(item["width"]) + "w" for item in data)})')
                     else:
                         sizes.append(size.title())
                 return ' | '.join(sizes)
@@ -992,13 +1121,13 @@ class MediaItemAdmin(ModelAdmin):
         for media_item in queryset.filter(media_type='image'):
             if media_item.original_image:
                 try:
-                    # This would regenerate thumbnails - simplified for now
+                    multimedia_service.generate_renditions(media_item)
                     count += 1
                 except Exception as e:
                     self.message_user(request, f'Error processing {media_item.title}: {str(e)}', level='ERROR')
         
-        self.message_user(request, f'Thumbnails regenerated for {count} media items.')
-    regenerate_thumbnails.short_description = "Regenerate thumbnails for selected images"
+        self.message_user(request, f'WebP/AVIF renditions regenerated for {count} media items.')
+    regenerate_thumbnails.short_description = "Regenerate responsive renditions for selected images"
     
     def optimize_images(self, request, queryset):
         """Optimize images for web delivery"""
@@ -1044,76 +1173,15 @@ class BlogEngagementAdminSite(admin.AdminSite):
         return custom_urls + urls
     
     def engagement_analytics_view(self, request):
-        """Main engagement analytics dashboard"""
-        # Overall statistics
-        total_posts = Post.objects.filter(status='published').count()
-        total_comments = Comment.objects.filter(is_approved=True).count()
-        total_subscribers = NewsletterSubscriber.objects.filter(is_confirmed=True).count()
-        total_shares = SocialShare.objects.aggregate(total=Sum('share_count'))['total'] or 0
-        
-        # Recent activity (last 30 days)
-        last_30_days = timezone.now() - timedelta(days=30)
-        recent_posts = Post.objects.filter(created_at__gte=last_30_days, status='published').count()
-        recent_comments = Comment.objects.filter(created_at__gte=last_30_days, is_approved=True).count()
-        recent_subscribers = NewsletterSubscriber.objects.filter(subscribed_at__gte=last_30_days).count()
-        recent_shares = SocialShare.objects.filter(last_shared__gte=last_30_days).aggregate(total=Sum('share_count'))['total'] or 0
-        
-        # Top performing content
-        top_posts_by_views = Post.objects.filter(status='published').order_by('-view_count')[:10]
-        top_posts_by_comments = Post.objects.filter(status='published').annotate(
-            comment_count=Count('comments', filter=Q(comments__is_approved=True))
-        ).order_by('-comment_count')[:10]
-        top_posts_by_shares = Post.objects.filter(status='published').annotate(
-            share_count=Sum('social_shares__share_count')
-        ).filter(share_count__gt=0).order_by('-share_count')[:10]
-        
-        # Engagement trends by category
-        category_stats = Category.objects.annotate(
-            post_count=Count('posts', filter=Q(posts__status='published')),
-            total_views=Sum('posts__view_count', filter=Q(posts__status='published')),
-            total_comments=Count('posts__comments', filter=Q(posts__status='published', posts__comments__is_approved=True)),
-            total_shares=Sum('posts__social_shares__share_count', filter=Q(posts__status='published'))
-        ).filter(post_count__gt=0).order_by('-total_views')[:10]
-        
-        # Tag performance
-        tag_stats = Tag.objects.annotate(
-            post_count=Count('posts', filter=Q(posts__status='published')),
-            total_views=Sum('posts__view_count', filter=Q(posts__status='published')),
-            avg_engagement=Count('posts__comments', filter=Q(posts__status='published', posts__comments__is_approved=True)) + Sum('posts__social_shares__share_count', filter=Q(posts__status='published'))
-        ).filter(post_count__gt=0).order_by('-total_views')[:10]
-        
-        # Author performance
-        author_stats = User.objects.annotate(
-            post_count=Count('blog_posts', filter=Q(blog_posts__status='published')),
-            total_views=Sum('blog_posts__view_count', filter=Q(blog_posts__status='published')),
-            total_comments=Count('blog_posts__comments', filter=Q(blog_posts__status='published', blog_posts__comments__is_approved=True)),
-            total_shares=Sum('blog_posts__social_shares__share_count', filter=Q(blog_posts__status='published'))
-        ).filter(post_count__gt=0).order_by('-total_views')[:10]
-        
-        # Social media platform performance
-        platform_performance = SocialShare.objects.values('platform').annotate(
-            total_shares=Sum('share_count'),
-            post_count=Count('post', distinct=True),
-            avg_shares_per_post=Sum('share_count') / Count('post', distinct=True)
-        ).order_by('-total_shares')
-        
+        """
+        Main engagement analytics dashboard.
+
+        Renders from the engagement warehouse rollups, which are rebuilt in
+        the background from the daily engagement facts.
+        """
         context = {
             'title': 'Blog Engagement Analytics Dashboard',
-            'total_posts': total_posts,
-            'total_comments': total_comments,
-            'total_subscribers': total_subscribers,
-            'total_shares': total_shares,
-            'recent_posts': recent_posts,
-            'recent_comments': recent_comments,
-            'recent_subscribers': recent_subscribers,
-            'recent_shares': recent_shares,
-            'top_posts_by_views': top_posts_by_views,
-            'top_posts_by_comments': top_posts_by_comments,
-            'top_posts_by_shares': top_posts_by_shares,
-            'category_stats': category_stats,
-            'tag_stats': tag_stats,
-            'author_stats': author_stats,
-            'platform_performance': platform_performance,
+            **EngagementWarehouseService.get_rollups(),
         }
         
         return render(request, 'admin/blog/engagement_analytics.html', context)
@@ -1441,7 +1509,7 @@ class LinkedInConfigAdmin(ModelAdmin):
 
 
 @admin.register(LinkedInPost)
-class LinkedInPostAdmin(ModelAdmin):
+class LinkedInPostAdmin(StreamingExportMixin, ModelAdmin):
     """
     Admin configuration for LinkedIn Post tracking with status monitoring.
     """
@@ -1564,27 +1632,7 @@ class LinkedInPostAdmin(ModelAdmin):
     
     def export_posting_data(self, request, queryset):
         """Export posting data to CSV"""
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="linkedin_posts_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow([
-            'Blog Post Title', 'Status', 'LinkedIn Post ID', 'Attempt Count', 
-            'Created At', 'Posted At', 'Error Message'
-        ])
-        
-        for linkedin_post in queryset.select_related('post'):
-            writer.writerow([
-                linkedin_post.post.title,
-                linkedin_post.get_status_display(),
-                linkedin_post.linkedin_post_id or '',
-                linkedin_post.attempt_count,
-                linkedin_post.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                linkedin_post.posted_at.strftime('%Y-%m-%d %H:%M:%S') if linkedin_post.posted_at else '',
-                linkedin_post.error_message or ''
-            ])
-        
-        return response
+        return self.export_selection(request, queryset, 'linkedin_posts', 'csv')
     export_posting_data.short_description = "Export posting data to CSV"
     
     def get_queryset(self, request):
@@ -1846,29 +1894,7 @@ class LinkedInPostAdmin(ModelAdmin):
     
     def export_linkedin_stats(self, request, queryset):
         """Export LinkedIn posting statistics"""
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="linkedin_stats_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow([
-            'Post Title', 'Status', 'Image Status', 'Media Count', 
-            'Attempts', 'Posted At', 'LinkedIn URL', 'Error Message'
-        ])
-        
-        for linkedin_post in queryset.select_related('post'):
-            media_count = len(linkedin_post.media_ids) if linkedin_post.media_ids else 0
-            writer.writerow([
-                linkedin_post.post.title if linkedin_post.post else 'No Post',
-                linkedin_post.get_status_display(),
-                linkedin_post.get_image_upload_status_display(),
-                media_count,
-                linkedin_post.attempt_count,
-                linkedin_post.posted_at.strftime('%Y-%m-%d %H:%M:%S') if linkedin_post.posted_at else '',
-                linkedin_post.linkedin_post_url or '',
-                linkedin_post.error_message or linkedin_post.image_error_message or ''
-            ])
-        
-        return response
+        return self.export_selection(request, queryset, 'linkedin_stats', 'csv')
     export_linkedin_stats.short_description = "Export LinkedIn statistics to CSV"
     
     def view_image_metrics(self, request, queryset):
@@ -1933,3 +1959,121 @@ class LinkedInPostAdmin(ModelAdmin):
             return redirect(reverse('admin:blog_linkedinpost_changelist'))
 
 
+
+
+class LinkedInTaskEventInline(TabularInline):
+    """Read-only step and error history of a LinkedIn task."""
+    model = LinkedInTaskEvent
+    extra = 0
+    can_delete = False
+    fields = ('created_at', 'attempt', 'event_type', 'step_name', 'duration', 'error')
+    readonly_fields = fields
+    ordering = ('id',)
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(LinkedInTask)
+class LinkedInTaskAdmin(ModelAdmin):
+    """
+    Admin view of the LinkedIn task registry.
+    
+    Tasks are written by LinkedInTaskMonitor only, so the admin is read-only.
+    The changelist filters use the status and post_id indexes.
+    """
+    list_display = ('task_id', 'task_type', 'post_id', 'status_display', 'retry_count', 'step_progress', 'duration_display', 'created_at')
+    list_filter = ('status', 'task_type', 'created_at')
+    search_fields = ('=post_id', '=task_id')
+    date_hierarchy = 'created_at'
+    ordering = ('-created_at',)
+    list_per_page = 50
+    show_full_result_count = False
+    inlines = [LinkedInTaskEventInline]
+    readonly_fields = (
+        'task_id', 'task_type', 'post_id', 'status', 'context', 'result', 'final_error',
+        'retry_count', 'max_retries', 'retry_reason', 'cancellation_reason',
+        'step_count', 'successful_steps', 'failed_steps', 'error_count',
+        'created_at', 'updated_at', 'started_at', 'completed_at', 'retry_at', 'cancelled_at', 'duration'
+    )
+    
+    fieldsets = (
+        ("Task", {
+            'fields': ('task_id', 'task_type', 'post_id', 'status', 'context')
+        }),
+        ("Progress", {
+            'fields': ('step_count', 'successful_steps', 'failed_steps', 'error_count', 'duration')
+        }),
+        ("Result", {
+            'classes': ('collapse',),
+            'fields': ('result', 'final_error')
+        }),
+        ("Retries and Cancellation", {
+            'classes': ('collapse',),
+            'fields': ('retry_count', 'max_retries', 'retry_reason', 'retry_at', 'cancellation_reason', 'cancelled_at')
+        }),
+        ("Timestamps", {
+            'classes': ('collapse',),
+            'fields': ('created_at', 'updated_at', 'started_at', 'completed_at')
+        }),
+    )
+    
+    def status_display(self, obj):
+        """Display status with color coding"""
+        status_colors = {
+            'pending': 'orange',
+            'running': 'blue',
+            'success': 'green',
+            'failed': 'red',
+            'retrying': 'purple',
+            'cancelled': 'gray',
+        }
+        return format_html(
+            '<span style="color: {}; font-weight: bold;">{}</span>',
+            status_colors.get(obj.status, 'gray'),
+            obj.get_status_display()
+        )
+    status_display.short_description = 'Status'
+    status_display.admin_order_field = 'status'
+    
+    def step_progress(self, obj):
+        """Display successful/failed step counts for the current attempt"""
+        if not obj.step_count:
+            return "-"
+        return f"{obj.successful_steps} ok / {obj.failed_steps} failed of {obj.step_count}"
+    step_progress.short_description = 'Steps'
+    
+    def duration_display(self, obj):
+        """Display task duration"""
+        return f"{obj.duration:.2f}s" if obj.duration is not None else "-"
+    duration_display.short_description = 'Duration'
+    duration_display.admin_order_field = 'duration'
+    
+    def has_add_permission(self, request):
+        return False  # Tasks are created by the task monitor
+    
+    def has_change_permission(self, request, obj=None):
+        return False  # Task state is managed by the task monitor
+
+
+@admin.register(LinkedInPublishQueueEntry)
+class LinkedInPublishQueueEntryAdmin(ModelAdmin):
+    """
+    Admin view of the LinkedIn publish queue.
+    
+    Entries are created and dispatched by LinkedInPublishScheduler; deleting
+    an entry removes the post from the queue.
+    """
+    list_display = ('post', 'reason', 'priority', 'due_at', 'enqueued_at', 'coalesced_count')
+    list_filter = ('reason', 'priority')
+    search_fields = ('post__title', '=post__id')
+    list_select_related = ('post',)
+    ordering = ('-priority', 'enqueued_at')
+    list_per_page = 50
+    readonly_fields = ('post', 'reason', 'priority', 'due_at', 'enqueued_at', 'coalesced_count')
+    
+    def has_add_permission(self, request):
+        return False  # Entries are created by the publish scheduler
+    
+    def has_change_permission(self, request, obj=None):
+        return False  # Entries are managed by the publish scheduler
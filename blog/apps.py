@@ -8,3 +8,10 @@ class BlogConfig(AppConfig):
     def ready(self):
         import blog.signals
         import blog.signals.schema_cache_signals
+        import blog.signals.linkedin_signals
+        import blog.signals.comment_signals
+        import blog.signals.author_stats_signals
+        import blog.signals.social_image_signals
+        import blog.signals.engagement_signals
+        import blog.signals.moderation_signals
+        import blog.signals.post_card_signals
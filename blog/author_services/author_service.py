@@ -2,9 +2,10 @@
 Author service for managing author profiles and related functionality.
 """
 from django.contrib.auth.models import User
-from django.db.models import Count, Q
+from django.db.models import F, Q
 from django.core.exceptions import ObjectDoesNotExist
 from ..models import AuthorProfile, Post
+from .author_stats_service import AuthorStatsService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -74,15 +75,20 @@ class AuthorService:
         """
         Get all active authors who have published posts.
         
+        Reads post counts from AuthorStats, so a page of authors, their
+        profiles and stats is a single query without grouping over posts.
+        
         Returns:
             QuerySet of User objects with author profiles
         """
         return User.objects.filter(
             author_profile__is_active=True,
-            blog_posts__status='published'
+            author_stats__published_post_count__gt=0
+        ).select_related(
+            'author_profile', 'author_stats'
         ).annotate(
-            post_count=Count('blog_posts', filter=Q(blog_posts__status='published'))
-        ).filter(post_count__gt=0).distinct().order_by('first_name', 'last_name', 'username')
+            post_count=F('author_stats__published_post_count')
+        ).order_by('first_name', 'last_name', 'username')
     
     @staticmethod
     def get_guest_authors():
@@ -196,14 +202,17 @@ class AuthorService:
         Returns:
             Dictionary with author statistics
         """
-        posts = user.blog_posts.filter(status='published')
+        author_stats = AuthorStatsService.get_stats(user)
         
+        # Posts are loaded lazily, only if a template uses them
         stats = {
-            'total_posts': posts.count(),
-            'total_views': sum(post.view_count for post in posts),
-            'total_comments': sum(post.comments.filter(is_approved=True).count() for post in posts),
-            'most_viewed_post': posts.order_by('-view_count').first(),
-            'latest_post': posts.order_by('-created_at').first(),
+            'total_posts': author_stats.published_post_count,
+            'total_views': author_stats.total_views,
+            'total_comments': author_stats.approved_comment_count,
+            'last_published_at': author_stats.last_published_at,
+            'top_categories': author_stats.top_categories,
+            'most_viewed_post': author_stats.most_viewed_post,
+            'latest_post': author_stats.latest_post,
         }
         
         return stats
@@ -219,13 +228,9 @@ class AuthorService:
         Returns:
             QuerySet of User objects matching the search
         """
-        return User.objects.filter(
+        return AuthorService.get_all_active_authors().filter(
             Q(first_name__icontains=query) |
             Q(last_name__icontains=query) |
             Q(username__icontains=query) |
-            Q(author_profile__bio__icontains=query),
-            author_profile__is_active=True,
-            blog_posts__status='published'
-        ).annotate(
-            post_count=Count('blog_posts', filter=Q(blog_posts__status='published'))
-        ).filter(post_count__gt=0).distinct().order_by('first_name', 'last_name', 'username')
\ No newline at end of file
+            Q(author_profile__bio__icontains=query)
+        )
\ No newline at end of file
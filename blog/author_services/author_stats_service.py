@@ -0,0 +1,195 @@
+"""
+Author statistics service.
+
+Maintains AuthorStats, a denormalized row per author holding published post
+count, total views, approved comment count, last published date and top
+categories, so author list and profile pages read one row per author
+instead of aggregating over posts and comments.
+
+Rows are refreshed per author from Post, Comment and Post.categories
+signals (see blog/signals/author_stats_signals.py). Buffered view counts are
+added as deltas when they are flushed. ``rebuild()`` recomputes every row
+and backs the ``rebuild_author_stats`` command.
+"""
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import Count, F, Subquery
+from ..models import AuthorStats, Comment, Post
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AuthorStatsService:
+    """Service class for computing and storing per-author statistics."""
+
+    TOP_CATEGORY_LIMIT = 5
+
+    @staticmethod
+    def _empty_stats():
+        return {
+            'published_post_count': 0,
+            'total_views': 0,
+            'approved_comment_count': 0,
+            'last_published_at': None,
+            'top_categories': [],
+            'latest_post_id': None,
+            'most_viewed_post_id': None,
+        }
+
+    @classmethod
+    def compute_stats(cls, author_ids=None):
+        """
+        Compute statistics for the given authors, or for all authors.
+
+        Uses three queries whatever the number of authors: one pass over
+        published posts, one grouped comment count and one grouped category
+        count.
+
+        Args:
+            author_ids: Iterable of user IDs, or None for every author
+
+        Returns:
+            Dictionary mapping user ID to a dictionary of AuthorStats fields
+        """
+        posts = Post.objects.filter(status='published')
+        comments = Comment.objects.filter(is_approved=True, post__status='published')
+        categories = Post.categories.through.objects.filter(post__status='published')
+        if author_ids is not None:
+            author_ids = list(author_ids)
+            posts = posts.filter(author_id__in=author_ids)
+            comments = comments.filter(post__author_id__in=author_ids)
+            categories = categories.filter(post__author_id__in=author_ids)
+
+        stats = defaultdict(cls._empty_stats)
+        most_views = {}
+
+        for author_id, post_id, created_at, view_count in posts.values_list(
+            'author_id', 'id', 'created_at', 'view_count'
+        ).iterator():
+            entry = stats[author_id]
+            entry['published_post_count'] += 1
+            entry['total_views'] += view_count
+            if entry['last_published_at'] is None or created_at > entry['last_published_at']:
+                entry['last_published_at'] = created_at
+                entry['latest_post_id'] = post_id
+            if author_id not in most_views or view_count > most_views[author_id]:
+                most_views[author_id] = view_count
+                entry['most_viewed_post_id'] = post_id
+
+        comment_counts = comments.values('post__author_id').annotate(count=Count('id'))
+        for row in comment_counts:
+            stats[row['post__author_id']]['approved_comment_count'] = row['count']
+
+        category_counts = categories.values(
+            'post__author_id', 'category_id', 'category__name', 'category__slug'
+        ).annotate(post_count=Count('post_id')).order_by('post__author_id', '-post_count', 'category__name')
+        for row in category_counts:
+            top = stats[row['post__author_id']]['top_categories']
+            if len(top) < cls.TOP_CATEGORY_LIMIT:
+                top.append({
+                    'id': row['category_id'],
+                    'name': row['category__name'],
+                    'slug': row['category__slug'],
+                    'post_count': row['post_count'],
+                })
+
+        return dict(stats)
+
+    @classmethod
+    def refresh_authors(cls, author_ids, create=True):
+        """
+        Recompute and store the statistics of some authors.
+
+        Args:
+            author_ids: Iterable of user IDs
+            create: Create missing rows; disabled while posts are being
+                deleted, which may be part of deleting the author
+
+        Returns:
+            Number of rows written
+        """
+        author_ids = {author_id for author_id in author_ids if author_id is not None}
+        if not author_ids:
+            return 0
+
+        stats = cls.compute_stats(author_ids)
+        written = 0
+        for author_id in author_ids:
+            fields = stats.get(author_id) or cls._empty_stats()
+            if AuthorStats.objects.filter(user_id=author_id).update(**fields):
+                written += 1
+            elif create:
+                AuthorStats.objects.get_or_create(user_id=author_id, defaults=fields)
+                written += 1
+
+        return written
+
+    @classmethod
+    def refresh_author(cls, author_id, create=True):
+        """Recompute and store the statistics of one author."""
+        return cls.refresh_authors([author_id], create=create)
+
+    @classmethod
+    def refresh_comment_counts(cls, post_ids):
+        """
+        Recount approved comments for the authors of some posts.
+
+        Args:
+            post_ids: Iterable of post IDs whose comments changed
+        """
+        author_ids = set(Post.objects.filter(pk__in=set(post_ids)).values_list('author_id', flat=True))
+        counts = dict(
+            Comment.objects.filter(is_approved=True, post__status='published', post__author_id__in=author_ids)
+            .values('post__author_id').annotate(count=Count('id')).values_list('post__author_id', 'count')
+        )
+        for author_id in author_ids:
+            AuthorStats.objects.filter(user_id=author_id).update(approved_comment_count=counts.get(author_id, 0))
+
+    @staticmethod
+    def add_views(post_id, views):
+        """
+        Add flushed views of a published post to its author's total.
+
+        Args:
+            post_id: ID of the viewed post
+            views: Number of views to add
+        """
+        author = Post.objects.filter(pk=post_id, status='published').values('author_id')[:1]
+        AuthorStats.objects.filter(user_id=Subquery(author)).update(total_views=F('total_views') + views)
+
+    @classmethod
+    def get_stats(cls, user):
+        """
+        Get an author's stored statistics, computing them when missing.
+
+        Args:
+            user: User instance
+
+        Returns:
+            AuthorStats instance
+        """
+        stats = AuthorStats.objects.filter(user=user).first()
+        if stats is None:
+            cls.refresh_author(user.pk)
+            stats = AuthorStats.objects.get(user=user)
+        return stats
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Recompute the statistics of every author.
+
+        Returns:
+            Number of rows written
+        """
+        stats = cls.compute_stats()
+        with transaction.atomic():
+            AuthorStats.objects.all().delete()
+            AuthorStats.objects.bulk_create(
+                [AuthorStats(user_id=author_id, **fields) for author_id, fields in stats.items()],
+                batch_size=500
+            )
+
+        logger.info(f"Rebuilt author stats for {len(stats)} authors")
+        return len(stats)
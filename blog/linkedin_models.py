@@ -4,6 +4,7 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 from datetime import timedelta
 import logging
+import uuid
 from .utils.encryption import credential_encryption
 
 logger = logging.getLogger(__name__)
@@ -675,4 +676,213 @@ class LinkedInPost(models.Model):
     @classmethod
     def get_successful_posts(cls):
         """Get all successfully posted posts"""
-        return cls.objects.filter(status='success').select_related('post')
\ No newline at end of file
+        return cls.objects.filter(status='success').select_related('post')
+
+class LinkedInTask(models.Model):
+    """
+    Registry entry for a monitored LinkedIn task.
+    
+    Holds the current task state only; step history is kept as append-only
+    LinkedInTaskEvent rows so step updates never rewrite the task. State
+    transitions are single conditional UPDATE statements.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCESS = 'success'
+    STATUS_FAILED = 'failed'
+    STATUS_RETRYING = 'retrying'
+    STATUS_CANCELLED = 'cancelled'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCESS, 'Success'),
+        (STATUS_FAILED, 'Failed'),
+        (STATUS_RETRYING, 'Retrying'),
+        (STATUS_CANCELLED, 'Cancelled'),
+    ]
+    ACTIVE_STATUSES = (STATUS_PENDING, STATUS_RUNNING, STATUS_RETRYING)
+    TERMINAL_STATUSES = (STATUS_SUCCESS, STATUS_FAILED, STATUS_CANCELLED)
+
+    task_id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False,
+        help_text="Unique task identifier"
+    )
+    task_type = models.CharField(
+        max_length=50,
+        help_text="Type of task (e.g. image_processing, linkedin_post)"
+    )
+    post_id = models.PositiveIntegerField(
+        help_text="ID of the blog post the task works on"
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        help_text="Current task status"
+    )
+    context = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Context supplied when the task was created"
+    )
+    result = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Result data recorded on completion"
+    )
+    final_error = models.TextField(
+        blank=True,
+        help_text="Error that caused the task to fail"
+    )
+    retry_count = models.PositiveIntegerField(default=0)
+    max_retries = models.PositiveIntegerField(default=3)
+    retry_reason = models.TextField(blank=True)
+    cancellation_reason = models.TextField(blank=True)
+
+    # Step counters for the current attempt
+    step_count = models.PositiveIntegerField(default=0)
+    successful_steps = models.PositiveIntegerField(default=0)
+    failed_steps = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    retry_at = models.DateTimeField(null=True, blank=True)
+    cancelled_at = models.DateTimeField(null=True, blank=True)
+    duration = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Task duration in seconds"
+    )
+
+    class Meta:
+        verbose_name = "LinkedIn Task"
+        verbose_name_plural = "LinkedIn Tasks"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['post_id', 'created_at']),
+            models.Index(fields=['task_type', 'status']),
+            models.Index(fields=['status', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.task_type} task for post {self.post_id} - {self.get_status_display()}"
+
+    def is_active(self):
+        """Check if the task has not reached a terminal status"""
+        return self.status in self.ACTIVE_STATUSES
+
+
+class LinkedInTaskEvent(models.Model):
+    """
+    Append-only step and error events for a LinkedIn task.
+    
+    Events are tagged with the attempt (the task's retry_count when they were
+    recorded), so a retry starts a fresh step list without deleting history.
+    """
+    EVENT_STEP_STARTED = 'step_started'
+    EVENT_STEP_SUCCEEDED = 'step_succeeded'
+    EVENT_STEP_FAILED = 'step_failed'
+    EVENT_ERROR = 'error'
+
+    EVENT_TYPE_CHOICES = [
+        (EVENT_STEP_STARTED, 'Step started'),
+        (EVENT_STEP_SUCCEEDED, 'Step succeeded'),
+        (EVENT_STEP_FAILED, 'Step failed'),
+        (EVENT_ERROR, 'Error'),
+    ]
+
+    task = models.ForeignKey(
+        LinkedInTask,
+        on_delete=models.CASCADE,
+        related_name='events'
+    )
+    attempt = models.PositiveIntegerField(default=0)
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPE_CHOICES)
+    step_name = models.CharField(max_length=50, blank=True)
+    data = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    error_type = models.CharField(max_length=100, blank=True)
+    duration = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "LinkedIn Task Event"
+        verbose_name_plural = "LinkedIn Task Events"
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['task', 'attempt', 'step_name']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_event_type_display()}: {self.step_name or '-'}"
+
+
+class LinkedInPublishQueueEntry(models.Model):
+    """
+    Pending LinkedIn publish work for a blog post.
+    
+    There is at most one entry per post: repeated publish events and retries
+    for the same post are coalesced into it, keeping the highest priority and
+    the earliest due time. The scheduler dispatches due entries by priority
+    and age, and the due_at index drives retries.
+    """
+    REASON_PUBLISH = 'publish'
+    REASON_RETRY = 'retry'
+    REASON_IMAGE_RETRY = 'image_retry'
+
+    REASON_CHOICES = [
+        (REASON_PUBLISH, 'Publish'),
+        (REASON_RETRY, 'Retry'),
+        (REASON_IMAGE_RETRY, 'Image retry'),
+    ]
+
+    PRIORITY_LOW = 1
+    PRIORITY_NORMAL = 5
+    PRIORITY_HIGH = 10
+
+    post = models.OneToOneField(
+        'Post',
+        on_delete=models.CASCADE,
+        related_name='linkedin_queue_entry',
+        help_text="The blog post waiting to be published to LinkedIn"
+    )
+    reason = models.CharField(
+        max_length=20,
+        choices=REASON_CHOICES,
+        default=REASON_PUBLISH,
+        help_text="Why the post was queued"
+    )
+    priority = models.PositiveSmallIntegerField(
+        default=PRIORITY_NORMAL,
+        help_text="Higher priority entries are dispatched first"
+    )
+    due_at = models.DateTimeField(
+        help_text="Earliest time the entry may be dispatched"
+    )
+    enqueued_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="When the post was first queued"
+    )
+    coalesced_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of later events merged into this entry"
+    )
+
+    class Meta:
+        verbose_name = "LinkedIn Publish Queue Entry"
+        verbose_name_plural = "LinkedIn Publish Queue"
+        ordering = ['-priority', 'enqueued_at']
+        indexes = [
+            models.Index(fields=['due_at']),
+            models.Index(fields=['-priority', 'enqueued_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_reason_display()} for post {self.post_id} due {self.due_at}"
@@ -0,0 +1,47 @@
+"""
+Management command to compact the daily engagement facts.
+
+Signals and the view and share counter flushes keep DailyEngagement
+current. Run this nightly to recount recent comments and subscribers, add
+counts recorded outside the warehouse, reconcile the site-wide views, fold days past the daily retention
+into weekly rows and rebuild the dashboard rollups.
+Run it once with --full to backfill the facts from existing data.
+
+Usage:
+    python manage.py compact_engagement_facts
+    python manage.py compact_engagement_facts --days 7
+    python manage.py compact_engagement_facts --full
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.services.engagement_warehouse_service import EngagementWarehouseService
+
+
+class Command(BaseCommand):
+    help = 'Reconcile the daily engagement facts with their sources and rebuild the dashboard rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=EngagementWarehouseService.COMPACTION_DAYS,
+            help=f'Number of recent days to recount (default: {EngagementWarehouseService.COMPACTION_DAYS})'
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Recount every day, e.g. to backfill the facts'
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days must be at least 1')
+
+        summary = EngagementWarehouseService.compact(days=options['days'], full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Compacted engagement facts: {summary['comments']} comment rows and "
+            f"{summary['subscribers']} subscriber rows recounted, {summary['history']} rows backfilled, "
+            f"{summary['site_views']} site view rows reconciled, {summary['folded']} old days folded into weeks, "
+            f"{summary['removed']} empty rows removed"
+        ))
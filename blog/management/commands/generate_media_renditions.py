@@ -0,0 +1,212 @@
+"""
+Management command to backfill WebP/AVIF renditions for existing media items.
+
+Items are processed in primary key order in batches. After each batch the id
+of the last item before the first failure is written to a checkpoint file and
+printed, so an interrupted run can continue with --resume (or --start-after
+the printed id) and failed items are retried. Items whose renditions manifest
+already matches their original image are skipped, which makes re-running the
+command safe.
+
+Usage:
+    python manage.py generate_media_renditions [--batch-size 50] [--resume]
+    python manage.py generate_media_renditions --start-after 1234
+    python manage.py generate_media_renditions --report
+"""
+
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.models import MediaItem
+from blog.services.multimedia_service import multimedia_service
+
+
+class Command(BaseCommand):
+    help = 'Generate WebP/AVIF srcset renditions for media items and report byte savings'
+
+    CHECKPOINT_FILE = 'media_renditions_checkpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Number of media items to process per batch (default: 50)'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Maximum number of media items to process in this run'
+        )
+        parser.add_argument(
+            '--start-after',
+            type=int,
+            default=0,
+            help='Only process media items with an id greater than this value, e.g. a printed checkpoint'
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue after the checkpoint stored by the previous run'
+        )
+        parser.add_argument(
+            '--checkpoint-file',
+            default=os.path.join(settings.BASE_DIR, self.CHECKPOINT_FILE),
+            help='File the checkpoint is stored in (default: media_renditions_checkpoint in the project directory)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate renditions even if the manifest is current'
+        )
+        parser.add_argument(
+            '--formats',
+            nargs='+',
+            choices=multimedia_service.RENDITION_FORMAT_ORDER,
+            help='Formats to generate (default: every format Pillow can encode)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the media items that would be processed without writing files'
+        )
+        parser.add_argument(
+            '--report',
+            action='store_true',
+            help='Only report byte savings across the media library'
+        )
+
+    def handle(self, *args, **options):
+        if options['report']:
+            self.report_savings()
+            return
+
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        supported = multimedia_service.get_supported_rendition_formats()
+        formats = options['formats'] or supported
+        unsupported = [fmt for fmt in formats if fmt not in supported]
+        if unsupported:
+            raise CommandError(f"Pillow cannot encode: {', '.join(unsupported)}")
+        if not formats:
+            raise CommandError('No modern image formats are supported by the installed Pillow build')
+
+        checkpoint_file = options['checkpoint_file']
+        last_pk = options['start_after']
+        if options['resume']:
+            last_pk = max(last_pk, self.read_checkpoint(checkpoint_file))
+            self.stdout.write(f'Resuming after media item {last_pk}')
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Generating {', '.join(formats)} renditions in batches of {batch_size}...")
+        )
+
+        queryset = MediaItem.objects.filter(media_type='image').exclude(original_image='').exclude(original_image__isnull=True)
+        stats = {'processed': 0, 'skipped': 0, 'failed': 0}
+        limit = options['limit']
+        # The checkpoint only moves past items that succeeded or were skipped
+        checkpoint = last_pk
+
+        while limit is None or stats['processed'] < limit:
+            batch = list(queryset.filter(pk__gt=last_pk).order_by('pk')[:batch_size])
+            if not batch:
+                break
+
+            for media_item in batch:
+                if limit is not None and stats['processed'] >= limit:
+                    break
+                last_pk = media_item.pk
+
+                if media_item.has_current_renditions() and not options['force']:
+                    current_formats = [fmt for fmt in formats if media_item.renditions.get(fmt)]
+                    if len(current_formats) == len(formats):
+                        stats['skipped'] += 1
+                        if not stats['failed']:
+                            checkpoint = last_pk
+                        continue
+
+                if options['dry_run']:
+                    self.stdout.write(f'Would process media item {media_item.pk}: {media_item.original_image.name}')
+                    stats['processed'] += 1
+                    continue
+
+                try:
+                    multimedia_service.generate_renditions(media_item, formats=formats)
+                    stats['processed'] += 1
+                    if not stats['failed']:
+                        checkpoint = last_pk
+                except Exception as e:
+                    stats['failed'] += 1
+                    self.stdout.write(self.style.ERROR(f'Failed media item {media_item.pk}: {str(e)}'))
+
+            if not options['dry_run']:
+                self.write_checkpoint(checkpoint_file, checkpoint)
+            self.stdout.write(
+                f"Checkpoint {checkpoint}: {stats['processed']} processed, "
+                f"{stats['skipped']} skipped, {stats['failed']} failed"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {stats['processed']} processed, {stats['skipped']} skipped, {stats['failed']} failed"
+        ))
+
+        if not options['dry_run']:
+            self.report_savings()
+
+    def read_checkpoint(self, path):
+        """Read the checkpoint of the previous run, 0 when there is none"""
+        try:
+            with open(path) as checkpoint_file:
+                return int(checkpoint_file.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Cannot read checkpoint file {path}: {e}')
+
+    def write_checkpoint(self, path, checkpoint):
+        """Store the checkpoint, replacing the file so a crash never leaves it half written"""
+        temp_path = f'{path}.tmp'
+        try:
+            with open(temp_path, 'w') as checkpoint_file:
+                checkpoint_file.write(str(checkpoint))
+            os.replace(temp_path, path)
+        except OSError as e:
+            raise CommandError(
+                f'Cannot write checkpoint file {path}: {e}. Rerun with --start-after {checkpoint} to continue.'
+            )
+
+    def report_savings(self):
+        """Report byte savings of modern formats over JPEG across the media library"""
+        manifests = MediaItem.objects.filter(media_type='image').exclude(renditions={}).values_list(
+            'renditions', flat=True
+        ).iterator(chunk_size=500)
+        summary = multimedia_service.summarize_rendition_savings(manifests)
+
+        self.stdout.write(self.style.SUCCESS('Rendition byte savings report'))
+        self.stdout.write(f"Media items with renditions: {summary['items']}")
+        self.stdout.write(f"Rendition widths encoded: {summary['renditions']}")
+        self.stdout.write(f"JPEG baseline: {self._format_bytes(summary['jpeg_bytes'])}")
+
+        if not summary['formats']:
+            self.stdout.write('No modern-format renditions found.')
+            return
+
+        for fmt, stats in summary['formats'].items():
+            self.stdout.write(
+                f"{fmt.upper()}: {self._format_bytes(stats['bytes'])} vs "
+                f"{self._format_bytes(stats['jpeg_bytes'])} JPEG "
+                f"(saved {self._format_bytes(stats['saved_bytes'])}, {stats['saved_percent']}%) "
+                f"across {stats['items']} items"
+            )
+
+    def _format_bytes(self, size):
+        """Format a byte count in human-readable form"""
+        if abs(size) < 1024:
+            return f'{size} B'
+        elif abs(size) < 1024 * 1024:
+            return f'{size / 1024:.1f} KB'
+        return f'{size / (1024 * 1024):.1f} MB'
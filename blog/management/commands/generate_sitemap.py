@@ -86,6 +86,21 @@ class Command(BaseCommand):
             default='daily',
             help='Change frequency for categories (default: daily)',
         )
+        parser.add_argument(
+            '--sharded',
+            action='store_true',
+            help='Write sharded sitemaps with a sitemap_index.xml, rewriting only changed shards',
+        )
+        parser.add_argument(
+            '--output-dir',
+            type=str,
+            help='Output directory for sharded sitemaps (default: static/sitemaps)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rewrite every shard when used with --sharded',
+        )
         parser.add_argument(
             '--dry-run',
             action='store_true',
@@ -102,6 +117,10 @@ class Command(BaseCommand):
             # Get site URL
             site_url = self._get_site_url()
             
+            if options['sharded'] and not options['dry_run']:
+                self._generate_sharded_sitemap(options, site_url)
+                return
+            
             # Generate URL list
             urls = self._generate_url_list(options, site_url)
             
@@ -136,6 +155,22 @@ class Command(BaseCommand):
             )
             logger.error(f"Sitemap generation error: {str(e)}")
 
+    def _generate_sharded_sitemap(self, options, site_url):
+        """Write sharded sitemaps and the sitemap index"""
+        generator = SitemapGenerator(site_url=site_url)
+        result = generator.update_sharded_sitemap(options['output_dir'], force=options['force'])
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully generated sitemap index with {result['urls']} URLs in "
+                f"{result['shards']} shards at {result['index_path']}"
+            )
+        )
+        
+        if options['verbose']:
+            self.stdout.write(f"Written: {', '.join(result['written'])}")
+            self.stdout.write(f"Unchanged: {', '.join(result['skipped']) or 'none'}")
+
     def _get_site_url(self):
         """Get the site URL from settings"""
         site_url = getattr(settings, 'SITE_URL', None)
@@ -7,9 +7,11 @@ from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 from django.db import transaction
 from blog.models import Post
-from blog.linkedin_models import LinkedInConfig, LinkedInPost
+from blog.linkedin_models import LinkedInConfig, LinkedInPost, LinkedInTask, LinkedInPublishQueueEntry
 from blog.services.linkedin_service import LinkedInAPIService, LinkedInAPIError
 from blog.services.linkedin_content_formatter import LinkedInContentFormatter
+from blog.services.linkedin_task_monitor import LinkedInTaskMonitor
+from blog.services.linkedin_publish_scheduler import LinkedInPublishScheduler
 import json
 import time
 from datetime import datetime, timedelta
@@ -42,6 +44,7 @@ class Command(BaseCommand):
         bulk_parser.add_argument('--dry-run', action='store_true', help='Show what would be posted without actually posting')
         bulk_parser.add_argument('--delay', type=int, default=30, help='Delay between posts in seconds')
         bulk_parser.add_argument('--force', action='store_true', help='Force posting even if already posted')
+        bulk_parser.add_argument('--queue', action='store_true', help='Queue posts on the publish scheduler instead of posting inline')
         
         # Credential validation and refresh
         cred_parser = subparsers.add_parser('credentials', help='Validate and refresh LinkedIn credentials')
@@ -54,6 +57,21 @@ class Command(BaseCommand):
         status_parser.add_argument('--failed', action='store_true', help='Show only failed posts')
         status_parser.add_argument('--pending', action='store_true', help='Show only pending posts')
         status_parser.add_argument('--stats', action='store_true', help='Show posting statistics')
+        
+        # Task registry
+        tasks_parser = subparsers.add_parser('tasks', help='Show monitored LinkedIn tasks from the task registry')
+        tasks_parser.add_argument('--status', nargs='+', choices=[choice for choice, _ in LinkedInTask.STATUS_CHOICES], help='Only tasks with these statuses')
+        tasks_parser.add_argument('--active', action='store_true', help='Only pending, running and retrying tasks')
+        tasks_parser.add_argument('--post-id', type=int, help='Only tasks for this blog post ID')
+        tasks_parser.add_argument('--type', dest='task_type', help='Only tasks of this type')
+        tasks_parser.add_argument('--limit', type=int, default=20, help='Number of tasks to show')
+        tasks_parser.add_argument('--task-id', help='Show step history for a single task')
+        tasks_parser.add_argument('--cleanup', type=int, metavar='HOURS', help='Delete finished tasks older than HOURS')
+        
+        # Publish queue operation
+        queue_parser = subparsers.add_parser('queue', help='Show or dispatch the LinkedIn publish queue')
+        queue_parser.add_argument('--dispatch', action='store_true', help='Dispatch due entries within the posting quota')
+        queue_parser.add_argument('--limit', type=int, default=20, help='Number of queued posts to show')
 
     def handle(self, *args, **options):
         operation = options.get('operation')
@@ -73,6 +91,10 @@ class Command(BaseCommand):
                 self.handle_credentials(options)
             elif operation == 'status':
                 self.handle_status(options)
+            elif operation == 'tasks':
+                self.handle_tasks(options)
+            elif operation == 'queue':
+                self.handle_queue(options)
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'Operation failed: {str(e)}'))
             raise CommandError(str(e))
@@ -87,6 +109,8 @@ class Command(BaseCommand):
         self.stdout.write('  bulk      - Bulk post existing published posts')
         self.stdout.write('  credentials - Validate and refresh LinkedIn credentials')
         self.stdout.write('  status    - Show LinkedIn posting status and statistics')
+        self.stdout.write('  tasks     - Show monitored LinkedIn tasks from the task registry')
+        self.stdout.write('  queue     - Show or dispatch the LinkedIn publish queue')
         self.stdout.write('')
         self.stdout.write('Use --help with any operation for detailed options.')
 
@@ -270,9 +294,9 @@ class Command(BaseCommand):
         self.stdout.write('')
         self.stdout.write('4. Quota Status:')
         try:
-            # Check current quota usage from the service
-            daily_used = linkedin_service._daily_quota_used
-            daily_limit = linkedin_service._daily_quota_limit
+            # Check current quota usage from the shared ledger
+            daily_used = linkedin_service.quota_ledger.get_usage('posts')
+            daily_limit = linkedin_service.quota_ledger.limits['posts']
             
             self.stdout.write(f'   Daily quota: {daily_used}/{daily_limit} posts')
             
@@ -339,6 +363,16 @@ class Command(BaseCommand):
         self.stdout.write(f'Found {total_posts} posts to process')
         self.stdout.write('')
         
+        if options.get('queue') and not dry_run:
+            # Let the scheduler pace the posts against the shared quota
+            scheduler = LinkedInPublishScheduler()
+            queued = sum(1 for post in posts if scheduler.enqueue(post.id))
+            summary = scheduler.dispatch()
+            self.stdout.write(self.style.SUCCESS(
+                f'Queued {queued} posts ({total_posts - queued} already queued), dispatched {summary["dispatched"]} now'
+            ))
+            return
+        
         # Initialize LinkedIn service
         linkedin_service = LinkedInAPIService()
         if not linkedin_service.is_configured():
@@ -680,6 +714,95 @@ class Command(BaseCommand):
             self.stdout.write('')
             self.stdout.write(self.style.WARNING(f'Posts ready for retry: {retry_ready}'))
 
+    def handle_tasks(self, options):
+        """Handle task registry listing, inspection and cleanup"""
+        monitor = LinkedInTaskMonitor()
+        
+        if options.get('cleanup') is not None:
+            deleted = monitor.cleanup_completed_tasks(hours=options['cleanup'])
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} finished tasks'))
+            return
+        
+        if options.get('task_id'):
+            self._show_task_detail(monitor, options['task_id'])
+            return
+        
+        self.stdout.write(self.style.SUCCESS('LinkedIn Task Registry'))
+        counts = monitor.get_status_counts(task_type=options.get('task_type'))
+        self.stdout.write('  ' + ', '.join(f'{status}: {count}' for status, count in counts.items()))
+        self.stdout.write('')
+        
+        status = LinkedInTask.ACTIVE_STATUSES if options.get('active') else options.get('status')
+        tasks = monitor.get_tasks(
+            status=status,
+            post_id=options.get('post_id'),
+            task_type=options.get('task_type'),
+            limit=options.get('limit', 20)
+        )
+        
+        if not tasks:
+            self.stdout.write(self.style.WARNING('No tasks found.'))
+            return
+        
+        for task in tasks:
+            duration = f"{task['duration']:.2f}s" if task['duration'] is not None else '-'
+            self.stdout.write(
+                f"{task['task_id']}  {task['task_type']:<20} post={task['post_id']:<6} "
+                f"{task['status']:<10} steps={task['step_count']} errors={task['error_count']} "
+                f"retries={task['retry_count']} duration={duration}  {task['created_at']}"
+            )
+
+    def handle_queue(self, options):
+        """Handle publish queue status and dispatch"""
+        scheduler = LinkedInPublishScheduler()
+        
+        if options.get('dispatch'):
+            summary = scheduler.dispatch()
+            self.stdout.write(self.style.SUCCESS(
+                f"Dispatched {summary['dispatched']} of {summary['due']} due posts (budget {summary['budget']})"
+            ))
+            return
+        
+        status = scheduler.get_queue_status()
+        self.stdout.write(self.style.SUCCESS('LinkedIn Publish Queue'))
+        self.stdout.write(f"   Queued: {status['total']} ({status['due']} due)")
+        self.stdout.write(f"   Dispatch budget: {status['budget']}")
+        if status['next_due_at']:
+            self.stdout.write(f"   Next scheduled: {status['next_due_at']}")
+        if status['by_reason']:
+            self.stdout.write('   ' + ', '.join(f'{reason}: {count}' for reason, count in status['by_reason'].items()))
+        self.stdout.write('')
+        
+        entries = LinkedInPublishQueueEntry.objects.select_related('post')[:options.get('limit', 20)]
+        for entry in entries:
+            self.stdout.write(
+                f"post={entry.post_id:<6} {entry.reason:<12} priority={entry.priority:<3} "
+                f"due={entry.due_at}  coalesced={entry.coalesced_count}  {entry.post.title[:60]}"
+            )
+
+    def _show_task_detail(self, monitor, task_id):
+        """Show a single task with its step history"""
+        task = monitor.get_task_status(task_id)
+        if not task:
+            raise CommandError(f'Task {task_id} not found')
+        
+        self.stdout.write(self.style.SUCCESS(f"Task {task['task_id']} ({task['task_type']})"))
+        self.stdout.write(f"   Post ID: {task['post_id']}")
+        self.stdout.write(f"   Status: {task['status']}")
+        self.stdout.write(f"   Created: {task['created_at']}")
+        if task['completed_at']:
+            self.stdout.write(f"   Completed: {task['completed_at']} ({task['duration']:.2f}s)")
+        if task['retry_count']:
+            self.stdout.write(f"   Retries: {task['retry_count']}/{task['max_retries']} ({task['retry_reason']})")
+        if task['final_error']:
+            self.stdout.write(self.style.ERROR(f"   Error: {task['final_error']}"))
+        
+        for step in task['steps']:
+            duration = f"{step['duration']:.2f}s" if step['duration'] is not None else '-'
+            self.stdout.write(f"   - {step['step_name']}: {step['status']} ({duration})")
+            if step.get('error'):
+                self.stdout.write(self.style.ERROR(f"     {step['error']}"))
+
     def _build_linkedin_post_url(self, linkedin_post_id):
         """Build LinkedIn post URL from post ID"""
         if not linkedin_post_id:
@@ -2,10 +2,9 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.utils.text import slugify
 from django.contrib.auth.models import User
-from blog.models import Post, Tag, Category, NewsletterSubscriber, AuthorProfile
-import json
+from blog.models import Tag, Category, NewsletterSubscriber, AuthorProfile
+from blog.services.bulk_migration_service import BulkMigrationService
 import logging
-from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
@@ -38,8 +37,8 @@ class Command(BaseCommand):
         parser.add_argument(
             '--batch-size',
             type=int,
-            default=100,
-            help='Number of records to process in each batch (default: 100)',
+            default=BulkMigrationService.DEFAULT_BATCH_SIZE,
+            help=f'Number of records to process in each batch (default: {BulkMigrationService.DEFAULT_BATCH_SIZE})',
         )
         parser.add_argument(
             '--create-defaults',
@@ -83,7 +82,7 @@ class Command(BaseCommand):
         self.stdout.write("Migrating tags...")
         
         if options['source_file']:
-            self._import_tags_from_file(options)
+            self._import_from_file(options, 'tags')
         else:
             self._extract_tags_from_posts(options)
 
@@ -104,39 +103,31 @@ class Command(BaseCommand):
             'tutorial', 'guide', 'tips', 'best-practices'
         ]
         
-        created_count = 0
+        # Every term is counted in a single scan of the posts
+        term_counts = BulkMigrationService.count_content_terms(common_tags)
+        specs = {
+            tag_name.title(): {
+                'slug': slugify(tag_name),
+                'color': self._get_tag_color(tag_name),
+                'description': f'Posts related to {tag_name}',
+            }
+            for tag_name, count in term_counts.items()
+            if count > 0
+        }
         
-        for tag_name in common_tags:
-            # Check if posts contain this tag term
-            posts_with_tag = Post.objects.filter(
-                content__icontains=tag_name
-            ).count()
-            
-            if posts_with_tag > 0:
-                if not dry_run:
-                    tag, created = Tag.objects.get_or_create(
-                        name=tag_name.title(),
-                        defaults={
-                            'slug': slugify(tag_name),
-                            'color': self._get_tag_color(tag_name),
-                            'description': f'Posts related to {tag_name}'
-                        }
-                    )
-                    if created:
-                        created_count += 1
-                        self.stdout.write(f"Created tag: {tag.name}")
-                else:
-                    self.stdout.write(f"Would create tag: {tag_name.title()}")
-                    created_count += 1
+        _, result = BulkMigrationService.resolve_names(
+            'tags', specs, dry_run=dry_run, batch_size=options['batch_size']
+        )
         
         if dry_run:
             self.stdout.write(
-                self.style.WARNING(f"DRY RUN: Would create {created_count} tags")
+                self.style.WARNING(f"DRY RUN: Would create {result.created} tags")
             )
         else:
             self.stdout.write(
-                self.style.SUCCESS(f"Created {created_count} tags")
+                self.style.SUCCESS(f"Created {result.created} tags")
             )
+        self._report_conflicts(result)
 
     def _get_tag_color(self, tag_name):
         """Get a color for a tag based on its category"""
@@ -252,6 +243,9 @@ class Command(BaseCommand):
         
         self.stdout.write("Migrating categories...")
         
+        if options['source_file']:
+            self._import_from_file(options, 'categories')
+        
         categories_without_slugs = Category.objects.filter(slug='')
         updated_count = 0
         
@@ -344,137 +338,85 @@ class Command(BaseCommand):
             )
 
     def _export_data(self, options):
-        """Export current blog data to JSON file"""
+        """Stream current blog data to a JSON file"""
         export_file = options['export_file']
         
-        self.stdout.write(f"Exporting data to {export_file}...")
-        
-        data = {
-            'posts': [],
-            'categories': [],
-            'tags': [],
-            'newsletter_subscribers': [],
-            'author_profiles': [],
-            'export_date': datetime.now().isoformat(),
-        }
+        if options['dry_run']:
+            counts = BulkMigrationService.count_export_rows()
+            self.stdout.write(
+                self.style.WARNING(f"DRY RUN: Would export data to {export_file}")
+            )
+            self._print_export_summary(counts)
+            return
         
-        # Export posts
-        for post in Post.objects.all():
-            data['posts'].append({
-                'id': post.id,
-                'title': post.title,
-                'slug': post.slug,
-                'author': post.author.username,
-                'status': post.status,
-                'created_at': post.created_at.isoformat(),
-                'categories': [cat.name for cat in post.categories.all()],
-                'tags': [tag.name for tag in post.tags.all()],
-                'is_featured': post.is_featured,
-                'view_count': post.view_count,
-            })
-        
-        # Export categories
-        for category in Category.objects.all():
-            data['categories'].append({
-                'name': category.name,
-                'slug': category.slug,
-                'parent': category.parent.name if category.parent else None,
-            })
-        
-        # Export tags
-        for tag in Tag.objects.all():
-            data['tags'].append({
-                'name': tag.name,
-                'slug': tag.slug,
-                'color': tag.color,
-                'description': tag.description,
-            })
-        
-        # Export newsletter subscribers (without sensitive tokens)
-        for subscriber in NewsletterSubscriber.objects.all():
-            data['newsletter_subscribers'].append({
-                'email': subscriber.email,
-                'is_confirmed': subscriber.is_confirmed,
-                'subscribed_at': subscriber.subscribed_at.isoformat(),
-                'confirmed_at': subscriber.confirmed_at.isoformat() if subscriber.confirmed_at else None,
-            })
-        
-        # Export author profiles
-        for profile in AuthorProfile.objects.all():
-            data['author_profiles'].append({
-                'username': profile.user.username,
-                'bio': profile.bio,
-                'website': profile.website,
-                'twitter': profile.twitter,
-                'linkedin': profile.linkedin,
-                'github': profile.github,
-                'is_guest_author': profile.is_guest_author,
-                'is_active': profile.is_active,
-            })
+        self.stdout.write(f"Exporting data to {export_file}...")
         
         try:
-            with open(export_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            counts = BulkMigrationService.export(export_file, batch_size=options['batch_size'])
             
             self.stdout.write(
                 self.style.SUCCESS(f"Successfully exported data to {export_file}")
             )
-            
-            # Print summary
-            self.stdout.write(f"Exported:")
-            self.stdout.write(f"  - {len(data['posts'])} posts")
-            self.stdout.write(f"  - {len(data['categories'])} categories")
-            self.stdout.write(f"  - {len(data['tags'])} tags")
-            self.stdout.write(f"  - {len(data['newsletter_subscribers'])} subscribers")
-            self.stdout.write(f"  - {len(data['author_profiles'])} author profiles")
+            self._print_export_summary(counts)
             
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f"Error exporting data: {str(e)}")
             )
 
-    def _import_tags_from_file(self, options):
-        """Import tags from a JSON file"""
+    def _print_export_summary(self, counts):
+        """Print row counts of an export"""
+        self.stdout.write(f"Exported:")
+        self.stdout.write(f"  - {counts['posts']} posts")
+        self.stdout.write(f"  - {counts['categories']} categories")
+        self.stdout.write(f"  - {counts['tags']} tags")
+        self.stdout.write(f"  - {counts['newsletter_subscribers']} subscribers")
+        self.stdout.write(f"  - {counts['author_profiles']} author profiles")
+
+    def _import_from_file(self, options, relation):
+        """Import tags or categories, and the posts linked to them, from a JSON file"""
         source_file = options['source_file']
         dry_run = options['dry_run']
         
         try:
-            with open(source_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            if 'tags' not in data:
-                self.stdout.write(
-                    self.style.ERROR("No 'tags' key found in source file")
-                )
-                return
-            
-            created_count = 0
-            
-            for tag_data in data['tags']:
-                if not dry_run:
-                    tag, created = Tag.objects.get_or_create(
-                        name=tag_data['name'],
-                        defaults={
-                            'slug': tag_data.get('slug', slugify(tag_data['name'])),
-                            'color': tag_data.get('color', '#007acc'),
-                            'description': tag_data.get('description', ''),
-                        }
-                    )
-                    if created:
-                        created_count += 1
-                else:
-                    created_count += 1
-            
-            if dry_run:
-                self.stdout.write(
-                    self.style.WARNING(f"DRY RUN: Would import {created_count} tags")
+            results = BulkMigrationService.import_file(
+                source_file,
+                relations=[relation],
+                dry_run=dry_run,
+                batch_size=options['batch_size'],
+            )
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f"Error importing {relation}: {str(e)}")
+            )
+            return
+        
+        result = results[relation]
+        if dry_run:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"DRY RUN: Would import {result.created} {relation} "
+                    f"and add {result.links_created} post links to {result.posts_linked} posts"
                 )
-            else:
-                self.stdout.write(
-                    self.style.SUCCESS(f"Imported {created_count} tags")
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Imported {result.created} {relation} "
+                    f"and added {result.links_created} post links to {result.posts_linked} posts"
                 )
-                
-        except Exception as e:
+            )
+        if result.links_existing:
+            self.stdout.write(f"  {result.links_existing} post links already existed")
+        if result.missing_posts:
             self.stdout.write(
-                self.style.ERROR(f"Error importing tags: {str(e)}")
-            )
\ No newline at end of file
+                self.style.WARNING(f"  {result.missing_posts} posts in the file were not found")
+            )
+        self._report_conflicts(result)
+
+    def _report_conflicts(self, result):
+        """Report names that could not be created because their slug is taken"""
+        for name in result.conflicts:
+            self.stdout.write(
+                self.style.ERROR(f"  Skipped {name}: its slug is already used")
+            )
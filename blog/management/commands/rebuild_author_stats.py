@@ -0,0 +1,41 @@
+"""
+Management command to rebuild the denormalized author statistics.
+
+Signals keep AuthorStats current for individual saves and deletes. Run this
+after changes that bypass signals, such as QuerySet.update() on posts or raw
+data imports, or to verify the stored rows against a fresh computation.
+
+Usage:
+    python manage.py rebuild_author_stats
+    python manage.py rebuild_author_stats --author <username>
+"""
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.author_services.author_stats_service import AuthorStatsService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild denormalized author statistics (post counts, views, comments, top categories)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--author',
+            type=str,
+            help='Only refresh the statistics of this username'
+        )
+
+    def handle(self, *args, **options):
+        username = options.get('author')
+
+        if username:
+            user_id = User.objects.filter(username=username).values_list('id', flat=True).first()
+            if user_id is None:
+                raise CommandError(f'User "{username}" does not exist')
+            AuthorStatsService.refresh_author(user_id)
+            self.stdout.write(self.style.SUCCESS(f'Refreshed author stats for {username}'))
+            return
+
+        count = AuthorStatsService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt author stats for {count} authors'))
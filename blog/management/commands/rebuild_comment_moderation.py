@@ -0,0 +1,35 @@
+"""
+Management command to rebuild the comment moderation counters and scores.
+
+Signals and the bulk moderation actions keep CommenterReputation current.
+Run this once after migrating, after imports that bypass signals, or to
+verify the stored counters against a fresh count. Blocked IP addresses and
+emails stay blocked.
+
+Usage:
+    python manage.py rebuild_comment_moderation
+    python manage.py rebuild_comment_moderation --rescore
+"""
+
+from django.core.management.base import BaseCommand
+
+from blog.services.comment_moderation_service import CommentModerationService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild commenter reputation counters and optionally rescore pending comments'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rescore',
+            action='store_true',
+            help='Also score the pending comments again against the rebuilt reputations'
+        )
+
+    def handle(self, *args, **options):
+        count = CommentModerationService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} reputation counters'))
+
+        if options['rescore']:
+            scored = CommentModerationService.rescore_pending()
+            self.stdout.write(self.style.SUCCESS(f'Rescored {scored} pending comments'))
@@ -0,0 +1,49 @@
+"""
+Management command to build the precomputed social image manifests.
+
+Signals keep a post's manifest current when the post or its media change,
+and a data migration filled it in for posts that existed before. Run this
+after changes that bypass signals, such as bulk_create() or raw data
+imports, since pages resolve missing manifests on every read until then.
+
+Usage:
+    python manage.py refresh_social_images
+    python manage.py refresh_social_images --all
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.models import Post
+from blog.services.social_image_service import SocialImageService
+
+
+class Command(BaseCommand):
+    help = 'Build the social image manifests of posts that lack a current one'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Rebuild the manifest of every post, e.g. after image files were replaced on disk'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of posts read per query (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        if options['all']:
+            post_ids = list(Post.objects.order_by('pk').values_list('pk', flat=True))
+            count = 0
+            for start in range(0, len(post_ids), batch_size):
+                count += SocialImageService.refresh_posts(post_ids[start:start + batch_size])
+        else:
+            count = SocialImageService.refresh_stale(batch_size=batch_size)
+
+        self.stdout.write(self.style.SUCCESS(f'Refreshed social images for {count} posts'))
@@ -0,0 +1,83 @@
+"""
+Management command to set up periodic tasks for the blog.
+
+This command creates or updates Celery Beat periodic tasks for:
+- Dispatching due entries of the LinkedIn publish queue every minute
+- Flushing buffered view counts every 5 minutes
+- Flushing buffered social share counts every minute
+- Rebuilding the engagement dashboard rollups every 5 minutes
+- Compacting the daily engagement facts nightly, which also folds days
+  past the daily retention into weekly rows
+- Deleting old admin export files daily
+
+Usage:
+    python manage.py setup_blog_tasks
+    python manage.py setup_blog_tasks --disable
+"""
+
+from django.core.management.base import BaseCommand
+from django_celery_beat.models import PeriodicTask, IntervalSchedule, CrontabSchedule
+
+
+class Command(BaseCommand):
+    help = 'Set up periodic tasks for the blog'
+
+    # Task name: (task path, minutes between runs, or (hour, minute) of a daily run)
+    TASKS = {
+        'LinkedIn Publish Queue Dispatch': ('blog.tasks.dispatch_linkedin_publish_queue', 1),
+        'View Counts Flush': ('blog.tasks.flush_view_counts', 5),
+        'Social Share Counts Flush': ('blog.tasks.flush_social_share_counts', 1),
+        'Engagement Rollups Refresh': ('blog.tasks.refresh_engagement_rollups', 5),
+        # Daily at 2:30 AM
+        'Engagement Facts Compaction': ('blog.tasks.compact_engagement_facts', (2, 30)),
+        # Daily at 3:30 AM; exports include subscriber email lists
+        'Export Files Purge': ('blog.tasks.purge_export_files', (3, 30)),
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--disable',
+            action='store_true',
+            help='Disable the blog periodic tasks'
+        )
+
+    def handle(self, *args, **options):
+        if options['disable']:
+            disabled = PeriodicTask.objects.filter(name__in=list(self.TASKS)).update(enabled=False)
+            self.stdout.write(self.style.SUCCESS(f'Disabled {disabled} blog tasks'))
+            return
+
+        for name, (task_path, schedule) in self.TASKS.items():
+            if isinstance(schedule, tuple):
+                hour, minute = schedule
+                crontab, _ = CrontabSchedule.objects.get_or_create(
+                    minute=minute,
+                    hour=hour,
+                    day_of_week='*',
+                    day_of_month='*',
+                    month_of_year='*',
+                )
+                self.save_task(name, task_path, crontab=crontab)
+            else:
+                interval, _ = IntervalSchedule.objects.get_or_create(
+                    every=schedule,
+                    period=IntervalSchedule.MINUTES,
+                )
+                self.save_task(name, task_path, interval=interval)
+
+        self.stdout.write(self.style.SUCCESS('Successfully set up blog tasks'))
+
+    def save_task(self, name, task_path, interval=None, crontab=None):
+        """Create or update a periodic task"""
+        task, created = PeriodicTask.objects.update_or_create(
+            name=name,
+            defaults={
+                'interval': interval,
+                'crontab': crontab,
+                'task': task_path,
+                'enabled': True,
+            }
+        )
+
+        action = 'Created' if created else 'Updated'
+        self.stdout.write(f'{action} task: {name}')
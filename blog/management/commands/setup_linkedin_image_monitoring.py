@@ -5,7 +5,10 @@ This command creates or updates Celery Beat periodic tasks for:
 - Metrics cleanup
 - Health monitoring
 - Daily reporting
-- Automatic retry of failed uploads
+
+Failed image uploads are no longer retried by a periodic scan; the posting
+task queues them on the LinkedIn publish queue with a backoff. Setting up
+all tasks removes the old retry task if it is still scheduled.
 """
 
 from django.core.management.base import BaseCommand, CommandError
@@ -75,7 +78,7 @@ class Command(BaseCommand):
             tasks_to_create.append('health')
         
         if options['enable_all']:
-            tasks_to_create.extend(['daily_report', 'retry_failed'])
+            tasks_to_create.append('daily_report')
         
         if not tasks_to_create and not (options['cleanup_only'] or options['health_only']):
             # Default: create cleanup and health monitoring
@@ -88,8 +91,9 @@ class Command(BaseCommand):
                 self.create_health_monitoring_task(options['dry_run'])
             elif task_type == 'daily_report':
                 self.create_daily_report_task(options['dry_run'])
-            elif task_type == 'retry_failed':
-                self.create_retry_failed_task(options['dry_run'])
+        
+        if options['enable_all']:
+            self.remove_retry_failed_task(options['dry_run'])
         
         if not options['dry_run']:
             self.stdout.write(
@@ -206,39 +210,17 @@ class Command(BaseCommand):
         action = 'Created' if created else 'Updated'
         self.stdout.write(f'{action} task: {task_name}')
 
-    def create_retry_failed_task(self, dry_run=False):
-        """Create or update the retry failed uploads task"""
+    def remove_retry_failed_task(self, dry_run=False):
+        """Remove the retired periodic retry of failed uploads"""
         task_name = 'LinkedIn Image Retry Failed Uploads'
         
-        # Create schedule to run every 4 hours
-        schedule, created = IntervalSchedule.objects.get_or_create(
-            every=4,
-            period=IntervalSchedule.HOURS,
-        )
-        
         if dry_run:
-            self.stdout.write(f'Would create/update task: {task_name}')
-            self.stdout.write(f'  Schedule: Every 4 hours')
-            self.stdout.write(f'  Task: blog.tasks.linkedin_image_monitoring.retry_failed_image_uploads')
+            self.stdout.write(f'Would remove retired task: {task_name}')
             return
         
-        task, created = PeriodicTask.objects.get_or_create(
-            name=task_name,
-            defaults={
-                'interval': schedule,
-                'task': 'blog.tasks.linkedin_image_monitoring.retry_failed_image_uploads',
-                'enabled': True,
-            }
-        )
-        
-        if not created:
-            task.interval = schedule
-            task.task = 'blog.tasks.linkedin_image_monitoring.retry_failed_image_uploads'
-            task.enabled = True
-            task.save()
-        
-        action = 'Created' if created else 'Updated'
-        self.stdout.write(f'{action} task: {task_name}')
+        deleted, _ = PeriodicTask.objects.filter(name=task_name).delete()
+        if deleted:
+            self.stdout.write(f'Removed retired task: {task_name}')
 
     def disable_all_tasks(self):
         """Disable all LinkedIn image monitoring tasks"""
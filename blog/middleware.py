@@ -13,6 +13,7 @@ from django.utils.deprecation import MiddlewareMixin
 from django.conf import settings
 from .security import RateLimitTracker, SecurityHeaders, SecurityAuditLogger
 from .performance import PerformanceMonitor
+from .utils.content_scanner import REQUEST_RULES, content_scanner
 from typing import Dict, Optional
 
 
@@ -143,13 +144,8 @@ class ContentSecurityMiddleware(MiddlewareMixin):
     
     def __init__(self, get_response=None):
         super().__init__(get_response)
-        self.suspicious_patterns = [
-            r'<script[^>]*>.*?</script>',
-            r'javascript:',
-            r'vbscript:',
-            r'data:text/html',
-            r'on\w+\s*=',
-        ]
+        # Malicious content rules checked by the shared content scanner
+        self.suspicious_rules = REQUEST_RULES
         
         # Fields that should be excluded from security scanning (like tags, categories)
         self.excluded_fields = [
@@ -168,11 +164,12 @@ class ContentSecurityMiddleware(MiddlewareMixin):
                 return None
             
             # Check POST data for suspicious patterns
-            if self._contains_suspicious_content(request.POST):
+            matched_rules = self._find_suspicious_content(request.POST)
+            if matched_rules:
                 SecurityAuditLogger.log_suspicious_activity(
                     request,
                     'malicious_content_attempt',
-                    {'data_type': 'POST'}
+                    {'data_type': 'POST', 'rules': matched_rules}
                 )
                 
                 return JsonResponse({
@@ -183,8 +180,10 @@ class ContentSecurityMiddleware(MiddlewareMixin):
     
     def _contains_suspicious_content(self, data) -> bool:
         """Check if data contains suspicious patterns"""
-        import re
-        
+        return bool(self._find_suspicious_content(data))
+    
+    def _find_suspicious_content(self, data) -> list:
+        """Get the suspicious rules matched by the content fields in data"""
         for key, value in data.items():
             # Skip excluded fields (like tags, categories, etc.)
             if key.lower() in self.excluded_fields:
@@ -197,11 +196,13 @@ class ContentSecurityMiddleware(MiddlewareMixin):
             if isinstance(value, str):
                 # Only check content fields, not metadata fields
                 if self._is_content_field(key):
-                    for pattern in self.suspicious_patterns:
-                        if re.search(pattern, value, re.IGNORECASE):
-                            return True
+                    # Stripped, so the comment validator reuses the same scan
+                    result = content_scanner.scan(value.strip())
+                    matched = [rule for rule in result.malicious if rule in self.suspicious_rules]
+                    if matched:
+                        return matched
         
-        return False
+        return []
     
     def _is_content_field(self, field_name: str) -> bool:
         """Determine if a field should be scanned for malicious content"""
@@ -279,29 +280,22 @@ class CommentSpamProtectionMiddleware(MiddlewareMixin):
     
     def __init__(self, get_response=None):
         super().__init__(get_response)
-        self.spam_indicators = [
-            'viagra', 'cialis', 'casino', 'poker', 'lottery',
-            'make money', 'earn money', 'get rich', 'work from home',
-            'click here', 'visit now', 'act now', 'limited time'
-        ]
+        self.spam_threshold = 3  # Distinct spam indicators needed to block
     
     def process_request(self, request):
         """Check comment submissions for spam"""
         if (request.method == 'POST' and 
             '/blog/comment/' in request.path):
             
-            content = request.POST.get('content', '').lower()
+            content = request.POST.get('content', '')
             
             # Check for spam indicators
-            spam_score = 0
-            for indicator in self.spam_indicators:
-                if indicator in content:
-                    spam_score += 1
+            spam_score = len(content_scanner.scan(content.strip()).spam_indicators)
             
             # If high spam score, block the request
-            if spam_score >= 3:
+            if spam_score >= self.spam_threshold:
                 SecurityAuditLogger.log_spam_attempt(
-                    request, 'comment', content[:100]
+                    request, 'comment', content.lower()[:100]
                 )
                 
                 return JsonResponse({
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 20:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_add_linkedin_image_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediaitem',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, help_text='Manifest of modern-format (WebP/AVIF) renditions generated from the original image'),
+        ),
+    ]
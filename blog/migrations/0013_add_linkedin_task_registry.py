@@ -0,0 +1,69 @@
+# Generated by Django 5.2.3 on 2026-10-18 21:10
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_add_media_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LinkedInTask',
+            fields=[
+                ('task_id', models.UUIDField(default=uuid.uuid4, editable=False, help_text='Unique task identifier', primary_key=True, serialize=False)),
+                ('task_type', models.CharField(help_text='Type of task (e.g. image_processing, linkedin_post)', max_length=50)),
+                ('post_id', models.PositiveIntegerField(help_text='ID of the blog post the task works on')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('success', 'Success'), ('failed', 'Failed'), ('retrying', 'Retrying'), ('cancelled', 'Cancelled')], default='pending', help_text='Current task status', max_length=10)),
+                ('context', models.JSONField(blank=True, default=dict, help_text='Context supplied when the task was created')),
+                ('result', models.JSONField(blank=True, default=dict, help_text='Result data recorded on completion')),
+                ('final_error', models.TextField(blank=True, help_text='Error that caused the task to fail')),
+                ('retry_count', models.PositiveIntegerField(default=0)),
+                ('max_retries', models.PositiveIntegerField(default=3)),
+                ('retry_reason', models.TextField(blank=True)),
+                ('cancellation_reason', models.TextField(blank=True)),
+                ('step_count', models.PositiveIntegerField(default=0)),
+                ('successful_steps', models.PositiveIntegerField(default=0)),
+                ('failed_steps', models.PositiveIntegerField(default=0)),
+                ('error_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('retry_at', models.DateTimeField(blank=True, null=True)),
+                ('cancelled_at', models.DateTimeField(blank=True, null=True)),
+                ('duration', models.FloatField(blank=True, help_text='Task duration in seconds', null=True)),
+            ],
+            options={
+                'verbose_name': 'LinkedIn Task',
+                'verbose_name_plural': 'LinkedIn Tasks',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='blog_linked_status_05d828_idx'), models.Index(fields=['post_id', 'created_at'], name='blog_linked_post_id_d7fbdb_idx'), models.Index(fields=['task_type', 'status'], name='blog_linked_task_ty_ee6aa3_idx'), models.Index(fields=['status', 'updated_at'], name='blog_linked_status_5178b4_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LinkedInTaskEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempt', models.PositiveIntegerField(default=0)),
+                ('event_type', models.CharField(choices=[('step_started', 'Step started'), ('step_succeeded', 'Step succeeded'), ('step_failed', 'Step failed'), ('error', 'Error')], max_length=20)),
+                ('step_name', models.CharField(blank=True, max_length=50)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True)),
+                ('error_type', models.CharField(blank=True, max_length=100)),
+                ('duration', models.FloatField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='blog.linkedintask')),
+            ],
+            options={
+                'verbose_name': 'LinkedIn Task Event',
+                'verbose_name_plural': 'LinkedIn Task Events',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['task', 'attempt', 'step_name'], name='blog_linked_task_id_f92222_idx')],
+            },
+        ),
+    ]
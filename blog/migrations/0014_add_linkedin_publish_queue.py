@@ -0,0 +1,49 @@
+# Generated by Django 5.2.3 on 2026-10-18 21:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def enqueue_pending_retries(apps, schema_editor):
+    """Move posts already scheduled for retry onto the publish queue."""
+    LinkedInPost = apps.get_model('blog', 'LinkedInPost')
+    LinkedInPublishQueueEntry = apps.get_model('blog', 'LinkedInPublishQueueEntry')
+
+    retrying = LinkedInPost.objects.filter(status='retrying', next_retry_at__isnull=False)
+    LinkedInPublishQueueEntry.objects.bulk_create(
+        [
+            LinkedInPublishQueueEntry(post_id=post_id, reason='retry', due_at=next_retry_at)
+            for post_id, next_retry_at in retrying.values_list('post_id', 'next_retry_at')
+        ],
+        batch_size=500,
+        ignore_conflicts=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_add_linkedin_task_registry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LinkedInPublishQueueEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reason', models.CharField(choices=[('publish', 'Publish'), ('retry', 'Retry'), ('image_retry', 'Image retry')], default='publish', help_text='Why the post was queued', max_length=20)),
+                ('priority', models.PositiveSmallIntegerField(default=5, help_text='Higher priority entries are dispatched first')),
+                ('due_at', models.DateTimeField(help_text='Earliest time the entry may be dispatched')),
+                ('enqueued_at', models.DateTimeField(auto_now_add=True, help_text='When the post was first queued')),
+                ('coalesced_count', models.PositiveIntegerField(default=0, help_text='Number of later events merged into this entry')),
+                ('post', models.OneToOneField(help_text='The blog post waiting to be published to LinkedIn', on_delete=django.db.models.deletion.CASCADE, related_name='linkedin_queue_entry', to='blog.post')),
+            ],
+            options={
+                'verbose_name': 'LinkedIn Publish Queue Entry',
+                'verbose_name_plural': 'LinkedIn Publish Queue',
+                'ordering': ['-priority', 'enqueued_at'],
+                'indexes': [models.Index(fields=['due_at'], name='blog_linked_due_at_42487d_idx'), models.Index(fields=['-priority', 'enqueued_at'], name='blog_linked_priorit_f88276_idx')],
+            },
+        ),
+        migrations.RunPython(enqueue_pending_retries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_author_stats(apps, schema_editor):
+    """Compute stats for every author with published posts."""
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    AuthorStats = apps.get_model('blog', 'AuthorStats')
+
+    stats = {}
+    most_views = {}
+    published = Post.objects.filter(status='published')
+    for author_id, post_id, created_at, view_count in published.values_list(
+        'author_id', 'id', 'created_at', 'view_count'
+    ).iterator():
+        entry = stats.setdefault(author_id, AuthorStats(user_id=author_id, top_categories=[]))
+        entry.published_post_count += 1
+        entry.total_views += view_count
+        if entry.last_published_at is None or created_at > entry.last_published_at:
+            entry.last_published_at = created_at
+            entry.latest_post_id = post_id
+        if author_id not in most_views or view_count > most_views[author_id]:
+            most_views[author_id] = view_count
+            entry.most_viewed_post_id = post_id
+
+    comment_counts = Comment.objects.filter(is_approved=True, post__status='published').values(
+        'post__author_id'
+    ).annotate(count=Count('id'))
+    for row in comment_counts:
+        stats[row['post__author_id']].approved_comment_count = row['count']
+
+    category_counts = Post.categories.through.objects.filter(post__status='published').values(
+        'post__author_id', 'category_id', 'category__name', 'category__slug'
+    ).annotate(post_count=Count('post_id')).order_by('post__author_id', '-post_count', 'category__name')
+    for row in category_counts:
+        top = stats[row['post__author_id']].top_categories
+        if len(top) < 5:
+            top.append({
+                'id': row['category_id'],
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+                'post_count': row['post_count'],
+            })
+
+    AuthorStats.objects.bulk_create(stats.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('blog', '0014_add_linkedin_publish_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(help_text='The author these statistics belong to', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='author_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('published_post_count', models.PositiveIntegerField(default=0, help_text='Number of published posts')),
+                ('total_views', models.PositiveBigIntegerField(default=0, help_text='Total views across published posts')),
+                ('approved_comment_count', models.PositiveIntegerField(default=0, help_text='Approved comments on published posts')),
+                ('last_published_at', models.DateTimeField(blank=True, help_text='Creation date of the latest published post', null=True)),
+                ('top_categories', models.JSONField(blank=True, default=list, help_text='Most used categories as [{id, name, slug, post_count}]')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('latest_post', models.ForeignKey(blank=True, help_text='Latest published post', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='blog.post')),
+                ('most_viewed_post', models.ForeignKey(blank=True, help_text='Most viewed published post as of the last refresh', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='blog.post')),
+            ],
+            options={
+                'verbose_name_plural': 'Author stats',
+                'indexes': [models.Index(fields=['published_post_count'], name='blog_author_publish_9f571c_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_author_stats, migrations.RunPython.noop),
+    ]
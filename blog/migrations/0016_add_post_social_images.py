@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_add_author_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='social_images',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Manifest of the resolved social sharing images, kept current when the post or its media change'),
+        ),
+    ]
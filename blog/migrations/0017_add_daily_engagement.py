@@ -0,0 +1,38 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_add_post_social_images'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyEngagement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='The day the engagement happened')),
+                ('views', models.PositiveIntegerField(default=0, help_text='Views on this day')),
+                ('comments', models.PositiveIntegerField(default=0, help_text='Approved comments posted on this day')),
+                ('shares', models.PositiveIntegerField(default=0, help_text='Shares on all platforms on this day')),
+                ('facebook_shares', models.PositiveIntegerField(default=0)),
+                ('twitter_shares', models.PositiveIntegerField(default=0)),
+                ('linkedin_shares', models.PositiveIntegerField(default=0)),
+                ('reddit_shares', models.PositiveIntegerField(default=0)),
+                ('pinterest_shares', models.PositiveIntegerField(default=0)),
+                ('whatsapp_shares', models.PositiveIntegerField(default=0)),
+                ('new_subscribers', models.PositiveIntegerField(default=0, help_text='Newsletter sign-ups on this day (site-wide rows)')),
+                ('post', models.ForeignKey(blank=True, help_text='The post these facts belong to, empty for site-wide facts', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_engagement', to='blog.post')),
+            ],
+            options={
+                'verbose_name_plural': 'Daily engagement',
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['day'], name='blog_dailye_day_3d4e4f_idx')],
+                'constraints': [models.UniqueConstraint(fields=('post', 'day'), name='unique_post_engagement_day'), models.UniqueConstraint(condition=models.Q(('post__isnull', True)), fields=('day',), name='unique_site_engagement_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-19 00:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_add_daily_engagement'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['author_email'], name='blog_commen_author__1ba8a5_idx'),
+        ),
+    ]
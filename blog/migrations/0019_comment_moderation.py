@@ -0,0 +1,58 @@
+# Generated by Django 5.2.3 on 2026-10-19 01:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_add_comment_author_email_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommenterReputation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('ip', 'IP address'), ('email', 'Email'), ('site', 'Site')], help_text='What the value identifies', max_length=10)),
+                ('value', models.CharField(blank=True, help_text='IP address or email, empty for the site row', max_length=254)),
+                ('display_name', models.CharField(blank=True, help_text='Latest author name seen for an email', max_length=100)),
+                ('comment_count', models.PositiveIntegerField(default=0, help_text='Comments submitted')),
+                ('approved_count', models.PositiveIntegerField(default=0, help_text='Comments approved')),
+                ('spam_count', models.PositiveIntegerField(default=0, help_text='Comments rejected as spam')),
+                ('is_blocked', models.BooleanField(default=False, help_text='Reject new comments from this IP address or email')),
+                ('last_seen', models.DateTimeField(blank=True, help_text='When the latest comment was submitted', null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='is_spam',
+            field=models.BooleanField(default=False, help_text='Whether this comment was rejected as spam'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='risk_features',
+            field=models.JSONField(blank=True, default=dict, help_text='Signals the risk score was computed from'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='risk_score',
+            field=models.FloatField(default=0, help_text='Spam risk from 0.0 to 1.0, scored when the comment was submitted'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['ip_address'], name='blog_commen_ip_addr_760826_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['is_approved', 'is_spam', '-risk_score', 'created_at'], name='blog_comment_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='commenterreputation',
+            index=models.Index(fields=['kind', '-comment_count'], name='blog_commen_kind_ef7668_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='commenterreputation',
+            constraint=models.UniqueConstraint(fields=('kind', 'value'), name='blog_commenter_reputation_unique'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.3 on 2026-10-19 09:12
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+FACT_FIELDS = (
+    'views', 'comments', 'shares', 'facebook_shares', 'twitter_shares', 'linkedin_shares',
+    'reddit_shares', 'pinterest_shares', 'whatsapp_shares', 'new_subscribers',
+)
+
+
+def fill_scopes(apps, schema_editor):
+    """Copy post IDs into the scope and merge duplicate site-wide rows of a day."""
+    DailyEngagement = apps.get_model('blog', 'DailyEngagement')
+    DailyEngagement.objects.filter(post__isnull=False).update(scope=F('post_id'))
+
+    kept = {}
+    duplicates = []
+    for row in DailyEngagement.objects.filter(post__isnull=True).order_by('day', 'pk').iterator():
+        first = kept.get(row.day)
+        if first is None:
+            kept[row.day] = row
+            continue
+        for field in FACT_FIELDS:
+            setattr(first, field, getattr(first, field) + getattr(row, field))
+        first.merged = True
+        duplicates.append(row.pk)
+
+    DailyEngagement.objects.filter(pk__in=duplicates).delete()
+    DailyEngagement.objects.bulk_update(
+        [row for row in kept.values() if getattr(row, 'merged', False)], FACT_FIELDS, batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0019_comment_moderation'),
+    ]
+
+    operations = [
+        # Never created on MySQL, which skips conditional constraints
+        migrations.RemoveConstraint(
+            model_name='dailyengagement',
+            name='unique_site_engagement_day',
+        ),
+        migrations.AddField(
+            model_name='dailyengagement',
+            name='scope',
+            field=models.PositiveBigIntegerField(default=0, editable=False, help_text='The post ID, or 0 for site-wide facts'),
+        ),
+        migrations.RunPython(fill_scopes, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='dailyengagement',
+            name='unique_post_engagement_day',
+        ),
+        migrations.AddConstraint(
+            model_name='dailyengagement',
+            constraint=models.UniqueConstraint(fields=('scope', 'day'), name='unique_engagement_scope_day'),
+        ),
+    ]
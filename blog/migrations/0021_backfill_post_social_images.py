@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-19 09:40
+
+from django.db import migrations
+from django.db.models import Q
+
+
+def backfill_social_images(apps, schema_editor):
+    """Build the social image manifest of every post that doesn't have one yet."""
+    from blog.services.social_image_service import SocialImageService
+
+    Post = apps.get_model('blog', 'Post')
+    stale = Post.objects.filter(
+        Q(social_images__version__isnull=True) | ~Q(social_images__version=SocialImageService.MANIFEST_VERSION)
+    )
+    for post in stale.only('id', 'social_image', 'featured_image').iterator(chunk_size=500):
+        Post.objects.filter(pk=post.pk).update(social_images=SocialImageService.build_manifest(post))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0020_daily_engagement_scope'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_social_images, migrations.RunPython.noop),
+    ]
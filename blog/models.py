@@ -1,10 +1,12 @@
 from django.db import models
+from django.utils import timezone
 from django.utils.text import slugify
 from django.conf import settings
 from django.urls import reverse
 from django.utils.html import strip_tags
 from django.contrib.auth.models import User
 from django.core.validators import EmailValidator
+from django.core.exceptions import ObjectDoesNotExist
 import readtime
 import secrets
 import hashlib
@@ -95,6 +97,7 @@ class Post(models.Model):
     allow_comments = models.BooleanField(default=True, help_text="Allow readers to comment on this post.")
     social_image = models.ImageField(upload_to='social_images/', blank=True, null=True, help_text="Custom image for social media sharing. If not provided, featured_image will be used.")
     table_of_contents = models.BooleanField(default=True, help_text="Automatically generate table of contents for this post.")
+    social_images = models.JSONField(default=dict, blank=True, editable=False, help_text="Manifest of the resolved social sharing images, kept current when the post or its media change")
     
     # Meta fields for display
     read_time = models.PositiveIntegerField(default=5, help_text="Estimated time to read the article in minutes.")
@@ -139,6 +142,11 @@ class Post(models.Model):
         """Return the absolute URL for this post"""
         return reverse('blog:detail', kwargs={'slug': self.slug})
 
+    def get_social_image(self):
+        """Return the best social sharing image (url, width, height, type, alt), or None"""
+        from .services.social_image_service import SocialImageService
+        return SocialImageService.get_best_image(self)
+
 # Enhanced model to store email addresses for the newsletter with confirmation workflow
 class NewsletterSubscriber(models.Model):
     email = models.EmailField(unique=True, validators=[EmailValidator()], help_text="Subscriber's email address")
@@ -187,6 +195,9 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     ip_address = models.GenericIPAddressField(help_text="IP address of the commenter for moderation purposes")
     user_agent = models.TextField(blank=True, help_text="Browser user agent for spam detection")
+    is_spam = models.BooleanField(default=False, help_text="Whether this comment was rejected as spam")
+    risk_score = models.FloatField(default=0, help_text="Spam risk from 0.0 to 1.0, scored when the comment was submitted")
+    risk_features = models.JSONField(default=dict, blank=True, help_text="Signals the risk score was computed from")
 
     class Meta:
         ordering = ['created_at']
@@ -194,6 +205,10 @@ class Comment(models.Model):
             models.Index(fields=['post', 'is_approved']),
             models.Index(fields=['created_at']),
             models.Index(fields=['is_approved']),
+            models.Index(fields=['author_email']),
+            models.Index(fields=['ip_address']),
+            # Moderation queue: pending comments, riskiest first
+            models.Index(fields=['is_approved', 'is_spam', '-risk_score', 'created_at'], name='blog_comment_queue_idx'),
         ]
 
     def __str__(self):
@@ -208,6 +223,46 @@ class Comment(models.Model):
         return self.parent is not None
 
 
+# Moderation counters per commenter IP address and email, plus one row for the whole site,
+# maintained by signals and the moderation service (see blog/services/comment_moderation_service.py)
+class CommenterReputation(models.Model):
+    KIND_CHOICES = [
+        ('ip', 'IP address'),
+        ('email', 'Email'),
+        ('site', 'Site'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, help_text="What the value identifies")
+    value = models.CharField(max_length=254, blank=True, help_text="IP address or email, empty for the site row")
+    display_name = models.CharField(max_length=100, blank=True, help_text="Latest author name seen for an email")
+    comment_count = models.PositiveIntegerField(default=0, help_text="Comments submitted")
+    approved_count = models.PositiveIntegerField(default=0, help_text="Comments approved")
+    spam_count = models.PositiveIntegerField(default=0, help_text="Comments rejected as spam")
+    is_blocked = models.BooleanField(default=False, help_text="Reject new comments from this IP address or email")
+    last_seen = models.DateTimeField(null=True, blank=True, help_text="When the latest comment was submitted")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'value'], name='blog_commenter_reputation_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', '-comment_count']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.value or 'site'} ({self.comment_count} comments)"
+
+    @property
+    def pending_count(self):
+        """Comments neither approved nor rejected yet"""
+        return self.comment_count - self.approved_count - self.spam_count
+
+    @property
+    def spam_ratio(self):
+        """Share of the comments rejected as spam"""
+        return self.spam_count / self.comment_count if self.comment_count else 0.0
+
+
 # Model for tracking social media shares of blog posts
 class SocialShare(models.Model):
     PLATFORM_CHOICES = [
@@ -237,9 +292,12 @@ class SocialShare(models.Model):
         return f"{self.post.title} shared on {self.get_platform_display()} ({self.share_count} times)"
 
     def increment_share_count(self):
-        """Increment the share count for this platform"""
-        self.share_count += 1
-        self.save(update_fields=['share_count', 'last_shared'])
+        """Atomically increment the share count for this platform"""
+        SocialShare.objects.filter(pk=self.pk).update(
+            share_count=models.F('share_count') + 1,
+            last_shared=timezone.now()
+        )
+        self.refresh_from_db(fields=['share_count', 'last_shared'])
 
 
 # Enhanced author profile model for blog authors with bio and social links
@@ -378,7 +436,10 @@ class AuthorProfile(models.Model):
 
     def get_post_count(self):
         """Get the number of published posts by this author"""
-        return self.user.blog_posts.filter(status='published').count()
+        try:
+            return self.user.author_stats.published_post_count
+        except ObjectDoesNotExist:
+            return self.user.blog_posts.filter(status='published').count()
 
     def get_recent_posts(self, limit=5):
         """Get recent published posts by this author"""
@@ -389,6 +450,91 @@ class AuthorProfile(models.Model):
         return self.guest_author_email if self.guest_author_email else self.user.email
 
 
+# Denormalized per-author statistics, maintained by signals (see blog/signals/author_stats_signals.py)
+class AuthorStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='author_stats',
+        help_text="The author these statistics belong to"
+    )
+    published_post_count = models.PositiveIntegerField(default=0, help_text="Number of published posts")
+    total_views = models.PositiveBigIntegerField(default=0, help_text="Total views across published posts")
+    approved_comment_count = models.PositiveIntegerField(default=0, help_text="Approved comments on published posts")
+    last_published_at = models.DateTimeField(null=True, blank=True, help_text="Creation date of the latest published post")
+    top_categories = models.JSONField(default=list, blank=True, help_text="Most used categories as [{id, name, slug, post_count}]")
+    latest_post = models.ForeignKey(
+        Post, on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+        help_text="Latest published post"
+    )
+    most_viewed_post = models.ForeignKey(
+        Post, on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+        help_text="Most viewed published post as of the last refresh"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Author stats"
+        indexes = [
+            models.Index(fields=['published_post_count']),
+        ]
+
+    def __str__(self):
+        return f"Stats for {self.user.username} ({self.published_post_count} posts)"
+
+
+# Engagement fact table, one row per (post, day), maintained by the engagement
+# warehouse (see blog/services/engagement_warehouse_service.py). Rows without
+# a post hold site-wide facts such as new subscribers. Their scope is 0, so the
+# unique (scope, day) key holds for them too; MySQL can't enforce the
+# conditional constraint a NULL post would need.
+class DailyEngagement(models.Model):
+    SITE_SCOPE = 0
+
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, null=True, blank=True, related_name='daily_engagement',
+        help_text="The post these facts belong to, empty for site-wide facts"
+    )
+    scope = models.PositiveBigIntegerField(
+        default=SITE_SCOPE, editable=False,
+        help_text="The post ID, or 0 for site-wide facts"
+    )
+    day = models.DateField(help_text="The day the engagement happened")
+    views = models.PositiveIntegerField(default=0, help_text="Views on this day")
+    comments = models.PositiveIntegerField(default=0, help_text="Approved comments posted on this day")
+    shares = models.PositiveIntegerField(default=0, help_text="Shares on all platforms on this day")
+    facebook_shares = models.PositiveIntegerField(default=0)
+    twitter_shares = models.PositiveIntegerField(default=0)
+    linkedin_shares = models.PositiveIntegerField(default=0)
+    reddit_shares = models.PositiveIntegerField(default=0)
+    pinterest_shares = models.PositiveIntegerField(default=0)
+    whatsapp_shares = models.PositiveIntegerField(default=0)
+    new_subscribers = models.PositiveIntegerField(default=0, help_text="Newsletter sign-ups on this day (site-wide rows)")
+
+    class Meta:
+        verbose_name_plural = "Daily engagement"
+        ordering = ['-day']
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'day'], name='unique_engagement_scope_day'),
+        ]
+        indexes = [
+            models.Index(fields=['day']),
+        ]
+
+    def __str__(self):
+        return f"Engagement on {self.day} for {self.post_id or 'site'}"
+
+    @classmethod
+    def scope_of(cls, post_id):
+        """Get the scope of a post's facts, or of the site-wide facts for None"""
+        return post_id or cls.SITE_SCOPE
+
+    def save(self, *args, **kwargs):
+        self.scope = self.scope_of(self.post_id)
+        super().save(*args, **kwargs)
+
+
 # Model for storing multimedia content associated with blog posts
 class MediaItem(models.Model):
     MEDIA_TYPES = [
@@ -427,6 +573,7 @@ class MediaItem(models.Model):
     file_size = models.PositiveIntegerField(default=0, help_text="File size in bytes")
     width = models.PositiveIntegerField(default=0, help_text="Image/video width in pixels")
     height = models.PositiveIntegerField(default=0, help_text="Image/video height in pixels")
+    renditions = models.JSONField(default=dict, blank=True, help_text="Manifest of modern-format (WebP/AVIF) renditions generated from the original image")
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -465,8 +612,48 @@ class MediaItem(models.Model):
             images['medium'] = {'url': self.medium_image.url}
         if self.large_image:
             images['large'] = {'url': self.large_image.url}
+        for fmt in self.get_rendition_formats():
+            images[fmt] = [
+                {'url': url, 'width': width, 'height': height, 'bytes': size}
+                for width, height, size, url in self._iter_renditions(fmt)
+            ]
         return images
 
+    def has_current_renditions(self):
+        """Check whether the renditions manifest matches the current original image"""
+        return bool(
+            self.original_image
+            and self.renditions
+            and self.renditions.get('src') == self.original_image.name
+        )
+
+    def get_rendition_formats(self):
+        """Get the modern formats available for this item, best compression first"""
+        if not self.has_current_renditions():
+            return []
+        from .services.multimedia_service import MultimediaService
+        return [fmt for fmt in MultimediaService.RENDITION_FORMAT_ORDER if self.renditions.get(fmt)]
+
+    def _iter_renditions(self, fmt):
+        """Yield (width, height, bytes, url) tuples for one format of the manifest"""
+        from django.core.files.storage import default_storage
+        for width, height, size, path in self.renditions.get(fmt, []):
+            yield width, height, size, default_storage.url(path)
+
+    def get_srcset(self, fmt):
+        """Build a srcset attribute value for a rendition format"""
+        return ', '.join(f'{url} {width}w' for width, _, _, url in self._iter_renditions(fmt))
+
+    def get_fallback_srcset(self):
+        """Build a srcset for the JPEG fallback sizes"""
+        from .services.multimedia_service import MultimediaService
+        candidates = []
+        for size_name in ('thumbnail', 'medium', 'large'):
+            image_field = getattr(self, f'{size_name}_image')
+            if image_field:
+                candidates.append(f'{image_field.url} {MultimediaService.IMAGE_SIZES[size_name][0]}w')
+        return ', '.join(candidates)
+
     def get_video_embed_code(self):
         """Generate HTML embed code for videos"""
         if self.media_type != 'video' or not self.video_embed_url:
@@ -499,4 +686,4 @@ class MediaItem(models.Model):
 
 
 # Import LinkedIn models
-from .linkedin_models import LinkedInConfig, LinkedInPost
\ No newline at end of file
+from .linkedin_models import LinkedInConfig, LinkedInPost, LinkedInTask, LinkedInTaskEvent, LinkedInPublishQueueEntry
\ No newline at end of file
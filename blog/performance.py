@@ -111,6 +111,32 @@ class CacheManager:
             # Fallback: clear entire cache (not ideal but safe)
             cache.clear()
 
+    @classmethod
+    def has_atomic_counters(cls, backend=None) -> bool:
+        """
+        Check whether a cache backend's incr() and add() are atomic.
+
+        Redis and Memcached update the key on the server and LocMemCache under
+        a lock. DatabaseCache and FileBasedCache read the value and write it
+        back, so concurrent increments overwrite each other, and add() can
+        overwrite an expired key for two callers at once.
+
+        Args:
+            backend: Cache backend to check (default cache if omitted)
+
+        Returns:
+            True if concurrent updates are never lost
+        """
+        from django.core.cache.backends.locmem import LocMemCache
+        from django.core.cache.backends.memcached import BaseMemcachedCache
+        from django.core.cache.backends.redis import RedisCache
+
+        backend = cache if backend is None else backend
+        if isinstance(backend, (RedisCache, BaseMemcachedCache, LocMemCache)):
+            return True
+        # django-redis ships its own RedisCache class
+        return type(backend).__module__.startswith('django_redis.')
+
 
 class QueryOptimizer:
     """Database query optimization utilities"""
@@ -118,7 +144,12 @@ class QueryOptimizer:
     @staticmethod
     def optimize_post_queryset(queryset):
         """
-        Optimize post queryset with proper select_related and prefetch_related.
+        Optimize post queryset for listing posts.
+        
+        The body and meta data are deferred, as listings never show them,
+        and only the categories and tags shown beside each post are
+        prefetched. Widgets that only render post cards should use
+        PostCardService instead.
         
         Args:
             queryset: Post queryset to optimize
@@ -126,15 +157,16 @@ class QueryOptimizer:
         Returns:
             Optimized queryset
         """
-        return queryset.select_related(
+        return queryset.defer(
+            'content',
+            'meta_data',
+            'social_images'
+        ).select_related(
             'author',
             'author__author_profile'
         ).prefetch_related(
             'categories',
-            'tags',
-            'comments',
-            'social_shares',
-            'media_items'
+            'tags'
         )
     
     @staticmethod
@@ -144,63 +176,57 @@ class QueryOptimizer:
     
     @staticmethod
     def get_popular_posts_optimized(timeframe: str = 'week', limit: int = 5):
-        """Get popular posts with optimized query"""
+        """Get the cards of popular posts, caching only their IDs"""
         from .models import Post
+        from .services.post_card_service import PostCardService
+        
+        post_ids = CacheManager.get('popular_posts', timeframe, limit=limit)
+        
+        if post_ids is None:
+            # Calculate date filter
+            now = timezone.now()
+            if timeframe == 'week':
+                start_date = now - timedelta(days=7)
+            elif timeframe == 'month':
+                start_date = now - timedelta(days=30)
+            elif timeframe == 'year':
+                start_date = now - timedelta(days=365)
+            else:
+                start_date = None
+            
+            queryset = Post.objects.filter(status='published')
+            if start_date:
+                queryset = queryset.filter(created_at__gte=start_date)
+            
+            post_ids = list(queryset.order_by(
+                '-view_count', '-created_at'
+            ).values_list('id', flat=True)[:limit])
+            
+            # Cache the result
+            CacheManager.set('popular_posts', post_ids, None, timeframe, limit=limit)
         
-        cache_key = f"popular_posts:{timeframe}:{limit}"
-        cached_result = CacheManager.get('popular_posts', timeframe, limit=limit)
-        
-        if cached_result is not None:
-            return cached_result
-        
-        # Calculate date filter
-        now = timezone.now()
-        if timeframe == 'week':
-            start_date = now - timedelta(days=7)
-        elif timeframe == 'month':
-            start_date = now - timedelta(days=30)
-        elif timeframe == 'year':
-            start_date = now - timedelta(days=365)
-        else:
-            start_date = None
-        
-        # Build optimized query
-        queryset = Post.objects.filter(status='published')
-        if start_date:
-            queryset = queryset.filter(created_at__gte=start_date)
-        
-        posts = list(QueryOptimizer.optimize_post_queryset(queryset).order_by(
-            '-view_count', '-created_at'
-        )[:limit])
-        
-        # Cache the result
-        CacheManager.set('popular_posts', posts, args=[timeframe], limit=limit)
-        
-        return posts
+        return PostCardService.cards_for_ids(post_ids)
     
     @staticmethod
     def get_related_posts_optimized(post, limit: int = 3):
-        """Get related posts with optimized query and caching"""
+        """Get the cards of related posts, caching only their IDs"""
         from .models import Post
+        from .services.post_card_service import PostCardService
         from django.db.models import Q, Count
         
-        cached_result = CacheManager.get('related_posts', post.id, limit=limit)
-        if cached_result is not None:
-            return cached_result
+        post_ids = CacheManager.get('related_posts', post.id, limit=limit)
         
-        # Get category and tag IDs
-        category_ids = list(post.categories.values_list('id', flat=True))
-        tag_ids = list(post.tags.values_list('id', flat=True))
-        
-        if not category_ids and not tag_ids:
-            # Fallback to recent posts
-            related_posts = list(QueryOptimizer.optimize_post_queryset(
-                Post.objects.filter(status='published').exclude(id=post.id)
-            ).order_by('-created_at')[:limit])
-        else:
-            # Find posts with matching categories or tags
-            related_posts = list(QueryOptimizer.optimize_post_queryset(
-                Post.objects.filter(
+        if post_ids is None:
+            # Get category and tag IDs
+            category_ids = list(post.categories.values_list('id', flat=True))
+            tag_ids = list(post.tags.values_list('id', flat=True))
+            
+            if not category_ids and not tag_ids:
+                # Fallback to recent posts
+                related = Post.objects.filter(status='published').exclude(id=post.id).order_by('-created_at')
+            else:
+                # Find posts with matching categories or tags
+                related = Post.objects.filter(
                     status='published'
                 ).exclude(
                     id=post.id
@@ -210,12 +236,13 @@ class QueryOptimizer:
                     relevance_score=Count('categories', filter=Q(categories__id__in=category_ids)) +
                                   Count('tags', filter=Q(tags__id__in=tag_ids))
                 ).order_by('-relevance_score', '-created_at')
-            )[:limit])
-        
-        # Cache the result
-        CacheManager.set('related_posts', related_posts, args=[post.id], limit=limit)
+            post_ids = list(related.values_list('id', flat=True)[:limit])
+            
+            # Cache the result
+            CacheManager.set('related_posts', post_ids, None, post.id, limit=limit)
         
-        return related_posts
+        # Unpublished or deleted posts drop out until the cache expires
+        return PostCardService.cards_for_ids(post_ids)
 
 
 class PerformanceMonitor:
@@ -271,47 +298,111 @@ class PerformanceMonitor:
 class ViewCountOptimizer:
     """Optimize view count tracking to reduce database writes"""
     
+    BUFFER_PREFIX = 'view_count_buffer'
+    BUFFER_TIMEOUT = 3600
+    FLUSH_THRESHOLD = 10
+    FLUSH_LOCK_TIMEOUT = 60
+    
     @staticmethod
     def increment_view_count(post_id: int) -> None:
         """
         Increment view count with batching to reduce database load.
         
+        Each view is also counted in its hour for view trends. A post's
+        first buffered view is logged so flush_all_view_counts() can find
+        posts that never reach the flush threshold.
+        
         Args:
             post_id: ID of the post to increment view count for
         """
-        cache_key = f"view_count_buffer:{post_id}"
+        from .services.view_trends_service import ViewTrendsService
         
-        # Increment counter in cache
-        current_count = cache.get(cache_key, 0)
-        cache.set(cache_key, current_count + 1, 300)  # 5 minutes
+        cache_key = f"{ViewCountOptimizer.BUFFER_PREFIX}:{post_id}"
         
-        # Batch update every 10 views or 5 minutes
-        if current_count + 1 >= 10:
+        # Increment counter in cache
+        cache.add(cache_key, 0, ViewCountOptimizer.BUFFER_TIMEOUT)
+        try:
+            current_count = cache.incr(cache_key)
+        except ValueError:
+            cache.set(cache_key, 1, ViewCountOptimizer.BUFFER_TIMEOUT)
+            current_count = 1
+        if current_count == 1:
+            ViewCountOptimizer._log_dirty(post_id)
+        ViewTrendsService.record(post_id)
+        
+        # Batch update every 10 views, or on the periodic flush. Only the view
+        # that reaches the threshold flushes, later ones wait for the next round
+        if current_count == ViewCountOptimizer.FLUSH_THRESHOLD:
             ViewCountOptimizer._flush_view_count(post_id)
     
+    @staticmethod
+    def _log_dirty(post_id: int) -> None:
+        """Append a post with buffered views to the dirty log"""
+        prefix = ViewCountOptimizer.BUFFER_PREFIX
+        cache.add(f"{prefix}:log_seq", 0, None)
+        sequence = cache.incr(f"{prefix}:log_seq")
+        cache.set(f"{prefix}:log:{sequence}", post_id, ViewCountOptimizer.BUFFER_TIMEOUT)
+    
     @staticmethod
     def _flush_view_count(post_id: int) -> None:
-        """Flush buffered view count to database"""
+        """
+        Flush buffered view count to database.
+        
+        Only one flush per post runs at a time; a concurrent call returns
+        immediately and its views stay buffered for the running one.
+        """
         from .models import Post
+        from .author_services.author_stats_service import AuthorStatsService
+        from .services.engagement_warehouse_service import EngagementWarehouseService
         
-        cache_key = f"view_count_buffer:{post_id}"
-        buffered_count = cache.get(cache_key, 0)
+        cache_key = f"{ViewCountOptimizer.BUFFER_PREFIX}:{post_id}"
+        lock_key = f"{ViewCountOptimizer.BUFFER_PREFIX}:flush_lock:{post_id}"
+        if not cache.add(lock_key, 1, ViewCountOptimizer.FLUSH_LOCK_TIMEOUT):
+            return
         
-        if buffered_count > 0:
-            # Update database
-            Post.objects.filter(id=post_id).update(
-                view_count=models.F('view_count') + buffered_count
-            )
+        try:
+            buffered_count = cache.get(cache_key, 0)
             
-            # Clear cache
-            cache.delete(cache_key)
+            if buffered_count > 0:
+                # Update database
+                updated = Post.objects.filter(id=post_id).update(
+                    view_count=models.F('view_count') + buffered_count
+                )
+                if updated:
+                    AuthorStatsService.add_views(post_id, buffered_count)
+                    EngagementWarehouseService.record_views(post_id, buffered_count)
+                
+                # Take the flushed views off the buffer, keeping any added meanwhile
+                try:
+                    if cache.decr(cache_key, buffered_count) > 0:
+                        ViewCountOptimizer._log_dirty(post_id)
+                except ValueError:
+                    pass
+        finally:
+            cache.delete(lock_key)
     
     @staticmethod
-    def flush_all_view_counts() -> None:
-        """Flush all buffered view counts (for periodic cleanup)"""
-        # This would typically be called by a management command or Celery task
-        # Implementation depends on cache backend capabilities
-        pass
+    def flush_all_view_counts() -> int:
+        """
+        Flush all buffered view counts (for periodic cleanup).
+        
+        Returns:
+            Number of posts flushed
+        """
+        prefix = ViewCountOptimizer.BUFFER_PREFIX
+        flushed = cache.get(f"{prefix}:log_flushed", 0)
+        last = cache.get(f"{prefix}:log_seq", 0)
+        if last <= flushed:
+            return 0
+        
+        slot_keys = [f"{prefix}:log:{sequence}" for sequence in range(flushed + 1, last + 1)]
+        post_ids = set(cache.get_many(slot_keys).values())
+        for post_id in post_ids:
+            ViewCountOptimizer._flush_view_count(post_id)
+        
+        cache.set(f"{prefix}:log_flushed", last, None)
+        cache.delete_many(slot_keys)
+        return len(post_ids)
 
 
 class SearchOptimizer:
@@ -13,30 +13,12 @@ from urllib.parse import urlparse
 from django.core.cache import cache
 from django.conf import settings
 
+from .utils.content_scanner import content_scanner
+
 
 class ContentValidator:
     """Validates user-generated content for security and spam"""
     
-    # Spam patterns to detect
-    SPAM_PATTERNS = [
-        r'viagra|cialis|casino|poker|lottery',
-        r'make money|earn \$|get rich|work from home',
-        r'click here|visit now|act now|limited time',
-        r'free money|guaranteed income|no investment',
-        r'weight loss|lose weight|diet pills',
-        r'replica|rolex|designer|handbags',
-        r'mortgage|refinance|credit repair|debt',
-        r'pharmacy|prescription|medication',
-    ]
-    
-    # Suspicious URL patterns
-    SUSPICIOUS_URL_PATTERNS = [
-        r'bit\.ly|tinyurl|t\.co|goo\.gl',  # URL shorteners
-        r'[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}',  # IP addresses
-        r'localhost|127\.0\.0\.1',  # Local addresses
-        r'\.tk|\.ml|\.ga|\.cf',  # Suspicious TLDs
-    ]
-    
     @classmethod
     def validate_comment_content(cls, content: str) -> Tuple[bool, Optional[str]]:
         """
@@ -60,17 +42,16 @@ class ContentValidator:
         if len(content) > 5000:
             return False, "Comment is too long (maximum 5000 characters)"
         
-        # Check for spam patterns
-        spam_score = cls._calculate_spam_score(content)
-        if spam_score > 0.7:
+        # Spam, repetition and malicious code findings all come from one scan
+        result = content_scanner.scan(content)
+        
+        if result.spam_score > 0.7:
             return False, "Comment appears to be spam"
         
-        # Check for excessive repetition
-        if cls._is_too_repetitive(content):
+        if result.is_repetitive:
             return False, "Comment contains too much repetitive content"
         
-        # Check for malicious HTML/JavaScript
-        if cls._contains_malicious_code(content):
+        if result.has_malicious:
             return False, "Comment contains potentially malicious content"
         
         return True, None
@@ -78,23 +59,7 @@ class ContentValidator:
     @classmethod
     def _contains_malicious_code(cls, content: str) -> bool:
         """Check for malicious HTML/JavaScript patterns"""
-        malicious_patterns = [
-            r'<script[^>]*>.*?</script>',
-            r'javascript:',
-            r'vbscript:',
-            r'data:text/html',
-            r'on\w+\s*=',
-            r'<iframe[^>]*>',
-            r'<object[^>]*>',
-            r'<embed[^>]*>',
-        ]
-        
-        content_lower = content.lower()
-        for pattern in malicious_patterns:
-            if re.search(pattern, content_lower, re.IGNORECASE | re.DOTALL):
-                return True
-        
-        return False
+        return content_scanner.scan(content).has_malicious
     
     @classmethod
     def sanitize_html_content(cls, content: str) -> str:
@@ -185,51 +150,20 @@ class ContentValidator:
             return False, "Invalid URL format"
         
         # Check for suspicious patterns
-        for pattern in cls.SUSPICIOUS_URL_PATTERNS:
-            if re.search(pattern, url, re.IGNORECASE):
-                return False, "Suspicious URL detected"
+        if content_scanner.scan(url).has_suspicious_url:
+            return False, "Suspicious URL detected"
         
         return True, None
     
     @classmethod
     def _calculate_spam_score(cls, content: str) -> float:
         """Calculate spam probability score (0.0 to 1.0)"""
-        score = 0.0
-        content_lower = content.lower()
-        
-        # Check for spam patterns
-        for pattern in cls.SPAM_PATTERNS:
-            matches = len(re.findall(pattern, content_lower))
-            score += matches * 0.3
-        
-        # Check for excessive capitalization
-        if len(content) > 20:
-            caps_ratio = sum(1 for c in content if c.isupper()) / len(content)
-            if caps_ratio > 0.5:
-                score += 0.4
-        
-        # Check for excessive punctuation
-        punct_count = len(re.findall(r'[!?]{2,}', content))
-        score += punct_count * 0.2
-        
-        # Check for excessive numbers
-        number_ratio = len(re.findall(r'\d', content)) / len(content) if content else 0
-        if number_ratio > 0.3:
-            score += 0.3
-        
-        return min(score, 1.0)
+        return content_scanner.scan(content).spam_score
     
     @classmethod
     def _is_too_repetitive(cls, content: str) -> bool:
         """Check if content is too repetitive (spam indicator)"""
-        words = content.lower().split()
-        if len(words) < 5:
-            return False
-        
-        unique_words = set(words)
-        repetition_ratio = len(unique_words) / len(words)
-        
-        return repetition_ratio < 0.3  # Less than 30% unique words
+        return content_scanner.scan(content).is_repetitive
 
 
 class SecurityHeaders:
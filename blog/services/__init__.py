@@ -1,3 +1,4 @@
 # Blog services package
 
-from .linkedin_service import LinkedInAPIService, LinkedInAPIError
\ No newline at end of file
+from .linkedin_service import LinkedInAPIService, LinkedInAPIError
+from .social_share_service import SocialShareService
\ No newline at end of file
@@ -0,0 +1,432 @@
+"""
+Bulk Migration Service
+
+This service imports and exports blog data in bulk for the
+``migrate_blog_data`` command.
+
+Tag and category names are resolved with one query per chunk of names and
+the missing ones are created with ``bulk_create(ignore_conflicts=True)``.
+Post tag and category links are written straight to the through tables in
+batches, skipping links that already exist. Exports are streamed to the
+file one page of rows at a time.
+
+Every import can run as a dry run, which reads the same data and reports
+the same counts without writing anything.
+"""
+
+import json
+import logging
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from django.utils.text import slugify
+
+from ..models import AuthorProfile, Category, NewsletterSubscriber, Post, Tag
+from ..utils.jsonl_stream import json_default, open_jsonl
+from .engagement_backup_service import keyset_pages
+
+
+logger = logging.getLogger(__name__)
+
+
+# Names and IDs per IN (...) lookup, well under every backend's parameter limit
+LOOKUP_CHUNK_SIZE = 500
+
+# Post relations written by the importer: (related model, through model, column)
+RELATIONS = {
+    'tags': (Tag, Post.tags.through, 'tag_id'),
+    'categories': (Category, Post.categories.through, 'category_id'),
+}
+
+
+def chunks(items: List, size: int) -> Iterator[List]:
+    """Yield consecutive slices of a list."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+@dataclass
+class ImportResult:
+    """Counts of a bulk tag or category import."""
+
+    relation: str
+    created: int = 0
+    existing: int = 0
+    # Names whose slug is already used by another name
+    conflicts: List[str] = field(default_factory=list)
+    links_created: int = 0
+    links_existing: int = 0
+    posts_linked: int = 0
+    # Post slugs in the file that don't exist here
+    missing_posts: int = 0
+
+
+class BulkMigrationService:
+    """Service for bulk tag/category imports and streamed exports"""
+
+    DEFAULT_BATCH_SIZE = 1000
+
+    @staticmethod
+    def load_names(model, names: Iterable[str]) -> Dict[str, int]:
+        """
+        Get the IDs of existing tags or categories by name.
+
+        Args:
+            model: Tag or Category
+            names: Names to look up
+
+        Returns:
+            dict: Name to ID, for names that exist
+        """
+        ids = {}
+        for chunk in chunks(list(names), LOOKUP_CHUNK_SIZE):
+            ids.update(model.objects.filter(name__in=chunk).values_list('name', 'id'))
+        return ids
+
+    @classmethod
+    def resolve_names(
+        cls,
+        relation: str,
+        specs: Dict[str, Dict],
+        dry_run: bool = False,
+        batch_size: int = None,
+    ) -> Tuple[Dict[str, int], ImportResult]:
+        """
+        Resolve tag or category names to IDs, creating the missing ones.
+
+        Args:
+            relation: 'tags' or 'categories'
+            specs: Name to the fields of a new object ('slug', 'color', ...)
+            dry_run: Count the missing names without creating them
+            batch_size: Rows per INSERT
+
+        Returns:
+            tuple: (name to ID for names that exist or were created, with
+                negative placeholder IDs for missing names on a dry run;
+                ImportResult)
+        """
+        model = RELATIONS[relation][0]
+        ids = cls.load_names(model, specs)
+        result = ImportResult(relation, existing=len(ids))
+        missing = [name for name in specs if name not in ids]
+        if dry_run or not missing:
+            result.created = len(missing)
+            # Placeholder IDs let a dry run count the links of missing names
+            ids.update((name, -position) for position, name in enumerate(missing, 1))
+            return ids, result
+
+        model.objects.bulk_create(
+            [cls._build(model, name, specs[name]) for name in missing],
+            batch_size=batch_size or cls.DEFAULT_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        # Rows skipped as conflicts clash with another name's slug
+        ids.update(cls.load_names(model, missing))
+        result.created = sum(1 for name in missing if name in ids)
+        result.conflicts = [name for name in missing if name not in ids]
+        for name in result.conflicts:
+            logger.warning(f"Could not create {model._meta.verbose_name} '{name}', its slug is already taken")
+
+        if model is Category:
+            cls._link_parents(missing, specs, ids)
+
+        return ids, result
+
+    @staticmethod
+    def _build(model, name, spec):
+        # bulk_create doesn't call save(), which fills in the slug
+        slug = spec.get('slug') or slugify(name)
+        if model is Tag:
+            return Tag(
+                name=name,
+                slug=slug,
+                color=spec.get('color') or '#007acc',
+                description=spec.get('description') or '',
+            )
+        return Category(name=name, slug=slug)
+
+    @classmethod
+    def _link_parents(cls, created, specs, ids):
+        # Parents are set once every category of the import exists
+        parent_names = {specs[name]['parent'] for name in created if specs[name].get('parent')}
+        if not parent_names:
+            return
+        parent_ids = {**cls.load_names(Category, parent_names - ids.keys()), **ids}
+        children = [
+            Category(pk=ids[name], parent_id=parent_ids[specs[name]['parent']])
+            for name in created
+            if name in ids and specs[name].get('parent') in parent_ids
+        ]
+        Category.objects.bulk_update(children, ['parent'], batch_size=cls.DEFAULT_BATCH_SIZE)
+
+    @classmethod
+    def link_posts(
+        cls,
+        relation: str,
+        post_names: Dict[int, Iterable[str]],
+        name_ids: Dict[str, int],
+        result: ImportResult,
+        dry_run: bool = False,
+        batch_size: int = None,
+    ) -> Set[int]:
+        """
+        Add tag or category links to posts, writing the through rows in bulk.
+
+        Links that already exist are kept, so imports can be repeated.
+
+        Args:
+            relation: 'tags' or 'categories'
+            post_names: Post ID to the names it should be linked to
+            name_ids: Name to ID, from resolve_names
+            result: ImportResult to add the link counts to
+            dry_run: Count the new links without writing them
+            batch_size: Rows per INSERT
+
+        Returns:
+            set: IDs of posts that gained links
+        """
+        _, through, column = RELATIONS[relation]
+        batch_size = batch_size or cls.DEFAULT_BATCH_SIZE
+        linked_posts = set()
+
+        for post_ids in chunks(list(post_names), LOOKUP_CHUNK_SIZE):
+            wanted = {
+                (post_id, name_ids[name])
+                for post_id in post_ids
+                for name in post_names[post_id]
+                if name in name_ids
+            }
+            existing = set(through.objects.filter(post_id__in=post_ids).values_list('post_id', column))
+            new_links = sorted(wanted - existing)
+            result.links_existing += len(wanted) - len(new_links)
+            result.links_created += len(new_links)
+            linked_posts.update(post_id for post_id, _ in new_links)
+            if new_links and not dry_run:
+                with transaction.atomic():
+                    through.objects.bulk_create(
+                        [through(post_id=post_id, **{column: related_id}) for post_id, related_id in new_links],
+                        batch_size=batch_size,
+                        ignore_conflicts=True,
+                    )
+
+        result.posts_linked = len(linked_posts)
+        return linked_posts
+
+    @classmethod
+    def import_file(
+        cls,
+        source_file: str,
+        relations: Iterable[str] = ('tags', 'categories'),
+        dry_run: bool = False,
+        batch_size: int = None,
+    ) -> Dict[str, ImportResult]:
+        """
+        Import tags, categories and post links from an export file.
+
+        Reads the 'tags' and 'categories' lists and the 'tags' and
+        'categories' names of each post in 'posts'. Names used by posts but
+        missing from the lists are created with default fields.
+
+        Args:
+            source_file: JSON export, optionally '.gz'/'.zst' compressed
+            relations: 'tags' and/or 'categories'
+            dry_run: Report counts without writing
+            batch_size: Rows per INSERT
+
+        Returns:
+            dict: ImportResult per relation
+
+        Raises:
+            ValueError: If the file has nothing to import
+        """
+        with open_jsonl(source_file, 'r') as handle:
+            data = json.load(handle)
+
+        relations = [relation for relation in relations if relation in data or 'posts' in data]
+        if not relations:
+            raise ValueError("No 'tags', 'categories' or 'posts' key found in source file")
+
+        post_ids = cls._load_post_ids(post.get('slug') for post in data.get('posts', []))
+        results = {}
+        touched_posts = set()
+        for relation in relations:
+            specs = {item['name']: item for item in data.get(relation, []) if item.get('name')}
+            post_names = defaultdict(list)
+            missing_posts = 0
+            for post in data.get('posts', []):
+                post_id = post_ids.get(post.get('slug'))
+                if post_id is None:
+                    missing_posts += 1
+                    continue
+                for name in post.get(relation) or []:
+                    specs.setdefault(name, {})
+                    post_names[post_id].append(name)
+
+            name_ids, result = cls.resolve_names(relation, specs, dry_run, batch_size)
+            result.missing_posts = missing_posts
+            touched_posts |= cls.link_posts(relation, post_names, name_ids, result, dry_run, batch_size)
+            results[relation] = result
+
+        if touched_posts and not dry_run:
+            cls._refresh_derived_data(touched_posts, 'categories' in results)
+
+        return results
+
+    @staticmethod
+    def _load_post_ids(slugs: Iterable[Optional[str]]) -> Dict[str, int]:
+        slugs = list({slug for slug in slugs if slug})
+        ids = {}
+        for chunk in chunks(slugs, LOOKUP_CHUNK_SIZE):
+            ids.update(Post.objects.filter(slug__in=chunk).values_list('slug', 'id'))
+        return ids
+
+    @staticmethod
+    def _refresh_derived_data(post_ids, categories_changed):
+        # Through rows written in bulk send no m2m_changed signals
+        try:
+            from .schema_bundle_service import SchemaBundleService
+            SchemaBundleService.invalidate_posts(post_ids)
+            if categories_changed:
+                from ..author_services.author_stats_service import AuthorStatsService
+                author_ids = set()
+                for chunk in chunks(list(post_ids), LOOKUP_CHUNK_SIZE):
+                    author_ids.update(Post.objects.filter(pk__in=chunk).values_list('author_id', flat=True))
+                AuthorStatsService.refresh_authors(author_ids)
+        except Exception as e:
+            logger.error(f"Error refreshing data derived from post links: {str(e)}")
+
+    @staticmethod
+    def count_content_terms(terms: Iterable[str]) -> Dict[str, int]:
+        """
+        Count the posts whose content mentions each term, in one query.
+
+        Args:
+            terms: Case-insensitive terms
+
+        Returns:
+            dict: Term to number of posts
+        """
+        terms = list(terms)
+        counts = Post.objects.aggregate(**{
+            f"term_{i}": Count('pk', filter=Q(content__icontains=term)) for i, term in enumerate(terms)
+        })
+        return {term: counts[f"term_{i}"] for i, term in enumerate(terms)}
+
+    # Export
+
+    EXPORT_SECTIONS = ('posts', 'categories', 'tags', 'newsletter_subscribers', 'author_profiles')
+
+    @classmethod
+    def count_export_rows(cls) -> Dict[str, int]:
+        """Count the rows an export would hold."""
+        return {name: cls._export_queryset(name).count() for name in cls.EXPORT_SECTIONS}
+
+    @staticmethod
+    def _export_queryset(name):
+        if name == 'posts':
+            return Post.objects.values(
+                'id', 'title', 'slug', 'status', 'created_at', 'is_featured', 'view_count',
+                author_username=F('author__username'),
+            )
+        if name == 'categories':
+            return Category.objects.values('id', 'name', 'slug', parent_name=F('parent__name'))
+        if name == 'tags':
+            return Tag.objects.values('id', 'name', 'slug', 'color', 'description')
+        if name == 'newsletter_subscribers':
+            # Tokens are left out
+            return NewsletterSubscriber.objects.values('id', 'email', 'is_confirmed', 'subscribed_at', 'confirmed_at')
+        return AuthorProfile.objects.values(
+            'id', 'bio', 'website', 'twitter', 'linkedin', 'github', 'is_guest_author', 'is_active',
+            username=F('user__username'),
+        )
+
+    @classmethod
+    def iter_export_rows(cls, name: str, batch_size: int = None) -> Iterator[Dict]:
+        """
+        Yield the rows of one export section, one page per query.
+
+        Args:
+            name: Section name from EXPORT_SECTIONS
+            batch_size: Rows per query
+
+        Yields:
+            Row dicts in the export format
+        """
+        for page in keyset_pages(cls._export_queryset(name), batch_size or cls.DEFAULT_BATCH_SIZE):
+            if name == 'posts':
+                yield from cls._serialize_posts(page)
+                continue
+            for row in page:
+                row = {key: value for key, value in row.items() if key != 'id'}
+                if name == 'categories':
+                    row['parent'] = row.pop('parent_name')
+                yield row
+
+    @staticmethod
+    def _serialize_posts(page):
+        post_ids = [row['id'] for row in page]
+        names = {'categories': defaultdict(list), 'tags': defaultdict(list)}
+        for relation, (_, through, column) in RELATIONS.items():
+            related_name = column[:-len('_id')]
+            for post_id, name in (
+                through.objects.filter(post_id__in=post_ids).values_list('post_id', f"{related_name}__name")
+            ):
+                names[relation][post_id].append(name)
+        for row in page:
+            yield {
+                'id': row['id'],
+                'title': row['title'],
+                'slug': row['slug'],
+                'author': row['author_username'],
+                'status': row['status'],
+                'created_at': row['created_at'],
+                'categories': names['categories'].get(row['id'], []),
+                'tags': names['tags'].get(row['id'], []),
+                'is_featured': row['is_featured'],
+                'view_count': row['view_count'],
+            }
+
+    @classmethod
+    def export(cls, export_file: str, batch_size: int = None) -> Dict[str, int]:
+        """
+        Stream an export to a JSON file.
+
+        The file is one JSON document with a list per section, written a
+        row at a time, one row per line. It's written under a temporary
+        name and moved into place once complete.
+
+        Args:
+            export_file: Output path; '.gz' or '.zst' compresses it
+            batch_size: Rows per query
+
+        Returns:
+            dict: Row counts per section
+        """
+        directory, filename = os.path.split(os.path.abspath(export_file))
+        partial_path = os.path.join(directory, f".{filename}")
+        counts = {}
+
+        try:
+            with open_jsonl(partial_path, 'w') as handle:
+                handle.write('{\n')
+                for name in cls.EXPORT_SECTIONS:
+                    handle.write(f'  "{name}": [')
+                    count = 0
+                    for row in cls.iter_export_rows(name, batch_size):
+                        handle.write(',\n    ' if count else '\n    ')
+                        handle.write(json.dumps(row, ensure_ascii=False, default=json_default))
+                        count += 1
+                    handle.write('\n  ],\n' if count else '],\n')
+                    counts[name] = count
+                handle.write(f'  "export_date": {json.dumps(timezone.now().isoformat())}\n}}\n')
+            os.replace(partial_path, export_file)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+        return counts
@@ -0,0 +1,190 @@
+"""
+Comment Tree Service for Blog Posts
+
+This service loads the threaded comments shown on a post page. All approved
+comments for a post are fetched with one ordered query and linked into a
+tree in memory, instead of one ``get_replies()`` query per comment. Top-level
+threads are paginated, and the rendered thread HTML for each page is cached
+per post until a comment on that post is saved, approved or deleted.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from django.core.cache import caches
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+
+from ..models import Comment
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CommentNode:
+    """An approved comment and its approved replies."""
+
+    comment: Comment
+    depth: int = 0
+    replies: List['CommentNode'] = field(default_factory=list)
+
+
+class CommentTreeService:
+    """Service for loading, paginating and rendering comment threads"""
+
+    CACHE_ALIAS = 'default'
+    CACHE_PREFIX = 'blog:comment_tree'
+    CACHE_TIMEOUT = 1800
+    THREADS_PER_PAGE = 20
+    TEMPLATE = 'blog/partials/comment_thread.html'
+
+    # Only the fields the thread template renders
+    FIELDS = ('id', 'parent_id', 'author_name', 'author_website', 'content', 'created_at')
+
+    @classmethod
+    def _cache(cls):
+        return caches[cls.CACHE_ALIAS]
+
+    @classmethod
+    def build_tree(cls, comments: Iterable[Comment]) -> List[CommentNode]:
+        """
+        Link comments into threads in O(n).
+
+        Replies whose parent isn't among the given comments (for example an
+        unapproved parent) are dropped along with their own replies, matching
+        what ``Comment.get_replies()`` would show.
+
+        Args:
+            comments: Comments ordered for display
+
+        Returns:
+            List[CommentNode]: Top-level threads in display order
+        """
+        nodes: Dict[int, CommentNode] = {}
+        for comment in comments:
+            nodes[comment.id] = CommentNode(comment)
+
+        roots = []
+        for node in nodes.values():
+            parent_id = node.comment.parent_id
+            if parent_id is None:
+                roots.append(node)
+            elif parent_id in nodes:
+                nodes[parent_id].replies.append(node)
+
+        # Depth is only known once a node is reachable from a root
+        stack = [(node, 0) for node in roots]
+        while stack:
+            node, depth = stack.pop()
+            node.depth = depth
+            stack.extend((reply, depth + 1) for reply in node.replies)
+
+        return roots
+
+    @classmethod
+    def get_comment_tree(cls, post) -> List[CommentNode]:
+        """
+        Load all approved comments for a post as threads with one query.
+
+        Args:
+            post: Post instance or post ID
+
+        Returns:
+            List[CommentNode]: Top-level threads, oldest first
+        """
+        post_id = getattr(post, 'pk', post)
+        comments = (
+            Comment.objects.filter(post_id=post_id, is_approved=True)
+            .only(*cls.FIELDS)
+            .order_by('created_at', 'id')
+        )
+        return cls.build_tree(comments)
+
+    @classmethod
+    def _version(cls, post_id: int) -> int:
+        """Get the cache version for a post's threads, creating it when missing."""
+        cache = cls._cache()
+        key = f"{cls.CACHE_PREFIX}:{post_id}:version"
+        version = cache.get(key)
+        if version is None:
+            # Seeded from the clock, so an evicted version never revives old pages
+            cache.add(key, time.time_ns() // 1000, timeout=None)
+            version = cache.get(key)
+        return version
+
+    @classmethod
+    def get_thread_page(cls, post, page: Optional[int] = 1, per_page: Optional[int] = None) -> Dict:
+        """
+        Get one page of top-level threads with their rendered HTML.
+
+        Args:
+            post: Post instance or post ID
+            page: Page number; out-of-range values show the nearest page
+            per_page: Top-level threads per page
+
+        Returns:
+            Dict: Rendered ``html`` plus ``thread_count``, ``comment_count``,
+            ``page``, ``num_pages``, ``has_previous`` and ``has_next``
+        """
+        post_id = getattr(post, 'pk', post)
+        per_page = per_page or cls.THREADS_PER_PAGE
+        cache = cls._cache()
+
+        cache_key = f"{cls.CACHE_PREFIX}:{post_id}:v{cls._version(post_id)}:{per_page}:{page}"
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        threads = cls.get_comment_tree(post_id)
+        paginator = Paginator(threads, per_page)
+        page_obj = paginator.get_page(page)
+
+        comment_count = 0
+        stack = list(threads)
+        while stack:
+            node = stack.pop()
+            comment_count += 1
+            stack.extend(node.replies)
+
+        data = {
+            'html': render_to_string(cls.TEMPLATE, {'threads': page_obj.object_list}),
+            'thread_count': len(threads),
+            'comment_count': comment_count,
+            'page': page_obj.number,
+            'num_pages': paginator.num_pages,
+            'has_previous': page_obj.has_previous(),
+            'has_next': page_obj.has_next(),
+        }
+        # Out-of-range page numbers aren't cached, so they can't flood the cache
+        if page_obj.number == page:
+            cache.set(cache_key, data, cls.CACHE_TIMEOUT)
+        return data
+
+    @classmethod
+    def invalidate_post(cls, post_id: int):
+        """
+        Drop the cached threads of a post.
+
+        Pages are cached under a per-post version, so bumping the version
+        retires every cached page at once.
+
+        Args:
+            post_id: ID of the post whose comments changed
+        """
+        cache = cls._cache()
+        key = f"{cls.CACHE_PREFIX}:{post_id}:version"
+        try:
+            cache.incr(key)
+        except ValueError:
+            # No page has been cached under any version yet
+            pass
+        logger.debug(f"Invalidated comment threads for post {post_id}")
+
+    @classmethod
+    def invalidate_posts(cls, post_ids: Iterable[int]):
+        """Drop the cached threads of several posts."""
+        for post_id in set(post_ids):
+            cls.invalidate_post(post_id)
@@ -5,18 +5,25 @@ This service provides functionality for content discovery features including
 featured posts, related posts, popular posts, and view tracking.
 """
 
+from django.core.cache import cache
 from django.db.models import F, Q, Count
 from django.utils import timezone
 from datetime import timedelta
 from typing import List, Optional
 from ..models import Post, Tag
+from .engagement_warehouse_service import EngagementWarehouseService
+from .post_card_service import PostCard, PostCardService
+from .view_trends_service import ViewTrendsService
 
 
 class ContentDiscoveryService:
     """Service class for content discovery and recommendation features"""
     
+    TIMEFRAME_DAYS = {'week': 7, 'month': 30, 'year': 365}
+    POPULAR_CACHE_TIMEOUT = 300
+    
     @classmethod
-    def get_featured_posts(cls, limit: int = 3) -> List[Post]:
+    def get_featured_posts(cls, limit: int = 3) -> List[PostCard]:
         """
         Get featured posts for homepage display.
         
@@ -24,15 +31,15 @@ class ContentDiscoveryService:
             limit: Maximum number of featured posts to return
             
         Returns:
-            List of featured Post objects
+            List of featured PostCard objects
         """
-        return Post.objects.filter(
+        return PostCardService.cards(Post.objects.filter(
             status='published',
             is_featured=True
-        ).select_related('author').prefetch_related('categories', 'tags').order_by('-created_at')[:limit]
+        ).order_by('-created_at')[:limit])
     
     @classmethod
-    def get_related_posts(cls, post: Post, limit: int = 3) -> List[Post]:
+    def get_related_posts(cls, post: Post, limit: int = 3) -> List[PostCard]:
         """
         Get related posts based on tags, categories, and content similarity.
         
@@ -41,14 +48,14 @@ class ContentDiscoveryService:
             limit: Maximum number of related posts to return
             
         Returns:
-            List of related Post objects
+            List of related PostCard objects
         """
         # Get posts with similar tags and categories
         related_posts = Post.objects.filter(
             status='published'
         ).exclude(
             id=post.id
-        ).select_related('author').prefetch_related('categories', 'tags')
+        )
         
         # Filter by same categories or tags
         category_ids = list(post.categories.values_list('id', flat=True))
@@ -65,37 +72,39 @@ class ContentDiscoveryService:
                           Count('tags', filter=Q(tags__id__in=tag_ids))
         ).order_by('-relevance_score', '-created_at')
         
-        return list(related_posts[:limit])
+        return PostCardService.cards_for_ids(related_posts.values_list('id', flat=True)[:limit])
     
     @classmethod
-    def get_popular_posts(cls, timeframe: str = 'week', limit: int = 5) -> List[Post]:
+    def get_popular_posts(cls, timeframe: str = 'week', limit: int = 5) -> List[PostCard]:
         """
-        Get popular posts based on view count within a timeframe.
+        Get popular posts based on views within a timeframe.
         
         Args:
             timeframe: Time period ('week', 'month', 'year', 'all')
             limit: Maximum number of popular posts to return
             
         Returns:
-            List of popular Post objects
+            List of popular PostCard objects; for a timeframe other than 'all'
+            each has ``recent_views`` set to its views in that period
         """
-        posts = Post.objects.filter(status='published').select_related('author')
+        if timeframe == 'all':
+            posts = Post.objects.filter(status='published')
+            return PostCardService.cards(posts.order_by('-view_count', '-created_at')[:limit])
         
-        # Filter by timeframe
-        if timeframe != 'all':
-            now = timezone.now()
-            if timeframe == 'week':
-                start_date = now - timedelta(days=7)
-            elif timeframe == 'month':
-                start_date = now - timedelta(days=30)
-            elif timeframe == 'year':
-                start_date = now - timedelta(days=365)
-            else:
-                start_date = now - timedelta(days=7)  # Default to week
-            
-            posts = posts.filter(created_at__gte=start_date)
+        # Ranking a period reads every post's daily views, so the ranking
+        # is cached briefly; the cards come from their own cache
+        cache_key = f"popular_posts:{timeframe}:{limit}"
+        ranked = cache.get(cache_key)
+        if ranked is None:
+            days = cls.TIMEFRAME_DAYS.get(timeframe, cls.TIMEFRAME_DAYS['week'])
+            ranked = ViewTrendsService.most_viewed_ids(days=days, limit=limit)
+            cache.set(cache_key, ranked, cls.POPULAR_CACHE_TIMEOUT)
         
-        return list(posts.order_by('-view_count', '-created_at')[:limit])
+        views = dict(ranked)
+        posts = PostCardService.cards_for_ids(post_id for post_id, _ in ranked)
+        for post in posts:
+            post.recent_views = views[post.id]
+        return posts
     
     @classmethod
     def get_trending_tags(cls, limit: int = 10) -> List[Tag]:
@@ -126,4 +135,6 @@ class ContentDiscoveryService:
         Args:
             post: Post object to update view count for
         """
-        Post.objects.filter(id=post.id).update(view_count=F('view_count') + 1)
\ No newline at end of file
+        if Post.objects.filter(id=post.id).update(view_count=F('view_count') + 1):
+            EngagementWarehouseService.record_views(post.id, 1)
+            ViewTrendsService.record(post.id)
\ No newline at end of file
@@ -0,0 +1,944 @@
+"""
+Engagement Backup Service
+
+This service streams blog engagement data (categories, tags, author profiles,
+subscribers, posts, comments, social shares and media items) to and from
+JSON Lines backups, so neither side ever holds a whole table in memory.
+
+A backup file holds one section per model, in restore dependency order:
+
+    {"@metadata": {"version": "2.0", "created_at": ..., ...}}
+    {"@section": "comments"}
+    {"id": 1, "post_slug": "hello-world", ...}
+    ...
+    {"@end": "comments", "count": 1000000}
+
+Rows are read in primary key order, one bounded keyset page per query, and
+written as they're read. Restores read the file line by line and apply each
+batch of rows with ``bulk_create``/``bulk_update`` in its own transaction.
+A failed batch is rolled back and reported without stopping the restore.
+In parallel mode each model is restored by its own worker, with models
+that others depend on restored first.
+
+Backups written before version 2.0 were single JSON documents. They're
+still restored, loaded whole, for the sections they could restore before.
+"""
+
+import json
+import logging
+import os
+from collections import defaultdict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.text import slugify
+
+from ..models import (
+    AuthorProfile, Category, Comment, MediaItem, NewsletterSubscriber, Post, SocialShare, Tag
+)
+from ..utils.jsonl_stream import encode_line, iter_lines, open_jsonl
+
+
+logger = logging.getLogger(__name__)
+
+
+BACKUP_VERSION = '2.0'
+
+METADATA_KEY = '@metadata'
+SECTION_KEY = '@section'
+END_KEY = '@end'
+
+# Control lines start with one of these, so rows of skipped sections are
+# recognised without decoding them
+CONTROL_PREFIX = '{"@'
+
+
+@dataclass
+class SectionResult:
+    """Row counts of one restored section."""
+
+    section: str
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    failed: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return self.created + self.updated + self.skipped + self.failed
+
+
+def keyset_pages(queryset, chunk_size: int) -> Iterator[List[Dict]]:
+    """
+    Yield pages of a ``values()`` queryset in primary key order.
+
+    Each page is a separate query bounded by the last primary key seen, so
+    memory stays flat on every backend; ``iterator()`` on MySQL still
+    buffers the whole result set in the client.
+
+    Args:
+        queryset: values() queryset including 'id'
+        chunk_size: Rows per page
+
+    Yields:
+        Lists of row dicts
+    """
+    queryset = queryset.order_by('pk')
+    last_pk = None
+    while True:
+        page_query = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        page = list(page_query[:chunk_size])
+        if not page:
+            return
+        yield page
+        last_pk = page[-1]['id']
+
+
+def parse_timestamp(value):
+    """Parse an ISO timestamp from a backup row, making it aware if needed."""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+@contextmanager
+def stored_timestamps(model, field_names):
+    """
+    Let bulk_create keep the auto_now/auto_now_add values set on objects.
+
+    Restores are the only writers of a model while they run; in parallel
+    mode each worker only switches the fields of its own model.
+
+    Args:
+        model: Model class
+        field_names: auto_now/auto_now_add field names
+    """
+    fields = [model._meta.get_field(name) for name in field_names]
+    flags = [(f, f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, auto_now, auto_now_add in flags:
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+class BackupSection:
+    """
+    Export and restore rules for one model.
+
+    Subclasses name the fields read for the backup and how rows are matched
+    to existing objects, built and updated on restore.
+    """
+
+    name = None
+    data_type = None
+    model = None
+    # Field filtered by --date-range
+    date_field = None
+    # values() arguments for the backup rows
+    fields = ()
+    expressions = {}
+    # Row key matching a unique model field
+    key_field = None
+    # Fields overwritten on existing objects with --force
+    update_fields = ()
+    # auto_now/auto_now_add fields, kept from the backup on restore
+    timestamp_fields = ()
+
+    def __init__(self):
+        # Posts whose cached pages depend on restored rows
+        self.touched_post_ids = set()
+
+    # Backup
+
+    def export_queryset(self, date_range=None, include_content=False):
+        queryset = self.model.objects.all()
+        if date_range and self.date_field:
+            queryset = queryset.filter(**{f"{self.date_field}__range": date_range})
+        return queryset
+
+    def count(self, date_range=None) -> int:
+        return self.export_queryset(date_range).count()
+
+    def export_rows(self, date_range=None, include_content=False, chunk_size=2000) -> Iterator[Dict]:
+        """
+        Yield backup rows, reading one page of rows per query.
+
+        Args:
+            date_range: Optional (start, end) filter on date_field
+            include_content: Include full post content
+            chunk_size: Rows read per query
+
+        Yields:
+            Row dicts
+        """
+        queryset = self.export_queryset(date_range, include_content).values(
+            'id', *self.export_fields(include_content), **self.expressions
+        )
+        for page in keyset_pages(queryset, chunk_size):
+            yield from self.serialize_page(page, include_content)
+
+    def export_fields(self, include_content):
+        return self.fields
+
+    def serialize_page(self, page, include_content):
+        return page
+
+    # Restore
+
+    def row_key(self, row):
+        return row.get(self.key_field)
+
+    def existing(self, keys) -> Dict:
+        """Get existing objects by row key."""
+        return self.model.objects.in_bulk(keys, field_name=self.key_field)
+
+    def prepare(self, rows):
+        """Load whatever the rows of a batch refer to, before building objects."""
+
+    def build(self, row):
+        """Build a new object from a row, or None to skip the row."""
+        raise NotImplementedError
+
+    def apply(self, obj, row):
+        """Copy the update_fields of a row onto an existing object."""
+        for name in self.update_fields:
+            if name in row:
+                setattr(obj, name, row[name])
+
+    def batch_update_fields(self, rows):
+        return [name for name in self.update_fields if name in rows[0]]
+
+    def after_batch(self, saved, rows_by_key, force):
+        """Write related rows for objects created or updated in a batch."""
+
+    def finish(self, force):
+        """Apply fixups that need every row of the section."""
+
+    def restore_batch(self, rows: List[Dict], force: bool) -> SectionResult:
+        """
+        Create missing objects and, with force, update existing ones.
+
+        The batch is applied in one transaction.
+
+        Args:
+            rows: Backup rows
+            force: Overwrite existing objects
+
+        Returns:
+            SectionResult for the batch
+        """
+        result = SectionResult(self.name)
+        rows_by_key = {}
+        for row in rows:
+            key = self.row_key(row)
+            if key is None or key in rows_by_key:
+                result.skipped += 1
+                continue
+            rows_by_key[key] = row
+        if not rows_by_key:
+            return result
+
+        with transaction.atomic():
+            self.prepare(list(rows_by_key.values()))
+            existing = self.existing(list(rows_by_key))
+
+            to_create = []
+            to_update = []
+            for key, row in rows_by_key.items():
+                obj = existing.get(key)
+                if obj is None:
+                    obj = self.build(row)
+                    if obj is None:
+                        result.skipped += 1
+                    else:
+                        to_create.append(obj)
+                elif force:
+                    self.apply(obj, row)
+                    to_update.append(obj)
+                else:
+                    result.skipped += 1
+
+            created = []
+            if to_create:
+                for obj in to_create:
+                    self._stamp(obj, rows_by_key[self.row_key_of(obj)])
+                with stored_timestamps(self.model, self.timestamp_fields):
+                    self.model.objects.bulk_create(to_create)
+                # Primary keys aren't set by bulk_create on every backend
+                created_keys = [self.row_key_of(obj) for obj in to_create]
+                created = list(self.existing(created_keys).values())
+            if to_update:
+                update_fields = self.batch_update_fields(list(rows_by_key.values()))
+                if update_fields:
+                    self.model.objects.bulk_update(to_update, update_fields)
+
+            self.after_batch(created + to_update, rows_by_key, force)
+
+        result.created = len(to_create)
+        result.updated = len(to_update)
+        return result
+
+    def row_key_of(self, obj):
+        """Get the row key of a built object."""
+        return getattr(obj, self.key_field)
+
+    def _stamp(self, obj, row):
+        now = timezone.now()
+        for name in self.timestamp_fields:
+            setattr(obj, name, parse_timestamp(row.get(name)) or now)
+
+
+class PostLookupMixin:
+    """Resolve post slugs of rows to post IDs, remembering them per section."""
+
+    def prepare(self, rows):
+        if not hasattr(self, '_post_ids'):
+            self._post_ids = {}
+        missing = {row.get('post_slug') for row in rows} - self._post_ids.keys()
+        missing.discard(None)
+        if missing:
+            found = dict(Post.objects.filter(slug__in=missing).values_list('slug', 'id'))
+            for slug in missing:
+                self._post_ids[slug] = found.get(slug)
+
+    def post_id_for(self, row):
+        return self._post_ids.get(row.get('post_slug'))
+
+
+class CategorySection(BackupSection):
+    name = 'categories'
+    data_type = 'categories'
+    model = Category
+    fields = ('name', 'slug')
+    expressions = {'parent_name': F('parent__name')}
+    key_field = 'name'
+    update_fields = ('slug',)
+
+    def __init__(self):
+        super().__init__()
+        # (name, parent name) pairs, linked once every category exists
+        self.parent_links = []
+
+    def build(self, row):
+        return Category(name=row['name'], slug=row.get('slug') or slugify(row['name']))
+
+    def after_batch(self, saved, rows_by_key, force):
+        saved_names = {category.name for category in saved}
+        self.parent_links.extend(
+            (name, row['parent_name']) for name, row in rows_by_key.items()
+            if row.get('parent_name') and name in saved_names
+        )
+
+    def finish(self, force):
+        if not self.parent_links:
+            return
+        names = {name for link in self.parent_links for name in link}
+        categories = Category.objects.in_bulk(list(names), field_name='name')
+        linked = []
+        for name, parent_name in self.parent_links:
+            category, parent = categories.get(name), categories.get(parent_name)
+            if category is not None and parent is not None and category.parent_id != parent.pk:
+                category.parent_id = parent.pk
+                linked.append(category)
+        Category.objects.bulk_update(linked, ['parent'], batch_size=500)
+
+
+class TagSection(BackupSection):
+    name = 'tags'
+    data_type = 'tags'
+    model = Tag
+    fields = ('name', 'slug', 'color', 'description', 'created_at')
+    key_field = 'name'
+    update_fields = ('slug', 'color', 'description')
+    timestamp_fields = ('created_at',)
+
+    def build(self, row):
+        return Tag(
+            name=row['name'],
+            slug=row.get('slug') or slugify(row['name']),
+            color=row.get('color') or '#007acc',
+            description=row.get('description') or '',
+        )
+
+
+class AuthorProfileSection(BackupSection):
+    name = 'author_profiles'
+    data_type = 'authors'
+    model = AuthorProfile
+    fields = (
+        'bio', 'website', 'twitter', 'linkedin', 'github', 'instagram', 'is_guest_author',
+        'guest_author_email', 'guest_author_company', 'is_active', 'created_at', 'updated_at',
+    )
+    expressions = {'username': F('user__username')}
+    key_field = 'username'
+    update_fields = (
+        'bio', 'website', 'twitter', 'linkedin', 'github', 'instagram', 'is_guest_author',
+        'guest_author_email', 'guest_author_company', 'is_active',
+    )
+    timestamp_fields = ('created_at', 'updated_at')
+
+    def existing(self, keys):
+        return {
+            profile.user.username: profile
+            for profile in AuthorProfile.objects.filter(user__username__in=keys).select_related('user')
+        }
+
+    def prepare(self, rows):
+        self._user_ids = dict(
+            User.objects.filter(username__in=[row['username'] for row in rows]).values_list('username', 'id')
+        )
+
+    def build(self, row):
+        user_id = self._user_ids.get(row['username'])
+        if user_id is None:
+            logger.warning(f"User {row['username']} not found, skipping profile")
+            return None
+        profile = AuthorProfile(user_id=user_id)
+        self.apply(profile, row)
+        profile._backup_username = row['username']
+        return profile
+
+    def row_key_of(self, obj):
+        return obj._backup_username if hasattr(obj, '_backup_username') else obj.user.username
+
+
+class SubscriberSection(BackupSection):
+    name = 'subscribers'
+    data_type = 'subscribers'
+    model = NewsletterSubscriber
+    date_field = 'subscribed_at'
+    fields = ('email', 'is_confirmed', 'subscribed_at', 'confirmed_at', 'preferences')
+    key_field = 'email'
+    update_fields = ('is_confirmed', 'confirmed_at', 'preferences')
+    timestamp_fields = ('subscribed_at',)
+
+    def build(self, row):
+        subscriber = NewsletterSubscriber(
+            email=row['email'],
+            is_confirmed=row.get('is_confirmed', False),
+            preferences=row.get('preferences') or {},
+        )
+        subscriber.confirmed_at = parse_timestamp(row.get('confirmed_at'))
+        # save() isn't called by bulk_create, so the tokens are set here
+        subscriber.confirmation_token = subscriber._generate_token()
+        subscriber.unsubscribe_token = subscriber._generate_token()
+        return subscriber
+
+    def apply(self, obj, row):
+        super().apply(obj, row)
+        obj.confirmed_at = parse_timestamp(row.get('confirmed_at'))
+
+
+class PostSection(BackupSection):
+    name = 'posts'
+    data_type = 'posts'
+    model = Post
+    date_field = 'created_at'
+    fields = (
+        'title', 'slug', 'status', 'created_at', 'updated_at', 'is_featured', 'view_count',
+        'allow_comments', 'table_of_contents',
+    )
+    expressions = {'author_username': F('author__username')}
+    key_field = 'slug'
+    update_fields = (
+        'title', 'status', 'is_featured', 'view_count', 'allow_comments', 'table_of_contents',
+        'content', 'excerpt',
+    )
+    timestamp_fields = ('created_at', 'updated_at')
+
+    def export_fields(self, include_content):
+        return self.fields + (('content', 'excerpt') if include_content else ())
+
+    def serialize_page(self, page, include_content):
+        post_ids = [row['id'] for row in page]
+        tags = defaultdict(list)
+        for post_id, name in Post.tags.through.objects.filter(post_id__in=post_ids).values_list('post_id', 'tag__name'):
+            tags[post_id].append(name)
+        categories = defaultdict(list)
+        for post_id, name in (
+            Post.categories.through.objects.filter(post_id__in=post_ids).values_list('post_id', 'category__name')
+        ):
+            categories[post_id].append(name)
+        for row in page:
+            row['tags'] = tags.get(row['id'], [])
+            row['categories'] = categories.get(row['id'], [])
+        return page
+
+    def prepare(self, rows):
+        self._author_ids = dict(
+            User.objects.filter(username__in={row.get('author_username') for row in rows})
+            .values_list('username', 'id')
+        )
+
+    def build(self, row):
+        author_id = self._author_ids.get(row.get('author_username'))
+        if author_id is None:
+            logger.warning(f"Author {row.get('author_username')} not found, skipping post {row['slug']}")
+            return None
+        post = Post(author_id=author_id, slug=row['slug'], content=row.get('content', ''), excerpt=row.get('excerpt', ''))
+        self.apply(post, row)
+        return post
+
+    def after_batch(self, saved, rows_by_key, force):
+        if not saved:
+            return
+        post_ids = [post.pk for post in saved]
+        self.touched_post_ids.update(post_ids)
+        for through, field_name, model in (
+            (Post.tags.through, 'tag_id', Tag),
+            (Post.categories.through, 'category_id', Category),
+        ):
+            relation = 'tags' if model is Tag else 'categories'
+            names = {name for post in saved for name in rows_by_key[post.slug].get(relation, [])}
+            ids = dict(model.objects.filter(name__in=names).values_list('name', 'id'))
+            through.objects.filter(post_id__in=post_ids).delete()
+            through.objects.bulk_create(
+                [
+                    through(post_id=post.pk, **{field_name: ids[name]})
+                    for post in saved
+                    for name in rows_by_key[post.slug].get(relation, [])
+                    if name in ids
+                ],
+                ignore_conflicts=True,
+            )
+
+
+class CommentSection(PostLookupMixin, BackupSection):
+    name = 'comments'
+    data_type = 'comments'
+    model = Comment
+    date_field = 'created_at'
+    fields = (
+        'parent_id', 'author_name', 'author_email', 'author_website', 'content', 'is_approved',
+        'created_at', 'ip_address',
+    )
+    expressions = {'post_slug': F('post__slug')}
+    key_field = 'id'
+    update_fields = ('author_name', 'author_email', 'author_website', 'content', 'is_approved')
+    timestamp_fields = ('created_at',)
+
+    def prepare(self, rows):
+        super().prepare(rows)
+        # Replies keep their parent when it's in the batch or already stored
+        batch_ids = {row['id'] for row in rows}
+        parent_ids = {row['parent_id'] for row in rows if row.get('parent_id')} - batch_ids
+        self._known_parents = batch_ids | set(
+            Comment.objects.filter(pk__in=parent_ids).values_list('pk', flat=True)
+        )
+
+    def build(self, row):
+        post_id = self.post_id_for(row)
+        if post_id is None:
+            return None
+        parent_id = row.get('parent_id')
+        comment = Comment(
+            id=row['id'],
+            post_id=post_id,
+            parent_id=parent_id if parent_id in self._known_parents else None,
+            ip_address=row.get('ip_address') or '0.0.0.0',
+        )
+        self.apply(comment, row)
+        return comment
+
+    def after_batch(self, saved, rows_by_key, force):
+        self.touched_post_ids.update(comment.post_id for comment in saved)
+
+
+class SocialShareSection(PostLookupMixin, BackupSection):
+    name = 'social_shares'
+    data_type = 'social'
+    model = SocialShare
+    fields = ('platform', 'share_count', 'last_shared', 'created_at')
+    expressions = {'post_slug': F('post__slug')}
+    update_fields = ('share_count',)
+    timestamp_fields = ('created_at', 'last_shared')
+
+    def row_key(self, row):
+        if not row.get('post_slug') or not row.get('platform'):
+            return None
+        return (row['post_slug'], row['platform'])
+
+    def existing(self, keys):
+        shares = SocialShare.objects.filter(
+            post__slug__in={slug for slug, _ in keys}, platform__in={platform for _, platform in keys}
+        ).select_related('post')
+        wanted = set(keys)
+        return {
+            (share.post.slug, share.platform): share for share in shares
+            if (share.post.slug, share.platform) in wanted
+        }
+
+    def row_key_of(self, obj):
+        return (obj._backup_slug, obj.platform) if hasattr(obj, '_backup_slug') else (obj.post.slug, obj.platform)
+
+    def build(self, row):
+        post_id = self.post_id_for(row)
+        if post_id is None:
+            return None
+        share = SocialShare(post_id=post_id, platform=row['platform'], share_count=row.get('share_count', 0))
+        share._backup_slug = row['post_slug']
+        return share
+
+    def after_batch(self, saved, rows_by_key, force):
+        self.touched_post_ids.update(share.post_id for share in saved)
+
+
+class MediaItemSection(PostLookupMixin, BackupSection):
+    name = 'media_items'
+    data_type = 'media'
+    model = MediaItem
+    date_field = 'created_at'
+    fields = (
+        'media_type', 'title', 'description', 'alt_text', 'order', 'is_featured', 'video_url',
+        'video_platform', 'video_id', 'gallery_images', 'file_size', 'width', 'height',
+        'created_at', 'updated_at',
+    )
+    expressions = {'post_slug': F('post__slug')}
+    key_field = 'id'
+    update_fields = (
+        'media_type', 'title', 'description', 'alt_text', 'order', 'is_featured', 'video_url',
+        'video_platform', 'video_id', 'gallery_images', 'file_size', 'width', 'height',
+    )
+    timestamp_fields = ('created_at', 'updated_at')
+
+    def build(self, row):
+        post_id = self.post_id_for(row)
+        if post_id is None:
+            return None
+        item = MediaItem(id=row['id'], post_id=post_id)
+        self.apply(item, row)
+        return item
+
+    def after_batch(self, saved, rows_by_key, force):
+        self.touched_post_ids.update(item.post_id for item in saved)
+
+
+# Sections in restore dependency order
+SECTION_CLASSES = (
+    CategorySection, TagSection, AuthorProfileSection, SubscriberSection,
+    PostSection, CommentSection, SocialShareSection, MediaItemSection,
+)
+SECTION_NAMES = tuple(section.name for section in SECTION_CLASSES)
+SECTIONS_BY_NAME = {section.name: section for section in SECTION_CLASSES}
+
+# Sections restored together in parallel mode; each wave only depends on earlier ones
+RESTORE_WAVES = (
+    ('categories', 'tags', 'author_profiles', 'subscribers'),
+    ('posts',),
+    ('comments', 'social_shares', 'media_items'),
+)
+
+# Sections the 1.0 format could be restored from
+LEGACY_RESTORE_SECTIONS = ('categories', 'tags', 'author_profiles', 'subscribers')
+
+
+def sections_for(data_types: Iterable[str]) -> List[str]:
+    """
+    Get the section names selected by --data-types choices, in dependency order.
+
+    Args:
+        data_types: Choices such as 'comments', 'social' or 'all'
+
+    Returns:
+        List of section names
+    """
+    data_types = set(data_types)
+    return [
+        section.name for section in SECTION_CLASSES
+        if 'all' in data_types or section.data_type in data_types
+    ]
+
+
+class EngagementBackupService:
+    """Service for streaming engagement backups and restores"""
+
+    DEFAULT_CHUNK_SIZE = 2000
+    DEFAULT_BATCH_SIZE = 1000
+
+    @classmethod
+    def count_rows(cls, sections: Iterable[str], date_range=None) -> Dict[str, int]:
+        """Count the rows a backup of some sections would hold."""
+        return {name: SECTIONS_BY_NAME[name]().count(date_range) for name in sections}
+
+    @classmethod
+    def write_backup(
+        cls,
+        path: str,
+        sections: Iterable[str],
+        include_content: bool = False,
+        date_range=None,
+        chunk_size: int = None,
+        metadata: Optional[Dict] = None,
+        progress: Optional[Callable[[str, int], None]] = None,
+    ) -> Dict[str, int]:
+        """
+        Stream a backup of some sections to a JSON Lines file.
+
+        The file is written under a temporary name and moved into place
+        once complete, so an interrupted backup never looks finished.
+
+        Args:
+            path: Backup file path; '.gz' or '.zst' compresses it
+            sections: Section names, written in dependency order
+            include_content: Include full post content
+            date_range: Optional (start, end) filter
+            chunk_size: Rows read per query
+            metadata: Extra metadata stored in the header
+            progress: Called with (section, row count) after each section
+
+        Returns:
+            dict: Row counts per section
+        """
+        chunk_size = chunk_size or cls.DEFAULT_CHUNK_SIZE
+        sections = [name for name in SECTION_NAMES if name in set(sections)]
+        directory, filename = os.path.split(path)
+        partial_path = os.path.join(directory, f".{filename}")
+
+        header = {
+            'version': BACKUP_VERSION,
+            'created_at': timezone.now().isoformat(),
+            'sections': sections,
+            'include_content': include_content,
+            'date_range': date_range,
+            **(metadata or {}),
+        }
+
+        counts = {}
+        try:
+            with open_jsonl(partial_path, 'w') as handle:
+                handle.write(encode_line({METADATA_KEY: header}))
+                for name in sections:
+                    handle.write(encode_line({SECTION_KEY: name}))
+                    count = 0
+                    for row in SECTIONS_BY_NAME[name]().export_rows(date_range, include_content, chunk_size):
+                        handle.write(encode_line(row))
+                        count += 1
+                    handle.write(encode_line({END_KEY: name, 'count': count}))
+                    counts[name] = count
+                    if progress:
+                        progress(name, count)
+            os.replace(partial_path, path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+        return counts
+
+    @staticmethod
+    def is_legacy_backup(path: str) -> bool:
+        """Check whether a file is a single-document backup from before 2.0."""
+        for line in iter_lines(path):
+            return not line.startswith('{"' + METADATA_KEY)
+        return False
+
+    @classmethod
+    def read_metadata(cls, path: str) -> Dict:
+        """Read the metadata of a backup."""
+        if cls.is_legacy_backup(path):
+            return cls._load_legacy(path).get('metadata', {})
+        for line in iter_lines(path):
+            return json.loads(line)[METADATA_KEY]
+        return {}
+
+    @classmethod
+    def iter_section_batches(
+        cls, path: str, sections: Optional[Iterable[str]] = None, batch_size: int = None
+    ) -> Iterator[Tuple[str, List[Dict]]]:
+        """
+        Stream the rows of a backup in batches.
+
+        Rows of sections that aren't wanted are skipped without decoding.
+
+        Args:
+            path: Backup file path
+            sections: Section names to read, or None for all
+            batch_size: Rows per batch
+
+        Yields:
+            (section name, list of rows)
+
+        Raises:
+            ValueError: If a section is cut short
+        """
+        batch_size = batch_size or cls.DEFAULT_BATCH_SIZE
+        wanted = None if sections is None else set(sections)
+
+        if cls.is_legacy_backup(path):
+            yield from cls._iter_legacy_batches(path, wanted, batch_size)
+            return
+
+        current = None
+        reading = False
+        batch = []
+        for line in iter_lines(path):
+            if line.startswith(CONTROL_PREFIX):
+                record = json.loads(line)
+                if SECTION_KEY in record:
+                    current = record[SECTION_KEY]
+                    reading = wanted is None or current in wanted
+                elif END_KEY in record:
+                    if batch:
+                        yield current, batch
+                        batch = []
+                    current = None
+                    reading = False
+                continue
+            if reading:
+                batch.append(json.loads(line))
+                if len(batch) >= batch_size:
+                    yield current, batch
+                    batch = []
+
+        if current is not None:
+            raise ValueError(f"Backup is truncated in section '{current}'")
+
+    @staticmethod
+    def _load_legacy(path: str) -> Dict:
+        with open_jsonl(path, 'r') as handle:
+            return json.load(handle)
+
+    @classmethod
+    def _iter_legacy_batches(cls, path, wanted, batch_size):
+        data = cls._load_legacy(path).get('data', {})
+        for name in LEGACY_RESTORE_SECTIONS:
+            if name not in data or (wanted is not None and name not in wanted):
+                continue
+            rows = data[name]
+            for start in range(0, len(rows), batch_size):
+                yield name, rows[start:start + batch_size]
+
+    @classmethod
+    def count_backup_rows(cls, path: str, sections: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """Count the rows of each section in a backup, without decoding them."""
+        counts = defaultdict(int)
+        for name, rows in cls.iter_section_batches(path, sections):
+            counts[name] += len(rows)
+        return dict(counts)
+
+    @classmethod
+    def restore(
+        cls,
+        path: str,
+        sections: Optional[Iterable[str]] = None,
+        force: bool = False,
+        batch_size: int = None,
+        parallel: bool = False,
+        workers: int = 4,
+    ) -> Dict[str, SectionResult]:
+        """
+        Restore a backup, one transaction per batch of rows.
+
+        Args:
+            path: Backup file path
+            sections: Section names to restore, or None for all
+            force: Overwrite existing objects
+            batch_size: Rows applied per transaction
+            parallel: Restore each model in its own worker, model
+                dependencies first
+            workers: Maximum number of workers in parallel mode; one on
+                SQLite
+
+        Returns:
+            dict: SectionResult per section
+        """
+        sections = list(SECTION_NAMES if sections is None else sections)
+
+        if parallel:
+            if connection.vendor == 'sqlite':
+                # SQLite allows a single writer, so workers take turns
+                workers = 1
+            results = {}
+            touched = set()
+            for wave in RESTORE_WAVES:
+                wave_sections = [name for name in wave if name in sections]
+                if not wave_sections:
+                    continue
+                with ThreadPoolExecutor(max_workers=max(1, min(workers, len(wave_sections)))) as executor:
+                    futures = [
+                        executor.submit(cls._restore_in_worker, path, [name], force, batch_size)
+                        for name in wave_sections
+                    ]
+                    for future in futures:
+                        wave_results, wave_touched = future.result()
+                        results.update(wave_results)
+                        touched |= wave_touched
+        else:
+            results, touched = cls._restore_sections(path, sections, force, batch_size)
+
+        cls._refresh_derived_data(results, touched)
+        return results
+
+    @classmethod
+    def _restore_in_worker(cls, path, sections, force, batch_size):
+        try:
+            return cls._restore_sections(path, sections, force, batch_size)
+        finally:
+            # Worker threads get their own connection
+            connection.close()
+
+    @classmethod
+    def _restore_sections(cls, path, sections, force, batch_size):
+        restorers = {name: SECTIONS_BY_NAME[name]() for name in sections}
+        results = {name: SectionResult(name) for name in sections}
+
+        for name, rows in cls.iter_section_batches(path, sections, batch_size):
+            restorer, result = restorers[name], results[name]
+            try:
+                batch_result = restorer.restore_batch(rows, force)
+            except Exception as e:
+                result.failed += len(rows)
+                result.errors.append(str(e))
+                logger.error(f"Failed to restore a batch of {len(rows)} {name}: {str(e)}")
+                continue
+            result.created += batch_result.created
+            result.updated += batch_result.updated
+            result.skipped += batch_result.skipped
+
+        touched = set()
+        for name, restorer in restorers.items():
+            try:
+                restorer.finish(force)
+            except Exception as e:
+                results[name].errors.append(str(e))
+                logger.error(f"Failed to finish restoring {name}: {str(e)}")
+            touched |= restorer.touched_post_ids
+
+        return results, touched
+
+    @staticmethod
+    def _refresh_derived_data(results, touched_post_ids):
+        # bulk_create and bulk_update send no signals, so derived data is
+        # refreshed once for the whole restore
+        changed = {name for name, result in results.items() if result.created or result.updated}
+        if not changed:
+            return
+
+        try:
+            if changed & {'posts', 'comments'}:
+                from ..author_services.author_stats_service import AuthorStatsService
+                AuthorStatsService.rebuild()
+            if touched_post_ids:
+                from .comment_tree_service import CommentTreeService
+                from .schema_bundle_service import SchemaBundleService
+                from .social_share_service import SocialShareService
+
+                CommentTreeService.invalidate_posts(touched_post_ids)
+                SchemaBundleService.invalidate_posts(touched_post_ids)
+                if 'social_shares' in changed:
+                    SocialShareService.refresh_snapshots(touched_post_ids)
+        except Exception as e:
+            logger.error(f"Error refreshing data derived from restored rows: {str(e)}")
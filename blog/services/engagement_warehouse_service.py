@@ -0,0 +1,583 @@
+"""
+Engagement Warehouse Service
+
+This service keeps DailyEngagement, a fact table with one row per post and
+day holding views, approved comments and shares per platform, plus one
+site-wide row per day for newsletter sign-ups and the views of all posts. The admin analytics
+dashboard renders from rollups derived from it instead of aggregating over
+posts, comments and shares on every load.
+
+Views and shares are added as deltas where their buffered counters are
+flushed. Comments and subscribers are recounted from their own tables when
+they change, since approval can go either way. ``compact()`` is the nightly
+job: it recounts recent days, moves counts recorded before the warehouse
+existed onto their history days, drops empty rows and rebuilds the rollups.
+
+Days are kept for DAILY_RETENTION_DAYS. Older facts are folded into one row
+per week, dated the Monday of that week, so the table grows by weeks rather
+than days once posts age. Recounts and backfills write older days to their
+week's row.
+
+Each rollup is one GROUP BY query summing the facts of published posts:
+per post, per author, and per category and tag through their link tables.
+A post reaches its facts through one link row per group, so comments and
+shares are never multiplied by joins. The rollups are rebuilt by the
+scheduled ``refresh_engagement_rollups`` task and the dashboard serves the
+last stored ones, queueing a rebuild when they are missing or old.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from ..models import Comment, DailyEngagement, NewsletterSubscriber, Post, SocialShare
+
+
+logger = logging.getLogger(__name__)
+
+FactKey = Tuple[Optional[int], date]
+
+
+class EngagementWarehouseService:
+    """Service for the daily engagement facts and their rollups"""
+
+    PLATFORM_FIELDS = {platform: f'{platform}_shares' for platform, _ in SocialShare.PLATFORM_CHOICES}
+    FACT_FIELDS = ('views', 'comments', 'shares', *PLATFORM_FIELDS.values(), 'new_subscribers')
+
+    # Days recounted by the nightly compaction
+    COMPACTION_DAYS = 2
+
+    # Days kept at daily resolution before folding into weekly rows
+    DAILY_RETENTION_DAYS = 90
+
+    # Window of the "recent activity" figures
+    RECENT_DAYS = 30
+    TOP_LIMIT = 10
+
+    ROLLUP_CACHE_KEY = 'engagement_warehouse:rollups'
+    ROLLUP_LOCK_KEY = 'engagement_warehouse:rollups:refresh'
+    ROLLUP_LOCK_TIMEOUT = 300
+
+    # Rollups older than this are rebuilt in the background when read; the
+    # scheduled task normally rebuilds them every 5 minutes
+    ROLLUP_STALE_SECONDS = 900
+
+    BATCH_SIZE = 500
+
+    # Buckets
+
+    @classmethod
+    def retention_start(cls) -> date:
+        """Get the first day still kept at daily resolution."""
+        return timezone.localdate() - timedelta(days=cls.DAILY_RETENTION_DAYS)
+
+    @classmethod
+    def bucket_day(cls, day: date, retention_start: Optional[date] = None) -> date:
+        """
+        Get the day of the fact row a day's counts belong to.
+
+        Args:
+            day: Day of the engagement
+            retention_start: First daily day, see retention_start()
+
+        Returns:
+            The day itself, or the Monday of its week once it has been folded
+        """
+        if day >= (retention_start or cls.retention_start()):
+            return day
+        return day - timedelta(days=day.weekday())
+
+    # Recording
+
+    @classmethod
+    def add(cls, deltas: Dict[FactKey, Dict[str, int]]) -> int:
+        """
+        Add counts to the facts of some posts and days.
+
+        Missing rows are created first, then the rows are locked and
+        updated, so concurrent writers to the same row don't lose counts.
+
+        Args:
+            deltas: Mapping of (post_id or None, day) to {field: amount}
+
+        Returns:
+            Number of fact rows written
+        """
+        by_post = defaultdict(dict)
+        for (post_id, day), fields in deltas.items():
+            fields = {field: amount for field, amount in fields.items() if amount}
+            if fields:
+                by_post[post_id][day] = fields
+
+        post_ids = list(by_post)
+        written = 0
+        with transaction.atomic():
+            for start in range(0, len(post_ids), cls.BATCH_SIZE):
+                written += cls._add_chunk({post_id: by_post[post_id] for post_id in post_ids[start:start + cls.BATCH_SIZE]})
+        return written
+
+    @classmethod
+    def _add_chunk(cls, by_post: Dict[Optional[int], Dict[date, Dict[str, int]]]) -> int:
+        condition = Q(post_id__in=[post_id for post_id in by_post if post_id is not None])
+        if None in by_post:
+            condition |= Q(post__isnull=True)
+        days = {day for post_days in by_post.values() for day in post_days}
+        facts = DailyEngagement.objects.filter(condition, day__in=days)
+
+        existing = set(facts.values_list('post_id', 'day'))
+        DailyEngagement.objects.bulk_create(
+            [
+                DailyEngagement(post_id=post_id, scope=DailyEngagement.scope_of(post_id), day=day)
+                for post_id, post_days in by_post.items() for day in post_days
+                if (post_id, day) not in existing
+            ],
+            batch_size=cls.BATCH_SIZE,
+            ignore_conflicts=True
+        )
+
+        rows = []
+        changed_fields = set()
+        for row in facts.select_for_update():
+            fields = by_post.get(row.post_id, {}).get(row.day)
+            if not fields:
+                continue
+            for field, amount in fields.items():
+                setattr(row, field, max(getattr(row, field) + amount, 0))
+            changed_fields.update(fields)
+            rows.append(row)
+        if rows:
+            DailyEngagement.objects.bulk_update(rows, sorted(changed_fields), batch_size=cls.BATCH_SIZE)
+        return len(rows)
+
+    @classmethod
+    def record_views(cls, post_id: int, views: int, day: Optional[date] = None):
+        """
+        Add flushed views of a post, and to the site-wide views of the day.
+
+        Args:
+            post_id: ID of the viewed post
+            views: Number of views
+            day: Day of the views, today by default
+        """
+        day = day or timezone.localdate()
+        cls.add({(post_id, day): {'views': views}, (None, day): {'views': views}})
+
+    @classmethod
+    def record_shares(cls, counts: Dict[Tuple[int, str], int], day: Optional[date] = None):
+        """
+        Add flushed shares per post and platform.
+
+        Args:
+            counts: Mapping of (post_id, platform) to number of shares
+            day: Day of the shares, today by default
+        """
+        day = day or timezone.localdate()
+        deltas = defaultdict(lambda: defaultdict(int))
+        for (post_id, platform), count in counts.items():
+            deltas[(post_id, day)]['shares'] += count
+            if platform in cls.PLATFORM_FIELDS:
+                deltas[(post_id, day)][cls.PLATFORM_FIELDS[platform]] += count
+        cls.add(deltas)
+
+    # Recounting
+
+    @staticmethod
+    def _day_start(day: date) -> datetime:
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+    @classmethod
+    def _store_counts(cls, field: str, counts: Dict[FactKey, int], scope) -> int:
+        """
+        Replace one field of the facts in scope with fresh counts.
+
+        Args:
+            field: Fact field, e.g. 'comments'
+            counts: Mapping of (post_id or None, day) to count
+            scope: DailyEngagement queryset whose rows the counts replace
+
+        Returns:
+            Number of fact rows changed
+        """
+        existing = {(post_id, day): (pk, value) for pk, post_id, day, value in scope.values_list('pk', 'post_id', 'day', field)}
+        changed = [
+            DailyEngagement(pk=pk, **{field: counts.get(key, 0)})
+            for key, (pk, value) in existing.items() if counts.get(key, 0) != value
+        ]
+        created = [
+            DailyEngagement(post_id=post_id, scope=DailyEngagement.scope_of(post_id), day=day, **{field: count})
+            for (post_id, day), count in counts.items() if count and (post_id, day) not in existing
+        ]
+        with transaction.atomic():
+            DailyEngagement.objects.bulk_update(changed, [field], batch_size=cls.BATCH_SIZE)
+            DailyEngagement.objects.bulk_create(created, batch_size=cls.BATCH_SIZE, ignore_conflicts=True)
+        return len(changed) + len(created)
+
+    @classmethod
+    def recount_comments(cls, post_ids: Optional[Iterable[int]] = None, since: Optional[date] = None) -> int:
+        """
+        Recount approved comments per post and day.
+
+        Args:
+            post_ids: Posts to recount, or None for every post with comments
+                or comment facts in the period
+            since: First day to recount, or None for all days
+
+        Returns:
+            Number of fact rows changed
+        """
+        comments = Comment.objects.filter(is_approved=True)
+        facts = DailyEngagement.objects.filter(post__isnull=False)
+        retention_start = cls.retention_start()
+        if since is not None:
+            since = cls.bucket_day(since, retention_start)
+            comments = comments.filter(created_at__gte=cls._day_start(since))
+            facts = facts.filter(day__gte=since)
+
+        if post_ids is None:
+            post_ids = set(comments.values_list('post_id', flat=True).distinct())
+            post_ids |= set(facts.filter(comments__gt=0).values_list('post_id', flat=True).distinct())
+        post_ids = sorted(set(post_ids))
+
+        changed = 0
+        for start in range(0, len(post_ids), cls.BATCH_SIZE):
+            chunk = post_ids[start:start + cls.BATCH_SIZE]
+            counts = defaultdict(int)
+            for post_id, day, count in comments.filter(post_id__in=chunk).annotate(
+                    day=TruncDate('created_at')).values('post_id', 'day').annotate(
+                    count=Count('id')).values_list('post_id', 'day', 'count'):
+                counts[(post_id, cls.bucket_day(day, retention_start))] += count
+            changed += cls._store_counts('comments', counts, facts.filter(post_id__in=chunk))
+        return changed
+
+    @classmethod
+    def recount_subscribers(cls, since: Optional[date] = None) -> int:
+        """
+        Recount newsletter sign-ups per day.
+
+        Args:
+            since: First day to recount, or None for all days
+
+        Returns:
+            Number of fact rows changed
+        """
+        subscribers = NewsletterSubscriber.objects.all()
+        facts = DailyEngagement.objects.filter(post__isnull=True)
+        retention_start = cls.retention_start()
+        if since is not None:
+            since = cls.bucket_day(since, retention_start)
+            subscribers = subscribers.filter(subscribed_at__gte=cls._day_start(since))
+            facts = facts.filter(day__gte=since)
+
+        counts = defaultdict(int)
+        for day, count in subscribers.annotate(day=TruncDate('subscribed_at')).values('day').annotate(
+                count=Count('id')).values_list('day', 'count'):
+            counts[(None, cls.bucket_day(day, retention_start))] += count
+        return cls._store_counts('new_subscribers', counts, facts)
+
+    @classmethod
+    def backfill_history(cls) -> int:
+        """
+        Add view and share counts that the facts don't hold yet.
+
+        Counts recorded before the warehouse existed, or by code paths that
+        bypass it, are placed on the post's creation day (views) or the day
+        it was last shared on that platform (shares).
+
+        Returns:
+            Number of fact rows written
+        """
+        recorded = {
+            row['post_id']: row
+            for row in DailyEngagement.objects.filter(post__isnull=False).values('post_id').annotate(
+                views=Sum('views'), **{field: Sum(field) for field in cls.PLATFORM_FIELDS.values()}
+            )
+        }
+
+        retention_start = cls.retention_start()
+        deltas = defaultdict(lambda: defaultdict(int))
+        for post_id, view_count, created_at in Post.objects.values_list('id', 'view_count', 'created_at').iterator():
+            missing = view_count - (recorded.get(post_id, {}).get('views') or 0)
+            if missing > 0:
+                deltas[(post_id, cls.bucket_day(timezone.localdate(created_at), retention_start))]['views'] += missing
+
+        for post_id, platform, share_count, last_shared in SocialShare.objects.values_list(
+                'post_id', 'platform', 'share_count', 'last_shared').iterator():
+            field = cls.PLATFORM_FIELDS.get(platform)
+            if field is None:
+                continue
+            missing = share_count - (recorded.get(post_id, {}).get(field) or 0)
+            if missing > 0:
+                key = (post_id, cls.bucket_day(timezone.localdate(last_shared), retention_start))
+                deltas[key][field] += missing
+                deltas[key]['shares'] += missing
+
+        return cls.add(deltas)
+
+    @classmethod
+    def reconcile_site_views(cls) -> int:
+        """
+        Make the site-wide views of each day match the sum over its posts.
+
+        Returns:
+            Number of site rows written
+        """
+        post_views = dict(
+            DailyEngagement.objects.filter(post__isnull=False).values('day')
+            .annotate(views=Sum('views')).values_list('day', 'views')
+        )
+        site_views = dict(DailyEngagement.objects.filter(post__isnull=True).values_list('day', 'views'))
+        return cls.add({
+            (None, day): {'views': post_views.get(day, 0) - site_views.get(day, 0)}
+            for day in post_views.keys() | site_views.keys()
+        })
+
+    @classmethod
+    def fold_old_days(cls) -> int:
+        """
+        Fold facts older than the daily retention into weekly rows.
+
+        Returns:
+            Number of daily rows folded
+        """
+        old_days = DailyEngagement.objects.filter(day__lt=cls.retention_start()).exclude(day__iso_week_day=1)
+        folded = 0
+        for day in sorted(set(old_days.values_list('day', flat=True).distinct())):
+            monday = day - timedelta(days=day.weekday())
+            rows = old_days.filter(day=day)
+            deltas = {
+                (post_id, monday): dict(zip(cls.FACT_FIELDS, values))
+                for post_id, *values in rows.values_list('post_id', *cls.FACT_FIELDS)
+            }
+            with transaction.atomic():
+                cls.add(deltas)
+                rows.delete()
+            folded += len(deltas)
+        return folded
+
+    @classmethod
+    def compact(cls, days: int = COMPACTION_DAYS, full: bool = False) -> Dict[str, int]:
+        """
+        Reconcile the facts with their sources and rebuild the rollups.
+
+        Args:
+            days: Number of recent days to recount
+            full: Recount every day instead
+
+        Returns:
+            dict: Rows changed per step
+        """
+        since = None if full else timezone.localdate() - timedelta(days=days - 1)
+        summary = {
+            'comments': cls.recount_comments(since=since),
+            'subscribers': cls.recount_subscribers(since=since),
+            'history': cls.backfill_history(),
+            'site_views': cls.reconcile_site_views(),
+            'folded': cls.fold_old_days(),
+        }
+        summary['removed'], _ = DailyEngagement.objects.filter(**{field: 0 for field in cls.FACT_FIELDS}).delete()
+        cls.refresh_rollups()
+
+        logger.info(f"Compacted engagement facts: {summary}")
+        return summary
+
+    # Rollups
+
+    @staticmethod
+    def _display_name(first_name: str, last_name: str, username: str) -> str:
+        return f"{first_name} {last_name}".strip() or username
+
+    @staticmethod
+    def _fact_sums(path: str) -> Dict:
+        """Sums of the post facts reached through a lookup path."""
+        return {
+            'total_views': Coalesce(Sum(f'{path}views'), 0),
+            'total_comments': Coalesce(Sum(f'{path}comments'), 0),
+            'total_shares': Coalesce(Sum(f'{path}shares'), 0),
+        }
+
+    @classmethod
+    def _top_posts(cls, order: str) -> List[Dict]:
+        """Get the top published posts by one of their fact sums."""
+        rows = Post.objects.filter(status='published').values(
+            'id', 'title', 'author_id', 'created_at', 'author__username', 'author__first_name', 'author__last_name'
+        ).annotate(**cls._fact_sums('daily_engagement__')).order_by(f'-{order}', 'id')[:cls.TOP_LIMIT]
+        return [
+            {
+                'id': row['id'], 'title': row['title'], 'author_id': row['author_id'], 'created_at': row['created_at'],
+                'author': cls._display_name(row['author__first_name'], row['author__last_name'], row['author__username']),
+                'view_count': row['total_views'], 'comment_count': row['total_comments'],
+                'share_count': row['total_shares'],
+            }
+            for row in rows
+        ]
+
+    @classmethod
+    def _top_groups(cls, rows, group_field: str, name, post: str = 'post__') -> List[Dict]:
+        """
+        Get the top groups of published posts by views.
+
+        Each row of ``rows`` links one post to one group, so the post's facts
+        are summed once per group it belongs to.
+
+        Args:
+            rows: values() queryset grouping the rows by group
+            group_field: Field of the group's ID in the rows
+            name: Function of a row returning the group's name
+            post: Lookup path from the rows to their post
+        """
+        rows = rows.annotate(
+            post_count=Count(f'{post}id', distinct=True), **cls._fact_sums(f'{post}daily_engagement__')
+        ).order_by('-total_views', group_field)[:cls.TOP_LIMIT]
+        return [
+            {
+                'id': row[group_field], 'name': name(row), 'post_count': row['post_count'],
+                'total_views': row['total_views'], 'total_comments': row['total_comments'],
+                'total_shares': row['total_shares'],
+            }
+            for row in rows
+        ]
+
+    @classmethod
+    def build_rollups(cls) -> Dict:
+        """
+        Compute the dashboard figures from the facts.
+
+        Returns:
+            dict: Totals, recent activity, top posts and category, tag,
+            author and platform rollups, as plain data
+        """
+        now = timezone.now()
+        since = timezone.localdate(now) - timedelta(days=cls.RECENT_DAYS)
+        recent_start = now - timedelta(days=cls.RECENT_DAYS)
+        # Post rows hold comments and shares, site rows views and subscribers
+        fact_sums = {
+            'views': Sum('views', filter=Q(post__isnull=True)),
+            'comments': Sum('comments'),
+            'shares': Sum('shares'),
+            'new_subscribers': Sum('new_subscribers'),
+        }
+        totals = DailyEngagement.objects.aggregate(**fact_sums)
+        recent = DailyEngagement.objects.filter(day__gte=since).aggregate(**fact_sums)
+        post_counts = Post.objects.filter(status='published').aggregate(
+            total=Count('id'), recent=Count('id', filter=Q(created_at__gte=recent_start))
+        )
+
+        published = {'post__status': 'published'}
+        category_stats = cls._top_groups(
+            Post.categories.through.objects.filter(**published).values('category_id', 'category__name'),
+            'category_id', lambda row: row['category__name']
+        )
+        tag_stats = cls._top_groups(
+            Post.tags.through.objects.filter(**published).values('tag_id', 'tag__name'),
+            'tag_id', lambda row: row['tag__name']
+        )
+        author_stats = cls._top_groups(
+            Post.objects.filter(status='published').values(
+                'author_id', 'author__username', 'author__first_name', 'author__last_name'
+            ),
+            'author_id',
+            lambda row: cls._display_name(row['author__first_name'], row['author__last_name'], row['author__username']),
+            post=''
+        )
+
+        platform_totals = DailyEngagement.objects.aggregate(**{
+            aggregate: function
+            for platform, field in cls.PLATFORM_FIELDS.items()
+            for aggregate, function in (
+                (f'{platform}_total', Sum(field)),
+                (f'{platform}_posts', Count('post', distinct=True, filter=Q(**{f'{field}__gt': 0}))),
+            )
+        })
+        platform_performance = []
+        for platform in cls.PLATFORM_FIELDS:
+            total, post_count = platform_totals[f'{platform}_total'] or 0, platform_totals[f'{platform}_posts']
+            if total:
+                platform_performance.append({
+                    'platform': platform, 'total_shares': total, 'post_count': post_count,
+                    'avg_shares_per_post': total / post_count if post_count else 0,
+                })
+        platform_performance.sort(key=lambda row: -row['total_shares'])
+
+        return {
+            'built_at': now,
+            'total_posts': post_counts['total'],
+            'total_comments': totals['comments'] or 0,
+            'total_subscribers': NewsletterSubscriber.objects.filter(is_confirmed=True).count(),
+            'total_shares': totals['shares'] or 0,
+            'total_views': totals['views'] or 0,
+            'recent_posts': post_counts['recent'],
+            'recent_comments': recent['comments'] or 0,
+            'recent_subscribers': recent['new_subscribers'] or 0,
+            'recent_shares': recent['shares'] or 0,
+            'recent_views': recent['views'] or 0,
+            'top_posts_by_views': cls._top_posts('total_views'),
+            'top_posts_by_comments': cls._top_posts('total_comments'),
+            'top_posts_by_shares': [post for post in cls._top_posts('total_shares') if post['share_count']],
+            'category_stats': category_stats,
+            'tag_stats': tag_stats,
+            'author_stats': author_stats,
+            'platform_performance': platform_performance,
+        }
+
+    @classmethod
+    def empty_rollups(cls) -> Dict:
+        """Get rollups with no figures, shown until the first build is stored."""
+        figures = ('posts', 'comments', 'subscribers', 'shares', 'views')
+        return {
+            'built_at': None,
+            **{f'total_{figure}': 0 for figure in figures},
+            **{f'recent_{figure}': 0 for figure in figures},
+            **{key: [] for key in (
+                'top_posts_by_views', 'top_posts_by_comments', 'top_posts_by_shares',
+                'category_stats', 'tag_stats', 'author_stats', 'platform_performance',
+            )},
+        }
+
+    @classmethod
+    def refresh_rollups(cls) -> Dict:
+        """Rebuild the rollups and store them until the next rebuild."""
+        try:
+            rollups = cls.build_rollups()
+            cache.set(cls.ROLLUP_CACHE_KEY, rollups, None)
+        finally:
+            cache.delete(cls.ROLLUP_LOCK_KEY)
+        return rollups
+
+    @classmethod
+    def get_rollups(cls) -> Dict:
+        """
+        Get the last stored dashboard rollups.
+
+        Rollups are never built in the request. Missing or old ones queue a
+        background rebuild, and until the first build is stored the figures
+        are empty.
+
+        Returns:
+            dict: See build_rollups()
+        """
+        rollups = cache.get(cls.ROLLUP_CACHE_KEY)
+        if rollups is None or (timezone.now() - rollups['built_at']).total_seconds() > cls.ROLLUP_STALE_SECONDS:
+            cls._queue_refresh()
+        return rollups if rollups is not None else cls.empty_rollups()
+
+    @classmethod
+    def _queue_refresh(cls) -> bool:
+        """Queue a background rebuild of the rollups unless one is queued."""
+        from ..tasks import refresh_engagement_rollups
+
+        if not cache.add(cls.ROLLUP_LOCK_KEY, 1, timeout=cls.ROLLUP_LOCK_TIMEOUT):
+            return False
+        try:
+            refresh_engagement_rollups.delay()
+        except Exception as e:
+            cache.delete(cls.ROLLUP_LOCK_KEY)
+            logger.warning(f"Could not queue the engagement rollup refresh: {str(e)}")
+            return False
+        return True
@@ -0,0 +1,585 @@
+"""
+Export Service
+
+This service streams admin bulk exports instead of building the whole file
+in memory. An export is described by an ExportSpec: the columns read with
+``values()`` and how each value is shown. Rows are read one keyset page per
+query (see keyset_pages) and each page is encoded into one chunk of the
+response, so memory stays flat whatever the number of rows.
+
+Encoders are pluggable: CSV, JSON and JSON Lines are built in, and any of
+them can be gzip-compressed on the fly. Register more in
+ExportService.ENCODERS.
+
+Selections larger than BACKGROUND_THRESHOLD rows are exported by a Celery
+task instead (see ``start_job()``), which writes the file to private
+storage and records its progress in the cache for the export status view.
+The task receives the selection itself as arguments (see ``selection()``),
+so the worker needs nothing from the web process's cache to rebuild it.
+"""
+
+import csv
+import io
+import logging
+import tempfile
+import uuid
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db.models import Expression, F, QuerySet, TextField, Value
+from django.db.models.functions import Coalesce, NullIf
+from django.http import HttpRequest, QueryDict, StreamingHttpResponse
+from django.utils import timezone
+
+from ..linkedin_models import LinkedInPost
+from ..models import SocialShare
+from ..utils.jsonl_stream import encode_line
+from .engagement_backup_service import keyset_pages
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ExportColumn:
+    """One column of an export."""
+
+    key: str
+    header: str
+    # Field lookup or expression read from the database, the key by default
+    lookup: Optional[Union[str, Expression]] = None
+    # Transforms the value for every format, e.g. to truncate it
+    transform: Optional[Callable] = None
+    # Shows the value in text formats such as CSV
+    display: Optional[Callable] = None
+
+
+@dataclass
+class ExportSpec:
+    """Columns and file name of an export."""
+
+    name: str
+    filename: str
+    columns: Tuple[ExportColumn, ...]
+
+    def values(self, queryset):
+        """Get a values() queryset with the id and every column."""
+        fields = [column.key for column in self.columns if (column.lookup or column.key) == column.key]
+        expressions = {
+            column.key: F(column.lookup) if isinstance(column.lookup, str) else column.lookup
+            for column in self.columns if (column.lookup or column.key) != column.key
+        }
+        return queryset.values('id', *fields, **expressions)
+
+    def transform(self, row: Dict) -> Dict:
+        return {
+            column.key: column.transform(row[column.key]) if column.transform else row[column.key]
+            for column in self.columns
+        }
+
+
+def text_value(value) -> str:
+    """Show a value in a text export."""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'Yes' if value else 'No'
+    if isinstance(value, datetime):
+        return timezone.localtime(value).strftime('%Y-%m-%d %H:%M:%S') if timezone.is_aware(value) \
+            else value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return encode_line(value).rstrip('\n') if value else ''
+    return str(value)
+
+
+def choice_display(choices) -> Callable:
+    """Show the label of a choices value."""
+    labels = dict(choices)
+    return lambda value: labels.get(value, text_value(value))
+
+
+def truncate(length: int) -> Callable:
+    """Cut text longer than length, marking the cut with an ellipsis."""
+    return lambda value: value[:length] + '...' if value and len(value) > length else value
+
+
+# Encoders
+
+class CSVEncoder:
+    """Encode rows as CSV with a header line."""
+
+    extension = 'csv'
+    content_type = 'text/csv'
+
+    def header(self, spec: ExportSpec) -> str:
+        return self._lines([[column.header for column in spec.columns]])
+
+    def page(self, spec: ExportSpec, rows: Iterable[Dict], first: bool = True) -> str:
+        return self._lines(
+            [(column.display or text_value)(row[column.key]) for column in spec.columns]
+            for row in rows
+        )
+
+    def footer(self, spec: ExportSpec) -> str:
+        return ''
+
+    @staticmethod
+    def _lines(rows) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+
+class JSONLEncoder:
+    """Encode rows as JSON Lines, one object per row, keyed by column."""
+
+    extension = 'jsonl'
+    content_type = 'application/x-ndjson'
+
+    def header(self, spec: ExportSpec) -> str:
+        return ''
+
+    def page(self, spec: ExportSpec, rows: Iterable[Dict], first: bool = True) -> str:
+        return ''.join(encode_line(row) for row in rows)
+
+    def footer(self, spec: ExportSpec) -> str:
+        return ''
+
+
+class JSONEncoder:
+    """Encode rows as one JSON document, an array of objects keyed by column."""
+
+    extension = 'json'
+    content_type = 'application/json'
+
+    def header(self, spec: ExportSpec) -> str:
+        return '[\n'
+
+    def page(self, spec: ExportSpec, rows: Iterable[Dict], first: bool = True) -> str:
+        lines = ',\n'.join(encode_line(row).rstrip('\n') for row in rows)
+        return lines if first or not lines else ',\n' + lines
+
+    def footer(self, spec: ExportSpec) -> str:
+        return '\n]\n'
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """
+    Compress a byte stream into one gzip member, chunk by chunk.
+
+    Args:
+        chunks: Uncompressed chunks
+        level: Compression level
+
+    Yields:
+        Compressed chunks
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+# Exports
+
+EXPORTS = {
+    spec.name: spec for spec in (
+        ExportSpec(
+            name='subscribers',
+            filename='newsletter_subscribers',
+            columns=(
+                ExportColumn('email', 'Email'),
+                ExportColumn('is_confirmed', 'Confirmed'),
+                ExportColumn('subscribed_at', 'Subscribed At'),
+                ExportColumn('confirmed_at', 'Confirmed At'),
+                ExportColumn('preferences', 'Preferences'),
+            ),
+        ),
+        ExportSpec(
+            name='comments',
+            filename='comments',
+            columns=(
+                ExportColumn('post_title', 'Post Title', lookup='post__title'),
+                ExportColumn('author_name', 'Author Name'),
+                ExportColumn('author_email', 'Author Email'),
+                ExportColumn('content', 'Content', transform=truncate(200)),
+                ExportColumn('is_approved', 'Approved'),
+                ExportColumn('created_at', 'Created At'),
+                ExportColumn('ip_address', 'IP Address'),
+            ),
+        ),
+        ExportSpec(
+            name='social_shares',
+            filename='social_shares',
+            columns=(
+                ExportColumn('post_title', 'Post Title', lookup='post__title'),
+                ExportColumn('platform', 'Platform', display=choice_display(SocialShare.PLATFORM_CHOICES)),
+                ExportColumn('share_count', 'Share Count'),
+                ExportColumn('last_shared', 'Last Shared'),
+                ExportColumn('created_at', 'Created At'),
+            ),
+        ),
+        ExportSpec(
+            name='linkedin_posts',
+            filename='linkedin_posts',
+            columns=(
+                ExportColumn('post_title', 'Blog Post Title', lookup='post__title'),
+                ExportColumn('status', 'Status', display=choice_display(LinkedInPost.STATUS_CHOICES)),
+                ExportColumn('linkedin_post_id', 'LinkedIn Post ID'),
+                ExportColumn('attempt_count', 'Attempt Count'),
+                ExportColumn('created_at', 'Created At'),
+                ExportColumn('posted_at', 'Posted At'),
+                ExportColumn('error_message', 'Error Message'),
+            ),
+        ),
+        ExportSpec(
+            name='dashboard_metrics',
+            filename='dashboard_metrics',
+            columns=(
+                ExportColumn('label', 'Metric'),
+                ExportColumn('value', 'Value'),
+                ExportColumn('change', 'Change'),
+            ),
+        ),
+        ExportSpec(
+            name='linkedin_stats',
+            filename='linkedin_stats',
+            columns=(
+                ExportColumn('post_title', 'Post Title', lookup='post__title'),
+                ExportColumn('status', 'Status', display=choice_display(LinkedInPost.STATUS_CHOICES)),
+                ExportColumn(
+                    'image_upload_status', 'Image Status',
+                    display=choice_display(LinkedInPost._meta.get_field('image_upload_status').choices)
+                ),
+                ExportColumn('media_count', 'Media Count', lookup='media_ids',
+                             transform=lambda media_ids: len(media_ids) if media_ids else 0),
+                ExportColumn('attempt_count', 'Attempts'),
+                ExportColumn('posted_at', 'Posted At'),
+                ExportColumn('linkedin_post_url', 'LinkedIn URL'),
+                ExportColumn('error', 'Error Message',
+                             lookup=Coalesce(NullIf('error_message', Value('', output_field=TextField())),
+                                             'image_error_message')),
+            ),
+        ),
+    )
+}
+
+
+class ExportService:
+    """Service for streaming and background exports"""
+
+    ENCODERS = {
+        'csv': CSVEncoder(),
+        'json': JSONEncoder(),
+        'jsonl': JSONLEncoder(),
+    }
+
+    # Rows read per query
+    CHUNK_SIZE = 2000
+
+    # Larger selections are exported in the background
+    BACKGROUND_THRESHOLD = 100000
+
+    JOB_PREFIX = 'export_job'
+    JOB_TIMEOUT = 86400
+    # Progress is saved every this many rows
+    PROGRESS_INTERVAL = 10000
+    # Days export files are kept in storage
+    FILE_RETENTION_DAYS = 7
+
+    @classmethod
+    def get_encoder(cls, export_format: str):
+        try:
+            return cls.ENCODERS[export_format]
+        except KeyError:
+            raise ValueError(f"Unsupported export format: {export_format}")
+
+    @classmethod
+    def filename(cls, spec: ExportSpec, export_format: str, compress: bool = False) -> str:
+        extension = cls.get_encoder(export_format).extension + ('.gz' if compress else '')
+        return f"{spec.filename}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+
+    @classmethod
+    def encode(cls, spec_name: str, pages: Iterable[Iterable[Dict]], export_format: str = 'csv',
+               compress: bool = False, progress: Optional[Callable[[int], None]] = None) -> Iterator[bytes]:
+        """
+        Encode pages of rows, one chunk per page.
+
+        Args:
+            spec_name: Name of the export in EXPORTS
+            pages: Lists of row dicts holding the columns' keys
+            export_format: Key of ENCODERS
+            compress: Gzip the output
+            progress: Called with the number of rows written after each page
+
+        Yields:
+            Encoded chunks
+        """
+        spec = EXPORTS[spec_name]
+        encoder = cls.get_encoder(export_format)
+
+        def chunks():
+            yield encoder.header(spec).encode('utf-8')
+            written = 0
+            for page in pages:
+                rows = [spec.transform(row) for row in page]
+                yield encoder.page(spec, rows, first=not written).encode('utf-8')
+                written += len(rows)
+                if progress:
+                    progress(written)
+            yield encoder.footer(spec).encode('utf-8')
+
+        return gzip_chunks(chunks()) if compress else (chunk for chunk in chunks() if chunk)
+
+    @classmethod
+    def iter_chunks(cls, spec_name: str, queryset, export_format: str = 'csv', compress: bool = False,
+                    progress: Optional[Callable[[int], None]] = None) -> Iterator[bytes]:
+        """
+        Encode the rows of a queryset, reading one page of rows per query.
+
+        Args:
+            spec_name: Name of the export in EXPORTS
+            queryset: Rows to export
+            export_format: Key of ENCODERS
+            compress: Gzip the output
+            progress: Called with the number of rows written after each page
+
+        Yields:
+            Encoded chunks
+        """
+        pages = keyset_pages(EXPORTS[spec_name].values(queryset), cls.CHUNK_SIZE)
+        return cls.encode(spec_name, pages, export_format, compress, progress)
+
+    @classmethod
+    def stream_response(cls, spec_name: str, source, export_format: str = 'csv',
+                        compress: bool = False) -> StreamingHttpResponse:
+        """
+        Stream an export as a file download.
+
+        Args:
+            spec_name: Name of the export in EXPORTS
+            source: Queryset of the rows to export, or a list of row dicts
+            export_format: Key of ENCODERS
+            compress: Gzip the output
+
+        Returns:
+            StreamingHttpResponse
+        """
+        encoder = cls.get_encoder(export_format)
+        if isinstance(source, QuerySet):
+            chunks = cls.iter_chunks(spec_name, source, export_format, compress)
+        else:
+            chunks = cls.encode(spec_name, [source], export_format, compress)
+        response = StreamingHttpResponse(
+            chunks, content_type='application/gzip' if compress else encoder.content_type
+        )
+        filename = cls.filename(EXPORTS[spec_name], export_format, compress)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    # Background jobs
+
+    @staticmethod
+    def storage() -> FileSystemStorage:
+        """
+        Get the storage of background export files.
+
+        Exports hold subscriber and commenter emails, so they are kept in
+        EXPORT_STORAGE_ROOT, outside MEDIA_ROOT, and only served by the
+        export status view to the user who started the job.
+        """
+        return FileSystemStorage(location=settings.EXPORT_STORAGE_ROOT)
+
+    @staticmethod
+    def selection(model, params: Optional[str] = None, ids: Optional[Iterable] = None) -> Dict:
+        """
+        Describe the rows of an export as plain task arguments.
+
+        Args:
+            model: Model of the rows
+            params: Query string of the admin changelist the rows were
+                selected on, or None for every row of the model
+            ids: Primary keys of the selected rows, or None for all of them
+
+        Returns:
+            dict: JSON-serializable selection for selection_queryset()
+        """
+        return {
+            'model': model._meta.label_lower,
+            'params': params,
+            'ids': [str(pk) for pk in ids] if ids is not None else None,
+        }
+
+    @classmethod
+    def selection_queryset(cls, selection: Dict, user_id: Optional[int] = None) -> QuerySet:
+        """
+        Rebuild the queryset of a selection.
+
+        Changelist filters and search are applied by the model's admin as
+        the user who started the export, so the job exports the rows that
+        user selected.
+
+        Args:
+            selection: Dict returned by selection()
+            user_id: ID of the user who selected the rows
+
+        Returns:
+            QuerySet of the rows to export
+        """
+        from django.contrib import admin
+
+        model = apps.get_model(selection['model'])
+        if selection['params'] is None:
+            queryset = model._default_manager.all()
+        else:
+            model_admin = admin.site._registry.get(model)
+            if model_admin is None or user_id is None:
+                raise ValueError(f"Cannot rebuild the changelist of {selection['model']}")
+            request = HttpRequest()
+            request.method = 'GET'
+            request.GET = QueryDict(selection['params'])
+            request.user = get_user_model().objects.get(pk=user_id)
+            queryset = model_admin.get_changelist_instance(request).get_queryset(request)
+
+        if selection['ids'] is not None:
+            queryset = queryset.filter(pk__in=selection['ids'])
+        return queryset
+
+    @classmethod
+    def job_key(cls, job_id: str) -> str:
+        return f"{cls.JOB_PREFIX}:{job_id}"
+
+    @classmethod
+    def get_job(cls, job_id: str) -> Optional[Dict]:
+        return cache.get(cls.job_key(job_id))
+
+    @classmethod
+    def _save_job(cls, job: Dict):
+        cache.set(cls.job_key(job['id']), job, cls.JOB_TIMEOUT)
+
+    @classmethod
+    def start_job(cls, spec_name: str, selection: Dict, export_format: str = 'csv', compress: bool = True,
+                  user_id: Optional[int] = None) -> Dict:
+        """
+        Export a selection of rows to storage in the background.
+
+        The selection is passed to the task as arguments, so the worker
+        rebuilds the same filtered rows with its own database connection.
+
+        Args:
+            spec_name: Name of the export in EXPORTS
+            selection: Rows to export, from selection()
+            export_format: Key of ENCODERS
+            compress: Gzip the file
+            user_id: ID of the user allowed to download the file
+
+        Returns:
+            dict: The queued job
+        """
+        from ..tasks import run_export_job
+
+        cls.get_encoder(export_format)
+        job = {
+            'id': uuid.uuid4().hex,
+            'spec': spec_name,
+            'format': export_format,
+            'compress': compress,
+            'user_id': user_id,
+            'status': 'queued',
+            'rows': 0,
+            'total': cls.selection_queryset(selection, user_id).count(),
+            'path': None,
+            'filename': cls.filename(EXPORTS[spec_name], export_format, compress),
+            'error': None,
+            'created_at': timezone.now().isoformat(),
+        }
+        cls._save_job(job)
+        run_export_job.delay(job['id'], selection)
+        return job
+
+    @classmethod
+    def run_job(cls, job_id: str, selection: Dict) -> Dict:
+        """
+        Write the export of a queued job to storage.
+
+        Args:
+            job_id: ID returned by start_job()
+            selection: Rows to export, from selection()
+
+        Returns:
+            dict: The finished job
+        """
+        job = cls.get_job(job_id)
+        if job is None:
+            raise ValueError(f"Export job {job_id} not found or expired")
+
+        spec = EXPORTS[job['spec']]
+        job['status'] = 'running'
+        cls._save_job(job)
+        last_saved = [0]
+
+        def progress(rows):
+            job['rows'] = rows
+            if rows - last_saved[0] >= cls.PROGRESS_INTERVAL:
+                last_saved[0] = rows
+                cls._save_job(job)
+
+        try:
+            queryset = cls.selection_queryset(selection, job['user_id'])
+            with tempfile.NamedTemporaryFile(suffix=f"_{job['filename']}") as handle:
+                for chunk in cls.iter_chunks(spec.name, queryset, job['format'], job['compress'], progress):
+                    handle.write(chunk)
+                handle.flush()
+                handle.seek(0)
+                job['path'] = cls.storage().save(f"{job_id}_{job['filename']}", File(handle))
+        except Exception as e:
+            logger.error(f"Export job {job_id} failed: {e}")
+            job.update(status='failed', error=str(e))
+            cls._save_job(job)
+            raise
+
+        job['status'] = 'done'
+        cls._save_job(job)
+        logger.info(f"Export job {job_id} wrote {job['rows']} rows to {job['path']}")
+        return job
+
+    @classmethod
+    def purge_files(cls, days: int = FILE_RETENTION_DAYS) -> int:
+        """
+        Delete export files older than some days from storage.
+
+        Args:
+            days: Age in days of the files to delete
+
+        Returns:
+            Number of files deleted
+        """
+        storage = cls.storage()
+        if not storage.exists(''):
+            return 0
+        cutoff = timezone.now() - timedelta(days=days)
+        deleted = 0
+        for name in storage.listdir('')[1]:
+            if storage.get_modified_time(name) < cutoff:
+                storage.delete(name)
+                deleted += 1
+        return deleted
+
+    @staticmethod
+    def progress(job: Dict) -> float:
+        """Get the share of rows written, in percent."""
+        if job['status'] == 'done':
+            return 100.0
+        return round(job['rows'] / job['total'] * 100, 1) if job['total'] else 0.0
@@ -0,0 +1,306 @@
+"""
+Shared LinkedIn API client resources.
+
+This module provides:
+- LinkedInClientPool: per-process pool of HTTP sessions and decrypted
+  credentials, shared by every LinkedInAPIService instance in a worker
+- LinkedInQuotaLedger: cache-backed daily quota counters and 429 backoff
+  shared by all workers, so quota checks hold across processes
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.core.cache import caches
+
+from ..performance import CacheManager
+
+
+logger = logging.getLogger(__name__)
+
+
+class LinkedInClientPool:
+    """
+    Per-process pool of LinkedIn HTTP sessions and decrypted credentials.
+
+    Sessions keep their connection pools between tasks, so a Celery worker
+    reuses TLS connections to LinkedIn instead of opening new ones for every
+    post. The pool is reset after a fork so child processes never share
+    sockets with their parent.
+    """
+
+    USER_AGENT = 'Django-Blog-LinkedIn-Integration/1.0'
+    POOL_CONNECTIONS = 4   # Distinct hosts kept per session
+    POOL_MAXSIZE = 10      # Connections kept per host
+    MAX_CREDENTIALS = 32   # Decrypted values kept per process
+
+    # Session kinds: 'api' for JSON API calls, 'upload' for image transfers
+    SESSION_HEADERS = {
+        'api': {'Content-Type': 'application/json'},
+        'upload': {},
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._sessions = {}
+        self._credentials = {}
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            self._reset()
+
+    def get_session(self, kind: str = 'api') -> requests.Session:
+        """
+        Get the shared session for a kind of request.
+
+        Args:
+            kind: 'api' or 'upload'
+
+        Returns:
+            requests.Session: Pooled session
+        """
+        with self._lock:
+            self._check_pid()
+            session = self._sessions.get(kind)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.POOL_CONNECTIONS, pool_maxsize=self.POOL_MAXSIZE)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update({'User-Agent': self.USER_AGENT, **self.SESSION_HEADERS[kind]})
+                self._sessions[kind] = session
+            return session
+
+    def get_credential(self, config, field: str) -> Optional[str]:
+        """
+        Get a decrypted credential field, decrypting it at most once per process.
+
+        Values are cached by ciphertext, so updated tokens are picked up as
+        soon as the config row changes.
+
+        Args:
+            config: LinkedInConfig instance
+            field: 'client_secret', 'access_token' or 'refresh_token'
+
+        Returns:
+            str: Decrypted value, or None/empty if not set or not decryptable
+        """
+        encrypted = getattr(config, field)
+        if not encrypted:
+            return encrypted
+
+        with self._lock:
+            self._check_pid()
+            value = self._credentials.get(encrypted)
+        if value is not None:
+            return value
+
+        value = getattr(config, f'get_{field}')()
+        if value is not None:
+            with self._lock:
+                if len(self._credentials) >= self.MAX_CREDENTIALS:
+                    self._credentials.clear()
+                self._credentials[encrypted] = value
+        return value
+
+    def close(self):
+        """Close all pooled sessions."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._reset()
+
+
+class LinkedInQuotaLedger:
+    """
+    Cache-backed quota and rate limit ledger shared by all workers.
+
+    Daily usage is kept in one counter per quota per UTC day. Requests reserve
+    quota with an atomic increment before calling LinkedIn and release it if
+    the call fails, so concurrent workers can't overshoot the limit. 429
+    responses record a backoff deadline that every worker honours.
+
+    The increment is only atomic on Redis, Memcached or LocMemCache. On other
+    backends, such as the DatabaseCache fallback, reservations read and write
+    the counter under a short cache lock instead.
+    """
+
+    # LinkedIn daily limits
+    QUOTA_LIMITS = {
+        'posts': 100,
+        'media': 50,
+    }
+
+    LOCK_TIMEOUT = 10   # Seconds before a crashed holder's lock expires
+    LOCK_WAIT = 5       # Seconds to wait for the lock before giving up
+
+    def __init__(self, limits: Dict[str, int] = None, cache_alias: str = 'default',
+                 prefix: str = 'linkedin_quota'):
+        self.limits = {**self.QUOTA_LIMITS, **(limits or {})}
+        self.cache_alias = cache_alias
+        self.prefix = prefix
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _now(self) -> datetime:
+        return datetime.now(dt_timezone.utc)
+
+    def _usage_key(self, quota: str) -> str:
+        return f"{self.prefix}:{quota}:{self._now():%Y%m%d}"
+
+    def _lock_key(self, quota: str) -> str:
+        return f"{self.prefix}:{quota}:lock"
+
+    def _backoff_key(self) -> str:
+        return f"{self.prefix}:backoff_until"
+
+    def seconds_until_reset(self) -> int:
+        """Get the number of seconds until daily quotas reset (UTC midnight)."""
+        now = self._now()
+        midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return max(1, int((midnight - now).total_seconds()))
+
+    def get_usage(self, quota: str) -> int:
+        """Get today's usage for a quota."""
+        return self.cache.get(self._usage_key(quota), 0)
+
+    def is_exhausted(self, quota: str) -> bool:
+        """Check if today's quota has been used up."""
+        return self.get_usage(quota) >= self.limits[quota]
+
+    def try_acquire(self, quota: str) -> bool:
+        """
+        Atomically reserve one unit of quota.
+
+        Args:
+            quota: Quota name ('posts' or 'media')
+
+        Returns:
+            bool: True if the unit was reserved, False if the quota is used up
+        """
+        cache = self.cache
+        if not CacheManager.has_atomic_counters(cache):
+            return self._update_locked(quota, 1)
+
+        key = self._usage_key(quota)
+        try:
+            used = cache.incr(key)
+        except ValueError:
+            cache.add(key, 0, timeout=self.seconds_until_reset() + 3600)
+            used = cache.incr(key)
+
+        if used > self.limits[quota]:
+            self.release(quota)
+            return False
+        return True
+
+    def release(self, quota: str):
+        """Return a reserved unit of quota after a failed request."""
+        if not CacheManager.has_atomic_counters(self.cache):
+            self._update_locked(quota, -1)
+            return
+        try:
+            self.cache.decr(self._usage_key(quota))
+        except ValueError:
+            pass
+
+    def _update_locked(self, quota: str, delta: int) -> bool:
+        """
+        Change today's usage under a lock, for caches without atomic incr().
+
+        Args:
+            quota: Quota name
+            delta: 1 to reserve a unit, -1 to release one
+
+        Returns:
+            bool: False if a reservation would exceed the limit or the lock
+            couldn't be taken
+        """
+        cache = self.cache
+        lock_key = self._lock_key(quota)
+        deadline = time.monotonic() + self.LOCK_WAIT
+        # Reading the lock deletes it once expired, so add() inserts a row and
+        # the unique cache key lets one caller win (DatabaseCache.add() would
+        # overwrite an expired row for every caller)
+        while cache.get(lock_key) is not None or not cache.add(lock_key, 1, timeout=self.LOCK_TIMEOUT):
+            if time.monotonic() >= deadline:
+                logger.warning(f"Timed out waiting for the LinkedIn {quota} quota lock")
+                return False
+            time.sleep(0.05)
+
+        try:
+            key = self._usage_key(quota)
+            used = cache.get(key, 0)
+            if delta > 0 and used + delta > self.limits[quota]:
+                return False
+            cache.set(key, max(0, used + delta), timeout=self.seconds_until_reset() + 3600)
+            return True
+        finally:
+            cache.delete(lock_key)
+
+    def exhaust(self, quota: str):
+        """Mark today's quota as used up (LinkedIn reported a daily limit)."""
+        self.cache.set(self._usage_key(quota), self.limits[quota], timeout=self.seconds_until_reset() + 3600)
+
+    def record_backoff(self, retry_after: int):
+        """
+        Record a 429 backoff for all workers.
+
+        An existing later deadline is kept.
+
+        Args:
+            retry_after: Seconds to wait before calling LinkedIn again
+        """
+        until = time.time() + retry_after
+        current = self.cache.get(self._backoff_key())
+        if current is None or until > current:
+            self.cache.set(self._backoff_key(), until, timeout=int(retry_after) + 1)
+
+    def get_backoff_remaining(self) -> int:
+        """Get the number of seconds left on the shared 429 backoff."""
+        until = self.cache.get(self._backoff_key())
+        if until is None:
+            return 0
+        return max(0, int(until - time.time() + 0.999))
+
+    def get_wait_seconds(self, quota: str = 'posts') -> int:
+        """
+        Get how long callers should wait before using a quota.
+
+        Args:
+            quota: Quota name
+
+        Returns:
+            int: Seconds until the backoff ends or the daily quota resets, 0 if available now
+        """
+        wait_seconds = self.get_backoff_remaining()
+        if self.is_exhausted(quota):
+            wait_seconds = max(wait_seconds, self.seconds_until_reset())
+        return wait_seconds
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get usage, limits and backoff for reporting."""
+        return {
+            'quotas': {
+                quota: {'used': self.get_usage(quota), 'limit': limit}
+                for quota, limit in self.limits.items()
+            },
+            'backoff_remaining': self.get_backoff_remaining(),
+            'reset_in': self.seconds_until_reset(),
+        }
+
+
+# Per-process client pool shared by all LinkedInAPIService instances
+linkedin_client_pool = LinkedInClientPool()
@@ -12,10 +12,9 @@ import time
 import random
 import logging
 from typing import Dict, Any, Optional, Callable, Tuple, List
-from datetime import datetime, timedelta
 from django.utils import timezone
-from django.core.cache import cache
 from django.conf import settings
+from ..utils.metrics_store import MetricsStore
 from .linkedin_error_logger import LinkedInErrorLogger
 
 
@@ -170,6 +169,7 @@ class LinkedInImageErrorHandler:
         self.error_logger = LinkedInErrorLogger()
         self.cache_prefix = 'linkedin_image_error_handler'
         self.metrics_cache_ttl = 3600  # 1 hour
+        self.metrics = MetricsStore(self.cache_prefix, window_seconds=3600, retention_windows=24)
         
         # Performance thresholds
         self.performance_thresholds = {
@@ -528,32 +528,8 @@ class LinkedInImageErrorHandler:
             error_details: Error details
             processing_step: Processing step where error occurred
         """
-        metrics_key = f"{self.cache_prefix}_processing_metrics"
-        
-        current_metrics = cache.get(metrics_key, {
-            'total_attempts': 0,
-            'total_errors': 0,
-            'error_by_step': {},
-            'error_by_code': {},
-            'last_updated': timezone.now().isoformat()
-        })
-        
-        current_metrics['total_attempts'] += 1
-        current_metrics['total_errors'] += 1
-        current_metrics['last_updated'] = timezone.now().isoformat()
-        
-        # Track errors by processing step
-        if processing_step not in current_metrics['error_by_step']:
-            current_metrics['error_by_step'][processing_step] = 0
-        current_metrics['error_by_step'][processing_step] += 1
-        
-        # Track errors by error code
-        error_code = error_details.get('error_code', 'UNKNOWN_ERROR')
-        if error_code not in current_metrics['error_by_code']:
-            current_metrics['error_by_code'][error_code] = 0
-        current_metrics['error_by_code'][error_code] += 1
-        
-        cache.set(metrics_key, current_metrics, timeout=self.metrics_cache_ttl)
+        self.metrics.incr('processing_errors_by_step', processing_step)
+        self.metrics.incr('processing_errors_by_code', error_details.get('error_code', 'UNKNOWN_ERROR'))
     
     def _update_upload_metrics(self, error_details: Dict[str, Any], upload_stage: str):
         """
@@ -563,32 +539,32 @@ class LinkedInImageErrorHandler:
             error_details: Error details
             upload_stage: Upload stage where error occurred
         """
-        metrics_key = f"{self.cache_prefix}_upload_metrics"
-        
-        current_metrics = cache.get(metrics_key, {
-            'total_attempts': 0,
-            'total_errors': 0,
-            'error_by_stage': {},
-            'error_by_code': {},
-            'last_updated': timezone.now().isoformat()
-        })
-        
-        current_metrics['total_attempts'] += 1
-        current_metrics['total_errors'] += 1
-        current_metrics['last_updated'] = timezone.now().isoformat()
+        self.metrics.incr('upload_errors_by_stage', upload_stage)
+        self.metrics.incr('upload_errors_by_code', error_details.get('error_code', 'UNKNOWN_ERROR'))
+    
+    def _get_error_metrics(self, operation: str, location: str, hours: int = None) -> Dict[str, Any]:
+        """
+        Build the error metrics summary for processing or upload errors.
         
-        # Track errors by upload stage
-        if upload_stage not in current_metrics['error_by_stage']:
-            current_metrics['error_by_stage'][upload_stage] = 0
-        current_metrics['error_by_stage'][upload_stage] += 1
+        Args:
+            operation: 'processing' or 'upload'
+            location: Name of the per-location breakdown ('step' or 'stage')
+            hours: Number of hourly windows to aggregate (default: full retention)
+        """
+        error_by_location = self.metrics.get_counters(f"{operation}_errors_by_{location}", windows=hours)
+        error_by_code = self.metrics.get_counters(f"{operation}_errors_by_code", windows=hours)
+        total_errors = sum(error_by_code.values())
         
-        # Track errors by error code
-        error_code = error_details.get('error_code', 'UNKNOWN_ERROR')
-        if error_code not in current_metrics['error_by_code']:
-            current_metrics['error_by_code'][error_code] = 0
-        current_metrics['error_by_code'][error_code] += 1
+        if not total_errors:
+            return {}
         
-        cache.set(metrics_key, current_metrics, timeout=self.metrics_cache_ttl)
+        return {
+            # Only failures reach the error handler, so attempts equal errors here
+            'total_attempts': total_errors,
+            'total_errors': total_errors,
+            f'error_by_{location}': {key: value for key, value in error_by_location.items() if value},
+            'error_by_code': {key: value for key, value in error_by_code.items() if value},
+        }
     
     def _check_processing_alert_thresholds(self, error_details: Dict[str, Any], processing_step: str):
         """
@@ -598,8 +574,7 @@ class LinkedInImageErrorHandler:
             error_details: Error details
             processing_step: Processing step where error occurred
         """
-        metrics_key = f"{self.cache_prefix}_processing_metrics"
-        metrics = cache.get(metrics_key, {})
+        metrics = self._get_error_metrics('processing', 'step', hours=1)
         
         total_attempts = metrics.get('total_attempts', 0)
         total_errors = metrics.get('total_errors', 0)
@@ -631,8 +606,7 @@ class LinkedInImageErrorHandler:
             error_details: Error details
             upload_stage: Upload stage where error occurred
         """
-        metrics_key = f"{self.cache_prefix}_upload_metrics"
-        metrics = cache.get(metrics_key, {})
+        metrics = self._get_error_metrics('upload', 'stage', hours=1)
         
         total_attempts = metrics.get('total_attempts', 0)
         total_errors = metrics.get('total_errors', 0)
@@ -669,11 +643,8 @@ class LinkedInImageErrorHandler:
         logger.info(f"Retry attempt {attempt}: {error} (waiting {delay:.2f}s)")
         
         # Store retry metrics
-        retry_key = f"{self.cache_prefix}_retry_metrics"
-        retry_metrics = cache.get(retry_key, {'attempts': 0, 'total_delay': 0})
-        retry_metrics['attempts'] += 1
-        retry_metrics['total_delay'] += delay
-        cache.set(retry_key, retry_metrics, timeout=self.metrics_cache_ttl)
+        self.metrics.incr('retry_attempts')
+        self.metrics.incr('retry_delay_ms', amount=int(round(delay * 1000)))
     
     def _log_retry_success(self, retry_info: Dict[str, Any], context: Dict[str, Any] = None):
         """
@@ -705,9 +676,13 @@ class LinkedInImageErrorHandler:
         Returns:
             dict: Error metrics summary
         """
-        processing_metrics = cache.get(f"{self.cache_prefix}_processing_metrics", {})
-        upload_metrics = cache.get(f"{self.cache_prefix}_upload_metrics", {})
-        retry_metrics = cache.get(f"{self.cache_prefix}_retry_metrics", {})
+        processing_metrics = self._get_error_metrics('processing', 'step')
+        upload_metrics = self._get_error_metrics('upload', 'stage')
+        retry_attempts = self.metrics.get_counter('retry_attempts')
+        retry_metrics = {
+            'attempts': retry_attempts,
+            'total_delay': self.metrics.get_counter('retry_delay_ms') / 1000.0,
+        } if retry_attempts else {}
         
         summary = {
             'generated_at': timezone.now().isoformat(),
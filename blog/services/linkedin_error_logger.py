@@ -8,11 +8,12 @@ including authentication failures, rate limiting, content errors, and more.
 import logging
 import json
 from typing import Dict, Any, Optional
-from datetime import datetime
 from django.utils import timezone
 from django.core.cache import cache
 from django.conf import settings
 
+from blog.utils.metrics_store import MetricsStore
+
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +46,7 @@ class LinkedInErrorLogger:
     def __init__(self):
         self.cache_prefix = 'linkedin_error_metrics'
         self.cache_ttl = 3600  # 1 hour
+        self.metrics = MetricsStore(self.cache_prefix, window_seconds=self.cache_ttl, retention_windows=24)
     
     def log_authentication_error(self, error_details: Dict[str, Any], context: Optional[Dict] = None):
         """
@@ -369,26 +371,40 @@ class LinkedInErrorLogger:
     
     def _update_error_metrics(self, structured_log: Dict[str, Any]):
         """
-        Update cached error metrics for monitoring.
+        Update error metrics for monitoring.
         
         Args:
             structured_log: Structured log entry
         """
-        cache_key = f"{self.cache_prefix}_{structured_log['category']}"
-        
-        current_metrics = cache.get(cache_key, {
-            'count': 0,
-            'last_occurrence': None,
-            'severity_counts': {}
-        })
-        
-        current_metrics['count'] += 1
-        current_metrics['last_occurrence'] = structured_log['timestamp']
+        category = structured_log['category']
+        self.metrics.incr(f"{category}_errors", structured_log['severity'])
+        cache.set(f"{self.cache_prefix}_{category}_last_occurrence", structured_log['timestamp'],
+                  timeout=self.metrics.ttl)
+    
+    def get_category_metrics(self, category: str, hours: int = None) -> Dict[str, Any]:
+        """
+        Get error metrics for a category.
         
-        severity = structured_log['severity']
-        current_metrics['severity_counts'][severity] = current_metrics['severity_counts'].get(severity, 0) + 1
+        Args:
+            category: Error category
+            hours: Number of hours to aggregate (default: full retention)
+            
+        Returns:
+            dict: count, last_occurrence and severity_counts, or {} if no errors
+        """
+        severity_counts = {
+            severity: count
+            for severity, count in self.metrics.get_counters(f"{category}_errors", windows=hours).items()
+            if count
+        }
+        if not severity_counts:
+            return {}
         
-        cache.set(cache_key, current_metrics, timeout=self.cache_ttl)
+        return {
+            'count': sum(severity_counts.values()),
+            'last_occurrence': cache.get(f"{self.cache_prefix}_{category}_last_occurrence"),
+            'severity_counts': severity_counts
+        }
     
     def _check_alert_thresholds(self, structured_log: Dict[str, Any]):
         """
@@ -402,8 +418,7 @@ class LinkedInErrorLogger:
             logger.critical(f"ALERT: Critical LinkedIn error detected: {structured_log['error_message']}")
         
         # Check for error frequency thresholds
-        cache_key = f"{self.cache_prefix}_{structured_log['category']}"
-        metrics = cache.get(cache_key, {})
+        metrics = self.get_category_metrics(structured_log['category'], hours=1)
         
         error_count = metrics.get('count', 0)
         
@@ -462,29 +477,13 @@ class LinkedInErrorLogger:
         """
         Track rate limiting patterns for analysis.
         
+        Occurrences are counted per hourly window, so the last 24 hours are
+        available without keeping a list of timestamps.
+        
         Args:
             structured_log: Structured log entry
         """
-        pattern_key = f"{self.cache_prefix}_rate_limit_pattern"
-        
-        current_pattern = cache.get(pattern_key, {
-            'occurrences': [],
-            'quota_types': {}
-        })
-        
-        current_pattern['occurrences'].append(structured_log['timestamp'])
-        
-        quota_type = structured_log.get('quota_type', 'unknown')
-        current_pattern['quota_types'][quota_type] = current_pattern['quota_types'].get(quota_type, 0) + 1
-        
-        # Keep only last 24 hours of occurrences
-        cutoff_time = timezone.now() - timezone.timedelta(hours=24)
-        current_pattern['occurrences'] = [
-            occurrence for occurrence in current_pattern['occurrences']
-            if datetime.fromisoformat(occurrence.replace('Z', '+00:00')) > cutoff_time
-        ]
-        
-        cache.set(pattern_key, current_pattern, timeout=86400)  # 24 hours
+        self.metrics.incr('rate_limit_quota_types', structured_log.get('quota_type') or 'unknown')
     
     def _track_content_error_patterns(self, structured_log: Dict[str, Any]):
         """
@@ -493,22 +492,13 @@ class LinkedInErrorLogger:
         Args:
             structured_log: Structured log entry
         """
-        pattern_key = f"{self.cache_prefix}_content_error_pattern"
-        
-        current_pattern = cache.get(pattern_key, {
-            'issue_types': {},
-            'content_lengths': []
-        })
-        
-        potential_issues = structured_log.get('potential_issues', [])
-        for issue in potential_issues:
-            current_pattern['issue_types'][issue] = current_pattern['issue_types'].get(issue, 0) + 1
+        for issue in structured_log.get('potential_issues', []):
+            self.metrics.incr('content_error_issue_types', issue)
         
         content_length = structured_log.get('content_length', 0)
         if content_length > 0:
-            current_pattern['content_lengths'].append(content_length)
-        
-        cache.set(pattern_key, current_pattern, timeout=self.cache_ttl)
+            self.metrics.incr('content_error_lengths', 'count')
+            self.metrics.incr('content_error_lengths', 'total', content_length)
     
     def _track_fallback_patterns(self, structured_log: Dict[str, Any]):
         """
@@ -517,26 +507,11 @@ class LinkedInErrorLogger:
         Args:
             structured_log: Structured log entry
         """
-        pattern_key = f"{self.cache_prefix}_fallback_pattern"
-        
-        current_pattern = cache.get(pattern_key, {
-            'fallback_types': {},
-            'success_rates': {}
-        })
-        
-        fallback_type = structured_log.get('fallback_type', 'unknown')
-        current_pattern['fallback_types'][fallback_type] = current_pattern['fallback_types'].get(fallback_type, 0) + 1
-        
-        # Track success rates
-        if fallback_type not in current_pattern['success_rates']:
-            current_pattern['success_rates'][fallback_type] = {'attempts': 0, 'successes': 0}
-        
-        current_pattern['success_rates'][fallback_type]['attempts'] += 1
+        fallback_type = structured_log.get('fallback_type') or 'unknown'
+        self.metrics.incr('fallback_attempts', fallback_type)
         
         if structured_log.get('fallback_result', {}).get('fallback_success'):
-            current_pattern['success_rates'][fallback_type]['successes'] += 1
-        
-        cache.set(pattern_key, current_pattern, timeout=self.cache_ttl)
+            self.metrics.incr('fallback_successes', fallback_type)
     
     def _track_media_upload_patterns(self, structured_log: Dict[str, Any]):
         """
@@ -545,31 +520,56 @@ class LinkedInErrorLogger:
         Args:
             structured_log: Structured log entry
         """
-        pattern_key = f"{self.cache_prefix}_media_upload_pattern"
-        
-        current_pattern = cache.get(pattern_key, {
-            'issue_types': {},
-            'image_formats': {},
-            'fallback_usage': 0,
-            'total_attempts': 0
-        })
-        
-        current_pattern['total_attempts'] += 1
-        
-        # Track issue types
-        issue_type = structured_log.get('media_issue_type', 'unknown')
-        current_pattern['issue_types'][issue_type] = current_pattern['issue_types'].get(issue_type, 0) + 1
+        self.metrics.incr('media_upload_issue_types', structured_log.get('media_issue_type') or 'unknown')
         
         # Track image formats that fail
         image_format = structured_log.get('image_format')
         if image_format:
-            current_pattern['image_formats'][image_format] = current_pattern['image_formats'].get(image_format, 0) + 1
+            self.metrics.incr('media_upload_image_formats', image_format)
         
         # Track fallback usage
         if structured_log.get('fallback_used'):
-            current_pattern['fallback_usage'] += 1
+            self.metrics.incr('media_upload_fallbacks')
+    
+    def get_pattern_metrics(self, hours: int = None) -> Dict[str, Any]:
+        """
+        Get rate limit, content, fallback and media upload error patterns.
         
-        cache.set(pattern_key, current_pattern, timeout=self.cache_ttl)
+        Args:
+            hours: Number of hours to aggregate (default: full retention)
+            
+        Returns:
+            dict: Pattern counters keyed by pattern type
+        """
+        fallback_attempts = self.metrics.get_counters('fallback_attempts', windows=hours)
+        fallback_successes = self.metrics.get_counters('fallback_successes', labels=fallback_attempts, windows=hours)
+        content_lengths = self.metrics.get_counters('content_error_lengths', labels=['count', 'total'], windows=hours)
+        media_issue_types = self.metrics.get_counters('media_upload_issue_types', windows=hours)
+        
+        return {
+            'rate_limit': {
+                'quota_types': self.metrics.get_counters('rate_limit_quota_types', windows=hours),
+            },
+            'content_error': {
+                'issue_types': self.metrics.get_counters('content_error_issue_types', windows=hours),
+                'average_content_length': (
+                    content_lengths['total'] / content_lengths['count'] if content_lengths['count'] else 0
+                ),
+            },
+            'fallback': {
+                'fallback_types': fallback_attempts,
+                'success_rates': {
+                    fallback_type: {'attempts': attempts, 'successes': fallback_successes.get(fallback_type, 0)}
+                    for fallback_type, attempts in fallback_attempts.items()
+                },
+            },
+            'media_upload': {
+                'issue_types': media_issue_types,
+                'image_formats': self.metrics.get_counters('media_upload_image_formats', windows=hours),
+                'fallback_usage': self.metrics.get_counter('media_upload_fallbacks', windows=hours),
+                'total_attempts': sum(media_issue_types.values()),
+            },
+        }
     
     def get_error_summary(self, hours: int = 24) -> Dict[str, Any]:
         """
@@ -600,8 +600,7 @@ class LinkedInErrorLogger:
         ]
         
         for category in categories:
-            cache_key = f"{self.cache_prefix}_{category}"
-            metrics = cache.get(cache_key, {})
+            metrics = self.get_category_metrics(category, hours=hours)
             
             if metrics:
                 summary['categories'][category] = metrics
@@ -14,6 +14,7 @@ from django.core.cache import cache
 from django.db.models import Count, Q
 from django.conf import settings
 from ..linkedin_models import LinkedInPost
+from ..utils.metrics_store import MetricsStore
 from .linkedin_error_logger import LinkedInErrorLogger
 
 
@@ -35,6 +36,7 @@ class LinkedInImageMonitor:
     def __init__(self):
         self.cache_prefix = 'linkedin_image_monitor'
         self.cache_ttl = 3600  # 1 hour
+        self.metrics = MetricsStore(self.cache_prefix, window_seconds=3600, retention_windows=24)
         self.error_logger = LinkedInErrorLogger()
         
         # Monitoring thresholds
@@ -280,27 +282,30 @@ class LinkedInImageMonitor:
         dashboard_data = {
             'generated_at': timezone.now().isoformat(),
             'period_hours': hours,
-            'overview': self._get_overview_metrics(),
-            'processing_metrics': self._get_processing_metrics(),
-            'upload_metrics': self._get_upload_metrics(),
-            'performance_metrics': self._get_performance_metrics(),
+            'overview': self._get_overview_metrics(hours),
+            'processing_metrics': self._get_processing_metrics(hours),
+            'upload_metrics': self._get_upload_metrics(hours),
+            'performance_metrics': self._get_performance_metrics(hours),
             'error_analysis': self._get_error_analysis(),
             'trends': self._get_trend_analysis(hours),
-            'alerts': self._get_active_alerts(),
-            'recommendations': self._get_recommendations()
+            'alerts': self._get_active_alerts(hours),
+            'recommendations': self._get_recommendations(hours)
         }
         
         return dashboard_data
     
-    def get_success_rates(self) -> Dict[str, float]:
+    def get_success_rates(self, hours: int = None) -> Dict[str, float]:
         """
         Get current success rates for different operations.
         
+        Args:
+            hours: Number of hours to aggregate (default: full retention)
+        
         Returns:
             dict: Success rates by operation type
         """
-        processing_metrics = cache.get(f"{self.cache_prefix}_processing_metrics", {})
-        upload_metrics = cache.get(f"{self.cache_prefix}_upload_metrics", {})
+        processing_metrics = self._get_processing_metrics(hours)
+        upload_metrics = self._get_upload_metrics(hours)
         
         success_rates = {}
         
@@ -325,8 +330,9 @@ class LinkedInImageMonitor:
                 success_rates[f'upload_{stage}'] = 0.0
         
         # Calculate overall success rate
-        total_attempts = sum(metrics.get('attempts', 0) for metrics in {**processing_metrics, **upload_metrics}.values())
-        total_successes = sum(metrics.get('successes', 0) for metrics in {**processing_metrics, **upload_metrics}.values())
+        all_metrics = list(processing_metrics.values()) + list(upload_metrics.values())
+        total_attempts = sum(metrics.get('attempts', 0) for metrics in all_metrics)
+        total_successes = sum(metrics.get('successes', 0) for metrics in all_metrics)
         
         if total_attempts > 0:
             success_rates['overall'] = total_successes / total_attempts
@@ -335,6 +341,9 @@ class LinkedInImageMonitor:
         
         return success_rates
     
+    # Counter names per metric type ('attempt' -> 'attempts', ...)
+    OUTCOME_COUNTERS = {'attempt': 'attempts', 'success': 'successes', 'failure': 'failures'}
+    
     def _update_step_metrics(self, step: str, metric_type: str):
         """
         Update metrics for a specific processing step.
@@ -343,21 +352,7 @@ class LinkedInImageMonitor:
             step: Processing step name
             metric_type: Type of metric ('attempt', 'success', 'failure')
         """
-        metrics_key = f"{self.cache_prefix}_processing_metrics"
-        current_metrics = cache.get(metrics_key, {})
-        
-        if step not in current_metrics:
-            current_metrics[step] = {
-                'attempts': 0,
-                'successes': 0,
-                'failures': 0,
-                'last_updated': timezone.now().isoformat()
-            }
-        
-        current_metrics[step][f'{metric_type}s'] += 1
-        current_metrics[step]['last_updated'] = timezone.now().isoformat()
-        
-        cache.set(metrics_key, current_metrics, timeout=self.cache_ttl)
+        self.metrics.incr(f"processing_{self.OUTCOME_COUNTERS[metric_type]}", step)
     
     def _update_upload_metrics(self, stage: str, metric_type: str):
         """
@@ -367,21 +362,7 @@ class LinkedInImageMonitor:
             stage: Upload stage name
             metric_type: Type of metric ('attempt', 'success', 'failure')
         """
-        metrics_key = f"{self.cache_prefix}_upload_metrics"
-        current_metrics = cache.get(metrics_key, {})
-        
-        if stage not in current_metrics:
-            current_metrics[stage] = {
-                'attempts': 0,
-                'successes': 0,
-                'failures': 0,
-                'last_updated': timezone.now().isoformat()
-            }
-        
-        current_metrics[stage][f'{metric_type}s'] += 1
-        current_metrics[stage]['last_updated'] = timezone.now().isoformat()
-        
-        cache.set(metrics_key, current_metrics, timeout=self.cache_ttl)
+        self.metrics.incr(f"upload_{self.OUTCOME_COUNTERS[metric_type]}", stage)
     
     def _update_performance_metrics(self, step: str, processing_time: float):
         """
@@ -391,26 +372,7 @@ class LinkedInImageMonitor:
             step: Processing step name
             processing_time: Time taken in seconds
         """
-        perf_key = f"{self.cache_prefix}_performance_{step}"
-        current_perf = cache.get(perf_key, {
-            'total_time': 0.0,
-            'count': 0,
-            'min_time': float('inf'),
-            'max_time': 0.0,
-            'times': []
-        })
-        
-        current_perf['total_time'] += processing_time
-        current_perf['count'] += 1
-        current_perf['min_time'] = min(current_perf['min_time'], processing_time)
-        current_perf['max_time'] = max(current_perf['max_time'], processing_time)
-        
-        # Keep last 100 times for percentile calculations
-        current_perf['times'].append(processing_time)
-        if len(current_perf['times']) > 100:
-            current_perf['times'] = current_perf['times'][-100:]
-        
-        cache.set(perf_key, current_perf, timeout=self.cache_ttl)
+        self.metrics.observe('processing_time', processing_time, step)
     
     def _update_upload_performance_metrics(self, stage: str, upload_time: float):
         """
@@ -420,26 +382,7 @@ class LinkedInImageMonitor:
             stage: Upload stage name
             upload_time: Time taken in seconds
         """
-        perf_key = f"{self.cache_prefix}_upload_performance_{stage}"
-        current_perf = cache.get(perf_key, {
-            'total_time': 0.0,
-            'count': 0,
-            'min_time': float('inf'),
-            'max_time': 0.0,
-            'times': []
-        })
-        
-        current_perf['total_time'] += upload_time
-        current_perf['count'] += 1
-        current_perf['min_time'] = min(current_perf['min_time'], upload_time)
-        current_perf['max_time'] = max(current_perf['max_time'], upload_time)
-        
-        # Keep last 100 times for percentile calculations
-        current_perf['times'].append(upload_time)
-        if len(current_perf['times']) > 100:
-            current_perf['times'] = current_perf['times'][-100:]
-        
-        cache.set(perf_key, current_perf, timeout=self.cache_ttl)
+        self.metrics.observe('upload_time', upload_time, stage)
     
     def _check_performance_thresholds(self, step: str, processing_time: float):
         """
@@ -474,10 +417,7 @@ class LinkedInImageMonitor:
         Args:
             step: Processing step name
         """
-        metrics_key = f"{self.cache_prefix}_processing_metrics"
-        metrics = cache.get(metrics_key, {})
-        
-        step_metrics = metrics.get(step, {})
+        step_metrics = self._get_outcome_counters('processing', [step], windows=1).get(step, {})
         attempts = step_metrics.get('attempts', 0)
         failures = step_metrics.get('failures', 0)
         
@@ -496,10 +436,7 @@ class LinkedInImageMonitor:
         Args:
             stage: Upload stage name
         """
-        metrics_key = f"{self.cache_prefix}_upload_metrics"
-        metrics = cache.get(metrics_key, {})
-        
-        stage_metrics = metrics.get(stage, {})
+        stage_metrics = self._get_outcome_counters('upload', [stage], windows=1).get(stage, {})
         attempts = stage_metrics.get('attempts', 0)
         failures = stage_metrics.get('failures', 0)
         
@@ -511,62 +448,73 @@ class LinkedInImageMonitor:
             elif error_rate > self.thresholds['error_rate_warning']:
                 logger.warning(f"WARNING: High upload error rate for {stage}: {error_rate:.2%}")
     
-    def _get_overview_metrics(self) -> Dict[str, Any]:
+    def _get_outcome_counters(self, operation: str, labels: List[str] = None,
+                              windows: int = None) -> Dict[str, Dict[str, int]]:
+        """
+        Get attempt/success/failure counters for an operation keyed by step or stage.
+        
+        Args:
+            operation: 'processing' or 'upload'
+            labels: Steps/stages to read (default: every recorded one)
+            windows: Number of hourly windows to aggregate
+        """
+        if labels is None:
+            labels = set()
+            for counter in self.OUTCOME_COUNTERS.values():
+                labels.update(self.metrics.get_labels(f"{operation}_{counter}"))
+        
+        metrics = {label: {} for label in sorted(labels)}
+        for counter in self.OUTCOME_COUNTERS.values():
+            totals = self.metrics.get_counters(f"{operation}_{counter}", metrics.keys(), windows)
+            for label, total in totals.items():
+                metrics[label][counter] = total
+        return metrics
+    
+    def _get_overview_metrics(self, hours: int = None) -> Dict[str, Any]:
         """Get overview metrics for the dashboard."""
-        success_rates = self.get_success_rates()
+        success_rates = self.get_success_rates(hours)
         
         return {
             'overall_success_rate': success_rates.get('overall', 0.0),
-            'total_operations': self._get_total_operations(),
-            'active_alerts': len(self._get_active_alerts()),
+            'total_operations': self._get_total_operations(hours),
+            'active_alerts': len(self._get_active_alerts(hours)),
             'system_health': self._determine_system_health(success_rates)
         }
     
-    def _get_processing_metrics(self) -> Dict[str, Any]:
+    def _get_processing_metrics(self, hours: int = None) -> Dict[str, Any]:
         """Get processing-specific metrics."""
-        return cache.get(f"{self.cache_prefix}_processing_metrics", {})
+        return self._get_outcome_counters('processing', windows=hours)
     
-    def _get_upload_metrics(self) -> Dict[str, Any]:
+    def _get_upload_metrics(self, hours: int = None) -> Dict[str, Any]:
         """Get upload-specific metrics."""
-        return cache.get(f"{self.cache_prefix}_upload_metrics", {})
+        return self._get_outcome_counters('upload', windows=hours)
+    
+    def get_processing_metrics(self, hours: int = None) -> Dict[str, Any]:
+        """
+        Get attempt/success/failure counts per processing step.
+        
+        Args:
+            hours: Number of hours to aggregate (default: full retention)
+        """
+        return self._get_processing_metrics(hours)
     
-    def _get_performance_metrics(self) -> Dict[str, Any]:
+    def get_upload_metrics(self, hours: int = None) -> Dict[str, Any]:
+        """
+        Get attempt/success/failure counts per upload stage.
+        
+        Args:
+            hours: Number of hours to aggregate (default: full retention)
+        """
+        return self._get_upload_metrics(hours)
+    
+    def _get_performance_metrics(self, hours: int = None) -> Dict[str, Any]:
         """Get performance metrics with averages and percentiles."""
         performance_data = {}
         
-        # Get all performance cache keys
-        cache_keys = [
-            key for key in cache._cache.keys() 
-            if key.startswith(f"{self.cache_prefix}_performance_") or 
-               key.startswith(f"{self.cache_prefix}_upload_performance_")
-        ]
-        
-        for key in cache_keys:
-            perf_data = cache.get(key, {})
-            if perf_data.get('count', 0) > 0:
-                times = perf_data.get('times', [])
-                
-                # Calculate statistics
-                avg_time = perf_data['total_time'] / perf_data['count']
-                
-                stats = {
-                    'average_time': avg_time,
-                    'min_time': perf_data.get('min_time', 0),
-                    'max_time': perf_data.get('max_time', 0),
-                    'count': perf_data['count']
-                }
-                
-                # Calculate percentiles if we have enough data
-                if len(times) >= 10:
-                    sorted_times = sorted(times)
-                    stats.update({
-                        'p50': sorted_times[len(sorted_times) // 2],
-                        'p90': sorted_times[int(len(sorted_times) * 0.9)],
-                        'p95': sorted_times[int(len(sorted_times) * 0.95)]
-                    })
-                
-                operation_name = key.replace(f"{self.cache_prefix}_", "").replace("_performance_", "_")
-                performance_data[operation_name] = stats
+        for operation, histogram_name in (('processing', 'processing_time'), ('upload', 'upload_time')):
+            for label, histogram in self.metrics.get_histograms(histogram_name, windows=hours).items():
+                if histogram.count > 0:
+                    performance_data[f"{operation}_{label}"] = histogram.summary()
         
         return performance_data
     
@@ -584,10 +532,10 @@ class LinkedInImageMonitor:
             'note': 'Trend analysis requires historical data collection'
         }
     
-    def _get_active_alerts(self) -> List[Dict[str, Any]]:
+    def _get_active_alerts(self, hours: int = None) -> List[Dict[str, Any]]:
         """Get list of active alerts."""
         alerts = []
-        success_rates = self.get_success_rates()
+        success_rates = self.get_success_rates(hours)
         
         # Check success rate alerts
         for operation, rate in success_rates.items():
@@ -608,10 +556,10 @@ class LinkedInImageMonitor:
         
         return alerts
     
-    def _get_recommendations(self) -> List[str]:
+    def _get_recommendations(self, hours: int = None) -> List[str]:
         """Get system recommendations based on current metrics."""
         recommendations = []
-        success_rates = self.get_success_rates()
+        success_rates = self.get_success_rates(hours)
         
         overall_rate = success_rates.get('overall', 0.0)
         
@@ -633,18 +581,11 @@ class LinkedInImageMonitor:
         
         return recommendations
     
-    def _get_total_operations(self) -> int:
+    def _get_total_operations(self, hours: int = None) -> int:
         """Get total number of operations performed."""
-        processing_metrics = cache.get(f"{self.cache_prefix}_processing_metrics", {})
-        upload_metrics = cache.get(f"{self.cache_prefix}_upload_metrics", {})
-        
         total = 0
-        for metrics in processing_metrics.values():
-            total += metrics.get('attempts', 0)
-        
-        for metrics in upload_metrics.values():
-            total += metrics.get('attempts', 0)
-        
+        for operation in ('processing', 'upload'):
+            total += sum(self.metrics.get_counters(f"{operation}_attempts", windows=hours).values())
         return total
     
     def _determine_system_health(self, success_rates: Dict[str, float]) -> str:
@@ -19,6 +19,7 @@ from django.contrib.sites.models import Site
 from django.core.files.storage import default_storage
 from ..utils.image_processor import ImageProcessor, ImageProcessingError
 from ..models import Post, MediaItem
+from .social_image_service import SocialImageService
 from .linkedin_error_handler import LinkedInImageErrorHandler, ImageProcessingError as LinkedInImageProcessingError
 from .linkedin_image_monitor import LinkedInImageMonitor
 from .linkedin_task_monitor import LinkedInTaskMonitor
@@ -96,92 +97,21 @@ class LinkedInImageService:
             )
         
         try:
-            # Priority 1: Social image (specifically for social media sharing)
-            if hasattr(blog_post, 'social_image') and blog_post.social_image:
-                try:
-                    image_url = urljoin(service.base_url, blog_post.social_image.url)
-                    logger.debug(f"Found social_image for post {blog_post.id}: {image_url}")
-                    
-                    # Complete task step if successful
-                    if task_id:
-                        processing_time = time.time() - start_time
-                        service.task_monitor.complete_task_step(
-                            task_id, 
-                            'image_selection', 
-                            {'selected_image': image_url, 'image_source': 'social_image'}
-                        )
-                    
-                    return image_url
-                except Exception as e:
-                    logger.warning(f"Could not get social_image URL for post {blog_post.id}: {e}")
-            
-            # Priority 2: Featured image
-            if hasattr(blog_post, 'featured_image') and blog_post.featured_image:
-                try:
-                    image_url = urljoin(service.base_url, blog_post.featured_image.url)
-                    logger.debug(f"Found featured_image for post {blog_post.id}: {image_url}")
-                    
-                    # Complete task step if successful
-                    if task_id:
-                        processing_time = time.time() - start_time
-                        service.task_monitor.complete_task_step(
-                            task_id, 
-                            'image_selection', 
-                            {'selected_image': image_url, 'image_source': 'featured_image'}
-                        )
-                    
-                    return image_url
-                except Exception as e:
-                    logger.warning(f"Could not get featured_image URL for post {blog_post.id}: {e}")
-            
-            # Priority 3: First image from media items
-            if hasattr(blog_post, 'media_items'):
-                try:
-                    # Look for featured media item first
-                    featured_media = blog_post.media_items.filter(
-                        media_type='image',
-                        is_featured=True,
-                        original_image__isnull=False
-                    ).first()
-                    
-                    if featured_media and featured_media.original_image:
-                        image_url = urljoin(service.base_url, featured_media.original_image.url)
-                        logger.debug(f"Found featured media image for post {blog_post.id}: {image_url}")
-                        
-                        # Complete task step if successful
-                        if task_id:
-                            processing_time = time.time() - start_time
-                            service.task_monitor.complete_task_step(
-                                task_id, 
-                                'image_selection', 
-                                {'selected_image': image_url, 'image_source': 'featured_media'}
-                            )
-                        
-                        return image_url
-                    
-                    # If no featured media, get first available image
-                    first_media = blog_post.media_items.filter(
-                        media_type='image',
-                        original_image__isnull=False
-                    ).order_by('order', 'created_at').first()
-                    
-                    if first_media and first_media.original_image:
-                        image_url = urljoin(service.base_url, first_media.original_image.url)
-                        logger.debug(f"Found first media image for post {blog_post.id}: {image_url}")
-                        
-                        # Complete task step if successful
-                        if task_id:
-                            processing_time = time.time() - start_time
-                            service.task_monitor.complete_task_step(
-                                task_id, 
-                                'image_selection', 
-                                {'selected_image': image_url, 'image_source': 'first_media'}
-                            )
-                        
-                        return image_url
-                        
-                except Exception as e:
-                    logger.warning(f"Could not get media image URL for post {blog_post.id}: {e}")
+            # Resolved when the post or its media change, see SocialImageService
+            image = SocialImageService.get_publishing_image(blog_post)
+            if image:
+                image_url = urljoin(service.base_url, image['url'])
+                logger.debug(f"Found {image['source']} for post {blog_post.id}: {image_url}")
+                
+                # Complete task step if successful
+                if task_id:
+                    service.task_monitor.complete_task_step(
+                        task_id, 
+                        'image_selection', 
+                        {'selected_image': image_url, 'image_source': image['source']}
+                    )
+                
+                return image_url
             
             logger.info(f"No suitable image found for post {blog_post.id}")
             
@@ -453,57 +383,11 @@ class LinkedInImageService:
         fallback_images = []
         
         try:
-            # Collect all possible images
-            image_sources = []
-            
-            # Add social_image
-            if hasattr(blog_post, 'social_image') and blog_post.social_image:
-                try:
-                    image_sources.append({
-                        'url': urljoin(service.base_url, blog_post.social_image.url),
-                        'type': 'social_image',
-                        'priority': 1
-                    })
-                except Exception as e:
-                    logger.warning(f"Could not get social_image URL for post {blog_post.id}: {e}")
-            
-            # Add featured_image
-            if hasattr(blog_post, 'featured_image') and blog_post.featured_image:
-                try:
-                    image_sources.append({
-                        'url': urljoin(service.base_url, blog_post.featured_image.url),
-                        'type': 'featured_image',
-                        'priority': 2
-                    })
-                except Exception as e:
-                    logger.warning(f"Could not get featured_image URL for post {blog_post.id}: {e}")
-            
-            # Add media items
-            if hasattr(blog_post, 'media_items'):
-                try:
-                    media_items = blog_post.media_items.filter(
-                        media_type='image',
-                        original_image__isnull=False
-                    ).order_by('order', 'created_at')
-                    
-                    for i, media_item in enumerate(media_items):
-                        if media_item.original_image:
-                            try:
-                                image_sources.append({
-                                    'url': urljoin(service.base_url, media_item.original_image.url),
-                                    'type': 'media_item',
-                                    'priority': 3 + i,
-                                    'media_id': media_item.id
-                                })
-                            except Exception as e:
-                                logger.warning(f"Could not get media image URL for item {media_item.id}: {e}")
-                                
-                except Exception as e:
-                    logger.warning(f"Could not get media items for post {blog_post.id}: {e}")
-            
-            # Sort by priority and extract URLs
-            image_sources.sort(key=lambda x: x['priority'])
-            fallback_images = [source['url'] for source in image_sources]
+            # Social image, featured image, then every media original
+            manifest = SocialImageService.get_manifest(blog_post)
+            images = [manifest['social_image'], manifest['featured_image']]
+            images.extend(SocialImageService.get_original_images(blog_post))
+            fallback_images = [urljoin(service.base_url, image['url']) for image in images if image]
             
             # Remove duplicates while preserving order
             seen = set()
@@ -0,0 +1,237 @@
+"""
+LinkedIn publishing scheduler.
+
+Publish events, retries and image retries all go through one queue table
+(LinkedInPublishQueueEntry) instead of each queuing Celery tasks directly:
+
+- Events for the same post are coalesced into a single entry, keeping the
+  highest priority and, for publish events, the earliest due time. Retries
+  never bring a pending entry forward, so a backoff or a 429 deferral
+  already in the queue is kept.
+- Due entries are dispatched by priority, then age, at the rate the shared
+  posting quota allows: never more than the ledger has left for the day,
+  never while a 429 backoff is pending, and at most a fixed number of posts
+  per minute.
+- Retries, image upload retries included, are queued by the posting task
+  when an attempt fails, with a backoff due time, so the due_at index
+  replaces periodic scans of LinkedInPost.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Any
+
+from django.core.cache import caches
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Min, Q, Value
+from django.db.models.functions import Greatest, Least
+from django.utils import timezone
+
+from ..linkedin_models import LinkedInPublishQueueEntry
+from .linkedin_api_client import LinkedInQuotaLedger
+
+
+logger = logging.getLogger(__name__)
+
+
+class LinkedInPublishScheduler:
+    """
+    Coalescing, priority-ordered dispatcher for LinkedIn publish work.
+    """
+
+    MAX_DISPATCH_PER_RUN = 10
+    DISPATCH_RATE_PER_MINUTE = 10
+    REDISPATCH_DELAY = 60  # Seconds before retrying an entry that couldn't be queued
+
+    # Reasons that only add an entry, never moving a pending one forward
+    RETRY_REASONS = (
+        LinkedInPublishQueueEntry.REASON_RETRY,
+        LinkedInPublishQueueEntry.REASON_IMAGE_RETRY,
+    )
+
+    DEFAULT_PRIORITIES = {
+        LinkedInPublishQueueEntry.REASON_PUBLISH: LinkedInPublishQueueEntry.PRIORITY_NORMAL,
+        LinkedInPublishQueueEntry.REASON_RETRY: LinkedInPublishQueueEntry.PRIORITY_NORMAL,
+        LinkedInPublishQueueEntry.REASON_IMAGE_RETRY: LinkedInPublishQueueEntry.PRIORITY_LOW,
+    }
+
+    def __init__(self, max_per_run: int = None, rate_per_minute: int = None,
+                 quota_ledger: LinkedInQuotaLedger = None, cache_alias: str = 'default'):
+        self.max_per_run = max_per_run or self.MAX_DISPATCH_PER_RUN
+        self.rate_per_minute = rate_per_minute or self.DISPATCH_RATE_PER_MINUTE
+        self.quota_ledger = quota_ledger or LinkedInQuotaLedger()
+        self.cache_alias = cache_alias
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _now(self) -> datetime:
+        return timezone.now()
+
+    def _rate_key(self) -> str:
+        return f"linkedin_publish_queue:rate:{int(self._now().timestamp() // 60)}"
+
+    def enqueue(self, post_id: int, reason: str = LinkedInPublishQueueEntry.REASON_PUBLISH,
+                priority: int = None, due_at: datetime = None) -> bool:
+        """
+        Queue a post for publishing, coalescing with any pending entry.
+
+        Args:
+            post_id: Blog post ID
+            reason: Queue reason (publish, retry or image_retry)
+            priority: Dispatch priority (default depends on reason)
+            due_at: Earliest dispatch time (default: now)
+
+        Returns:
+            bool: True if a new entry was created, False if merged into an existing one
+        """
+        if priority is None:
+            priority = self.DEFAULT_PRIORITIES.get(reason, LinkedInPublishQueueEntry.PRIORITY_NORMAL)
+        due_at = due_at or self._now()
+
+        if self._coalesce(post_id, reason, priority, due_at):
+            return False
+
+        try:
+            with transaction.atomic():
+                LinkedInPublishQueueEntry.objects.create(
+                    post_id=post_id,
+                    reason=reason,
+                    priority=priority,
+                    due_at=due_at
+                )
+            return True
+        except IntegrityError:
+            # Another worker queued the same post first
+            self._coalesce(post_id, reason, priority, due_at)
+            return False
+
+    def _coalesce(self, post_id: int, reason: str, priority: int, due_at: datetime) -> bool:
+        """Merge an event into the post's pending entry in a single UPDATE."""
+        updates = {
+            'priority': Greatest(F('priority'), Value(priority)),
+            'coalesced_count': F('coalesced_count') + 1,
+        }
+        if reason not in self.RETRY_REASONS:
+            updates['due_at'] = Least(F('due_at'), Value(due_at, output_field=models.DateTimeField()))
+        return bool(LinkedInPublishQueueEntry.objects.filter(post_id=post_id).update(**updates))
+
+    def schedule_retry(self, post_id: int, delay_seconds: int,
+                       reason: str = LinkedInPublishQueueEntry.REASON_RETRY) -> datetime:
+        """
+        Queue a post to be retried after a delay.
+
+        Args:
+            post_id: Blog post ID
+            delay_seconds: Seconds to wait before the retry
+            reason: Queue reason
+
+        Returns:
+            datetime: When the retry becomes due
+        """
+        due_at = self._now() + timedelta(seconds=delay_seconds)
+        self.enqueue(post_id, reason=reason, due_at=due_at)
+        return due_at
+
+    def get_dispatch_budget(self) -> int:
+        """
+        Get how many posts may be dispatched right now.
+
+        Returns:
+            int: Dispatch budget limited by the posting quota, any 429 backoff,
+            the per-minute rate and the per-run maximum
+        """
+        if self.quota_ledger.get_backoff_remaining():
+            return 0
+
+        quota_left = self.quota_ledger.limits['posts'] - self.quota_ledger.get_usage('posts')
+        rate_left = self.rate_per_minute - (self.cache.get(self._rate_key()) or 0)
+        return max(0, min(self.max_per_run, quota_left, rate_left))
+
+    def _take_rate_slot(self) -> bool:
+        """Atomically take one dispatch slot in the current minute."""
+        key = self._rate_key()
+        cache = self.cache
+        try:
+            used = cache.incr(key)
+        except ValueError:
+            cache.add(key, 0, timeout=120)
+            used = cache.incr(key)
+
+        if used > self.rate_per_minute:
+            cache.decr(key)
+            return False
+        return True
+
+    def dispatch(self) -> Dict[str, Any]:
+        """
+        Dispatch due entries by priority and age, within the current budget.
+
+        Entries are claimed by deleting them, so concurrent dispatchers never
+        queue the same post twice.
+
+        Returns:
+            dict: Number of due entries, the budget and the dispatched post IDs
+        """
+        from ..tasks import post_to_linkedin
+
+        now = self._now()
+        due_entries = LinkedInPublishQueueEntry.objects.filter(due_at__lte=now)
+        due_count = due_entries.count()
+        budget = self.get_dispatch_budget() if due_count else 0
+
+        dispatched = []
+        if budget:
+            candidates = list(
+                due_entries.order_by('-priority', 'enqueued_at').values_list('pk', 'post_id')[:budget * 2]
+            )
+            for pk, post_id in candidates:
+                if len(dispatched) >= budget or not self._take_rate_slot():
+                    break
+
+                deleted, _ = LinkedInPublishQueueEntry.objects.filter(pk=pk).delete()
+                if not deleted:
+                    # Claimed by another dispatcher
+                    self.cache.decr(self._rate_key())
+                    continue
+
+                try:
+                    post_to_linkedin.delay(post_id)
+                    dispatched.append(post_id)
+                except Exception as e:
+                    logger.error(f"Failed to queue LinkedIn posting task for post {post_id}: {e}")
+                    self.schedule_retry(post_id, self.REDISPATCH_DELAY)
+
+        if dispatched or due_count:
+            logger.info(f"LinkedIn publish queue: dispatched {len(dispatched)} of {due_count} due posts (budget {budget})")
+
+        return {
+            'due': due_count,
+            'budget': budget,
+            'dispatched': len(dispatched),
+            'post_ids': dispatched,
+        }
+
+    def get_queue_status(self) -> Dict[str, Any]:
+        """
+        Get queue size, due entries and the current dispatch budget.
+
+        Returns:
+            dict: Queue statistics
+        """
+        now = self._now()
+        totals = LinkedInPublishQueueEntry.objects.aggregate(
+            total=Count('pk'),
+            due=Count('pk', filter=Q(due_at__lte=now)),
+            next_due_at=Min('due_at', filter=Q(due_at__gt=now)),
+        )
+        by_reason = dict(
+            LinkedInPublishQueueEntry.objects.values_list('reason').annotate(count=Count('pk')).order_by()
+        )
+
+        return {
+            **totals,
+            'by_reason': by_reason,
+            'budget': self.get_dispatch_budget(),
+        }
@@ -17,6 +17,7 @@ from django.conf import settings
 from django.urls import reverse
 from ..linkedin_models import LinkedInConfig, LinkedInPost
 from .linkedin_error_logger import LinkedInErrorLogger
+from .linkedin_api_client import LinkedInQuotaLedger, linkedin_client_pool
 
 
 logger = logging.getLogger(__name__)
@@ -116,22 +117,12 @@ class LinkedInAPIService:
             config: LinkedInConfig instance. If None, will try to get active config.
         """
         self.config = config or LinkedInConfig.get_active_config()
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Django-Blog-LinkedIn-Integration/1.0',
-            'Content-Type': 'application/json',
-        })
-        
-        # Rate limiting tracking
-        self._rate_limit_reset_time = None
-        self._daily_quota_used = 0
-        self._daily_quota_limit = 100  # LinkedIn's daily posting limit
-        self._last_quota_reset = None
-        
-        # Media upload tracking
-        self._media_quota_used = 0
-        self._media_quota_limit = 50  # LinkedIn's daily media upload limit
-        self._media_quota_reset = None
+        
+        # Pooled session shared by all service instances in this process
+        self.session = linkedin_client_pool.get_session()
+        
+        # Posting/media quotas and rate limit backoff shared by all workers
+        self.quota_ledger = LinkedInQuotaLedger()
         
         # Error logging
         self.error_logger = LinkedInErrorLogger()
@@ -142,7 +133,7 @@ class LinkedInAPIService:
             self.config is not None and 
             self.config.is_active and 
             self.config.client_id and 
-            self.config.get_client_secret()
+            linkedin_client_pool.get_credential(self.config, 'client_secret')
         )
     
     def _handle_authentication_error(self, response: requests.Response, context: str = "") -> None:
@@ -215,9 +206,6 @@ class LinkedInAPIService:
         except ValueError:
             retry_after_seconds = 3600
         
-        # Update rate limit tracking
-        self._rate_limit_reset_time = timezone.now() + timedelta(seconds=retry_after_seconds)
-        
         try:
             error_data = response.json() if response.headers.get('content-type', '').startswith('application/json') else {}
         except ValueError:
@@ -238,10 +226,10 @@ class LinkedInAPIService:
             }
         )
         
-        # Update quota tracking
+        # Share the backoff with all workers
+        self.quota_ledger.record_backoff(retry_after_seconds)
         if quota_type == 'daily':
-            self._daily_quota_used = self._daily_quota_limit
-            self._last_quota_reset = timezone.now()
+            self.quota_ledger.exhaust('posts')
         
         raise LinkedInRateLimitError(
             error_message,
@@ -316,44 +304,35 @@ class LinkedInAPIService:
             is_retryable=True
         )
     
-    def _check_quota_limits(self) -> None:
+    def _check_quota_limits(self, reserve: bool = False) -> None:
         """
         Check if we're within quota limits before making requests.
         
+        Args:
+            reserve: Atomically reserve one unit of the daily posting quota
+        
         Raises:
             LinkedInRateLimitError: If quota limits are exceeded
         """
-        now = timezone.now()
-        
-        # Reset daily quota if it's a new day
-        if self._last_quota_reset and (now - self._last_quota_reset).days >= 1:
-            self._daily_quota_used = 0
-            self._last_quota_reset = now
-        
-        # Check if we're still rate limited
-        if self._rate_limit_reset_time and now < self._rate_limit_reset_time:
-            remaining_seconds = int((self._rate_limit_reset_time - now).total_seconds())
+        # Check if any worker is still rate limited
+        backoff_remaining = self.quota_ledger.get_backoff_remaining()
+        if backoff_remaining:
             raise LinkedInRateLimitError(
-                f"Still rate limited. Retry after {remaining_seconds} seconds",
-                retry_after=remaining_seconds
+                f"Still rate limited. Retry after {backoff_remaining} seconds",
+                retry_after=backoff_remaining
             )
         
         # Check daily quota
-        if self._daily_quota_used >= self._daily_quota_limit:
-            logger.warning(f"LinkedIn daily quota limit reached: {self._daily_quota_used}/{self._daily_quota_limit}")
+        available = self.quota_ledger.try_acquire('posts') if reserve else not self.quota_ledger.is_exhausted('posts')
+        if not available:
+            used, limit = self.quota_ledger.get_usage('posts'), self.quota_ledger.limits['posts']
+            logger.warning(f"LinkedIn daily quota limit reached: {used}/{limit}")
             raise LinkedInRateLimitError(
-                f"Daily posting quota exceeded: {self._daily_quota_used}/{self._daily_quota_limit}",
+                f"Daily posting quota exceeded: {used}/{limit}",
+                retry_after=self.quota_ledger.seconds_until_reset(),
                 quota_type='daily'
             )
     
-    def _update_quota_usage(self) -> None:
-        """Update quota usage after successful request."""
-        self._daily_quota_used += 1
-        if not self._last_quota_reset:
-            self._last_quota_reset = timezone.now()
-        
-        logger.debug(f"LinkedIn quota usage updated: {self._daily_quota_used}/{self._daily_quota_limit}")
-    
     def _implement_fallback_mechanism(self, error: LinkedInAPIError, blog_post, attempt_count: int = 1) -> dict:
         """
         Implement enhanced fallback mechanisms for posting failures, including image-related fallbacks.
@@ -539,7 +518,7 @@ class LinkedInAPIService:
             return False
         
         return (
-            self.config.get_access_token() and 
+            linkedin_client_pool.get_credential(self.config, 'access_token') and 
             not self.config.is_token_expired()
         )
     
@@ -593,7 +572,7 @@ class LinkedInAPIService:
             'code': code,
             'redirect_uri': redirect_uri,
             'client_id': self.config.client_id,
-            'client_secret': self.config.get_client_secret(),
+            'client_secret': linkedin_client_pool.get_credential(self.config, 'client_secret'),
         }
         
         try:
@@ -648,7 +627,7 @@ class LinkedInAPIService:
         if not self.is_configured():
             raise LinkedInAPIError("LinkedIn integration is not configured")
         
-        refresh_token = self.config.get_refresh_token()
+        refresh_token = linkedin_client_pool.get_credential(self.config, 'refresh_token')
         if not refresh_token:
             raise LinkedInAPIError("No refresh token available")
         
@@ -656,7 +635,7 @@ class LinkedInAPIService:
             'grant_type': 'refresh_token',
             'refresh_token': refresh_token,
             'client_id': self.config.client_id,
-            'client_secret': self.config.get_client_secret(),
+            'client_secret': linkedin_client_pool.get_credential(self.config, 'client_secret'),
         }
         
         try:
@@ -736,21 +715,25 @@ class LinkedInAPIService:
         Raises:
             LinkedInAPIError: If authentication fails or request fails
         """
-        # Check quota limits before making request
-        self._check_quota_limits()
-        
-        if not self.authenticate():
-            raise LinkedInAuthenticationError("Failed to authenticate with LinkedIn API")
-        
-        # Add authorization header
-        headers = kwargs.get('headers', {})
-        headers['Authorization'] = f"Bearer {self.config.get_access_token()}"
-        kwargs['headers'] = headers
+        # Creating a post consumes the shared daily posting quota
+        reserve_quota = method.upper() == 'POST' and url == self.UGC_POSTS_URL
         
-        # Set timeout if not provided
-        kwargs.setdefault('timeout', 30)
+        # Check quota limits before making request
+        self._check_quota_limits(reserve=reserve_quota)
+        release_quota = reserve_quota
         
         try:
+            if not self.authenticate():
+                raise LinkedInAuthenticationError("Failed to authenticate with LinkedIn API")
+            
+            # Add authorization header
+            headers = kwargs.get('headers', {})
+            headers['Authorization'] = f"Bearer {linkedin_client_pool.get_credential(self.config, 'access_token')}"
+            kwargs['headers'] = headers
+            
+            # Set timeout if not provided
+            kwargs.setdefault('timeout', 30)
+            
             logger.debug(f"Making LinkedIn API request: {method} {url}")
             response = self.session.request(method, url, **kwargs)
             
@@ -781,14 +764,17 @@ class LinkedInAPIService:
                     is_retryable=False
                 )
             
-            # Update quota usage for successful requests
-            if response.status_code in [200, 201]:
-                self._update_quota_usage()
+            release_quota = False
             
             logger.debug(f"LinkedIn API request successful: {method} {url} -> {response.status_code}")
             return response
             
-        except (LinkedInAPIError, LinkedInAuthenticationError, LinkedInRateLimitError, LinkedInContentError):
+        except LinkedInRateLimitError as e:
+            # A daily limit leaves the ledger exhausted until the quota resets
+            if e.quota_type == 'daily':
+                release_quota = False
+            raise
+        except (LinkedInAPIError, LinkedInAuthenticationError, LinkedInContentError):
             # Re-raise our custom exceptions
             raise
         except requests.Timeout as e:
@@ -830,6 +816,9 @@ class LinkedInAPIService:
                 error_code='NETWORK_ERROR',
                 is_retryable=True
             )
+        finally:
+            if release_quota:
+                self.quota_ledger.release('posts')
     
     def get_user_profile(self) -> Dict:
         """
@@ -970,6 +959,9 @@ class LinkedInAPIService:
             profile = self.get_user_profile()
             person_id = profile['id']
             author_urn = f"urn:li:person:{person_id}"
+        except LinkedInRateLimitError:
+            # Keep retry_after so callers can wait for the shared backoff
+            raise
         except LinkedInAPIError as e:
             logger.error(f"Failed to get user profile for posting: {e.message}")
             raise LinkedInAPIError(f"Failed to get user profile: {e.message}")
@@ -1063,8 +1055,8 @@ class LinkedInAPIService:
         if not image_url:
             raise LinkedInAPIError("Image URL is required for media upload")
         
-        # Check media upload quota
-        self._check_media_quota_limits()
+        # Reserve one unit of the media upload quota; released if the upload fails
+        self._reserve_media_quota()
         
         try:
             # Get user profile to get person URN
@@ -1083,15 +1075,14 @@ class LinkedInAPIService:
             # Step 3: Upload image binary data to LinkedIn
             self._upload_image_binary(media_urn, image_data)
             
-            # Update media quota usage
-            self._update_media_quota_usage()
-            
             logger.info(f"Successfully uploaded media to LinkedIn: {media_urn}")
             return media_urn
             
         except LinkedInAPIError:
+            self.quota_ledger.release('media')
             raise
         except Exception as e:
+            self.quota_ledger.release('media')
             logger.error(f"Unexpected error uploading media: {e}")
             raise LinkedInAPIError(f"Unexpected error uploading media: {e}")
     
@@ -1172,11 +1163,8 @@ class LinkedInAPIService:
         try:
             logger.debug(f"Downloading image data from: {image_url}")
             
-            # Use a separate session for image download to avoid auth headers
-            download_session = requests.Session()
-            download_session.headers.update({
-                'User-Agent': 'Django-Blog-LinkedIn-Integration/1.0'
-            })
+            # Use the upload session for image download to avoid auth headers
+            download_session = linkedin_client_pool.get_session('upload')
             
             response = download_session.get(image_url, timeout=60)
             
@@ -1228,10 +1216,7 @@ class LinkedInAPIService:
             
             # Upload binary data using PUT request
             # Note: This request should NOT include authorization headers
-            upload_session = requests.Session()
-            upload_session.headers.update({
-                'User-Agent': 'Django-Blog-LinkedIn-Integration/1.0'
-            })
+            upload_session = linkedin_client_pool.get_session('upload')
             
             response = upload_session.put(
                 self._upload_url,
@@ -1288,6 +1273,9 @@ class LinkedInAPIService:
             profile = self.get_user_profile()
             person_id = profile['id']
             author_urn = f"urn:li:person:{person_id}"
+        except LinkedInRateLimitError:
+            # Keep retry_after so callers can wait for the shared backoff
+            raise
         except LinkedInAPIError as e:
             logger.error(f"Failed to get user profile for posting: {e.message}")
             raise LinkedInAPIError(f"Failed to get user profile: {e.message}")
@@ -1370,36 +1358,25 @@ class LinkedInAPIService:
             logger.error(f"Unexpected error creating LinkedIn post with media: {e}")
             raise LinkedInAPIError(f"Unexpected error creating LinkedIn post with media: {e}")
     
-    def _check_media_quota_limits(self) -> None:
+    def _reserve_media_quota(self) -> None:
         """
-        Check if we're within media upload quota limits before making requests.
+        Atomically reserve one unit of the daily media upload quota.
+        
+        Reserving before the upload keeps concurrent workers from uploading
+        past the limit; callers release the unit if the upload fails.
         
         Raises:
             LinkedInRateLimitError: If media quota limits are exceeded
         """
-        now = timezone.now()
-        
-        # Reset daily media quota if it's a new day
-        if self._media_quota_reset and (now - self._media_quota_reset).days >= 1:
-            self._media_quota_used = 0
-            self._media_quota_reset = now
-        
-        # Check daily media quota
-        if self._media_quota_used >= self._media_quota_limit:
-            logger.warning(f"LinkedIn daily media quota limit reached: {self._media_quota_used}/{self._media_quota_limit}")
+        if not self.quota_ledger.try_acquire('media'):
+            used, limit = self.quota_ledger.get_usage('media'), self.quota_ledger.limits['media']
+            logger.warning(f"LinkedIn daily media quota limit reached: {used}/{limit}")
             raise LinkedInRateLimitError(
-                f"Daily media upload quota exceeded: {self._media_quota_used}/{self._media_quota_limit}",
+                f"Daily media upload quota exceeded: {used}/{limit}",
+                retry_after=self.quota_ledger.seconds_until_reset(),
                 quota_type='daily_media'
             )
     
-    def _update_media_quota_usage(self) -> None:
-        """Update media quota usage after successful media upload."""
-        self._media_quota_used += 1
-        if not self._media_quota_reset:
-            self._media_quota_reset = timezone.now()
-        
-        logger.debug(f"LinkedIn media quota usage updated: {self._media_quota_used}/{self._media_quota_limit}")
-    
     def _format_post_content(self, title: str, content: str, url: str) -> str:
         """
         Format content for LinkedIn post.
@@ -8,10 +8,14 @@ including task lifecycle tracking, performance monitoring, and failure analysis.
 import logging
 import uuid
 from typing import Dict, Any, Optional, List
-from datetime import datetime, timedelta
+from datetime import timedelta
 from django.utils import timezone
 from django.core.cache import cache
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from ..linkedin_models import LinkedInTask, LinkedInTaskEvent
+from ..utils.metrics_store import MetricsStore
 from .linkedin_error_handler import LinkedInImageErrorHandler
 from .linkedin_image_monitor import LinkedInImageMonitor
 
@@ -21,12 +25,12 @@ logger = logging.getLogger(__name__)
 
 class LinkedInTaskStatus:
     """Task status constants"""
-    PENDING = 'pending'
-    RUNNING = 'running'
-    SUCCESS = 'success'
-    FAILED = 'failed'
-    RETRYING = 'retrying'
-    CANCELLED = 'cancelled'
+    PENDING = LinkedInTask.STATUS_PENDING
+    RUNNING = LinkedInTask.STATUS_RUNNING
+    SUCCESS = LinkedInTask.STATUS_SUCCESS
+    FAILED = LinkedInTask.STATUS_FAILED
+    RETRYING = LinkedInTask.STATUS_RETRYING
+    CANCELLED = LinkedInTask.STATUS_CANCELLED
 
 
 class LinkedInTaskMonitor:
@@ -39,11 +43,23 @@ class LinkedInTaskMonitor:
     - Failure analysis and recovery tracking
     - Task queue health monitoring
     - Detailed task execution logs
+    
+    Task state lives in the LinkedInTask registry table (indexed by status and
+    post_id) with step history as append-only LinkedInTaskEvent rows. The cache
+    holds each task's immutable header and snapshots of finished tasks.
     """
     
+    # Fields read to build task summaries and listings
+    SUMMARY_FIELDS = (
+        'task_id', 'task_type', 'post_id', 'status', 'duration', 'retry_count',
+        'step_count', 'successful_steps', 'failed_steps', 'error_count',
+        'created_at', 'completed_at'
+    )
+    
     def __init__(self):
         self.cache_prefix = 'linkedin_task_monitor'
         self.cache_ttl = 7200  # 2 hours
+        self.metrics = MetricsStore(self.cache_prefix, window_seconds=3600, retention_windows=24)
         self.error_handler = LinkedInImageErrorHandler()
         self.image_monitor = LinkedInImageMonitor()
         
@@ -57,6 +73,64 @@ class LinkedInTaskMonitor:
             'post_creation': {'warning': 10, 'critical': 20},       # seconds
         }
     
+    def _parse_task_id(self, task_id) -> Optional[uuid.UUID]:
+        """Parse a task ID, returning None if it is not a valid UUID."""
+        try:
+            return uuid.UUID(str(task_id))
+        except (TypeError, ValueError):
+            return None
+    
+    def _tasks(self, task_id):
+        """Get a queryset for a single task (empty for invalid IDs)."""
+        parsed_id = self._parse_task_id(task_id)
+        if parsed_id is None:
+            return LinkedInTask.objects.none()
+        return LinkedInTask.objects.filter(task_id=parsed_id)
+    
+    def _snapshot_key(self, task_id) -> str:
+        return f"{self.cache_prefix}_task_{task_id}"
+    
+    def _header_key(self, task_id) -> str:
+        return f"{self.cache_prefix}_task_{task_id}_header"
+    
+    def _get_task_header(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a task's immutable fields (task type and post ID).
+        
+        Headers never change after creation, so they are cached without
+        invalidation and state transitions don't need to read the task row.
+        """
+        header_key = self._header_key(task_id)
+        header = cache.get(header_key)
+        if header is None:
+            header = self._tasks(task_id).values('task_type', 'post_id').first()
+            if header is not None:
+                cache.set(header_key, header, timeout=self.cache_ttl)
+        return header
+    
+    def _transition(self, task_id: str, from_statuses=None, condition: Q = None, **updates) -> bool:
+        """
+        Apply a state transition with a single conditional UPDATE.
+        
+        Args:
+            task_id: Task ID
+            from_statuses: Statuses the task must currently be in (any if None)
+            condition: Additional condition the task row must match
+            **updates: Field values to set
+            
+        Returns:
+            bool: True if the task was updated
+        """
+        tasks = self._tasks(task_id)
+        if from_statuses is not None:
+            tasks = tasks.filter(status__in=from_statuses)
+        if condition is not None:
+            tasks = tasks.filter(condition)
+        updated = tasks.update(updated_at=timezone.now(), **updates) == 1
+        if updated:
+            cache.delete(self._snapshot_key(task_id))
+        return updated
+    
     def create_task(self, task_type: str, post_id: int, context: Dict[str, Any] = None) -> str:
         """
         Create a new monitored task.
@@ -69,27 +143,14 @@ class LinkedInTaskMonitor:
         Returns:
             str: Unique task ID
         """
-        task_id = str(uuid.uuid4())
-        
-        task_data = {
-            'task_id': task_id,
-            'task_type': task_type,
-            'post_id': post_id,
-            'status': LinkedInTaskStatus.PENDING,
-            'created_at': timezone.now().isoformat(),
-            'started_at': None,
-            'completed_at': None,
-            'duration': None,
-            'context': context or {},
-            'steps': [],
-            'errors': [],
-            'retry_count': 0,
-            'max_retries': 3
-        }
+        task = LinkedInTask.objects.create(
+            task_type=task_type,
+            post_id=post_id,
+            context=context or {}
+        )
+        task_id = str(task.task_id)
         
-        # Store task data
-        task_key = f"{self.cache_prefix}_task_{task_id}"
-        cache.set(task_key, task_data, timeout=self.cache_ttl)
+        cache.set(self._header_key(task_id), {'task_type': task_type, 'post_id': post_id}, timeout=self.cache_ttl)
         
         # Update task queue metrics
         self._update_queue_metrics(task_type, 'created')
@@ -100,7 +161,7 @@ class LinkedInTaskMonitor:
     
     def start_task(self, task_id: str) -> bool:
         """
-        Mark a task as started.
+        Mark a pending (or retrying) task as started.
         
         Args:
             task_id: Task ID
@@ -108,26 +169,23 @@ class LinkedInTaskMonitor:
         Returns:
             bool: True if task was successfully started
         """
-        task_key = f"{self.cache_prefix}_task_{task_id}"
-        task_data = cache.get(task_key)
-        
-        if not task_data:
-            logger.error(f"Task {task_id} not found")
-            return False
+        started = self._transition(
+            task_id,
+            from_statuses=[LinkedInTaskStatus.PENDING, LinkedInTaskStatus.RETRYING],
+            status=LinkedInTaskStatus.RUNNING,
+            started_at=timezone.now()
+        )
         
-        if task_data['status'] != LinkedInTaskStatus.PENDING:
-            logger.warning(f"Task {task_id} is not in pending status: {task_data['status']}")
+        if not started:
+            status = self._tasks(task_id).values_list('status', flat=True).first()
+            if status is None:
+                logger.error(f"Task {task_id} not found")
+            else:
+                logger.warning(f"Task {task_id} is not in pending status: {status}")
             return False
         
-        task_data.update({
-            'status': LinkedInTaskStatus.RUNNING,
-            'started_at': timezone.now().isoformat()
-        })
-        
-        cache.set(task_key, task_data, timeout=self.cache_ttl)
-        
         # Update queue metrics
-        self._update_queue_metrics(task_data['task_type'], 'started')
+        self._update_queue_metrics(self._get_task_header(task_id)['task_type'], 'started')
         
         logger.info(f"Started LinkedIn task {task_id}")
         
@@ -145,28 +203,24 @@ class LinkedInTaskMonitor:
         Returns:
             bool: True if step was added successfully
         """
-        task_key = f"{self.cache_prefix}_task_{task_id}"
-        task_data = cache.get(task_key)
+        task = self._tasks(task_id).values('task_id', 'post_id', 'status', 'retry_count').first()
         
-        if not task_data:
+        if not task:
             logger.error(f"Task {task_id} not found")
             return False
         
-        step_info = {
-            'step_name': step_name,
-            'started_at': timezone.now().isoformat(),
-            'completed_at': None,
-            'duration': None,
-            'status': 'running',
-            'data': step_data or {}
-        }
-        
-        task_data['steps'].append(step_info)
-        cache.set(task_key, task_data, timeout=self.cache_ttl)
+        LinkedInTaskEvent.objects.create(
+            task_id=task['task_id'],
+            attempt=task['retry_count'],
+            event_type=LinkedInTaskEvent.EVENT_STEP_STARTED,
+            step_name=step_name,
+            data=step_data or {}
+        )
+        self._transition(task_id, step_count=F('step_count') + 1)
         
         # Record step start in image monitor
         self.image_monitor.record_image_processing_attempt(
-            post_id=task_data['post_id'],
+            post_id=task['post_id'],
             image_url=step_data.get('image_url', '') if step_data else '',
             processing_step=step_name,
             context={'task_id': task_id}
@@ -176,6 +230,23 @@ class LinkedInTaskMonitor:
         
         return True
     
+    def _find_running_step(self, task: Dict[str, Any], step_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the oldest running step with the given name in the current attempt.
+        
+        Steps with the same name complete in the order they were started, so
+        the n-th completion event closes the n-th start event.
+        """
+        events = LinkedInTaskEvent.objects.filter(
+            task_id=task['task_id'], attempt=task['retry_count'], step_name=step_name
+        )
+        closed = events.filter(
+            event_type__in=[LinkedInTaskEvent.EVENT_STEP_SUCCEEDED, LinkedInTaskEvent.EVENT_STEP_FAILED]
+        ).count()
+        return events.filter(
+            event_type=LinkedInTaskEvent.EVENT_STEP_STARTED
+        ).order_by('id').values('created_at', 'data')[closed:closed + 1].first()
+    
     def complete_task_step(self, task_id: str, step_name: str, 
                           step_result: Dict[str, Any] = None, error: Exception = None) -> bool:
         """
@@ -190,59 +261,56 @@ class LinkedInTaskMonitor:
         Returns:
             bool: True if step was completed successfully
         """
-        task_key = f"{self.cache_prefix}_task_{task_id}"
-        task_data = cache.get(task_key)
+        task = self._tasks(task_id).values('task_id', 'post_id', 'status', 'retry_count').first()
         
-        if not task_data:
+        if not task:
             logger.error(f"Task {task_id} not found")
             return False
         
-        # Find the step
-        step_found = False
-        for step in task_data['steps']:
-            if step['step_name'] == step_name and step['status'] == 'running':
-                completed_at = timezone.now()
-                started_at = datetime.fromisoformat(step['started_at'].replace('Z', '+00:00'))
-                duration = (completed_at - started_at).total_seconds()
-                
-                step.update({
-                    'completed_at': completed_at.isoformat(),
-                    'duration': duration,
-                    'status': 'success' if error is None else 'failed',
-                    'result': step_result or {},
-                    'error': str(error) if error else None
-                })
-                
-                step_found = True
-                
-                # Check performance thresholds
-                self._check_step_performance_thresholds(step_name, duration)
-                
-                # Record in image monitor
-                if error is None:
-                    self.image_monitor.record_image_processing_success(
-                        post_id=task_data['post_id'],
-                        image_url=step.get('data', {}).get('image_url', ''),
-                        processing_step=step_name,
-                        processing_time=duration,
-                        result_data=step_result
-                    )
-                else:
-                    self.image_monitor.record_image_processing_failure(
-                        post_id=task_data['post_id'],
-                        image_url=step.get('data', {}).get('image_url', ''),
-                        processing_step=step_name,
-                        error=error,
-                        processing_time=duration
-                    )
-                
-                break
+        step = self._find_running_step(task, step_name)
         
-        if not step_found:
+        if not step:
             logger.warning(f"Running step '{step_name}' not found in task {task_id}")
             return False
         
-        cache.set(task_key, task_data, timeout=self.cache_ttl)
+        duration = (timezone.now() - step['created_at']).total_seconds()
+        
+        LinkedInTaskEvent.objects.create(
+            task_id=task['task_id'],
+            attempt=task['retry_count'],
+            event_type=(
+                LinkedInTaskEvent.EVENT_STEP_SUCCEEDED if error is None else LinkedInTaskEvent.EVENT_STEP_FAILED
+            ),
+            step_name=step_name,
+            data=step_result or {},
+            error=str(error) if error else '',
+            error_type=type(error).__name__ if error else '',
+            duration=duration
+        )
+        counter = 'successful_steps' if error is None else 'failed_steps'
+        self._transition(task_id, **{counter: F(counter) + 1})
+        
+        # Check performance thresholds
+        self._check_step_performance_thresholds(step_name, duration)
+        
+        # Record in image monitor
+        image_url = step['data'].get('image_url', '')
+        if error is None:
+            self.image_monitor.record_image_processing_success(
+                post_id=task['post_id'],
+                image_url=image_url,
+                processing_step=step_name,
+                processing_time=duration,
+                result_data=step_result
+            )
+        else:
+            self.image_monitor.record_image_processing_failure(
+                post_id=task['post_id'],
+                image_url=image_url,
+                processing_step=step_name,
+                error=error,
+                processing_time=duration
+            )
         
         logger.debug(f"Completed step '{step_name}' for task {task_id} "
                     f"({'success' if error is None else 'failed'})")
@@ -251,7 +319,7 @@ class LinkedInTaskMonitor:
     
     def complete_task(self, task_id: str, result: Dict[str, Any] = None, error: Exception = None) -> bool:
         """
-        Mark a task as completed.
+        Mark an active task as completed.
         
         Args:
             task_id: Task ID
@@ -261,47 +329,102 @@ class LinkedInTaskMonitor:
         Returns:
             bool: True if task was completed successfully
         """
-        task_key = f"{self.cache_prefix}_task_{task_id}"
-        task_data = cache.get(task_key)
+        task = self._tasks(task_id).values('task_id', 'task_type', 'status', 'retry_count',
+                                           'created_at', 'started_at').first()
         
-        if not task_data:
+        if not task:
             logger.error(f"Task {task_id} not found")
             return False
         
         completed_at = timezone.now()
-        started_at = datetime.fromisoformat(task_data['started_at'].replace('Z', '+00:00'))
-        duration = (completed_at - started_at).total_seconds()
+        duration = (completed_at - (task['started_at'] or task['created_at'])).total_seconds()
         
-        task_data.update({
+        updates = {
             'status': LinkedInTaskStatus.SUCCESS if error is None else LinkedInTaskStatus.FAILED,
-            'completed_at': completed_at.isoformat(),
+            'completed_at': completed_at,
             'duration': duration,
             'result': result or {},
-            'final_error': str(error) if error else None
-        })
-        
+            'final_error': str(error) if error else '',
+        }
         if error:
-            task_data['errors'].append({
-                'error': str(error),
-                'error_type': type(error).__name__,
-                'timestamp': completed_at.isoformat(),
-                'step': 'task_completion'
-            })
+            updates['error_count'] = F('error_count') + 1
+        
+        if not self._transition(task_id, from_statuses=LinkedInTask.ACTIVE_STATUSES, **updates):
+            logger.warning(f"Task {task_id} is already finished: {task['status']}")
+            return False
         
-        cache.set(task_key, task_data, timeout=self.cache_ttl)
+        if error:
+            LinkedInTaskEvent.objects.create(
+                task_id=task['task_id'],
+                attempt=task['retry_count'],
+                event_type=LinkedInTaskEvent.EVENT_ERROR,
+                step_name='task_completion',
+                error=str(error),
+                error_type=type(error).__name__
+            )
         
         # Update queue metrics
         status = 'completed' if error is None else 'failed'
-        self._update_queue_metrics(task_data['task_type'], status)
+        self._update_queue_metrics(task['task_type'], status)
         
         # Update task performance metrics
-        self._update_task_performance_metrics(task_data['task_type'], duration, error is None)
+        self._update_task_performance_metrics(task['task_type'], duration, error is None)
         
         logger.info(f"Completed LinkedIn task {task_id} "
                    f"({'success' if error is None else 'failed'}, {duration:.2f}s)")
         
         return True
     
+    def log_task_completion(self, result: Dict[str, Any], task_type: str = 'linkedin_post') -> Optional[str]:
+        """
+        Record a finished task from its result dict in a single insert.
+        
+        Used by tasks that are not tracked step by step, such as the
+        post_to_linkedin Celery task. Monitoring failures are logged and never
+        propagate to the caller.
+        
+        Args:
+            result: Task result with 'success', 'post_id' and 'task_duration'
+            task_type: Type of task
+            
+        Returns:
+            str: Task ID of the registry entry, or None if it couldn't be recorded
+        """
+        try:
+            completed_at = timezone.now()
+            duration = result.get('task_duration') or 0.0
+            
+            if result.get('success'):
+                status, event = LinkedInTaskStatus.SUCCESS, 'completed'
+            elif result.get('skipped'):
+                status, event = LinkedInTaskStatus.CANCELLED, 'cancelled'
+            else:
+                status, event = LinkedInTaskStatus.FAILED, 'failed'
+            
+            task = LinkedInTask.objects.create(
+                task_type=task_type,
+                post_id=result['post_id'],
+                status=status,
+                result=result,
+                final_error=result.get('error') or '',
+                retry_count=max(0, (result.get('attempt_count') or 1) - 1),
+                error_count=0 if result.get('success') else 1,
+                started_at=completed_at - timedelta(seconds=duration),
+                completed_at=completed_at,
+                cancelled_at=completed_at if status == LinkedInTaskStatus.CANCELLED else None,
+                duration=duration
+            )
+            
+            self._update_queue_metrics(task_type, 'created')
+            self._update_queue_metrics(task_type, event)
+            if status != LinkedInTaskStatus.CANCELLED:
+                self._update_task_performance_metrics(task_type, duration, status == LinkedInTaskStatus.SUCCESS)
+            
+            return str(task.task_id)
+        except Exception as e:
+            logger.error(f"Failed to record LinkedIn task completion: {str(e)}")
+            return None
+    
     def retry_task(self, task_id: str, reason: str = None) -> bool:
         """
         Mark a task for retry.
@@ -313,33 +436,31 @@ class LinkedInTaskMonitor:
         Returns:
             bool: True if task was marked for retry
         """
-        task_key = f"{self.cache_prefix}_task_{task_id}"
-        task_data = cache.get(task_key)
-        
-        if not task_data:
-            logger.error(f"Task {task_id} not found")
-            return False
+        marked = self._transition(
+            task_id,
+            condition=Q(retry_count__lt=F('max_retries')),
+            status=LinkedInTaskStatus.RETRYING,
+            retry_count=F('retry_count') + 1,
+            retry_reason=reason or '',
+            retry_at=timezone.now(),
+            # Steps of the new attempt are counted from zero
+            step_count=0,
+            successful_steps=0,
+            failed_steps=0,
+        )
         
-        if task_data['retry_count'] >= task_data['max_retries']:
-            logger.warning(f"Task {task_id} has exceeded max retries ({task_data['max_retries']})")
+        if not marked:
+            task = self._tasks(task_id).values('retry_count', 'max_retries').first()
+            if not task:
+                logger.error(f"Task {task_id} not found")
+            else:
+                logger.warning(f"Task {task_id} has exceeded max retries ({task['max_retries']})")
             return False
         
-        task_data.update({
-            'status': LinkedInTaskStatus.RETRYING,
-            'retry_count': task_data['retry_count'] + 1,
-            'retry_reason': reason,
-            'retry_at': timezone.now().isoformat()
-        })
-        
-        # Clear previous steps for retry
-        task_data['steps'] = []
-        
-        cache.set(task_key, task_data, timeout=self.cache_ttl)
-        
         # Update queue metrics
-        self._update_queue_metrics(task_data['task_type'], 'retried')
+        self._update_queue_metrics(self._get_task_header(task_id)['task_type'], 'retried')
         
-        logger.info(f"Marked task {task_id} for retry (attempt {task_data['retry_count']})")
+        logger.info(f"Marked task {task_id} for retry")
         
         return True
     
@@ -354,23 +475,19 @@ class LinkedInTaskMonitor:
         Returns:
             bool: True if task was cancelled
         """
-        task_key = f"{self.cache_prefix}_task_{task_id}"
-        task_data = cache.get(task_key)
+        cancelled = self._transition(
+            task_id,
+            status=LinkedInTaskStatus.CANCELLED,
+            cancelled_at=timezone.now(),
+            cancellation_reason=reason or ''
+        )
         
-        if not task_data:
+        if not cancelled:
             logger.error(f"Task {task_id} not found")
             return False
         
-        task_data.update({
-            'status': LinkedInTaskStatus.CANCELLED,
-            'cancelled_at': timezone.now().isoformat(),
-            'cancellation_reason': reason
-        })
-        
-        cache.set(task_key, task_data, timeout=self.cache_ttl)
-        
         # Update queue metrics
-        self._update_queue_metrics(task_data['task_type'], 'cancelled')
+        self._update_queue_metrics(self._get_task_header(task_id)['task_type'], 'cancelled')
         
         logger.info(f"Cancelled LinkedIn task {task_id}: {reason}")
         
@@ -380,14 +497,129 @@ class LinkedInTaskMonitor:
         """
         Get current status of a task.
         
+        Finished tasks are served from a cached snapshot.
+        
         Args:
             task_id: Task ID
             
         Returns:
             dict: Task status information or None if not found
         """
-        task_key = f"{self.cache_prefix}_task_{task_id}"
-        return cache.get(task_key)
+        snapshot_key = self._snapshot_key(task_id)
+        task_data = cache.get(snapshot_key)
+        if task_data is not None:
+            return task_data
+        
+        task = self._tasks(task_id).first()
+        if not task:
+            return None
+        
+        events = task.events.filter(
+            Q(attempt=task.retry_count) | Q(event_type=LinkedInTaskEvent.EVENT_ERROR)
+        ).order_by('id')
+        
+        task_data = {
+            'task_id': str(task.task_id),
+            'task_type': task.task_type,
+            'post_id': task.post_id,
+            'status': task.status,
+            'created_at': task.created_at.isoformat(),
+            'started_at': task.started_at.isoformat() if task.started_at else None,
+            'completed_at': task.completed_at.isoformat() if task.completed_at else None,
+            'duration': task.duration,
+            'context': task.context,
+            'steps': self._build_steps(event for event in events if event.attempt == task.retry_count),
+            'errors': [
+                {
+                    'error': event.error,
+                    'error_type': event.error_type,
+                    'timestamp': event.created_at.isoformat(),
+                    'step': event.step_name
+                }
+                for event in events if event.event_type == LinkedInTaskEvent.EVENT_ERROR
+            ],
+            'retry_count': task.retry_count,
+            'max_retries': task.max_retries,
+            'result': task.result,
+            'final_error': task.final_error or None,
+            'retry_reason': task.retry_reason or None,
+            'retry_at': task.retry_at.isoformat() if task.retry_at else None,
+            'cancelled_at': task.cancelled_at.isoformat() if task.cancelled_at else None,
+            'cancellation_reason': task.cancellation_reason or None
+        }
+        
+        if task.status in LinkedInTask.TERMINAL_STATUSES:
+            cache.set(snapshot_key, task_data, timeout=self.cache_ttl)
+        
+        return task_data
+    
+    def _build_steps(self, events) -> List[Dict[str, Any]]:
+        """
+        Rebuild step records from step events.
+        
+        Args:
+            events: Step events of one attempt, oldest first
+            
+        Returns:
+            list: Step dicts in start order
+        """
+        steps = []
+        running = {}
+        for event in events:
+            if event.event_type == LinkedInTaskEvent.EVENT_STEP_STARTED:
+                step = {
+                    'step_name': event.step_name,
+                    'started_at': event.created_at.isoformat(),
+                    'completed_at': None,
+                    'duration': None,
+                    'status': 'running',
+                    'data': event.data
+                }
+                steps.append(step)
+                running.setdefault(event.step_name, []).append(step)
+            elif event.event_type != LinkedInTaskEvent.EVENT_ERROR and running.get(event.step_name):
+                step = running[event.step_name].pop(0)
+                step.update({
+                    'completed_at': event.created_at.isoformat(),
+                    'duration': event.duration,
+                    'status': 'success' if event.event_type == LinkedInTaskEvent.EVENT_STEP_SUCCEEDED else 'failed',
+                    'result': event.data,
+                    'error': event.error or None
+                })
+        return steps
+    
+    def _build_summary(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build a task summary from registry fields, without reading events.
+        
+        Args:
+            task: Dict with SUMMARY_FIELDS values
+            
+        Returns:
+            dict: Task summary
+        """
+        summary = {
+            'task_id': str(task['task_id']),
+            'task_type': task['task_type'],
+            'post_id': task['post_id'],
+            'status': task['status'],
+            'duration': task['duration'],
+            'retry_count': task['retry_count'],
+            'step_count': task['step_count'],
+            'error_count': task['error_count'],
+            'created_at': task['created_at'].isoformat(),
+            'completed_at': task['completed_at'].isoformat() if task['completed_at'] else None
+        }
+        
+        # Add step summary
+        if task['step_count']:
+            summary.update({
+                'successful_steps': task['successful_steps'],
+                'failed_steps': task['failed_steps'],
+                'step_success_rate': task['successful_steps'] / task['step_count']
+            })
+        
+        return summary
     
     def get_task_summary(self, task_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -399,85 +631,160 @@ class LinkedInTaskMonitor:
         Returns:
             dict: Task summary or None if not found
         """
-        task_data = self.get_task_status(task_id)
+        task = self._tasks(task_id).values(*self.SUMMARY_FIELDS).first()
         
-        if not task_data:
+        if not task:
             return None
         
-        summary = {
-            'task_id': task_id,
-            'task_type': task_data['task_type'],
-            'post_id': task_data['post_id'],
-            'status': task_data['status'],
-            'duration': task_data.get('duration'),
-            'retry_count': task_data['retry_count'],
-            'step_count': len(task_data['steps']),
-            'error_count': len(task_data['errors']),
-            'created_at': task_data['created_at'],
-            'completed_at': task_data.get('completed_at')
-        }
+        return self._build_summary(task)
+    
+    def get_tasks(self, status=None, post_id: int = None, task_type: str = None,
+                  limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        List task summaries using the status and post_id indexes.
         
-        # Add step summary
-        if task_data['steps']:
-            successful_steps = sum(1 for step in task_data['steps'] if step['status'] == 'success')
-            failed_steps = sum(1 for step in task_data['steps'] if step['status'] == 'failed')
+        Args:
+            status: Status or list of statuses to include
+            post_id: Only tasks for this blog post
+            task_type: Only tasks of this type
+            limit: Maximum number of tasks, newest first
             
-            summary.update({
-                'successful_steps': successful_steps,
-                'failed_steps': failed_steps,
-                'step_success_rate': successful_steps / len(task_data['steps']) if task_data['steps'] else 0
-            })
+        Returns:
+            list: List of task summaries
+        """
+        tasks = LinkedInTask.objects.all()
         
-        return summary
+        if status:
+            tasks = tasks.filter(status__in=[status] if isinstance(status, str) else status)
+        if post_id is not None:
+            tasks = tasks.filter(post_id=post_id)
+        if task_type:
+            tasks = tasks.filter(task_type=task_type)
+        
+        return [
+            self._build_summary(task)
+            for task in tasks.order_by('-created_at').values(*self.SUMMARY_FIELDS)[:limit]
+        ]
+    
+    def get_status_counts(self, task_type: str = None) -> Dict[str, int]:
+        """
+        Get the number of registered tasks per status.
+        
+        Args:
+            task_type: Only count tasks of this type
+            
+        Returns:
+            dict: Task counts keyed by status
+        """
+        tasks = LinkedInTask.objects.all()
+        if task_type:
+            tasks = tasks.filter(task_type=task_type)
+        
+        counts = {status: 0 for status, _ in LinkedInTask.STATUS_CHOICES}
+        for row in tasks.order_by().values('status').annotate(count=Count('task_id')):
+            counts[row['status']] = row['count']
+        return counts
+    
+    # Queue lifecycle events tracked per task type
+    QUEUE_EVENTS = ('created', 'started', 'completed', 'failed', 'retried', 'cancelled')
     
-    def get_queue_metrics(self) -> Dict[str, Any]:
+    def get_queue_metrics(self, hours: int = None) -> Dict[str, Any]:
         """
         Get task queue metrics.
         
+        Args:
+            hours: Number of hours to aggregate (default: full retention)
+        
         Returns:
             dict: Queue metrics by task type
         """
-        metrics_key = f"{self.cache_prefix}_queue_metrics"
-        return cache.get(metrics_key, {})
+        task_types = set()
+        for event in self.QUEUE_EVENTS:
+            task_types.update(self.metrics.get_labels(f"queue_{event}"))
+        
+        metrics = {task_type: {} for task_type in sorted(task_types)}
+        for event in self.QUEUE_EVENTS:
+            for task_type, total in self.metrics.get_counters(f"queue_{event}", metrics.keys(), hours).items():
+                metrics[task_type][event] = total
+        return metrics
     
-    def get_performance_metrics(self) -> Dict[str, Any]:
+    def get_performance_metrics(self, hours: int = None) -> Dict[str, Any]:
         """
         Get task performance metrics.
         
+        Args:
+            hours: Number of hours to aggregate (default: full retention)
+        
         Returns:
             dict: Performance metrics by task type
         """
-        perf_key = f"{self.cache_prefix}_performance_metrics"
-        return cache.get(perf_key, {})
+        histograms = self.metrics.get_histograms('task_duration', windows=hours)
+        success_counts = self.metrics.get_counters('task_successes', histograms.keys(), hours)
+        
+        performance = {}
+        for task_type, histogram in histograms.items():
+            if not histogram.count:
+                continue
+            performance[task_type] = {
+                'total_duration': histogram.total,
+                'count': histogram.count,
+                'success_count': success_counts.get(task_type, 0),
+                'average_duration': histogram.mean,
+                'min_duration': histogram.min,
+                'max_duration': histogram.max,
+                'p50': histogram.percentile(50),
+                'p95': histogram.percentile(95),
+            }
+        return performance
     
-    def get_active_tasks(self) -> List[Dict[str, Any]]:
+    def get_active_tasks(self, limit: int = 100) -> List[Dict[str, Any]]:
         """
         Get list of currently active tasks.
         
+        Args:
+            limit: Maximum number of tasks, newest first
+        
         Returns:
             list: List of active task summaries
         """
-        active_tasks = []
-        
-        # This is a simplified implementation
-        # In a real system, you'd maintain an index of active tasks
-        # For now, we'll return an empty list as we don't have a way to enumerate cache keys
-        
-        return active_tasks
+        return self.get_tasks(status=LinkedInTask.ACTIVE_STATUSES, limit=limit)
     
-    def cleanup_completed_tasks(self, hours: int = 24) -> int:
+    def cleanup_completed_tasks(self, hours: int = 24, batch_size: int = 1000) -> int:
         """
-        Clean up completed tasks older than specified hours.
+        Clean up finished tasks older than specified hours.
+        
+        Tasks and their events are deleted in batches to keep transactions short.
         
         Args:
-            hours: Hours after which to clean up completed tasks
+            hours: Hours after which to clean up finished tasks
+            batch_size: Number of tasks deleted per batch
             
         Returns:
             int: Number of tasks cleaned up
         """
-        # This would require maintaining an index of tasks
-        # For now, return 0 as we rely on cache TTL for cleanup
-        return 0
+        cutoff = timezone.now() - timedelta(hours=hours)
+        expired = LinkedInTask.objects.filter(
+            status__in=LinkedInTask.TERMINAL_STATUSES,
+            updated_at__lt=cutoff
+        )
+        
+        deleted = 0
+        while True:
+            task_ids = list(expired.values_list('task_id', flat=True)[:batch_size])
+            if not task_ids:
+                break
+            
+            with transaction.atomic():
+                LinkedInTaskEvent.objects.filter(task_id__in=task_ids).delete()
+                LinkedInTask.objects.filter(task_id__in=task_ids).delete()
+            
+            cache.delete_many([self._snapshot_key(task_id) for task_id in task_ids])
+            deleted += len(task_ids)
+        
+        if deleted:
+            logger.info(f"Cleaned up {deleted} finished LinkedIn tasks older than {hours}h")
+        
+        return deleted
     
     def _update_queue_metrics(self, task_type: str, metric_type: str):
         """
@@ -487,24 +794,7 @@ class LinkedInTaskMonitor:
             task_type: Type of task
             metric_type: Type of metric ('created', 'started', 'completed', 'failed', 'retried', 'cancelled')
         """
-        metrics_key = f"{self.cache_prefix}_queue_metrics"
-        current_metrics = cache.get(metrics_key, {})
-        
-        if task_type not in current_metrics:
-            current_metrics[task_type] = {
-                'created': 0,
-                'started': 0,
-                'completed': 0,
-                'failed': 0,
-                'retried': 0,
-                'cancelled': 0,
-                'last_updated': timezone.now().isoformat()
-            }
-        
-        current_metrics[task_type][metric_type] += 1
-        current_metrics[task_type]['last_updated'] = timezone.now().isoformat()
-        
-        cache.set(metrics_key, current_metrics, timeout=self.cache_ttl)
+        self.metrics.incr(f"queue_{metric_type}", task_type)
     
     def _update_task_performance_metrics(self, task_type: str, duration: float, success: bool):
         """
@@ -515,35 +805,9 @@ class LinkedInTaskMonitor:
             duration: Task duration in seconds
             success: Whether task was successful
         """
-        perf_key = f"{self.cache_prefix}_performance_metrics"
-        current_perf = cache.get(perf_key, {})
-        
-        if task_type not in current_perf:
-            current_perf[task_type] = {
-                'total_duration': 0.0,
-                'count': 0,
-                'success_count': 0,
-                'min_duration': float('inf'),
-                'max_duration': 0.0,
-                'durations': []
-            }
-        
-        task_perf = current_perf[task_type]
-        task_perf['total_duration'] += duration
-        task_perf['count'] += 1
-        
+        self.metrics.observe('task_duration', duration, task_type)
         if success:
-            task_perf['success_count'] += 1
-        
-        task_perf['min_duration'] = min(task_perf['min_duration'], duration)
-        task_perf['max_duration'] = max(task_perf['max_duration'], duration)
-        
-        # Keep last 50 durations for percentile calculations
-        task_perf['durations'].append(duration)
-        if len(task_perf['durations']) > 50:
-            task_perf['durations'] = task_perf['durations'][-50:]
-        
-        cache.set(perf_key, current_perf, timeout=self.cache_ttl)
+            self.metrics.incr('task_successes', task_type)
     
     def _check_step_performance_thresholds(self, step_name: str, duration: float):
         """
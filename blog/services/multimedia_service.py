@@ -30,6 +30,17 @@ class MultimediaService:
     # Supported image formats
     SUPPORTED_IMAGE_FORMATS = ['JPEG', 'PNG', 'WebP', 'GIF']
     
+    # Modern-format rendition configuration (widths for srcset, formats best compression first)
+    RENDITION_WIDTHS = (320, 640, 960, 1280, 1920)
+    RENDITION_FORMAT_ORDER = ('avif', 'webp')
+    RENDITION_FORMATS = {
+        'avif': {'pil_format': 'AVIF', 'extension': 'avif', 'mime': 'image/avif', 'options': {'quality': 60}},
+        'webp': {'pil_format': 'WEBP', 'extension': 'webp', 'mime': 'image/webp', 'options': {'quality': 80, 'method': 6}},
+    }
+    RENDITION_BASELINE_OPTIONS = {'quality': 85, 'optimize': True}
+    RENDITION_PATH = 'blog_images/renditions'
+    RENDITION_MANIFEST_VERSION = 1
+    
     # Video platform patterns
     VIDEO_PATTERNS = {
         'youtube': [
@@ -206,6 +217,175 @@ class MultimediaService:
             logger.error(f"Error generating responsive images for {image_path}: {str(e)}")
             raise
     
+    def get_supported_rendition_formats(self):
+        """
+        Get the modern formats the installed Pillow build can encode.
+        
+        Returns:
+            list: Format keys from RENDITION_FORMAT_ORDER that can be written
+        """
+        Image.init()
+        return [
+            fmt for fmt in self.RENDITION_FORMAT_ORDER
+            if self.RENDITION_FORMATS[fmt]['pil_format'] in Image.SAVE
+        ]
+    
+    def _get_rendition_widths(self, source_width):
+        """Get the srcset widths to generate for a source image, never upscaling"""
+        widths = [width for width in self.RENDITION_WIDTHS if width < source_width]
+        if source_width <= self.RENDITION_WIDTHS[-1]:
+            widths.append(source_width)
+        return widths
+    
+    def _encode_image(self, img, pil_format, options):
+        """Encode a PIL image in memory and return its bytes"""
+        img_io = BytesIO()
+        img.save(img_io, format=pil_format, **options)
+        return img_io.getvalue()
+    
+    def generate_renditions(self, media_item, formats=None, save=True):
+        """
+        Generate WebP/AVIF renditions of a media item's original image at the
+        configured srcset widths and record them in the item's manifest.
+        
+        The manifest is compact: each format maps to a list of
+        [width, height, bytes, storage_path] entries in ascending width, and
+        'jpeg' holds the [width, height, bytes] of an equivalent JPEG encode so
+        that byte savings can be reported without keeping extra files.
+        
+        Args:
+            media_item: MediaItem with an original_image
+            formats: Format keys to generate (default: all supported)
+            save: Whether to persist the manifest on the media item
+            
+        Returns:
+            dict: The renditions manifest
+        """
+        if not media_item.original_image:
+            raise ValueError(f"Media item {media_item.pk} has no original image")
+        
+        if formats is None:
+            formats = self.get_supported_rendition_formats()
+        
+        source_name = media_item.original_image.name
+        base_name = slugify(os.path.splitext(os.path.basename(source_name))[0]) or 'image'
+        
+        try:
+            with default_storage.open(source_name, 'rb') as f:
+                with Image.open(f) as img:
+                    img = ImageOps.exif_transpose(img)
+                    if img.mode not in ('RGB', 'RGBA'):
+                        img = img.convert('RGBA' if 'transparency' in img.info or img.mode in ('LA', 'PA') else 'RGB')
+                    
+                    manifest = {
+                        'v': self.RENDITION_MANIFEST_VERSION,
+                        'src': source_name,
+                        'w': img.width,
+                        'h': img.height,
+                        'jpeg': [],
+                    }
+                    for fmt in formats:
+                        manifest[fmt] = []
+                    
+                    for width in self._get_rendition_widths(img.width):
+                        height = max(1, round(img.height * width / img.width))
+                        resized = img if width == img.width else img.resize((width, height), Image.Resampling.LANCZOS)
+                        
+                        baseline = resized.convert('RGB') if resized.mode != 'RGB' else resized
+                        baseline_bytes = self._encode_image(baseline, 'JPEG', self.RENDITION_BASELINE_OPTIONS)
+                        manifest['jpeg'].append([width, height, len(baseline_bytes)])
+                        
+                        for fmt in formats:
+                            config = self.RENDITION_FORMATS[fmt]
+                            data = self._encode_image(resized, config['pil_format'], config['options'])
+                            file_path = f"{self.RENDITION_PATH}/{base_name}_{media_item.pk}_{width}w.{config['extension']}"
+                            if default_storage.exists(file_path):
+                                default_storage.delete(file_path)
+                            saved_path = default_storage.save(file_path, ContentFile(data))
+                            manifest[fmt].append([width, height, len(data), saved_path])
+        
+        except Exception as e:
+            logger.error(f"Error generating renditions for media item {media_item.pk}: {str(e)}")
+            raise
+        
+        stale_paths = self._get_rendition_paths(media_item.renditions) - self._get_rendition_paths(manifest)
+        for path in stale_paths:
+            try:
+                default_storage.delete(path)
+            except Exception as e:
+                logger.warning(f"Could not delete stale rendition {path}: {str(e)}")
+        
+        media_item.renditions = manifest
+        if save:
+            media_item.save(update_fields=['renditions', 'updated_at'])
+        return manifest
+    
+    def _get_rendition_paths(self, manifest):
+        """Get the storage paths referenced by a renditions manifest"""
+        paths = set()
+        for fmt in self.RENDITION_FORMAT_ORDER:
+            for entry in (manifest or {}).get(fmt, []):
+                paths.add(entry[3])
+        return paths
+    
+    def delete_renditions(self, media_item, save=True):
+        """
+        Delete all rendition files of a media item and clear its manifest.
+        
+        Args:
+            media_item: MediaItem whose renditions should be removed
+            save: Whether to persist the cleared manifest
+        """
+        for path in self._get_rendition_paths(media_item.renditions):
+            try:
+                default_storage.delete(path)
+            except Exception as e:
+                logger.warning(f"Could not delete rendition {path}: {str(e)}")
+        
+        media_item.renditions = {}
+        if save:
+            media_item.save(update_fields=['renditions', 'updated_at'])
+    
+    def summarize_rendition_savings(self, manifests):
+        """
+        Summarize byte savings of modern-format renditions over JPEG.
+        
+        Args:
+            manifests: Iterable of renditions manifests
+            
+        Returns:
+            dict: Item count, JPEG baseline bytes and per-format bytes/savings
+        """
+        summary = {'items': 0, 'renditions': 0, 'jpeg_bytes': 0, 'formats': {}}
+        
+        for manifest in manifests:
+            if not manifest:
+                continue
+            baseline = {entry[0]: entry[2] for entry in manifest.get('jpeg', [])}
+            if not baseline:
+                continue
+            summary['items'] += 1
+            summary['renditions'] += len(baseline)
+            summary['jpeg_bytes'] += sum(baseline.values())
+            
+            for fmt in self.RENDITION_FORMAT_ORDER:
+                entries = manifest.get(fmt)
+                if not entries:
+                    continue
+                stats = summary['formats'].setdefault(fmt, {'items': 0, 'bytes': 0, 'jpeg_bytes': 0})
+                stats['items'] += 1
+                for width, _, size, _ in entries:
+                    stats['bytes'] += size
+                    stats['jpeg_bytes'] += baseline.get(width, 0)
+        
+        for stats in summary['formats'].values():
+            stats['saved_bytes'] = stats['jpeg_bytes'] - stats['bytes']
+            stats['saved_percent'] = (
+                round(100.0 * stats['saved_bytes'] / stats['jpeg_bytes'], 1) if stats['jpeg_bytes'] else 0.0
+            )
+        
+        return summary
+    
     def extract_video_embed(self, url):
         """
         Extract video embed information from URL.
@@ -0,0 +1,312 @@
+"""
+Post Card Service for Blog Posts
+
+List pages and discovery widgets only show a card for each post: title,
+excerpt, author, date, read time, image and a few category and tag links.
+Loading full ``Post`` rows for them also reads the content and meta data,
+which are often tens of KB per post, and then queries the categories and
+tags of every post again through ``post.categories.first`` and
+``post.tags.all``.
+
+``PostCardService.cards()`` takes the queryset of a page and reads it as
+``values()`` rows of the id, ``updated_at`` and view count only. Each card
+is stored in the cache under its post id, tagged with the ``updated_at``
+it was built from. A page of cached cards costs that one query and one
+``get_many``. Missing or outdated cards are built together, with one query
+for their fields and author and one query each for their categories and
+tags. View counts, comment counts and recent views change too often to
+cache, so they are attached to the cards on every call.
+
+Each card has a ``version`` fingerprint of its cached fields. It can key
+template fragment caches, and it changes whenever the card would render
+differently. Category, tag and author changes don't touch ``updated_at``,
+so the post card signals drop the affected cards.
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from django.core.cache import cache
+from django.db.models import Count
+from django.urls import reverse
+
+from ..models import Comment, Post
+from .social_image_service import SocialImageService
+
+
+logger = logging.getLogger(__name__)
+
+
+class CategoryLink(NamedTuple):
+    id: int
+    name: str
+    slug: str
+
+
+class TagChip(NamedTuple):
+    id: int
+    name: str
+    slug: str
+    color: str
+
+
+@dataclass
+class PostCard:
+    """Lightweight stand-in for a Post in list views and widgets."""
+
+    id: int
+    title: str
+    slug: str
+    excerpt: str
+    author_name: str
+    author_username: str
+    created_at: datetime
+    updated_at: datetime
+    read_time: int
+    is_featured: bool
+    featured_image_url: Optional[str]
+    image_url: Optional[str]
+    categories: List[CategoryLink] = field(default_factory=list)
+    tags: List[TagChip] = field(default_factory=list)
+    version: str = ''
+
+    # Not cached; attached on every call
+    view_count: int = 0
+    comment_count: Optional[int] = None
+    recent_views: Optional[int] = None
+
+    @property
+    def pk(self) -> int:
+        return self.id
+
+    @property
+    def category(self) -> Optional[CategoryLink]:
+        """The first category by name, as ``post.categories.first`` was."""
+        return self.categories[0] if self.categories else None
+
+    def get_absolute_url(self) -> str:
+        return reverse('blog:detail', kwargs={'slug': self.slug})
+
+
+class PostCardService:
+    """Service for building and caching post cards"""
+
+    CACHE_PREFIX = 'blog:post_card'
+    CACHE_TIMEOUT = 86400  # 24 hours
+
+    # Columns read when a card is built
+    CARD_FIELDS = (
+        'id', 'title', 'slug', 'excerpt', 'created_at', 'updated_at', 'read_time', 'is_featured',
+        'featured_image', 'social_images', 'author__username', 'author__first_name', 'author__last_name',
+    )
+
+    # Fields of the card that are cached and fingerprinted
+    VERSIONED_FIELDS = (
+        'title', 'slug', 'excerpt', 'author_name', 'created_at', 'read_time', 'is_featured',
+        'featured_image_url', 'image_url', 'categories', 'tags',
+    )
+
+    @classmethod
+    def cache_key(cls, post_id: int) -> str:
+        return f"{cls.CACHE_PREFIX}:{post_id}"
+
+    @classmethod
+    def cards(cls, queryset, with_comment_counts: bool = False) -> List[PostCard]:
+        """
+        Get the cards of the posts of a queryset, in its order.
+
+        Args:
+            queryset: Post queryset, usually a sliced page
+            with_comment_counts: Also count the comments of each post
+
+        Returns:
+            list: PostCard objects
+        """
+        rows = list(queryset.values('id', 'updated_at', 'view_count'))
+        cards = cls._get_cards({row['id']: row['updated_at'] for row in rows})
+
+        comment_counts = cls._comment_counts(cards) if with_comment_counts else {}
+        result = []
+        for row in rows:
+            card = cards[row['id']]
+            card.view_count = row['view_count']
+            if with_comment_counts:
+                card.comment_count = comment_counts.get(card.id, 0)
+            result.append(card)
+        return result
+
+    @classmethod
+    def cards_for_ids(cls, post_ids: Iterable[int], **kwargs) -> List[PostCard]:
+        """
+        Get the cards of posts by ID, in the given order.
+
+        Posts that no longer exist are skipped.
+
+        Args:
+            post_ids: Post IDs
+            **kwargs: Passed to cards()
+
+        Returns:
+            list: PostCard objects
+        """
+        post_ids = list(post_ids)
+        cards = {card.id: card for card in cls.cards(Post.objects.filter(pk__in=post_ids), **kwargs)}
+        return [cards[post_id] for post_id in post_ids if post_id in cards]
+
+    @classmethod
+    def _get_cards(cls, versions: Dict[int, datetime]) -> Dict[int, PostCard]:
+        """
+        Get cards from the cache, building the missing and outdated ones.
+
+        Args:
+            versions: Post ID to the updated_at the card must match
+
+        Returns:
+            dict: Post ID to a fresh copy of its card
+        """
+        if not versions:
+            return {}
+
+        keys = {cls.cache_key(post_id): post_id for post_id in versions}
+        try:
+            cached = cache.get_many(keys)
+        except Exception as e:
+            logger.warning(f"Post card cache error: {str(e)}")
+            cached = {}
+
+        cards = {}
+        for key, card in cached.items():
+            if card.updated_at == versions[keys[key]]:
+                cards[card.id] = card
+
+        missing = [post_id for post_id in versions if post_id not in cards]
+        if missing:
+            built = cls.build(missing)
+            try:
+                cache.set_many({cls.cache_key(post_id): card for post_id, card in built.items()}, cls.CACHE_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Failed to cache post cards: {str(e)}")
+            cards.update(built)
+        return cards
+
+    @classmethod
+    def build(cls, post_ids: List[int]) -> Dict[int, PostCard]:
+        """
+        Build cards with three queries, whatever the number of posts.
+
+        Posts without a current social image manifest have it resolved in
+        memory, as ``SocialImageService.get_manifest()`` would.
+
+        Args:
+            post_ids: Post IDs
+
+        Returns:
+            dict: Post ID to PostCard
+        """
+        categories = {post_id: [] for post_id in post_ids}
+        for row in (
+            Post.categories.through.objects.filter(post_id__in=post_ids)
+            .order_by('category__name', 'category_id')
+            .values_list('post_id', 'category_id', 'category__name', 'category__slug')
+        ):
+            categories[row[0]].append(CategoryLink(*row[1:]))
+
+        tags = {post_id: [] for post_id in post_ids}
+        for row in (
+            Post.tags.through.objects.filter(post_id__in=post_ids)
+            .order_by('tag__name', 'tag_id')
+            .values_list('post_id', 'tag_id', 'tag__name', 'tag__slug', 'tag__color')
+        ):
+            tags[row[0]].append(TagChip(*row[1:]))
+
+        rows = list(Post.objects.filter(pk__in=post_ids).values(*cls.CARD_FIELDS))
+        manifests = cls._manifests(rows)
+
+        cards = {}
+        for row in rows:
+            full_name = f"{row['author__first_name']} {row['author__last_name']}".strip()
+            featured_image_url = cls._file_url(Post, 'featured_image', row['featured_image'])
+            card = PostCard(
+                id=row['id'],
+                title=row['title'],
+                slug=row['slug'],
+                excerpt=row['excerpt'],
+                author_name=full_name or row['author__username'],
+                author_username=row['author__username'],
+                created_at=row['created_at'],
+                updated_at=row['updated_at'],
+                read_time=row['read_time'],
+                is_featured=row['is_featured'],
+                featured_image_url=featured_image_url,
+                image_url=featured_image_url or cls._best_image_url(manifests[row['id']]),
+                categories=categories[row['id']],
+                tags=tags[row['id']],
+            )
+            card.version = cls.content_version(card)
+            cards[card.id] = card
+        return cards
+
+    @classmethod
+    def content_version(cls, card: PostCard) -> str:
+        """
+        Fingerprint the cached fields of a card.
+
+        Args:
+            card: PostCard
+
+        Returns:
+            str: Hex digest that changes whenever the card renders differently
+        """
+        digest = hashlib.sha1()
+        for field_name in cls.VERSIONED_FIELDS:
+            digest.update(repr(getattr(card, field_name)).encode('utf-8'))
+            digest.update(b'\x1f')
+        return digest.hexdigest()[:16]
+
+    @staticmethod
+    def _file_url(model, field_name: str, name: str) -> Optional[str]:
+        """Get the storage URL of a file field value read with values()."""
+        if not name:
+            return None
+        return model._meta.get_field(field_name).storage.url(name)
+
+    @staticmethod
+    def _manifests(rows: List[Dict]) -> Dict[int, Dict]:
+        """Get the social image manifests of card rows, resolving missing ones without storing them."""
+        manifests = {row['id']: row['social_images'] for row in rows}
+        stale = [
+            post_id for post_id, manifest in manifests.items()
+            if not manifest or manifest.get('version') != SocialImageService.MANIFEST_VERSION
+        ]
+        if stale:
+            # Posts created in bulk and not refreshed yet
+            for post in Post.objects.filter(pk__in=stale).only('id', 'social_image', 'featured_image'):
+                manifests[post.id] = SocialImageService.build_manifest(post)
+        return manifests
+
+    @staticmethod
+    def _best_image_url(manifest: Dict) -> Optional[str]:
+        """Get the URL of the best sharing image in a manifest."""
+        best = manifest.get('best') if manifest else None
+        return best['url'] if best else None
+
+    @staticmethod
+    def _comment_counts(cards: Dict[int, PostCard]) -> Dict[int, int]:
+        """Count the comments of the posts with one grouped query, as ``post.comments.count`` did."""
+        return dict(
+            Comment.objects.filter(post_id__in=list(cards))
+            .order_by().values('post_id').annotate(count=Count('id')).values_list('post_id', 'count')
+        )
+
+    @classmethod
+    def invalidate_posts(cls, post_ids):
+        """Drop the stored cards of posts."""
+        keys = [cls.cache_key(post_id) for post_id in set(post_ids)]
+        if keys:
+            try:
+                cache.delete_many(keys)
+            except Exception as e:
+                logger.warning(f"Failed to invalidate post cards: {str(e)}")
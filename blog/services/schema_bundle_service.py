@@ -0,0 +1,218 @@
+"""
+Schema Bundle Service for Blog Posts
+
+This service compiles the JSON-LD served on a post page (the Article schema,
+with its embedded author and publisher, and the BreadcrumbList) into the
+final ``<script type="application/ld+json">`` payload once, and stores it in
+the cache as pre-encoded bytes. A page render then costs one cache read
+instead of separate schema lookups, validation passes and ``json.dumps``
+calls.
+
+Bundles are keyed per post and tagged with a fingerprint of the post's
+content fields. Counters such as ``view_count`` and the ``updated_at``
+timestamp are left out, so view count flushes don't invalidate the bundle.
+Changes to related data (author profile, categories, tags and media) drop
+the bundle through the schema cache signals, and publishing a post warms it.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Optional
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.cache import caches
+
+from ..models import Post
+from .schema_service import SchemaService
+
+
+logger = logging.getLogger(__name__)
+
+
+# Characters escaped so the JSON can't close the surrounding <script> element
+_SCRIPT_ESCAPES = {
+    ord('<'): '\\u003C',
+    ord('>'): '\\u003E',
+    ord('&'): '\\u0026',
+}
+
+
+class CanonicalURLBuilder:
+    """
+    Stand-in for a request when building absolute URLs.
+
+    Bundles are shared across requests and warmed outside of them, so URLs
+    are built against the canonical site domain instead of the request host.
+    """
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip('/') + '/'
+
+    def build_absolute_uri(self, location: str = '/') -> str:
+        return urljoin(self.base_url, location)
+
+
+class SchemaBundleService:
+    """Service for compiling and serving pre-encoded JSON-LD bundles"""
+
+    CACHE_PREFIX = 'schema:bundle'
+    CACHE_TIMEOUT = 86400 * 7
+
+    # Bump when the bundle layout changes, to retire bundles built by older code
+    BUNDLE_FORMAT = 1
+
+    # Post fields the bundle is built from; counters are deliberately left out
+    CONTENT_FIELDS = (
+        'id', 'slug', 'title', 'excerpt', 'content', 'status',
+        'author_id', 'created_at', 'featured_image', 'social_image',
+    )
+
+    @staticmethod
+    def _cache():
+        try:
+            return caches['schema_cache']
+        except Exception:
+            return caches['default']
+
+    @classmethod
+    def cache_key(cls, post_id: int) -> str:
+        return f"{cls.CACHE_PREFIX}:{post_id}"
+
+    @staticmethod
+    def get_base_url() -> str:
+        """Get the canonical site URL that bundle URLs are built against."""
+        domain = getattr(settings, 'SITE_DOMAIN', 'kabhishek18.com')
+        if '://' not in domain:
+            domain = f"https://{domain}"
+        return domain
+
+    @classmethod
+    def content_version(cls, post) -> str:
+        """
+        Fingerprint the post fields that end up in the bundle.
+
+        Args:
+            post: Post instance
+
+        Returns:
+            str: Hex digest that changes only when schema content changes
+        """
+        digest = hashlib.sha1(f"{cls.BUNDLE_FORMAT}|{cls.get_base_url()}".encode('utf-8'))
+        for field_name in cls.CONTENT_FIELDS:
+            value = getattr(post, field_name)
+            if field_name in ('featured_image', 'social_image'):
+                value = value.name if value else ''
+            digest.update(b'\x1f')
+            digest.update(str(value).encode('utf-8'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def encode_script(schema_data) -> bytes:
+        """Serialize one schema as a JSON-LD script element."""
+        payload = json.dumps(schema_data, ensure_ascii=False).translate(_SCRIPT_ESCAPES)
+        return f'<script type="application/ld+json">{payload}</script>\n'.encode('utf-8')
+
+    @classmethod
+    def compile(cls, post) -> bytes:
+        """
+        Build, validate and serialize the JSON-LD bundle for a post.
+
+        Validation only runs here; serving a bundle never re-validates it.
+
+        Args:
+            post: Post instance
+
+        Returns:
+            bytes: UTF-8 encoded script elements
+        """
+        url_builder = CanonicalURLBuilder(cls.get_base_url())
+
+        try:
+            article = SchemaService.build_article_schema(post, url_builder)
+        except Exception as e:
+            logger.error(f"Error building article schema bundle for post {post.id}: {str(e)}")
+            article = SchemaService._get_minimal_article_schema(post, url_builder)
+        breadcrumb = SchemaService.generate_breadcrumb_schema(post, url_builder)
+
+        payload = b''
+        for schema in (article, breadcrumb):
+            if not schema:
+                continue
+            if not SchemaService.validate_schema(schema):
+                # Still served, as the inclusion tag always did
+                logger.warning(f"{schema.get('@type')} schema for post {post.id} failed validation")
+            payload += cls.encode_script(schema)
+        return payload
+
+    @classmethod
+    def get_bundle(cls, post) -> bytes:
+        """
+        Get the JSON-LD bundle for a post, compiling it on a miss.
+
+        A hit costs one cache read and no queries.
+
+        Args:
+            post: Post instance
+
+        Returns:
+            bytes: UTF-8 encoded script elements
+        """
+        cache = cls._cache()
+        key = cls.cache_key(post.id)
+        version = cls.content_version(post)
+
+        try:
+            cached = cache.get(key)
+        except Exception as e:
+            logger.warning(f"Schema bundle cache error for post {post.id}: {str(e)}")
+            cached = None
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        payload = cls.compile(post)
+        try:
+            cache.set(key, (version, payload), cls.CACHE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Failed to cache schema bundle for post {post.id}: {str(e)}")
+        return payload
+
+    @classmethod
+    def warm(cls, post_id: int) -> Optional[bytes]:
+        """
+        Compile and store the bundle of a published post.
+
+        Args:
+            post_id: ID of the post
+
+        Returns:
+            bytes: The bundle, or None when the post isn't published
+        """
+        post = (
+            Post.objects.filter(pk=post_id, status='published')
+            .select_related('author', 'author__author_profile')
+            .prefetch_related('categories', 'tags', 'media_items')
+            .first()
+        )
+        if post is None:
+            return None
+        return cls.get_bundle(post)
+
+    @classmethod
+    def invalidate_post(cls, post_id: int):
+        """Drop the stored bundle of a post."""
+        try:
+            cls._cache().delete(cls.cache_key(post_id))
+        except Exception as e:
+            logger.warning(f"Failed to invalidate schema bundle for post {post_id}: {str(e)}")
+
+    @classmethod
+    def invalidate_posts(cls, post_ids):
+        """Drop the stored bundles of several posts."""
+        keys = [cls.cache_key(post_id) for post_id in set(post_ids)]
+        if keys:
+            try:
+                cls._cache().delete_many(keys)
+            except Exception as e:
+                logger.warning(f"Failed to invalidate schema bundles: {str(e)}")
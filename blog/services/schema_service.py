@@ -86,86 +86,7 @@ class SchemaService:
             performance_monitor.record_cache_miss('schema_article')
         
         try:
-            # Build absolute URL
-            if request:
-                absolute_url = request.build_absolute_uri(post.get_absolute_url())
-            else:
-                # Fallback to constructing URL manually
-                domain = getattr(settings, 'SITE_DOMAIN', 'kabhishek18.com')
-                absolute_url = f"https://{domain}{post.get_absolute_url()}"
-            
-            # Handle date formatting safely
-            try:
-                date_published = post.created_at.isoformat() if hasattr(post.created_at, 'isoformat') else str(post.created_at)
-                date_modified = post.updated_at.isoformat() if hasattr(post.updated_at, 'isoformat') else str(post.updated_at)
-            except:
-                date_published = "2024-01-01T00:00:00Z"
-                date_modified = "2024-01-01T00:00:00Z"
-            
-            # Generate base article schema
-            schema = {
-                "@context": SchemaService.SCHEMA_CONTEXT,
-                "@type": "Article",
-                "headline": SchemaService._truncate_headline(post.title),
-                "url": absolute_url,
-                "datePublished": date_published,
-                "dateModified": date_modified,
-                "author": SchemaService.generate_author_schema(post.author, request),
-                "publisher": SchemaService.generate_publisher_schema(),
-            }
-            
-            # Add description/excerpt
-            if post.excerpt:
-                schema["description"] = SchemaService._clean_text(post.excerpt)
-            elif post.content:
-                # Generate excerpt from content
-                clean_content = strip_tags(post.content)
-                schema["description"] = Truncator(clean_content).words(30)
-            
-            # Add word count and reading time
-            if post.content:
-                word_count = len(strip_tags(post.content).split())
-                schema["wordCount"] = word_count
-                
-                # Convert reading time to ISO 8601 duration format
-                reading_minutes = post.get_reading_time()
-                schema["timeRequired"] = f"PT{reading_minutes}M"
-            
-            # Add images (optimized to avoid N+1 queries)
-            images = SchemaService._get_post_images(post, request)
-            if images:
-                schema["image"] = images
-            
-            # Use prefetched categories and tags to avoid additional queries
-            try:
-                # Try to use prefetched data first
-                if hasattr(post, '_prefetched_objects_cache') and 'categories' in post._prefetched_objects_cache:
-                    categories = [cat.name for cat in post.categories.all()]
-                else:
-                    categories = list(post.categories.values_list('name', flat=True))
-                
-                if categories:
-                    schema["articleSection"] = categories
-            except Exception as e:
-                logger.warning(f"Error getting categories for post {post.id}: {str(e)}")
-            
-            try:
-                # Try to use prefetched data first
-                if hasattr(post, '_prefetched_objects_cache') and 'tags' in post._prefetched_objects_cache:
-                    tags = [tag.name for tag in post.tags.all()]
-                else:
-                    tags = list(post.tags.values_list('name', flat=True))
-                
-                if tags:
-                    schema["keywords"] = tags
-            except Exception as e:
-                logger.warning(f"Error getting tags for post {post.id}: {str(e)}")
-            
-            # Add main entity of page
-            schema["mainEntityOfPage"] = {
-                "@type": "WebPage",
-                "@id": absolute_url
-            }
+            schema = SchemaService.build_article_schema(post, request)
             
             # Cache the generated schema
             try:
@@ -185,6 +106,101 @@ class SchemaService:
             # Return minimal schema on error
             return SchemaService._get_minimal_article_schema(post, request)
 
+    @staticmethod
+    def build_article_schema(post, request=None) -> Dict[str, Any]:
+        """
+        Build Article schema markup for a blog post without caching.
+        
+        Args:
+            post: Post model instance (should be prefetched with related data)
+            request: Django request object for absolute URL generation
+            
+        Returns:
+            Dict containing Article schema markup
+        """
+        # Build absolute URL
+        if request:
+            absolute_url = request.build_absolute_uri(post.get_absolute_url())
+        else:
+            # Fallback to constructing URL manually
+            domain = getattr(settings, 'SITE_DOMAIN', 'kabhishek18.com')
+            absolute_url = f"https://{domain}{post.get_absolute_url()}"
+        
+        # Handle date formatting safely
+        try:
+            date_published = post.created_at.isoformat() if hasattr(post.created_at, 'isoformat') else str(post.created_at)
+            date_modified = post.updated_at.isoformat() if hasattr(post.updated_at, 'isoformat') else str(post.updated_at)
+        except:
+            date_published = "2024-01-01T00:00:00Z"
+            date_modified = "2024-01-01T00:00:00Z"
+        
+        # Generate base article schema
+        schema = {
+            "@context": SchemaService.SCHEMA_CONTEXT,
+            "@type": "Article",
+            "headline": SchemaService._truncate_headline(post.title),
+            "url": absolute_url,
+            "datePublished": date_published,
+            "dateModified": date_modified,
+            "author": SchemaService.generate_author_schema(post.author, request),
+            "publisher": SchemaService.generate_publisher_schema(),
+        }
+        
+        # Add description/excerpt
+        if post.excerpt:
+            schema["description"] = SchemaService._clean_text(post.excerpt)
+        elif post.content:
+            # Generate excerpt from content
+            clean_content = strip_tags(post.content)
+            schema["description"] = Truncator(clean_content).words(30)
+        
+        # Add word count and reading time
+        if post.content:
+            word_count = len(strip_tags(post.content).split())
+            schema["wordCount"] = word_count
+            
+            # Convert reading time to ISO 8601 duration format
+            reading_minutes = post.get_reading_time()
+            schema["timeRequired"] = f"PT{reading_minutes}M"
+        
+        # Add images (optimized to avoid N+1 queries)
+        images = SchemaService._get_post_images(post, request)
+        if images:
+            schema["image"] = images
+        
+        # Use prefetched categories and tags to avoid additional queries
+        try:
+            # Try to use prefetched data first
+            if hasattr(post, '_prefetched_objects_cache') and 'categories' in post._prefetched_objects_cache:
+                categories = [cat.name for cat in post.categories.all()]
+            else:
+                categories = list(post.categories.values_list('name', flat=True))
+            
+            if categories:
+                schema["articleSection"] = categories
+        except Exception as e:
+            logger.warning(f"Error getting categories for post {post.id}: {str(e)}")
+        
+        try:
+            # Try to use prefetched data first
+            if hasattr(post, '_prefetched_objects_cache') and 'tags' in post._prefetched_objects_cache:
+                tags = [tag.name for tag in post.tags.all()]
+            else:
+                tags = list(post.tags.values_list('name', flat=True))
+            
+            if tags:
+                schema["keywords"] = tags
+        except Exception as e:
+            logger.warning(f"Error getting tags for post {post.id}: {str(e)}")
+        
+        # Add main entity of page
+        schema["mainEntityOfPage"] = {
+            "@type": "WebPage",
+            "@id": absolute_url
+        }
+        
+        return schema
+
     @staticmethod
     def generate_author_schema(author, request=None) -> Dict[str, Any]:
         """
@@ -509,7 +525,7 @@ class SchemaService:
         Get all relevant images for a post.
         
         Args:
-            post: Post model instance (should be prefetched with media_items)
+            post: Post model instance
             request: Django request object for absolute URL generation
             
         Returns:
@@ -518,38 +534,24 @@ class SchemaService:
         images = []
         
         try:
-            # Add featured image
-            if post.featured_image:
+            from .social_image_service import SocialImageService
+            
+            # Resolved when the post or its media change, so no media query here
+            manifest = SocialImageService.get_manifest(post)
+            featured, social = manifest['featured_image'], manifest['social_image']
+            candidates = [featured]
+            if social and (not featured or social['name'] != featured['name']):
+                candidates.append(social)
+            candidates.extend(SocialImageService.get_original_images(post))
+            
+            domain = getattr(settings, 'SITE_DOMAIN', 'kabhishek18.com')
+            for image in candidates:
+                if not image:
+                    continue
                 if request:
-                    images.append(request.build_absolute_uri(post.featured_image.url))
+                    images.append(request.build_absolute_uri(image['url']))
                 else:
-                    domain = getattr(settings, 'SITE_DOMAIN', 'kabhishek18.com')
-                    images.append(f"https://{domain}{post.featured_image.url}")
-            
-            # Add social image if different from featured
-            if post.social_image and post.social_image != post.featured_image:
-                if request:
-                    images.append(request.build_absolute_uri(post.social_image.url))
-                else:
-                    domain = getattr(settings, 'SITE_DOMAIN', 'kabhishek18.com')
-                    images.append(f"https://{domain}{post.social_image.url}")
-            
-            # Add media item images (use prefetched data if available)
-            try:
-                if hasattr(post, '_prefetched_objects_cache') and 'media_items' in post._prefetched_objects_cache:
-                    media_items = [item for item in post.media_items.all() if item.media_type == 'image']
-                else:
-                    media_items = post.media_items.filter(media_type='image')
-                
-                for media_item in media_items:
-                    if media_item.original_image:
-                        if request:
-                            images.append(request.build_absolute_uri(media_item.original_image.url))
-                        else:
-                            domain = getattr(settings, 'SITE_DOMAIN', 'kabhishek18.com')
-                            images.append(f"https://{domain}{media_item.original_image.url}")
-            except Exception as e:
-                logger.warning(f"Error getting media items for post {post.id}: {str(e)}")
+                    images.append(f"https://{domain}{image['url']}")
             
         except Exception as e:
             logger.error(f"Error getting post images: {str(e)}")
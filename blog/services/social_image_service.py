@@ -0,0 +1,384 @@
+"""
+Social Image Service
+
+This service resolves the images used to share a post (Open Graph and
+Twitter tags, JSON-LD, LinkedIn) once, when the post or its media change,
+and stores the result on the post as a manifest. Templates, the schema
+service and the LinkedIn services read the manifest instead of querying
+media items and opening image files on every render.
+
+The manifest holds each candidate image with its URL, dimensions and MIME
+type, in the order the selection rules look at them:
+
+    {
+        "version": 1,
+        "social_image": {"url": ..., "width": ..., "height": ..., "type": ..., "source": "social_image"},
+        "featured_image": {...},
+        "media": [{"id": 3, "featured": true, "alt": "...", "large": {...}, "medium": null, "original": {...}}],
+        "best": {...},
+        "alt": "..."
+    }
+
+URLs are stored as returned by the storage backend; callers make them
+absolute the way they always have.
+
+Reads never write: manifests of existing posts are filled in by a data
+migration, and posts created in bulk get theirs from the
+``refresh_social_images`` command. Until then a read resolves the images
+in memory without storing them.
+"""
+
+import logging
+import os
+from typing import Dict, Iterable, List, Optional
+
+from PIL import Image
+from django.db.models import Q
+
+from ..models import Post
+
+
+logger = logging.getLogger(__name__)
+
+
+class SocialImageService:
+    """Service for precomputed social sharing images"""
+
+    MANIFEST_VERSION = 1
+
+    # Media renditions in order of preference for sharing
+    MEDIA_RENDITIONS = ('large', 'medium', 'original')
+
+    # Large images close to LinkedIn's preferred 1200x627
+    LINKEDIN_WIDTH_RANGE = (1100, 1300)
+    LINKEDIN_HEIGHT_RANGE = (600, 700)
+
+    IMAGE_TYPES = {
+        '.jpg': 'image/jpeg',
+        '.jpeg': 'image/jpeg',
+        '.png': 'image/png',
+        '.gif': 'image/gif',
+        '.webp': 'image/webp',
+        '.svg': 'image/svg+xml',
+    }
+
+    @staticmethod
+    def image_dimensions(image_field) -> Dict[str, int]:
+        """
+        Get the dimensions of an image file.
+
+        Args:
+            image_field: ImageField file
+
+        Returns:
+            dict: 'width' and 'height', with defaults when the file can't be read
+        """
+        if not image_field:
+            return {'width': 512, 'height': 512}
+
+        try:
+            if hasattr(image_field, 'path') and os.path.exists(image_field.path):
+                with Image.open(image_field.path) as img:
+                    return {'width': img.width, 'height': img.height}
+        except Exception:
+            pass
+
+        # LinkedIn recommended dimensions
+        return {'width': 1200, 'height': 627}
+
+    @classmethod
+    def image_type(cls, image_field) -> str:
+        """Get the MIME type of an image file from its extension."""
+        try:
+            if image_field and getattr(image_field, 'name', None):
+                return cls.IMAGE_TYPES.get(os.path.splitext(image_field.name)[1].lower(), 'image/jpeg')
+        except Exception:
+            pass
+        return 'image/jpeg'
+
+    @classmethod
+    def describe(cls, image_field, source: str) -> Optional[Dict]:
+        """
+        Describe an image for the manifest.
+
+        Args:
+            image_field: ImageField file
+            source: Where the image comes from, e.g. 'social_image'
+
+        Returns:
+            dict with url, name, width, height, type and source, or None
+        """
+        if not image_field:
+            return None
+        try:
+            url = image_field.url
+        except Exception as e:
+            logger.warning(f"Could not get URL of image {getattr(image_field, 'name', '')}: {str(e)}")
+            return None
+        return {
+            'url': url,
+            'name': image_field.name,
+            **cls.image_dimensions(image_field),
+            'type': cls.image_type(image_field),
+            'source': source,
+        }
+
+    # Building
+
+    @classmethod
+    def build_manifest(cls, post: Post) -> Dict:
+        """
+        Resolve the sharing images of a post.
+
+        Reads the post's image media items with one query and opens each
+        image file once to read its dimensions.
+
+        Args:
+            post: Post instance
+
+        Returns:
+            dict: The manifest
+        """
+        media = []
+        for item in post.media_items.filter(media_type='image'):
+            media.append({
+                'id': item.id,
+                'featured': item.is_featured,
+                'alt': item.alt_text,
+                'large': cls.describe(item.large_image, 'media_item'),
+                'medium': cls.describe(item.medium_image, 'media_item'),
+                'original': cls.describe(item.original_image, 'media_item'),
+            })
+
+        manifest = {
+            'version': cls.MANIFEST_VERSION,
+            'social_image': cls.describe(post.social_image, 'social_image'),
+            'featured_image': cls.describe(post.featured_image, 'featured_image'),
+            'media': media,
+        }
+        manifest['best'] = cls._select_best(manifest)
+        manifest['alt'] = cls._select_alt(manifest)
+        return manifest
+
+    @classmethod
+    def _select_best(cls, manifest):
+        # Social image, featured image, then the featured media item's (or
+        # failing that the first image's) largest rendition
+        best = manifest['social_image'] or manifest['featured_image']
+        if best or not manifest['media']:
+            return best
+        chosen = cls._featured_media(manifest) or manifest['media'][0]
+        return cls._first_rendition(chosen)
+
+    @classmethod
+    def _select_alt(cls, manifest):
+        featured_media = cls._featured_media(manifest)
+        if (manifest['social_image'] or manifest['featured_image']) and featured_media and featured_media['alt']:
+            return featured_media['alt']
+        if manifest['media'] and manifest['media'][0]['alt']:
+            return manifest['media'][0]['alt']
+        return ''
+
+    @staticmethod
+    def _featured_media(manifest):
+        return next((entry for entry in manifest['media'] if entry['featured']), None)
+
+    @classmethod
+    def _first_rendition(cls, entry):
+        return next((entry[key] for key in cls.MEDIA_RENDITIONS if entry[key]), None)
+
+    @classmethod
+    def refresh(cls, post: Post) -> Dict:
+        """
+        Rebuild and store the manifest of a post.
+
+        The manifest is written with update(), so saving it doesn't send
+        post signals again.
+
+        Args:
+            post: Post instance
+
+        Returns:
+            dict: The new manifest
+        """
+        manifest = cls.build_manifest(post)
+        Post.objects.filter(pk=post.pk).update(social_images=manifest)
+        post.social_images = manifest
+        return manifest
+
+    @classmethod
+    def refresh_posts(cls, post_ids: Iterable[int]) -> int:
+        """
+        Rebuild and store the manifests of several posts.
+
+        Args:
+            post_ids: Post IDs
+
+        Returns:
+            Number of posts refreshed
+        """
+        post_ids = {post_id for post_id in post_ids if post_id is not None}
+        refreshed = 0
+        for post in Post.objects.filter(pk__in=post_ids).only('id', 'social_image', 'featured_image'):
+            try:
+                cls.refresh(post)
+                refreshed += 1
+            except Exception as e:
+                logger.error(f"Error refreshing social images for post {post.pk}: {str(e)}")
+        return refreshed
+
+    @classmethod
+    def stale_posts(cls):
+        """Get the posts whose manifest is missing or from an older version."""
+        return Post.objects.filter(
+            Q(social_images__version__isnull=True) | ~Q(social_images__version=cls.MANIFEST_VERSION)
+        )
+
+    @classmethod
+    def refresh_stale(cls, batch_size: int = 500) -> int:
+        """
+        Build and store the manifests of every post that lacks a current one.
+
+        Args:
+            batch_size: Number of posts read per query
+
+        Returns:
+            Number of posts refreshed
+        """
+        refreshed = 0
+        last_pk = 0
+        while True:
+            post_ids = list(
+                cls.stale_posts().filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not post_ids:
+                return refreshed
+            refreshed += cls.refresh_posts(post_ids)
+            last_pk = post_ids[-1]
+
+    @classmethod
+    def is_current(cls, post: Post) -> bool:
+        """Check whether the stored manifest matches the post's own image fields."""
+        manifest = post.social_images or {}
+        if manifest.get('version') != cls.MANIFEST_VERSION:
+            return False
+        for field_name in ('social_image', 'featured_image'):
+            stored = manifest.get(field_name)
+            image = getattr(post, field_name)
+            if (stored['name'] if stored else '') != (image.name if image else ''):
+                return False
+        return True
+
+    @classmethod
+    def get_manifest(cls, post: Post) -> Dict:
+        """
+        Get the manifest of a post.
+
+        A post without a current manifest (created in bulk and not yet
+        refreshed) has it resolved in memory for this instance; nothing is
+        written on read.
+
+        Args:
+            post: Post instance
+
+        Returns:
+            dict: The manifest
+        """
+        manifest = post.social_images
+        if not manifest or manifest.get('version') != cls.MANIFEST_VERSION:
+            manifest = cls.build_manifest(post)
+            post.social_images = manifest
+        return manifest
+
+    # Selection
+
+    @classmethod
+    def get_best_image(cls, post: Post) -> Optional[Dict]:
+        """
+        Get the best image for sharing a post.
+
+        Args:
+            post: Post instance
+
+        Returns:
+            dict with url, width, height, type, source and alt, or None
+        """
+        manifest = cls.get_manifest(post)
+        if not manifest['best']:
+            return None
+        return {**manifest['best'], 'alt': cls.get_alt_text(post)}
+
+    @classmethod
+    def get_alt_text(cls, post: Post) -> str:
+        """Get the alt text of a post's sharing image."""
+        return cls.get_manifest(post)['alt'] or f"Featured image for: {post.title}"
+
+    @classmethod
+    def get_linkedin_optimized_image(cls, post: Post) -> Optional[Dict]:
+        """Get the first large media image sized close to 1200x627, if any."""
+        for entry in cls.get_manifest(post)['media']:
+            image = entry['large']
+            if (image and
+                    cls.LINKEDIN_WIDTH_RANGE[0] <= image['width'] <= cls.LINKEDIN_WIDTH_RANGE[1] and
+                    cls.LINKEDIN_HEIGHT_RANGE[0] <= image['height'] <= cls.LINKEDIN_HEIGHT_RANGE[1]):
+                return image
+        return None
+
+    @classmethod
+    def get_fallback_images(cls, post: Post, limit: int = 4) -> List[Dict]:
+        """
+        Get the images offered to social networks after the best one.
+
+        The social image comes first, then the featured image and the
+        largest rendition of the first three image media items.
+
+        Args:
+            post: Post instance
+            limit: Maximum number of images
+
+        Returns:
+            List of image dicts
+        """
+        manifest = cls.get_manifest(post)
+        images = []
+        social, featured = manifest['social_image'], manifest['featured_image']
+        if social and (not featured or social['name'] != featured['name']):
+            images.append(social)
+        if featured:
+            images.append(featured)
+        for entry in manifest['media'][:3]:
+            rendition = cls._first_rendition(entry)
+            if rendition:
+                images.append(rendition)
+        return images[:limit]
+
+    @classmethod
+    def get_original_images(cls, post: Post) -> List[Dict]:
+        """Get the original image of each image media item, in display order."""
+        return [entry['original'] for entry in cls.get_manifest(post)['media'] if entry['original']]
+
+    @classmethod
+    def get_publishing_image(cls, post: Post) -> Optional[Dict]:
+        """
+        Get the image published with a post on LinkedIn.
+
+        Full-size originals are preferred over renditions: the social image,
+        the featured image, the featured media item's original and then the
+        first media original.
+
+        Args:
+            post: Post instance
+
+        Returns:
+            Image dict, or None
+        """
+        manifest = cls.get_manifest(post)
+        if manifest['social_image'] or manifest['featured_image']:
+            return manifest['social_image'] or manifest['featured_image']
+        featured_media = next(
+            (entry for entry in manifest['media'] if entry['featured'] and entry['original']), None
+        )
+        if featured_media:
+            return {**featured_media['original'], 'source': 'featured_media'}
+        originals = cls.get_original_images(post)
+        return {**originals[0], 'source': 'first_media'} if originals else None
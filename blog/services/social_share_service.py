@@ -3,12 +3,248 @@ Social Share Service for Blog Posts
 
 This service provides functionality for social media sharing including
 URL generation, share tracking, and analytics.
+
+Share clicks are not written to SocialShare one by one. They increment
+atomic cache counters (ShareCountBuffer) that are flushed to the database in
+bulk with a single F() update; without an atomic cache backend each click is
+written with its own F() update instead. Per-post counts are read from a cached
+snapshot of the flushed database counts plus the pending counters, so pages
+showing share counts don't query SocialShare at all.
 """
 
+import logging
+from django.conf import settings
+from django.core.cache import caches
+from django.db import models, transaction
+from django.db.models import Case, F, Sum, Value, When
 from django.urls import reverse
+from django.utils import timezone
 from urllib.parse import urlencode, quote_plus
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from ..models import Post, SocialShare
+from .engagement_warehouse_service import EngagementWarehouseService
+from ..performance import CacheManager
+
+
+logger = logging.getLogger(__name__)
+
+
+class ShareCountBuffer:
+    """
+    Cache-backed buffer of share counts waiting to be written to SocialShare.
+
+    Each (post, platform) pair has a pending counter updated with the cache
+    backend's atomic ``incr``, so concurrent share clicks never overwrite each
+    other. When a counter goes from 0 to 1 its pair is appended to a log of
+    dirty pairs; flush() walks the log, writes the pending counts with one
+    UPDATE per batch and subtracts exactly what it wrote from each counter,
+    so clicks that arrive during a flush stay pending for the next one.
+
+    A crash between the database write and the decrement re-applies that
+    batch on the next flush: counts may overshoot, but are never lost.
+
+    The counters need a cache with atomic increments (Redis, Memcached or
+    LocMemCache). On other backends, such as the DatabaseCache fallback,
+    add() writes each share straight to the database instead.
+    """
+
+    PREFIX = 'blog:social_shares:pending'
+    PENDING_TTL = 86400 * 7
+    FLUSH_BATCH_SIZE = 500
+    FLUSH_LOCK_TIMEOUT = 120
+
+    def __init__(self, cache_alias: str = 'default'):
+        self.cache_alias = cache_alias
+        self.flush_interval = getattr(settings, 'BLOG_SHARE_COUNT_FLUSH_INTERVAL', 60)
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    @property
+    def buffered(self) -> bool:
+        """Whether shares are buffered, i.e. the cache's incr() is atomic."""
+        return CacheManager.has_atomic_counters(self.cache)
+
+    def pending_key(self, post_id: int, platform: str) -> str:
+        return f"{self.PREFIX}:{post_id}:{platform}"
+
+    def _incr(self, key: str, amount: int = 1, timeout: Optional[int] = PENDING_TTL) -> int:
+        """Atomically increment a counter, creating it when missing."""
+        cache = self.cache
+        try:
+            return cache.incr(key, amount)
+        except ValueError:
+            cache.add(key, 0, timeout=timeout)
+            return cache.incr(key, amount)
+
+    def _log_dirty(self, post_id: int, platform: str):
+        """Append a (post, platform) pair to the dirty log."""
+        # The sequence and the flushed position never expire, so they can't drift apart
+        sequence = self._incr(f"{self.PREFIX}:log_seq", timeout=None)
+        self.cache.set(f"{self.PREFIX}:log:{sequence}", f"{post_id}:{platform}", timeout=self.PENDING_TTL)
+
+    def add(self, post_id: int, platform: str, amount: int = 1) -> int:
+        """
+        Buffer share events.
+
+        Args:
+            post_id: ID of the shared post
+            platform: Platform the post was shared on
+            amount: Number of shares
+
+        Returns:
+            int: Pending (unflushed) count for the pair
+        """
+        if not self.buffered:
+            # Counters would lose concurrent shares, write through with F()
+            self._write_counts({(post_id, platform): amount})
+            return 0
+        pending = self._incr(self.pending_key(post_id, platform), amount)
+        if pending == amount:
+            self._log_dirty(post_id, platform)
+        return pending
+
+    def flush_if_due(self) -> int:
+        """
+        Flush if no flush has started within the flush interval.
+
+        Lets request handlers keep the buffer drained when the periodic
+        flush task isn't scheduled.
+
+        Returns:
+            int: Number of shares written
+        """
+        if self.cache.add(f"{self.PREFIX}:flush_due", 1, timeout=self.flush_interval):
+            return self.flush()
+        return 0
+
+    def flush(self) -> int:
+        """
+        Write all pending share counts to the database.
+
+        Only one flush runs at a time; a concurrent call returns immediately.
+
+        Returns:
+            int: Number of shares written
+        """
+        cache = self.cache
+        lock_key = f"{self.PREFIX}:flush_lock"
+        if not cache.add(lock_key, 1, timeout=self.FLUSH_LOCK_TIMEOUT):
+            return 0
+
+        written = 0
+        try:
+            flushed = cache.get(f"{self.PREFIX}:log_flushed", 0)
+            last = cache.get(f"{self.PREFIX}:log_seq", 0)
+            while flushed < last:
+                end = min(last, flushed + self.FLUSH_BATCH_SIZE)
+                slot_keys = [f"{self.PREFIX}:log:{sequence}" for sequence in range(flushed + 1, end + 1)]
+                slots = cache.get_many(slot_keys)
+                end = self._readable_log_end(flushed, end, slots)
+                if end == flushed:
+                    break
+
+                pairs = set()
+                for key in slot_keys[:end - flushed]:
+                    if key in slots:
+                        post_id, platform = slots[key].split(':', 1)
+                        pairs.add((int(post_id), platform))
+                written += self._flush_pairs(pairs)
+
+                cache.set(f"{self.PREFIX}:log_flushed", end, timeout=None)
+                cache.delete_many(slot_keys[:end - flushed])
+                flushed = end
+        finally:
+            cache.delete(lock_key)
+
+        if written:
+            logger.info(f"Flushed {written} buffered social shares")
+        return written
+
+    def _readable_log_end(self, flushed: int, end: int, slots: Dict[str, str]) -> int:
+        """
+        Get how far the dirty log can be consumed.
+
+        A missing slot is usually one whose writer has taken a sequence number
+        but not stored the pair yet, so the flush stops before it. A slot that
+        is still missing on the next flush is skipped.
+        """
+        cache = self.cache
+        gap_key = f"{self.PREFIX}:log_gap"
+        for sequence in range(flushed + 1, end + 1):
+            if f"{self.PREFIX}:log:{sequence}" in slots:
+                continue
+            if cache.get(gap_key) == sequence:
+                cache.delete(gap_key)
+                continue
+            cache.set(gap_key, sequence, timeout=self.PENDING_TTL)
+            return sequence - 1
+        return end
+
+    def _flush_pairs(self, pairs: Iterable[Tuple[int, str]]) -> int:
+        """Write the pending counts of a batch of pairs to the database."""
+        cache = self.cache
+        keys = {pair: self.pending_key(*pair) for pair in pairs}
+        values = cache.get_many(list(keys.values()))
+        pending = {pair: values.get(key, 0) for pair, key in keys.items() if values.get(key, 0) > 0}
+        if not pending:
+            return 0
+
+        written = self._write_counts(pending)
+        for pair, count in pending.items():
+            try:
+                if cache.decr(keys[pair], count) > 0:
+                    self._log_dirty(*pair)
+            except ValueError:
+                pass
+
+        return written
+
+    def _write_counts(self, pending: Dict[Tuple[int, str], int]) -> int:
+        """Add share counts to SocialShare rows, creating missing ones."""
+        post_ids = {post_id for post_id, _ in pending}
+        with transaction.atomic():
+            rows = self._get_rows(post_ids)
+            missing = [pair for pair in pending if pair not in rows]
+            if missing:
+                existing_posts = set(Post.objects.filter(pk__in={post_id for post_id, _ in missing}).values_list('pk', flat=True))
+                SocialShare.objects.bulk_create(
+                    [SocialShare(post_id=post_id, platform=platform) for post_id, platform in missing
+                     if post_id in existing_posts],
+                    ignore_conflicts=True
+                )
+                rows = self._get_rows(post_ids)
+
+            updates = {rows[pair][0]: count for pair, count in pending.items() if pair in rows}
+            if updates:
+                SocialShare.objects.filter(pk__in=updates).update(
+                    share_count=F('share_count') + Case(
+                        *[When(pk=pk, then=Value(count)) for pk, count in updates.items()],
+                        default=Value(0),
+                        output_field=models.PositiveIntegerField()
+                    ),
+                    last_shared=timezone.now()
+                )
+                EngagementWarehouseService.record_shares(
+                    {pair: count for pair, count in pending.items() if pair in rows}
+                )
+
+        # Refresh snapshots before taking the flushed counts off the buffer
+        SocialShareService.refresh_snapshots(post_ids)
+        return sum(count for pair, count in pending.items() if pair in rows)
+
+    def _get_rows(self, post_ids: Iterable[int]) -> Dict[Tuple[int, str], Tuple[int, int]]:
+        """Get (pk, share_count) of SocialShare rows keyed by (post_id, platform)."""
+        return {
+            (post_id, platform): (pk, share_count)
+            for pk, post_id, platform, share_count in SocialShare.objects.filter(
+                post_id__in=post_ids
+            ).values_list('pk', 'post_id', 'platform', 'share_count')
+        }
+
+
+share_count_buffer = ShareCountBuffer()
 
 
 class SocialShareService:
@@ -105,17 +341,76 @@ class SocialShareService:
         
         return share_urls
     
+    @classmethod
+    def _snapshot_key(cls, post_id: int) -> str:
+        return CacheManager.get_cache_key('social_shares', post_id)
+
+    @classmethod
+    def _build_snapshot(cls, rows: Iterable[Tuple[int, int, str, int]]) -> Dict[int, Dict[str, List[int]]]:
+        """Group (pk, post_id, platform, share_count) rows into per-post snapshots."""
+        snapshots = {}
+        for pk, post_id, platform, share_count in rows:
+            snapshots.setdefault(post_id, {})[platform] = [pk, share_count]
+        return snapshots
+
+    @classmethod
+    def refresh_snapshots(cls, post_ids: Iterable[int]):
+        """
+        Rebuild the cached share snapshots of several posts with one query.
+
+        Args:
+            post_ids: IDs of the posts to refresh
+        """
+        post_ids = list(post_ids)
+        snapshots = cls._build_snapshot(
+            SocialShare.objects.filter(post_id__in=post_ids).values_list('pk', 'post_id', 'platform', 'share_count')
+        )
+        share_count_buffer.cache.set_many(
+            {cls._snapshot_key(post_id): snapshots.get(post_id, {}) for post_id in post_ids},
+            timeout=CacheManager.CACHE_TIMEOUTS['social_shares']
+        )
+
+    @classmethod
+    def _get_share_state(cls, post_id: int) -> Tuple[Dict[str, List[int]], Dict[str, int]]:
+        """
+        Get the database snapshot and the pending counts for a post.
+
+        Both come from a single cache round trip; the database is only
+        queried when the snapshot isn't cached.
+
+        Returns:
+            tuple: ({platform: [pk, flushed count]}, {platform: pending count})
+        """
+        cache = share_count_buffer.cache
+        snapshot_key = cls._snapshot_key(post_id)
+        pending_keys = {share_count_buffer.pending_key(post_id, platform): platform for platform in cls.PLATFORMS}
+        values = cache.get_many([snapshot_key, *pending_keys])
+
+        snapshot = values.get(snapshot_key)
+        if snapshot is None:
+            snapshot = cls._build_snapshot(
+                SocialShare.objects.filter(post_id=post_id).values_list('pk', 'post_id', 'platform', 'share_count')
+            ).get(post_id, {})
+            # add() so a snapshot refreshed by a concurrent flush is never overwritten
+            cache.add(snapshot_key, snapshot, timeout=CacheManager.CACHE_TIMEOUTS['social_shares'])
+
+        pending = {platform: values.get(key, 0) for key, platform in pending_keys.items()}
+        return snapshot, pending
+
     @classmethod
     def track_share(cls, post: Post, platform: str) -> SocialShare:
         """
         Track a social media share event.
         
+        The share is buffered and written to the database by the next flush,
+        or written right away when the cache can't buffer it.
+        
         Args:
             post: Blog post that was shared
             platform: Social media platform name
             
         Returns:
-            SocialShare object
+            SocialShare object with the current share count (flushed and pending)
             
         Raises:
             ValueError: If platform is not supported
@@ -123,15 +418,30 @@ class SocialShareService:
         if platform not in cls.PLATFORMS:
             raise ValueError(f"Unsupported platform: {platform}")
         
-        # Get or create social share record
-        social_share, created = SocialShare.objects.get_or_create(
+        share_count_buffer.add(post.id, platform)
+        snapshot, pending = cls._get_share_state(post.id)
+        
+        if platform in snapshot:
+            pk, flushed_count = snapshot[platform]
+        else:
+            # First share on this platform: create the row the buffer will update
+            social_share, created = SocialShare.objects.get_or_create(
+                post=post,
+                platform=platform,
+                defaults={'share_count': 0}
+            )
+            pk, flushed_count = social_share.pk, social_share.share_count
+            share_count_buffer.cache.delete(cls._snapshot_key(post.id))
+        
+        social_share = SocialShare(
+            pk=pk,
             post=post,
             platform=platform,
-            defaults={'share_count': 0}
+            share_count=flushed_count + pending[platform],
+            last_shared=timezone.now()
         )
         
-        # Increment share count
-        social_share.increment_share_count()
+        share_count_buffer.flush_if_due()
         
         return social_share
     
@@ -146,20 +456,12 @@ class SocialShareService:
         Returns:
             Dictionary mapping platform names to share counts
         """
-        share_counts = {}
-        
-        # Get all social shares for this post
-        social_shares = SocialShare.objects.filter(post=post)
-        
-        # Initialize all platforms with 0
-        for platform_key in cls.PLATFORMS.keys():
-            share_counts[platform_key] = 0
+        snapshot, pending = cls._get_share_state(post.id)
         
-        # Update with actual counts
-        for share in social_shares:
-            share_counts[share.platform] = share.share_count
-        
-        return share_counts
+        return {
+            platform_key: snapshot.get(platform_key, [None, 0])[1] + pending[platform_key]
+            for platform_key in cls.PLATFORMS
+        }
     
     @classmethod
     def get_total_shares(cls, post: Post) -> int:
@@ -207,27 +509,29 @@ class SocialShareService:
             Dictionary with analytics data
         """
         if post:
-            # Analytics for specific post
-            shares = SocialShare.objects.filter(post=post)
+            # Analytics for specific post, from the share snapshot
+            counts = cls.get_share_counts(post)
         else:
-            # Analytics for all posts
-            shares = SocialShare.objects.all()
+            # Analytics for all posts (flushed counts only)
+            counts = dict(
+                SocialShare.objects.values_list('platform').annotate(total=Sum('share_count')).order_by()
+            )
         
+        total_shares = sum(counts.get(platform_key, 0) for platform_key in cls.PLATFORMS)
         analytics = {
-            'total_shares': sum(share.share_count for share in shares),
+            'total_shares': total_shares,
             'platform_breakdown': {},
             'top_platforms': []
         }
         
         # Calculate platform breakdown
         for platform_key, platform_config in cls.PLATFORMS.items():
-            platform_shares = shares.filter(platform=platform_key)
-            total_count = sum(share.share_count for share in platform_shares)
+            total_count = counts.get(platform_key, 0)
             
             analytics['platform_breakdown'][platform_key] = {
                 'name': platform_config['name'],
                 'count': total_count,
-                'percentage': (total_count / analytics['total_shares'] * 100) if analytics['total_shares'] > 0 else 0
+                'percentage': (total_count / total_shares * 100) if total_shares > 0 else 0
             }
         
         # Get top platforms
@@ -3,6 +3,10 @@ Table of Contents Service for Blog Posts
 
 This service provides functionality to automatically generate table of contents
 for blog posts by extracting headings from HTML content and creating anchor links.
+
+Post bodies are processed by the single-pass engine in ``blog.utils.toc_stream``,
+which adds heading anchors and counts section words without building a parse
+tree. The BeautifulSoup helpers remain for callers that already hold a soup.
 """
 
 import re
@@ -11,6 +15,8 @@ from django.utils.text import slugify
 from django.utils.html import format_html
 from typing import List, Dict, Optional, Tuple
 
+from ..utils.toc_stream import TocStreamResult, stream_toc
+
 
 class TableOfContentsService:
     """Service class for generating table of contents from HTML content"""
@@ -24,6 +30,24 @@ class TableOfContentsService:
     # Heading tags to extract (in order of hierarchy)
     HEADING_TAGS = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']
     
+    # Average reading speed used for section reading times
+    WORDS_PER_MINUTE = 200
+    
+    @classmethod
+    def process_content(cls, content: str, min_headings: int = None) -> TocStreamResult:
+        """
+        Extract headings, add anchor links and count section words in one pass.
+        
+        Args:
+            content: HTML content string
+            min_headings: Minimum number of headings required (defaults to MIN_HEADINGS_FOR_TOC)
+            
+        Returns:
+            TocStreamResult with headings, modified content, show_toc and
+            section word counts keyed by anchor
+        """
+        return stream_toc(content, min_headings or cls.MIN_HEADINGS_FOR_TOC, cls.generate_unique_anchor)
+    
     @classmethod
     def generate_toc(cls, content: str, min_headings: int = None) -> Dict:
         """
@@ -46,27 +70,12 @@ class TableOfContentsService:
                 'show_toc': False
             }
         
-        min_headings = min_headings or cls.MIN_HEADINGS_FOR_TOC
-        
-        # Parse HTML content
-        soup = BeautifulSoup(content, 'html.parser')
-        
-        # Extract headings
-        headings = cls.extract_headings(soup)
-        
-        # Check if we should show TOC
-        show_toc = len(headings) >= min_headings
-        
-        if show_toc:
-            # Add anchor links to headings
-            modified_content = cls.add_anchor_links(soup, headings)
-        else:
-            modified_content = str(soup)
+        result = cls.process_content(content, min_headings)
         
         return {
-            'headings': headings,
-            'content': modified_content,
-            'show_toc': show_toc
+            'headings': result.headings,
+            'content': result.content,
+            'show_toc': result.show_toc
         }
     
     @classmethod
@@ -280,53 +289,25 @@ class TableOfContentsService:
         if not headings:
             return {}
         
-        soup = BeautifulSoup(content, 'html.parser')
-        section_times = {}
-        
-        # Average reading speed (words per minute)
-        WPM = 200
-        
-        for i, heading in enumerate(headings):
-            # Find content between this heading and the next
-            current_element = heading['element']
-            
-            # Get next heading element if exists
-            next_element = headings[i + 1]['element'] if i + 1 < len(headings) else None
-            
-            # Extract text content for this section
-            section_text = cls._extract_section_text(current_element, next_element)
-            
-            # Calculate reading time
-            word_count = len(section_text.split())
-            reading_time = max(1, round(word_count / WPM))
-            
-            section_times[heading['anchor']] = reading_time
+        section_words = cls.process_content(content).section_words
         
-        return section_times
+        return {
+            heading['anchor']: cls._reading_time(section_words.get(heading['anchor'], 0))
+            for heading in headings
+        }
     
     @classmethod
-    def _extract_section_text(cls, start_element, end_element) -> str:
+    def _reading_time(cls, word_count: int) -> int:
         """
-        Extract text content between two elements.
+        Convert a word count to a reading time of at least one minute.
         
         Args:
-            start_element: Starting element (heading)
-            end_element: Ending element (next heading) or None
+            word_count: Number of words
             
         Returns:
-            Text content of the section
+            Reading time in minutes
         """
-        text_parts = []
-        current = start_element.next_sibling
-        
-        while current and current != end_element:
-            if hasattr(current, 'get_text'):
-                text_parts.append(current.get_text())
-            elif isinstance(current, str):
-                text_parts.append(current.strip())
-            current = current.next_sibling
-        
-        return ' '.join(text_parts)
+        return max(1, round(word_count / cls.WORDS_PER_MINUTE))
     
     @classmethod
     def generate_toc_data_for_template(cls, post) -> Dict:
@@ -347,26 +328,26 @@ class TableOfContentsService:
                 'content': post.content
             }
         
-        toc_data = cls.generate_toc(post.content)
+        # Anchors and section word counts come from the same pass
+        result = cls.process_content(post.content)
         
-        if toc_data['show_toc']:
-            toc_html = cls.build_toc_html(toc_data['headings'])
+        if result.show_toc:
+            toc_html = cls.build_toc_html(result.headings)
             
-            # Add reading times for sections
-            section_times = cls.get_reading_time_by_sections(
-                post.content, 
-                toc_data['headings']
-            )
+            section_times = {
+                anchor: cls._reading_time(word_count)
+                for anchor, word_count in result.section_words.items()
+            }
             
             # Add reading times to headings
-            for heading in toc_data['headings']:
+            for heading in result.headings:
                 heading['reading_time'] = section_times.get(heading['anchor'], 1)
             
             return {
                 'show_toc': True,
                 'toc_html': toc_html,
-                'headings': toc_data['headings'],
-                'content': toc_data['content'],
+                'headings': result.headings,
+                'content': result.content,
                 'section_reading_times': section_times
             }
         
@@ -0,0 +1,199 @@
+"""
+View Trends Service
+
+This service answers time-based questions about post views: the most
+viewed posts of the last N days, view series for sparklines and the views
+of one period against the previous one.
+
+Views are kept at three resolutions:
+
+- hours, as per-post and site-wide counters in the cache, recorded on every
+  view and kept for HOUR_RETENTION hours;
+- days, in the DailyEngagement fact table, written when buffered view
+  counts are flushed (see ViewCountOptimizer);
+- weeks, once the warehouse compaction folds days past
+  EngagementWarehouseService.DAILY_RETENTION_DAYS into weekly rows.
+
+Queries read one bucket per period, so their cost follows the length of the
+window rather than the number of views; site-wide series read the site row
+of each day. Only ranking posts scans the post rows of the window. Windows reaching back past the
+daily retention count whole weeks.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from ..models import DailyEngagement, Post
+
+
+logger = logging.getLogger(__name__)
+
+
+class ViewTrendsService:
+    """Service for view counts over time"""
+
+    HOUR_PREFIX = 'views:hour'
+    HOUR_RETENTION = 48
+
+    # Hourly counters
+
+    @staticmethod
+    def _hour(at: Optional[datetime] = None) -> datetime:
+        return timezone.localtime(at).replace(minute=0, second=0, microsecond=0)
+
+    @classmethod
+    def hour_key(cls, hour: datetime, post_id: Optional[int] = None) -> str:
+        return f"{cls.HOUR_PREFIX}:{hour:%Y%m%d%H}:{post_id or 'site'}"
+
+    @classmethod
+    def record(cls, post_id: int, views: int = 1, at: Optional[datetime] = None):
+        """
+        Count views in the current hour, for the post and the whole site.
+
+        Args:
+            post_id: ID of the viewed post
+            views: Number of views
+            at: Time of the views, now by default
+        """
+        hour = cls._hour(at)
+        timeout = (cls.HOUR_RETENTION + 1) * 3600
+        for key in (cls.hour_key(hour, post_id), cls.hour_key(hour)):
+            cache.add(key, 0, timeout)
+            try:
+                cache.incr(key, views)
+            except ValueError:
+                # Expired between add() and incr()
+                cache.set(key, views, timeout)
+
+    @classmethod
+    def hourly_series(cls, post_id: Optional[int] = None, hours: int = 24) -> List[Tuple[datetime, int]]:
+        """
+        Get views per hour, oldest first, ending with the current hour.
+
+        Args:
+            post_id: Post ID, or None for the whole site
+            hours: Number of hours, at most HOUR_RETENTION
+
+        Returns:
+            List of (hour, views) tuples
+        """
+        current = cls._hour()
+        slots = [current - timedelta(hours=offset) for offset in range(min(hours, cls.HOUR_RETENTION) - 1, -1, -1)]
+        counts = cache.get_many([cls.hour_key(hour, post_id) for hour in slots])
+        return [(hour, counts.get(cls.hour_key(hour, post_id), 0)) for hour in slots]
+
+    # Daily and weekly facts
+
+    @staticmethod
+    def _facts(post_id: Optional[int] = None):
+        # The site-wide row of each day holds the views of all posts
+        if post_id:
+            return DailyEngagement.objects.filter(post_id=post_id)
+        return DailyEngagement.objects.filter(post__isnull=True)
+
+    @staticmethod
+    def _window_start(days: int) -> date:
+        return timezone.localdate() - timedelta(days=days - 1)
+
+    @classmethod
+    def daily_series(cls, post_id: Optional[int] = None, days: int = 30) -> List[Tuple[date, int]]:
+        """
+        Get views per day, oldest first, ending today.
+
+        Args:
+            post_id: Post ID, or None for the whole site
+            days: Number of days
+
+        Returns:
+            List of (day, views) tuples, with zeros for days without views
+        """
+        start = cls._window_start(days)
+        counts = dict(
+            cls._facts(post_id).filter(day__gte=start).values('day')
+            .annotate(views=Sum('views')).values_list('day', 'views')
+        )
+        return [(day, counts.get(day, 0)) for day in (start + timedelta(days=offset) for offset in range(days))]
+
+    @classmethod
+    def weekly_series(cls, post_id: Optional[int] = None, weeks: int = 12) -> List[Tuple[date, int]]:
+        """
+        Get views per week, oldest first, ending with the current week.
+
+        Args:
+            post_id: Post ID, or None for the whole site
+            weeks: Number of weeks
+
+        Returns:
+            List of (Monday, views) tuples
+        """
+        today = timezone.localdate()
+        current = today - timedelta(days=today.weekday())
+        start = current - timedelta(weeks=weeks - 1)
+        totals = {start + timedelta(weeks=offset): 0 for offset in range(weeks)}
+        for day, views in cls._facts(post_id).filter(day__gte=start).values('day').annotate(
+                views=Sum('views')).values_list('day', 'views'):
+            totals[day - timedelta(days=day.weekday())] += views
+        return list(totals.items())
+
+    @classmethod
+    def most_viewed(cls, days: int = 7, limit: int = 5) -> List[Post]:
+        """
+        Get the published posts with the most views in the last days.
+
+        Args:
+            days: Number of days, including today
+            limit: Maximum number of posts
+
+        Returns:
+            List of Post objects with a ``recent_views`` attribute, most viewed first
+        """
+        ranked = cls.most_viewed_ids(days=days, limit=limit)
+        posts = Post.objects.select_related('author').in_bulk([post_id for post_id, _ in ranked])
+        result = []
+        for post_id, views in ranked:
+            post = posts[post_id]
+            post.recent_views = views
+            result.append(post)
+        return result
+
+    @classmethod
+    def most_viewed_ids(cls, days: int = 7, limit: int = 5) -> List[Tuple[int, int]]:
+        """
+        Rank the published posts by their views in the last days.
+
+        Args:
+            days: Number of days, including today
+            limit: Maximum number of posts
+
+        Returns:
+            List of (post ID, views) tuples, most viewed first
+        """
+        return list(
+            DailyEngagement.objects.filter(day__gte=cls._window_start(days), post__status='published')
+            .values('post_id').annotate(views=Sum('views')).filter(views__gt=0)
+            .order_by('-views', 'post_id').values_list('post_id', 'views')[:limit]
+        )
+
+    @classmethod
+    def period_views(cls, days: int = 30, post_id: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Get the views of the last days and of the period before them.
+
+        Args:
+            days: Length of each period in days
+            post_id: Post ID, or None for the whole site
+
+        Returns:
+            (current, previous) view counts
+        """
+        current_start = cls._window_start(days)
+        totals = cls._facts(post_id).filter(day__gte=current_start - timedelta(days=days)).aggregate(
+            current=Sum('views', filter=Q(day__gte=current_start)),
+            previous=Sum('views', filter=Q(day__lt=current_start)),
+        )
+        return totals['current'] or 0, totals['previous'] or 0
@@ -0,0 +1,125 @@
+"""
+Django signals for the denormalized author statistics.
+
+Saving or deleting a post, changing its categories, or saving or deleting
+a comment refreshes the AuthorStats row of the affected author only.
+"""
+
+import logging
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from blog.models import Comment, Post
+from blog.author_services.author_stats_service import AuthorStatsService
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_post_author(sender, instance, **kwargs):
+    """
+    Remember the stored author of a post, so a change of author refreshes both.
+
+    Args:
+        sender: The model class (Post)
+        instance: The post being saved
+        **kwargs: Additional keyword arguments
+    """
+    if instance.pk and not kwargs.get('raw'):
+        instance._previous_author_id = (
+            Post.objects.filter(pk=instance.pk).values_list('author_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Post)
+def refresh_author_stats_on_post_save(sender, instance, created, **kwargs):
+    """
+    Refresh the author's statistics when a post is saved.
+
+    Args:
+        sender: The model class (Post)
+        instance: The post being saved
+        created: Boolean indicating if this is a new post
+        **kwargs: Additional keyword arguments
+    """
+    if kwargs.get('raw'):
+        return
+
+    try:
+        AuthorStatsService.refresh_authors([instance.author_id, getattr(instance, '_previous_author_id', None)])
+    except Exception as e:
+        logger.error(f"Error refreshing author stats for post {instance.pk}: {str(e)}")
+
+
+@receiver(post_delete, sender=Post)
+def refresh_author_stats_on_post_delete(sender, instance, **kwargs):
+    """
+    Refresh the author's statistics when a post is deleted.
+
+    Missing rows aren't created, since the post may be deleted along with
+    its author.
+
+    Args:
+        sender: The model class (Post)
+        instance: The post being deleted
+        **kwargs: Additional keyword arguments
+    """
+    try:
+        AuthorStatsService.refresh_author(instance.author_id, create=False)
+    except Exception as e:
+        logger.error(f"Error refreshing author stats for deleted post {instance.pk}: {str(e)}")
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+def refresh_author_stats_on_categories_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Refresh top categories when post categories change.
+
+    Args:
+        sender: The through model of Post.categories
+        instance: The post, or the category when changed from the category side
+        action: The m2m_changed action
+        reverse: True when changed from the category side
+        pk_set: Primary keys of the added or removed objects
+        **kwargs: Additional keyword arguments
+    """
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            author_ids = [instance.author_id]
+        else:
+            return
+    elif action == 'pre_clear':
+        # pk_set is empty on clear, so remember the affected authors first
+        instance._cleared_post_author_ids = set(instance.posts.values_list('author_id', flat=True))
+        return
+    elif action == 'post_clear':
+        author_ids = getattr(instance, '_cleared_post_author_ids', set())
+    elif action in ('post_add', 'post_remove'):
+        author_ids = Post.objects.filter(pk__in=pk_set).values_list('author_id', flat=True)
+    else:
+        return
+
+    try:
+        AuthorStatsService.refresh_authors(author_ids)
+    except Exception as e:
+        logger.error(f"Error refreshing author stats after category change: {str(e)}")
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def refresh_author_comment_count(sender, instance, **kwargs):
+    """
+    Recount approved comments for the author of a commented post.
+
+    Args:
+        sender: The model class (Comment)
+        instance: The comment being saved or deleted
+        **kwargs: Additional keyword arguments
+    """
+    if kwargs.get('raw'):
+        return
+
+    try:
+        AuthorStatsService.refresh_comment_counts([instance.post_id])
+    except Exception as e:
+        logger.error(f"Error refreshing author comment count for post {instance.post_id}: {str(e)}")
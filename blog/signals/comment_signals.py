@@ -0,0 +1,57 @@
+"""
+Django signals for comment thread cache invalidation.
+
+Saving, approving or deleting a comment retires the cached comment threads
+of its post. Bulk moderation actions that use ``QuerySet.update()`` send no
+signals and invalidate the affected posts themselves.
+"""
+
+import logging
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from blog.models import Comment
+from blog.services.comment_tree_service import CommentTreeService
+
+logger = logging.getLogger(__name__)
+
+
+def _invalidate_comment_threads(post_id):
+    # Invalidate again on commit, so a page rendered from the old rows while
+    # the transaction was open isn't kept
+    CommentTreeService.invalidate_post(post_id)
+    transaction.on_commit(lambda: CommentTreeService.invalidate_post(post_id))
+
+
+@receiver(post_save, sender=Comment)
+def invalidate_comment_threads_on_save(sender, instance, created, **kwargs):
+    """
+    Invalidate a post's comment threads when one of its comments is saved.
+
+    Args:
+        sender: The model class (Comment)
+        instance: The comment being saved
+        created: Boolean indicating if this is a new comment
+        **kwargs: Additional keyword arguments
+    """
+    try:
+        _invalidate_comment_threads(instance.post_id)
+    except Exception as e:
+        logger.error(f"Error invalidating comment threads for post {instance.post_id}: {str(e)}")
+
+
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_threads_on_delete(sender, instance, **kwargs):
+    """
+    Invalidate a post's comment threads when one of its comments is deleted.
+
+    Args:
+        sender: The model class (Comment)
+        instance: The comment being deleted
+        **kwargs: Additional keyword arguments
+    """
+    try:
+        _invalidate_comment_threads(instance.post_id)
+    except Exception as e:
+        logger.error(f"Error invalidating comment threads for post {instance.post_id}: {str(e)}")
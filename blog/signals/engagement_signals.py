@@ -0,0 +1,61 @@
+"""
+Django signals for the daily engagement facts.
+
+Saving or deleting a comment recounts the approved comments of its post
+from the comment's day on, and saving or deleting a newsletter subscriber
+recounts the sign-ups from their day on. Views and shares are recorded
+where their buffered counters are flushed.
+"""
+
+import logging
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from blog.models import Comment, NewsletterSubscriber, Post
+from blog.services.engagement_warehouse_service import EngagementWarehouseService
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def recount_comment_facts(sender, instance, **kwargs):
+    """
+    Recount the approved comments of a post from the comment's day on.
+
+    Args:
+        sender: The model class (Comment)
+        instance: The comment being saved or deleted
+        **kwargs: Additional keyword arguments
+    """
+    # Facts of a deleted post go with it
+    if kwargs.get('raw') or isinstance(kwargs.get('origin'), Post):
+        return
+
+    try:
+        since = timezone.localdate(instance.created_at) if instance.created_at else None
+        EngagementWarehouseService.recount_comments([instance.post_id], since=since)
+    except Exception as e:
+        logger.error(f"Error recounting comment facts for post {instance.post_id}: {str(e)}")
+
+
+@receiver(post_save, sender=NewsletterSubscriber)
+@receiver(post_delete, sender=NewsletterSubscriber)
+def recount_subscriber_facts(sender, instance, **kwargs):
+    """
+    Recount newsletter sign-ups from the subscriber's day on.
+
+    Args:
+        sender: The model class (NewsletterSubscriber)
+        instance: The subscriber being saved or deleted
+        **kwargs: Additional keyword arguments
+    """
+    if kwargs.get('raw') or (kwargs.get('created') is False):
+        return
+
+    try:
+        since = timezone.localdate(instance.subscribed_at) if instance.subscribed_at else None
+        EngagementWarehouseService.recount_subscribers(since=since)
+    except Exception as e:
+        logger.error(f"Error recounting subscriber facts: {str(e)}")
@@ -0,0 +1,86 @@
+"""
+Django signals for LinkedIn auto-posting.
+
+Publishing a post queues it on the LinkedIn publish scheduler instead of
+starting a posting task directly, so repeated saves of the same post are
+coalesced and bulk publishing is paced by the posting quota. Only a save
+that creates a published post or changes a post's status to published
+queues it; later edits of a published post don't.
+"""
+
+import logging
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from blog.models import Post
+from blog.linkedin_models import LinkedInConfig, LinkedInPost, LinkedInPublishQueueEntry
+from blog.services.linkedin_publish_scheduler import LinkedInPublishScheduler
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_post_status(sender, instance, **kwargs):
+    """
+    Remember the stored status of a post, so only publishing it queues it.
+
+    Args:
+        sender: The model class (Post)
+        instance: The post being saved
+        **kwargs: Additional keyword arguments
+    """
+    if instance.pk and not kwargs.get('raw'):
+        instance._previous_status = (
+            Post.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Post)
+def queue_linkedin_post_on_publish(sender, instance, created, **kwargs):
+    """
+    Queue a blog post for LinkedIn posting when it is published.
+
+    Only runs when the post is created as published or its status changes
+    to published, so editing a published post doesn't queue it. Skips posts that are already posted, in progress or out of retries.
+    Featured posts are queued with high priority. The queue is dispatched
+    once the transaction commits.
+
+    Args:
+        sender: The model class (Post)
+        instance: The actual instance being saved
+        created: Boolean indicating if this is a new instance
+        **kwargs: Additional keyword arguments
+    """
+    if instance.status != 'published' or kwargs.get('raw'):
+        return
+    if not created and getattr(instance, '_previous_status', None) == 'published':
+        return
+
+    try:
+        linkedin_config = LinkedInConfig.get_active_config()
+        if not linkedin_config or not linkedin_config.has_valid_credentials():
+            return
+
+        existing_linkedin_post = LinkedInPost.objects.filter(post=instance).first()
+        if existing_linkedin_post:
+            if existing_linkedin_post.is_successful():
+                return
+            if existing_linkedin_post.status in ['pending', 'retrying']:
+                # The posting task or a queued retry will handle it
+                return
+            if existing_linkedin_post.is_failed() and not existing_linkedin_post.can_retry():
+                logger.warning(f"Post '{instance.title}' has failed LinkedIn posting and exceeded max attempts. Skipping.")
+                return
+
+        scheduler = LinkedInPublishScheduler()
+        priority = LinkedInPublishQueueEntry.PRIORITY_HIGH if instance.is_featured else None
+        if scheduler.enqueue(instance.id, priority=priority):
+            transaction.on_commit(scheduler.dispatch)
+            logger.info(f"LinkedIn posting queued for post: {instance.title}")
+        else:
+            logger.debug(f"LinkedIn posting already queued for post: {instance.title}")
+
+    except Exception as e:
+        # Don't interrupt the post save process
+        logger.error(f"Failed to queue LinkedIn posting for post '{instance.title}': {e}")
@@ -0,0 +1,131 @@
+"""
+Django signals for comment risk scores and commenter reputation.
+
+New comments are scored before they are saved. Saving, moderating or
+deleting a single comment updates the reputation counters of its IP
+address, its email and the site, starting from the state stored before
+the change. Bulk moderation actions go through
+``CommentModerationService.set_state()``, which updates the counters
+itself.
+"""
+
+import logging
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from blog.models import Comment
+from blog.services.comment_moderation_service import CommentModerationService, comment_state
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(pre_save, sender=Comment)
+def score_comment(sender, instance, **kwargs):
+    """
+    Score a new comment, or remember the state of an existing one.
+
+    Args:
+        sender: The model class (Comment)
+        instance: The comment being saved
+        **kwargs: Additional keyword arguments
+    """
+    if kwargs.get('raw'):
+        return
+
+    try:
+        if instance._state.adding:
+            CommentModerationService.ingest(instance)
+        else:
+            instance._moderation_previous = Comment.objects.filter(pk=instance.pk).values(
+                'author_email', 'ip_address', 'is_approved', 'is_spam'
+            ).first()
+    except Exception as e:
+        logger.error(f"Error scoring comment: {str(e)}")
+
+
+@receiver(post_save, sender=Comment)
+def record_comment_saved(sender, instance, created, **kwargs):
+    """
+    Count a new comment, or move a changed one between states.
+
+    Args:
+        sender: The model class (Comment)
+        instance: The comment being saved
+        created: Boolean indicating if this is a new comment
+        **kwargs: Additional keyword arguments
+    """
+    if kwargs.get('raw'):
+        return
+
+    changes = []
+    state = comment_state(instance.is_approved, instance.is_spam)
+    previous = getattr(instance, '_moderation_previous', None)
+    if created:
+        changes.append({'old': None, 'new': state, 'seen': instance.created_at})
+    elif previous:
+        old = comment_state(previous['is_approved'], previous['is_spam'])
+        if (previous['author_email'], previous['ip_address']) != (instance.author_email, instance.ip_address):
+            changes.append({'author_email': previous['author_email'], 'ip_address': previous['ip_address'],
+                            'old': old, 'new': None})
+            changes.append({'old': None, 'new': state})
+        elif old != state:
+            changes.append({'old': old, 'new': state})
+    instance._moderation_previous = None
+
+    for change in changes:
+        change.setdefault('author_email', instance.author_email)
+        change.setdefault('ip_address', instance.ip_address)
+        change.setdefault('author_name', instance.author_name)
+
+    try:
+        CommentModerationService.record(changes)
+    except Exception as e:
+        logger.error(f"Error recording comment {instance.pk} for moderation: {str(e)}")
+
+
+@receiver(pre_delete, sender=Comment)
+def remember_deleted_comment(sender, instance, **kwargs):
+    """
+    Remember the stored state of a comment being deleted.
+
+    The instance may predate a bulk moderation action, so its own fields
+    can be out of date.
+
+    Args:
+        sender: The model class (Comment)
+        instance: The comment being deleted
+        **kwargs: Additional keyword arguments
+    """
+    try:
+        instance._moderation_previous = Comment.objects.filter(pk=instance.pk).values(
+            'author_email', 'ip_address', 'is_approved', 'is_spam'
+        ).first()
+    except Exception as e:
+        logger.error(f"Error reading deleted comment {instance.pk}: {str(e)}")
+
+
+@receiver(post_delete, sender=Comment)
+def record_comment_deleted(sender, instance, **kwargs):
+    """
+    Uncount a deleted comment.
+
+    Args:
+        sender: The model class (Comment)
+        instance: The comment being deleted
+        **kwargs: Additional keyword arguments
+    """
+    previous = getattr(instance, '_moderation_previous', None) or {
+        'author_email': instance.author_email, 'ip_address': instance.ip_address,
+        'is_approved': instance.is_approved, 'is_spam': instance.is_spam,
+    }
+    instance._moderation_previous = None
+
+    try:
+        CommentModerationService.record([{
+            'author_email': previous['author_email'],
+            'ip_address': previous['ip_address'],
+            'old': comment_state(previous['is_approved'], previous['is_spam']),
+            'new': None,
+        }])
+    except Exception as e:
+        logger.error(f"Error recording deleted comment {instance.pk} for moderation: {str(e)}")
@@ -0,0 +1,127 @@
+"""
+Django signals for post card invalidation.
+
+Cached post cards are checked against the post's ``updated_at``, so saving
+a post already outdates its card. These handlers drop the cards of posts
+whose categories, tags, media or author change without the post itself
+being saved.
+"""
+
+import logging
+from django.contrib.auth.models import User
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from blog.models import Category, MediaItem, Post, Tag
+from blog.services.post_card_service import PostCardService
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_delete, sender=Post)
+def drop_deleted_post_card(sender, instance, **kwargs):
+    """
+    Drop the card of a deleted post.
+
+    Args:
+        sender: The model class (Post)
+        instance: The post being deleted
+        **kwargs: Additional keyword arguments
+    """
+    PostCardService.invalidate_posts([instance.pk])
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_cards_on_taxonomy_change(sender, instance, action, pk_set, reverse=False, **kwargs):
+    """
+    Drop post cards when categories or tags are added to or removed from posts.
+
+    Args:
+        sender: The through model for the many-to-many relationship
+        instance: The Post, or the Category or Tag when changed from that side
+        action: The action being performed ('post_add', 'post_remove', etc.)
+        pk_set: Set of primary keys of the related objects
+        **kwargs: Additional keyword arguments
+    """
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    try:
+        if not reverse:
+            PostCardService.invalidate_posts([instance.pk])
+        elif action == 'pre_clear':
+            # pk_set is empty on clear; read the posts before they are unlinked
+            field_name = 'categories' if sender is Post.categories.through else 'tags'
+            post_ids = Post.objects.filter(**{field_name: instance}).values_list('pk', flat=True)
+            PostCardService.invalidate_posts(post_ids)
+        else:
+            # Changed from the category or tag side; pk_set holds post IDs
+            PostCardService.invalidate_posts(pk_set or [])
+    except Exception as e:
+        logger.error(f"Error invalidating post cards on {sender.__name__} change: {str(e)}")
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Tag)
+def invalidate_cards_on_taxonomy_save(sender, instance, created, **kwargs):
+    """
+    Drop the cards showing a category or tag when it is renamed or recoloured.
+
+    Args:
+        sender: The model class (Category or Tag)
+        instance: The category or tag being saved
+        created: Boolean indicating if this is a new instance
+        **kwargs: Additional keyword arguments
+    """
+    if created or kwargs.get('raw'):
+        return
+
+    try:
+        field_name = 'categories' if sender is Category else 'tags'
+        post_ids = Post.objects.filter(**{field_name: instance}).values_list('pk', flat=True)
+        PostCardService.invalidate_posts(post_ids)
+    except Exception as e:
+        logger.error(f"Error invalidating post cards for {sender.__name__} {instance.pk}: {str(e)}")
+
+
+@receiver(post_save, sender=MediaItem)
+@receiver(post_delete, sender=MediaItem)
+def invalidate_card_on_media_change(sender, instance, **kwargs):
+    """
+    Drop the card of a post when its media items change.
+
+    The social image manifest the card image falls back to is rebuilt with
+    update(), which leaves the post's updated_at as it was.
+
+    Args:
+        sender: The model class (MediaItem)
+        instance: The media item being saved or deleted
+        **kwargs: Additional keyword arguments
+    """
+    PostCardService.invalidate_posts([instance.post_id])
+
+
+@receiver(post_save, sender=User)
+def invalidate_cards_on_author_save(sender, instance, created, **kwargs):
+    """
+    Drop the cards of an author's posts when the author's name may have changed.
+
+    Args:
+        sender: The model class (User)
+        instance: The user being saved
+        created: Boolean indicating if this is a new user
+        **kwargs: Additional keyword arguments
+    """
+    if created or kwargs.get('raw'):
+        return
+
+    update_fields = kwargs.get('update_fields')
+    if update_fields and not {'first_name', 'last_name', 'username'} & set(update_fields):
+        # Logins only touch last_login
+        return
+
+    try:
+        PostCardService.invalidate_posts(instance.blog_posts.values_list('pk', flat=True))
+    except Exception as e:
+        logger.error(f"Error invalidating post cards for author {instance.pk}: {str(e)}")
@@ -6,12 +6,14 @@ schema markup cache when blog posts or related data is updated.
 """
 
 import logging
+from django.db import transaction
 from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.core.cache import caches
 
-from blog.models import Post, Category, Tag, AuthorProfile
+from blog.models import Post, Category, Tag, AuthorProfile, MediaItem
 from blog.services.schema_service import SchemaService
+from blog.services.schema_bundle_service import SchemaBundleService
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +33,11 @@ def invalidate_post_schema_cache(sender, instance, created, **kwargs):
         # Invalidate the specific post's schema cache
         SchemaService.invalidate_post_schema_cache(instance.id)
         
+        # The JSON-LD bundle is tagged with a content fingerprint, so it only
+        # needs warming: saves that don't touch schema content keep it
+        if instance.status == 'published' and not kwargs.get('raw'):
+            transaction.on_commit(lambda: SchemaBundleService.warm(instance.id))
+        
         # Also invalidate template cache for this post
         template_cache = caches['template_cache']
         cache_pattern = f"schema_template:article:{instance.id}:*"
@@ -68,6 +75,7 @@ def cleanup_post_schema_cache(sender, instance, **kwargs):
     try:
         # Clean up the specific post's schema cache
         SchemaService.invalidate_post_schema_cache(instance.id)
+        SchemaBundleService.invalidate_post(instance.id)
         
         # Clean up template cache
         template_cache = caches['template_cache']
@@ -100,6 +108,7 @@ def invalidate_author_schema_cache(sender, instance, created, **kwargs):
         
         for post in posts:
             SchemaService.invalidate_post_schema_cache(post.id)
+        SchemaBundleService.invalidate_posts(post.id for post in posts)
         
         logger.info(f"Schema cache invalidated for {posts.count()} posts by author {user.username}")
         
@@ -108,7 +117,7 @@ def invalidate_author_schema_cache(sender, instance, created, **kwargs):
 
 
 @receiver(m2m_changed, sender=Post.categories.through)
-def invalidate_post_categories_cache(sender, instance, action, pk_set, **kwargs):
+def invalidate_post_categories_cache(sender, instance, action, pk_set, reverse=False, **kwargs):
     """
     Invalidate schema cache when post categories are changed.
     
@@ -121,14 +130,19 @@ def invalidate_post_categories_cache(sender, instance, action, pk_set, **kwargs)
     """
     if action in ['post_add', 'post_remove', 'post_clear']:
         try:
+            if reverse:
+                # Changed from the category side; pk_set holds post IDs
+                SchemaBundleService.invalidate_posts(pk_set or [])
+                return
             SchemaService.invalidate_post_schema_cache(instance.id)
+            SchemaBundleService.invalidate_post(instance.id)
             logger.info(f"Schema cache invalidated for post {instance.id} due to category changes")
         except Exception as e:
             logger.error(f"Error invalidating schema cache for post categories: {str(e)}")
 
 
 @receiver(m2m_changed, sender=Post.tags.through)
-def invalidate_post_tags_cache(sender, instance, action, pk_set, **kwargs):
+def invalidate_post_tags_cache(sender, instance, action, pk_set, reverse=False, **kwargs):
     """
     Invalidate schema cache when post tags are changed.
     
@@ -141,7 +155,12 @@ def invalidate_post_tags_cache(sender, instance, action, pk_set, **kwargs):
     """
     if action in ['post_add', 'post_remove', 'post_clear']:
         try:
+            if reverse:
+                # Changed from the tag side; pk_set holds post IDs
+                SchemaBundleService.invalidate_posts(pk_set or [])
+                return
             SchemaService.invalidate_post_schema_cache(instance.id)
+            SchemaBundleService.invalidate_post(instance.id)
             logger.info(f"Schema cache invalidated for post {instance.id} due to tag changes")
         except Exception as e:
             logger.error(f"Error invalidating schema cache for post tags: {str(e)}")
@@ -165,6 +184,7 @@ def invalidate_category_posts_cache(sender, instance, created, **kwargs):
             
             for post in posts:
                 SchemaService.invalidate_post_schema_cache(post.id)
+            SchemaBundleService.invalidate_posts(post.id for post in posts)
             
             logger.info(f"Schema cache invalidated for {posts.count()} posts in category '{instance.name}'")
             
@@ -190,6 +210,7 @@ def invalidate_tag_posts_cache(sender, instance, created, **kwargs):
             
             for post in posts:
                 SchemaService.invalidate_post_schema_cache(post.id)
+            SchemaBundleService.invalidate_posts(post.id for post in posts)
             
             logger.info(f"Schema cache invalidated for {posts.count()} posts with tag '{instance.name}'")
             
@@ -197,6 +218,23 @@ def invalidate_tag_posts_cache(sender, instance, created, **kwargs):
             logger.error(f"Error invalidating tag posts cache: {str(e)}")
 
 
+@receiver(post_save, sender=MediaItem)
+@receiver(post_delete, sender=MediaItem)
+def invalidate_media_schema_bundle(sender, instance, **kwargs):
+    """
+    Drop the schema bundle of a post when its media items change.
+    
+    Args:
+        sender: The model class (MediaItem)
+        instance: The media item being saved or deleted
+        **kwargs: Additional keyword arguments
+    """
+    try:
+        SchemaBundleService.invalidate_post(instance.post_id)
+    except Exception as e:
+        logger.error(f"Error invalidating schema bundle for media item {instance.pk}: {str(e)}")
+
+
 def bulk_invalidate_schema_cache():
     """
     Utility function to bulk invalidate all schema cache.
@@ -230,7 +268,7 @@ def warm_up_schema_cache(post_queryset=None):
         if post_queryset is None:
             post_queryset = Post.objects.select_related(
                 'author',
-                'author__profile'
+                'author__author_profile'
             ).prefetch_related(
                 'categories',
                 'tags',
@@ -242,6 +280,7 @@ def warm_up_schema_cache(post_queryset=None):
             try:
                 # Generate schema to warm up cache
                 SchemaService.generate_article_schema(post)
+                SchemaBundleService.get_bundle(post)
                 warmed_count += 1
             except Exception as e:
                 logger.warning(f"Failed to warm cache for post {post.id}: {str(e)}")
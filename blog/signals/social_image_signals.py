@@ -0,0 +1,60 @@
+"""
+Django signals for the precomputed social sharing images.
+
+Saving a post with a new social or featured image, or saving or deleting
+one of its media items, rebuilds the post's social image manifest.
+"""
+
+import logging
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from blog.models import MediaItem, Post
+from blog.services.social_image_service import SocialImageService
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Post)
+def refresh_social_images_on_post_save(sender, instance, created, **kwargs):
+    """
+    Rebuild the manifest when a post's own images change.
+
+    Args:
+        sender: The model class (Post)
+        instance: The post being saved
+        created: Boolean indicating if this is a new post
+        **kwargs: Additional keyword arguments
+    """
+    if kwargs.get('raw') or SocialImageService.is_current(instance):
+        return
+
+    try:
+        SocialImageService.refresh(instance)
+    except Exception as e:
+        logger.error(f"Error refreshing social images for post {instance.pk}: {str(e)}")
+
+
+@receiver(post_save, sender=MediaItem)
+@receiver(post_delete, sender=MediaItem)
+def refresh_social_images_on_media_change(sender, instance, **kwargs):
+    """
+    Rebuild the manifest of a post when one of its media items changes.
+
+    Args:
+        sender: The model class (MediaItem)
+        instance: The media item being saved or deleted
+        **kwargs: Additional keyword arguments
+    """
+    if kwargs.get('raw') or isinstance(kwargs.get('origin'), Post):
+        # The post itself is being deleted
+        return
+
+    try:
+        if MediaItem.post.is_cached(instance):
+            # Keeps the post object the caller holds current too
+            SocialImageService.refresh(instance.post)
+        else:
+            SocialImageService.refresh_posts([instance.post_id])
+    except Exception as e:
+        logger.error(f"Error refreshing social images for post {instance.post_id}: {str(e)}")
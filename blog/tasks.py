@@ -228,17 +228,108 @@ Best regards,
 def flush_view_counts():
     """
     Periodically flush buffered view counts to the database.
-    This task should be run every 5-10 minutes to optimize database writes.
+    This task should be run every 5 minutes, well within the buffer
+    timeout, or views of posts below the flush threshold are lost;
+    `manage.py setup_blog_tasks` schedules it.
     """
     try:
-        ViewCountOptimizer.flush_all_view_counts()
-        logger.info("View counts flushed successfully")
-        return "View counts flushed successfully"
+        flushed = ViewCountOptimizer.flush_all_view_counts()
+        logger.info(f"View counts flushed for {flushed} posts")
+        return flushed
     except Exception as e:
         logger.error(f"Failed to flush view counts: {str(e)}")
         raise
 
 
+@shared_task
+def flush_social_share_counts():
+    """
+    Periodically flush buffered social share counts to the database.
+    This task should be run every minute so SocialShare stays close to the
+    counts shown on post pages; `manage.py setup_blog_tasks` registers it
+    with Celery Beat.
+    """
+    from .services.social_share_service import share_count_buffer
+    
+    try:
+        written = share_count_buffer.flush()
+        logger.info(f"Social share counts flushed: {written} shares written")
+        return written
+    except Exception as e:
+        logger.error(f"Failed to flush social share counts: {str(e)}")
+        raise
+
+
+@shared_task
+def refresh_engagement_rollups():
+    """
+    Rebuild the engagement analytics dashboard rollups.
+    This task should be run every 5 minutes so the dashboard never builds
+    them on a page load; `manage.py setup_blog_tasks` schedules it.
+    """
+    from .services.engagement_warehouse_service import EngagementWarehouseService
+
+    try:
+        rollups = EngagementWarehouseService.refresh_rollups()
+        return rollups['total_posts']
+    except Exception as e:
+        logger.error(f"Failed to refresh engagement rollups: {str(e)}")
+        raise
+
+
+@shared_task
+def compact_engagement_facts():
+    """
+    Nightly reconciliation of the daily engagement facts with their sources.
+    Recounts recent comments and subscribers, adds counts recorded outside
+    the warehouse, folds days past the daily retention into weekly rows and
+    removes empty rows. Scheduled by
+    `manage.py setup_blog_tasks`.
+    """
+    from .services.engagement_warehouse_service import EngagementWarehouseService
+
+    try:
+        summary = EngagementWarehouseService.compact()
+        logger.info(f"Engagement facts compacted: {summary}")
+        return summary
+    except Exception as e:
+        logger.error(f"Failed to compact engagement facts: {str(e)}")
+        raise
+
+
+@shared_task
+def run_export_job(job_id, selection):
+    """
+    Write a queued admin export to storage.
+    Progress is recorded on the job in the cache as rows are written.
+    """
+    from .services.export_service import ExportService
+
+    try:
+        job = ExportService.run_job(job_id, selection)
+        return job['rows']
+    except Exception as e:
+        logger.error(f"Failed to run export job {job_id}: {str(e)}")
+        raise
+
+
+@shared_task
+def purge_export_files():
+    """
+    Delete old admin export files from storage.
+    This task should be run daily; `manage.py setup_blog_tasks` schedules it.
+    """
+    from .services.export_service import ExportService
+
+    try:
+        deleted = ExportService.purge_files()
+        logger.info(f"Deleted {deleted} old export files")
+        return deleted
+    except Exception as e:
+        logger.error(f"Failed to purge export files: {str(e)}")
+        raise
+
+
 @shared_task
 def invalidate_expired_caches():
     """
@@ -376,27 +467,33 @@ def post_to_linkedin(self, post_id):
     - Error handling with exponential backoff
     - Status tracking and monitoring
     
+    Tasks are normally dispatched by the LinkedIn publish scheduler. Temporary
+    failures and quota deferrals are queued back on the scheduler with a due
+    time rather than retried through Celery.
+    
     Args:
         post_id (int): ID of the blog post to share on LinkedIn
         
     Returns:
         dict: Result information including success status and details
-        
-    Raises:
-        Retry: If the task should be retried due to temporary failures
     """
     from .models import Post
     from .linkedin_models import LinkedInPost, LinkedInConfig
-    from .services.linkedin_service import LinkedInAPIService, LinkedInAPIError
+    from .services.linkedin_service import (
+        LinkedInAPIService, LinkedInAPIError, LinkedInAuthenticationError,
+        LinkedInRateLimitError, LinkedInContentError
+    )
+    from .services.linkedin_api_client import LinkedInQuotaLedger
+    from .services.linkedin_publish_scheduler import LinkedInPublishScheduler
     from .services.linkedin_task_monitor import LinkedInTaskMonitor
     from django.utils import timezone
-    from datetime import timedelta
     import time
     
     task_start_time = timezone.now()
     monitor = LinkedInTaskMonitor()
+    scheduler = LinkedInPublishScheduler()
     
-    logger.info(f"Starting LinkedIn posting task for post ID {post_id} (attempt {self.request.retries + 1})")
+    logger.info(f"Starting LinkedIn posting task for post ID {post_id}")
     
     try:
         # Get the blog post
@@ -449,16 +546,36 @@ def post_to_linkedin(self, post_id):
             monitor.log_task_completion(result)
             return result
         
+        # Defer without using a retry attempt while any worker is rate limited
+        # or today's posting quota is used up
+        wait_seconds = LinkedInQuotaLedger().get_wait_seconds('posts')
+        if wait_seconds > 0:
+            logger.info(f"LinkedIn posting quota unavailable, deferring post ID {post_id} by {wait_seconds} seconds")
+            linkedin_post.status = 'retrying'
+            linkedin_post.next_retry_at = scheduler.schedule_retry(post_id, wait_seconds)
+            linkedin_post.save(update_fields=['status', 'next_retry_at'])
+            return {
+                'success': False,
+                'deferred': True,
+                'retry_after': wait_seconds,
+                'post_id': post_id,
+                'task_duration': (timezone.now() - task_start_time).total_seconds()
+            }
+        
         # Update status to indicate posting is in progress
         linkedin_post.status = 'pending'
         linkedin_post.save(update_fields=['status'])
         
+        # Retries are separate task runs dispatched from the publish queue, so
+        # the attempt count comes from the tracking record
+        retries = linkedin_post.attempt_count
+        
         # Initialize LinkedIn API service
         linkedin_service = LinkedInAPIService(config=linkedin_config)
         
         try:
             # Attempt to post to LinkedIn with current attempt count
-            result_linkedin_post = linkedin_service.post_blog_article(blog_post, attempt_count=self.request.retries + 1)
+            result_linkedin_post = linkedin_service.post_blog_article(blog_post, attempt_count=retries + 1)
             
             # Task completed successfully
             task_duration = (timezone.now() - task_start_time).total_seconds()
@@ -491,22 +608,21 @@ def post_to_linkedin(self, post_id):
             logger.error(f"LinkedIn API error for post '{blog_post.title}': {error_context}")
             
             # Enhanced retry logic based on error type
-            should_retry = _should_retry_enhanced(e, self.request.retries)
+            should_retry = _should_retry_enhanced(e, retries)
             
-            if should_retry and self.request.retries < self.max_retries:
+            if should_retry and retries < self.max_retries:
                 # Calculate retry delay based on error type
-                retry_delay = _calculate_enhanced_retry_delay(e, self.request.retries)
+                retry_delay = _calculate_enhanced_retry_delay(e, retries)
                 
-                logger.info(f"Retrying LinkedIn post for '{blog_post.title}' in {retry_delay} seconds (attempt {self.request.retries + 2})")
+                logger.info(f"Retrying LinkedIn post for '{blog_post.title}' in {retry_delay} seconds (attempt {retries + 2})")
                 
-                # Update LinkedIn post status for retry
+                # Update LinkedIn post status and queue the retry
                 linkedin_post.status = 'retrying'
-                linkedin_post.next_retry_at = timezone.now() + timedelta(seconds=retry_delay)
+                linkedin_post.next_retry_at = scheduler.schedule_retry(post_id, retry_delay)
                 linkedin_post.error_message = f"{e.message} (will retry in {retry_delay}s)"
                 linkedin_post.save(update_fields=['status', 'next_retry_at', 'error_message'])
                 
-                # Retry the task with calculated delay
-                raise self.retry(countdown=retry_delay, exc=e)
+                return _retry_scheduled_result(post_id, e.message, retries, retry_delay, task_start_time)
             else:
                 # Mark as permanently failed with detailed error information
                 linkedin_post.mark_as_failed(
@@ -514,6 +630,7 @@ def post_to_linkedin(self, post_id):
                     error_code=getattr(e, 'error_code', None),
                     can_retry=False
                 )
+                image_retry_delay = _queue_image_retry(scheduler, linkedin_post)
                 
                 task_duration = (timezone.now() - task_start_time).total_seconds()
                 failure_result = {
@@ -524,7 +641,8 @@ def post_to_linkedin(self, post_id):
                     'post_id': post_id,
                     'blog_title': blog_post.title,
                     'final_failure': True,
-                    'attempt_count': self.request.retries + 1,
+                    'image_retry_after': image_retry_delay,
+                    'attempt_count': retries + 1,
                     'task_duration': task_duration,
                     'error_context': error_context
                 }
@@ -535,24 +653,25 @@ def post_to_linkedin(self, post_id):
             # Handle unexpected errors
             logger.error(f"Unexpected error posting to LinkedIn for '{blog_post.title}': {str(e)}")
             
-            if self.request.retries < self.max_retries:
+            if retries < self.max_retries:
                 # Retry for unexpected errors
-                retry_delay = _calculate_retry_delay(self.request.retries)
+                retry_delay = _calculate_retry_delay(retries)
                 
                 logger.info(f"Retrying LinkedIn post for '{blog_post.title}' due to unexpected error in {retry_delay} seconds")
                 
-                # Update LinkedIn post status
+                # Update LinkedIn post status and queue the retry
                 linkedin_post.status = 'retrying'
-                linkedin_post.next_retry_at = timezone.now() + timedelta(seconds=retry_delay)
+                linkedin_post.next_retry_at = scheduler.schedule_retry(post_id, retry_delay)
                 linkedin_post.save(update_fields=['status', 'next_retry_at'])
                 
-                raise self.retry(countdown=retry_delay, exc=e)
+                return _retry_scheduled_result(post_id, str(e), retries, retry_delay, task_start_time)
             else:
                 # Mark as permanently failed
                 linkedin_post.mark_as_failed(
                     error_message=str(e),
                     can_retry=False
                 )
+                image_retry_delay = _queue_image_retry(scheduler, linkedin_post)
                 
                 task_duration = (timezone.now() - task_start_time).total_seconds()
                 failure_result = {
@@ -561,7 +680,8 @@ def post_to_linkedin(self, post_id):
                     'post_id': post_id,
                     'blog_title': blog_post.title,
                     'final_failure': True,
-                    'attempt_count': self.request.retries + 1,
+                    'image_retry_after': image_retry_delay,
+                    'attempt_count': retries + 1,
                     'task_duration': task_duration
                 }
                 monitor.log_task_completion(failure_result)
@@ -583,26 +703,43 @@ def post_to_linkedin(self, post_id):
         return error_result
 
 
+@shared_task
+def dispatch_linkedin_publish_queue():
+    """
+    Celery task to dispatch due entries from the LinkedIn publish queue.
+    
+    This task should be run every minute; `manage.py setup_blog_tasks`
+    registers it with Celery Beat. Each run dispatches due posts by
+    priority and age, up to what the shared posting quota and the dispatch
+    rate allow.
+    
+    Returns:
+        dict: Number of due entries, the dispatch budget and dispatched post IDs
+    """
+    from .services.linkedin_publish_scheduler import LinkedInPublishScheduler
+    
+    return LinkedInPublishScheduler().dispatch()
+
+
 @shared_task
 def retry_failed_linkedin_posts():
     """
     Celery task to retry LinkedIn posts that are ready for retry.
     
-    This task should be run periodically (e.g., every 15 minutes) to check
-    for posts that are ready to be retried based on their retry schedule.
+    Retries are queue entries with a due time on the LinkedIn publish queue,
+    so this dispatches due entries instead of scanning LinkedInPost. Kept for
+    existing periodic schedules; dispatch_linkedin_publish_queue does the same.
     
     Returns:
         dict: Summary of retry attempts
     """
-    from .linkedin_models import LinkedInPost
-    from django.utils import timezone
+    from .services.linkedin_publish_scheduler import LinkedInPublishScheduler
     
     logger.info("Starting retry of failed LinkedIn posts")
     
-    # Get posts ready for retry
-    posts_to_retry = LinkedInPost.get_posts_ready_for_retry()
+    summary = LinkedInPublishScheduler().dispatch()
     
-    if not posts_to_retry.exists():
+    if not summary['due']:
         logger.info("No LinkedIn posts ready for retry")
         return {
             'posts_checked': 0,
@@ -610,22 +747,10 @@ def retry_failed_linkedin_posts():
             'message': 'No posts ready for retry'
         }
     
-    retry_count = 0
-    for linkedin_post in posts_to_retry:
-        try:
-            # Trigger the main posting task for retry
-            post_to_linkedin.delay(linkedin_post.post.id)
-            retry_count += 1
-            
-            logger.info(f"Queued retry for LinkedIn post: {linkedin_post.post.title}")
-            
-        except Exception as e:
-            logger.error(f"Failed to queue retry for LinkedIn post {linkedin_post.id}: {str(e)}")
-    
     result = {
-        'posts_checked': posts_to_retry.count(),
-        'posts_retried': retry_count,
-        'message': f'Queued {retry_count} posts for retry'
+        'posts_checked': summary['due'],
+        'posts_retried': summary['dispatched'],
+        'message': f"Queued {summary['dispatched']} posts for retry"
     }
     
     logger.info(f"LinkedIn retry task completed: {result['message']}")
@@ -996,6 +1121,67 @@ def comprehensive_error_audit():
         }
 
 
+def _retry_scheduled_result(post_id, error, retries, retry_delay, task_start_time):
+    """
+    Build the result of a LinkedIn posting run whose retry was queued.
+    
+    Args:
+        post_id: Blog post ID
+        error: Error message of the failed attempt
+        retries: Number of attempts made before this run
+        retry_delay: Seconds until the retry is due
+        task_start_time: When the run started
+        
+    Returns:
+        dict: Task result
+    """
+    return {
+        'success': False,
+        'error': error,
+        'post_id': post_id,
+        'retry_scheduled': True,
+        'retry_after': retry_delay,
+        'attempt_count': retries + 1,
+        'task_duration': (timezone.now() - task_start_time).total_seconds()
+    }
+
+
+def _queue_image_retry(scheduler, linkedin_post):
+    """
+    Queue another attempt for a post whose image upload failed.
+    
+    Runs once the posting task gives up on a post. If the image upload
+    failed and the post has attempts left, a low priority image retry is
+    queued after LINKEDIN_IMAGE_SETTINGS['RETRY_DELAY_SECONDS'], doubled
+    for every attempt made.
+    
+    Args:
+        scheduler: LinkedInPublishScheduler to queue the retry on
+        linkedin_post: LinkedInPost marked as failed
+        
+    Returns:
+        int: Seconds until the retry is due, or None if none was queued
+    """
+    from .linkedin_models import LinkedInPublishQueueEntry
+    
+    image_settings = getattr(settings, 'LINKEDIN_IMAGE_SETTINGS', {})
+    if not image_settings.get('RETRY_FAILED_UPLOADS', True):
+        return None
+    
+    # The image status is set by the posting service on its own instance
+    linkedin_post.refresh_from_db(fields=['image_upload_status'])
+    if not linkedin_post.is_image_upload_failed() or linkedin_post.attempt_count >= linkedin_post.max_attempts:
+        return None
+    
+    retry_delay = image_settings.get('RETRY_DELAY_SECONDS', 60) * (2 ** linkedin_post.attempt_count)
+    linkedin_post.next_retry_at = scheduler.schedule_retry(
+        linkedin_post.post_id, retry_delay, reason=LinkedInPublishQueueEntry.REASON_IMAGE_RETRY
+    )
+    linkedin_post.save(update_fields=['next_retry_at'])
+    logger.info(f"Image upload retry for post ID {linkedin_post.post_id} queued in {retry_delay} seconds")
+    return retry_delay
+
+
 def _calculate_retry_delay(retry_count: int) -> int:
     """
     Calculate retry delay with exponential backoff and jitter.
@@ -1052,6 +1238,10 @@ def cleanup_linkedin_image_metrics(self):
         deleted_count = old_failed_posts.count()
         old_failed_posts.delete()
         
+        # Clean up finished tasks from the task registry
+        from blog.services.linkedin_task_monitor import LinkedInTaskMonitor
+        deleted_count += LinkedInTaskMonitor().cleanup_completed_tasks(hours=24 * 7)
+        
         logger.info(f"LinkedIn image metrics cleanup completed - removed {deleted_count} old records")
         return f"Metrics cleanup completed - removed {deleted_count} records"
     except Exception as e:
@@ -1159,71 +1349,4 @@ def generate_daily_linkedin_report(self):
         
     except Exception as e:
         logger.error(f"Error generating daily LinkedIn report: {str(e)}")
-        raise self.retry(exc=e, countdown=1800)  # Retry after 30 minutes
-
-
-@shared_task(bind=True, max_retries=2)
-def retry_failed_image_uploads(self):
-    """
-    Periodic task to retry failed image uploads that can be retried.
-    
-    This task should be run every few hours to automatically retry
-    failed uploads that may have been caused by temporary issues.
-    """
-    try:
-        from blog.linkedin_models import LinkedInPost, LinkedInConfig
-        from blog.services.linkedin_service import LinkedInAPIService
-        
-        logger.info("Starting automatic retry of failed LinkedIn image uploads")
-        
-        # Get LinkedIn configuration
-        config = LinkedInConfig.get_active_config()
-        if not config:
-            logger.warning("No active LinkedIn configuration found")
-            return "No LinkedIn configuration"
-        
-        # Find posts that can be retried
-        failed_posts = LinkedInPost.objects.filter(
-            status__in=['failed', 'retrying'],
-            image_upload_status='failed'
-        )
-        
-        # Filter posts that can actually be retried
-        retryable_posts = [post for post in failed_posts if post.can_retry()]
-        
-        if not retryable_posts:
-            logger.info("No failed posts available for retry")
-            return "No posts to retry"
-        
-        # Limit the number of retries per run
-        max_retries_per_run = 2
-        posts_to_retry = retryable_posts[:max_retries_per_run]
-        
-        service = LinkedInAPIService(config)
-        retry_count = 0
-        success_count = 0
-        
-        for linkedin_post in posts_to_retry:
-            try:
-                logger.info(f"Retrying LinkedIn post for blog post: {linkedin_post.post.title}")
-                
-                # Reset status and retry
-                linkedin_post.mark_as_pending()
-                result = service.post_blog_article(linkedin_post.post)
-                retry_count += 1
-                
-                if result.is_successful():
-                    success_count += 1
-                    logger.info(f"Successfully retried LinkedIn post for: {linkedin_post.post.title}")
-                else:
-                    logger.warning(f"Retry failed for LinkedIn post: {linkedin_post.post.title} - {result.error_message}")
-                
-            except Exception as e:
-                logger.error(f"Error retrying LinkedIn post for {linkedin_post.post.title}: {str(e)}")
-        
-        logger.info(f"Automatic retry completed - Attempted: {retry_count}, Successful: {success_count}")
-        return f"Retried {retry_count} posts, {success_count} successful"
-        
-    except Exception as e:
-        logger.error(f"Error during automatic retry of failed uploads: {str(e)}")
         raise self.retry(exc=e, countdown=1800)  # Retry after 30 minutes
\ No newline at end of file
@@ -43,7 +43,7 @@ def social_share_widget(context, post):
     request = context.get('request')
     share_urls = SocialShareService.generate_share_urls(post, request)
     share_counts = SocialShareService.get_share_counts(post)
-    total_shares = SocialShareService.get_total_shares(post)
+    total_shares = sum(share_counts.values())
     
     return {
         'post': post,
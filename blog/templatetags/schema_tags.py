@@ -17,6 +17,7 @@ from django.core.cache import caches
 from django.template.loader import render_to_string
 
 from blog.services.schema_service import SchemaService
+from blog.services.schema_bundle_service import SchemaBundleService
 from blog.utils.performance_monitor import performance_monitor, monitor_template_performance
 
 register = template.Library()
@@ -95,6 +96,33 @@ def render_article_schema(context, post):
         }
 
 
+@register.simple_tag
+def render_schema_bundle(post):
+    """
+    Simple tag for rendering the precompiled JSON-LD bundle of a post.
+    
+    The bundle holds the article (with author and publisher) and breadcrumb
+    script elements, validated and serialized when it was compiled, so a
+    render costs a single cache read.
+    
+    Usage:
+        {% load schema_tags %}
+        {% render_schema_bundle post %}
+    
+    Args:
+        post: Post model instance
+        
+    Returns:
+        Safe string of JSON-LD script elements
+    """
+    try:
+        return mark_safe(SchemaBundleService.get_bundle(post).decode('utf-8'))
+        
+    except Exception as e:
+        logger.error(f"Error in render_schema_bundle for post {post.id}: {str(e)}")
+        return ''
+
+
 @register.simple_tag(takes_context=True)
 def get_article_schema_json(context, post):
     """
@@ -0,0 +1,126 @@
+"""
+Tests for the admin changelists.
+
+Covers the annotated list_display columns, sorting by them and the number
+of queries per changelist page, which must not grow with the page size.
+"""
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.admin import AuthorProfileAdmin, CommentAdmin, PostAdmin, TagAdmin
+from blog.linkedin_models import LinkedInPost
+from blog.models import AuthorProfile, Comment, Post, SocialShare, Tag
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'admin-changelist-tests',
+    }
+})
+class AdminChangelistTestCase(TestCase):
+    """Shared fixtures for changelist tests."""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='testpass123')
+        self.client.force_login(self.admin)
+        self.tag = Tag.objects.create(name='Python', slug='python')
+        self.created = 0
+
+    def add_rows(self, count):
+        """Create posts with comments, replies, shares, LinkedIn posts, tags and authors."""
+        for _ in range(count):
+            self.created += 1
+            i = self.created
+            author = User.objects.create_user(username=f'author{i}', password='testpass123')
+            AuthorProfile.objects.get_or_create(user=author)
+            post = Post.objects.create(
+                title=f'Post {i}', slug=f'post-{i}', author=author, content='Body', status='published', view_count=i
+            )
+            post.tags.add(self.tag, Tag.objects.create(name=f'Tag {i}', slug=f'tag-{i}'))
+            comment = Comment.objects.create(
+                post=post, author_name='Reader', author_email=f'reader{i % 3}@example.com',
+                content='Nice post', ip_address='127.0.0.1', is_approved=True
+            )
+            Comment.objects.create(
+                post=post, parent=comment, author_name='Writer', author_email='writer@example.com',
+                content='Thanks', ip_address='127.0.0.1', is_approved=False
+            )
+            SocialShare.objects.create(post=post, platform='twitter', share_count=2)
+            SocialShare.objects.create(post=post, platform='facebook', share_count=1)
+            LinkedInPost.objects.create(post=post, status='success', linkedin_post_url='https://linkedin.com/p/1')
+
+    def changelist_queries(self, model_name, params=None):
+        url = reverse(f'admin:blog_{model_name}_changelist')
+        # The first request of a session also saves the session
+        self.client.get(url, params or {})
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response
+
+
+class ChangelistQueryCountTest(AdminChangelistTestCase):
+    """Test that changelist pages run a constant number of queries."""
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        for model_name in ('post', 'tag', 'comment', 'authorprofile'):
+            with self.subTest(model=model_name):
+                self.add_rows(3)
+                small, _ = self.changelist_queries(model_name)
+                self.add_rows(20)
+                large, response = self.changelist_queries(model_name)
+
+                self.assertGreaterEqual(len(response.context['cl'].result_list), 20)
+                self.assertEqual(small, large)
+
+    def test_row_count_is_cached(self):
+        self.add_rows(3)
+        first, _ = self.changelist_queries('comment')
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(reverse('admin:blog_comment_changelist'))
+
+        self.assertEqual(len(context.captured_queries), first - 1)
+
+
+class ChangelistColumnTest(AdminChangelistTestCase):
+    """Test the values and sorting of the annotated columns."""
+
+    def setUp(self):
+        super().setUp()
+        self.add_rows(2)
+        self.request = RequestFactory().get('/')
+        self.request.user = self.admin
+
+    def test_post_engagement_score(self):
+        post_admin = PostAdmin(Post, admin.site)
+        post = post_admin.get_queryset(self.request).get(slug='post-2')
+
+        # 2 views + 1 approved comment * 2 + 3 shares * 3
+        self.assertEqual(post_admin.engagement_score(post), 13)
+        self.assertIn('Posted', post_admin.linkedin_status(post))
+
+    def test_counts(self):
+        tag = TagAdmin(Tag, admin.site).get_queryset(self.request).get(pk=self.tag.pk)
+        comment = CommentAdmin(Comment, admin.site).get_queryset(self.request).get(parent__isnull=True, post__slug='post-1')
+        profile = AuthorProfileAdmin(AuthorProfile, admin.site).get_queryset(self.request).get(user__username='author1')
+
+        self.assertEqual(tag.published_post_count, 2)
+        self.assertEqual(comment.reply_count, 1)
+        self.assertEqual(comment.author_comment_count, 1)
+        self.assertEqual(profile.published_post_count, 1)
+
+    def test_sort_by_engagement(self):
+        column = PostAdmin.list_display.index('engagement_score') + 1
+        _, response = self.changelist_queries('post', {'o': f'-{column}'})
+
+        self.assertEqual([post.slug for post in response.context['cl'].result_list], ['post-2', 'post-1'])
@@ -0,0 +1,238 @@
+"""
+Tests for the denormalized author statistics.
+
+Covers incremental maintenance from post, category and comment signals,
+view count flushes, the full rebuild command and a query-count regression
+test for the author list and profile pages.
+"""
+
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.author_services.author_service import AuthorService
+from blog.models import AuthorProfile, AuthorStats, Category, Comment, Post
+from blog.performance import ViewCountOptimizer
+
+
+class AuthorStatsTestCase(TestCase):
+    """Shared fixtures for author stats tests."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = self.create_author('writer')
+        self.python = Category.objects.create(name='Python', slug='python')
+        self.django = Category.objects.create(name='Django', slug='django')
+
+    def create_author(self, username):
+        user = User.objects.create_user(username=username, password='testpass123', first_name=username.title())
+        AuthorProfile.objects.get_or_create(user=user)
+        return user
+
+    def create_post(self, title, author=None, status='published', view_count=0):
+        post = Post.objects.create(
+            title=title,
+            slug=title.lower().replace(' ', '-'),
+            author=author or self.author,
+            content='Post content',
+            status=status,
+        )
+        if view_count:
+            Post.objects.filter(pk=post.pk).update(view_count=view_count)
+        return post
+
+    def stats(self, user=None):
+        return AuthorStats.objects.get(user=user or self.author)
+
+
+class AuthorStatsSignalTest(AuthorStatsTestCase):
+    """Test that signals keep the stats row current."""
+
+    def test_publishing_counts_posts(self):
+        first = self.create_post('First Post')
+        self.create_post('Draft Post', status='draft')
+        second = self.create_post('Second Post')
+
+        stats = self.stats()
+        self.assertEqual(stats.published_post_count, 2)
+        self.assertEqual(stats.latest_post_id, second.pk)
+        self.assertEqual(stats.last_published_at, second.created_at)
+
+        second.status = 'archived'
+        second.save()
+
+        stats = self.stats()
+        self.assertEqual(stats.published_post_count, 1)
+        self.assertEqual(stats.latest_post_id, first.pk)
+
+    def test_changing_author_refreshes_both(self):
+        other = self.create_author('other')
+        post = self.create_post('Moving Post')
+
+        post.author = other
+        post.save()
+
+        self.assertEqual(self.stats().published_post_count, 0)
+        self.assertEqual(self.stats(other).published_post_count, 1)
+
+    def test_deleting_post(self):
+        post = self.create_post('Doomed Post')
+        post.delete()
+
+        self.assertEqual(self.stats().published_post_count, 0)
+        self.assertIsNone(self.stats().latest_post_id)
+
+    def test_deleting_author_with_posts(self):
+        self.create_post('Orphan Post')
+
+        self.author.delete()
+
+        self.assertFalse(AuthorStats.objects.exists())
+
+    def test_top_categories_follow_m2m_changes(self):
+        first = self.create_post('First Post')
+        second = self.create_post('Second Post')
+
+        first.categories.add(self.python, self.django)
+        second.categories.add(self.python)
+        self.assertEqual(
+            [(c['slug'], c['post_count']) for c in self.stats().top_categories],
+            [('python', 2), ('django', 1)]
+        )
+
+        self.python.posts.remove(first)
+        self.assertEqual(
+            [(c['slug'], c['post_count']) for c in self.stats().top_categories],
+            [('django', 1), ('python', 1)]
+        )
+
+        self.python.posts.clear()
+        first.categories.clear()
+        self.assertEqual(self.stats().top_categories, [])
+
+    def test_approved_comments_are_counted(self):
+        post = self.create_post('Discussed Post')
+        comment = Comment.objects.create(
+            post=post, author_name='Reader', author_email='reader@example.com',
+            content='Nice post', ip_address='127.0.0.1'
+        )
+        self.assertEqual(self.stats().approved_comment_count, 0)
+
+        comment.is_approved = True
+        comment.save()
+        self.assertEqual(self.stats().approved_comment_count, 1)
+
+        comment.delete()
+        self.assertEqual(self.stats().approved_comment_count, 0)
+
+    def test_flushed_views_are_added(self):
+        post = self.create_post('Viewed Post')
+        draft = self.create_post('Draft Post', status='draft')
+
+        for _ in range(10):
+            ViewCountOptimizer.increment_view_count(post.pk)
+            ViewCountOptimizer.increment_view_count(draft.pk)
+
+        self.assertEqual(self.stats().total_views, 10)
+
+
+class AuthorStatsRebuildTest(AuthorStatsTestCase):
+    """Test the full rebuild."""
+
+    def test_rebuild_matches_incremental_stats(self):
+        other = self.create_author('other')
+        posts = [self.create_post(f'Post {i}', author=self.author if i % 2 else other, view_count=i) for i in range(6)]
+        posts[1].categories.add(self.python)
+        posts[2].categories.add(self.django)
+        incremental = {
+            row.pop('user_id'): row
+            for row in AuthorStats.objects.values(
+                'user_id', 'published_post_count', 'total_views', 'top_categories', 'latest_post_id'
+            )
+        }
+
+        AuthorStats.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_author_stats', stdout=out)
+
+        rebuilt = {
+            row.pop('user_id'): row
+            for row in AuthorStats.objects.values(
+                'user_id', 'published_post_count', 'total_views', 'top_categories', 'latest_post_id'
+            )
+        }
+        self.assertEqual(rebuilt, incremental)
+        self.assertEqual(rebuilt[self.author.pk]['total_views'], 1 + 3 + 5)
+        self.assertIn('Rebuilt author stats for 2 authors', out.getvalue())
+
+    def test_rebuild_fixes_bulk_updates(self):
+        self.create_post('Bulk Post')
+        Post.objects.update(status='draft')
+
+        call_command('rebuild_author_stats', author='writer', stdout=StringIO())
+
+        self.assertEqual(self.stats().published_post_count, 0)
+
+
+class AuthorStatsQueryCountTest(AuthorStatsTestCase):
+    """Query-count regression tests for author pages."""
+
+    def create_authors(self, count, posts_each=3):
+        start = User.objects.count()
+        for i in range(start, start + count):
+            author = self.create_author(f'author{i:03d}')
+            for j in range(posts_each):
+                post = self.create_post(f'Post {i} {j}', author=author)
+                post.categories.add(self.python)
+
+    def count_queries(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return queries.captured_queries
+
+    def test_author_list_queries_do_not_grow_with_authors(self):
+        url = reverse('blog:author_list')
+        self.create_authors(5)
+        few = self.count_queries(url, per_page=48)
+
+        self.create_authors(40)
+        many = self.count_queries(url, per_page=48)
+
+        self.assertEqual(len(many), len(few))
+        self.assertFalse([q for q in many if 'blog_post' in q['sql'] and 'blog_authorstats' not in q['sql']])
+        # One COUNT for the paginator and one query for the page
+        self.assertEqual(len([q for q in many if 'blog_authorstats' in q['sql']]), 2)
+
+    def test_author_list_counts_come_from_stats(self):
+        self.create_authors(3, posts_each=2)
+
+        authors = list(AuthorService.get_all_active_authors())
+
+        self.assertEqual([author.post_count for author in authors], [2, 2, 2])
+        with self.assertNumQueries(0):
+            [(author.author_profile.get_display_name(), author.author_profile.get_post_count()) for author in authors]
+
+    def test_author_detail_reads_stats_in_one_query(self):
+        for i in range(5):
+            post = self.create_post(f'Detail Post {i}')
+            Comment.objects.create(
+                post=post, author_name='Reader', author_email='reader@example.com',
+                content='Nice post', ip_address='127.0.0.1', is_approved=True
+            )
+
+        queries = self.count_queries(reverse('blog:author_detail', args=[self.author.username]))
+
+        self.assertEqual(len([q for q in queries if 'blog_authorstats' in q['sql']]), 1)
+        # Approved comments are no longer counted post by post
+        self.assertFalse([q for q in queries if 'blog_comment' in q['sql'] and 'is_approved' in q['sql']])
+
+        stats = AuthorService.get_author_stats(self.author)
+        self.assertEqual(stats['total_posts'], 5)
+        self.assertEqual(stats['total_comments'], 5)
@@ -0,0 +1,279 @@
+"""
+Tests for the bulk tag/category import and streamed export of
+migrate_blog_data.
+
+Covers name resolution, batched through-table writes, dry runs, the export
+format and a benchmark of importing tags for many posts.
+"""
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.text import slugify
+
+from blog.models import AuthorStats, Category, Post, Tag
+from blog.services.bulk_migration_service import BulkMigrationService
+
+
+BENCHMARK_POSTS = int(os.environ.get('MIGRATION_BENCHMARK_POSTS', 5000))
+BENCHMARK_TAGS_PER_POST = 8
+
+
+def create_posts(author, count, content='Body'):
+    Post.objects.bulk_create(
+        [
+            Post(title=f'Post {i}', slug=f'post-{i}', author=author, content=content, status='published')
+            for i in range(count)
+        ],
+        batch_size=1000,
+    )
+
+
+class BulkMigrationTestCase(TestCase):
+    """Shared fixtures for bulk migration tests."""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+        self.author = User.objects.create_user(username='writer', password='testpass123')
+
+    def write_source(self, data, filename='source.json'):
+        path = os.path.join(self.work_dir, filename)
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(data, handle)
+        return path
+
+
+class BulkImportTest(BulkMigrationTestCase):
+    """Test importing tags, categories and post links from a file."""
+
+    def setUp(self):
+        super().setUp()
+        create_posts(self.author, 3)
+        Tag.objects.create(name='Python', slug='python', color='#3776ab')
+        self.source = self.write_source({
+            'tags': [
+                {'name': 'Python', 'slug': 'python', 'color': '#000000'},
+                {'name': 'Django', 'slug': 'django', 'color': '#092e20', 'description': 'Web framework'},
+            ],
+            'categories': [
+                {'name': 'Programming', 'slug': 'programming', 'parent': None},
+                {'name': 'Web', 'slug': 'web', 'parent': 'Programming'},
+            ],
+            'posts': [
+                {'slug': 'post-0', 'tags': ['Python', 'Django'], 'categories': ['Web']},
+                {'slug': 'post-1', 'tags': ['Testing'], 'categories': []},
+                {'slug': 'gone', 'tags': ['Python'], 'categories': ['Web']},
+            ],
+        })
+
+    def test_import_creates_names_and_links(self):
+        results = BulkMigrationService.import_file(self.source)
+
+        tags = results['tags']
+        self.assertEqual((tags.created, tags.existing, tags.links_created, tags.missing_posts), (2, 1, 3, 1))
+        django = Tag.objects.get(name='Django')
+        self.assertEqual((django.slug, django.color, django.description), ('django', '#092e20', 'Web framework'))
+        # Existing tags are kept as they are
+        self.assertEqual(Tag.objects.get(name='Python').color, '#3776ab')
+        # Names only used by posts get default fields
+        self.assertEqual(Tag.objects.get(name='Testing').slug, 'testing')
+
+        self.assertEqual(Category.objects.get(name='Web').parent.name, 'Programming')
+        post = Post.objects.get(slug='post-0')
+        self.assertEqual(sorted(post.tags.values_list('name', flat=True)), ['Django', 'Python'])
+        self.assertEqual(list(post.categories.values_list('name', flat=True)), ['Web'])
+        self.assertEqual(AuthorStats.objects.get(user=self.author).top_categories[0]['name'], 'Web')
+
+    def test_import_is_repeatable(self):
+        BulkMigrationService.import_file(self.source)
+
+        results = BulkMigrationService.import_file(self.source)
+
+        self.assertEqual((results['tags'].created, results['tags'].links_created), (0, 0))
+        self.assertEqual(results['tags'].links_existing, 3)
+        self.assertEqual(Post.tags.through.objects.count(), 3)
+
+    def test_dry_run_writes_nothing(self):
+        with CaptureQueriesContext(connection) as queries:
+            results = BulkMigrationService.import_file(self.source, dry_run=True)
+
+        self.assertEqual((results['tags'].created, results['tags'].links_created), (2, 3))
+        self.assertEqual((results['categories'].created, results['categories'].links_created), (2, 1))
+        self.assertFalse(any(query['sql'].startswith(('INSERT', 'UPDATE')) for query in queries))
+        self.assertEqual(Tag.objects.count(), 1)
+
+    def test_slug_conflicts_are_reported(self):
+        source = self.write_source({'posts': [{'slug': 'post-0', 'tags': ['python!', 'Ruby']}]}, 'conflict.json')
+
+        results = BulkMigrationService.import_file(source, relations=['tags'])
+
+        self.assertEqual(results['tags'].conflicts, ['python!'])
+        self.assertEqual(results['tags'].links_created, 1)
+        self.assertEqual(list(Post.objects.get(slug='post-0').tags.values_list('name', flat=True)), ['Ruby'])
+
+    def test_query_count_does_not_grow_with_posts(self):
+        Post.objects.bulk_create([
+            Post(title=f'Extra {i}', slug=f'extra-{i}', author=self.author, content='Body') for i in range(200)
+        ])
+        source = self.write_source({
+            'posts': [{'slug': f'extra-{i}', 'tags': [f'Tag {i % 20}', 'Shared']} for i in range(200)],
+        }, 'many.json')
+
+        with CaptureQueriesContext(connection) as queries:
+            results = BulkMigrationService.import_file(source, relations=['tags'])
+
+        self.assertEqual(results['tags'].links_created, 400)
+        self.assertLess(len(queries), 15)
+
+    def test_command_imports_from_file(self):
+        out = StringIO()
+        call_command(
+            'migrate_blog_data', '--migration-type', 'tags', '--source-file', self.source, stdout=out
+        )
+
+        self.assertIn('Imported 2 tags and added 3 post links to 2 posts', out.getvalue())
+        self.assertIn('1 posts in the file were not found', out.getvalue())
+
+
+class ExtractTagsTest(BulkMigrationTestCase):
+    """Test creating tags from terms found in post content."""
+
+    def test_terms_are_counted_in_one_query(self):
+        create_posts(self.author, 2, content='Deploying Django with Docker')
+
+        with CaptureQueriesContext(connection) as queries:
+            counts = BulkMigrationService.count_content_terms(['django', 'docker', 'kubernetes'])
+
+        self.assertEqual(counts, {'django': 2, 'docker': 2, 'kubernetes': 0})
+        self.assertEqual(len(queries), 1)
+
+    def test_command_creates_matching_tags(self):
+        create_posts(self.author, 2, content='Deploying Django with Docker')
+        out = StringIO()
+
+        call_command('migrate_blog_data', '--migration-type', 'tags', stdout=out)
+
+        self.assertEqual(Tag.objects.get(slug='docker').color, '#2496ed')
+        self.assertTrue(Tag.objects.filter(name='Django').exists())
+        self.assertFalse(Tag.objects.filter(slug='kubernetes').exists())
+        self.assertIn(f"Created {Tag.objects.count()} tags", out.getvalue())
+
+
+class StreamedExportTest(BulkMigrationTestCase):
+    """Test the streamed export."""
+
+    def setUp(self):
+        super().setUp()
+        parent = Category.objects.create(name='Programming', slug='programming')
+        category = Category.objects.create(name='Python', slug='python', parent=parent)
+        tag = Tag.objects.create(name='Django', slug='django', color='#092e20')
+        create_posts(self.author, 5)
+        post = Post.objects.get(slug='post-3')
+        post.tags.add(tag)
+        post.categories.add(category)
+
+    def test_export_format(self):
+        path = os.path.join(self.work_dir, 'export.json.gz')
+
+        counts = BulkMigrationService.export(path, batch_size=2)
+
+        with gzip.open(path, 'rt', encoding='utf-8') as handle:
+            data = json.load(handle)
+        self.assertEqual(counts['posts'], 5)
+        self.assertEqual(len(data['posts']), 5)
+        post = next(row for row in data['posts'] if row['slug'] == 'post-3')
+        self.assertEqual(post['author'], 'writer')
+        self.assertEqual((post['tags'], post['categories']), (['Django'], ['Python']))
+        self.assertIn({'name': 'Python', 'slug': 'python', 'parent': 'Programming'}, data['categories'])
+        self.assertEqual(data['newsletter_subscribers'], [])
+        self.assertIn('export_date', data)
+
+    def test_exported_links_import_back(self):
+        path = os.path.join(self.work_dir, 'export.json')
+        call_command('migrate_blog_data', '--export-file', path, stdout=StringIO())
+        Tag.objects.all().delete()
+        Category.objects.all().delete()
+
+        BulkMigrationService.import_file(path)
+
+        post = Post.objects.get(slug='post-3')
+        self.assertEqual(list(post.tags.values_list('name', flat=True)), ['Django'])
+        self.assertEqual(post.categories.get().parent.name, 'Programming')
+
+    def test_dry_run_export_writes_nothing(self):
+        path = os.path.join(self.work_dir, 'export.json')
+        out = StringIO()
+
+        call_command('migrate_blog_data', '--export-file', path, '--dry-run', stdout=out)
+
+        self.assertFalse(os.path.exists(path))
+        self.assertIn('5 posts', out.getvalue())
+
+
+@skipUnless('MIGRATION_BENCHMARK_POSTS' in os.environ, 'Set MIGRATION_BENCHMARK_POSTS to run the benchmark')
+class BulkMigrationBenchmarkTest(BulkMigrationTestCase):
+    """
+    Benchmark importing tags for many posts.
+
+    Runs when MIGRATION_BENCHMARK_POSTS is set to the number of posts (for
+    example 50000). The per-tag implementation is timed on a sample.
+    """
+
+    LEGACY_SAMPLE = 200
+
+    def setUp(self):
+        super().setUp()
+        create_posts(self.author, BENCHMARK_POSTS)
+        tag_names = [f'Tag {i}' for i in range(200)]
+        self.assignments = {
+            f'post-{i}': [tag_names[(i * 7 + j * 13) % len(tag_names)] for j in range(BENCHMARK_TAGS_PER_POST)]
+            for i in range(BENCHMARK_POSTS)
+        }
+
+    def legacy_import(self, slugs):
+        # The per-post, per-tag loop this replaced
+        for slug in slugs:
+            post = Post.objects.get(slug=slug)
+            for name in self.assignments[slug]:
+                tag, _ = Tag.objects.get_or_create(name=name, defaults={'slug': slugify(name)})
+                post.tags.add(tag)
+
+    def test_benchmark(self):
+        sample = list(self.assignments)[:self.LEGACY_SAMPLE]
+        start_time = time.perf_counter()
+        self.legacy_import(sample)
+        legacy_time = (time.perf_counter() - start_time) * BENCHMARK_POSTS / len(sample)
+        Post.tags.through.objects.all().delete()
+        Tag.objects.all().delete()
+
+        source = self.write_source({
+            'posts': [{'slug': slug, 'tags': names} for slug, names in self.assignments.items()],
+        }, 'benchmark.json')
+        start_time = time.perf_counter()
+        dry_run = BulkMigrationService.import_file(source, relations=['tags'], dry_run=True)
+        dry_run_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        results = BulkMigrationService.import_file(source, relations=['tags'])
+        bulk_time = time.perf_counter() - start_time
+
+        links = BENCHMARK_POSTS * BENCHMARK_TAGS_PER_POST
+        print(f"\nBulk Tag Import Benchmark ({BENCHMARK_POSTS} posts x {BENCHMARK_TAGS_PER_POST} tags):")
+        print(f"  Per-tag get_or_create/add: {legacy_time:.1f}s (from {len(sample)} posts)")
+        print(f"  Bulk dry run:              {dry_run_time:.2f}s")
+        print(f"  Bulk import:               {bulk_time:.2f}s")
+        self.assertEqual(dry_run['tags'].links_created, links)
+        self.assertEqual(results['tags'].links_created, links)
+        self.assertEqual(Post.tags.through.objects.count(), links)
+        self.assertLess(bulk_time, legacy_time)
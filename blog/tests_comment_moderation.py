@@ -0,0 +1,304 @@
+"""
+Tests for the comment moderation pipeline.
+
+Covers risk scores computed at submit time, reputation counters kept by
+signals and by the set-based bulk actions, blocking, the riskiest-first
+moderation queue, the dashboard read from the counters and a benchmark
+against the per-view scans it replaces.
+"""
+
+import os
+import time
+from datetime import timedelta
+
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from unittest import skipUnless
+from unittest.mock import patch
+
+from blog.admin import CommentAdmin
+from blog.models import Comment, CommenterReputation, Post
+from blog.services.comment_moderation_service import CommentModerationService
+
+
+BENCHMARK_COMMENTS = int(os.environ.get('COMMENT_MODERATION_BENCHMARK_COMMENTS', 20000))
+
+SPAM = 'CLICK HERE to make money fast!!! Visit now http://bit.ly/x http://bit.ly/y http://bit.ly/z'
+
+
+class CommentModerationTestCase(TestCase):
+    """Shared fixtures for moderation tests."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='author', password='testpass123')
+        self.post = Post.objects.create(
+            title='Moderated Post',
+            slug='moderated-post',
+            author=self.user,
+            content='Post content',
+            status='published',
+        )
+
+    def comment(self, content='Thanks, this was helpful.', email='reader@example.com', ip='10.0.0.1',
+                name='Reader', user_agent='Mozilla/5.0', **kwargs):
+        return Comment.objects.create(
+            post=self.post, author_name=name, author_email=email, content=content,
+            ip_address=ip, user_agent=user_agent, **kwargs
+        )
+
+    def reputation(self, kind, value=''):
+        return CommenterReputation.objects.get(kind=kind, value=value)
+
+    def counters(self):
+        return {
+            (row.kind, row.value): (row.comment_count, row.approved_count, row.spam_count)
+            for row in CommenterReputation.objects.all()
+        }
+
+    def admin_action(self, action, queryset):
+        admin = CommentAdmin(Comment, AdminSite())
+        with patch.object(admin, 'message_user'):
+            getattr(admin, action)(RequestFactory().post('/'), queryset)
+
+
+class RiskScoreTest(CommentModerationTestCase):
+    """Test scoring comments at submit time."""
+
+    def test_spam_scores_higher(self):
+        clean = self.comment()
+        spam = self.comment(SPAM, email='spammer@example.com', ip='10.0.0.9', user_agent='')
+
+        self.assertLess(clean.risk_score, 0.2)
+        self.assertGreater(spam.risk_score, 0.7)
+        self.assertEqual(spam.risk_features['suspicious_urls'], ['url_shortener'])
+        self.assertEqual(spam.risk_features['links'], 3)
+        self.assertTrue(spam.risk_features['no_user_agent'])
+
+    def test_reputation_feeds_the_score(self):
+        for i in range(3):
+            self.comment(f'Spam {i}', email='spammer@example.com', ip='10.0.0.9', is_spam=True)
+        for i in range(3):
+            self.comment(f'Comment {i}', email='regular@example.com', ip='10.0.0.2', is_approved=True)
+
+        suspect = self.comment('Plain comment', email='new@example.com', ip='10.0.0.9')
+        trusted = self.comment(SPAM, email='regular@example.com', ip='10.0.0.2')
+        stranger = self.comment(SPAM, email='stranger@example.com', ip='10.0.0.3')
+
+        self.assertEqual(suspect.risk_features['ip_spam_ratio'], 1.0)
+        self.assertGreaterEqual(suspect.risk_score, CommentModerationService.REPUTATION_WEIGHT)
+        self.assertLess(trusted.risk_score, stranger.risk_score)
+
+    def test_queue_is_riskiest_first(self):
+        low = self.comment()
+        high = self.comment(SPAM, email='spammer@example.com', ip='10.0.0.9')
+        self.comment(is_approved=True)
+
+        self.assertEqual(list(CommentModerationService.pending_queue()), [high, low])
+
+
+class ReputationCounterTest(CommentModerationTestCase):
+    """Test the counters kept by signals and bulk actions."""
+
+    def test_signals_count_single_changes(self):
+        first = self.comment()
+        second = self.comment(ip='10.0.0.2')
+
+        first.is_approved = True
+        first.save()
+        second.delete()
+
+        self.assertEqual(self.counters(), {
+            ('site', ''): (1, 1, 0),
+            ('email', 'reader@example.com'): (1, 1, 0),
+            ('ip', '10.0.0.1'): (1, 1, 0),
+            ('ip', '10.0.0.2'): (0, 0, 0),
+        })
+        self.assertEqual(self.reputation('email', 'reader@example.com').display_name, 'Reader')
+
+    def test_bulk_actions_are_set_based(self):
+        def approve(count, domain):
+            for i in range(count):
+                self.comment(f'Comment {i}', email=f'reader{i % 3}@{domain}', ip=f'10.0.{len(domain)}.{i % 5}')
+            with CaptureQueriesContext(connection) as queries:
+                updated = CommentModerationService.set_state(
+                    Comment.objects.filter(author_email__endswith=domain), 'approved'
+                )
+            return updated, len(queries)
+
+        small, small_queries = approve(3, 'a.example.com')
+        large, large_queries = approve(300, 'bb.example.com')
+
+        # Group, update and write the counters, whatever the number of comments
+        self.assertEqual((small, large), (3, 300))
+        self.assertEqual(small_queries, large_queries)
+        self.assertEqual(self.reputation('site').approved_count, 303)
+        self.assertEqual(self.reputation('email', 'reader0@bb.example.com').approved_count, 100)
+
+    def test_counters_match_a_rebuild(self):
+        comments = [self.comment(f'Comment {i}', email=f'reader{i % 4}@example.com', ip=f'10.0.0.{i % 3}')
+                    for i in range(24)]
+
+        self.admin_action('approve_comments', Comment.objects.filter(pk__in=[c.pk for c in comments[:10]]))
+        self.admin_action('reject_comments', Comment.objects.filter(pk__in=[c.pk for c in comments[5:15]]))
+        self.admin_action('bulk_approve_by_author', Comment.objects.filter(pk=comments[1].pk))
+        self.admin_action('bulk_block_by_ip', Comment.objects.filter(pk=comments[2].pk))
+        self.admin_action('unapprove_comments', Comment.objects.filter(pk=comments[3].pk))
+        comments[4].delete()
+        maintained = self.counters()
+
+        CommentModerationService.rebuild()
+
+        self.assertEqual(maintained, self.counters())
+        self.assertEqual(self.reputation('site').comment_count, 23)
+
+    def test_changelist_annotations_are_ignored(self):
+        self.comment()
+        self.comment(ip='10.0.0.2')
+        admin = CommentAdmin(Comment, AdminSite())
+        queryset = admin.get_queryset(RequestFactory().get('/'))
+
+        self.assertEqual(CommentModerationService.set_state(queryset, 'approved'), 2)
+        self.assertEqual(self.reputation('email', 'reader@example.com').approved_count, 2)
+
+
+class BlockingTest(CommentModerationTestCase):
+    """Test blocking IP addresses and emails."""
+
+    def test_block_rejects_existing_and_new_comments(self):
+        approved = self.comment(is_approved=True)
+        self.comment(email='other@example.com')
+        self.comment(ip='10.0.0.2')
+
+        self.admin_action('bulk_block_by_ip', Comment.objects.filter(pk=approved.pk))
+        new = self.comment(email='third@example.com')
+
+        self.assertEqual(Comment.objects.filter(ip_address='10.0.0.1', is_spam=True).count(), 3)
+        self.assertTrue(new.is_spam)
+        self.assertEqual(new.risk_score, 1.0)
+        self.assertEqual(self.reputation('ip', '10.0.0.1').spam_count, 3)
+        self.assertFalse(Comment.objects.get(ip_address='10.0.0.2').is_spam)
+
+        CommentModerationService.set_blocked('ip', ['10.0.0.1'], blocked=False)
+        self.assertFalse(self.comment().is_spam)
+
+    def test_block_survives_a_rebuild(self):
+        CommentModerationService.set_blocked('email', ['spammer@example.com'])
+        CommentModerationService.rebuild()
+
+        self.assertTrue(self.comment(email='spammer@example.com').is_spam)
+
+
+class ModerationDashboardTest(CommentModerationTestCase):
+    """Test the dashboard read from the counters."""
+
+    def test_dashboard(self):
+        admin = User.objects.create_superuser(username='admin', email='admin@test.com', password='testpass123')
+        self.client.force_login(admin)
+        for i in range(6):
+            self.comment(f'Comment {i}', email=f'reader{i % 2}@example.com', is_approved=i < 2)
+        self.comment(SPAM, email='spammer@example.com', ip='10.0.0.9', is_spam=True)
+
+        response = self.client.get(reverse('admin:blog_comment_moderation'))
+
+        self.assertEqual(response.status_code, 200)
+        context = response.context
+        self.assertEqual(
+            (context['total_comments'], context['pending_comments'], context['approved_comments'],
+             context['spam_comments'], context['recent_pending']),
+            (7, 4, 2, 1, 4)
+        )
+        self.assertEqual(context['top_commenters'][0]['comment_count'], 3)
+        self.assertEqual(len(context['moderation_queue']), 4)
+        self.assertContains(response, 'Moderation Queue')
+
+
+@skipUnless(
+    'COMMENT_MODERATION_BENCHMARK_COMMENTS' in os.environ,
+    'Set COMMENT_MODERATION_BENCHMARK_COMMENTS to run the benchmark'
+)
+class CommentModerationBenchmarkTest(CommentModerationTestCase):
+    """
+    Benchmark the dashboard and bulk actions against the scans they replace.
+
+    Runs when COMMENT_MODERATION_BENCHMARK_COMMENTS is set to the number of
+    comments (for example 1000000).
+    """
+
+    def timed(self, function, repeat=1):
+        start_time = time.perf_counter()
+        for _ in range(repeat):
+            result = function()
+        return (time.perf_counter() - start_time) / repeat, result
+
+    def create_comments(self):
+        now = timezone.now()
+        batch = []
+        for i in range(BENCHMARK_COMMENTS):
+            batch.append(Comment(
+                post=self.post, author_name=f'Reader {i % 5000}', author_email=f'reader{i % 5000}@example.com',
+                content=f'Comment {i}', ip_address=f'10.{i % 7}.{i % 250}.{i % 200}',
+                is_approved=i % 3 == 0, is_spam=i % 11 == 0 and i % 3 != 0,
+                risk_score=(i * 7919 % 1000) / 1000, created_at=now - timedelta(minutes=i % 100000),
+            ))
+            if len(batch) == 10000:
+                Comment.objects.bulk_create(batch)
+                batch = []
+        Comment.objects.bulk_create(batch)
+
+    def old_dashboard(self):
+        total_comments = Comment.objects.count()
+        pending_comments = Comment.objects.filter(is_approved=False).count()
+        last_24_hours = timezone.now() - timedelta(hours=24)
+        Comment.objects.filter(created_at__gte=last_24_hours).count()
+        Comment.objects.filter(created_at__gte=last_24_hours, is_approved=False).count()
+        list(Comment.objects.values('author_name', 'author_email').annotate(
+            comment_count=Count('id'), approved_count=Count('id', filter=Q(is_approved=True))
+        ).order_by('-comment_count')[:10])
+        list(Post.objects.annotate(
+            comment_count=Count('comments', filter=Q(comments__is_approved=True))
+        ).filter(comment_count__gt=0).order_by('-comment_count')[:10])
+        return total_comments, pending_comments
+
+    def test_benchmark(self):
+        insert_time, _ = self.timed(self.create_comments)
+        rebuild_time, rows = self.timed(CommentModerationService.rebuild)
+
+        old_dashboard_time, _ = self.timed(self.old_dashboard, repeat=3)
+        CommentModerationService.dashboard_stats()
+        dashboard_time, stats = self.timed(CommentModerationService.dashboard_stats, repeat=3)
+        queue_time, queue = self.timed(lambda: list(CommentModerationService.pending_queue()[:50]), repeat=10)
+
+        submit_time, _ = self.timed(lambda: self.comment(SPAM, email='reader7@example.com'), repeat=50)
+
+        emails = [f'reader{i}@example.com' for i in range(10)]
+        approve_time, approved = self.timed(lambda: CommentModerationService.set_state(
+            Comment.objects.filter(author_email__in=emails, is_approved=False, is_spam=False), 'approved'
+        ))
+        block_time, blocked = self.timed(lambda: CommentModerationService.set_blocked(
+            'ip', [f'10.{i}.{i}.{i}' for i in range(7)]
+        ))
+
+        print(f"\nComment Moderation Benchmark ({BENCHMARK_COMMENTS:,} comments):")
+        print(f"  Insert:                 {insert_time:8.2f}s")
+        print(f"  Rebuild counters:       {rebuild_time:8.2f}s  ({rows:,} rows)")
+        print(f"  Dashboard (before):     {old_dashboard_time * 1000:8.1f}ms")
+        print(f"  Dashboard (counters):   {dashboard_time * 1000:8.1f}ms")
+        print(f"  Queue head (50):        {queue_time * 1000:8.2f}ms")
+        print(f"  Submit (score + count): {submit_time * 1000:8.2f}ms per comment")
+        print(f"  Approve by author:      {approve_time * 1000:8.1f}ms  ({approved:,} comments)")
+        print(f"  Block by IP:            {block_time * 1000:8.1f}ms  ({blocked:,} comments)")
+
+        self.assertEqual(stats['total_comments'], BENCHMARK_COMMENTS)
+        self.assertEqual(self.reputation('site').comment_count, BENCHMARK_COMMENTS + 50)
+        self.assertEqual([comment.risk_score for comment in queue], sorted((c.risk_score for c in queue), reverse=True))
+        maintained = self.counters()
+        CommentModerationService.rebuild()
+        self.assertEqual(maintained, self.counters())
@@ -0,0 +1,231 @@
+"""
+Tests for the threaded comment tree loader.
+
+Covers tree building, pagination of top-level threads, cached rendering
+with signal and admin invalidation, and query counts on a post with 500
+comments nested 5 levels deep.
+"""
+
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from unittest.mock import patch
+
+from blog.admin import CommentAdmin
+from blog.models import Comment, Post
+from blog.services.comment_tree_service import CommentTreeService
+
+
+def make_comment(post, parent=None, approved=True, name='Reader'):
+    return Comment(
+        post=post,
+        parent=parent,
+        author_name=name,
+        author_email='reader@example.com',
+        content=f'Comment by {name}',
+        is_approved=approved,
+        ip_address='127.0.0.1',
+    )
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'comment-tree-tests',
+    }
+})
+class CommentTreeTestCase(TestCase):
+    """Shared fixtures for comment tree tests."""
+
+    def setUp(self):
+        caches[CommentTreeService.CACHE_ALIAS].clear()
+        self.user = User.objects.create_user(username='author', password='testpass123')
+        self.post = Post.objects.create(
+            title='Threaded Post',
+            slug='threaded-post',
+            author=self.user,
+            content='Post content',
+            status='published',
+        )
+
+    def create_threads(self, threads, depth):
+        """Create `threads` top-level comments, each with a reply chain `depth` levels deep."""
+        level = Comment.objects.bulk_create(
+            [make_comment(self.post, name=f'Root {i}') for i in range(threads)]
+        )
+        for d in range(1, depth):
+            level = Comment.objects.bulk_create(
+                [make_comment(self.post, parent=parent, name=f'Level {d} {i}') for i, parent in enumerate(level)]
+            )
+
+
+class CommentTreeBuildTest(CommentTreeTestCase):
+    """Test loading approved comments as threads."""
+
+    def test_builds_nested_threads(self):
+        root = make_comment(self.post, name='Root')
+        root.save()
+        reply = make_comment(self.post, parent=root, name='Reply')
+        reply.save()
+        nested = make_comment(self.post, parent=reply, name='Nested')
+        nested.save()
+        second = make_comment(self.post, name='Second')
+        second.save()
+
+        threads = CommentTreeService.get_comment_tree(self.post)
+
+        self.assertEqual([node.comment for node in threads], [root, second])
+        self.assertEqual([node.comment for node in threads[0].replies], [reply])
+        self.assertEqual(threads[0].replies[0].replies[0].comment, nested)
+        self.assertEqual(threads[0].replies[0].replies[0].depth, 2)
+
+    def test_unapproved_comments_and_their_replies_are_hidden(self):
+        root = make_comment(self.post, name='Root')
+        root.save()
+        pending = make_comment(self.post, parent=root, approved=False, name='Pending')
+        pending.save()
+        make_comment(self.post, parent=pending, name='Under Pending').save()
+
+        threads = CommentTreeService.get_comment_tree(self.post)
+
+        self.assertEqual(len(threads), 1)
+        self.assertEqual(threads[0].replies, [])
+
+    def test_children_listed_before_parents_are_linked(self):
+        """Test that tree building doesn't rely on parents coming first."""
+        root = make_comment(self.post)
+        root.id, root.parent_id = 1, None
+        reply = make_comment(self.post)
+        reply.id, reply.parent_id = 2, 1
+
+        threads = CommentTreeService.build_tree([reply, root])
+
+        self.assertEqual([node.comment for node in threads], [root])
+        self.assertEqual(threads[0].replies[0].depth, 1)
+
+
+class CommentTreePageTest(CommentTreeTestCase):
+    """Test paginated, cached thread rendering."""
+
+    def test_paginates_top_level_threads(self):
+        self.create_threads(threads=5, depth=2)
+
+        page = CommentTreeService.get_thread_page(self.post, page=2, per_page=2)
+
+        self.assertEqual(page['thread_count'], 5)
+        self.assertEqual(page['comment_count'], 10)
+        self.assertEqual(page['num_pages'], 3)
+        self.assertTrue(page['has_previous'])
+        self.assertTrue(page['has_next'])
+        self.assertIn('Root 2', page['html'])
+        self.assertIn('Level 1 3', page['html'])
+        self.assertNotIn('Root 0', page['html'])
+
+    def test_out_of_range_page_shows_last_page(self):
+        self.create_threads(threads=3, depth=1)
+
+        page = CommentTreeService.get_thread_page(self.post, page=99, per_page=2)
+
+        self.assertEqual(page['page'], 2)
+        self.assertIn('Root 2', page['html'])
+
+    def test_cached_page_needs_no_queries(self):
+        self.create_threads(threads=3, depth=2)
+        CommentTreeService.get_thread_page(self.post)
+
+        with self.assertNumQueries(0):
+            CommentTreeService.get_thread_page(self.post)
+
+    def test_new_comment_invalidates_cache(self):
+        self.create_threads(threads=1, depth=1)
+        CommentTreeService.get_thread_page(self.post)
+
+        make_comment(self.post, name='Newcomer').save()
+
+        self.assertIn('Newcomer', CommentTreeService.get_thread_page(self.post)['html'])
+
+    def test_approval_invalidates_cache(self):
+        pending = make_comment(self.post, approved=False, name='Pending')
+        pending.save()
+        self.assertNotIn('Pending', CommentTreeService.get_thread_page(self.post)['html'])
+
+        pending.is_approved = True
+        pending.save()
+
+        self.assertIn('Pending', CommentTreeService.get_thread_page(self.post)['html'])
+
+    def test_delete_invalidates_cache(self):
+        comment = make_comment(self.post, name='Removed')
+        comment.save()
+        CommentTreeService.get_thread_page(self.post)
+
+        comment.delete()
+
+        self.assertNotIn('Removed', CommentTreeService.get_thread_page(self.post)['html'])
+
+    def test_admin_bulk_approval_invalidates_cache(self):
+        pending = make_comment(self.post, approved=False, name='Bulk Approved')
+        pending.save()
+        CommentTreeService.get_thread_page(self.post)
+        admin = CommentAdmin(Comment, AdminSite())
+
+        with patch.object(admin, 'message_user'):
+            admin.approve_comments(RequestFactory().post('/'), Comment.objects.filter(pk=pending.pk))
+
+        self.assertIn('Bulk Approved', CommentTreeService.get_thread_page(self.post)['html'])
+
+
+class CommentTreeQueryCountTest(CommentTreeTestCase):
+    """Query counts on a post with 500 comments nested 5 levels deep."""
+
+    def setUp(self):
+        super().setUp()
+        self.create_threads(threads=100, depth=5)
+        # Unapproved comments must not cost extra queries or show up
+        Comment.objects.bulk_create([make_comment(self.post, approved=False, name='Hidden') for _ in range(20)])
+
+    def test_tree_loads_with_one_query(self):
+        with self.assertNumQueries(1):
+            threads = CommentTreeService.get_comment_tree(self.post)
+
+        self.assertEqual(len(threads), 100)
+        deepest = threads[0].replies[0].replies[0].replies[0].replies[0]
+        self.assertEqual(deepest.depth, 4)
+
+    def test_rendering_all_threads_uses_one_query(self):
+        with self.assertNumQueries(1):
+            page = CommentTreeService.get_thread_page(self.post, per_page=100)
+
+        self.assertEqual(page['comment_count'], 500)
+        self.assertEqual(page['html'].count('id="comment-'), 500)
+        self.assertNotIn('Hidden', page['html'])
+
+    def test_blog_detail_queries_comments_once(self):
+        url = reverse('blog:detail', kwargs={'slug': self.post.slug})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Comments (100)')
+        self.assertContains(response, 'Level 4 0')
+        comment_queries = [q for q in queries.captured_queries if 'blog_comment' in q['sql']]
+        self.assertEqual(len(comment_queries), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, {'comments_page': 2})
+            self.client.get(url, {'comments_page': 2})
+
+        comment_queries = [q for q in queries.captured_queries if 'blog_comment' in q['sql']]
+        self.assertEqual(len(comment_queries), 1)
+
+    def test_pagination_labels_follow_thread_order(self):
+        # Threads are shown oldest first, so later pages hold newer threads
+        response = self.client.get(reverse('blog:detail', kwargs={'slug': self.post.slug}), {'comments_page': 2})
+
+        self.assertContains(response, '?comments_page=1#comments">&laquo; Older threads</a>', html=False)
+        self.assertContains(response, '?comments_page=3#comments">Newer threads &raquo;</a>', html=False)
@@ -0,0 +1,330 @@
+"""
+Tests for the compiled content scanner.
+
+Checks that the scanner reproduces the per-pattern checks it replaced in
+ContentValidator and the security middlewares, that both middlewares
+delegate to it, and benchmarks it against the old checks on 5 KB comments.
+"""
+
+import os
+import random
+import re
+import time
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.http import HttpResponse
+from django.test import SimpleTestCase, RequestFactory
+
+from blog.middleware import CommentSpamProtectionMiddleware, ContentSecurityMiddleware
+from blog.security import ContentValidator
+from blog.utils.content_scanner import ContentScanner, build_keyword_pattern, content_scanner
+
+
+# Checks as they were implemented before the scanner, kept as the reference
+LEGACY_SPAM_PATTERNS = [
+    r'viagra|cialis|casino|poker|lottery',
+    r'make money|earn \$|get rich|work from home',
+    r'click here|visit now|act now|limited time',
+    r'free money|guaranteed income|no investment',
+    r'weight loss|lose weight|diet pills',
+    r'replica|rolex|designer|handbags',
+    r'mortgage|refinance|credit repair|debt',
+    r'pharmacy|prescription|medication',
+]
+LEGACY_MALICIOUS_PATTERNS = [
+    r'<script[^>]*>.*?</script>',
+    r'javascript:',
+    r'vbscript:',
+    r'data:text/html',
+    r'on\w+\s*=',
+    r'<iframe[^>]*>',
+    r'<object[^>]*>',
+    r'<embed[^>]*>',
+]
+LEGACY_URL_PATTERNS = [
+    r'bit\.ly|tinyurl|t\.co|goo\.gl',
+    r'[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}',
+    r'localhost|127\.0\.0\.1',
+    r'\.tk|\.ml|\.ga|\.cf',
+]
+LEGACY_SPAM_INDICATORS = [
+    'viagra', 'cialis', 'casino', 'poker', 'lottery',
+    'make money', 'earn money', 'get rich', 'work from home',
+    'click here', 'visit now', 'act now', 'limited time'
+]
+
+
+def legacy_spam_score(content):
+    score = 0.0
+    content_lower = content.lower()
+    for pattern in LEGACY_SPAM_PATTERNS:
+        score += len(re.findall(pattern, content_lower)) * 0.3
+    if len(content) > 20:
+        caps_ratio = sum(1 for c in content if c.isupper()) / len(content)
+        if caps_ratio > 0.5:
+            score += 0.4
+    score += len(re.findall(r'[!?]{2,}', content)) * 0.2
+    number_ratio = len(re.findall(r'\d', content)) / len(content) if content else 0
+    if number_ratio > 0.3:
+        score += 0.3
+    return min(score, 1.0)
+
+
+def legacy_is_repetitive(content):
+    words = content.lower().split()
+    if len(words) < 5:
+        return False
+    return len(set(words)) / len(words) < 0.3
+
+
+def legacy_contains_malicious(content):
+    content_lower = content.lower()
+    return any(re.search(pattern, content_lower, re.IGNORECASE | re.DOTALL) for pattern in LEGACY_MALICIOUS_PATTERNS)
+
+
+def legacy_suspicious_url(url):
+    return any(re.search(pattern, url, re.IGNORECASE) for pattern in LEGACY_URL_PATTERNS)
+
+
+def legacy_indicator_count(content):
+    content = content.lower()
+    return sum(1 for indicator in LEGACY_SPAM_INDICATORS if indicator in content)
+
+
+def legacy_scan(content):
+    """Everything the validator and both middlewares used to compute for one comment."""
+    return (
+        legacy_spam_score(content),
+        legacy_is_repetitive(content),
+        legacy_contains_malicious(content),
+        legacy_contains_malicious(content),  # ContentSecurityMiddleware ran its own pass
+        legacy_indicator_count(content),
+    )
+
+
+SAMPLES = [
+    'Great article, thanks for sharing!',
+    'This is a perfectly normal comment about Django querysets.',
+    'CLICK HERE TO WIN FREE VIAGRA CASINO POKER LOTTERY',
+    'Make money fast!!! Earn $500 a day, work from home, limited time only??',
+    'Visit now: act now, get rich, click here. Earn money with our casino.',
+    'spam spam spam spam spam spam spam spam spam spam',
+    'Nice post <script>alert("xss")</script> really',
+    '<SCRIPT type="text/javascript">\ndocument.cookie\n</SCRIPT>',
+    'Click <a href="javascript:alert(1)">here</a>',
+    'See <img src=x onerror = "alert(1)"> for details',
+    '<iframe src="https://evil.example"></iframe> and <embed src="x"> <object data="y">',
+    'data:text/html;base64,PHNjcmlwdD4= and VBScript:msgbox',
+    'Call 555 123 4567 or 555 765 4321 now 1234567890',
+    'Replica Rolex designer handbags, cheap pharmacy prescription medication',
+    'Mortgage refinance, credit repair and debt relief, weight loss diet pills',
+    'Free money! Guaranteed income with no investment. Lose weight now!!',
+    'I disagree?! Well... maybe?? We will see!!!',
+    'casino investment offer',
+    'Pay off your debt.com balance at bit.ly/x',
+    '',
+    'ok',
+]
+
+URL_SAMPLES = [
+    'https://example.com/blog/post/',
+    'http://bit.ly/malicious',
+    'https://tinyurl.com/abc',
+    'http://192.168.0.1/admin',
+    'http://localhost:8000/',
+    'http://127.0.0.1/',
+    'https://free-prizes.tk',
+    'https://goo.gl/maps',
+    'https://docs.djangoproject.com/en/5.2/',
+    'http://debt.com/x',
+    'https://casino.tk/',
+]
+
+
+def make_comment(seed, size=5000):
+    """Build a realistic ~5 KB comment with a little spam and markup mixed in."""
+    rng = random.Random(seed)
+    vocabulary = (
+        'the django query cache view model template signal index post author comment '
+        'performance database request response python test deploy server worker celery '
+        'redis token migration field admin review article thanks great helpful question'
+    ).split()
+    extras = ['Click here!!', 'casino', 'onload =', '127.0.0.1', 'WOW??', '2024', 'Debt']
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(extras) if rng.random() < 0.02 else rng.choice(vocabulary)
+        if rng.random() < 0.1:
+            word = word.capitalize()
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)[:size]
+
+
+class ContentScannerParityTest(SimpleTestCase):
+    """Test that scanner results match the checks they replaced."""
+
+    def setUp(self):
+        self.scanner = ContentScanner()
+        self.samples = SAMPLES + [make_comment(seed) for seed in range(20)]
+
+    def test_spam_score_matches_legacy(self):
+        for sample in self.samples:
+            with self.subTest(sample=sample[:40]):
+                self.assertAlmostEqual(self.scanner.scan(sample).spam_score, legacy_spam_score(sample))
+
+    def test_repetition_matches_legacy(self):
+        for sample in self.samples:
+            with self.subTest(sample=sample[:40]):
+                self.assertEqual(self.scanner.scan(sample).is_repetitive, legacy_is_repetitive(sample))
+
+    def test_malicious_matches_legacy(self):
+        for sample in self.samples:
+            with self.subTest(sample=sample[:40]):
+                self.assertEqual(self.scanner.scan(sample).has_malicious, legacy_contains_malicious(sample))
+
+    def test_spam_indicators_match_legacy(self):
+        for sample in self.samples:
+            with self.subTest(sample=sample[:40]):
+                self.assertEqual(len(self.scanner.scan(sample).spam_indicators), legacy_indicator_count(sample))
+
+    def test_suspicious_urls_match_legacy(self):
+        for url in URL_SAMPLES:
+            with self.subTest(url=url):
+                self.assertEqual(self.scanner.scan(url).has_suspicious_url, legacy_suspicious_url(url))
+
+    def test_all_findings_reported(self):
+        """Test that one scan names every rule hit, including rules inside a script block."""
+        result = self.scanner.scan('<script>x.onclick = go("javascript:")</script> <embed src=a> casino casino')
+
+        self.assertEqual(result.malicious, ('script_block', 'javascript_url', 'event_handler', 'embed_tag'))
+        self.assertEqual(result.keywords, {'casino': 2})
+
+    def test_overlapping_keywords_and_rules_are_all_found(self):
+        self.assertEqual(self.scanner.scan('http://debt.com/x').suspicious_urls, ('url_shortener',))
+        self.assertEqual(self.scanner.scan('casino investment offer').keywords, {'casino': 1, 'no investment': 1})
+
+    def test_keyword_pattern_prefers_longest(self):
+        pattern = re.compile(build_keyword_pattern(['act', 'act now', 'actor']))
+
+        self.assertEqual(pattern.findall('act now actor act'), ['act now', 'actor', 'act'])
+
+    def test_scan_is_memoised(self):
+        text = make_comment(1)
+
+        self.assertIs(self.scanner.scan(text), self.scanner.scan(text))
+
+
+class ContentValidatorDelegationTest(SimpleTestCase):
+    """Test that ContentValidator decisions come from the scanner."""
+
+    def test_validate_comment_content(self):
+        self.assertEqual(ContentValidator.validate_comment_content('A thoughtful, normal comment.'), (True, None))
+        self.assertEqual(
+            ContentValidator.validate_comment_content('CLICK HERE TO WIN FREE VIAGRA CASINO POKER LOTTERY'),
+            (False, 'Comment appears to be spam')
+        )
+        self.assertEqual(
+            ContentValidator.validate_comment_content('spam spam spam spam spam spam spam spam'),
+            (False, 'Comment contains too much repetitive content')
+        )
+        self.assertEqual(
+            ContentValidator.validate_comment_content('Hello <script>alert(1)</script>'),
+            (False, 'Comment contains potentially malicious content')
+        )
+
+    def test_validate_url(self):
+        self.assertEqual(ContentValidator.validate_url('https://example.com/'), (True, None))
+        self.assertEqual(ContentValidator.validate_url('http://bit.ly/abc'), (False, 'Suspicious URL detected'))
+        self.assertEqual(ContentValidator.validate_url('http://debt.com/x'), (False, 'Suspicious URL detected'))
+        self.assertAlmostEqual(ContentValidator._calculate_spam_score('casino investment offer'), 0.6)
+
+    def test_validator_and_middleware_share_one_scan(self):
+        """Test that validating a comment the middleware already checked doesn't rescan it."""
+        content = make_comment(2, size=2000)
+        middleware = ContentSecurityMiddleware(lambda request: HttpResponse())
+        request = RequestFactory().post('/blog/comment/1/', {'content': f'  {content}\n'})
+
+        content_scanner.scan.cache_clear()
+        middleware.process_request(request)
+        ContentValidator.validate_comment_content(content)
+
+        info = content_scanner.scan.cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 1)
+
+
+class SecurityMiddlewareScannerTest(SimpleTestCase):
+    """Test that the security middlewares delegate to the scanner."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_content_security_blocks_request_rules(self):
+        middleware = ContentSecurityMiddleware(lambda request: HttpResponse())
+
+        with patch('blog.middleware.SecurityAuditLogger.log_suspicious_activity') as log:
+            response = middleware.process_request(
+                self.factory.post('/blog/comment/1/', {'content': 'hi <a href="JavaScript:alert(1)">x</a>'})
+            )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(log.call_args.args[2], {'data_type': 'POST', 'rules': ['javascript_url']})
+
+    def test_content_security_ignores_validator_only_rules(self):
+        """Test that rules only the comment validator enforces don't block requests."""
+        middleware = ContentSecurityMiddleware(lambda request: HttpResponse())
+
+        for data in [{'content': '<iframe src="https://youtube.com/embed/x"></iframe>'},
+                     {'tags': '<script>alert(1)</script>'},
+                     {'content': 'casino casino casino'}]:
+            with self.subTest(data=data):
+                self.assertIsNone(middleware.process_request(self.factory.post('/blog/comment/1/', data)))
+
+    def test_spam_protection_counts_distinct_indicators(self):
+        middleware = CommentSpamProtectionMiddleware(lambda request: HttpResponse())
+
+        with patch('blog.middleware.SecurityAuditLogger.log_spam_attempt'):
+            blocked = middleware.process_request(self.factory.post(
+                '/blog/comment/1/', {'content': 'Casino! Get rich. Click here. Earn money.'}
+            ))
+            allowed = middleware.process_request(self.factory.post(
+                '/blog/comment/1/', {'content': 'casino casino casino, click here'}
+            ))
+
+        self.assertEqual(blocked.status_code, 400)
+        self.assertIsNone(allowed)
+
+
+@skipUnless(
+    'CONTENT_SCANNER_BENCHMARK_COMMENTS' in os.environ,
+    'Set CONTENT_SCANNER_BENCHMARK_COMMENTS to run the benchmark'
+)
+class ContentScannerBenchmarkTest(SimpleTestCase):
+    """
+    Microbenchmark: one comment checked by both middlewares and the validator.
+
+    Runs when CONTENT_SCANNER_BENCHMARK_COMMENTS is set to the number of
+    comments scanned (for example 200).
+    """
+
+    COMMENTS = int(os.environ.get('CONTENT_SCANNER_BENCHMARK_COMMENTS', 200))
+    SIZE = 5000
+
+    def test_5kb_comment_benchmark(self):
+        comments = [make_comment(seed, self.SIZE) for seed in range(self.COMMENTS)]
+        scanner = ContentScanner()
+
+        start = time.perf_counter()
+        for comment in comments:
+            legacy_scan(comment)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for comment in comments:
+            result = scanner.scan(comment)
+            (result.spam_score, result.is_repetitive, result.has_malicious, len(result.spam_indicators))
+        scanner_time = time.perf_counter() - start
+
+        self.assertLess(scanner_time, legacy_time)
@@ -0,0 +1,364 @@
+"""
+Tests for the streaming engagement backup and restore.
+
+Covers the JSON Lines format, a full backup/restore round trip, batched
+restores with per-batch transactions, --force updates, restores of
+pre-2.0 backups, the parallel per-model mode and a benchmark of memory and
+time for backing up and restoring many comments.
+"""
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+import unittest
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import (
+    AuthorProfile, Category, Comment, MediaItem, NewsletterSubscriber, Post, SocialShare, Tag
+)
+from blog.services.engagement_backup_service import CommentSection, EngagementBackupService
+from blog.utils import jsonl_stream
+from blog.utils.jsonl_stream import iter_jsonl
+
+
+BENCHMARK_COMMENTS = int(os.environ.get('ENGAGEMENT_BACKUP_BENCHMARK_COMMENTS', 20000))
+
+
+class EngagementBackupFixtures:
+    """Shared fixtures for engagement backup tests."""
+
+    def setUp(self):
+        self.backup_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.backup_dir, ignore_errors=True)
+        self.created_at = timezone.now() - timedelta(days=30)
+
+        self.author = User.objects.create_user(username='writer', password='testpass123')
+        AuthorProfile.objects.create(user=self.author, bio='Writes about Python', twitter='@writer')
+        self.parent_category = Category.objects.create(name='Programming', slug='programming')
+        self.category = Category.objects.create(name='Python', slug='python', parent=self.parent_category)
+        self.tag = Tag.objects.create(name='Backups', slug='backups', color='#123456')
+        self.post = Post.objects.create(
+            title='Backed Up Post', slug='backed-up-post', author=self.author,
+            content='<p>Post body</p>', excerpt='Excerpt', status='published',
+        )
+        self.post.tags.add(self.tag)
+        self.post.categories.add(self.category)
+        Post.objects.filter(pk=self.post.pk).update(created_at=self.created_at, view_count=42)
+
+        self.comment = Comment.objects.create(
+            post=self.post, author_name='Reader', author_email='reader@example.com',
+            content='First!', ip_address='127.0.0.1', is_approved=True,
+        )
+        self.reply = Comment.objects.create(
+            post=self.post, parent=self.comment, author_name='Writer', author_email='writer@example.com',
+            content='Thanks', ip_address='127.0.0.2', is_approved=True,
+        )
+        Comment.objects.filter(pk=self.comment.pk).update(created_at=self.created_at)
+        NewsletterSubscriber.objects.create(email='fan@example.com', is_confirmed=True, preferences={'weekly': True})
+        SocialShare.objects.create(post=self.post, platform='twitter', share_count=7)
+        MediaItem.objects.create(post=self.post, media_type='video', title='Demo', video_url='https://youtu.be/demo')
+
+    def backup(self, filename='backup.jsonl', *args):
+        call_command(
+            'backup_engagement_data', '--action', 'backup', '--backup-dir', self.backup_dir,
+            '--backup-file', filename, *args, stdout=StringIO(),
+        )
+        return os.path.join(self.backup_dir, filename)
+
+    def restore(self, filename='backup.jsonl', *args):
+        out = StringIO()
+        call_command(
+            'backup_engagement_data', '--action', 'restore', '--backup-dir', self.backup_dir,
+            '--backup-file', filename, *args, stdout=out,
+        )
+        return out.getvalue()
+
+    def clear_engagement_data(self):
+        Post.objects.all().delete()
+        Category.objects.all().delete()
+        Tag.objects.all().delete()
+        NewsletterSubscriber.objects.all().delete()
+        AuthorProfile.objects.all().delete()
+
+    def snapshot(self):
+        post = Post.objects.get(slug='backed-up-post')
+        return {
+            'post': (post.title, post.status, post.view_count, post.content, post.created_at),
+            'post_tags': list(post.tags.values_list('name', flat=True)),
+            'post_categories': list(post.categories.values_list('name', flat=True)),
+            'category_parent': Category.objects.get(name='Python').parent.name,
+            'tag': Tag.objects.values_list('name', 'slug', 'color').get(),
+            'profile': AuthorProfile.objects.values_list('user__username', 'bio', 'twitter').get(),
+            'subscriber': NewsletterSubscriber.objects.values_list('email', 'is_confirmed', 'preferences').get(),
+            'comments': list(
+                Comment.objects.order_by('pk').values_list('pk', 'parent_id', 'content', 'is_approved', 'created_at')
+            ),
+            'shares': list(SocialShare.objects.values_list('post__slug', 'platform', 'share_count')),
+            'media': list(MediaItem.objects.values_list('pk', 'post__slug', 'title', 'video_url')),
+        }
+
+
+class EngagementBackupFormatTest(EngagementBackupFixtures, TestCase):
+    """Test the JSON Lines backup format."""
+
+    def test_backup_is_one_section_per_model(self):
+        path = self.backup('backup.jsonl', '--include-content')
+        records = list(iter_jsonl(path))
+
+        metadata = records[0]['@metadata']
+        self.assertEqual(metadata['version'], '2.0')
+        self.assertTrue(metadata['include_content'])
+        self.assertEqual(
+            [record['@section'] for record in records if '@section' in record],
+            ['categories', 'tags', 'author_profiles', 'subscribers', 'posts', 'comments', 'social_shares', 'media_items']
+        )
+        ends = {record['@end']: record['count'] for record in records if '@end' in record}
+        self.assertEqual(ends['comments'], 2)
+        self.assertEqual(ends['posts'], 1)
+
+        post_row = next(record for record in records if record.get('slug') == 'backed-up-post')
+        self.assertEqual(post_row['tags'], ['Backups'])
+        self.assertEqual(post_row['content'], '<p>Post body</p>')
+        self.assertEqual(post_row['author_username'], 'writer')
+
+    def test_compressed_backup(self):
+        path = self.backup('backup.jsonl', '--compress')
+
+        self.assertTrue(path.endswith('.jsonl') and os.path.exists(path + '.gz'))
+        with gzip.open(path + '.gz', 'rt', encoding='utf-8') as handle:
+            self.assertIn('@metadata', json.loads(handle.readline()))
+
+    @unittest.skipIf(jsonl_stream.zstandard is None, 'zstandard is not installed')
+    def test_zstd_round_trip(self):
+        self.backup('backup.jsonl', '--compress', 'zstd')
+        self.clear_engagement_data()
+
+        self.restore('backup.jsonl.zst')
+
+        self.assertEqual(Comment.objects.count(), 2)
+
+    def test_backup_reads_bounded_pages(self):
+        for i in range(23):
+            Comment.objects.create(
+                post=self.post, author_name=f'Reader {i}', author_email='reader@example.com',
+                content='More', ip_address='127.0.0.1',
+            )
+        path = os.path.join(self.backup_dir, 'comments.jsonl')
+
+        with CaptureQueriesContext(connection) as queries:
+            counts = EngagementBackupService.write_backup(path, ['comments'], chunk_size=10)
+
+        self.assertEqual(counts, {'comments': 25})
+        # Three pages and the empty page that ends the section
+        self.assertEqual(len(queries), 4)
+
+    def test_dry_run_counts_without_writing(self):
+        out = StringIO()
+        call_command(
+            'backup_engagement_data', '--action', 'backup', '--backup-dir', self.backup_dir,
+            '--backup-file', 'dry.jsonl', '--dry-run', stdout=out,
+        )
+
+        self.assertIn('comments: 2 items', out.getvalue())
+        self.assertFalse(os.path.exists(os.path.join(self.backup_dir, 'dry.jsonl')))
+
+
+class EngagementRestoreTest(EngagementBackupFixtures, TestCase):
+    """Test batched restores."""
+
+    def test_round_trip(self):
+        before = self.snapshot()
+        self.backup('backup.jsonl.gz', '--include-content')
+        self.clear_engagement_data()
+
+        output = self.restore('backup.jsonl.gz', '--batch-size', '1')
+
+        self.assertEqual(self.snapshot(), before)
+        self.assertIn('comments: 2 created', output)
+        self.assertTrue(NewsletterSubscriber.objects.get().unsubscribe_token)
+
+    def test_existing_rows_are_kept_unless_forced(self):
+        self.backup()
+        Comment.objects.filter(pk=self.comment.pk).update(content='Edited', is_approved=False)
+
+        output = self.restore()
+        self.assertEqual(Comment.objects.get(pk=self.comment.pk).content, 'Edited')
+        self.assertIn('comments: 0 created, 0 updated, 2 skipped', output)
+
+        output = self.restore('backup.jsonl', '--force')
+        comment = Comment.objects.get(pk=self.comment.pk)
+        self.assertEqual((comment.content, comment.is_approved), ('First!', True))
+        self.assertIn('comments: 0 created, 2 updated', output)
+
+    def test_batches_use_bulk_writes(self):
+        for i in range(48):
+            Comment.objects.create(
+                post=self.post, author_name=f'Reader {i}', author_email='reader@example.com',
+                content='More', ip_address='127.0.0.1',
+            )
+        path = self.backup()
+        Comment.objects.all().delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            results = EngagementBackupService.restore(path, ['comments'], batch_size=25)
+
+        self.assertEqual(results['comments'].created, 50)
+        inserts = [q for q in queries if q['sql'].startswith('INSERT INTO "blog_comment"')]
+        self.assertEqual(len(inserts), 2)
+
+    def test_failed_batch_is_rolled_back(self):
+        path = self.backup()
+        Comment.objects.all().delete()
+        reply_pk = self.reply.pk
+        original_after_batch = CommentSection.after_batch
+
+        def fail_on_reply(section, saved, rows_by_key, force):
+            if reply_pk in rows_by_key:
+                raise RuntimeError('Reply batch failed')
+            original_after_batch(section, saved, rows_by_key, force)
+
+        with mock.patch.object(CommentSection, 'after_batch', fail_on_reply):
+            results = EngagementBackupService.restore(path, ['comments'], batch_size=1)
+
+        self.assertEqual(results['comments'].created, 1)
+        self.assertEqual(results['comments'].failed, 1)
+        self.assertEqual(results['comments'].errors, ['Reply batch failed'])
+        self.assertTrue(Comment.objects.filter(pk=self.comment.pk).exists())
+        self.assertFalse(Comment.objects.filter(pk=reply_pk).exists())
+
+    def test_truncated_backup_is_reported(self):
+        path = self.backup()
+        with open(path, encoding='utf-8') as handle:
+            lines = handle.readlines()
+        end = next(i for i, line in enumerate(lines) if line.startswith('{"@end":"comments"'))
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.writelines(lines[:end])
+        Comment.objects.all().delete()
+
+        output = self.restore()
+
+        self.assertIn("Backup is truncated in section 'comments'", output)
+
+    def test_legacy_backup_restores(self):
+        legacy = {
+            'metadata': {'created_at': timezone.now().isoformat(), 'version': '1.0'},
+            'data': {
+                'tags': [{'name': 'Legacy', 'slug': 'legacy', 'color': '#000000', 'description': ''}],
+                'subscribers': [{'email': 'old@example.com', 'is_confirmed': True, 'preferences': {}}],
+                'comments': [{'post_slug': 'backed-up-post', 'content': 'Not restorable'}],
+            },
+        }
+        with gzip.open(os.path.join(self.backup_dir, 'legacy.json.gz'), 'wt', encoding='utf-8') as handle:
+            json.dump(legacy, handle, indent=2)
+
+        self.restore('legacy.json.gz')
+
+        self.assertTrue(Tag.objects.filter(name='Legacy').exists())
+        self.assertTrue(NewsletterSubscriber.objects.filter(email='old@example.com').exists())
+        self.assertEqual(Comment.objects.count(), 2)
+
+
+class EngagementParallelRestoreTest(EngagementBackupFixtures, TransactionTestCase):
+    """Test the parallel per-model restore."""
+
+    def test_parallel_round_trip(self):
+        before = self.snapshot()
+        self.backup('backup.jsonl', '--include-content')
+        self.clear_engagement_data()
+
+        output = self.restore('backup.jsonl', '--parallel', '--workers', '3')
+
+        self.assertEqual(self.snapshot(), before)
+        self.assertIn('Restore completed successfully', output)
+
+
+@skipUnless(
+    'ENGAGEMENT_BACKUP_BENCHMARK_COMMENTS' in os.environ,
+    'Set ENGAGEMENT_BACKUP_BENCHMARK_COMMENTS to run the benchmark'
+)
+class EngagementBackupBenchmarkTest(TestCase):
+    """
+    Benchmark backup and restore of many comments.
+
+    Runs when ENGAGEMENT_BACKUP_BENCHMARK_COMMENTS is set to the number of
+    comments (for example 1000000).
+    """
+
+    def setUp(self):
+        self.backup_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.backup_dir, ignore_errors=True)
+        author = User.objects.create_user(username='writer', password='testpass123')
+        self.post = Post.objects.create(title='Busy Post', slug='busy-post', author=author, content='Body')
+        batch = []
+        for i in range(BENCHMARK_COMMENTS):
+            batch.append(Comment(
+                post=self.post, author_name=f'Reader {i}', author_email=f'reader{i}@example.com',
+                content='A comment of a typical length, long enough to be realistic. ' * 3,
+                ip_address='127.0.0.1', is_approved=bool(i % 2),
+            ))
+            if len(batch) == 5000:
+                Comment.objects.bulk_create(batch)
+                batch = []
+        Comment.objects.bulk_create(batch)
+
+    def measure(self, function):
+        tracemalloc.start()
+        start_time = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start_time
+        peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+        return elapsed, peak
+
+    def legacy_backup(self, path):
+        # The single-document backup this replaced
+        comments = [
+            {
+                'post_slug': comment.post.slug,
+                'parent_id': comment.parent.id if comment.parent else None,
+                'author_name': comment.author_name,
+                'author_email': comment.author_email,
+                'author_website': comment.author_website,
+                'content': comment.content,
+                'is_approved': comment.is_approved,
+                'created_at': comment.created_at.isoformat(),
+                'ip_address': str(comment.ip_address),
+            }
+            for comment in Comment.objects.select_related('post', 'parent')
+        ]
+        with gzip.open(path, 'wt', encoding='utf-8') as handle:
+            json.dump({'metadata': {}, 'data': {'comments': comments}}, handle, indent=2, default=str)
+
+    def test_benchmark(self):
+        legacy_path = os.path.join(self.backup_dir, 'legacy.json.gz')
+        stream_path = os.path.join(self.backup_dir, 'stream.jsonl.gz')
+
+        legacy_time, legacy_peak = self.measure(lambda: self.legacy_backup(legacy_path))
+        backup_time, backup_peak = self.measure(
+            lambda: EngagementBackupService.write_backup(stream_path, ['comments'])
+        )
+        Comment.objects.all().delete()
+        results = {}
+        restore_time, restore_peak = self.measure(
+            lambda: results.update(EngagementBackupService.restore(stream_path, ['comments']))
+        )
+
+        print(f"\nEngagement Backup Benchmark ({BENCHMARK_COMMENTS} comments, gzip):")
+        print(f"  Legacy backup:    {legacy_time:.2f}s, {legacy_peak:.1f}MB peak")
+        print(f"  Streaming backup: {backup_time:.2f}s, {backup_peak:.1f}MB peak")
+        print(f"  Streaming restore: {restore_time:.2f}s, {restore_peak:.1f}MB peak")
+        self.assertEqual(results['comments'].created, BENCHMARK_COMMENTS)
+        self.assertLess(backup_peak, legacy_peak)
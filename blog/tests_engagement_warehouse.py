@@ -0,0 +1,398 @@
+"""
+Tests for the daily engagement facts and the analytics dashboard rollups.
+
+Covers recording views and shares where their counters flush, recounting
+comments and subscribers, the nightly compaction, rollups without join
+double counting, the dashboard render and a benchmark against the
+per-request aggregates the dashboard used to run.
+"""
+
+import os
+import random
+import time
+from datetime import timedelta
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, Q, Sum
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.admin import blog_engagement_admin
+from blog.models import (
+    Category, Comment, DailyEngagement, NewsletterSubscriber, Post, SocialShare, Tag
+)
+from blog.performance import ViewCountOptimizer
+from blog.services.engagement_backup_service import stored_timestamps
+from blog.services.engagement_warehouse_service import EngagementWarehouseService
+from blog.services.social_share_service import share_count_buffer
+
+
+BENCHMARK_POSTS = int(os.environ.get('ENGAGEMENT_BENCHMARK_POSTS', 2000))
+BENCHMARK_COMMENTS = int(os.environ.get('ENGAGEMENT_BENCHMARK_COMMENTS', 40000))
+
+
+def comment(post, approved=True, **kwargs):
+    return Comment.objects.create(
+        post=post, author_name='Reader', author_email='reader@example.com', content='Nice post',
+        ip_address='127.0.0.1', is_approved=approved, **kwargs
+    )
+
+
+class EngagementWarehouseTestCase(TestCase):
+    """Shared fixtures for engagement warehouse tests."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(
+            username='writer', password='testpass123', first_name='Ada', last_name='Writer'
+        )
+        self.category = Category.objects.create(name='Python', slug='python')
+        self.post = Post.objects.create(
+            title='Engagement Post', slug='engagement-post', author=self.author, content='Body', status='published'
+        )
+        self.post.categories.add(self.category)
+        self.today = timezone.localdate()
+
+    def fact(self, post=None):
+        return DailyEngagement.objects.get(post=post or self.post, day=self.today)
+
+
+class RecordingTest(EngagementWarehouseTestCase):
+    """Test keeping the facts current."""
+
+    def test_flushed_views_are_recorded(self):
+        for _ in range(10):
+            ViewCountOptimizer.increment_view_count(self.post.id)
+
+        self.assertEqual(self.fact().views, 10)
+        self.assertEqual(Post.objects.get(pk=self.post.pk).view_count, 10)
+
+    def test_flushed_shares_are_recorded_per_platform(self):
+        for platform in ('twitter', 'twitter', 'linkedin'):
+            share_count_buffer.add(self.post.id, platform)
+
+        share_count_buffer.flush()
+
+        fact = self.fact()
+        self.assertEqual((fact.shares, fact.twitter_shares, fact.linkedin_shares), (3, 2, 1))
+
+    def test_comment_approval_is_recounted(self):
+        pending = comment(self.post, approved=False)
+        comment(self.post)
+        self.assertEqual(self.fact().comments, 1)
+
+        pending.is_approved = True
+        pending.save()
+        self.assertEqual(self.fact().comments, 2)
+
+        pending.delete()
+        self.assertEqual(self.fact().comments, 1)
+
+    def test_bulk_comment_actions_are_recounted(self):
+        comments = [comment(self.post, approved=False) for _ in range(3)]
+        request = RequestFactory().post('/')
+        comment_admin = blog_engagement_admin._registry[Comment]
+        comment_admin.message_user = lambda *args, **kwargs: None
+
+        comment_admin.approve_comments(request, Comment.objects.filter(pk__in=[c.pk for c in comments]))
+
+        self.assertEqual(self.fact().comments, 3)
+
+    def test_subscribers_are_counted_per_day(self):
+        NewsletterSubscriber.objects.create(email='one@example.com')
+        subscriber = NewsletterSubscriber.objects.create(email='two@example.com')
+        self.assertEqual(DailyEngagement.objects.get(post__isnull=True, day=self.today).new_subscribers, 2)
+
+        subscriber.delete()
+        self.assertEqual(DailyEngagement.objects.get(post__isnull=True, day=self.today).new_subscribers, 1)
+
+    def test_deltas_share_one_row(self):
+        EngagementWarehouseService.record_views(self.post.id, 2)
+        EngagementWarehouseService.record_shares({(self.post.id, 'reddit'): 4})
+
+        fact = self.fact()
+        self.assertEqual((fact.views, fact.shares, fact.reddit_shares), (2, 4, 4))
+        self.assertEqual(DailyEngagement.objects.filter(post=self.post).count(), 1)
+
+    def test_site_rows_are_unique_per_day(self):
+        EngagementWarehouseService.record_views(self.post.id, 2)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            DailyEngagement.objects.create(day=self.today, views=1)
+
+        # A writer that missed the existing row adds to it instead of a second one
+        DailyEngagement.objects.bulk_create(
+            [DailyEngagement(scope=DailyEngagement.SITE_SCOPE, day=self.today)], ignore_conflicts=True
+        )
+        EngagementWarehouseService.record_views(self.post.id, 3)
+        self.assertEqual(DailyEngagement.objects.get(post__isnull=True, day=self.today).views, 5)
+
+
+class CompactionTest(EngagementWarehouseTestCase):
+    """Test the nightly compaction."""
+
+    def test_history_is_backfilled(self):
+        created_day = self.today - timedelta(days=40)
+        Post.objects.filter(pk=self.post.pk).update(
+            view_count=25, created_at=timezone.now() - timedelta(days=40)
+        )
+        share = SocialShare.objects.create(post=self.post, platform='facebook', share_count=7)
+        SocialShare.objects.filter(pk=share.pk).update(last_shared=timezone.now() - timedelta(days=3))
+        comment(self.post)
+        DailyEngagement.objects.all().delete()
+
+        summary = EngagementWarehouseService.compact(full=True)
+
+        self.assertEqual(DailyEngagement.objects.get(post=self.post, day=created_day).views, 25)
+        fact = DailyEngagement.objects.get(post=self.post, day=self.today - timedelta(days=3))
+        self.assertEqual((fact.shares, fact.facebook_shares), (7, 7))
+        self.assertEqual(self.fact().comments, 1)
+        self.assertEqual(summary['history'], 2)
+
+        # Nothing is added twice
+        self.assertEqual(EngagementWarehouseService.compact(full=True)['history'], 0)
+
+    def test_empty_rows_are_removed(self):
+        pending = comment(self.post)
+        Comment.objects.filter(pk=pending.pk).update(is_approved=False)
+
+        summary = EngagementWarehouseService.compact()
+
+        self.assertEqual(summary['removed'], 1)
+        self.assertFalse(DailyEngagement.objects.exists())
+
+
+class RollupTest(EngagementWarehouseTestCase):
+    """Test the dashboard rollups."""
+
+    def setUp(self):
+        super().setUp()
+        tag = Tag.objects.create(name='Django', slug='django')
+        self.post.tags.add(tag)
+        for _ in range(3):
+            comment(self.post)
+        EngagementWarehouseService.record_shares({(self.post.id, 'facebook'): 5, (self.post.id, 'twitter'): 7})
+        EngagementWarehouseService.record_views(self.post.id, 40)
+        Post.objects.create(title='Draft', slug='draft', author=self.author, content='Body')
+
+    def test_joins_do_not_double_count(self):
+        rollups = EngagementWarehouseService.build_rollups()
+
+        expected = {
+            'id': self.category.id, 'name': 'Python', 'post_count': 1,
+            'total_views': 40, 'total_comments': 3, 'total_shares': 12,
+        }
+        self.assertEqual(rollups['category_stats'], [expected])
+        self.assertEqual(rollups['tag_stats'][0]['total_shares'], 12)
+        self.assertEqual(rollups['author_stats'][0]['name'], 'Ada Writer')
+        self.assertEqual(rollups['author_stats'][0]['total_comments'], 3)
+
+    def test_totals_and_platforms(self):
+        rollups = EngagementWarehouseService.build_rollups()
+
+        self.assertEqual((rollups['total_posts'], rollups['recent_posts']), (1, 1))
+        self.assertEqual((rollups['total_comments'], rollups['total_shares']), (3, 12))
+        self.assertEqual(rollups['recent_shares'], 12)
+        self.assertEqual(rollups['top_posts_by_views'][0]['author'], 'Ada Writer')
+        self.assertEqual(
+            [(row['platform'], row['total_shares'], row['post_count']) for row in rollups['platform_performance']],
+            [('twitter', 7, 1), ('facebook', 5, 1)]
+        )
+
+    @override_settings(CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'engagement-warehouse-tests',
+        }
+    })
+    def test_dashboard_renders_from_cached_rollups(self):
+        staff = User.objects.create_user(username='staff', password='testpass123', is_staff=True, is_superuser=True)
+        request = RequestFactory().get('/')
+        request.user = staff
+        EngagementWarehouseService.refresh_rollups()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = blog_engagement_admin.engagement_analytics_view(request)
+
+        self.assertEqual(len(queries), 0)
+        content = response.content.decode()
+        self.assertIn('Engagement Post', content)
+        self.assertIn('Ada Writer', content)
+
+    def test_build_query_count_is_constant(self):
+        with CaptureQueriesContext(connection) as small:
+            EngagementWarehouseService.build_rollups()
+
+        for i in range(20):
+            post = Post.objects.create(title=f'Post {i}', slug=f'post-{i}', author=self.author, content='Body',
+                                       status='published')
+            post.categories.add(Category.objects.create(name=f'Category {i}', slug=f'category-{i}'))
+            EngagementWarehouseService.record_views(post.id, i)
+        with CaptureQueriesContext(connection) as large:
+            rollups = EngagementWarehouseService.build_rollups()
+
+        self.assertEqual(len(large), len(small))
+        self.assertEqual(rollups['total_posts'], 21)
+        self.assertEqual(rollups['top_posts_by_views'][1]['view_count'], 19)
+        self.assertEqual(len(rollups['category_stats']), EngagementWarehouseService.TOP_LIMIT)
+
+    @override_settings(CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'engagement-warehouse-tests',
+        }
+    })
+    def test_reads_serve_stored_rollups_and_queue_a_rebuild(self):
+        cache.clear()
+        with patch('blog.tasks.refresh_engagement_rollups.delay') as delay:
+            with self.assertNumQueries(0):
+                first = EngagementWarehouseService.get_rollups()
+                EngagementWarehouseService.get_rollups()
+        delay.assert_called_once_with()
+        self.assertIsNone(first['built_at'])
+        self.assertEqual(first['top_posts_by_views'], [])
+
+        rollups = EngagementWarehouseService.refresh_rollups()
+        cache.set(EngagementWarehouseService.ROLLUP_CACHE_KEY,
+                  {**rollups, 'built_at': rollups['built_at'] - timedelta(hours=1)}, None)
+        with patch('blog.tasks.refresh_engagement_rollups.delay') as delay:
+            stale = EngagementWarehouseService.get_rollups()
+        delay.assert_called_once_with()
+        self.assertEqual(stale['total_views'], 40)
+
+
+@skipUnless(
+    'ENGAGEMENT_BENCHMARK_POSTS' in os.environ or 'ENGAGEMENT_BENCHMARK_COMMENTS' in os.environ,
+    'Set ENGAGEMENT_BENCHMARK_POSTS or ENGAGEMENT_BENCHMARK_COMMENTS to run the benchmark'
+)
+class EngagementWarehouseBenchmarkTest(TestCase):
+    """
+    Benchmark the dashboard against the aggregates it used to run.
+
+    Runs when ENGAGEMENT_BENCHMARK_POSTS or ENGAGEMENT_BENCHMARK_COMMENTS
+    is set; they set the dataset size (for example 50000 and 2000000).
+    """
+
+    def setUp(self):
+        cache.clear()
+        rng = random.Random(41)
+        authors = [User.objects.create_user(username=f'author{i}') for i in range(20)]
+        categories = [Category.objects.create(name=f'Category {i}', slug=f'category-{i}') for i in range(30)]
+        tags = [Tag.objects.create(name=f'Tag {i}', slug=f'tag-{i}') for i in range(100)]
+        now = timezone.now()
+        Post.objects.bulk_create([
+            Post(
+                title=f'Post {i}', slug=f'post-{i}', author=authors[i % len(authors)], content='Body',
+                status='published' if i % 10 else 'draft', view_count=rng.randrange(5000),
+            )
+            for i in range(BENCHMARK_POSTS)
+        ], batch_size=1000)
+        post_ids = list(Post.objects.values_list('id', flat=True))
+        Post.categories.through.objects.bulk_create([
+            Post.categories.through(post_id=post_id, category_id=categories[(post_id * 7 + j) % 30].id)
+            for post_id in post_ids for j in range(2)
+        ], batch_size=5000)
+        Post.tags.through.objects.bulk_create([
+            Post.tags.through(post_id=post_id, tag_id=tags[(post_id * 13 + j * 17) % 100].id)
+            for post_id in post_ids for j in range(3)
+        ], batch_size=5000)
+        SocialShare.objects.bulk_create([
+            SocialShare(post_id=post_id, platform=platform, share_count=rng.randrange(1, 50))
+            for post_id in post_ids for platform in ('facebook', 'twitter', 'linkedin') if post_id % 3
+        ], batch_size=5000)
+        # Comments spread over the last year
+        with stored_timestamps(Comment, ['created_at']):
+            for start in range(0, BENCHMARK_COMMENTS, 50000):
+                Comment.objects.bulk_create([
+                    Comment(
+                        post_id=post_ids[rng.randrange(len(post_ids))], author_name='Reader',
+                        author_email='reader@example.com', content='Comment', ip_address='127.0.0.1',
+                        is_approved=rng.random() < 0.9, created_at=now - timedelta(minutes=rng.randrange(525600)),
+                    )
+                    for _ in range(start, min(start + 50000, BENCHMARK_COMMENTS))
+                ], batch_size=5000)
+        self.staff = User.objects.create_user(username='staff', is_staff=True, is_superuser=True)
+
+    def legacy_dashboard(self):
+        # The per-request aggregates this replaced
+        published = Q(posts__status='published')
+        last_30_days = timezone.now() - timedelta(days=30)
+        figures = [
+            Post.objects.filter(status='published').count(),
+            Comment.objects.filter(is_approved=True).count(),
+            NewsletterSubscriber.objects.filter(is_confirmed=True).count(),
+            SocialShare.objects.aggregate(total=Sum('share_count'))['total'],
+            Post.objects.filter(created_at__gte=last_30_days, status='published').count(),
+            Comment.objects.filter(created_at__gte=last_30_days, is_approved=True).count(),
+            NewsletterSubscriber.objects.filter(subscribed_at__gte=last_30_days).count(),
+            SocialShare.objects.filter(last_shared__gte=last_30_days).aggregate(total=Sum('share_count'))['total'],
+            list(Post.objects.filter(status='published').order_by('-view_count')[:10]),
+            list(Post.objects.filter(status='published').annotate(
+                comment_count=Count('comments', filter=Q(comments__is_approved=True))
+            ).order_by('-comment_count')[:10]),
+            list(Post.objects.filter(status='published').annotate(
+                share_count=Sum('social_shares__share_count')
+            ).filter(share_count__gt=0).order_by('-share_count')[:10]),
+            list(Category.objects.annotate(
+                post_count=Count('posts', filter=published),
+                total_views=Sum('posts__view_count', filter=published),
+                total_comments=Count('posts__comments', filter=published & Q(posts__comments__is_approved=True)),
+                total_shares=Sum('posts__social_shares__share_count', filter=published)
+            ).filter(post_count__gt=0).order_by('-total_views')[:10]),
+            list(Tag.objects.annotate(
+                post_count=Count('posts', filter=published),
+                total_views=Sum('posts__view_count', filter=published),
+                avg_engagement=Count('posts__comments', filter=published & Q(posts__comments__is_approved=True))
+                + Sum('posts__social_shares__share_count', filter=published)
+            ).filter(post_count__gt=0).order_by('-total_views')[:10]),
+            list(User.objects.annotate(
+                post_count=Count('blog_posts', filter=Q(blog_posts__status='published')),
+                total_views=Sum('blog_posts__view_count', filter=Q(blog_posts__status='published')),
+                total_comments=Count('blog_posts__comments', filter=Q(
+                    blog_posts__status='published', blog_posts__comments__is_approved=True)),
+                total_shares=Sum('blog_posts__social_shares__share_count', filter=Q(blog_posts__status='published'))
+            ).filter(post_count__gt=0).order_by('-total_views')[:10]),
+            list(SocialShare.objects.values('platform').annotate(
+                total_shares=Sum('share_count'),
+                post_count=Count('post', distinct=True),
+                avg_shares_per_post=Sum('share_count') / Count('post', distinct=True)
+            ).order_by('-total_shares')),
+        ]
+        return figures
+
+    def test_benchmark(self):
+        start_time = time.perf_counter()
+        legacy = self.legacy_dashboard()
+        legacy_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        EngagementWarehouseService.compact(full=True)
+        backfill_time = time.perf_counter() - start_time
+        facts = DailyEngagement.objects.count()
+
+        start_time = time.perf_counter()
+        rollups = EngagementWarehouseService.refresh_rollups()
+        rollup_time = time.perf_counter() - start_time
+
+        request = RequestFactory().get('/')
+        request.user = self.staff
+        blog_engagement_admin.engagement_analytics_view(request)
+        start_time = time.perf_counter()
+        response = blog_engagement_admin.engagement_analytics_view(request)
+        render_time = time.perf_counter() - start_time
+
+        print(f"\nEngagement Dashboard Benchmark ({BENCHMARK_POSTS} posts, {BENCHMARK_COMMENTS} comments):")
+        print(f"  Per-request aggregates: {legacy_time * 1000:.0f}ms")
+        print(f"  Full backfill:          {backfill_time * 1000:.0f}ms ({facts} fact rows)")
+        print(f"  Rollup rebuild:         {rollup_time * 1000:.0f}ms")
+        print(f"  Dashboard render:       {render_time * 1000:.1f}ms")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(rollups['total_comments'], legacy[1])
+        self.assertEqual(rollups['total_shares'], legacy[3])
+        self.assertLess(render_time, legacy_time)
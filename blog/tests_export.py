@@ -0,0 +1,288 @@
+"""
+Tests for the streaming export engine.
+
+Covers CSV and gzipped JSON Lines exports from the admin actions, the
+background job mode with its status and download URL, the dashboard
+export and a memory benchmark of streaming against building the whole
+response.
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.linkedin_models import LinkedInPost
+from blog.models import Comment, NewsletterSubscriber, Post
+from blog.services.export_service import ExportService
+from core.views import DashboardExportView
+
+
+BENCHMARK_ROWS = int(os.environ.get('EXPORT_BENCHMARK_ROWS', 50000))
+
+
+def create_subscribers(count, start=0):
+    NewsletterSubscriber.objects.bulk_create([
+        NewsletterSubscriber(
+            email=f'reader{i}@example.com', is_confirmed=i % 2 == 0,
+            confirmation_token=f'confirm-{i}', unsubscribe_token=f'unsubscribe-{i}',
+            preferences={'frequency': 'weekly'}
+        )
+        for i in range(start, start + count)
+    ], batch_size=5000)
+
+
+def content_of(response):
+    return b''.join(response.streaming_content)
+
+
+class ExportTestCase(TestCase):
+    """Shared fixtures for export tests."""
+
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.export_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.export_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, EXPORT_STORAGE_ROOT=self.export_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='testpass123')
+        self.client.force_login(self.admin)
+        self.post = Post.objects.create(title='Exported Post', slug='exported-post', author=self.admin,
+                                        content='Body', status='published')
+
+    def run_action(self, model_name, action, queryset, query='', select_across=False):
+        return self.client.post(reverse(f'admin:blog_{model_name}_changelist') + query, {
+            'action': action,
+            'index': '0',
+            '_selected_action': [str(pk) for pk in queryset.values_list('pk', flat=True)],
+            'select_across': '1' if select_across else '0',
+        })
+
+
+class StreamingExportTest(ExportTestCase):
+    """Test exports streamed as the action response."""
+
+    def test_comments_csv(self):
+        Comment.objects.create(post=self.post, author_name='Reader', author_email='reader@example.com',
+                               content='x' * 250, ip_address='127.0.0.1', is_approved=True)
+
+        response = self.run_action('comment', 'export_comments_csv', Comment.objects.all())
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.reader(io.StringIO(content_of(response).decode())))
+        self.assertEqual(rows[0][:3], ['Post Title', 'Author Name', 'Author Email'])
+        self.assertEqual(rows[1][0], 'Exported Post')
+        self.assertEqual(rows[1][3], 'x' * 200 + '...')
+        self.assertEqual(rows[1][4], 'Yes')
+
+    def test_subscribers_json(self):
+        create_subscribers(3)
+
+        response = self.run_action('newslettersubscriber', 'export_subscribers_json',
+                                   NewsletterSubscriber.objects.all())
+
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('.json"', response['Content-Disposition'])
+        records = json.loads(content_of(response))
+        self.assertEqual([record['email'] for record in records],
+                         ['reader0@example.com', 'reader1@example.com', 'reader2@example.com'])
+        self.assertEqual(records[0]['preferences'], {'frequency': 'weekly'})
+
+    def test_json_spans_several_pages(self):
+        create_subscribers(25)
+
+        with patch.object(ExportService, 'CHUNK_SIZE', 10):
+            content = b''.join(ExportService.iter_chunks('subscribers', NewsletterSubscriber.objects.all(), 'json'))
+
+        self.assertEqual(len(json.loads(content)), 25)
+        self.assertEqual(json.loads(b''.join(ExportService.iter_chunks(
+            'subscribers', NewsletterSubscriber.objects.none(), 'json'))), [])
+
+    def test_subscribers_jsonl_gzip(self):
+        create_subscribers(3)
+
+        response = self.run_action('newslettersubscriber', 'export_subscribers_jsonl',
+                                   NewsletterSubscriber.objects.all())
+
+        self.assertIn('.jsonl.gz', response['Content-Disposition'])
+        records = [json.loads(line) for line in gzip.decompress(content_of(response)).decode().splitlines()]
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[0]['email'], 'reader0@example.com')
+        self.assertIs(records[0]['is_confirmed'], True)
+        self.assertEqual(records[0]['preferences'], {'frequency': 'weekly'})
+
+    def test_rows_span_several_pages(self):
+        create_subscribers(25)
+
+        with patch.object(ExportService, 'CHUNK_SIZE', 10):
+            chunks = list(ExportService.iter_chunks('subscribers', NewsletterSubscriber.objects.all()))
+
+        # Header and three pages
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(b''.join(chunks).count(b'\n'), 26)
+
+    def test_linkedin_stats(self):
+        LinkedInPost.objects.create(post=self.post, status='failed', media_ids=['a', 'b'],
+                                    error_message='', image_error_message='Image too large')
+
+        response = self.run_action('linkedinpost', 'export_linkedin_stats', LinkedInPost.objects.all())
+
+        rows = list(csv.reader(io.StringIO(content_of(response).decode())))
+        self.assertEqual(rows[1][1], 'Failed')
+        self.assertEqual(rows[1][3], '2')
+        self.assertEqual(rows[1][7], 'Image too large')
+
+    def test_dashboard_export(self):
+        request = RequestFactory().get('/', {'format': 'csv'})
+        request.user = self.admin
+        response = DashboardExportView.as_view()(request)
+
+        rows = list(csv.reader(io.StringIO(content_of(response).decode())))
+        self.assertEqual(rows[0], ['Metric', 'Value', 'Change'])
+        self.assertGreater(len(rows), 1)
+
+
+class BackgroundExportTest(ExportTestCase):
+    """Test large exports written to storage by a job."""
+
+    def test_large_selection_runs_in_background(self):
+        create_subscribers(5)
+
+        with patch.object(ExportService, 'BACKGROUND_THRESHOLD', 2), \
+                patch('blog.tasks.run_export_job.delay', side_effect=ExportService.run_job):
+            response = self.run_action('newslettersubscriber', 'export_subscribers_csv',
+                                       NewsletterSubscriber.objects.all())
+
+        self.assertEqual(response.status_code, 302)
+        message = str(next(iter(get_messages(response.wsgi_request))))
+        status_url = message.split('href="')[1].split('"')[0]
+
+        status = self.client.get(status_url).json()
+        self.assertEqual(status['status'], 'done')
+        self.assertEqual((status['rows'], status['total'], status['progress']), (5, 5, 100.0))
+
+        download = self.client.get(status['download_url'])
+        lines = gzip.decompress(b''.join(download.streaming_content)).decode().splitlines()
+        self.assertEqual(len(lines), 6)
+
+    def test_job_rebuilds_the_filtered_selection(self):
+        create_subscribers(6)
+        selections = []
+
+        def run_job(job_id, selection):
+            # Task arguments go through the broker as JSON, and nothing else is shared
+            selections.append(json.loads(json.dumps(selection)))
+            return ExportService.run_job(job_id, selections[-1])
+
+        with patch.object(ExportService, 'BACKGROUND_THRESHOLD', 2), \
+                patch('blog.tasks.run_export_job.delay', side_effect=run_job):
+            self.run_action('newslettersubscriber', 'export_subscribers_csv',
+                            NewsletterSubscriber.objects.filter(is_confirmed=True),
+                            query='?is_confirmed__exact=1', select_across=True)
+
+        self.assertEqual(selections[0]['ids'], None)
+        files = os.listdir(self.export_root)
+        self.assertEqual(len(files), 1)
+        self.assertEqual(os.listdir(self.media_root), [])
+        with gzip.open(os.path.join(self.export_root, files[0]), 'rt') as handle:
+            rows = list(csv.reader(handle))
+        self.assertEqual([row[0] for row in rows[1:]],
+                         ['reader0@example.com', 'reader2@example.com', 'reader4@example.com'])
+
+    def test_status_is_private(self):
+        create_subscribers(1)
+        with patch('blog.tasks.run_export_job.delay'):
+            job = ExportService.start_job('subscribers', ExportService.selection(NewsletterSubscriber),
+                                          user_id=self.admin.id)
+        other = User.objects.create_user(username='staff', password='testpass123', is_staff=True)
+        self.client.force_login(other)
+
+        response = self.client.get(reverse('admin:blog_newslettersubscriber_export_job', args=[job['id']]))
+
+        self.assertNotEqual(response.status_code, 200)
+
+    def test_purge_old_files(self):
+        create_subscribers(1)
+        with patch('blog.tasks.run_export_job.delay', side_effect=ExportService.run_job):
+            ExportService.start_job('subscribers', ExportService.selection(NewsletterSubscriber))
+
+        self.assertEqual(ExportService.purge_files(days=1), 0)
+        with patch('blog.services.export_service.timezone.now', return_value=timezone.now() + timedelta(days=2)):
+            self.assertEqual(ExportService.purge_files(days=1), 1)
+
+
+@skipUnless('EXPORT_BENCHMARK_ROWS' in os.environ, 'Set EXPORT_BENCHMARK_ROWS to run the benchmark')
+class ExportBenchmarkTest(TestCase):
+    """
+    Benchmark the memory of streaming an export against building it whole.
+
+    Runs when EXPORT_BENCHMARK_ROWS is set to the number of subscribers
+    exported (for example 1000000).
+    """
+
+    def setUp(self):
+        create_subscribers(BENCHMARK_ROWS)
+
+    def legacy_export(self):
+        response = HttpResponse(content_type='text/csv')
+        writer = csv.writer(response)
+        writer.writerow(['Email', 'Confirmed', 'Subscribed At', 'Confirmed At', 'Preferences'])
+        for subscriber in NewsletterSubscriber.objects.all():
+            writer.writerow([
+                subscriber.email,
+                'Yes' if subscriber.is_confirmed else 'No',
+                subscriber.subscribed_at.strftime('%Y-%m-%d %H:%M:%S'),
+                subscriber.confirmed_at.strftime('%Y-%m-%d %H:%M:%S') if subscriber.confirmed_at else '',
+                json.dumps(subscriber.preferences),
+            ])
+        return len(response.content)
+
+    def streamed_export(self, export_format, compress=False):
+        response = ExportService.stream_response('subscribers', NewsletterSubscriber.objects.all(),
+                                                 export_format, compress)
+        return sum(len(chunk) for chunk in response.streaming_content)
+
+    def measure(self, export):
+        tracemalloc.start()
+        start_time = time.perf_counter()
+        size = export()
+        elapsed = time.perf_counter() - start_time
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak / 1024 / 1024, elapsed, size
+
+    def test_benchmark(self):
+        results = {
+            'Whole response (CSV)': self.measure(self.legacy_export),
+            'Streamed CSV': self.measure(lambda: self.streamed_export('csv')),
+            'Streamed JSON Lines': self.measure(lambda: self.streamed_export('jsonl')),
+            'Streamed CSV (gzip)': self.measure(lambda: self.streamed_export('csv', compress=True)),
+        }
+
+        print(f"\nExport Benchmark ({BENCHMARK_ROWS} subscribers):")
+        for name, (peak, elapsed, size) in results.items():
+            print(f"  {name:<22} peak {peak:8.1f} MB  {elapsed:6.2f}s  "
+                  f"{BENCHMARK_ROWS / elapsed:9,.0f} rows/s  {size / 1024 / 1024:7.1f} MB out")
+
+        self.assertLess(results['Streamed CSV'][0], results['Whole response (CSV)'][0])
@@ -0,0 +1,331 @@
+"""
+Tests for the pooled LinkedIn client and the shared quota ledger.
+
+Requests go to a local stand-in for the LinkedIn API that enforces a posting
+quota, answers 429 with Retry-After once it is used up and counts the TCP
+connections opened by clients.
+"""
+
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from blog.linkedin_models import LinkedInConfig, LinkedInPost, LinkedInPublishQueueEntry
+from blog.models import Post
+from blog.services.linkedin_api_client import LinkedInQuotaLedger, linkedin_client_pool
+from blog.services.linkedin_service import LinkedInAPIError, LinkedInAPIService, LinkedInRateLimitError
+from blog.tasks import post_to_linkedin
+
+
+class StandInLinkedInHandler(BaseHTTPRequestHandler):
+    """Minimal LinkedIn API stand-in with a daily posting quota."""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; don't wait on delayed ACKs between them
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, data, headers=None):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests += 1
+        if self.path == '/v2/userinfo':
+            self._send_json(200, {'sub': 'abc123', 'given_name': 'Test', 'family_name': 'User'})
+        else:
+            self._send_json(404, {'message': 'Not found'})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        with self.server.lock:
+            self.server.requests += 1
+            if self.server.fail_posts:
+                status = 503
+            elif self.server.quota_used >= self.server.post_limit:
+                self.server.rejected += 1
+                status = 429
+            else:
+                self.server.posts_created += 1
+                self.server.quota_used += 1
+                status = 201
+            post_number = self.server.posts_created
+
+        if status == 429:
+            self._send_json(429, {'message': 'Daily posting limit reached'}, {'Retry-After': '120'})
+        elif status == 503:
+            self._send_json(503, {'message': 'Service unavailable'})
+        else:
+            self._send_json(201, {'id': f'urn:li:share:{post_number}'})
+
+
+class LinkedInStandInTestCase(TestCase):
+    """Base test case running the stand-in server and pointing the service at it."""
+
+    POST_LIMIT = 100
+
+    def setUp(self):
+        cache.clear()
+        linkedin_client_pool.close()
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInLinkedInHandler)
+        self.server.lock = threading.Lock()
+        self.server.connections = 0
+        self.server.requests = 0
+        self.server.posts_created = 0
+        self.server.quota_used = 0
+        self.server.rejected = 0
+        self.server.post_limit = self.POST_LIMIT
+        self.server.fail_posts = False
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.addCleanup(linkedin_client_pool.close)
+
+        base_url = f'http://127.0.0.1:{self.server.server_address[1]}/v2'
+        for name, value in [
+            ('BASE_URL', base_url), ('UGC_POSTS_URL', f'{base_url}/ugcPosts'), ('ASSETS_URL', f'{base_url}/assets'),
+        ]:
+            patcher = patch.object(LinkedInAPIService, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        LinkedInConfig.objects.all().delete()
+        self.config = LinkedInConfig(client_id='test_client_id_12345', is_active=True)
+        self.config.set_client_secret('test_client_secret_67890')
+        self.config.set_access_token('test_access_token_abcdef')
+        self.config.token_expires_at = timezone.now() + timedelta(hours=1)
+        self.config.save()
+
+    def create_post(self, service=None):
+        service = service or LinkedInAPIService(self.config)
+        return service.create_post('Title', 'Content', 'https://example.com/blog/post/')
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'linkedin-quota-ledger-tests',
+    }
+})
+class LinkedInQuotaLedgerTest(TestCase):
+    """Test ledger bookkeeping."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_usage_is_shared_between_instances(self):
+        """Test that separate ledgers (workers) see the same usage and backoff."""
+        first, second = LinkedInQuotaLedger(), LinkedInQuotaLedger()
+
+        self.assertTrue(first.try_acquire('posts'))
+        first.record_backoff(30)
+
+        self.assertEqual(second.get_usage('posts'), 1)
+        self.assertGreater(second.get_backoff_remaining(), 0)
+        self.assertGreater(second.get_wait_seconds('posts'), 0)
+
+    def test_concurrent_acquire_never_overshoots(self):
+        """Test that concurrent reservations never exceed the limit."""
+        ledger = LinkedInQuotaLedger(limits={'posts': 20})
+        barrier = threading.Barrier(8)
+        acquired = []
+
+        def worker():
+            barrier.wait()
+            for _ in range(10):
+                if ledger.try_acquire('posts'):
+                    acquired.append(1)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(acquired), 20)
+        self.assertEqual(ledger.get_usage('posts'), 20)
+        self.assertTrue(ledger.is_exhausted('posts'))
+
+    def test_backoff_keeps_later_deadline(self):
+        """Test that a shorter backoff doesn't cut an existing one short."""
+        ledger = LinkedInQuotaLedger()
+        ledger.record_backoff(600)
+        ledger.record_backoff(5)
+
+        self.assertGreater(ledger.get_backoff_remaining(), 500)
+
+    @override_settings(CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'cache_table',
+        }
+    })
+    def test_non_atomic_cache_reserves_under_lock(self):
+        """Test that a cache without atomic incr() still enforces the limit."""
+        ledger = LinkedInQuotaLedger(limits={'posts': 2})
+
+        with patch.object(ledger, '_update_locked', wraps=ledger._update_locked) as update_locked:
+            self.assertTrue(ledger.try_acquire('posts'))
+            self.assertTrue(ledger.try_acquire('posts'))
+            self.assertFalse(ledger.try_acquire('posts'))
+            ledger.release('posts')
+
+        self.assertEqual(update_locked.call_count, 4)
+        self.assertEqual(ledger.get_usage('posts'), 1)
+        self.assertIsNone(ledger.cache.get(ledger._lock_key('posts')))
+
+
+class LinkedInPooledClientTest(LinkedInStandInTestCase):
+    """Test the service against the stand-in server."""
+
+    POST_LIMIT = 3
+
+    def test_service_instances_share_connection(self):
+        """Test that posts from separate service instances reuse one connection."""
+        for _ in range(3):
+            self.create_post()
+
+        self.assertEqual(self.server.posts_created, 3)
+        self.assertEqual(self.server.requests, 6)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(LinkedInQuotaLedger().get_usage('posts'), 3)
+
+    def test_credentials_decrypted_once(self):
+        """Test that tokens are decrypted once per process, not per request."""
+        with patch.object(LinkedInConfig, 'get_access_token', autospec=True,
+                          side_effect=lambda config: 'test_access_token_abcdef') as get_access_token:
+            for _ in range(3):
+                self.create_post(LinkedInAPIService(self.config))
+
+        self.assertEqual(get_access_token.call_count, 1)
+
+    def test_rate_limit_backoff_is_shared(self):
+        """Test that a 429 seen by one worker stops the others from calling LinkedIn."""
+        for _ in range(3):
+            self.create_post()
+
+        with self.assertRaises(LinkedInRateLimitError) as context:
+            self.create_post()
+        self.assertEqual(context.exception.retry_after, 120)
+        self.assertEqual(context.exception.quota_type, 'daily')
+        requests_seen = self.server.requests
+
+        with self.assertRaises(LinkedInRateLimitError):
+            self.create_post(LinkedInAPIService(self.config))
+
+        self.assertEqual(self.server.requests, requests_seen)
+        ledger = LinkedInQuotaLedger()
+        self.assertTrue(ledger.is_exhausted('posts'))
+        self.assertGreaterEqual(ledger.get_wait_seconds('posts'), 120)
+
+    def test_local_quota_stops_before_server(self):
+        """Test that the ledger refuses posts over the limit without calling LinkedIn."""
+        LinkedInQuotaLedger().exhaust('posts')
+
+        with self.assertRaises(LinkedInRateLimitError) as context:
+            self.create_post()
+
+        self.assertEqual(context.exception.quota_type, 'daily')
+        self.assertEqual(self.server.posts_created, 0)
+
+    def test_failed_post_releases_quota(self):
+        """Test that quota reserved for a failed post is given back."""
+        self.server.fail_posts = True
+
+        with self.assertRaises(LinkedInAPIError):
+            self.create_post()
+
+        self.assertEqual(LinkedInQuotaLedger().get_usage('posts'), 0)
+
+    def test_media_quota_is_reserved_before_upload(self):
+        """Test that the media quota stops uploads before calling LinkedIn."""
+        LinkedInQuotaLedger().exhaust('media')
+
+        with self.assertRaises(LinkedInRateLimitError) as context:
+            LinkedInAPIService(self.config).upload_media('https://example.com/image.png')
+
+        self.assertEqual(context.exception.quota_type, 'daily_media')
+        self.assertEqual(self.server.requests, 0)
+
+    def test_failed_upload_releases_media_quota(self):
+        """Test that media quota reserved for a failed upload is given back."""
+        self.server.fail_posts = True
+
+        with self.assertRaises(LinkedInAPIError):
+            LinkedInAPIService(self.config).upload_media('https://example.com/image.png')
+
+        self.assertGreater(self.server.requests, 0)
+        self.assertEqual(LinkedInQuotaLedger().get_usage('media'), 0)
+
+
+class LinkedInTaskDeferralTest(LinkedInStandInTestCase):
+    """Test that post_to_linkedin waits for the quota window instead of retrying."""
+
+    def setUp(self):
+        super().setUp()
+        user = User.objects.create_user(username='author', password='testpass123')
+        self.blog_post = Post.objects.create(
+            title='Test Blog Post',
+            slug='test-blog-post',
+            author=user,
+            content='Test content',
+            excerpt='Test excerpt',
+            status='published'
+        )
+        # Tasks run after dispatch has taken the post off the publish queue
+        LinkedInPublishQueueEntry.objects.all().delete()
+
+    def test_task_defers_while_rate_limited(self):
+        """Test that the task is queued again for the end of the backoff."""
+        LinkedInQuotaLedger().record_backoff(300)
+
+        result = post_to_linkedin(self.blog_post.id)
+
+        self.assertTrue(result['deferred'])
+        self.assertGreaterEqual(result['retry_after'], 299)
+        self.assertEqual(self.server.requests, 0)
+
+        linkedin_post = LinkedInPost.objects.get(post=self.blog_post)
+        entry = LinkedInPublishQueueEntry.objects.get(post=self.blog_post)
+        self.assertEqual(linkedin_post.status, 'retrying')
+        self.assertEqual(linkedin_post.attempt_count, 0)
+        self.assertEqual(linkedin_post.next_retry_at, entry.due_at)
+        self.assertEqual(entry.reason, LinkedInPublishQueueEntry.REASON_RETRY)
+
+    def test_api_error_queues_a_retry(self):
+        """Test that a LinkedIn API error puts the post back on the publish queue."""
+        self.server.fail_posts = True
+
+        result = post_to_linkedin(self.blog_post.id)
+
+        self.assertTrue(result['retry_scheduled'])
+        self.assertGreater(self.server.requests, 0)
+
+        linkedin_post = LinkedInPost.objects.get(post=self.blog_post)
+        entry = LinkedInPublishQueueEntry.objects.get(post=self.blog_post)
+        self.assertEqual(linkedin_post.status, 'retrying')
+        self.assertEqual(linkedin_post.next_retry_at, entry.due_at)
+        self.assertEqual(entry.reason, LinkedInPublishQueueEntry.REASON_RETRY)
@@ -183,7 +183,7 @@ class LinkedInImageMonitorTests(TestCase):
         )
         
         # Check that metrics were updated
-        metrics = cache.get(f"{self.monitor.cache_prefix}_processing_metrics", {})
+        metrics = self.monitor.get_processing_metrics()
         self.assertIn('image_download', metrics)
         self.assertEqual(metrics['image_download']['attempts'], 1)
     
@@ -198,15 +198,14 @@ class LinkedInImageMonitorTests(TestCase):
         )
         
         # Check metrics
-        metrics = cache.get(f"{self.monitor.cache_prefix}_processing_metrics", {})
+        metrics = self.monitor.get_processing_metrics()
         self.assertIn('image_validation', metrics)
         self.assertEqual(metrics['image_validation']['successes'], 1)
         
         # Check performance metrics
-        perf_key = f"{self.monitor.cache_prefix}_performance_image_validation"
-        perf_data = cache.get(perf_key, {})
-        self.assertEqual(perf_data['count'], 1)
-        self.assertEqual(perf_data['total_time'], 1.5)
+        histogram = self.monitor.metrics.get_histogram('processing_time', 'image_validation')
+        self.assertEqual(histogram.count, 1)
+        self.assertEqual(histogram.total, 1.5)
     
     def test_processing_failure_recording(self):
         """Test recording of processing failures."""
@@ -221,7 +220,7 @@ class LinkedInImageMonitorTests(TestCase):
         )
         
         # Check metrics
-        metrics = cache.get(f"{self.monitor.cache_prefix}_processing_metrics", {})
+        metrics = self.monitor.get_processing_metrics()
         self.assertIn('image_download', metrics)
         self.assertEqual(metrics['image_download']['failures'], 1)
     
@@ -453,8 +452,7 @@ class LinkedInErrorLoggerTests(TestCase):
         self.error_logger.log_authentication_error(error_details)
         
         # Check that metrics were updated
-        cache_key = f"{self.error_logger.cache_prefix}_authentication"
-        metrics = cache.get(cache_key, {})
+        metrics = self.error_logger.get_category_metrics('authentication')
         
         self.assertEqual(metrics['count'], 1)
         self.assertIn('warning', metrics['severity_counts'])
@@ -471,8 +469,7 @@ class LinkedInErrorLoggerTests(TestCase):
         self.error_logger.log_rate_limit_error(error_details)
         
         # Check metrics
-        cache_key = f"{self.error_logger.cache_prefix}_rate_limiting"
-        metrics = cache.get(cache_key, {})
+        metrics = self.error_logger.get_category_metrics('rate_limiting')
         
         self.assertEqual(metrics['count'], 1)
     
@@ -492,8 +489,7 @@ class LinkedInErrorLoggerTests(TestCase):
         self.error_logger.log_media_upload_error(error_details, context)
         
         # Check metrics
-        cache_key = f"{self.error_logger.cache_prefix}_media_upload"
-        metrics = cache.get(cache_key, {})
+        metrics = self.error_logger.get_category_metrics('media_upload')
         
         self.assertEqual(metrics['count'], 1)
     
@@ -91,14 +91,14 @@ class LinkedInEndToEndIntegrationTest(TransactionTestCase):
         return post
     
     @patch('blog.services.linkedin_service.LinkedInAPIService')
-    @patch('blog.signals.post_to_linkedin.delay')
+    @patch('blog.signals.linkedin_signals.LinkedInPublishScheduler.enqueue')
     def test_complete_end_to_end_workflow_success(self, mock_task_delay, mock_service_class):
         """
         Test complete successful end-to-end workflow.
         
         Verifies:
         - Post creation and publishing triggers signal
-        - Signal handler queues Celery task
+        - Signal handler queues the post on the publish queue
         - Task executes LinkedIn posting
         - Success is tracked in database
         
@@ -133,8 +133,8 @@ class LinkedInEndToEndIntegrationTest(TransactionTestCase):
         post.status = 'published'
         post.save()
         
-        # Verify signal handler was called
-        mock_task_delay.assert_called_once_with(post.id)
+        # Verify signal handler queued the post
+        mock_task_delay.assert_called_once_with(post.id, priority=None)
         
         # Simulate the Celery task execution
         with patch('blog.services.linkedin_service.LinkedInAPIService', return_value=mock_service):
@@ -191,7 +191,7 @@ class LinkedInSignalIntegrationTest(TestCase):
             status=status
         )
     
-    @patch('blog.signals.post_to_linkedin.delay')
+    @patch('blog.signals.linkedin_signals.LinkedInPublishScheduler.enqueue')
     def test_signal_triggers_on_status_change_to_published(self, mock_task):
         """
         Test that signal triggers when post status changes to published.
@@ -206,8 +206,8 @@ class LinkedInSignalIntegrationTest(TestCase):
         post.status = 'published'
         post.save()
         
-        # Verify task was queued
-        mock_task.assert_called_once_with(post.id)
+        # Verify the post was queued
+        mock_task.assert_called_once_with(post.id, priority=None)
 
 
 class LinkedInCeleryTaskIntegrationTest(TransactionTestCase):
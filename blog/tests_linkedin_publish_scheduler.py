@@ -0,0 +1,251 @@
+"""
+Tests for the LinkedIn publish queue and scheduler.
+
+Covers coalescing of publish events, priority/age ordering, due-time retries,
+quota- and rate-limited dispatch, and a simulation that publishes 500 posts
+against the throttled LinkedIn stand-in server.
+"""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from blog.linkedin_models import LinkedInConfig, LinkedInPost, LinkedInPublishQueueEntry
+from blog.models import Post
+from blog.services.linkedin_api_client import LinkedInQuotaLedger
+from blog.services.linkedin_publish_scheduler import LinkedInPublishScheduler
+from blog.tasks import _queue_image_retry, post_to_linkedin
+from blog.tests_linkedin_api_client import LinkedInStandInTestCase
+
+
+def create_posts(count, prefix='Queued post'):
+    """Create published posts without running post_save signals."""
+    author = User.objects.create_user(username=f'{prefix.replace(" ", "_")}_author', password='testpass123')
+    Post.objects.bulk_create([
+        Post(
+            title=f'{prefix} {i}',
+            slug=f'{prefix.replace(" ", "-").lower()}-{i}',
+            author=author,
+            content='Test content',
+            excerpt='Test excerpt',
+            status='published'
+        )
+        for i in range(count)
+    ])
+    return list(Post.objects.filter(title__startswith=prefix).order_by('id').values_list('id', flat=True))
+
+
+class LinkedInPublishSchedulerTest(TestCase):
+    """Test queueing and dispatch decisions."""
+
+    def setUp(self):
+        cache.clear()
+        self.scheduler = LinkedInPublishScheduler()
+        self.post_ids = create_posts(5)
+
+    def test_repeated_events_coalesce(self):
+        """Test that events for one post merge into a single entry."""
+        later = timezone.now() + timedelta(minutes=10)
+
+        self.assertTrue(self.scheduler.enqueue(self.post_ids[0], due_at=later))
+        self.assertFalse(self.scheduler.enqueue(self.post_ids[0]))
+        self.assertFalse(self.scheduler.enqueue(
+            self.post_ids[0], priority=LinkedInPublishQueueEntry.PRIORITY_HIGH, due_at=later
+        ))
+
+        entry = LinkedInPublishQueueEntry.objects.get()
+        self.assertEqual(entry.coalesced_count, 2)
+        self.assertEqual(entry.priority, LinkedInPublishQueueEntry.PRIORITY_HIGH)
+        self.assertLessEqual(entry.due_at, timezone.now())
+
+    def test_dispatch_orders_by_priority_then_age(self):
+        """Test that higher priority entries go first, then the oldest."""
+        first, second, third, fourth = self.post_ids[:4]
+        self.scheduler.enqueue(first, reason=LinkedInPublishQueueEntry.REASON_IMAGE_RETRY)
+        self.scheduler.enqueue(second)
+        self.scheduler.enqueue(third)
+        self.scheduler.enqueue(fourth, priority=LinkedInPublishQueueEntry.PRIORITY_HIGH)
+
+        with patch.object(post_to_linkedin, 'delay') as delay:
+            summary = LinkedInPublishScheduler(max_per_run=3).dispatch()
+
+        self.assertEqual(summary['post_ids'], [fourth, second, third])
+        self.assertEqual([call.args[0] for call in delay.call_args_list], [fourth, second, third])
+        self.assertEqual(list(LinkedInPublishQueueEntry.objects.values_list('post_id', flat=True)), [first])
+
+    def test_retries_wait_for_due_time(self):
+        """Test that retry entries are only dispatched once due."""
+        self.scheduler.schedule_retry(self.post_ids[0], 300)
+
+        with patch.object(post_to_linkedin, 'delay') as delay:
+            self.assertEqual(self.scheduler.dispatch()['dispatched'], 0)
+            with patch.object(LinkedInPublishScheduler, '_now', return_value=timezone.now() + timedelta(seconds=301)):
+                self.assertEqual(self.scheduler.dispatch()['post_ids'], [self.post_ids[0]])
+
+        delay.assert_called_once_with(self.post_ids[0])
+
+    def test_retries_never_bring_an_entry_forward(self):
+        """Test that a retry merged into a deferred entry keeps its due time."""
+        due_at = self.scheduler.schedule_retry(self.post_ids[0], 600)
+
+        self.assertFalse(self.scheduler.enqueue(self.post_ids[0], reason=LinkedInPublishQueueEntry.REASON_IMAGE_RETRY))
+        self.scheduler.schedule_retry(self.post_ids[0], 60)
+
+        self.assertEqual(LinkedInPublishQueueEntry.objects.get().due_at, due_at)
+
+    def test_failed_image_upload_queues_a_backoff_retry(self):
+        """Test that a post failed with its image is queued again after a backoff."""
+        linkedin_post = LinkedInPost.objects.create(
+            post_id=self.post_ids[0], status='failed', attempt_count=2, image_upload_status='failed'
+        )
+        exhausted = LinkedInPost.objects.create(
+            post_id=self.post_ids[1], status='failed', attempt_count=3, image_upload_status='failed'
+        )
+        text_only = LinkedInPost.objects.create(
+            post_id=self.post_ids[2], status='failed', attempt_count=1, image_upload_status='skipped'
+        )
+
+        with self.settings(LINKEDIN_IMAGE_SETTINGS={'RETRY_DELAY_SECONDS': 60}):
+            self.assertEqual(_queue_image_retry(self.scheduler, linkedin_post), 240)
+            self.assertIsNone(_queue_image_retry(self.scheduler, exhausted))
+            self.assertIsNone(_queue_image_retry(self.scheduler, text_only))
+
+        entry = LinkedInPublishQueueEntry.objects.get()
+        self.assertEqual((entry.post_id, entry.reason), (self.post_ids[0], LinkedInPublishQueueEntry.REASON_IMAGE_RETRY))
+        self.assertGreater(entry.due_at, timezone.now() + timedelta(seconds=230))
+        linkedin_post.refresh_from_db()
+        self.assertEqual(linkedin_post.next_retry_at, entry.due_at)
+
+    def test_dispatch_stops_when_quota_unavailable(self):
+        """Test that nothing is dispatched during a backoff or with no quota left."""
+        for post_id in self.post_ids:
+            self.scheduler.enqueue(post_id)
+        ledger = LinkedInQuotaLedger()
+
+        with patch.object(post_to_linkedin, 'delay') as delay:
+            ledger.record_backoff(60)
+            self.assertEqual(self.scheduler.dispatch(), {'due': 5, 'budget': 0, 'dispatched': 0, 'post_ids': []})
+
+            cache.clear()
+            for _ in range(ledger.limits['posts'] - 2):
+                ledger.try_acquire('posts')
+            self.assertEqual(self.scheduler.dispatch()['dispatched'], 2)
+
+        self.assertEqual(delay.call_count, 2)
+        self.assertEqual(LinkedInPublishQueueEntry.objects.count(), 3)
+
+    def test_dispatch_rate_per_minute(self):
+        """Test that dispatch is limited per minute across runs."""
+        for post_id in self.post_ids:
+            self.scheduler.enqueue(post_id)
+        scheduler = LinkedInPublishScheduler(rate_per_minute=3)
+
+        with patch.object(post_to_linkedin, 'delay'):
+            self.assertEqual(scheduler.dispatch()['dispatched'], 3)
+            self.assertEqual(scheduler.dispatch()['dispatched'], 0)
+            with patch.object(LinkedInPublishScheduler, '_now', return_value=timezone.now() + timedelta(minutes=1)):
+                self.assertEqual(scheduler.dispatch()['dispatched'], 2)
+
+    def create_config(self):
+        config = LinkedInConfig(client_id='test_client_id_12345', is_active=True)
+        config.set_client_secret('test_client_secret_67890')
+        config.set_access_token('test_access_token_abcdef')
+        config.token_expires_at = timezone.now() + timedelta(hours=1)
+        config.save()
+        return config
+
+    def test_publish_signal_queues_once(self):
+        """Test that publishing a post repeatedly queues one entry and one task."""
+        self.create_config()
+        author = User.objects.create_user(username='signal_author', password='testpass123')
+
+        with patch.object(post_to_linkedin, 'delay') as delay:
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                post = Post.objects.create(
+                    title='Signal post', slug='signal-post', author=author,
+                    content='Test content', status='published'
+                )
+                Post.objects.get(pk=post.pk).save()
+                Post.objects.filter(pk=post.pk).update(status='draft')
+                post = Post.objects.get(pk=post.pk)
+                post.status = 'published'
+                post.save()
+
+            entry = LinkedInPublishQueueEntry.objects.get(post=post)
+            self.assertEqual(entry.coalesced_count, 1)
+
+            for callback in callbacks:
+                callback()
+
+        delay.assert_called_once_with(post.id)
+        self.assertFalse(LinkedInPublishQueueEntry.objects.exists())
+
+    def test_editing_a_published_post_does_not_queue(self):
+        """Test that saves of already published posts don't queue them."""
+        self.create_config()
+        post = Post.objects.get(pk=self.post_ids[0])
+
+        post.title = 'Fixed typo'
+        post.save()
+        post.is_featured = True
+        post.save()
+
+        self.assertFalse(LinkedInPublishQueueEntry.objects.exists())
+
+        draft = Post.objects.get(pk=self.post_ids[1])
+        Post.objects.filter(pk=draft.pk).update(status='draft')
+        draft.refresh_from_db()
+        draft.status = 'published'
+        draft.save()
+
+        self.assertEqual(list(LinkedInPublishQueueEntry.objects.values_list('post_id', flat=True)), [draft.pk])
+
+
+class LinkedInPublishSimulationTest(LinkedInStandInTestCase):
+    """Publish 500 posts through the scheduler against a throttled stand-in."""
+
+    POST_COUNT = 500
+    POST_LIMIT = 100  # Stand-in daily posting quota, same as the ledger
+
+    def test_publish_500_posts(self):
+        """Test that 500 bulk-published posts go out once each without hitting 429s."""
+        post_ids = create_posts(self.POST_COUNT, prefix='Simulated post')
+        scheduler = LinkedInPublishScheduler()
+
+        # Every post is published twice, e.g. a bulk publish followed by an edit
+        created = [scheduler.enqueue(post_id) for post_id in post_ids + post_ids]
+        self.assertEqual(sum(created), self.POST_COUNT)
+        self.assertEqual(LinkedInPublishQueueEntry.objects.count(), self.POST_COUNT)
+
+        clock = {'now': timezone.now()}
+        dispatch_runs = days = 0
+        # Run the dispatched tasks in-process; there is no broker in tests
+        with patch.object(LinkedInPublishScheduler, '_now', side_effect=lambda: clock['now']), \
+                patch.object(LinkedInQuotaLedger, '_now', side_effect=lambda: clock['now']), \
+                patch.object(post_to_linkedin, 'delay', side_effect=lambda pid: post_to_linkedin.apply(args=(pid,))):
+            while LinkedInPublishQueueEntry.objects.exists() and dispatch_runs < 500:
+                summary = scheduler.dispatch()
+                dispatch_runs += 1
+                self.assertLessEqual(summary['dispatched'], scheduler.rate_per_minute)
+
+                if summary['dispatched']:
+                    clock['now'] += timedelta(minutes=1)
+                else:
+                    # Quota used up: idle until the next UTC day
+                    clock['now'] += timedelta(seconds=LinkedInQuotaLedger().seconds_until_reset() + 1)
+                    self.server.quota_used = 0
+                    days += 1
+
+        self.assertFalse(LinkedInPublishQueueEntry.objects.exists())
+        self.assertEqual(self.server.posts_created, self.POST_COUNT)
+        self.assertEqual(self.server.rejected, 0)
+        self.assertEqual(days, self.POST_COUNT // self.POST_LIMIT - 1)
+        self.assertEqual(
+            LinkedInPost.objects.filter(post_id__in=post_ids, status='success').count(),
+            self.POST_COUNT
+        )
+        self.assertEqual(self.server.connections, 1)
@@ -15,6 +15,7 @@ import requests
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime, timedelta
 from django.test import TestCase, TransactionTestCase
+from django.core.cache import cache
 from django.utils import timezone
 from django.contrib.auth.models import User
 
@@ -569,8 +570,9 @@ class LinkedInAPIErrorHandlingTest(TransactionTestCase):
     def test_quota_limit_checking(self):
         """Test quota limit checking logic."""
         # Test within limits
-        self.service._daily_quota_used = 50
-        self.service._daily_quota_limit = 100
+        cache.clear()
+        for _ in range(50):
+            self.assertTrue(self.service.quota_ledger.try_acquire('posts'))
         
         # Should not raise error
         try:
@@ -579,7 +581,7 @@ class LinkedInAPIErrorHandlingTest(TransactionTestCase):
             self.fail("Should not raise error when within limits")
         
         # Test quota exceeded
-        self.service._daily_quota_used = 100
+        self.service.quota_ledger.exhaust('posts')
         
         with self.assertRaises(LinkedInRateLimitError) as context:
             self.service._check_quota_limits()
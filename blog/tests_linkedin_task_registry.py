@@ -0,0 +1,262 @@
+"""
+Tests for the DB-backed LinkedIn task registry behind LinkedInTaskMonitor.
+
+Covers append-only step events, indexed listings by status and post_id,
+constant-cost state transitions, cleanup and a 10k task load test.
+"""
+
+import time
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from blog.linkedin_models import LinkedInTask, LinkedInTaskEvent
+from blog.services.linkedin_task_monitor import LinkedInTaskMonitor, LinkedInTaskStatus
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'linkedin-task-registry-tests',
+    }
+})
+class LinkedInTaskRegistryTest(TestCase):
+    """Test registry storage and state transitions."""
+
+    def setUp(self):
+        cache.clear()
+        self.monitor = LinkedInTaskMonitor()
+
+    def test_steps_are_append_only_events(self):
+        """Test that step updates append events instead of rewriting the task."""
+        task_id = self.monitor.create_task('image_processing', 42)
+        self.monitor.start_task(task_id)
+
+        for i in range(5):
+            self.monitor.add_task_step(task_id, f'step{i}', {'image_url': f'https://example.com/{i}.jpg'})
+            self.monitor.complete_task_step(task_id, f'step{i}', {'ok': True})
+
+        self.assertEqual(LinkedInTaskEvent.objects.filter(task_id=task_id).count(), 10)
+        task = LinkedInTask.objects.get(task_id=task_id)
+        self.assertEqual(task.step_count, 5)
+        self.assertEqual(task.successful_steps, 5)
+
+        steps = self.monitor.get_task_status(task_id)['steps']
+        self.assertEqual([step['step_name'] for step in steps], [f'step{i}' for i in range(5)])
+        self.assertTrue(all(step['status'] == 'success' for step in steps))
+        self.assertEqual(steps[0]['data'], {'image_url': 'https://example.com/0.jpg'})
+
+    def test_repeated_step_names_complete_in_order(self):
+        """Test that steps with the same name are closed oldest first."""
+        task_id = self.monitor.create_task('image_processing', 42)
+        self.monitor.add_task_step(task_id, 'image_download')
+        self.monitor.add_task_step(task_id, 'image_download')
+
+        self.monitor.complete_task_step(task_id, 'image_download', error=ConnectionError('timeout'))
+        self.monitor.complete_task_step(task_id, 'image_download', {'ok': True})
+
+        steps = self.monitor.get_task_status(task_id)['steps']
+        self.assertEqual([step['status'] for step in steps], ['failed', 'success'])
+        self.assertFalse(self.monitor.complete_task_step(task_id, 'image_download'))
+
+    def test_transition_query_counts(self):
+        """Test that state transitions cost a constant number of queries."""
+        task_id = self.monitor.create_task('image_processing', 42)
+
+        with self.assertNumQueries(1):
+            self.assertTrue(self.monitor.start_task(task_id))
+
+        for i in range(20):
+            self.monitor.add_task_step(task_id, f'step{i}')
+            self.monitor.complete_task_step(task_id, f'step{i}')
+
+        with self.assertNumQueries(3):
+            self.monitor.add_task_step(task_id, 'final_step')
+        with self.assertNumQueries(5):
+            self.monitor.complete_task_step(task_id, 'final_step')
+        with self.assertNumQueries(1):
+            self.monitor.get_task_summary(task_id)
+
+    def test_retry_starts_new_attempt(self):
+        """Test that a retry resets steps but keeps errors and event history."""
+        task_id = self.monitor.create_task('image_upload', 7)
+        self.monitor.start_task(task_id)
+        self.monitor.add_task_step(task_id, 'image_upload')
+        self.monitor.complete_task_step(task_id, 'image_upload', error=ConnectionError('reset'))
+        self.monitor.complete_task(task_id, error=ConnectionError('reset'))
+
+        self.assertTrue(self.monitor.retry_task(task_id, 'Network error'))
+        self.assertTrue(self.monitor.start_task(task_id))
+
+        task_data = self.monitor.get_task_status(task_id)
+        self.assertEqual(task_data['status'], LinkedInTaskStatus.RUNNING)
+        self.assertEqual(task_data['retry_count'], 1)
+        self.assertEqual(task_data['steps'], [])
+        self.assertEqual(len(task_data['errors']), 1)
+        self.assertEqual(LinkedInTaskEvent.objects.filter(task_id=task_id).count(), 3)
+
+    def test_finished_task_is_not_completed_twice(self):
+        """Test that completing a finished task is rejected."""
+        task_id = self.monitor.create_task('image_upload', 7)
+        self.monitor.start_task(task_id)
+        self.assertTrue(self.monitor.complete_task(task_id, {'ok': True}))
+        self.assertFalse(self.monitor.complete_task(task_id, error=Exception('late failure')))
+
+        self.assertEqual(self.monitor.get_task_status(task_id)['status'], LinkedInTaskStatus.SUCCESS)
+        self.assertEqual(self.monitor.get_queue_metrics()['image_upload']['failed'], 0)
+
+    def test_finished_task_snapshot_is_cached(self):
+        """Test that finished tasks are served from cache and invalidated on change."""
+        task_id = self.monitor.create_task('image_upload', 7)
+        self.monitor.start_task(task_id)
+        self.monitor.complete_task(task_id, error=Exception('failed'))
+        self.monitor.get_task_status(task_id)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.monitor.get_task_status(task_id)['status'], LinkedInTaskStatus.FAILED)
+
+        self.monitor.retry_task(task_id, 'again')
+        self.assertEqual(self.monitor.get_task_status(task_id)['status'], LinkedInTaskStatus.RETRYING)
+
+    def test_unknown_and_invalid_task_ids(self):
+        """Test that unknown or malformed task IDs are reported as missing."""
+        for task_id in ['not-a-uuid', '00000000-0000-0000-0000-000000000000']:
+            self.assertIsNone(self.monitor.get_task_status(task_id))
+            self.assertFalse(self.monitor.start_task(task_id))
+            self.assertFalse(self.monitor.add_task_step(task_id, 'step'))
+            self.assertFalse(self.monitor.cancel_task(task_id))
+
+    def test_log_task_completion(self):
+        """Test recording Celery task results as finished registry entries."""
+        success_id = self.monitor.log_task_completion({'success': True, 'post_id': 5, 'task_duration': 1.25})
+        skipped_id = self.monitor.log_task_completion({'success': False, 'skipped': True, 'post_id': 5, 'task_duration': 0.1})
+        failed_id = self.monitor.log_task_completion({
+            'success': False, 'post_id': 6, 'error': 'Rate limited', 'attempt_count': 3, 'task_duration': 2.0
+        })
+
+        self.assertEqual(self.monitor.get_task_status(success_id)['status'], LinkedInTaskStatus.SUCCESS)
+        self.assertEqual(self.monitor.get_task_status(skipped_id)['status'], LinkedInTaskStatus.CANCELLED)
+        failed = self.monitor.get_task_status(failed_id)
+        self.assertEqual(failed['final_error'], 'Rate limited')
+        self.assertEqual(failed['retry_count'], 2)
+        self.assertEqual(len(self.monitor.get_tasks(post_id=5)), 2)
+        self.assertEqual(self.monitor.get_queue_metrics()['linkedin_post']['failed'], 1)
+
+    def test_cleanup_completed_tasks(self):
+        """Test that cleanup removes old finished tasks and their events only."""
+        old_done = self.monitor.create_task('image_upload', 1)
+        self.monitor.add_task_step(old_done, 'image_upload')
+        self.monitor.complete_task(old_done)
+        old_active = self.monitor.create_task('image_upload', 2)
+        recent_done = self.monitor.create_task('image_upload', 3)
+        self.monitor.complete_task(recent_done)
+        LinkedInTask.objects.filter(task_id__in=[old_done, old_active]).update(
+            updated_at=timezone.now() - timedelta(hours=48)
+        )
+
+        self.assertEqual(self.monitor.cleanup_completed_tasks(hours=24, batch_size=1), 1)
+
+        self.assertIsNone(self.monitor.get_task_status(old_done))
+        self.assertFalse(LinkedInTaskEvent.objects.filter(task_id=old_done).exists())
+        self.assertIsNotNone(self.monitor.get_task_status(old_active))
+        self.assertIsNotNone(self.monitor.get_task_status(recent_done))
+
+    def test_linkedin_operations_tasks_command(self):
+        """Test listing and inspecting tasks through linkedin_operations."""
+        task_id = self.monitor.create_task('image_processing', 99)
+        self.monitor.start_task(task_id)
+        self.monitor.add_task_step(task_id, 'image_download')
+
+        out = StringIO()
+        call_command('linkedin_operations', 'tasks', '--active', stdout=out)
+        self.assertIn(task_id, out.getvalue())
+        self.assertIn('running: 1', out.getvalue())
+
+        out = StringIO()
+        call_command('linkedin_operations', 'tasks', '--task-id', task_id, stdout=out)
+        self.assertIn('image_download: running', out.getvalue())
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'linkedin-task-registry-tests',
+    }
+})
+class LinkedInTaskRegistryLoadTest(TestCase):
+    """Load test the registry with 10k in-flight tasks."""
+
+    TASK_COUNT = 10000
+
+    @classmethod
+    def setUpTestData(cls):
+        statuses = [status for status, _ in LinkedInTask.STATUS_CHOICES]
+        LinkedInTask.objects.bulk_create(
+            [
+                LinkedInTask(
+                    task_type='image_processing' if i % 2 else 'image_upload',
+                    post_id=i % 500,
+                    status=statuses[i % len(statuses)],
+                )
+                for i in range(cls.TASK_COUNT)
+            ],
+            batch_size=1000
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.monitor = LinkedInTaskMonitor()
+
+    def test_indexed_listings(self):
+        """Test listings and counts by status and post_id at 10k tasks."""
+        with self.assertNumQueries(1):
+            counts = self.monitor.get_status_counts()
+        self.assertEqual(sum(counts.values()), self.TASK_COUNT)
+        self.assertEqual(counts[LinkedInTaskStatus.RUNNING], sum(1 for i in range(self.TASK_COUNT) if i % 6 == 1))
+
+        with self.assertNumQueries(1):
+            active = self.monitor.get_active_tasks(limit=100)
+        self.assertEqual(len(active), 100)
+        self.assertTrue(all(task['status'] in LinkedInTask.ACTIVE_STATUSES for task in active))
+
+        with self.assertNumQueries(1):
+            post_tasks = self.monitor.get_tasks(post_id=7, limit=100)
+        self.assertEqual(len(post_tasks), self.TASK_COUNT // 500)
+
+    def test_transitions_under_load(self):
+        """Test task lifecycle throughput against a 10k task registry."""
+        start = time.perf_counter()
+        task_ids = []
+        for i in range(200):
+            task_id = self.monitor.create_task('image_upload', i)
+            self.monitor.start_task(task_id)
+            self.monitor.add_task_step(task_id, 'image_upload')
+            self.monitor.complete_task_step(task_id, 'image_upload')
+            self.monitor.complete_task(task_id)
+            task_ids.append(task_id)
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 30.0)
+        self.assertEqual(
+            LinkedInTask.objects.filter(task_id__in=task_ids, status=LinkedInTaskStatus.SUCCESS).count(),
+            200
+        )
+
+        pending_id = self.monitor.get_tasks(status=LinkedInTaskStatus.PENDING, limit=1)[0]['task_id']
+        self.monitor._get_task_header(pending_id)
+        with self.assertNumQueries(1):
+            self.assertTrue(self.monitor.start_task(pending_id))
+
+    def test_cleanup_in_batches(self):
+        """Test that cleanup of thousands of finished tasks runs in batches."""
+        LinkedInTask.objects.update(updated_at=timezone.now() - timedelta(days=2))
+        finished = LinkedInTask.objects.filter(status__in=LinkedInTask.TERMINAL_STATUSES).count()
+
+        deleted = self.monitor.cleanup_completed_tasks(hours=24, batch_size=2000)
+
+        self.assertEqual(deleted, finished)
+        self.assertEqual(LinkedInTask.objects.count(), self.TASK_COUNT - finished)
@@ -0,0 +1,169 @@
+"""
+Tests for the cache-backed metrics store used by the LinkedIn monitors.
+"""
+
+import threading
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from blog.utils.metrics_store import LatencyHistogram, MetricsStore
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'metrics-store-tests',
+    }
+})
+class LatencyHistogramTest(TestCase):
+    """Test histogram bucketing, percentiles and merging."""
+
+    def test_bucket_bounds_contain_value(self):
+        """Test that every value falls within the bounds of its bucket."""
+        for seconds in [0.0005, 0.001, 0.0137, 0.25, 1.5, 12.0, 300.0]:
+            lower, upper = LatencyHistogram.bucket_bounds(LatencyHistogram.bucket_for(seconds))
+            self.assertLessEqual(lower, seconds)
+            self.assertLess(seconds, upper)
+
+    def test_percentiles_and_exact_totals(self):
+        """Test that percentiles stay within bucket error and totals are exact."""
+        store = MetricsStore('test_hist')
+        for millis in range(1, 101):
+            store.observe('latency', millis / 1000.0, 'step')
+
+        histogram = store.get_histogram('latency', 'step')
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.total, 5.05)
+        self.assertGreaterEqual(histogram.percentile(50), 0.050)
+        self.assertLess(histogram.percentile(50), 0.050 * 1.2)
+        self.assertGreaterEqual(histogram.percentile(99), 0.099)
+        self.assertLess(histogram.percentile(99), 0.099 * 1.2)
+
+    def test_merge(self):
+        """Test that merged histograms add bucket counts and sums."""
+        first = LatencyHistogram({3: 2}, total_us=10)
+        second = LatencyHistogram({3: 1, 5: 4}, total_us=20)
+
+        merged = first.merge(second)
+
+        self.assertEqual(merged.buckets, {3: 3, 5: 4})
+        self.assertEqual(merged.total_us, 30)
+        self.assertEqual(merged.count, 7)
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'metrics-store-tests',
+    }
+})
+class MetricsStoreTest(TestCase):
+    """Test windowed counters and label tracking."""
+
+    def setUp(self):
+        cache.clear()
+        self.store = MetricsStore('test_store', window_seconds=60, retention_windows=3)
+
+    def test_counters_by_label(self):
+        """Test counter totals and the label index."""
+        self.store.incr('errors', 'timeout')
+        self.store.incr('errors', 'timeout')
+        self.store.incr('errors', 'auth', amount=5)
+
+        self.assertEqual(self.store.get_labels('errors'), ['auth', 'timeout'])
+        self.assertEqual(self.store.get_counters('errors'), {'auth': 5, 'timeout': 2})
+        self.assertEqual(self.store.get_counter('errors', 'missing'), 0)
+
+    def test_window_rollup(self):
+        """Test that reads aggregate only the requested windows."""
+        with patch('blog.utils.metrics_store.time.time', return_value=60 * 100):
+            self.store.incr('events', amount=3)
+        with patch('blog.utils.metrics_store.time.time', return_value=60 * 101):
+            self.store.incr('events', amount=4)
+
+            self.assertEqual(self.store.get_counter('events', windows=1), 4)
+            self.assertEqual(self.store.get_counter('events'), 7)
+            self.assertEqual(
+                self.store.get_series('events'),
+                [(60 * 99, 0), (60 * 100, 3), (60 * 101, 4)]
+            )
+
+        with patch('blog.utils.metrics_store.time.time', return_value=60 * 104):
+            self.assertEqual(self.store.get_counter('events'), 0)
+
+    def test_concurrent_increments_are_lossless(self):
+        """Test that concurrent writers never lose counter or histogram samples."""
+        thread_count, iterations = 8, 500
+        barrier = threading.Barrier(thread_count)
+
+        def worker():
+            barrier.wait()
+            for _ in range(iterations):
+                self.store.incr('requests', 'publish')
+                self.store.observe('duration', 0.002, 'publish')
+
+        threads = [threading.Thread(target=worker) for _ in range(thread_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        expected = thread_count * iterations
+        self.assertEqual(self.store.get_counter('requests', 'publish'), expected)
+        histogram = self.store.get_histogram('duration', 'publish')
+        self.assertEqual(histogram.count, expected)
+        self.assertAlmostEqual(histogram.total, expected * 0.002)
+
+    def test_histogram_reads_only_recorded_groups(self):
+        """Test that reads fetch the sums and group counters, then only the recorded groups."""
+        with patch('blog.utils.metrics_store.time.time', return_value=60 * 100):
+            self.store.observe('duration', 0.002, 'publish')
+            self.store.observe('duration', 300.0, 'publish')
+        with patch('blog.utils.metrics_store.time.time', return_value=60 * 101):
+            self.store.observe('duration', 0.002, 'publish')
+            self.store.observe('duration', 0.0005, 'publish')
+
+            with patch.object(cache, 'get_many', wraps=cache.get_many) as get_many:
+                histogram = self.store.get_histogram('duration', 'publish')
+
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.total, 300.0045)
+        self.assertEqual(histogram.buckets[LatencyHistogram.bucket_for(0.002)], 2)
+        self.assertEqual(histogram.max, LatencyHistogram.bucket_bounds(LatencyHistogram.bucket_for(300.0))[1])
+        # 3 windows of one sum and 12 group counters, then the two groups of
+        # window 100 and the one group (buckets 0 and 2ms) of window 101
+        group_size = MetricsStore.BUCKET_GROUP_SIZE
+        self.assertEqual(
+            [len(call.args[0]) for call in get_many.call_args_list],
+            [3 * (1 + LatencyHistogram.MAX_BUCKET // group_size + 1), 3 * group_size]
+        )
+
+    def test_recreated_bucket_keeps_its_neighbours(self):
+        """Test that a bucket evicted and recorded again doesn't affect other buckets."""
+        with patch('blog.utils.metrics_store.time.time', return_value=60 * 100):
+            self.store.observe('duration', 0.002, 'publish')
+            self.store.observe('duration', 0.0025, 'publish')
+            cache.delete(self.store._key('duration', 'publish', 100, f':b{LatencyHistogram.bucket_for(0.002)}'))
+            self.store.observe('duration', 0.002, 'publish')
+
+            histogram = self.store.get_histogram('duration', 'publish')
+
+        self.assertEqual(histogram.buckets, {
+            LatencyHistogram.bucket_for(0.002): 1,
+            LatencyHistogram.bucket_for(0.0025): 1,
+        })
+
+    def test_evicted_group_counter_is_restored(self):
+        """Test that the next sample in a group makes its buckets readable again."""
+        bucket = LatencyHistogram.bucket_for(0.002)
+        with patch('blog.utils.metrics_store.time.time', return_value=60 * 100):
+            self.store.observe('duration', 0.002, 'publish')
+            self.store.observe('duration', 0.002, 'publish')
+            cache.delete(self.store._key('duration', 'publish', 100, f':g{bucket // MetricsStore.BUCKET_GROUP_SIZE}'))
+            self.store.observe('duration', 0.0021, 'publish')
+
+            histogram = self.store.get_histogram('duration', 'publish')
+
+        self.assertEqual(histogram.buckets, {bucket: 3})
@@ -295,4 +295,208 @@ class MediaItemModelTestCase(TestCase):
         self.assertIsInstance(responsive_images, dict)
         
         # Should be empty since no actual image files are attached
-        self.assertEqual(len(responsive_images), 0)
\ No newline at end of file
+        self.assertEqual(len(responsive_images), 0)
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class MediaRenditionTestCase(TestCase):
+    """Test cases for WebP/AVIF rendition generation and srcset rendering."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        
+        self.post = Post.objects.create(
+            title='Test Post',
+            slug='test-post',
+            author=self.user,
+            content='Test content',
+            status='published'
+        )
+    
+    def create_media_item(self, width=1000, height=500):
+        """Create an image media item with an original image on disk."""
+        image = Image.new('RGB', (width, height), color='blue')
+        image_io = BytesIO()
+        image.save(image_io, format='JPEG')
+        
+        return MediaItem.objects.create(
+            post=self.post,
+            media_type='image',
+            title='Rendition Image',
+            alt_text='A "blue" image',
+            original_image=SimpleUploadedFile('rendition.jpg', image_io.getvalue(), content_type='image/jpeg'),
+        )
+    
+    def checkpoint_file(self):
+        """Get a checkpoint file path in a temporary directory."""
+        return os.path.join(tempfile.mkdtemp(), 'media_renditions_checkpoint')
+    
+    def read_checkpoint(self, path):
+        with open(path) as checkpoint_file:
+            return int(checkpoint_file.read())
+    
+    def test_generate_renditions_manifest(self):
+        """Test that WebP renditions are generated at srcset widths without upscaling."""
+        media_item = self.create_media_item(width=1000, height=500)
+        
+        manifest = multimedia_service.generate_renditions(media_item, formats=['webp'])
+        
+        self.assertEqual(manifest['src'], media_item.original_image.name)
+        self.assertEqual([entry[0] for entry in manifest['webp']], [320, 640, 960, 1000])
+        self.assertEqual(manifest['webp'][0][1], 160)
+        self.assertEqual(len(manifest['jpeg']), 4)
+        for width, height, size, path in manifest['webp']:
+            self.assertTrue(path.endswith('.webp'))
+            self.assertGreater(size, 0)
+        
+        media_item.refresh_from_db()
+        self.assertTrue(media_item.has_current_renditions())
+        self.assertEqual(media_item.get_rendition_formats(), ['webp'])
+    
+    def test_get_responsive_images_includes_renditions(self):
+        """Test that responsive images expose rendition widths and byte sizes."""
+        media_item = self.create_media_item()
+        multimedia_service.generate_renditions(media_item, formats=['webp'])
+        
+        responsive_images = media_item.get_responsive_images()
+        
+        self.assertIn('original', responsive_images)
+        self.assertEqual(len(responsive_images['webp']), 4)
+        self.assertEqual(responsive_images['webp'][0]['width'], 320)
+        self.assertIn('bytes', responsive_images['webp'][0])
+    
+    def test_stale_manifest_is_ignored(self):
+        """Test that renditions are not served once the original image changes."""
+        media_item = self.create_media_item()
+        multimedia_service.generate_renditions(media_item, formats=['webp'])
+        
+        media_item.original_image.name = 'blog_images/originals/replaced.jpg'
+        
+        self.assertFalse(media_item.has_current_renditions())
+        self.assertNotIn('webp', media_item.get_responsive_images())
+    
+    def test_render_picture_with_renditions(self):
+        """Test that shortcodes emit a <picture> with srcset and sizes."""
+        from .utils.shortcodes import MediaShortcodeProcessor
+        
+        media_item = self.create_media_item()
+        multimedia_service.generate_renditions(media_item, formats=['webp'])
+        
+        html = MediaShortcodeProcessor.process_content(f'[image id="{media_item.id}"]', self.post)
+        
+        self.assertIn('<picture>', html)
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn('320w', html)
+        self.assertIn('sizes="(max-width: 768px) 100vw, 800px"', html)
+        self.assertIn('alt="A &quot;blue&quot; image"', html)
+    
+    def test_render_picture_without_renditions(self):
+        """Test that items without renditions fall back to a plain <img>."""
+        from .templatetags.media_tags import responsive_picture
+        
+        media_item = self.create_media_item()
+        
+        html = responsive_picture(media_item)
+        
+        self.assertNotIn('<picture>', html)
+        self.assertIn(media_item.original_image.url, html)
+    
+    def test_delete_renditions(self):
+        """Test that deleting renditions removes files and clears the manifest."""
+        from django.core.files.storage import default_storage
+        
+        media_item = self.create_media_item()
+        manifest = multimedia_service.generate_renditions(media_item, formats=['webp'])
+        paths = [entry[3] for entry in manifest['webp']]
+        
+        multimedia_service.delete_renditions(media_item)
+        
+        self.assertEqual(media_item.renditions, {})
+        for path in paths:
+            self.assertFalse(default_storage.exists(path))
+    
+    def test_summarize_rendition_savings(self):
+        """Test byte savings summary across manifests."""
+        manifests = [
+            {'jpeg': [[320, 160, 1000], [640, 320, 3000]],
+             'webp': [[320, 160, 600, 'a.webp'], [640, 320, 1800, 'b.webp']]},
+            {},
+        ]
+        
+        summary = multimedia_service.summarize_rendition_savings(manifests)
+        
+        self.assertEqual(summary['items'], 1)
+        self.assertEqual(summary['jpeg_bytes'], 4000)
+        self.assertEqual(summary['formats']['webp']['saved_bytes'], 1600)
+        self.assertEqual(summary['formats']['webp']['saved_percent'], 40.0)
+    
+    def test_backfill_command_resumes_from_checkpoint(self):
+        """Test that the backfill command processes batches and resumes after its checkpoint."""
+        from django.core.management import call_command
+        from io import StringIO
+        
+        checkpoint = self.checkpoint_file()
+        items = [self.create_media_item(width=400, height=300) for _ in range(3)]
+        
+        call_command(
+            'generate_media_renditions', '--formats', 'webp', '--batch-size', '1', '--limit', '2',
+            '--checkpoint-file', checkpoint, stdout=StringIO()
+        )
+        self.assertEqual(self.read_checkpoint(checkpoint), items[1].pk)
+        
+        out = StringIO()
+        call_command('generate_media_renditions', '--formats', 'webp', '--resume', '--checkpoint-file', checkpoint, stdout=out)
+        
+        for item in items:
+            item.refresh_from_db()
+            self.assertTrue(item.has_current_renditions())
+        self.assertIn('1 processed, 0 skipped', out.getvalue())
+        self.assertIn('Rendition byte savings report', out.getvalue())
+    
+    def test_backfill_command_retries_failed_items_on_resume(self):
+        """Test that the checkpoint stays before a failed item so --resume retries it."""
+        from unittest.mock import patch
+        from django.core.management import call_command
+        from io import StringIO
+        
+        checkpoint = self.checkpoint_file()
+        items = [self.create_media_item(width=400, height=300) for _ in range(3)]
+        generate_renditions = multimedia_service.generate_renditions
+        
+        def fail_second_item(media_item, **kwargs):
+            if media_item.pk == items[1].pk:
+                raise IOError('Storage unavailable')
+            return generate_renditions(media_item, **kwargs)
+        
+        with patch.object(multimedia_service, 'generate_renditions', side_effect=fail_second_item):
+            call_command('generate_media_renditions', '--formats', 'webp', '--checkpoint-file', checkpoint, stdout=StringIO())
+        self.assertEqual(self.read_checkpoint(checkpoint), items[0].pk)
+        
+        out = StringIO()
+        call_command('generate_media_renditions', '--formats', 'webp', '--resume', '--checkpoint-file', checkpoint, stdout=out)
+        
+        items[1].refresh_from_db()
+        self.assertTrue(items[1].has_current_renditions())
+        self.assertIn('1 processed, 1 skipped, 0 failed', out.getvalue())
+        self.assertEqual(self.read_checkpoint(checkpoint), items[2].pk)
+    
+    def test_backfill_command_starts_after_a_printed_checkpoint(self):
+        """Test that --start-after continues a run from the checkpoint it printed."""
+        from django.core.management import call_command
+        from io import StringIO
+        
+        items = [self.create_media_item(width=400, height=300) for _ in range(2)]
+        
+        out = StringIO()
+        call_command(
+            'generate_media_renditions', '--formats', 'webp', '--start-after', str(items[0].pk),
+            '--checkpoint-file', self.checkpoint_file(), stdout=out
+        )
+        
+        items[0].refresh_from_db()
+        self.assertFalse(items[0].has_current_renditions())
+        self.assertIn(f'Checkpoint {items[1].pk}: 1 processed', out.getvalue())
@@ -0,0 +1,67 @@
+"""
+Tests for the setup_blog_tasks management command.
+
+Covers registering the blog's periodic tasks with Celery Beat, re-running
+the command and disabling the tasks.
+"""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django_celery_beat.models import IntervalSchedule, PeriodicTask
+
+from blog.management.commands.setup_blog_tasks import Command
+from blog.performance import ViewCountOptimizer
+
+
+class SetupBlogTasksCommandTest(TestCase):
+    """Test registering the blog periodic tasks."""
+
+    def setup_tasks(self, *args):
+        call_command('setup_blog_tasks', *args, stdout=StringIO())
+
+    def test_registers_the_linkedin_queue_dispatcher_every_minute(self):
+        self.setup_tasks()
+
+        task = PeriodicTask.objects.get(task='blog.tasks.dispatch_linkedin_publish_queue')
+        self.assertTrue(task.enabled)
+        self.assertEqual((task.interval.every, task.interval.period), (1, IntervalSchedule.MINUTES))
+
+    def test_registers_engagement_rollups_and_nightly_compaction(self):
+        self.setup_tasks()
+
+        rollups = PeriodicTask.objects.get(task='blog.tasks.refresh_engagement_rollups')
+        compaction = PeriodicTask.objects.get(task='blog.tasks.compact_engagement_facts')
+        self.assertEqual(rollups.interval.every, 5)
+        self.assertEqual((compaction.crontab.hour, compaction.crontab.minute), ('2', '30'))
+
+    def test_flushes_view_counts_within_the_buffer_timeout(self):
+        self.setup_tasks()
+
+        task = PeriodicTask.objects.get(task='blog.tasks.flush_view_counts')
+        self.assertLess(task.interval.every * 60, ViewCountOptimizer.BUFFER_TIMEOUT)
+
+    def test_flushes_social_share_counts_every_minute(self):
+        self.setup_tasks()
+
+        task = PeriodicTask.objects.get(task='blog.tasks.flush_social_share_counts')
+        self.assertEqual((task.interval.every, task.interval.period), (1, IntervalSchedule.MINUTES))
+
+    def test_purges_export_files_daily(self):
+        self.setup_tasks()
+
+        task = PeriodicTask.objects.get(task='blog.tasks.purge_export_files')
+        self.assertEqual((task.crontab.hour, task.crontab.day_of_week), ('3', '*'))
+
+    def test_rerunning_updates_the_tasks(self):
+        self.setup_tasks()
+        self.setup_tasks()
+
+        self.assertEqual(PeriodicTask.objects.filter(task__startswith='blog.tasks.').count(), len(Command.TASKS))
+
+    def test_disable(self):
+        self.setup_tasks()
+        self.setup_tasks('--disable')
+
+        self.assertFalse(PeriodicTask.objects.filter(task__startswith='blog.tasks.', enabled=True).exists())
@@ -0,0 +1,320 @@
+"""
+Tests for post cards in list views and discovery widgets.
+
+Covers the fields of a card, the queries for cached and missing cards,
+invalidation when a post, its categories, tags or author change, comment
+counts, the list and author pages and a benchmark of time and memory per
+list page against full post rows with 50 KB bodies.
+"""
+
+import os
+import time
+import tracemalloc
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.models import Category, Comment, Post, Tag
+from blog.services.content_discovery_service import ContentDiscoveryService
+from blog.services.post_card_service import PostCardService
+from blog.services.social_image_service import SocialImageService
+
+
+BENCHMARK_POSTS = int(os.environ.get('POST_CARD_BENCHMARK_POSTS', 500))
+BENCHMARK_PAGE_SIZE = 50
+BENCHMARK_BODY_BYTES = 50 * 1024
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'post-card-tests',
+    }
+})
+class PostCardTestCase(TestCase):
+    """Shared fixtures for post card tests."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(
+            username='writer', password='testpass123', first_name='Ada', last_name='Lovelace'
+        )
+        self.python = Category.objects.create(name='Python', slug='python')
+        self.django = Category.objects.create(name='Django', slug='django')
+        self.orm = Tag.objects.create(name='ORM', slug='orm', color='#ff0000')
+        self.caching = Tag.objects.create(name='Caching', slug='caching', color='#00ff00')
+        self.post = self.create_post('First Post')
+        self.post.categories.add(self.python, self.django)
+        self.post.tags.add(self.orm, self.caching)
+
+    def create_post(self, title, **kwargs):
+        return Post.objects.create(
+            title=title, slug=title.lower().replace(' ', '-'), author=self.author,
+            content=kwargs.pop('content', 'Body'), excerpt=f'About {title}', status='published', **kwargs
+        )
+
+    def card(self, post):
+        return PostCardService.cards(Post.objects.filter(pk=post.pk))[0]
+
+
+class PostCardFieldsTest(PostCardTestCase):
+    """Test what a card holds."""
+
+    def test_card_fields(self):
+        card = self.card(self.post)
+
+        self.assertEqual(card.title, 'First Post')
+        self.assertEqual(card.excerpt, 'About First Post')
+        self.assertEqual(card.author_name, 'Ada Lovelace')
+        self.assertEqual(card.created_at, self.post.created_at)
+        self.assertEqual(card.get_absolute_url(), self.post.get_absolute_url())
+        self.assertIsNone(card.image_url)
+
+    def test_categories_and_tags_are_ordered_by_name(self):
+        card = self.card(self.post)
+
+        self.assertEqual(card.category.name, 'Django')
+        self.assertEqual([tag.name for tag in card.tags], ['Caching', 'ORM'])
+        self.assertEqual(card.tags[1].color, '#ff0000')
+
+    def test_author_without_name_shows_username(self):
+        User.objects.filter(pk=self.author.pk).update(first_name='', last_name='')
+
+        self.assertEqual(self.card(self.create_post('Second Post')).author_name, 'writer')
+
+    def test_cards_keep_queryset_order(self):
+        second = self.create_post('Second Post')
+        third = self.create_post('Third Post')
+
+        cards = PostCardService.cards(Post.objects.order_by('-title'))
+        by_ids = PostCardService.cards_for_ids([second.id, 0, self.post.id])
+
+        self.assertEqual([card.id for card in cards], [third.id, second.id, self.post.id])
+        self.assertEqual([card.id for card in by_ids], [second.id, self.post.id])
+
+    def test_comment_counts_are_read_in_one_query(self):
+        for is_approved in (True, True, False):
+            Comment.objects.create(
+                post=self.post, author_name='Reader', author_email='reader@example.com', ip_address='127.0.0.1',
+                content='Nice post', is_approved=is_approved
+            )
+
+        second = self.create_post('Second Post')
+
+        with self.assertNumQueries(5):
+            cards = PostCardService.cards(Post.objects.order_by('id'), with_comment_counts=True)
+
+        self.assertEqual([card.comment_count for card in cards], [3, 0])
+        self.assertEqual(cards[1].id, second.id)
+
+
+class PostCardCacheTest(PostCardTestCase):
+    """Test the queries and invalidation of stored cards."""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(9):
+            self.create_post(f'Post {i}').tags.add(self.orm)
+
+    def test_missing_cards_are_built_with_a_fixed_number_of_queries(self):
+        # The page itself, then the cards' fields, categories and tags
+        with self.assertNumQueries(4):
+            cards = PostCardService.cards(Post.objects.all())
+
+        self.assertEqual(len(cards), 10)
+
+    def test_cached_page_costs_one_query(self):
+        PostCardService.cards(Post.objects.all())
+
+        with self.assertNumQueries(1):
+            cards = PostCardService.cards(Post.objects.all())
+
+        self.assertEqual(len(cards), 10)
+
+    def test_only_outdated_cards_are_rebuilt(self):
+        PostCardService.cards(Post.objects.all())
+        self.post.title = 'Renamed Post'
+        self.post.save()
+
+        with CaptureQueriesContext(connection) as queries:
+            cards = {card.id: card for card in PostCardService.cards(Post.objects.all())}
+
+        self.assertEqual(cards[self.post.id].title, 'Renamed Post')
+        self.assertIn(f'IN ({self.post.id})', queries.captured_queries[-1]['sql'])
+
+    def test_view_count_is_current_and_keeps_the_version(self):
+        before = self.card(self.post)
+        Post.objects.filter(pk=self.post.pk).update(view_count=42)
+
+        after = self.card(self.post)
+
+        self.assertEqual(after.view_count, 42)
+        self.assertEqual(after.version, before.version)
+
+    def test_tag_changes_invalidate_cards(self):
+        before = self.card(self.post)
+
+        self.post.tags.remove(self.caching)
+        removed = self.card(self.post)
+        self.orm.posts.remove(self.post)
+        self.caching.posts.add(self.post)
+        added = self.card(self.post)
+        self.caching.color = '#0000ff'
+        self.caching.save()
+        recoloured = self.card(self.post)
+
+        self.assertEqual([tag.name for tag in removed.tags], ['ORM'])
+        self.assertEqual([tag.name for tag in added.tags], ['Caching'])
+        self.assertEqual(recoloured.tags[0].color, '#0000ff')
+        self.assertEqual(len({before.version, removed.version, added.version, recoloured.version}), 4)
+
+    def test_clearing_a_category_invalidates_cards(self):
+        self.card(self.post)
+
+        self.django.posts.clear()
+
+        self.assertEqual(self.card(self.post).category.name, 'Python')
+
+    def test_author_rename_invalidates_cards(self):
+        self.card(self.post)
+
+        self.author.first_name = 'Grace'
+        self.author.save()
+
+        self.assertEqual(self.card(self.post).author_name, 'Grace Lovelace')
+
+
+class PostCardViewsTest(PostCardTestCase):
+    """Test the pages and widgets rendering cards."""
+
+    def setUp(self):
+        super().setUp()
+        Post.objects.filter(pk=self.post.pk).update(is_featured=True)
+        for i in range(12):
+            self.create_post(f'Post {i}').tags.add(self.orm)
+
+    def list_queries(self, per_page):
+        cache.clear()
+        self.client.get(reverse('blog:list'), {'per_page': per_page})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('blog:list'), {'per_page': per_page})
+        return response, len(queries)
+
+    def test_blog_list_renders_cards(self):
+        response = self.client.get(reverse('blog:list'), {'per_page': 20})
+
+        self.assertContains(response, 'First Post')
+        self.assertContains(response, 'About Post 11')
+        self.assertContains(response, reverse('blog:list_by_tag', args=['caching']))
+        self.assertEqual(response.context['featured_posts'][0].id, self.post.id)
+
+    def test_blog_list_queries_dont_grow_with_page_size(self):
+        _, small_page = self.list_queries(5)
+        _, large_page = self.list_queries(20)
+
+        self.assertEqual(small_page, large_page)
+
+    def test_search_highlights_the_page(self):
+        response = self.client.get(reverse('blog:list'), {'q': 'caching'})
+
+        highlighted = response.context['search_highlighted_posts'][self.post.id]
+        self.assertIn('<mark class="search-highlight">Caching</mark>', highlighted['tags'][0]['name'])
+
+    def test_author_page_shows_comment_counts(self):
+        Comment.objects.create(
+            post=self.post, author_name='Reader', author_email='reader@example.com', ip_address='127.0.0.1',
+            content='Nice post', is_approved=True
+        )
+
+        response = self.client.get(reverse('blog:author_detail', args=['writer']), {'per_page': 20})
+
+        self.assertEqual(response.status_code, 200)
+        cards = {card.id: card for card in response.context['posts']}
+        self.assertEqual(cards[self.post.id].comment_count, 1)
+        self.assertContains(response, 'First Post')
+
+    def test_related_posts_are_cards(self):
+        related = ContentDiscoveryService.get_related_posts(self.post, limit=3)
+
+        self.assertEqual(len(related), 3)
+        self.assertTrue(all(card.tags for card in related))
+
+
+@skipUnless('POST_CARD_BENCHMARK_POSTS' in os.environ, 'Set POST_CARD_BENCHMARK_POSTS to run the benchmark')
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'post-card-tests',
+    }
+})
+class PostCardBenchmarkTest(TestCase):
+    """
+    Benchmark a list page of cards against full post rows.
+
+    Runs when POST_CARD_BENCHMARK_POSTS is set to the number of posts (for
+    example 500).
+    """
+
+    def setUp(self):
+        cache.clear()
+        author = User.objects.create_user(username='writer')
+        body = ('lorem ipsum ' * (BENCHMARK_BODY_BYTES // 12 + 1))[:BENCHMARK_BODY_BYTES]
+        Post.objects.bulk_create([
+            Post(title=f'Post {i}', slug=f'post-{i}', author=author, content=body, excerpt=f'Excerpt {i}',
+                 status='published', meta_data={'notes': body[:1024]})
+            for i in range(BENCHMARK_POSTS)
+        ], batch_size=100)
+        tags = Tag.objects.bulk_create([Tag(name=f'Tag {i}', slug=f'tag-{i}') for i in range(20)])
+        category = Category.objects.create(name='General', slug='general')
+        post_ids = list(Post.objects.values_list('id', flat=True))
+        Post.tags.through.objects.bulk_create([
+            Post.tags.through(post_id=post_id, tag_id=tags[(post_id + offset) % len(tags)].id)
+            for post_id in post_ids for offset in range(3)
+        ])
+        Post.categories.through.objects.bulk_create([
+            Post.categories.through(post_id=post_id, category_id=category.id) for post_id in post_ids
+        ])
+        # Saved posts have their social image manifests already
+        SocialImageService.refresh_posts(post_ids)
+
+    def page(self):
+        return Post.objects.filter(status='published').order_by('-created_at', '-id')[:BENCHMARK_PAGE_SIZE]
+
+    def full_rows(self):
+        # What the list page loaded before cards
+        posts = list(self.page().select_related('author').prefetch_related('categories', 'tags'))
+        return [(post.title, post.categories.first(), [tag.name for tag in post.tags.all()]) for post in posts]
+
+    def measure(self, function):
+        tracemalloc.start()
+        start_time = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            result = function()
+        elapsed = (time.perf_counter() - start_time) * 1000
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed, peak, len(queries), result
+
+    def test_benchmark(self):
+        runs = {
+            'full rows': self.full_rows,
+            'cards (cold)': lambda: PostCardService.cards(self.page()),
+            'cards (cached)': lambda: PostCardService.cards(self.page()),
+        }
+
+        print(f"\nPost Card Benchmark ({BENCHMARK_POSTS} posts, {BENCHMARK_BODY_BYTES // 1024} KB bodies, "
+              f"{BENCHMARK_PAGE_SIZE} per page):")
+        results = {}
+        for name, function in runs.items():
+            elapsed, peak, queries, result = self.measure(function)
+            results[name] = peak
+            print(f"  {name:<16} {elapsed:8.2f}ms {peak / 1024:10.1f} KB peak {queries:4d} queries")
+            self.assertEqual(len(result), min(BENCHMARK_POSTS, BENCHMARK_PAGE_SIZE))
+
+        self.assertLess(results['cards (cold)'], results['full rows'])
+        self.assertLess(results['cards (cached)'], results['full rows'])
@@ -0,0 +1,241 @@
+"""
+Tests for the precompiled JSON-LD schema bundle.
+
+Covers bundle contents, serving from a single cache read without
+re-validation, content-version keying that ignores counters, invalidation
+from related data, warming on publish, and a benchmark of detail-page
+template render time with and without the bundle.
+"""
+
+import json
+import os
+import re
+import statistics
+import time
+from datetime import timedelta
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from blog.models import AuthorProfile, Category, MediaItem, Post, Tag
+from blog.performance import ViewCountOptimizer
+from blog.services.schema_bundle_service import SchemaBundleService
+from blog.services.schema_service import SchemaService
+
+
+BENCHMARK_RENDERS = int(os.environ.get('SCHEMA_BUNDLE_BENCHMARK_RENDERS', 30))
+
+SCRIPT_RE = re.compile(r'<script type="application/ld\+json">(.*?)</script>', re.S)
+
+
+# The query count assertions need caches that don't read the database, and
+# the repo settings only define a default Redis or database cache
+TEST_CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'schema-bundle-{alias}'}
+    for alias in ('default', 'schema_cache', 'template_cache')
+}
+
+
+@override_settings(SITE_DOMAIN='https://example.com', CACHES=TEST_CACHES)
+class SchemaBundleTestCase(TestCase):
+    """Shared fixtures for schema bundle tests."""
+
+    def setUp(self):
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+        self.user = User.objects.create_user(
+            username='writer', password='testpass123', first_name='Ada', last_name='Writer'
+        )
+        AuthorProfile.objects.create(user=self.user, bio='Writes about Python', twitter='@writer')
+        self.category = Category.objects.create(name='Python', slug='python')
+        self.tag = Tag.objects.create(name='Caching', slug='caching')
+        self.post = Post.objects.create(
+            title='Bundled Post',
+            slug='bundled-post',
+            author=self.user,
+            content='<p>' + 'Schema words here. ' * 50 + '</p>',
+            excerpt='A post about bundles',
+            status='published',
+        )
+        self.post.categories.add(self.category)
+        self.post.tags.add(self.tag)
+        SchemaBundleService._cache().clear()
+
+    def fresh_post(self):
+        return Post.objects.get(pk=self.post.pk)
+
+    def schemas(self, payload):
+        return [json.loads(block) for block in SCRIPT_RE.findall(payload.decode('utf-8'))]
+
+
+class SchemaBundleContentTest(SchemaBundleTestCase):
+    """Test what the compiled bundle contains."""
+
+    def test_bundle_holds_article_and_breadcrumb(self):
+        article, breadcrumb = self.schemas(SchemaBundleService.get_bundle(self.fresh_post()))
+
+        self.assertEqual(article['@type'], 'Article')
+        self.assertEqual(article['url'], 'https://example.com/blog/bundled-post/')
+        self.assertEqual(article['author']['name'], 'Ada Writer')
+        self.assertEqual(article['publisher']['@type'], 'Organization')
+        self.assertEqual(article['articleSection'], ['Python'])
+        self.assertEqual(article['keywords'], ['Caching'])
+        self.assertEqual(breadcrumb['@type'], 'BreadcrumbList')
+        self.assertEqual(breadcrumb['itemListElement'][-1]['item'], article['url'])
+
+    def test_script_breakout_is_escaped(self):
+        self.post.title = 'Closing </script><script>alert(1)</script> & more'
+        self.post.save()
+
+        payload = SchemaBundleService.get_bundle(self.fresh_post()).decode('utf-8')
+
+        self.assertNotIn('</script><script>', payload)
+        self.assertEqual(self.schemas(payload.encode('utf-8'))[0]['headline'], self.post.title)
+
+    def test_detail_page_renders_bundle(self):
+        response = self.client.get(reverse('blog:detail', kwargs={'slug': self.post.slug}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, SchemaBundleService.get_bundle(self.fresh_post()).decode('utf-8'), html=False)
+
+
+class SchemaBundleCachingTest(SchemaBundleTestCase):
+    """Test serving and keying of stored bundles."""
+
+    def test_hit_uses_no_queries_and_skips_validation(self):
+        SchemaBundleService.get_bundle(self.fresh_post())
+        post = self.fresh_post()
+
+        with patch.object(SchemaService, 'validate_schema') as validate, self.assertNumQueries(0):
+            SchemaBundleService.get_bundle(post)
+
+        validate.assert_not_called()
+
+    def test_hit_is_a_single_cache_read(self):
+        SchemaBundleService.get_bundle(self.fresh_post())
+        post = self.fresh_post()
+        cache = SchemaBundleService._cache()
+
+        with patch.object(cache, 'get', wraps=cache.get) as cache_get:
+            SchemaBundleService.get_bundle(post)
+
+        self.assertEqual(cache_get.call_count, 1)
+
+    def test_counter_updates_keep_the_bundle(self):
+        SchemaBundleService.get_bundle(self.fresh_post())
+        # Ten views trigger a flush to the database
+        for _ in range(10):
+            ViewCountOptimizer.increment_view_count(self.post.pk)
+        Post.objects.filter(pk=self.post.pk).update(
+            view_count=500, updated_at=self.post.updated_at + timedelta(minutes=5)
+        )
+
+        with patch.object(SchemaBundleService, 'compile') as compile_bundle:
+            SchemaBundleService.get_bundle(self.fresh_post())
+
+        compile_bundle.assert_not_called()
+
+    def test_content_change_rebuilds(self):
+        SchemaBundleService.get_bundle(self.fresh_post())
+
+        self.post.title = 'Renamed Post'
+        self.post.save()
+
+        article = self.schemas(SchemaBundleService.get_bundle(self.fresh_post()))[0]
+        self.assertEqual(article['headline'], 'Renamed Post')
+
+    def test_related_changes_invalidate(self):
+        SchemaBundleService.get_bundle(self.fresh_post())
+        self.post.tags.add(Tag.objects.create(name='Django', slug='django'))
+        self.assertEqual(self.schemas(SchemaBundleService.get_bundle(self.fresh_post()))[0]['keywords'], ['Caching', 'Django'])
+
+        self.category.name = 'Python 3'
+        self.category.save()
+        self.assertEqual(self.schemas(SchemaBundleService.get_bundle(self.fresh_post()))[0]['articleSection'], ['Python 3'])
+
+        profile = self.user.author_profile
+        profile.bio = 'Now writes about Django'
+        profile.save()
+        article = self.schemas(SchemaBundleService.get_bundle(self.fresh_post()))[0]
+        self.assertEqual(article['author']['description'], 'Now writes about Django')
+
+        MediaItem.objects.create(post=self.post, media_type='video', title='Demo', video_url='https://youtu.be/demo')
+        self.assertIsNone(SchemaBundleService._cache().get(SchemaBundleService.cache_key(self.post.pk)))
+
+    def test_publishing_warms_the_bundle(self):
+        draft = Post.objects.create(title='Draft Post', slug='draft-post', author=self.user, content='Draft', status='draft')
+        key = SchemaBundleService.cache_key(draft.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            draft.save()
+        self.assertIsNone(SchemaBundleService._cache().get(key))
+
+        draft.status = 'published'
+        with self.captureOnCommitCallbacks(execute=True):
+            draft.save()
+
+        version, payload = SchemaBundleService._cache().get(key)
+        self.assertEqual(version, SchemaBundleService.content_version(Post.objects.get(pk=draft.pk)))
+        self.assertIn('"headline": "Draft Post"'.encode('utf-8'), payload)
+
+
+@skipUnless(
+    'SCHEMA_BUNDLE_BENCHMARK_RENDERS' in os.environ,
+    'Set SCHEMA_BUNDLE_BENCHMARK_RENDERS to run the benchmark'
+)
+class SchemaBundleBenchmarkTest(SchemaBundleTestCase):
+    """
+    Benchmark detail-page template render time with and without the bundle.
+
+    Runs when SCHEMA_BUNDLE_BENCHMARK_RENDERS is set to the number of
+    renders timed per template (for example 30).
+    """
+
+    # The detail page as it was before the bundle: separate cached schema
+    # lookups behind a fragment cache keyed on updated_at
+    WITHOUT_BUNDLE = (
+        '{% extends "blog/blog_detail.html" %}{% load schema_tags cache media_tags %}'
+        '{% block meta_data %}{% render_social_meta_tags post request %}'
+        '{% cache 1800 schema_markup post.id post.updated_at %}{% render_article_schema post %}{% endcache %}'
+        '{% endblock meta_data %}'
+    )
+    WITH_BUNDLE = '{% extends "blog/blog_detail.html" %}'
+
+    def detail_context(self):
+        response = self.client.get(reverse('blog:detail', kwargs={'slug': self.post.slug}))
+        keys = [
+            'post', 'author_profile', 'related_posts', 'comment_threads', 'comment_form', 'share_urls',
+            'share_counts', 'total_shares', 'title', 'meta_data', 'meta_details', 'toc_data',
+            'media_items', 'featured_media', 'post_images', 'post_videos', 'post_galleries',
+        ]
+        context = {key: response.context[key] for key in keys}
+        context['request'] = RequestFactory().get(self.post.get_absolute_url())
+        return context
+
+    def time_renders(self, source, context, iterations=BENCHMARK_RENDERS):
+        template = Template(source)
+        post = context['post']
+        times = []
+        for _ in range(iterations):
+            # Each render follows a view count flush that touched updated_at
+            post.updated_at += timedelta(seconds=1)
+            start_time = time.perf_counter()
+            template.render(Context(context))
+            times.append((time.perf_counter() - start_time) * 1000)
+        return statistics.median(times)
+
+    def test_detail_render_benchmark(self):
+        context = self.detail_context()
+
+        without_bundle = self.time_renders(self.WITHOUT_BUNDLE, context)
+        with_bundle = self.time_renders(self.WITH_BUNDLE, context)
+
+        print(f"\nDetail Page Render Benchmark (median of {BENCHMARK_RENDERS}, updated_at changing per render):")
+        print(f"  Without bundle: {without_bundle:.2f}ms")
+        print(f"  With bundle:    {with_bundle:.2f}ms")
+        self.assertLess(with_bundle, without_bundle)
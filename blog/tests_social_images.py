@@ -0,0 +1,205 @@
+"""
+Tests for the precomputed social sharing images.
+
+Covers building the manifest, keeping it current when a post or its media
+change, the selection rules read from it and the queries saved on list
+and detail pages.
+"""
+
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from PIL import Image
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.models import MediaItem, Post
+from blog.services.linkedin_image_service import LinkedInImageService
+from blog.services.schema_service import SchemaService
+from blog.services.social_image_service import SocialImageService
+
+
+def image_file(name, size=(1200, 630), image_format='JPEG'):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'navy').save(buffer, format=image_format)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=f"image/{image_format.lower()}")
+
+
+def media_queries(queries):
+    return [query['sql'] for query in queries if 'blog_mediaitem' in query['sql']]
+
+
+class SocialImageTestCase(TestCase):
+    """Shared fixtures with a temporary media root."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.author = User.objects.create_user(username='writer', password='testpass123')
+        self.post = Post.objects.create(
+            title='Sharing Test', slug='sharing-test', author=self.author,
+            content='<p>Body</p>', status='published',
+        )
+
+    def add_media(self, post=None, **kwargs):
+        fields = {'media_type': 'image', 'original_image': image_file('original.jpg', (1600, 900))}
+        fields.update(kwargs)
+        return MediaItem.objects.create(post=post or self.post, **fields)
+
+
+class SocialImageManifestTest(SocialImageTestCase):
+    """Test building and refreshing the manifest."""
+
+    def test_manifest_is_built_on_create(self):
+        self.assertEqual(self.post.social_images['version'], SocialImageService.MANIFEST_VERSION)
+        self.assertIsNone(self.post.get_social_image())
+
+    def test_social_image_is_preferred(self):
+        self.post.featured_image = image_file('featured.jpg')
+        self.post.social_image = image_file('social.png', (1200, 627), 'PNG')
+        self.post.save()
+
+        image = Post.objects.get(pk=self.post.pk).get_social_image()
+
+        self.assertIn('social', image['url'])
+        self.assertEqual((image['width'], image['height'], image['type']), (1200, 627, 'image/png'))
+        self.assertEqual(image['alt'], 'Featured image for: Sharing Test')
+
+    def test_media_changes_refresh_the_manifest(self):
+        first = self.add_media(alt_text='First image')
+        featured = self.add_media(large_image=image_file('large.jpg', (1200, 640)), is_featured=True, order=1)
+
+        post = Post.objects.get(pk=self.post.pk)
+        image = post.get_social_image()
+        self.assertIn('large', image['url'])
+        self.assertEqual(image['alt'], 'First image')
+
+        featured.delete()
+        image = Post.objects.get(pk=self.post.pk).get_social_image()
+        self.assertEqual(image['url'], first.original_image.url)
+
+    def test_held_post_is_kept_current(self):
+        self.add_media()
+
+        self.assertIsNotNone(self.post.get_social_image())
+
+    def test_missing_manifest_is_resolved_without_writing(self):
+        self.add_media()
+        Post.objects.filter(pk=self.post.pk).update(social_images={})
+        post = Post.objects.get(pk=self.post.pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            image = post.get_social_image()
+            post.get_social_image()
+
+        self.assertIsNotNone(image)
+        self.assertEqual(len(media_queries(queries)), 1)
+        self.assertFalse([query for query in queries if query['sql'].startswith('UPDATE')])
+        self.assertEqual(Post.objects.get(pk=self.post.pk).social_images, {})
+
+    def test_command_fills_missing_manifests(self):
+        self.add_media()
+        Post.objects.filter(pk=self.post.pk).update(social_images={})
+
+        out = StringIO()
+        call_command('refresh_social_images', stdout=out)
+
+        self.assertIn('for 1 posts', out.getvalue())
+        self.assertIsNotNone(Post.objects.get(pk=self.post.pk).social_images['best'])
+        self.assertFalse(SocialImageService.stale_posts().exists())
+
+    def test_unrelated_saves_keep_the_manifest(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.post.title = 'Renamed'
+            self.post.save()
+
+        self.assertEqual(media_queries(queries), [])
+
+    def test_reordering_media_refreshes_the_manifest(self):
+        first = self.add_media()
+        second = self.add_media(original_image=image_file('second.jpg'), order=1)
+        self.client.force_login(self.author)
+
+        self.client.post(
+            reverse('blog:update_media_order', args=[self.post.id]),
+            data=f'[{{"id": {first.id}, "order": 2}}, {{"id": {second.id}, "order": 0}}]',
+            content_type='application/json',
+        )
+
+        image = Post.objects.get(pk=self.post.pk).get_social_image()
+        self.assertEqual(image['url'], second.original_image.url)
+
+
+class SocialImageSelectionTest(SocialImageTestCase):
+    """Test the consumers reading the manifest."""
+
+    def setUp(self):
+        super().setUp()
+        self.post.featured_image = image_file('featured.jpg')
+        self.post.save()
+        self.add_media(large_image=image_file('linkedin.jpg', (1200, 627)), is_featured=True)
+        self.add_media(original_image=image_file('second.jpg'), order=1)
+        self.post = Post.objects.get(pk=self.post.pk)
+
+    def test_social_meta_tags_do_not_query_media(self):
+        request = RequestFactory().get('/')
+        template = Template('{% load media_tags %}{% render_social_meta_tags post request %}')
+
+        with CaptureQueriesContext(connection) as queries:
+            html = template.render(Context({'post': self.post, 'request': request}))
+
+        self.assertEqual(media_queries(queries), [])
+        self.assertIn('featured', html)
+        self.assertIn('linkedin', html)
+        self.assertIn('<meta property="og:image:width" content="1200">', html)
+
+    def test_linkedin_prefers_originals(self):
+        self.post.featured_image = None
+        self.post.save()
+
+        with CaptureQueriesContext(connection) as queries:
+            image_url = LinkedInImageService.get_post_image(self.post)
+            fallbacks = LinkedInImageService.get_fallback_images(self.post)
+
+        self.assertEqual(media_queries(queries), [])
+        self.assertIn('original', image_url)
+        self.assertEqual(len(fallbacks), 2)
+
+    def test_schema_images_do_not_query_media(self):
+        with CaptureQueriesContext(connection) as queries:
+            images = SchemaService._get_post_images(self.post)
+
+        self.assertEqual(media_queries(queries), [])
+        self.assertEqual(len(images), 3)
+        self.assertIn('featured', images[0])
+
+
+class SocialImageListPageTest(SocialImageTestCase):
+    """Test the card images of the blog list."""
+
+    def test_twenty_cards_do_not_query_media(self):
+        for i in range(20):
+            post = Post.objects.create(
+                title=f'Card {i}', slug=f'card-{i}', author=self.author, content='<p>Body</p>',
+                status='published',
+            )
+            self.add_media(post=post, original_image=image_file(f'card-{i}.jpg'))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('blog:list'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(media_queries(queries), [])
+        self.assertContains(response, 'card-19')
+        print(f"\nBlog list with 20 cards: {len(queries)} queries, none for media items")
@@ -0,0 +1,194 @@
+"""
+Tests for the single-pass table of contents engine.
+
+Compares the streamed output, headings and section word counts against the
+BeautifulSoup implementation it replaces, on edge cases and generated
+markup, and benchmarks both on 1 KB, 100 KB and 2 MB posts.
+"""
+
+import os
+import random
+import time
+import tracemalloc
+from unittest import skipUnless
+
+from bs4 import BeautifulSoup
+from django.test import SimpleTestCase
+
+from blog.services.table_of_contents_service import TableOfContentsService
+from blog.utils.toc_stream import stream_toc
+
+
+def soup_toc(content, min_headings=TableOfContentsService.MIN_HEADINGS_FOR_TOC):
+    """The BeautifulSoup implementation, used as the reference."""
+    soup = BeautifulSoup(content, 'html.parser')
+    headings = TableOfContentsService.extract_headings(soup)
+    show_toc = len(headings) >= min_headings
+    output = TableOfContentsService.add_anchor_links(soup, headings) if show_toc else str(soup)
+
+    section_words = {}
+    for i, heading in enumerate(headings):
+        end_element = headings[i + 1]['element'] if i + 1 < len(headings) else None
+        text_parts = []
+        current = heading['element'].next_sibling
+        while current and current != end_element:
+            if hasattr(current, 'get_text'):
+                text_parts.append(current.get_text())
+            elif isinstance(current, str):
+                text_parts.append(current.strip())
+            current = current.next_sibling
+        section_words[heading['anchor']] = len(' '.join(text_parts).split())
+
+    return {
+        'content': output,
+        'headings': [{key: h[key] for key in ('text', 'level', 'anchor')} for h in headings],
+        'show_toc': show_toc,
+        'section_words': section_words if show_toc else None,
+    }
+
+
+def streamed_toc(content, min_headings=TableOfContentsService.MIN_HEADINGS_FOR_TOC):
+    result = stream_toc(content, min_headings, TableOfContentsService.generate_unique_anchor)
+    return {
+        'content': result.content,
+        'headings': result.headings,
+        'show_toc': result.show_toc,
+        # Section times were only taken from pages showing the TOC
+        'section_words': result.section_words if result.show_toc else None,
+    }
+
+
+def build_post(size, seed=0):
+    """Build a post body of roughly ``size`` bytes."""
+    rng = random.Random(seed)
+    words = ['python', 'django', 'cache', 'query', 'index', 'stream', 'parser', 'token', 'section']
+    blocks = []
+    length = 0
+    while length < size:
+        kind = rng.random() if blocks else 0
+        if kind < 0.25:
+            level = rng.choice([2, 3, 4])
+            block = f"<h{level}>{' '.join(rng.sample(words, 3)).title()}</h{level}>\n"
+        elif kind < 0.35:
+            block = '<pre><code>for item in items:\n    print(item &lt; 3)</code></pre>\n'
+        elif kind < 0.45:
+            block = '<ul>' + ''.join(f"<li>{rng.choice(words)} &amp; {rng.choice(words)}</li>" for _ in range(4)) + '</ul>\n'
+        else:
+            sentence = ' '.join(rng.choice(words) for _ in range(40))
+            block = f'<p class="lead  text">{sentence} <a href="/blog/?q=1&amp;p=2">link</a><br>{sentence}</p>\n'
+        blocks.append(block)
+        length += len(block)
+    return ''.join(blocks)
+
+
+class TocStreamParityTest(SimpleTestCase):
+    """Test that streaming matches the BeautifulSoup implementation."""
+
+    EDGE_CASES = [
+        '<h2>A</h2><p>one two</p><h2>B</h2>x y z<h3>C</h3><p>q</p>',
+        "<h1>Title &amp; more</h1><p class='  a   b '>x&nbsp;y &copy; &#169; &#x41; &#150; &bogus; &#0;</p><h2>T</h2><h2>T</h2>",
+        (
+            "<!DOCTYPE html><html><head><meta charset='latin-1'>"
+            "<meta http-equiv='Content-Type' content='text/html; charset=latin-1'>"
+            "<style>a>b{}</style><script>if(a<b&&c)</script></head><body><h2>One</h2><br>"
+            "<img src=x alt=\"a'b\"><input value='a\"b'><p title='x\"y&apos;z'>t</p><h2>Two</h2>"
+            "<!-- c --><![CDATA[cd]]><?php x ?><h2>Three</h2></body></html>"
+        ),
+        '<div><h2>A</h2><p>w1 w2</p><div><h3>B</h3>inner</div><p>after</p></div><h2>C</h2>tail words here',
+        '<h2>Outer <h3>Inner</h3> rest</h2><p>para</p><h2>Next</h2><p>last</p>',
+        '<h2>X</h2>   \n  <p>a</p>\t<pre>  \n </pre><textarea>  </textarea><h2>Y</h2><h2></h2><h2>  </h2><h2>Z</h2>',
+        '<p>unclosed <b>bold <i>it</p> more</b></i><h2>A</h2><h2>B</h2><h2>C</h2></div></span>',
+        '<br></br><br/><p/><div/><h2>A<br>b</h2><h2>C</h2><h2>D</h2>',
+        '<template><h2>T</h2></template><h2>A</h2><ruby>x<rt>y</rt></ruby><h2>B</h2><h2>C</h2>',
+        '<ul><li><h3>L1</h3>text1</li><li><h3>L2</h3>text2</li></ul><h2>After</h2>foo',
+        '<h2>A</h2>pre <div> <h3>lead</h3> b</div><h2>B</h2>c',
+        "<h2 id='old' class='x'>Has id</h2><h2 data-x=1 ID=2>Two</h2><h2>Three</h2>",
+        '<h2>Über Café</h2><h2>日本語</h2><h2>!!!</h2><h2>!!!</h2>',
+        '<h2>A</h2><h2><script>x</script></h2><h2>B</h2><h2>C</h2>',
+        '<h3> y</h3><b id=q><h3 id=q><h2 class=" a  b">\n#',
+        'text < not tag & amp <h2>A</h2> <h2>B</h2> <h2>C</h2> <',
+    ]
+
+    def assertMatchesSoup(self, content, min_headings=3):
+        self.assertEqual(streamed_toc(content, min_headings), soup_toc(content, min_headings), content)
+
+    def test_edge_cases(self):
+        for content in self.EDGE_CASES:
+            for min_headings in (1, 3):
+                with self.subTest(content=content, min_headings=min_headings):
+                    self.assertMatchesSoup(content, min_headings)
+
+    def test_generated_markup(self):
+        rng = random.Random(37)
+        tags = ['h2', 'h3', 'p', 'div', 'span', 'b', 'br', 'img', 'pre', 'script', 'template', 'li', 'ul', 'rt']
+        attributes = ['', ' class=" a  b"', ' id=q']
+        texts = ['word ', ' two words ', 'x', '  ', '\n', '&amp;', '&lt;', '#', '<!--c-->', '&#150;', '<![CDATA[z]]>']
+        for _ in range(500):
+            parts = []
+            for _ in range(rng.randint(1, 40)):
+                roll = rng.random()
+                tag = rng.choice(tags)
+                if roll < 0.35:
+                    parts.append(f"<{tag}{rng.choice(attributes)}>")
+                elif roll < 0.55:
+                    parts.append(f"</{tag}>")
+                elif roll < 0.6:
+                    parts.append(f"<{tag}/>")
+                else:
+                    parts.append(rng.choice(texts))
+            content = ''.join(parts)
+            for min_headings in (1, 3):
+                self.assertMatchesSoup(content, min_headings)
+
+    def test_long_post(self):
+        self.assertMatchesSoup(build_post(100 * 1024))
+
+    def test_template_data_uses_one_pass(self):
+        content = build_post(8 * 1024, seed=1)
+        post = type('Post', (), {'table_of_contents': True, 'content': content})()
+        reference = soup_toc(content)
+
+        toc_data = TableOfContentsService.generate_toc_data_for_template(post)
+
+        self.assertEqual(toc_data['content'], reference['content'])
+        self.assertEqual(toc_data['section_reading_times'], {
+            anchor: max(1, round(words / TableOfContentsService.WORDS_PER_MINUTE))
+            for anchor, words in reference['section_words'].items()
+        })
+        self.assertEqual(
+            [heading['reading_time'] for heading in toc_data['headings']],
+            list(toc_data['section_reading_times'].values())
+        )
+
+
+@skipUnless('TOC_STREAM_BENCHMARK' in os.environ, 'Set TOC_STREAM_BENCHMARK to run the benchmark')
+class TocStreamBenchmarkTest(SimpleTestCase):
+    """
+    Benchmark streaming against BeautifulSoup on posts of different sizes.
+
+    Runs when TOC_STREAM_BENCHMARK is set.
+    """
+
+    SIZES = [('1 KB', 1024, 50), ('100 KB', 100 * 1024, 5), ('2 MB', 2 * 1024 * 1024, 1)]
+
+    def measure(self, function, content, iterations):
+        tracemalloc.start()
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            function(content)
+        elapsed = (time.perf_counter() - start_time) * 1000 / iterations
+        peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+        return elapsed, peak
+
+    def test_benchmark(self):
+        print("\nTable of Contents Benchmark (headings, anchors and section words):")
+        for label, size, iterations in self.SIZES:
+            content = build_post(size)
+            soup_time, soup_peak = self.measure(soup_toc, content, iterations)
+            stream_time, stream_peak = self.measure(streamed_toc, content, iterations)
+
+            print(f"  {label}: BeautifulSoup {soup_time:.2f}ms / {soup_peak:.1f}MB peak, "
+                  f"streaming {stream_time:.2f}ms / {stream_peak:.1f}MB peak")
+            self.assertLess(stream_time, soup_time)
+            self.assertLess(stream_peak, soup_peak)
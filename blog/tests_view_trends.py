@@ -0,0 +1,280 @@
+"""
+Tests for time-bucketed view tracking.
+
+Covers the hourly counters, flushing buffered views of quiet posts, daily
+and weekly series, most viewed posts per period, period-over-period
+changes, folding old days into weeks and a benchmark of write throughput
+and query latency.
+"""
+
+import os
+import random
+import time
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from blog.models import Comment, DailyEngagement, Post
+from blog.performance import ViewCountOptimizer
+from blog.services.content_discovery_service import ContentDiscoveryService
+from blog.services.engagement_warehouse_service import EngagementWarehouseService
+from blog.services.view_trends_service import ViewTrendsService
+from core.views import dashboard_callback
+
+
+BENCHMARK_POSTS = int(os.environ.get('VIEW_TRENDS_BENCHMARK_POSTS', 2000))
+BENCHMARK_DAYS = 90
+BENCHMARK_DAILY_VIEWS = 10_000_000
+
+
+class ViewTrendsTestCase(TestCase):
+    """Shared fixtures for view trends tests."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='writer', password='testpass123', is_staff=True)
+        self.today = timezone.localdate()
+        self.old_post = self.create_post('Old Post', created_days_ago=400)
+        self.new_post = self.create_post('New Post')
+
+    def create_post(self, title, status='published', created_days_ago=0):
+        post = Post.objects.create(
+            title=title, slug=title.lower().replace(' ', '-'), author=self.author, content='Body', status=status
+        )
+        if created_days_ago:
+            Post.objects.filter(pk=post.pk).update(created_at=timezone.now() - timedelta(days=created_days_ago))
+        return post
+
+    def views(self, post, days_ago, views):
+        EngagementWarehouseService.record_views(post.id, views, day=self.today - timedelta(days=days_ago))
+
+
+class ViewBufferTest(ViewTrendsTestCase):
+    """Test recording views."""
+
+    def test_views_are_counted_per_hour(self):
+        for _ in range(3):
+            ViewCountOptimizer.increment_view_count(self.new_post.id)
+        ViewCountOptimizer.increment_view_count(self.old_post.id)
+
+        self.assertEqual(ViewTrendsService.hourly_series(self.new_post.id, hours=2)[-1][1], 3)
+        self.assertEqual(ViewTrendsService.hourly_series(hours=2)[-1][1], 4)
+        self.assertEqual(ViewTrendsService.hourly_series(hours=2)[0][1], 0)
+
+    def test_quiet_posts_are_flushed(self):
+        for _ in range(3):
+            ViewCountOptimizer.increment_view_count(self.new_post.id)
+        ViewCountOptimizer.increment_view_count(self.old_post.id)
+
+        self.assertEqual(ViewCountOptimizer.flush_all_view_counts(), 2)
+
+        self.assertEqual(Post.objects.get(pk=self.new_post.pk).view_count, 3)
+        self.assertEqual(DailyEngagement.objects.get(post=self.new_post, day=self.today).views, 3)
+        self.assertEqual(ViewCountOptimizer.flush_all_view_counts(), 0)
+
+        ViewCountOptimizer.increment_view_count(self.new_post.id)
+        self.assertEqual(ViewCountOptimizer.flush_all_view_counts(), 1)
+        self.assertEqual(Post.objects.get(pk=self.new_post.pk).view_count, 4)
+
+    def test_threshold_flush_keeps_later_views(self):
+        for _ in range(12):
+            ViewCountOptimizer.increment_view_count(self.new_post.id)
+
+        ViewCountOptimizer.flush_all_view_counts()
+
+        self.assertEqual(Post.objects.get(pk=self.new_post.pk).view_count, 12)
+
+    def test_views_past_the_threshold_do_not_flush_again(self):
+        for _ in range(12):
+            ViewCountOptimizer.increment_view_count(self.new_post.id)
+
+        self.assertEqual(Post.objects.get(pk=self.new_post.pk).view_count, 10)
+        self.assertEqual(cache.get(f"{ViewCountOptimizer.BUFFER_PREFIX}:{self.new_post.id}"), 2)
+
+    def test_concurrent_flush_is_skipped(self):
+        for _ in range(3):
+            ViewCountOptimizer.increment_view_count(self.new_post.id)
+        lock_key = f"{ViewCountOptimizer.BUFFER_PREFIX}:flush_lock:{self.new_post.id}"
+        cache.add(lock_key, 1)
+
+        ViewCountOptimizer.flush_all_view_counts()
+        self.assertEqual(Post.objects.get(pk=self.new_post.pk).view_count, 0)
+
+        cache.delete(lock_key)
+        ViewCountOptimizer._flush_view_count(self.new_post.id)
+        self.assertEqual(Post.objects.get(pk=self.new_post.pk).view_count, 3)
+        self.assertEqual(DailyEngagement.objects.get(post=self.new_post, day=self.today).views, 3)
+
+
+class ViewQueriesTest(ViewTrendsTestCase):
+    """Test the view trend queries."""
+
+    def setUp(self):
+        super().setUp()
+        self.draft = self.create_post('Draft Post', status='draft')
+        self.views(self.old_post, 0, 5)
+        self.views(self.old_post, 3, 10)
+        self.views(self.old_post, 20, 500)
+        self.views(self.new_post, 1, 40)
+        self.views(self.draft, 0, 1000)
+
+    def test_most_viewed_uses_the_period(self):
+        week = ViewTrendsService.most_viewed(days=7)
+        month = ViewTrendsService.most_viewed(days=30)
+
+        self.assertEqual([(post.title, post.recent_views) for post in week], [('New Post', 40), ('Old Post', 15)])
+        self.assertEqual([post.title for post in month], ['Old Post', 'New Post'])
+
+    def test_popular_posts_rank_by_views_in_timeframe(self):
+        popular = ContentDiscoveryService.get_popular_posts(timeframe='week', limit=5)
+
+        # Posts created long ago count by their views this week
+        self.assertEqual([post.title for post in popular], ['New Post', 'Old Post'])
+
+    def test_daily_series(self):
+        series = ViewTrendsService.daily_series(self.old_post.id, days=4)
+
+        self.assertEqual([views for _, views in series], [10, 0, 0, 5])
+        self.assertEqual(series[-1][0], self.today)
+
+    def test_weekly_series(self):
+        series = ViewTrendsService.weekly_series(self.old_post.id, weeks=5)
+
+        self.assertEqual(len(series), 5)
+        self.assertEqual(sum(views for _, views in series), 515)
+        self.assertEqual(series[-1][0].weekday(), 0)
+
+    def test_period_views(self):
+        self.views(self.new_post, 40, 100)
+
+        self.assertEqual(ViewTrendsService.period_views(days=30), (1555, 100))
+        self.assertEqual(ViewTrendsService.period_views(days=30, post_id=self.new_post.id), (40, 100))
+
+    def test_dashboard_views_change(self):
+        self.views(self.new_post, 40, 1555)
+        request = RequestFactory().get('/')
+        request.user = self.author
+
+        context = dashboard_callback(request, {})
+
+        views_metric = next(metric for metric in context['metrics'] if metric['icon'] == 'visibility')
+        self.assertEqual(views_metric['change'], 0.0)
+        self.assertEqual(context['views_trend']['values'][-1], 1005)
+
+
+class RetentionTest(ViewTrendsTestCase):
+    """Test folding old days into weekly rows."""
+
+    def test_old_days_are_folded_into_weeks(self):
+        old_day = self.today - timedelta(days=EngagementWarehouseService.DAILY_RETENTION_DAYS + 10)
+        monday = old_day - timedelta(days=old_day.weekday())
+        for offset in range(7):
+            EngagementWarehouseService.record_views(self.old_post.id, 10, day=monday + timedelta(days=offset))
+        self.views(self.old_post, 1, 3)
+
+        summary = EngagementWarehouseService.compact()
+
+        # Six post rows and six site rows
+        self.assertEqual(summary['folded'], 12)
+        self.assertEqual(DailyEngagement.objects.get(post=self.old_post, day=monday).views, 70)
+        self.assertEqual(DailyEngagement.objects.get(post__isnull=True, day=monday).views, 70)
+        self.assertEqual(DailyEngagement.objects.filter(post=self.old_post).count(), 2)
+        self.assertEqual(EngagementWarehouseService.build_rollups()['total_views'], 73)
+
+    def test_site_views_are_reconciled(self):
+        DailyEngagement.objects.create(post=self.new_post, day=self.today, views=7)
+        self.views(self.old_post, 0, 3)
+
+        self.assertEqual(EngagementWarehouseService.reconcile_site_views(), 1)
+        self.assertEqual(ViewTrendsService.daily_series(days=1), [(self.today, 10)])
+        self.assertEqual(EngagementWarehouseService.reconcile_site_views(), 0)
+
+    def test_old_comments_are_recounted_into_weeks(self):
+        old_time = timezone.now() - timedelta(days=EngagementWarehouseService.DAILY_RETENTION_DAYS + 10)
+        for _ in range(2):
+            comment = Comment.objects.create(
+                post=self.old_post, author_name='Reader', author_email='reader@example.com',
+                content='Old comment', ip_address='127.0.0.1', is_approved=True
+            )
+            Comment.objects.filter(pk=comment.pk).update(created_at=old_time)
+
+        EngagementWarehouseService.compact(full=True)
+        EngagementWarehouseService.compact(full=True)
+
+        old_day = timezone.localdate(old_time)
+        facts = DailyEngagement.objects.get(post=self.old_post, day=old_day - timedelta(days=old_day.weekday()))
+        self.assertEqual(facts.comments, 2)
+        self.assertEqual(EngagementWarehouseService.build_rollups()['total_comments'], 2)
+
+
+@skipUnless('VIEW_TRENDS_BENCHMARK_POSTS' in os.environ, 'Set VIEW_TRENDS_BENCHMARK_POSTS to run the benchmark')
+class ViewTrendsBenchmarkTest(TestCase):
+    """
+    Benchmark view writes and trend queries at 10M views a day.
+
+    Runs when VIEW_TRENDS_BENCHMARK_POSTS is set to the number of posts
+    with daily view rows (for example 20000).
+    """
+
+    WRITES = 20000
+
+    def setUp(self):
+        cache.clear()
+        rng = random.Random(42)
+        author = User.objects.create_user(username='writer')
+        Post.objects.bulk_create([
+            Post(title=f'Post {i}', slug=f'post-{i}', author=author, content='Body', status='published')
+            for i in range(BENCHMARK_POSTS)
+        ], batch_size=1000)
+        self.post_ids = list(Post.objects.values_list('id', flat=True))
+        today = timezone.localdate()
+        mean_views = BENCHMARK_DAILY_VIEWS // BENCHMARK_POSTS
+        for offset in range(BENCHMARK_DAYS):
+            DailyEngagement.objects.bulk_create([
+                DailyEngagement(post_id=post_id, scope=post_id, day=today - timedelta(days=offset),
+                                views=rng.randrange(mean_views * 2))
+                for post_id in self.post_ids
+            ], batch_size=5000)
+        EngagementWarehouseService.reconcile_site_views()
+
+    def timed(self, function, repeat=5):
+        start_time = time.perf_counter()
+        for _ in range(repeat):
+            result = function()
+        return (time.perf_counter() - start_time) / repeat * 1000, result
+
+    def test_benchmark(self):
+        rng = random.Random(7)
+        start_time = time.perf_counter()
+        for _ in range(self.WRITES):
+            ViewCountOptimizer.increment_view_count(self.post_ids[rng.randrange(len(self.post_ids))])
+        ViewCountOptimizer.flush_all_view_counts()
+        write_rate = self.WRITES / (time.perf_counter() - start_time)
+
+        post_id = self.post_ids[0]
+        queries = {
+            'most_viewed(7)': lambda: ViewTrendsService.most_viewed(days=7, limit=10),
+            'most_viewed(30)': lambda: ViewTrendsService.most_viewed(days=30, limit=10),
+            'daily_series(post, 30)': lambda: ViewTrendsService.daily_series(post_id, days=30),
+            'daily_series(site, 30)': lambda: ViewTrendsService.daily_series(days=30),
+            'weekly_series(post, 12)': lambda: ViewTrendsService.weekly_series(post_id, weeks=12),
+            'period_views(site, 30)': lambda: ViewTrendsService.period_views(days=30),
+            'period_views(post, 30)': lambda: ViewTrendsService.period_views(days=30, post_id=post_id),
+            'hourly_series(site, 24)': lambda: ViewTrendsService.hourly_series(hours=24),
+        }
+
+        rows = BENCHMARK_POSTS * BENCHMARK_DAYS
+        print(f"\nView Trends Benchmark ({BENCHMARK_POSTS} posts x {BENCHMARK_DAYS} days = {rows} rows, "
+              f"{BENCHMARK_DAILY_VIEWS:,} views/day):")
+        print(f"  Buffered view writes: {write_rate:,.0f} views/s "
+              f"({BENCHMARK_DAILY_VIEWS / 86400:,.0f} views/s needed)")
+        for name, query in queries.items():
+            latency, result = self.timed(query)
+            print(f"  {name:<24} {latency:8.2f}ms")
+
+        self.assertEqual(len(ViewTrendsService.most_viewed(days=7, limit=10)), 10)
+        self.assertGreater(write_rate, BENCHMARK_DAILY_VIEWS / 86400)
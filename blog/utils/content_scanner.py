@@ -0,0 +1,278 @@
+"""
+Compiled single-pass scanner for user-generated content.
+
+The comment validator and the security middlewares used to keep their own
+pattern lists and each ran them one ``re.search``/``findall`` at a time, so a
+comment was lowercased, split and rescanned a dozen times per request. This
+module compiles every rule once and returns all findings from one scan:
+
+- Spam keywords (validator groups plus the middleware indicators) and the
+  literal malicious/URL rules ("javascript:", "bit.ly", ".tk", ...) are
+  compiled into two trie-shaped alternations, which the regex engine walks
+  like an Aho-Corasick automaton: one pass over the text each, every match
+  classified with a dict lookup. Both are matched inside a lookahead, so
+  overlapping occurrences are all found: "debt.com" is the keyword "debt"
+  and the shortener "t.co", "casino investment" holds "casino" and
+  "no investment".
+- The remaining pattern rules (script blocks, event handlers, embed tags,
+  IP addresses) each start with a literal or a small character class, so
+  each is compiled on its own to keep the engine's fast prefix search;
+  combining them into one alternation turns that search off and is slower.
+- Capitalisation and digit counts, punctuation runs and repetition stats
+  come from the same text, lowercased once and split once.
+
+Results are memoised per text, so the middleware and the validator share
+one scan of the same submission.
+"""
+
+import re
+import string
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, Tuple
+
+
+# Malicious markup/script rules, matched against lowercased text. Literal
+# rules are matched by the rule literal automaton, patterns by their own regex.
+MALICIOUS_LITERALS = (
+    ('javascript_url', ('javascript:',)),
+    ('vbscript_url', ('vbscript:',)),
+    ('data_html_url', ('data:text/html',)),
+)
+MALICIOUS_PATTERNS = (
+    ('script_block', r'<script[^>]*>.*?</script>'),
+    ('event_handler', r'on\w+\s*='),
+    ('iframe_tag', r'<iframe[^>]*>'),
+    ('object_tag', r'<object[^>]*>'),
+    ('embed_tag', r'<embed[^>]*>'),
+)
+MALICIOUS_RULE_ORDER = (
+    'script_block', 'javascript_url', 'vbscript_url', 'data_html_url',
+    'event_handler', 'iframe_tag', 'object_tag', 'embed_tag',
+)
+
+# Rules enforced on every submitted content field by ContentSecurityMiddleware
+REQUEST_RULES = frozenset({
+    'script_block', 'javascript_url', 'vbscript_url', 'data_html_url', 'event_handler',
+})
+
+# Spam keywords scored by the comment validator
+SPAM_KEYWORDS = (
+    'viagra', 'cialis', 'casino', 'poker', 'lottery',
+    'make money', 'earn $', 'get rich', 'work from home',
+    'click here', 'visit now', 'act now', 'limited time',
+    'free money', 'guaranteed income', 'no investment',
+    'weight loss', 'lose weight', 'diet pills',
+    'replica', 'rolex', 'designer', 'handbags',
+    'mortgage', 'refinance', 'credit repair', 'debt',
+    'pharmacy', 'prescription', 'medication',
+)
+
+# Indicators counted by CommentSpamProtectionMiddleware
+SPAM_INDICATORS = (
+    'viagra', 'cialis', 'casino', 'poker', 'lottery',
+    'make money', 'earn money', 'get rich', 'work from home',
+    'click here', 'visit now', 'act now', 'limited time',
+)
+
+SUSPICIOUS_URL_LITERALS = (
+    ('url_shortener', ('bit.ly', 'tinyurl', 't.co', 'goo.gl')),
+    ('local_address', ('localhost', '127.0.0.1')),
+    ('suspicious_tld', ('.tk', '.ml', '.ga', '.cf')),
+)
+SUSPICIOUS_URL_PATTERNS = (
+    ('ip_address', r'[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}'),
+)
+SUSPICIOUS_URL_RULE_ORDER = ('url_shortener', 'ip_address', 'local_address', 'suspicious_tld')
+
+# Spam score weights
+KEYWORD_WEIGHT = 0.3
+CAPS_WEIGHT = 0.4
+PUNCTUATION_WEIGHT = 0.2
+DIGIT_WEIGHT = 0.3
+CAPS_MIN_LENGTH = 20
+CAPS_RATIO_THRESHOLD = 0.5
+DIGIT_RATIO_THRESHOLD = 0.3
+
+# Repetition check
+REPETITION_MIN_WORDS = 5
+REPETITION_RATIO_THRESHOLD = 0.3
+
+
+def build_keyword_pattern(keywords: Iterable[str]) -> str:
+    """
+    Build a trie-shaped regex alternation for a set of literal keywords.
+
+    Shared prefixes are factored out ("c(?:asino|ialis|lick here)"), so the
+    engine tests each position against the trie instead of every keyword in
+    turn. At a given position the longest keyword wins; wrap the pattern in
+    a lookahead to find matches that overlap.
+
+    Args:
+        keywords: Literal keywords
+
+    Returns:
+        str: Regex pattern matching any of the keywords
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            return ('(?:' + body + ')' if len(branches) == 1 else body) + '?'
+        return body
+
+    return build(trie)
+
+
+@dataclass(frozen=True)
+class ScanResult:
+    """Findings and text statistics from one content scan."""
+
+    length: int
+    malicious: Tuple[str, ...] = ()
+    suspicious_urls: Tuple[str, ...] = ()
+    keywords: Dict[str, int] = field(default_factory=dict)
+    punctuation_runs: int = 0
+    upper_count: int = 0
+    digit_count: int = 0
+    word_count: int = 0
+    unique_word_count: int = 0
+
+    @property
+    def has_malicious(self) -> bool:
+        return bool(self.malicious)
+
+    @property
+    def has_suspicious_url(self) -> bool:
+        return bool(self.suspicious_urls)
+
+    @property
+    def spam_keyword_count(self) -> int:
+        """Number of spam keyword occurrences scored by the validator."""
+        return sum(count for keyword, count in self.keywords.items() if keyword in _SPAM_KEYWORD_SET)
+
+    @property
+    def spam_indicators(self) -> Tuple[str, ...]:
+        """Distinct middleware spam indicators found."""
+        return tuple(keyword for keyword in self.keywords if keyword in _SPAM_INDICATOR_SET)
+
+    @property
+    def spam_score(self) -> float:
+        """Spam probability score (0.0 to 1.0)."""
+        score = self.spam_keyword_count * KEYWORD_WEIGHT
+
+        if self.length > CAPS_MIN_LENGTH and self.upper_count / self.length > CAPS_RATIO_THRESHOLD:
+            score += CAPS_WEIGHT
+
+        score += self.punctuation_runs * PUNCTUATION_WEIGHT
+
+        if self.length and self.digit_count / self.length > DIGIT_RATIO_THRESHOLD:
+            score += DIGIT_WEIGHT
+
+        return min(score, 1.0)
+
+    @property
+    def repetition_ratio(self) -> float:
+        """Ratio of unique words to words (1.0 for empty text)."""
+        return self.unique_word_count / self.word_count if self.word_count else 1.0
+
+    @property
+    def is_repetitive(self) -> bool:
+        return self.word_count >= REPETITION_MIN_WORDS and self.repetition_ratio < REPETITION_RATIO_THRESHOLD
+
+
+_SPAM_KEYWORD_SET = frozenset(SPAM_KEYWORDS)
+_SPAM_INDICATOR_SET = frozenset(SPAM_INDICATORS)
+_ASCII_UPPER = string.ascii_uppercase.encode()
+_ASCII_DIGITS = string.digits.encode()
+
+
+class ContentScanner:
+    """
+    Content scanner with all rules compiled once.
+
+    Use the module-level ``content_scanner`` instance; ``scan()`` results are
+    memoised for the most recent texts.
+    """
+
+    CACHE_SIZE = 128
+
+    def __init__(self, cache_size: int = CACHE_SIZE):
+        # Spam keywords are counted, rule literals map to (category, rule)
+        self.keywords = frozenset(SPAM_KEYWORDS + SPAM_INDICATORS)
+        self.keyword_re = re.compile('(?=(' + build_keyword_pattern(self.keywords) + '))')
+        self.literals = {}
+        for category, rules in (('malicious', MALICIOUS_LITERALS), ('url', SUSPICIOUS_URL_LITERALS)):
+            for name, literals in rules:
+                for literal in literals:
+                    self.literals[literal] = (category, name)
+        self.literal_re = re.compile('(?=(' + build_keyword_pattern(self.literals) + '))')
+
+        self.malicious_patterns = [(name, re.compile(pattern, re.DOTALL)) for name, pattern in MALICIOUS_PATTERNS]
+        self.url_patterns = [(name, re.compile(pattern)) for name, pattern in SUSPICIOUS_URL_PATTERNS]
+        self.punctuation_re = re.compile(r'[!?]{2,}')
+        self.scan = lru_cache(maxsize=cache_size)(self.scan_uncached)
+
+    def scan_uncached(self, text: str) -> ScanResult:
+        """
+        Scan text for every rule and compute its statistics.
+
+        Args:
+            text: Content to scan
+
+        Returns:
+            ScanResult: All findings
+        """
+        if not text:
+            return ScanResult(length=0)
+
+        lowered = text.lower()
+
+        keywords = {}
+        for keyword in self.keyword_re.findall(lowered):
+            keywords[keyword] = keywords.get(keyword, 0) + 1
+
+        found = {'malicious': set(), 'url': set()}
+        for literal in set(self.literal_re.findall(lowered)):
+            category, name = self.literals[literal]
+            found[category].add(name)
+
+        for category, patterns in (('malicious', self.malicious_patterns), ('url', self.url_patterns)):
+            for name, pattern in patterns:
+                if pattern.search(lowered):
+                    found[category].add(name)
+
+        if text.isascii():
+            encoded = text.encode('ascii')
+            upper_count = len(encoded) - len(encoded.translate(None, _ASCII_UPPER))
+            digit_count = len(encoded) - len(encoded.translate(None, _ASCII_DIGITS))
+        else:
+            upper_count = sum(map(str.isupper, text))
+            digit_count = sum(map(str.isdecimal, text))
+
+        words = lowered.split()
+
+        return ScanResult(
+            length=len(text),
+            malicious=tuple(name for name in MALICIOUS_RULE_ORDER if name in found['malicious']),
+            suspicious_urls=tuple(name for name in SUSPICIOUS_URL_RULE_ORDER if name in found['url']),
+            keywords=keywords,
+            punctuation_runs=len(self.punctuation_re.findall(text)),
+            upper_count=upper_count,
+            digit_count=digit_count,
+            word_count=len(words),
+            unique_word_count=len(set(words)),
+        )
+
+
+# Shared scanner used by the comment validator and the security middlewares
+content_scanner = ContentScanner()
@@ -0,0 +1,112 @@
+"""
+Streaming JSON Lines files with optional compression.
+
+Backups and exports are written one JSON document per line, so neither side
+has to hold a whole data set in memory: writers append records as rows are
+read from the database, and readers yield records as lines are decompressed.
+
+The compression is chosen from the file name: ``.gz`` uses gzip and ``.zst``
+uses zstd through the optional ``zstandard`` package. Compressed streams may
+hold several concatenated gzip members or zstd frames.
+"""
+
+import gzip
+import io
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Iterator
+from uuid import UUID
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+COMPRESSION_SUFFIXES = {
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+
+def json_default(value: Any):
+    """Serialize values the json module doesn't know about."""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return str(value)
+
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=json_default)
+
+
+def encode_line(record) -> str:
+    """Encode one record as a line of compact JSON."""
+    return _encoder.encode(record) + '\n'
+
+
+def compression_for(path: str):
+    """
+    Get the compression used by a file from its name.
+
+    Args:
+        path: File path
+
+    Returns:
+        str: 'gzip', 'zstd' or None
+    """
+    for compression, suffix in COMPRESSION_SUFFIXES.items():
+        if path.endswith(suffix):
+            return compression
+    return None
+
+
+def open_jsonl(path: str, mode: str = 'r', compression_level: int = None):
+    """
+    Open a JSON Lines file for text reading or writing.
+
+    Args:
+        path: File path; '.gz' and '.zst' files are decompressed/compressed
+        mode: 'r', 'w' or 'a'
+        compression_level: Optional compression level
+
+    Returns:
+        Text file object
+    """
+    compression = compression_for(path)
+    text_mode = f"{mode[0]}t"
+
+    if compression == 'gzip':
+        level = 6 if compression_level is None else compression_level
+        if mode[0] == 'r':
+            return gzip.open(path, text_mode, encoding='utf-8')
+        return gzip.open(path, text_mode, encoding='utf-8', compresslevel=level)
+
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstd compression requires the 'zstandard' package")
+        if mode[0] == 'r':
+            reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True, closefd=True)
+            return io.TextIOWrapper(reader, encoding='utf-8')
+        level = 3 if compression_level is None else compression_level
+        return zstandard.open(path, text_mode, cctx=zstandard.ZstdCompressor(level=level), encoding='utf-8')
+
+    return open(path, text_mode, encoding='utf-8')
+
+
+def iter_lines(path: str) -> Iterator[str]:
+    """Yield the non-empty lines of a JSON Lines file, undecoded."""
+    with open_jsonl(path, 'r') as handle:
+        for line in handle:
+            if line.strip():
+                yield line
+
+
+def iter_jsonl(path: str) -> Iterator[Any]:
+    """Yield the records of a JSON Lines file."""
+    for line in iter_lines(path):
+        yield json.loads(line)
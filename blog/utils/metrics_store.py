@@ -0,0 +1,323 @@
+"""
+Cache-backed metrics store with atomic counters and latency histograms.
+
+Monitors used to keep their metrics as dict blobs that were read from the
+cache, modified in Python and written back on every event. Under concurrent
+Celery workers that read-modify-write loses samples. This module stores every
+metric as individual integer counters updated with the cache backend's atomic
+``incr`` (Redis INCRBY, memcached incr, the locked locmem implementation):
+
+- Counters are sharded into fixed time windows (one key per window), so a
+  rollup over the last N windows is a single ``get_many`` and old windows
+  expire on their own.
+- Latency histograms use fixed log-scale buckets (HDR-style). Recording a
+  sample increments one bucket and one sum counter; histograms from different
+  windows, labels or workers merge by adding bucket counts. Each window also
+  counts its samples per group of buckets; reads fetch the sums and group
+  counters first, then only the buckets of groups that recorded samples.
+  A group counter is incremented with every sample in the group, so it is
+  never colder than its buckets and double counts can't corrupt it.
+- Labels (processing steps, task types, error codes) are tracked in a small
+  per-metric index that is only written when a label's counter is created.
+"""
+
+import math
+import time
+import logging
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from django.core.cache import caches
+
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram with log-scale buckets.
+
+    Bucket 0 holds values below 1ms; bucket i (i >= 1) holds values in
+    [2^((i-1)/SUB_BUCKETS), 2^(i/SUB_BUCKETS)) milliseconds, which bounds the
+    relative error of reported percentiles to about 19%.
+    """
+
+    SUB_BUCKETS = 4
+    MAX_BUCKET = 22 * SUB_BUCKETS  # ~70 minutes
+
+    def __init__(self, buckets: Optional[Dict[int, int]] = None, total_us: int = 0):
+        self.buckets = {index: count for index, count in (buckets or {}).items() if count}
+        self.total_us = total_us
+
+    @classmethod
+    def bucket_for(cls, seconds: float) -> int:
+        """Get the bucket index for a duration in seconds."""
+        milliseconds = seconds * 1000.0
+        if milliseconds < 1.0:
+            return 0
+        return min(cls.MAX_BUCKET, int(math.log2(milliseconds) * cls.SUB_BUCKETS) + 1)
+
+    @classmethod
+    def bucket_bounds(cls, index: int) -> Tuple[float, float]:
+        """Get the (lower, upper) bounds of a bucket in seconds."""
+        if index == 0:
+            return 0.0, 0.001
+        lower = 2 ** ((index - 1) / cls.SUB_BUCKETS) / 1000.0
+        upper = 2 ** (index / cls.SUB_BUCKETS) / 1000.0
+        return lower, upper
+
+    @property
+    def count(self) -> int:
+        return sum(self.buckets.values())
+
+    @property
+    def total(self) -> float:
+        """Exact sum of recorded values in seconds."""
+        return self.total_us / 1_000_000.0
+
+    @property
+    def mean(self) -> float:
+        count = self.count
+        return self.total / count if count else 0.0
+
+    @property
+    def min(self) -> float:
+        """Lower bound of the lowest non-empty bucket."""
+        return self.bucket_bounds(min(self.buckets))[0] if self.buckets else 0.0
+
+    @property
+    def max(self) -> float:
+        """Upper bound of the highest non-empty bucket."""
+        return self.bucket_bounds(max(self.buckets))[1] if self.buckets else 0.0
+
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        """Add another histogram's samples into this one."""
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.total_us += other.total_us
+        return self
+
+    def percentile(self, percent: float) -> float:
+        """
+        Get an approximate percentile in seconds.
+
+        Returns the upper bound of the bucket containing the percentile rank.
+        """
+        count = self.count
+        if not count:
+            return 0.0
+
+        rank = max(1, math.ceil(count * percent / 100.0))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return self.bucket_bounds(index)[1]
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        """Get count, mean, bounds and common percentiles."""
+        return {
+            'count': self.count,
+            'total_time': self.total,
+            'average_time': self.mean,
+            'min_time': self.min,
+            'max_time': self.max,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+        }
+
+
+class MetricsStore:
+    """
+    Namespaced metrics store shared by the LinkedIn monitors and error handlers.
+
+    All writes are single atomic cache increments, so concurrent workers never
+    overwrite each other's samples. Reads aggregate the requested number of
+    time windows (default: the full retention period).
+    """
+
+    # Histogram buckets per occupancy group (two octaves)
+    BUCKET_GROUP_SIZE = 2 * LatencyHistogram.SUB_BUCKETS
+
+    def __init__(self, namespace: str, window_seconds: int = 3600,
+                 retention_windows: int = 24, cache_alias: str = 'default'):
+        self.namespace = namespace
+        self.window_seconds = window_seconds
+        self.retention_windows = retention_windows
+        self.cache_alias = cache_alias
+        self.ttl = window_seconds * (retention_windows + 1)
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _current_window(self) -> int:
+        return int(time.time() // self.window_seconds)
+
+    def _windows(self, windows: Optional[int]) -> List[int]:
+        """Get the window indexes to aggregate, most recent last."""
+        count = min(windows or self.retention_windows, self.retention_windows)
+        current = self._current_window()
+        return list(range(current - count + 1, current + 1))
+
+    def _key(self, name: str, label: str, window: int, suffix: str = '') -> str:
+        return f"{self.namespace}:{name}:{label}:{window}{suffix}"
+
+    def _labels_key(self, name: str) -> str:
+        return f"{self.namespace}:{name}:labels"
+
+    def _atomic_incr(self, key: str, amount: int) -> Tuple[int, bool]:
+        """
+        Atomically increment a counter, creating it when missing.
+
+        Returns:
+            tuple: (new value, whether this call created the counter)
+        """
+        cache = self.cache
+        try:
+            return cache.incr(key, amount), False
+        except ValueError:
+            created = cache.add(key, 0, timeout=self.ttl)
+            return cache.incr(key, amount), created
+
+    def _register_label(self, name: str, label: str):
+        """
+        Add a label to a metric's label index.
+
+        Only called when a label's counter is created, i.e. at most once per
+        label per window. The index update itself is not atomic; a label lost
+        to a concurrent registration is added back when its counter is created
+        in the next window.
+        """
+        cache = self.cache
+        labels_key = self._labels_key(name)
+        labels = cache.get(labels_key) or []
+        if label in labels:
+            cache.touch(labels_key, self.ttl)
+        else:
+            cache.set(labels_key, sorted(set(labels) | {label}), timeout=self.ttl)
+
+    def incr(self, name: str, label: str = '', amount: int = 1) -> int:
+        """
+        Atomically increment a counter in the current window.
+
+        Args:
+            name: Metric name
+            label: Optional label (step, task type, error code...)
+            amount: Increment amount
+
+        Returns:
+            int: Counter value within the current window
+        """
+        value, created = self._atomic_incr(self._key(name, label, self._current_window()), amount)
+        if created:
+            self._register_label(name, label)
+        return value
+
+    def observe(self, name: str, seconds: float, label: str = ''):
+        """
+        Record a latency sample in the current window's histogram.
+
+        Args:
+            name: Histogram name
+            seconds: Observed duration in seconds
+            label: Optional label
+        """
+        window = self._current_window()
+        bucket = LatencyHistogram.bucket_for(seconds)
+        self._atomic_incr(self._key(name, label, window, f':b{bucket}'), 1)
+        self._atomic_incr(self._key(name, label, window, f':g{bucket // self.BUCKET_GROUP_SIZE}'), 1)
+        _, created = self._atomic_incr(self._key(name, label, window, ':sum'), max(0, int(round(seconds * 1_000_000))))
+        if created:
+            self._register_label(name, label)
+
+    def get_labels(self, name: str) -> List[str]:
+        """Get all labels recorded for a metric within the retention period."""
+        return list(self.cache.get(self._labels_key(name)) or [])
+
+    def get_series(self, name: str, label: str = '', windows: int = None) -> List[Tuple[int, int]]:
+        """
+        Get per-window counter values.
+
+        Returns:
+            list: (window start timestamp, value) tuples, oldest first
+        """
+        window_indexes = self._windows(windows)
+        keys = [self._key(name, label, window) for window in window_indexes]
+        values = self.cache.get_many(keys)
+        return [
+            (window * self.window_seconds, values.get(key, 0))
+            for window, key in zip(window_indexes, keys)
+        ]
+
+    def get_counter(self, name: str, label: str = '', windows: int = None) -> int:
+        """Get a counter summed over the last N windows."""
+        return sum(value for _, value in self.get_series(name, label, windows))
+
+    def get_counters(self, name: str, labels: Iterable[str] = None, windows: int = None) -> Dict[str, int]:
+        """
+        Get counter totals for several labels with a single cache read.
+
+        Args:
+            name: Metric name
+            labels: Labels to read (default: every registered label)
+            windows: Number of windows to aggregate
+
+        Returns:
+            dict: Totals keyed by label
+        """
+        labels = list(self.get_labels(name) if labels is None else labels)
+        window_indexes = self._windows(windows)
+        keys = {
+            self._key(name, label, window): label
+            for label in labels for window in window_indexes
+        }
+        values = self.cache.get_many(list(keys))
+        totals = {label: 0 for label in labels}
+        for key, value in values.items():
+            totals[keys[key]] += value
+        return totals
+
+    def get_histogram(self, name: str, label: str = '', windows: int = None) -> LatencyHistogram:
+        """Get a histogram merged over the last N windows."""
+        return self.get_histograms(name, [label], windows).get(label, LatencyHistogram())
+
+    def get_histograms(self, name: str, labels: Iterable[str] = None, windows: int = None) -> Dict[str, LatencyHistogram]:
+        """
+        Get merged histograms for several labels with two cache reads.
+
+        The first read gets the sum and bucket group counters of every
+        window, the second only the buckets of groups that recorded samples.
+
+        Returns:
+            dict: LatencyHistogram keyed by label
+        """
+        labels = list(self.get_labels(name) if labels is None else labels)
+        groups = LatencyHistogram.MAX_BUCKET // self.BUCKET_GROUP_SIZE + 1
+        histograms = {label: LatencyHistogram() for label in labels}
+
+        keys = {}
+        for label in labels:
+            for window in self._windows(windows):
+                keys[self._key(name, label, window, ':sum')] = (label, window, None)
+                for group in range(groups):
+                    keys[self._key(name, label, window, f':g{group}')] = (label, window, group)
+
+        bucket_keys = {}
+        for key, value in self.cache.get_many(list(keys)).items():
+            label, window, group = keys[key]
+            if group is None:
+                histograms[label].total_us += value
+            elif value:
+                first = group * self.BUCKET_GROUP_SIZE
+                for bucket in range(first, min(first + self.BUCKET_GROUP_SIZE, LatencyHistogram.MAX_BUCKET + 1)):
+                    bucket_keys[self._key(name, label, window, f':b{bucket}')] = (label, bucket)
+
+        if bucket_keys:
+            for key, value in self.cache.get_many(list(bucket_keys)).items():
+                label, bucket = bucket_keys[key]
+                histogram = histograms[label]
+                histogram.buckets[bucket] = histogram.buckets.get(bucket, 0) + value
+        return histograms
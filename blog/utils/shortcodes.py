@@ -1,10 +1,19 @@
 import re
+from django.utils.html import escape
 from django.utils.safestring import mark_safe
 from ..models import MediaItem
 
 class MediaShortcodeProcessor:
     """Process media shortcodes in blog post content"""
     
+    # Layout width hints for srcset selection, keyed by requested shortcode size
+    SIZES_HINTS = {
+        'thumbnail': '300px',
+        'medium': '(max-width: 768px) 100vw, 800px',
+        'large': '(max-width: 1200px) 100vw, 1200px',
+        'original': '100vw',
+    }
+    
     @staticmethod
     def process_content(content, post):
         """Process all media shortcodes in content"""
@@ -93,18 +102,49 @@ class MediaShortcodeProcessor:
         return re.sub(pattern, replace_media, content)
     
     @staticmethod
-    def _render_image(media, size='medium'):
-        """Render image HTML"""
+    def render_picture(media, size='medium', css_class='responsive-image', sizes=None):
+        """
+        Render a <picture> element with AVIF/WebP sources and a JPEG fallback.
+        
+        Falls back to a plain <img> when no modern renditions exist.
+        """
         image_field = getattr(media, f'{size}_image', None) or media.original_image
         if not image_field:
+            return ''
+        
+        alt = escape(media.alt_text or media.title or '')
+        sizes = sizes or MediaShortcodeProcessor.SIZES_HINTS.get(size, MediaShortcodeProcessor.SIZES_HINTS['medium'])
+        fallback_srcset = media.get_fallback_srcset() if size != 'original' else ''
+        
+        img_attrs = f'src="{image_field.url}"'
+        if fallback_srcset:
+            img_attrs += f' srcset="{fallback_srcset}" sizes="{sizes}"'
+        if media.width and media.height:
+            img_attrs += f' width="{media.width}" height="{media.height}"'
+        img_tag = f'<img {img_attrs} alt="{alt}" class="{css_class}" loading="lazy" decoding="async">'
+        
+        formats = media.get_rendition_formats()
+        if not formats:
+            return img_tag
+        
+        from ..services.multimedia_service import MultimediaService
+        sources = ''.join(
+            f'<source type="{MultimediaService.RENDITION_FORMATS[fmt]["mime"]}" '
+            f'srcset="{media.get_srcset(fmt)}" sizes="{sizes}">'
+            for fmt in formats
+        )
+        return f'<picture>{sources}{img_tag}</picture>'
+    
+    @staticmethod
+    def _render_image(media, size='medium'):
+        """Render image HTML"""
+        picture = MediaShortcodeProcessor.render_picture(media, size)
+        if not picture:
             return '[Image not available]'
         
         html = f'''
         <figure class="shortcode-image">
-            <img src="{image_field.url}" 
-                 alt="{media.alt_text or media.title or ''}" 
-                 class="responsive-image"
-                 loading="lazy">
+            {picture}
             {f'<figcaption>{media.title}</figcaption>' if media.title else ''}
             {f'<p class="image-description">{media.description}</p>' if media.description else ''}
         </figure>
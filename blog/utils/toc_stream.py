@@ -0,0 +1,532 @@
+"""
+Single-pass table of contents engine for post HTML.
+
+The table of contents used to parse the post body into a BeautifulSoup tree,
+look up the headings, insert anchors, walk siblings to count words per section
+and serialise the whole tree back out. This module does the same work
+in one pass over ``html.parser`` events without building a tree:
+
+- Markup is written out as it's parsed, normalised the way BeautifulSoup's
+  ``html.parser`` builder and "minimal" formatter normalise it (attributes
+  sorted and requoted, void elements self-closed, whitespace-only text
+  collapsed, unmatched end tags dropped, open tags closed), so the output
+  matches ``str(soup)`` byte for byte.
+- Heading start tags are written to placeholder slots. Slots are filled
+  once every heading is known, because anchors are only added when there
+  are enough headings, and anchor de-duplication follows document order.
+- Words are counted per section while text streams past, following the
+  sibling walk of ``TableOfContentsService`` (a section runs over the
+  heading's following siblings up to the next heading, and the anchor link
+  inserted into later headings counts as text).
+
+Only the open-element stack, the open headings and the active sections are
+held in memory, besides the output itself.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional
+
+from bs4.builder import HTMLTreeBuilder
+from bs4.dammit import EntitySubstitution
+from bs4.element import CharsetMetaAttributeValue, ContentMetaAttributeValue
+
+
+HEADING_TAGS = frozenset({'h1', 'h2', 'h3', 'h4', 'h5', 'h6'})
+
+# Parsing and formatting rules shared with BeautifulSoup's html.parser builder
+VOID_ELEMENTS = frozenset(HTMLTreeBuilder.DEFAULT_EMPTY_ELEMENT_TAGS)
+PRESERVE_WHITESPACE_TAGS = frozenset(HTMLTreeBuilder.DEFAULT_PRESERVE_WHITESPACE_TAGS)
+STRING_CONTAINERS = frozenset(HTMLTreeBuilder.DEFAULT_STRING_CONTAINERS)
+LIST_ATTRIBUTES = {
+    tag: frozenset(attributes) for tag, attributes in HTMLTreeBuilder.DEFAULT_CDATA_LIST_ATTRIBUTES.items()
+}
+UNESCAPED_TEXT_TAGS = frozenset({'script', 'style'})
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+OUTPUT_ENCODING = 'utf-8'
+
+# String kinds: plain text, or the name of the innermost string container
+# (script, style, template, rt, rp) it appears in, or one of these
+TEXT = 'text'
+CDATA = 'cdata'
+COMMENT = 'comment'
+DOCTYPE = 'doctype'
+DECLARATION = 'declaration'
+PROCESSING_INSTRUCTION = 'pi'
+
+# Strings a tag's get_text() includes when it isn't a string container
+MAIN_CONTENT_KINDS = frozenset({TEXT, CDATA})
+
+SPECIAL_STRING_FORMATS = {
+    COMMENT: '<!--%s-->',
+    CDATA: '<![CDATA[%s]]>',
+    DOCTYPE: '<!DOCTYPE %s>\n',
+    DECLARATION: '<?%s?>',
+    PROCESSING_INSTRUCTION: '<?%s>',
+}
+
+
+def escape_text(value: str) -> str:
+    """Escape text the way BeautifulSoup's "minimal" formatter does."""
+    return value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def format_start_tag(name: str, attrs: Dict, self_closing: bool = False) -> str:
+    """Format a start tag with sorted, requoted attributes."""
+    if not attrs:
+        return f"<{name}/>" if self_closing else f"<{name}>"
+
+    parts = [f"<{name}"]
+    for key, value in sorted(attrs.items()):
+        if isinstance(value, list):
+            value = ' '.join(value)
+        elif isinstance(value, (CharsetMetaAttributeValue, ContentMetaAttributeValue)):
+            value = value.substitute_encoding(OUTPUT_ENCODING)
+        parts.append(f" {key}={EntitySubstitution.quoted_attribute_value(escape_text(value))}")
+    parts.append('/>' if self_closing else '>')
+    return ''.join(parts)
+
+
+class WordCounter:
+    """Counts whitespace-separated words in text fed to it in pieces."""
+
+    __slots__ = ('count', 'in_word', 'anchor_words')
+
+    def __init__(self):
+        self.count = 0
+        self.in_word = False
+        # Words added by anchor links, which only exist when they're shown
+        self.anchor_words = 0
+
+    def feed(self, text: str):
+        words = text.split()
+        if not words:
+            self.in_word = False
+            return
+        self.count += len(words)
+        if self.in_word and not text[0].isspace():
+            # Continues the word the previous piece ended with
+            self.count -= 1
+        self.in_word = not text[-1].isspace()
+
+    def boundary(self):
+        self.in_word = False
+
+
+@dataclass
+class HeadingRecord:
+    """A heading tag, in document order."""
+
+    position: int
+    level: int
+    attrs: Dict
+    slot: int
+    parent_depth: int
+    text_parts: List[str] = field(default_factory=list)
+    text: str = ''
+    listed: bool = False
+    anchor: Optional[str] = None
+    words: int = 0
+    anchor_words: int = 0
+    # Counters reading this heading's text, with whether they were inside a
+    # word when the heading started, whether its text starts with space, and
+    # whether it starts right after an enclosing heading's anchor link
+    anchor_watches: List[list] = field(default_factory=list)
+
+
+class Section:
+    """Words following a heading, up to the next heading among its siblings."""
+
+    __slots__ = ('heading', 'parent_depth', 'counter', 'awaiting', 'suspended_by')
+
+    def __init__(self, heading: HeadingRecord, parent_depth: int):
+        self.heading = heading
+        self.parent_depth = parent_depth
+        self.counter = WordCounter()
+        # Until the next listed heading is known, a sibling heading may end the section
+        self.awaiting = True
+        self.suspended_by: Optional[HeadingRecord] = None
+
+
+class Frame:
+    """An open element."""
+
+    __slots__ = ('name', 'kinds', 'container', 'preserve', 'pending_open', 'heading')
+
+    def __init__(self, name, kinds, container, preserve, pending_open=None, heading=None):
+        self.name = name
+        # String kinds this element's get_text() includes
+        self.kinds = kinds
+        # Innermost string container around (or at) this element
+        self.container = container
+        self.preserve = preserve
+        # Start tag of a void element, held until it turns out to have children
+        self.pending_open = pending_open
+        self.heading = heading
+
+
+@dataclass(frozen=True)
+class TocStreamResult:
+    """Headings, rewritten content and section word counts of one document."""
+
+    headings: List[Dict]
+    content: str
+    show_toc: bool
+    section_words: Dict[str, int]
+
+
+class TocStreamParser(HTMLParser):
+    """
+    Event-driven parser that writes normalised HTML with heading anchors.
+
+    Tokenising is left to ``html.parser`` with character references passed
+    through, as BeautifulSoup does, and the tree-building decisions that
+    affect output (which end tags close what, how void elements and text
+    runs are handled) are replayed on a stack of open element names.
+    """
+
+    def __init__(self, anchor_factory: Callable[[str, set], str]):
+        super().__init__(convert_charrefs=False)
+        self.anchor_factory = anchor_factory
+        self.out: List[Optional[str]] = []
+        self.stack: List[Frame] = [Frame('[document]', MAIN_CONTENT_KINDS, None, False)]
+        self.open_counter = Counter()
+        # Void elements closed on their start tag, whose end tags are ignored
+        self.already_closed_empty_element = Counter()
+        self.current_data: List[str] = []
+        self.headings: List[HeadingRecord] = []
+        self.open_headings: List[HeadingRecord] = []
+        self.sections: List[Section] = []
+        # Position of the last listed heading closed so far
+        self.last_listed_position = -1
+
+    # html.parser events, handled as BeautifulSoupHTMLParser handles them
+
+    def handle_startendtag(self, name, attrs):
+        self.handle_starttag(name, attrs, handle_empty_element=False)
+        self.handle_endtag(name)
+
+    def handle_starttag(self, name, attrs, handle_empty_element=True):
+        attr_dict = {}
+        for key, value in attrs:
+            attr_dict[key] = '' if value is None else value
+        self._start_tag(name, attr_dict)
+        if name in VOID_ELEMENTS and handle_empty_element:
+            self.handle_endtag(name, check_already_closed=False)
+            self.already_closed_empty_element[name] += 1
+
+    def handle_endtag(self, name, check_already_closed=True):
+        if check_already_closed and self.already_closed_empty_element[name]:
+            self.already_closed_empty_element[name] -= 1
+        else:
+            self._end_data()
+            self._pop_to(name)
+
+    def handle_data(self, data):
+        self.current_data.append(data)
+
+    def handle_charref(self, name):
+        if name.startswith('x'):
+            real_name = int(name.lstrip('x'), 16)
+        elif name.startswith('X'):
+            real_name = int(name.lstrip('X'), 16)
+        else:
+            real_name = int(name)
+
+        data = None
+        if real_name < 256:
+            # Numeric references below 256 are often meant as windows-1252
+            try:
+                data = bytearray([real_name]).decode('windows-1252')
+            except UnicodeDecodeError:
+                pass
+        if not data:
+            try:
+                data = chr(real_name)
+            except (ValueError, OverflowError):
+                pass
+        self.handle_data(data or '\N{REPLACEMENT CHARACTER}')
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.handle_data(character if character is not None else f"&{name}")
+
+    def handle_comment(self, data):
+        self._special_string(data, COMMENT)
+
+    def handle_decl(self, data):
+        self._special_string(data[len('DOCTYPE '):], DOCTYPE)
+
+    def unknown_decl(self, data):
+        if data.upper().startswith('CDATA['):
+            self._special_string(data[len('CDATA['):], CDATA)
+        else:
+            self._special_string(data, DECLARATION)
+
+    def handle_pi(self, data):
+        self._special_string(data, PROCESSING_INSTRUCTION)
+
+    # Tree-building replay
+
+    def _special_string(self, data, kind):
+        self._end_data()
+        self.current_data.append(data)
+        self._end_data(kind)
+
+    def _end_data(self, kind=None):
+        if not self.current_data:
+            return
+        data = ''.join(self.current_data)
+        self.current_data = []
+        top = self.stack[-1]
+
+        if not top.preserve and not data.strip(ASCII_SPACES):
+            data = '\n' if '\n' in data else ' '
+
+        if kind is None:
+            kind = top.container or TEXT
+            self._child_started()
+            self.out.append(data if top.name in UNESCAPED_TEXT_TAGS else escape_text(data))
+        else:
+            self._child_started()
+            self.out.append(SPECIAL_STRING_FORMATS[kind] % data)
+
+        if kind in MAIN_CONTENT_KINDS:
+            for heading in self.open_headings:
+                heading.text_parts.append(data)
+        self._count_words(data, kind)
+
+    def _child_started(self):
+        """Note that the element on top of the stack got a new child."""
+        top = self.stack[-1]
+        if top.pending_open is not None:
+            # A void element with children is written out in full
+            self.out.append(top.pending_open)
+            top.pending_open = None
+
+        depth = len(self.stack) - 1
+        for section in self.sections:
+            if section.parent_depth == depth:
+                section.counter.boundary()
+
+    def _count_words(self, data, kind):
+        depth = len(self.stack) - 1
+        for section in self.sections:
+            if section.suspended_by is not None:
+                continue
+            # Strings among the siblings count when they're main content,
+            # strings inside a sibling when its get_text() includes them
+            kinds = MAIN_CONTENT_KINDS if depth == section.parent_depth else self.stack[section.parent_depth + 1].kinds
+            if kind in kinds:
+                self._feed_section(section, data)
+
+    def _feed_section(self, section, data):
+        counter = section.counter
+        for heading in self.open_headings:
+            for watch in heading.anchor_watches:
+                if watch[0] is counter and watch[2] is None and data:
+                    watch[2] = data[0].isspace()
+        counter.feed(data)
+
+    def _follows_anchor(self, counter):
+        """Check whether an open heading read by the counter has no text yet."""
+        return any(
+            watch[0] is counter and watch[2] is None
+            for heading in self.open_headings
+            for watch in heading.anchor_watches
+        )
+
+    def _start_tag(self, name, attrs):
+        self._end_data()
+        attrs = self._process_attributes(name, attrs)
+        self._child_started()
+
+        parent = self.stack[-1]
+        depth = len(self.stack)
+        container = name if name in STRING_CONTAINERS else parent.container
+        kinds = frozenset({name}) if name in STRING_CONTAINERS else MAIN_CONTENT_KINDS
+        frame = Frame(name, kinds, container, parent.preserve or name in PRESERVE_WHITESPACE_TAGS)
+
+        if name in HEADING_TAGS:
+            heading = HeadingRecord(
+                position=len(self.headings),
+                level=int(name[1]),
+                attrs=attrs,
+                slot=len(self.out),
+                parent_depth=depth - 1,
+            )
+            self.out.append(None)
+            self.headings.append(heading)
+            frame.heading = heading
+            for section in self.sections:
+                if section.suspended_by is not None:
+                    continue
+                if section.awaiting and section.parent_depth == depth - 1:
+                    # A sibling heading ends the section if it turns out to be listed
+                    section.suspended_by = heading
+                elif depth - 1 == section.parent_depth or TEXT in self.stack[section.parent_depth + 1].kinds:
+                    # Its anchor link will be read as text by this section
+                    heading.anchor_watches.append([
+                        section.counter, section.counter.in_word, None, self._follows_anchor(section.counter),
+                    ])
+            self.open_headings.append(heading)
+        elif name in VOID_ELEMENTS:
+            frame.pending_open = format_start_tag(name, attrs)
+        else:
+            self.out.append(format_start_tag(name, attrs))
+
+        self.stack.append(frame)
+        self.open_counter[name] += 1
+
+    def _process_attributes(self, name, attrs):
+        if not attrs:
+            return attrs
+        universal = LIST_ATTRIBUTES.get('*', ())
+        specific = LIST_ATTRIBUTES.get(name, ())
+        for key in list(attrs):
+            if key in universal or key in specific:
+                attrs[key] = attrs[key].split()
+        if name == 'meta':
+            if 'charset' in attrs:
+                attrs['charset'] = CharsetMetaAttributeValue(attrs['charset'])
+            elif 'content' in attrs and attrs.get('http-equiv', '').lower() == 'content-type':
+                attrs['content'] = ContentMetaAttributeValue(attrs['content'])
+        return attrs
+
+    def _pop_to(self, name):
+        if not self.open_counter.get(name):
+            return
+        while len(self.stack) > 1:
+            frame = self._pop()
+            if frame.name == name:
+                break
+
+    def _pop(self):
+        frame = self.stack.pop()
+        self.open_counter[frame.name] -= 1
+        depth = len(self.stack)
+
+        if frame.pending_open is not None:
+            self.out.append(frame.pending_open[:-1] + '/>')
+        else:
+            self.out.append(f"</{frame.name}>")
+
+        # Sections end with their parent element
+        if any(section.parent_depth == depth for section in self.sections):
+            self._finish_sections([s for s in self.sections if s.parent_depth == depth])
+
+        if frame.heading is not None:
+            self._close_heading(frame.heading)
+        return frame
+
+    def _close_heading(self, heading):
+        self.open_headings.pop()
+        heading.text = ''.join(heading.text_parts).strip()
+        heading.text_parts = []
+        heading.listed = bool(heading.text)
+
+        innermost_open = self.open_headings[-1].position if self.open_headings else -1
+        ended = []
+        for section in self.sections:
+            if section.suspended_by is heading:
+                section.suspended_by = None
+                if heading.listed:
+                    ended.append(section)
+                    section.awaiting = False
+            elif heading.listed and section.awaiting and section.heading.position > innermost_open:
+                # The next listed heading isn't a sibling: the section runs on
+                section.awaiting = False
+
+        if heading.listed:
+            for counter, in_word, starts_with_space, follows_anchor in heading.anchor_watches:
+                if follows_anchor:
+                    # Joins the enclosing heading's "#", which is counted for both
+                    continue
+                if not in_word and starts_with_space:
+                    # The inserted "#" stands as a word of its own
+                    counter.anchor_words += 1
+        heading.anchor_watches = []
+        if ended:
+            self._finish_sections(ended)
+
+        if heading.listed:
+            section = Section(heading, len(self.stack) - 1)
+            if self.last_listed_position > heading.position:
+                # A listed heading inside this one comes next, so no sibling can end it
+                section.awaiting = False
+            self.sections.append(section)
+            self.last_listed_position = max(self.last_listed_position, heading.position)
+
+    def _finish_sections(self, sections):
+        for section in sections:
+            section.heading.words = section.counter.count
+            section.heading.anchor_words = section.counter.anchor_words
+            self.sections.remove(section)
+
+    def finish(self, min_headings: int) -> TocStreamResult:
+        """
+        Close the document and fill in the heading slots.
+
+        Args:
+            min_headings: Number of headings needed to add anchors
+
+        Returns:
+            TocStreamResult
+        """
+        self.close()
+        self._end_data()
+        while len(self.stack) > 1:
+            self._pop()
+        self._finish_sections(list(self.sections))
+
+        listed = [heading for heading in self.headings if heading.listed]
+        used_anchors = set()
+        for heading in listed:
+            heading.anchor = self.anchor_factory(heading.text, used_anchors)
+            used_anchors.add(heading.anchor)
+        show_toc = len(listed) >= min_headings
+
+        for heading in self.headings:
+            name = f"h{heading.level}"
+            if show_toc and heading.listed:
+                attrs = dict(heading.attrs)
+                attrs['id'] = heading.anchor
+                link = format_start_tag('a', {
+                    'href': f"#{heading.anchor}",
+                    'class': ['heading-anchor'],
+                    'aria-label': f"Link to {heading.text}",
+                })
+                self.out[heading.slot] = f"{format_start_tag(name, attrs)}{link}#</a>"
+            else:
+                self.out[heading.slot] = format_start_tag(name, heading.attrs)
+
+        return TocStreamResult(
+            headings=[
+                {'text': heading.text, 'level': heading.level, 'anchor': heading.anchor}
+                for heading in listed
+            ],
+            content=''.join(self.out),
+            show_toc=show_toc,
+            section_words={
+                heading.anchor: heading.words + (heading.anchor_words if show_toc else 0)
+                for heading in listed
+            },
+        )
+
+
+def stream_toc(content: str, min_headings: int, anchor_factory: Callable[[str, set], str]) -> TocStreamResult:
+    """
+    Extract headings, add anchors and count section words in one pass.
+
+    Args:
+        content: Post HTML
+        min_headings: Number of headings needed to add anchors
+        anchor_factory: Called with heading text and the anchors used so far
+
+    Returns:
+        TocStreamResult
+    """
+    parser = TocStreamParser(anchor_factory)
+    parser.feed(content)
+    return parser.finish(min_headings)
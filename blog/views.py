@@ -8,6 +8,7 @@ from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_protect
 from django.core.cache import cache
 from django.conf import settings
+from django.contrib.auth.models import User
 from django.utils.html import format_html
 from django.db.models import Case, When, Value, IntegerField
 from datetime import datetime, timedelta
@@ -16,9 +17,12 @@ from .models import Post, Category, NewsletterSubscriber, Tag, Comment, SocialSh
 from .forms import NewsletterSubscriptionForm, CommentForm, MediaUploadForm, VideoEmbedForm, GalleryForm
 from .tasks import send_confirmation_email, send_comment_notification
 from .services.social_share_service import SocialShareService
+from .services.comment_tree_service import CommentTreeService
 from .services.content_discovery_service import ContentDiscoveryService
 from .services.table_of_contents_service import TableOfContentsService
-# from .services.multimedia_service import multimedia_service
+from .services.multimedia_service import multimedia_service
+from .services.social_image_service import SocialImageService
+from .services.post_card_service import PostCardService
 from .author_services.author_service import AuthorService
 from .security_clean import RateLimiter, SecurityAuditLogger
 from .performance import CacheManager, QueryOptimizer, ViewCountOptimizer, PerformanceMonitor
@@ -31,7 +35,8 @@ def blog_list(request, category_slug=None, tag_slug=None):
     """
     category = None
     tag = None
-    posts_list = Post.objects.filter(status='published').select_related('author').prefetch_related('categories', 'tags')
+    # Filtered down to IDs only; the page is read as post cards below
+    posts_list = Post.objects.filter(status='published')
     
     # Filter by category (with hierarchy support)
     if category_slug:
@@ -69,9 +74,6 @@ def blog_list(request, category_slug=None, tag_slug=None):
         
         # Apply search filter
         posts_list = posts_list.filter(search_query).distinct()
-        
-        # Add search result highlighting
-        search_highlighted_posts = _highlight_search_results(posts_list, query)
     
     # Advanced filtering
     category_filter = request.GET.get('category')
@@ -132,6 +134,9 @@ def blog_list(request, category_slug=None, tag_slug=None):
         posts = paginator.page(1)
     except EmptyPage:
         posts = paginator.page(paginator.num_pages)
+    posts.object_list = PostCardService.cards(posts.object_list)
+    if query:
+        search_highlighted_posts = _highlight_search_results(posts.object_list, query)
     
     # Get navigation data with hierarchy
     category_hierarchy = _get_category_hierarchy()
@@ -247,12 +252,12 @@ def blog_detail(request, slug):
     # Get related posts using optimized caching
     related_posts = QueryOptimizer.get_related_posts_optimized(post, limit=3)
 
-    # Get approved comments for this post (only top-level comments, replies are handled in template)
-    comments = Comment.objects.filter(
-        post=post, 
-        is_approved=True, 
-        parent=None
-    ).order_by('created_at').prefetch_related('replies')
+    # Get the rendered approved comment threads (one query, cached per post)
+    try:
+        comments_page = max(int(request.GET.get('comments_page', 1)), 1)
+    except ValueError:
+        comments_page = 1
+    comment_threads = CommentTreeService.get_thread_page(post, page=comments_page)
     
     # Initialize comment form
     comment_form = CommentForm()
@@ -260,7 +265,7 @@ def blog_detail(request, slug):
     # Get social sharing data
     share_urls = SocialShareService.generate_share_urls(post, request)
     share_counts = SocialShareService.get_share_counts(post)
-    total_shares = SocialShareService.get_total_shares(post)
+    total_shares = sum(share_counts.values())
     
     # Generate table of contents data
     toc_data = TableOfContentsService.generate_toc_data_for_template(post)
@@ -276,7 +281,7 @@ def blog_detail(request, slug):
         'post': post,
         'author_profile': author_profile,
         'related_posts': related_posts,
-        'comments': comments,
+        'comment_threads': comment_threads,
         'comment_form': comment_form,
         'share_urls': share_urls,
         'share_counts': share_counts,
@@ -542,9 +547,10 @@ def track_social_share(request, slug):
         return JsonResponse({'error': 'Failed to track share'}, status=500)
 
 
-def _highlight_search_results(posts_queryset, query):
+def _highlight_search_results(posts, query):
     """
     Add search result highlighting to post titles and excerpts.
+    Takes the post cards of the current page.
     Returns a dictionary mapping post IDs to highlighted content.
     """
     highlighted_posts = {}
@@ -555,7 +561,7 @@ def _highlight_search_results(posts_queryset, query):
     # Create regex pattern for case-insensitive highlighting
     pattern = re.compile(re.escape(query), re.IGNORECASE)
     
-    for post in posts_queryset:
+    for post in posts:
         highlighted_data = {}
         
         # Highlight in title
@@ -574,7 +580,7 @@ def _highlight_search_results(posts_queryset, query):
         
         # Highlight in tag names
         highlighted_tags = []
-        for tag in post.tags.all():
+        for tag in post.tags:
             if pattern.search(tag.name):
                 highlighted_tag_name = pattern.sub(
                     lambda m: f'<mark class="search-highlight">{m.group()}</mark>',
@@ -861,6 +867,7 @@ def author_detail(request, username):
         posts = paginator.page(1)
     except EmptyPage:
         posts = paginator.page(paginator.num_pages)
+    posts.object_list = PostCardService.cards(posts.object_list, with_comment_counts=True)
     
     # Get author statistics
     author_stats = AuthorService.get_author_stats(author)
@@ -1061,6 +1068,13 @@ def upload_media(request, post_id):
                         media_item.large_image.name = processed_images['large']
                     
                     media_item.save()
+                    
+                    # Modern-format renditions are an enhancement; the JPEG sizes remain the fallback
+                    try:
+                        multimedia_service.generate_renditions(media_item)
+                    except Exception as e:
+                        messages.warning(request, f'Responsive renditions could not be generated: {str(e)}')
+                    
                     messages.success(request, 'Image uploaded and processed successfully!')
                 
                 elif media_type == 'gallery':
@@ -1301,6 +1315,7 @@ def delete_media(request, media_id):
             media_item.medium_image.delete(save=False)
         if media_item.large_image:
             media_item.large_image.delete(save=False)
+        multimedia_service.delete_renditions(media_item, save=False)
         
         media_item.delete()
         
@@ -1332,6 +1347,9 @@ def update_media_order(request, post_id):
             if media_id and order is not None:
                 MediaItem.objects.filter(id=media_id, post=post).update(order=order)
         
+        # update() sends no signals, and the first image may have changed
+        SocialImageService.refresh(post)
+        
         return JsonResponse({'success': True, 'message': 'Media order updated successfully'})
         
     except Exception as e:
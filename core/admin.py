@@ -80,7 +80,7 @@ class HealthMetricAdmin(ModelAdmin):
     """
     Admin configuration for Health Metrics using Unfold.
     """
-    list_display = ('metric_name', 'status', 'message', 'response_time', 'timestamp')
+    list_display = ('metric_name', 'status', 'message', 'value', 'response_time', 'timestamp')
     list_filter = ('metric_name', 'status', 'timestamp')
     search_fields = ('message',)
     readonly_fields = ('timestamp',)
@@ -91,7 +91,7 @@ class HealthMetricAdmin(ModelAdmin):
             'fields': ('metric_name', 'status', 'message')
         }),
         ('Metric Data', {
-            'fields': ('metric_value', 'response_time')
+            'fields': ('value', 'metric_value', 'response_time')
         }),
         ('Timestamp', {
             'fields': ('timestamp',)
@@ -0,0 +1,50 @@
+"""
+Management command to set up periodic tasks for the admin dashboard.
+
+This command creates or updates Celery Beat periodic tasks for:
+- Rebuilding the role-scoped dashboard snapshots every 5 minutes
+
+Usage:
+    python manage.py setup_dashboard_tasks
+    python manage.py setup_dashboard_tasks --disable
+"""
+
+from django.core.management.base import BaseCommand
+from django_celery_beat.models import PeriodicTask, IntervalSchedule
+
+
+class Command(BaseCommand):
+    help = 'Set up periodic tasks for the admin dashboard snapshots'
+
+    REFRESH_TASK = 'Dashboard Snapshots Refresh'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--disable',
+            action='store_true',
+            help='Disable the dashboard snapshot task'
+        )
+
+    def handle(self, *args, **options):
+        if options['disable']:
+            disabled = PeriodicTask.objects.filter(name=self.REFRESH_TASK).update(enabled=False)
+            self.stdout.write(self.style.SUCCESS(f'Disabled {disabled} dashboard tasks'))
+            return
+
+        every_five_minutes, _ = IntervalSchedule.objects.get_or_create(
+            every=5,
+            period=IntervalSchedule.MINUTES,
+        )
+        task, created = PeriodicTask.objects.update_or_create(
+            name=self.REFRESH_TASK,
+            defaults={
+                'interval': every_five_minutes,
+                'crontab': None,
+                'task': 'core.tasks.refresh_dashboard_snapshots',
+                'enabled': True,
+            }
+        )
+
+        action = 'Created' if created else 'Updated'
+        self.stdout.write(f'{action} task: {self.REFRESH_TASK}')
+        self.stdout.write(self.style.SUCCESS('Successfully set up dashboard tasks'))
@@ -0,0 +1,69 @@
+"""
+Management command to set up periodic tasks for the health metrics time series.
+
+This command creates or updates Celery Beat periodic tasks for:
+- Rolling up samples into minute, hour and day buckets every minute
+- Pruning samples and buckets past their retention daily
+
+Usage:
+    python manage.py setup_health_metrics_tasks
+    python manage.py setup_health_metrics_tasks --disable
+"""
+
+from django.core.management.base import BaseCommand
+from django_celery_beat.models import PeriodicTask, IntervalSchedule, CrontabSchedule
+
+
+class Command(BaseCommand):
+    help = 'Set up periodic tasks for health metrics rollup and retention'
+
+    ROLLUP_TASK = 'Health Metrics Rollup'
+    PRUNE_TASK = 'Health Metrics Retention'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--disable',
+            action='store_true',
+            help='Disable the health metrics tasks'
+        )
+
+    def handle(self, *args, **options):
+        if options['disable']:
+            disabled = PeriodicTask.objects.filter(
+                name__in=[self.ROLLUP_TASK, self.PRUNE_TASK]
+            ).update(enabled=False)
+            self.stdout.write(self.style.SUCCESS(f'Disabled {disabled} health metrics tasks'))
+            return
+
+        every_minute, _ = IntervalSchedule.objects.get_or_create(
+            every=1,
+            period=IntervalSchedule.MINUTES,
+        )
+        self.save_task(self.ROLLUP_TASK, 'core.tasks.rollup_health_metrics', interval=every_minute)
+
+        # Daily at 3 AM
+        nightly, _ = CrontabSchedule.objects.get_or_create(
+            minute=0,
+            hour=3,
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+        )
+        self.save_task(self.PRUNE_TASK, 'core.tasks.prune_health_metrics', crontab=nightly)
+
+        self.stdout.write(self.style.SUCCESS('Successfully set up health metrics tasks'))
+
+    def save_task(self, name, task_path, interval=None, crontab=None):
+        """Create or update a periodic task"""
+        task, created = PeriodicTask.objects.update_or_create(
+            name=name,
+            defaults={
+                'interval': interval,
+                'crontab': crontab,
+                'task': task_path,
+                'enabled': True,
+            }
+        )
+
+        action = 'Created' if created else 'Updated'
+        self.stdout.write(f'{action} task: {name}')
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.3 on 2026-10-19 02:58
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='healthmetric',
+            name='metric_value',
+            field=models.JSONField(blank=True, default=dict, help_text='Detailed metric data in JSON format, kept for warning and critical samples'),
+        ),
+        migrations.AddField(
+            model_name='healthmetric',
+            name='value',
+            field=models.FloatField(blank=True, help_text='Main numeric reading of the metric, e.g. percent of memory used', null=True),
+        ),
+        migrations.AlterField(
+            model_name='healthmetric',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='When this metric was sampled'),
+        ),
+        migrations.CreateModel(
+            name='HealthMetricRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric_name', models.CharField(choices=[('database', 'Database'), ('cache', 'Cache'), ('memory', 'Memory'), ('disk', 'Disk'), ('system_load', 'System Load'), ('logs', 'Logs'), ('api', 'API'), ('celery', 'Celery'), ('redis', 'Redis'), ('overall', 'Overall System')], help_text='Type of health metric', max_length=50)),
+                ('resolution', models.CharField(choices=[('minute', '1 Minute'), ('hour', '1 Hour'), ('day', '1 Day')], help_text='Length of the bucket', max_length=10)),
+                ('bucket_start', models.DateTimeField(help_text='Start of the bucket')),
+                ('sample_count', models.PositiveIntegerField(default=0, help_text='Number of samples in the bucket')),
+                ('value_count', models.PositiveIntegerField(default=0, help_text='Number of samples with a value')),
+                ('value_sum', models.FloatField(blank=True, null=True)),
+                ('value_min', models.FloatField(blank=True, null=True)),
+                ('value_max', models.FloatField(blank=True, null=True)),
+                ('response_time_count', models.PositiveIntegerField(default=0, help_text='Number of samples with a response time')),
+                ('response_time_sum', models.FloatField(blank=True, null=True)),
+                ('response_time_min', models.FloatField(blank=True, null=True)),
+                ('response_time_max', models.FloatField(blank=True, null=True)),
+                ('warning_count', models.PositiveIntegerField(default=0, help_text='Number of warning samples')),
+                ('critical_count', models.PositiveIntegerField(default=0, help_text='Number of critical samples')),
+            ],
+            options={
+                'verbose_name': 'Health Metric Rollup',
+                'verbose_name_plural': 'Health Metric Rollups',
+                'ordering': ['bucket_start'],
+                'indexes': [models.Index(fields=['resolution', 'bucket_start'], name='core_health_resolut_af77ca_idx')],
+                'constraints': [models.UniqueConstraint(fields=('metric_name', 'resolution', 'bucket_start'), name='unique_health_metric_bucket')],
+            },
+        ),
+    ]
@@ -120,7 +120,14 @@ class HealthMetric(models.Model):
         help_text="Type of health metric"
     )
     metric_value = models.JSONField(
-        help_text="Detailed metric data in JSON format"
+        default=dict,
+        blank=True,
+        help_text="Detailed metric data in JSON format, kept for warning and critical samples"
+    )
+    value = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Main numeric reading of the metric, e.g. percent of memory used"
     )
     status = models.CharField(
         max_length=20,
@@ -136,8 +143,8 @@ class HealthMetric(models.Model):
         help_text="Response time in milliseconds"
     )
     timestamp = models.DateTimeField(
-        auto_now_add=True,
-        help_text="When this metric was recorded"
+        default=timezone.now,
+        help_text="When this metric was sampled"
     )
     
     class Meta:
@@ -204,6 +211,90 @@ class HealthMetric(models.Model):
         return self.timestamp >= cutoff
 
 
+class HealthMetricRollup(models.Model):
+    """
+    Model for health metrics downsampled into minute, hour and day buckets.
+    """
+    RESOLUTION_CHOICES = [
+        ('minute', '1 Minute'),
+        ('hour', '1 Hour'),
+        ('day', '1 Day'),
+    ]
+    
+    metric_name = models.CharField(
+        max_length=50,
+        choices=HealthMetric.METRIC_TYPE_CHOICES,
+        help_text="Type of health metric"
+    )
+    resolution = models.CharField(
+        max_length=10,
+        choices=RESOLUTION_CHOICES,
+        help_text="Length of the bucket"
+    )
+    bucket_start = models.DateTimeField(
+        help_text="Start of the bucket"
+    )
+    sample_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of samples in the bucket"
+    )
+    value_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of samples with a value"
+    )
+    value_sum = models.FloatField(null=True, blank=True)
+    value_min = models.FloatField(null=True, blank=True)
+    value_max = models.FloatField(null=True, blank=True)
+    response_time_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of samples with a response time"
+    )
+    response_time_sum = models.FloatField(null=True, blank=True)
+    response_time_min = models.FloatField(null=True, blank=True)
+    response_time_max = models.FloatField(null=True, blank=True)
+    warning_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of warning samples"
+    )
+    critical_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of critical samples"
+    )
+    
+    class Meta:
+        ordering = ['bucket_start']
+        verbose_name = "Health Metric Rollup"
+        verbose_name_plural = "Health Metric Rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['metric_name', 'resolution', 'bucket_start'], name='unique_health_metric_bucket'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['resolution', 'bucket_start']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_metric_name_display()} ({self.resolution}) - {self.bucket_start.strftime('%Y-%m-%d %H:%M')}"
+    
+    @property
+    def value_avg(self):
+        return self.value_sum / self.value_count if self.value_count else None
+    
+    @property
+    def response_time_avg(self):
+        return self.response_time_sum / self.response_time_count if self.response_time_count else None
+    
+    @property
+    def status(self):
+        """Worst status seen in the bucket."""
+        if self.critical_count:
+            return 'critical'
+        if self.warning_count:
+            return 'warning'
+        return 'healthy'
+
+
 class SystemAlert(models.Model):
     """
     Model for managing system alerts and notifications.
@@ -0,0 +1,311 @@
+"""
+Dashboard Snapshot Service
+
+This service builds the admin dashboard data once per role and shares it
+between all users of that role, instead of caching it per user. A snapshot
+is plain data (dicts, lists, numbers and datetimes) so it can be rendered,
+exported and serialised to JSON without touching the database again.
+
+Snapshots are served stale-while-revalidate. A snapshot younger than
+FRESH_SECONDS is served as is. An older one, or one marked stale by a
+change to posts, categories, pages, templates or users, is still served
+while a single refresh is queued in the background. Only a missing
+snapshot is built in the request, and concurrent requests for it wait for
+the one that holds the build lock rather than building it again. The
+``refresh_dashboard_snapshots`` task rebuilds every role every 5 minutes
+(scheduled by ``manage.py setup_dashboard_tasks``) so the dashboard is
+rarely stale at all.
+"""
+
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from blog.models import Category, Post
+from blog.performance import CacheManager
+from blog.services.view_trends_service import ViewTrendsService
+
+from ..models import Page, Template
+
+
+logger = logging.getLogger(__name__)
+
+
+def calculate_percentage_change(current, previous):
+    """Calculate percentage change between two values"""
+    if previous == 0:
+        return 100 if current > 0 else 0
+    return round(((current - previous) / previous) * 100, 1)
+
+
+class DashboardSnapshotService:
+    """Service for the role-scoped admin dashboard snapshots"""
+
+    ROLES = ('superuser', 'staff')
+
+    # Sections only shown to superusers
+    SUPERUSER_SECTIONS = ('recent_users',)
+
+    CACHE_PREFIX = 'dashboard_snapshot'
+    FRESH_SECONDS = 300
+    SNAPSHOT_TIMEOUT = 86400
+    LOCK_TIMEOUT = 60
+
+    # How long a request waits for a snapshot another request is building
+    WAIT_SECONDS = 10
+    WAIT_INTERVAL = 0.05
+
+    @classmethod
+    def role_for(cls, user) -> str:
+        """
+        Get the dashboard role of a user.
+
+        Args:
+            user: The requesting user
+
+        Returns:
+            'superuser' or 'staff'
+        """
+        return 'superuser' if user.is_superuser else 'staff'
+
+    @classmethod
+    def _key(cls, role: str, suffix: str = '') -> str:
+        return f"{cls.CACHE_PREFIX}:{role}{suffix}"
+
+    @classmethod
+    def get(cls, role: str) -> Dict[str, Any]:
+        """
+        Get the dashboard snapshot of a role.
+
+        Args:
+            role: 'superuser' or 'staff'
+
+        Returns:
+            dict: The snapshot, see build()
+        """
+        entry = cache.get(cls._key(role))
+        if entry is None:
+            return cls._build_once(role)
+
+        stale = cache.get(cls._key(role, ':stale'))
+        if stale or time.time() - entry['built_at'] > cls.FRESH_SECONDS:
+            cls.revalidate(role)
+        return entry['snapshot']
+
+    @classmethod
+    def _acquire_lock(cls, role: str) -> bool:
+        """
+        Take the build lock of a role.
+
+        On caches without an atomic add(), such as DatabaseCache, an expired
+        lock is overwritten without checking whether another request is
+        doing the same, so both would win. Reading the key first deletes an
+        expired lock, and the add() then relies on the unique cache key to
+        let exactly one request take it.
+        """
+        lock_key = cls._key(role, ':lock')
+        if not CacheManager.has_atomic_counters(cache):
+            cache.get(lock_key)
+        return cache.add(lock_key, 1, timeout=cls.LOCK_TIMEOUT)
+
+    @classmethod
+    def _build_once(cls, role: str) -> Dict[str, Any]:
+        lock_key = cls._key(role, ':lock')
+        if cls._acquire_lock(role):
+            try:
+                return cls.refresh(role)
+            finally:
+                cache.delete(lock_key)
+
+        # Another request is building it
+        deadline = time.monotonic() + cls.WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(cls.WAIT_INTERVAL)
+            entry = cache.get(cls._key(role))
+            if entry is not None:
+                return entry['snapshot']
+
+        logger.warning(f"Timed out waiting for the {role} dashboard snapshot, building it")
+        return cls.refresh(role)
+
+    @classmethod
+    def revalidate(cls, role: str) -> bool:
+        """
+        Queue a background refresh of a snapshot unless one is already queued.
+
+        Args:
+            role: 'superuser' or 'staff'
+
+        Returns:
+            True if a refresh was queued
+        """
+        from ..tasks import refresh_dashboard_snapshots
+
+        lock_key = cls._key(role, ':lock')
+        if not cls._acquire_lock(role):
+            return False
+
+        try:
+            refresh_dashboard_snapshots.delay(role)
+        except Exception as e:
+            cache.delete(lock_key)
+            logger.warning(f"Could not queue the {role} dashboard snapshot refresh: {str(e)}")
+            return False
+        return True
+
+    @classmethod
+    def refresh(cls, role: str) -> Dict[str, Any]:
+        """
+        Build a snapshot and store it in the cache.
+
+        Args:
+            role: 'superuser' or 'staff'
+
+        Returns:
+            dict: The snapshot
+        """
+        # Clear the stale mark first, so a change made during the build
+        # marks the new snapshot stale again
+        cache.delete(cls._key(role, ':stale'))
+        snapshot = cls.build(role)
+        cache.set(cls._key(role), {'snapshot': snapshot, 'built_at': time.time()}, cls.SNAPSHOT_TIMEOUT)
+        return snapshot
+
+    @classmethod
+    def refresh_all(cls, roles=None) -> int:
+        """
+        Rebuild snapshots and release their refresh locks.
+
+        Args:
+            roles: Roles to rebuild, defaults to every role
+
+        Returns:
+            Number of snapshots rebuilt
+        """
+        roles = roles or cls.ROLES
+        for role in roles:
+            try:
+                cls.refresh(role)
+            finally:
+                cache.delete(cls._key(role, ':lock'))
+        return len(roles)
+
+    @classmethod
+    def mark_stale(cls):
+        """Mark the snapshots of every role stale after a change to their data."""
+        cache.set_many({cls._key(role, ':stale'): 1 for role in cls.ROLES}, cls.SNAPSHOT_TIMEOUT)
+
+    @classmethod
+    def build(cls, role: str, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Build the dashboard snapshot of a role.
+
+        Args:
+            role: 'superuser' or 'staff'
+            now: Time the 30 day comparisons end at, defaults to now
+
+        Returns:
+            dict: Metrics, chart data, views trend, recent posts, analytics
+            data and system health as plain data
+        """
+        now = now or timezone.now()
+        thirty_days_ago = now - timedelta(days=30)
+        sixty_days_ago = now - timedelta(days=60)
+
+        # 1. Current totals
+        total_users = User.objects.count()
+        total_posts = Post.objects.count()
+        total_post_views = Post.objects.aggregate(Sum('view_count'))['view_count__sum'] or 0
+        total_categories = Category.objects.count()
+        total_pages = Page.objects.count()
+        total_templates = Template.objects.count()
+
+        # 2. Changes over the last 30 days against the previous 30 days
+        try:
+            posts_change = calculate_percentage_change(
+                Post.objects.filter(created_at__gte=thirty_days_ago).count(),
+                Post.objects.filter(created_at__gte=sixty_days_ago, created_at__lt=thirty_days_ago).count()
+            )
+            users_change = calculate_percentage_change(
+                User.objects.filter(date_joined__gte=thirty_days_ago).count(),
+                User.objects.filter(date_joined__gte=sixty_days_ago, date_joined__lt=thirty_days_ago).count()
+            )
+            views_change = calculate_percentage_change(*ViewTrendsService.period_views(days=30))
+        except Exception as e:
+            logger.warning(f"Could not compute dashboard changes: {str(e)}")
+            posts_change = users_change = views_change = 0
+
+        metrics = [
+            {'label': _('Total Users'), 'value': total_users, 'icon': 'group',
+             'change': users_change, 'color': 'blue'},
+            {'label': _('Total Posts'), 'value': total_posts, 'icon': 'article',
+             'change': posts_change, 'color': 'green'},
+            {'label': _('Total Views'), 'value': total_post_views, 'icon': 'visibility',
+             'change': views_change, 'color': 'purple'},
+            {'label': _('Categories'), 'value': total_categories, 'icon': 'folder',
+             'change': 0, 'color': 'orange'},
+            {'label': _('Pages'), 'value': total_pages, 'icon': 'layers',
+             'change': 0, 'color': 'red'},
+            {'label': _('Templates'), 'value': total_templates, 'icon': 'dashboard_customize',
+             'change': 0, 'color': 'indigo'},
+        ]
+
+        chart_data = {
+            'labels': [_("Posts"), _("Categories"), _("Pages"), _("Templates")],
+            'values': [total_posts, total_categories, total_pages, total_templates],
+        }
+
+        # Daily site views for the last two weeks (sparkline)
+        daily_views = ViewTrendsService.daily_series(days=14)
+        views_trend = {
+            'labels': [day.strftime('%b %d') for day, _views in daily_views],
+            'values': [views for _day, views in daily_views],
+        }
+
+        recent_posts = list(Post.objects.order_by('-updated_at').values('id', 'title', 'status', 'updated_at')[:8])
+
+        try:
+            analytics_data = {
+                'posts_by_status': list(Post.objects.order_by().values('status').annotate(count=Count('id'))),
+                'posts_by_category': list(
+                    Post.objects.filter(categories__isnull=False).values('categories__name')
+                    .annotate(count=Count('id')).order_by('-count')[:5]
+                ),
+                'recent_users': list(User.objects.order_by('-date_joined').values('id', 'username', 'date_joined')[:5]),
+                'popular_posts': list(Post.objects.order_by('-view_count').values('id', 'title', 'view_count')[:5]),
+            }
+        except Exception as e:
+            logger.warning(f"Could not compute dashboard analytics: {str(e)}")
+            analytics_data = {
+                'posts_by_status': [],
+                'posts_by_category': [],
+                'recent_users': [],
+                'popular_posts': [],
+            }
+
+        if role != 'superuser':
+            for section in cls.SUPERUSER_SECTIONS:
+                analytics_data.pop(section, None)
+
+        return {
+            'role': role,
+            'metrics': metrics,
+            'chart_data': chart_data,
+            'views_trend': views_trend,
+            'recent_posts': recent_posts,
+            'analytics_data': analytics_data,
+            'system_health': {
+                'database_connection': True,
+                'cache_status': True,
+                'last_backup': None,
+            },
+            'dashboard_title': _("Digital Architect Dashboard"),
+            'last_updated': now.isoformat(),
+        }
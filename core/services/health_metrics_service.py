@@ -0,0 +1,553 @@
+"""
+Health Metrics Service
+
+This module stores health check samples as a time series. HealthService
+hands each sample to ``metric_writer``, a single background thread that
+inserts them in batches, instead of starting a thread per dashboard refresh.
+Every check is recorded, healthy ones included, with its main reading
+extracted from the check details into the ``value`` column. The full details
+are only kept for warning and critical samples.
+
+``HealthMetricStore.rollup()`` folds raw samples into 1-minute buckets,
+minutes into hours and hours into days, keeping the count, sum, min and max
+of the value and the response time so that coarser tiers are built from the
+finer ones without rereading samples. Each run recomputes only the buckets
+from the last one written onwards. ``prune()`` then applies the retention of
+each tier in batches, and ``series()`` serves a time range from the finest
+tier that fits it within the requested number of points.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from datetime import timedelta, timezone as dt_timezone
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import TruncDay, TruncHour, TruncMinute
+from django.utils import timezone
+
+from ..models import HealthMetric, HealthMetricRollup, SystemAlert
+
+
+logger = logging.getLogger(__name__)
+
+METRICS_RETENTION_DAYS = getattr(settings, 'HEALTH_METRICS_RETENTION_DAYS', 7)  # 7 days
+ROLLUP_RETENTION_DAYS = getattr(settings, 'HEALTH_METRICS_ROLLUP_RETENTION_DAYS', {
+    'minute': 14,
+    'hour': 180,
+    'day': 1825,
+})
+
+# Detail key holding the main reading of each check
+VALUE_FIELDS = {
+    'memory': 'percent_used',
+    'disk': 'percent_used',
+    'system_load': 'cpu_percent',
+    'api': 'error_rate_24h',
+    'celery': 'active_workers',
+    'redis': 'used_memory_percentage',
+    'logs': 'recent_errors',
+}
+
+
+def extract_value(metric_name: str, details: Optional[Dict[str, Any]]) -> Optional[float]:
+    """
+    Extract the main numeric reading of a check from its details.
+
+    Args:
+        metric_name: Name of the health check
+        details: Details returned by the check
+
+    Returns:
+        The reading as a float, or None if the check has none
+    """
+    field = VALUE_FIELDS.get(metric_name)
+    if not field or not details:
+        return None
+    value = details.get(field)
+    if isinstance(value, (list, tuple)):
+        return float(len(value))
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class HealthMetricWriter:
+    """
+    Writes health samples from a single background thread.
+
+    Samples are queued by ``submit()`` and inserted with one bulk insert per
+    batch of up to BATCH_SIZE samples or FLUSH_INTERVAL seconds. Critical
+    samples raise a SystemAlert unless one is already open for the check.
+
+    The thread starts on the first sample unless autostart is off; by
+    default it follows the HEALTH_METRIC_WRITER_AUTOSTART setting, which is
+    off under tests. Without the thread samples wait for ``flush()``.
+    """
+
+    BATCH_SIZE = 500
+    FLUSH_INTERVAL = 5  # seconds
+    QUEUE_SIZE = 10000
+    # Queued by stop() to end the background thread
+    STOP = object()
+
+    def __init__(self, autostart: Optional[bool] = None):
+        self._autostart = autostart
+        self.queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, metric_name: str, status: str, message: str, details: Optional[Dict[str, Any]] = None,
+               response_time: Optional[float] = None, value: Optional[float] = None, timestamp=None) -> bool:
+        """
+        Queue a health sample for writing.
+
+        Args:
+            metric_name: Name of the health check
+            status: Status of the check
+            message: Message of the check
+            details: Details of the check, kept for warning and critical samples
+            response_time: Response time in milliseconds
+            value: Main reading, extracted from the details if not given
+            timestamp: Time of the sample, defaults to now
+
+        Returns:
+            True if the sample was queued, False if the queue is full
+        """
+        sample = HealthMetric(
+            metric_name=metric_name,
+            metric_value=(details or {}) if status != 'healthy' else {},
+            value=value if value is not None else extract_value(metric_name, details),
+            status=status,
+            message=message,
+            response_time=response_time,
+            timestamp=timestamp or timezone.now(),
+        )
+        try:
+            self.queue.put_nowait(sample)
+        except queue.Full:
+            logger.warning(f"Health metric queue is full, dropping {metric_name} sample")
+            return False
+
+        if self.autostart:
+            self._ensure_started()
+        return True
+
+    @property
+    def autostart(self) -> bool:
+        if self._autostart is None:
+            return getattr(settings, 'HEALTH_METRIC_WRITER_AUTOSTART', True)
+        return self._autostart
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self, timeout: float = 10) -> bool:
+        """
+        Stop the background thread once it has written the samples it took.
+
+        Samples queued after the stop are left for ``flush()``.
+
+        Args:
+            timeout: Seconds to wait for the thread
+
+        Returns:
+            True if the thread is stopped
+        """
+        with self._lock:
+            thread = self._thread
+            if thread is None or not thread.is_alive():
+                return True
+            self.queue.put(self.STOP, timeout=timeout)
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def flush(self) -> int:
+        """
+        Write all queued samples in the calling thread.
+
+        Returns:
+            Number of samples written
+        """
+        written = 0
+        while True:
+            batch = self._take(self.BATCH_SIZE)
+            if not batch:
+                return written
+            self._write(batch)
+            written += len(batch)
+
+    def _ensure_started(self):
+        if self.running:
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='health-metric-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            sample = self.queue.get()
+            if sample is self.STOP:
+                break
+            batch = [sample]
+            deadline = time.monotonic() + self.FLUSH_INTERVAL
+            while len(batch) < self.BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    sample = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if sample is self.STOP:
+                    stopping = True
+                    break
+                batch.append(sample)
+
+            close_old_connections()
+            try:
+                self._write(batch)
+            except Exception as e:
+                logger.error(f"Failed to record {len(batch)} health metrics: {str(e)}")
+        close_old_connections()
+
+    def _take(self, limit: int) -> List[HealthMetric]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                sample = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if sample is not self.STOP:
+                batch.append(sample)
+        return batch
+
+    def _write(self, batch: List[HealthMetric]):
+        HealthMetric.objects.bulk_create(batch, batch_size=self.BATCH_SIZE)
+
+        critical = {sample.metric_name: sample for sample in batch if sample.status == 'critical'}
+        if not critical:
+            return
+
+        alerted = set(SystemAlert.objects.filter(
+            source_metric__in=critical, resolved=False
+        ).values_list('source_metric', flat=True))
+        for name, sample in critical.items():
+            if name not in alerted:
+                SystemAlert.create_alert(
+                    alert_type='health_check',
+                    title=f"{name.title()} Critical Issue",
+                    message=sample.message,
+                    severity='critical',
+                    source_metric=name,
+                    metadata=sample.metric_value
+                )
+
+
+class HealthMetricStore:
+    """Rollups, retention and range queries over the health metric time series"""
+
+    RESOLUTIONS = {
+        'minute': timedelta(minutes=1),
+        'hour': timedelta(hours=1),
+        'day': timedelta(days=1),
+    }
+    TRUNCATE = {
+        'minute': TruncMinute,
+        'hour': TruncHour,
+        'day': TruncDay,
+    }
+
+    # Each tier and the tier it is built from, None being the raw samples
+    TIERS = (('minute', None), ('hour', 'minute'), ('day', 'hour'))
+
+    # Span of the source read by one rollup query
+    ROLLUP_SLICES = {
+        'minute': timedelta(days=1),
+        'hour': timedelta(days=30),
+        'day': timedelta(days=365),
+    }
+
+    # Minutes recomputed on every run for samples still queued by writers
+    LATE_SAMPLE_GRACE = timedelta(minutes=5)
+
+    # Longest range served from raw samples
+    RAW_SERIES_SPAN = timedelta(hours=1)
+    MAX_POINTS = 1440
+
+    # Raw samples kept longer when something was wrong
+    RAW_RETENTION_DAYS = {
+        'healthy': METRICS_RETENTION_DAYS,
+        'warning': METRICS_RETENTION_DAYS + 7,
+        'critical': METRICS_RETENTION_DAYS + 14,
+    }
+    DELETE_BATCH_SIZE = 5000
+
+    @classmethod
+    def bucket_start(cls, moment, resolution: str):
+        """
+        Get the start of the bucket holding a moment.
+
+        Args:
+            moment: Aware datetime
+            resolution: 'minute', 'hour' or 'day'
+
+        Returns:
+            Start of the bucket in UTC
+        """
+        moment = moment.astimezone(dt_timezone.utc).replace(second=0, microsecond=0)
+        if resolution in ('hour', 'day'):
+            moment = moment.replace(minute=0)
+        if resolution == 'day':
+            moment = moment.replace(hour=0)
+        return moment
+
+    @classmethod
+    def rollup(cls, now=None) -> Dict[str, int]:
+        """
+        Fold new samples into the minute, hour and day tiers.
+
+        Args:
+            now: Time to roll up to, defaults to now
+
+        Returns:
+            Dict with the number of buckets written per tier
+        """
+        now = now or timezone.now()
+        summary = {}
+        source_start = None
+
+        for resolution, source in cls.TIERS:
+            start = cls._rollup_start(resolution, source, source_start, now)
+            summary[resolution] = cls._rebuild(resolution, source, start, now) if start else 0
+            source_start = start
+
+        return summary
+
+    @classmethod
+    def _rollup_start(cls, resolution, source, source_start, now):
+        last = HealthMetricRollup.objects.filter(resolution=resolution).aggregate(
+            last=Max('bucket_start'))['last']
+
+        if source is None:
+            if last is None:
+                last = HealthMetric.objects.aggregate(first=Min('timestamp'))['first']
+                if last is None:
+                    return None
+            start = min(last, now - cls.LATE_SAMPLE_GRACE)
+        else:
+            if source_start is None:
+                return None
+            start = min(last, source_start) if last else source_start
+
+        return cls.bucket_start(start, resolution)
+
+    @classmethod
+    def _rebuild(cls, resolution, source, start, now) -> int:
+        written = 0
+        with transaction.atomic():
+            HealthMetricRollup.objects.filter(resolution=resolution, bucket_start__gte=start).delete()
+
+            window = start
+            while window <= now:
+                end = window + cls.ROLLUP_SLICES[resolution]
+                buckets = [
+                    HealthMetricRollup(resolution=resolution, bucket_start=row.pop('bucket'), **row)
+                    for row in cls._aggregate(resolution, source, window, end)
+                ]
+                HealthMetricRollup.objects.bulk_create(buckets, batch_size=1000)
+                written += len(buckets)
+                window = end
+
+        return written
+
+    @classmethod
+    def _aggregate(cls, resolution, source, start, end):
+        truncate = cls.TRUNCATE[resolution]
+
+        if source is None:
+            return HealthMetric.objects.filter(
+                timestamp__gte=start, timestamp__lt=end
+            ).order_by().annotate(
+                bucket=truncate('timestamp', tzinfo=dt_timezone.utc)
+            ).values('metric_name', 'bucket').annotate(
+                sample_count=Count('id'),
+                value_count=Count('value'),
+                value_sum=Sum('value'),
+                value_min=Min('value'),
+                value_max=Max('value'),
+                response_time_count=Count('response_time'),
+                response_time_sum=Sum('response_time'),
+                response_time_min=Min('response_time'),
+                response_time_max=Max('response_time'),
+                warning_count=Count('id', filter=Q(status='warning')),
+                critical_count=Count('id', filter=Q(status='critical')),
+            )
+
+        return HealthMetricRollup.objects.filter(
+            resolution=source, bucket_start__gte=start, bucket_start__lt=end
+        ).order_by().annotate(
+            bucket=truncate('bucket_start', tzinfo=dt_timezone.utc)
+        ).values('metric_name', 'bucket').annotate(
+            sample_count=Sum('sample_count'),
+            value_count=Sum('value_count'),
+            value_sum=Sum('value_sum'),
+            value_min=Min('value_min'),
+            value_max=Max('value_max'),
+            response_time_count=Sum('response_time_count'),
+            response_time_sum=Sum('response_time_sum'),
+            response_time_min=Min('response_time_min'),
+            response_time_max=Max('response_time_max'),
+            warning_count=Sum('warning_count'),
+            critical_count=Sum('critical_count'),
+        )
+
+    @classmethod
+    def prune(cls, now=None) -> Dict[str, int]:
+        """
+        Delete samples and buckets past the retention of their tier.
+
+        Raw samples are only deleted once they have been rolled up.
+
+        Args:
+            now: Time the retention is counted from, defaults to now
+
+        Returns:
+            Dict with the number of rows deleted per tier
+        """
+        now = now or timezone.now()
+        summary = {'raw': 0}
+
+        rolled_up = HealthMetricRollup.objects.filter(resolution='minute').aggregate(
+            last=Max('bucket_start'))['last']
+        if rolled_up:
+            for status, days in cls.RAW_RETENTION_DAYS.items():
+                cutoff = min(now - timedelta(days=days), rolled_up)
+                summary['raw'] += cls._delete(HealthMetric.objects.filter(status=status, timestamp__lt=cutoff))
+
+        for resolution, days in ROLLUP_RETENTION_DAYS.items():
+            summary[resolution] = cls._delete(HealthMetricRollup.objects.filter(
+                resolution=resolution, bucket_start__lt=now - timedelta(days=days)
+            ))
+
+        deleted = sum(summary.values())
+        if deleted:
+            logger.info(f"Pruned {deleted} health metric rows: {summary}")
+        return summary
+
+    @classmethod
+    def _delete(cls, queryset) -> int:
+        deleted = 0
+        while True:
+            pks = list(queryset.order_by().values_list('pk', flat=True)[:cls.DELETE_BATCH_SIZE])
+            if not pks:
+                return deleted
+            deleted += queryset.model.objects.filter(pk__in=pks).delete()[0]
+
+    @classmethod
+    def resolution_for(cls, start, end, max_points=MAX_POINTS, now=None) -> str:
+        """
+        Pick the finest tier that serves a range within a number of points.
+
+        Args:
+            start: Start of the range
+            end: End of the range
+            max_points: Largest number of points wanted
+            now: Time retention is counted from, defaults to now
+
+        Returns:
+            'raw', 'minute', 'hour' or 'day'
+        """
+        now = now or timezone.now()
+        span = end - start
+
+        if span <= cls.RAW_SERIES_SPAN and start >= now - timedelta(days=METRICS_RETENTION_DAYS):
+            return 'raw'
+        for resolution, width in cls.RESOLUTIONS.items():
+            retained_since = now - timedelta(days=ROLLUP_RETENTION_DAYS[resolution])
+            if span / width <= max_points and start >= retained_since:
+                return resolution
+        return 'day'
+
+    @classmethod
+    def series(cls, metric_name: str, start, end=None, max_points: int = MAX_POINTS) -> Dict[str, Any]:
+        """
+        Get a metric over a time range at an appropriate resolution.
+
+        Args:
+            metric_name: Name of the health check
+            start: Start of the range
+            end: End of the range, defaults to now
+            max_points: Largest number of points wanted
+
+        Returns:
+            Dict with the resolution and one point per sample or bucket
+        """
+        end = end or timezone.now()
+        resolution = cls.resolution_for(start, end, max_points)
+
+        if resolution == 'raw':
+            samples = HealthMetric.objects.filter(
+                metric_name=metric_name, timestamp__gte=start, timestamp__lte=end
+            ).order_by('timestamp').values_list('timestamp', 'value', 'response_time', 'status')
+            points = [
+                {
+                    'timestamp': timestamp.isoformat(),
+                    'avg': value,
+                    'min': value,
+                    'max': value,
+                    'response_time': response_time,
+                    'samples': 1,
+                    'status': status,
+                }
+                for timestamp, value, response_time, status in samples
+            ]
+        else:
+            buckets = HealthMetricRollup.objects.filter(
+                metric_name=metric_name, resolution=resolution,
+                bucket_start__gte=cls.bucket_start(start, resolution), bucket_start__lte=end
+            ).order_by('bucket_start')
+            points = [
+                {
+                    'timestamp': bucket.bucket_start.isoformat(),
+                    'avg': bucket.value_avg,
+                    'min': bucket.value_min,
+                    'max': bucket.value_max,
+                    'response_time': bucket.response_time_avg,
+                    'samples': bucket.sample_count,
+                    'status': bucket.status,
+                }
+                for bucket in buckets
+            ]
+
+        return {
+            'metric_name': metric_name,
+            'resolution': resolution,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'points': points,
+        }
+
+
+# Global writer instance
+metric_writer = HealthMetricWriter()
+
+
+@atexit.register
+def _flush_at_exit():
+    # Without the thread, e.g. under tests, samples are only written on request
+    if not metric_writer.autostart:
+        return
+    try:
+        metric_writer.flush()
+    except Exception as e:
+        logger.error(f"Failed to flush health metrics at exit: {str(e)}")
@@ -11,9 +11,10 @@ import logging
 import os
 import psutil
 import shutil
-import time
 import threading
+import time
 import functools
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Callable
 from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
@@ -22,7 +23,10 @@ from django.core.cache import cache
 from django.db import connection, connections
 from django.conf import settings
 from django.utils import timezone
-from django.db.models import Count, Avg, Q
+from django.db.models import Count, Q
+
+from .health_metrics_service import metric_writer
+from .worker_telemetry import WorkerTelemetry
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -31,7 +35,6 @@ logger = logging.getLogger(__name__)
 MAX_WORKERS = getattr(settings, 'HEALTH_SERVICE_MAX_WORKERS', 4)
 DEFAULT_CACHE_TIMEOUT = getattr(settings, 'HEALTH_SERVICE_CACHE_TIMEOUT', 60)  # 1 minute
 CRITICAL_CACHE_TIMEOUT = getattr(settings, 'HEALTH_SERVICE_CRITICAL_CACHE_TIMEOUT', 10)  # 10 seconds
-METRICS_RETENTION_DAYS = getattr(settings, 'HEALTH_METRICS_RETENTION_DAYS', 7)  # 7 days
 
 # Performance monitoring
 PERFORMANCE_STATS = {
@@ -708,7 +711,8 @@ class APIHealthChecker(BaseHealthChecker):
             
             # Import API models
             try:
-                from api.models import APIClient, APIKey, APIUsageLog
+                from api.models import APIClient, APIKey
+                from api.services.usage_log_service import UsageLogService
             except ImportError:
                 return HealthCheckResult(
                     status='warning',
@@ -723,7 +727,7 @@ class APIHealthChecker(BaseHealthChecker):
             
             # Collect API statistics
             api_stats = self._collect_api_statistics(
-                APIClient, APIKey, APIUsageLog, 
+                APIClient, APIKey, UsageLogService,
                 now, twenty_four_hours_ago, one_hour_ago
             )
             
@@ -758,8 +762,13 @@ class APIHealthChecker(BaseHealthChecker):
                 details={'error': str(e)}
             )
     
-    def _collect_api_statistics(self, APIClient, APIKey, APIUsageLog, now, twenty_four_hours_ago, one_hour_ago) -> Dict[str, Any]:
-        """Collect comprehensive API statistics."""
+    def _collect_api_statistics(self, APIClient, APIKey, usage_logs, now, twenty_four_hours_ago, one_hour_ago) -> Dict[str, Any]:
+        """
+        Collect comprehensive API statistics.
+        
+        Usage comes from UsageLogService summaries, one grouped query per
+        monthly usage log partition in the window.
+        """
         try:
             # Basic counts
             total_clients = APIClient.objects.count()
@@ -767,60 +776,61 @@ class APIHealthChecker(BaseHealthChecker):
             total_api_keys = APIKey.objects.count()
             active_api_keys = APIKey.objects.filter(is_active=True, expires_at__gt=now).count()
             
-            # Usage statistics for last 24 hours
-            usage_24h = APIUsageLog.objects.filter(timestamp__gte=twenty_four_hours_ago)
-            total_requests_24h = usage_24h.count()
-            
-            # Usage statistics for last 1 hour
-            usage_1h = APIUsageLog.objects.filter(timestamp__gte=one_hour_ago)
-            total_requests_1h = usage_1h.count()
+            # Usage statistics for the last 24 hours and the last hour
+            usage_24h = usage_logs.summary(start=twenty_four_hours_ago)
+            usage_1h = usage_logs.summary(start=one_hour_ago)
+            total_requests_24h = usage_24h['total_requests']
+            total_requests_1h = usage_1h['total_requests']
             
             # Error statistics
-            error_requests_24h = usage_24h.filter(status_code__gte=400).count()
-            error_requests_1h = usage_1h.filter(status_code__gte=400).count()
+            error_requests_24h = usage_24h['error_requests']
+            error_requests_1h = usage_1h['error_requests']
             
             # Calculate error rates
             error_rate_24h = (error_requests_24h / total_requests_24h * 100) if total_requests_24h > 0 else 0
             error_rate_1h = (error_requests_1h / total_requests_1h * 100) if total_requests_1h > 0 else 0
             
             # Average response time
-            avg_response_time_24h = usage_24h.aggregate(avg_time=Avg('response_time'))['avg_time'] or 0
-            avg_response_time_1h = usage_1h.aggregate(avg_time=Avg('response_time'))['avg_time'] or 0
+            avg_response_time_24h = usage_24h['average_response_time']
+            avg_response_time_1h = usage_1h['average_response_time']
             
             # Top endpoints by usage
-            top_endpoints_24h = list(
-                usage_24h.values('endpoint')
-                .annotate(count=Count('endpoint'))
-                .order_by('-count')[:5]
-            )
+            endpoint_counts = Counter()
+            for (endpoint, method), count in usage_24h['endpoints'].items():
+                endpoint_counts[endpoint] += count
+            top_endpoints_24h = [
+                {'endpoint': endpoint, 'count': count}
+                for endpoint, count in endpoint_counts.most_common(5)
+            ]
             
             # Rate limiting statistics
-            rate_limited_requests_24h = usage_24h.filter(status_code=429).count()
-            rate_limited_requests_1h = usage_1h.filter(status_code=429).count()
+            rate_limited_requests_24h = usage_24h['rate_limited_requests']
+            rate_limited_requests_1h = usage_1h['rate_limited_requests']
             
             # Client activity
-            active_clients_24h = usage_24h.values('client').distinct().count()
-            active_clients_1h = usage_1h.values('client').distinct().count()
+            active_clients_24h = len(usage_24h['clients'])
+            active_clients_1h = len(usage_1h['clients'])
             
             # Most active clients
-            top_clients_24h = list(
-                usage_24h.values('client__name')
-                .annotate(request_count=Count('id'))
-                .order_by('-request_count')[:5]
+            top_client_counts = usage_24h['clients'].most_common(5)
+            client_names = dict(
+                APIClient.objects.filter(pk__in=[pk for pk, count in top_client_counts]).values_list('pk', 'name')
             )
+            top_clients_24h = [
+                {'client__name': client_names.get(pk), 'request_count': count}
+                for pk, count in top_client_counts
+            ]
             
             # Status code distribution
-            status_codes_24h = list(
-                usage_24h.values('status_code')
-                .annotate(count=Count('status_code'))
-                .order_by('status_code')
-            )
+            status_codes_24h = [
+                {'status_code': code, 'count': count}
+                for code, count in sorted(usage_24h['status_codes'].items())
+            ]
             
             # Recent errors (last 10)
-            recent_errors = list(
-                usage_24h.filter(status_code__gte=400)
-                .order_by('-timestamp')
-                .values('endpoint', 'method', 'status_code', 'error_message', 'timestamp', 'client__name')[:10]
+            recent_errors = usage_logs.recent(
+                10, start=twenty_four_hours_ago, status_code__gte=400,
+                fields=['endpoint', 'method', 'status_code', 'error_message', 'timestamp', 'client__name'],
             )
             
             # API key expiration warnings
@@ -887,6 +897,9 @@ class APIHealthChecker(BaseHealthChecker):
 class CeleryHealthChecker(BaseHealthChecker):
     """Health checker for Celery worker status and task queue monitoring."""
     
+    # How long the task result and periodic task summary is cached
+    DB_STATS_TIMEOUT = 60
+    
     def check(self) -> HealthCheckResult:
         """Check Celery worker status and task queue health."""
         try:
@@ -957,71 +970,47 @@ class CeleryHealthChecker(BaseHealthChecker):
             )
     
     def _collect_celery_statistics(self, celery_app, TaskResult, PeriodicTask) -> Dict[str, Any]:
-        """Collect comprehensive Celery statistics."""
+        """
+        Collect Celery statistics.
+
+        Worker, queue and task counts come from the telemetry the workers
+        publish to the cache rather than from inspect() broadcasts. The
+        TaskResult and PeriodicTask summaries are aggregated in one query
+        each and cached for DB_STATS_TIMEOUT seconds.
+        """
         try:
             stats = {}
             
             # Get worker information
             try:
-                inspect = celery_app.control.inspect()
-                active_workers = inspect.active()
-                registered_tasks = inspect.registered()
+                telemetry = WorkerTelemetry.snapshot()
+                workers = telemetry['workers']
                 
-                if active_workers:
-                    stats['active_workers'] = len(active_workers.keys())
-                    stats['worker_names'] = list(active_workers.keys())
-                    
-                    # Count active tasks across all workers
-                    total_active_tasks = sum(len(tasks) for tasks in active_workers.values())
-                    stats['active_tasks'] = total_active_tasks
-                    
-                    # Get registered tasks count
-                    if registered_tasks:
-                        total_registered = sum(len(tasks) for tasks in registered_tasks.values())
-                        stats['registered_tasks'] = total_registered
-                else:
-                    stats['active_workers'] = 0
-                    stats['worker_names'] = []
-                    stats['active_tasks'] = 0
-                    stats['registered_tasks'] = 0
+                stats['active_workers'] = len(workers)
+                stats['worker_names'] = sorted(worker['hostname'] for worker in workers)
+                stats['active_tasks'] = telemetry['active_tasks']
+                stats['queued_tasks'] = telemetry['queues']
+                if workers:
+                    stats['last_heartbeat_seconds'] = round(
+                        time.time() - max(worker['last_seen'] for worker in workers), 1
+                    )
+                
+                # Tasks registered with this app, leaving out Celery's own
+                stats['registered_tasks'] = len([name for name in celery_app.tasks if not name.startswith('celery.')])
+                
+                processed = telemetry['tasks']
+                stats['processed_tasks_24h'] = processed['total']
+                if processed['total'] > 0:
+                    stats['avg_task_time_24h'] = round(processed['runtime_ms'] / processed['total'], 2)
                     
             except Exception as worker_error:
                 logger.warning(f"Could not get worker info: {str(worker_error)}")
                 stats['active_workers'] = 0
                 stats['worker_error'] = str(worker_error)
             
-            # Get task statistics from database
+            # Get task and periodic task statistics from the database
             try:
-                now = timezone.now()
-                twenty_four_hours_ago = now - timedelta(hours=24)
-                
-                # Task results in last 24 hours
-                recent_tasks = TaskResult.objects.filter(date_created__gte=twenty_four_hours_ago)
-                stats['total_tasks_24h'] = recent_tasks.count()
-                
-                # Task status breakdown
-                stats['successful_tasks_24h'] = recent_tasks.filter(status='SUCCESS').count()
-                stats['failed_tasks_24h'] = recent_tasks.filter(status='FAILURE').count()
-                stats['pending_tasks_24h'] = recent_tasks.filter(status='PENDING').count()
-                stats['retry_tasks_24h'] = recent_tasks.filter(status='RETRY').count()
-                
-                # Calculate success rate
-                if stats['total_tasks_24h'] > 0:
-                    success_rate = (stats['successful_tasks_24h'] / stats['total_tasks_24h']) * 100
-                    stats['success_rate_24h'] = round(success_rate, 2)
-                else:
-                    stats['success_rate_24h'] = 100.0
-                
-                # Average task execution time
-                successful_tasks = recent_tasks.filter(status='SUCCESS', date_done__isnull=False)
-                if successful_tasks.exists():
-                    # Calculate average execution time (this is approximate)
-                    avg_runtime = successful_tasks.aggregate(
-                        avg_time=Avg('date_done') - Avg('date_created')
-                    )
-                    # Note: This is a simplified calculation
-                    stats['avg_task_time_24h'] = 'Available in task details'
-                
+                stats.update(self._collect_task_statistics(TaskResult, PeriodicTask))
             except Exception as db_error:
                 logger.warning(f"Could not get task statistics: {str(db_error)}")
                 stats['db_error'] = str(db_error)
@@ -1029,23 +1018,6 @@ class CeleryHealthChecker(BaseHealthChecker):
                 stats['successful_tasks_24h'] = 0
                 stats['failed_tasks_24h'] = 0
             
-            # Get periodic task information
-            try:
-                periodic_tasks = PeriodicTask.objects.all()
-                stats['total_periodic_tasks'] = periodic_tasks.count()
-                stats['enabled_periodic_tasks'] = periodic_tasks.filter(enabled=True).count()
-                
-                # Get recent periodic task names
-                recent_periodic = list(
-                    periodic_tasks.filter(enabled=True)
-                    .values_list('name', flat=True)[:5]
-                )
-                stats['recent_periodic_tasks'] = recent_periodic
-                
-            except Exception as periodic_error:
-                logger.warning(f"Could not get periodic task info: {str(periodic_error)}")
-                stats['periodic_error'] = str(periodic_error)
-            
             # Broker connection test
             try:
                 # Test broker connection
@@ -1072,10 +1044,97 @@ class CeleryHealthChecker(BaseHealthChecker):
                 'failed_tasks_24h': 0
             }
 
+    
+    def _collect_task_statistics(self, TaskResult, PeriodicTask) -> Dict[str, Any]:
+        """Summarise the task results of the last 24 hours and the periodic tasks."""
+        cache_key = 'health_check_celery_task_statistics'
+        stats = cache.get(cache_key)
+        if stats is not None:
+            return stats
+        
+        twenty_four_hours_ago = timezone.now() - timedelta(hours=24)
+        
+        # One range scan of the date_created index, grouped by status. The
+        # default ordering is cleared so it doesn't end up in the GROUP BY.
+        by_status = dict(
+            TaskResult.objects.filter(date_created__gte=twenty_four_hours_ago)
+            .order_by().values_list('status').annotate(count=Count('id'))
+        )
+        
+        stats = {
+            'total_tasks_24h': sum(by_status.values()),
+            'successful_tasks_24h': by_status.get('SUCCESS', 0),
+            'failed_tasks_24h': by_status.get('FAILURE', 0),
+            'pending_tasks_24h': by_status.get('PENDING', 0),
+            'retry_tasks_24h': by_status.get('RETRY', 0),
+        }
+        
+        # Calculate success rate
+        if stats['total_tasks_24h'] > 0:
+            success_rate = (stats['successful_tasks_24h'] / stats['total_tasks_24h']) * 100
+            stats['success_rate_24h'] = round(success_rate, 2)
+        else:
+            stats['success_rate_24h'] = 100.0
+        
+        # Get periodic task information
+        try:
+            stats.update(PeriodicTask.objects.aggregate(
+                total_periodic_tasks=Count('id'),
+                enabled_periodic_tasks=Count('id', filter=Q(enabled=True)),
+            ))
+            stats['recent_periodic_tasks'] = list(
+                PeriodicTask.objects.filter(enabled=True).values_list('name', flat=True)[:5]
+            )
+        except Exception as periodic_error:
+            logger.warning(f"Could not get periodic task info: {str(periodic_error)}")
+            stats['periodic_error'] = str(periodic_error)
+        
+        cache.set(cache_key, stats, self.DB_STATS_TIMEOUT)
+        return stats
+
+# Redis clients shared by every health check, one connection pool per URL
+REDIS_MAX_CONNECTIONS = getattr(settings, 'HEALTH_SERVICE_REDIS_MAX_CONNECTIONS', 4)
+_redis_clients = {}
+_redis_clients_lock = threading.Lock()
+
+
+def get_redis_client(redis_url: str, timeout: float = 5.0):
+    """
+    Get a Redis client backed by a shared connection pool.
+
+    Args:
+        redis_url: Redis URL
+        timeout: Socket and connect timeout in seconds
+
+    Returns:
+        redis.Redis client
+    """
+    import redis
+
+    with _redis_clients_lock:
+        client = _redis_clients.get(redis_url)
+        if client is None:
+            pool = redis.ConnectionPool.from_url(
+                redis_url,
+                max_connections=REDIS_MAX_CONNECTIONS,
+                socket_timeout=timeout,
+                socket_connect_timeout=timeout,
+            )
+            client = _redis_clients[redis_url] = redis.Redis(connection_pool=pool)
+        return client
+
 
 class RedisHealthChecker(BaseHealthChecker):
     """Health checker for Redis connection and performance monitoring."""
     
+    # How long collected statistics are reused. Kept in the checker rather
+    # than the Django cache since that is usually the Redis being checked.
+    STATS_TIMEOUT = 10
+    
+    def __init__(self, timeout: float = 5.0):
+        super().__init__(timeout)
+        self._stats_cache = {}
+    
     def check(self) -> HealthCheckResult:
         """Check Redis connection status and performance metrics."""
         try:
@@ -1094,13 +1153,15 @@ class RedisHealthChecker(BaseHealthChecker):
             # Get Redis connection details
             redis_url = getattr(settings, 'REDIS_URL', 'redis://127.0.0.1:6379/1')
             
-            # Test Redis connection
+            # Collect Redis statistics, INFO doubles as the connection test
             try:
-                redis_client = redis.from_url(redis_url)
-                redis_client.ping()
-                
-                # Collect Redis statistics
-                redis_stats = self._collect_redis_statistics(redis_client, redis_url)
+                cached = self._stats_cache.get(redis_url)
+                if cached and time.monotonic() - cached[0] < self.STATS_TIMEOUT:
+                    redis_stats = cached[1]
+                else:
+                    redis_client = get_redis_client(redis_url, timeout=self.timeout)
+                    redis_stats = self._collect_redis_statistics(redis_client, redis_url)
+                    self._stats_cache[redis_url] = (time.monotonic(), redis_stats)
                 
                 end_time = time.time()
                 response_time = (end_time - start_time) * 1000
@@ -1129,11 +1190,12 @@ class RedisHealthChecker(BaseHealthChecker):
                     response_time=response_time
                 )
                 
-            except redis.ConnectionError as conn_error:
+            except (redis.ConnectionError, redis.TimeoutError) as conn_error:
                 return HealthCheckResult(
                     status='critical',
                     message=f"Redis connection failed: {str(conn_error)}",
-                    details={'error': str(conn_error), 'redis_url': redis_url}
+                    details={'error': str(conn_error), 'redis_url': redis_url.split('@')[-1]},
+                    response_time=(time.time() - start_time) * 1000
                 )
                 
         except Exception as e:
@@ -1145,11 +1207,15 @@ class RedisHealthChecker(BaseHealthChecker):
             )
     
     def _collect_redis_statistics(self, redis_client, redis_url) -> Dict[str, Any]:
-        """Collect comprehensive Redis statistics."""
+        """
+        Collect comprehensive Redis statistics.
+        
+        Connection errors from INFO are raised so the check reports Redis
+        as unreachable.
+        """
+        info = redis_client.info()
+        
         try:
-            # Get Redis info
-            info = redis_client.info()
-            
             stats = {
                 'redis_version': info.get('redis_version'),
                 'redis_mode': info.get('redis_mode', 'standalone'),
@@ -1346,14 +1412,9 @@ class HealthService:
         count = self.performance_stats.get('total_checks_performed', 1)
         self.performance_stats['avg_execution_time'] = (prev_avg * (count - 1) + execution_time) / count
         
-        # Record health metrics in database asynchronously
-        self._record_health_metrics_async(overall_status, health_results, execution_time, 
-                                         total_checks, successful_checks, failed_checks)
-        
-        # Clean up old metrics periodically (1% chance to run on each check)
-        import random
-        if random.random() < 0.01:
-            self._cleanup_old_metrics()
+        # Queue health metrics for the background writer
+        self._record_health_metrics(overall_status, health_results, execution_time,
+                                    total_checks, successful_checks, failed_checks)
         
         # Prepare result
         result = {
@@ -1399,87 +1460,31 @@ class HealthService:
                 'timestamp': timezone.now().isoformat()
             }, 'critical'
     
-    def _record_health_metrics_async(self, overall_status, health_results, execution_time, 
-                                    total_checks, successful_checks, failed_checks):
-        """Record health metrics in the database asynchronously."""
-        def _record_metrics():
-            try:
-                from core.models import HealthMetric, SystemAlert
-                
-                # Record overall health
-                HealthMetric.record_metric(
-                    metric_name='overall',
-                    metric_value={
-                        'total_checks': total_checks,
-                        'successful_checks': successful_checks,
-                        'failed_checks': failed_checks,
-                        'execution_time_ms': execution_time
-                    },
-                    status=overall_status,
-                    message=f"System health: {successful_checks}/{total_checks} checks passed",
-                    response_time=execution_time
-                )
-                
-                # Record individual check metrics for critical or warning statuses
-                for name, check in health_results.items():
-                    if check['status'] in ['critical', 'warning']:
-                        HealthMetric.record_metric(
-                            metric_name=name,
-                            metric_value=check.get('details', {}),
-                            status=check['status'],
-                            message=check['message'],
-                            response_time=check.get('response_time')
-                        )
-                        
-                        # Create alerts for critical issues
-                        if check['status'] == 'critical':
-                            # Check if there's already an active alert for this issue
-                            existing_alert = SystemAlert.objects.filter(
-                                source_metric=name,
-                                resolved=False
-                            ).first()
-                            
-                            if not existing_alert:
-                                SystemAlert.create_alert(
-                                    alert_type='health_check',
-                                    title=f"{name.title()} Critical Issue",
-                                    message=check['message'],
-                                    severity='critical',
-                                    source_metric=name,
-                                    metadata=check.get('details', {})
-                                )
-                
-            except Exception as e:
-                logger.error(f"Failed to record health metrics: {str(e)}")
-        
-        # Run in a separate thread to avoid blocking
-        threading.Thread(target=_record_metrics).start()
-    
-    def _cleanup_old_metrics(self):
-        """Clean up old metrics to prevent database bloat."""
-        def _cleanup():
-            try:
-                from core.models import HealthMetric
-                from django.db.models import Q
-                
-                # Delete metrics older than retention period
-                cutoff_date = timezone.now() - timedelta(days=METRICS_RETENTION_DAYS)
-                
-                # Keep more recent critical metrics longer
-                deleted_count = HealthMetric.objects.filter(
-                    Q(timestamp__lt=cutoff_date, status='healthy') |
-                    Q(timestamp__lt=cutoff_date - timedelta(days=7), status='warning') |
-                    Q(timestamp__lt=cutoff_date - timedelta(days=14), status='critical')
-                ).delete()[0]
-                
-                if deleted_count > 0:
-                    logger.info(f"Cleaned up {deleted_count} old health metrics")
-                
-            except Exception as e:
-                logger.error(f"Failed to clean up old metrics: {str(e)}")
+    def _record_health_metrics(self, overall_status, health_results, execution_time,
+                               total_checks, successful_checks, failed_checks):
+        """Queue the overall health and every check for the background metric writer."""
+        metric_writer.submit(
+            metric_name='overall',
+            status=overall_status,
+            message=f"System health: {successful_checks}/{total_checks} checks passed",
+            details={
+                'total_checks': total_checks,
+                'successful_checks': successful_checks,
+                'failed_checks': failed_checks,
+                'execution_time_ms': execution_time
+            },
+            response_time=execution_time,
+            value=round((successful_checks / total_checks) * 100, 2) if total_checks > 0 else None
+        )
         
-        # Run in a separate thread to avoid blocking
-        threading.Thread(target=_cleanup).start()
+        for name, check in health_results.items():
+            metric_writer.submit(
+                metric_name=name,
+                status=check['status'],
+                message=check['message'],
+                details=check.get('details', {}),
+                response_time=check.get('response_time')
+            )
     
     def get_database_health(self) -> Dict[str, Any]:
         """Get database health status."""
@@ -0,0 +1,255 @@
+"""
+Worker Telemetry Service
+
+Celery workers publish their own state to the cache, so the health checks
+can read it instead of broadcasting ``inspect()`` calls to every worker and
+waiting for the replies. Each worker writes a heartbeat entry that expires
+shortly after the worker stops sending it, keeps a gauge of the tasks it is
+running, and counts finished tasks by state in hourly buckets. Publishers
+count the tasks they send to each queue and workers count them back out,
+which gives an estimate of the queue depths without asking the broker.
+
+Every update is a single cache add, set or incr and failures are only
+logged, so telemetry never slows down or breaks a task. The counters are
+exact on Redis; on the DatabaseCache fallback incr isn't atomic and
+concurrent updates can be lost, which only skews the estimates.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.core.cache import cache
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerTelemetry:
+    """Service for publishing and reading Celery worker telemetry"""
+
+    CACHE_PREFIX = 'worker_telemetry'
+
+    # Workers send a heartbeat every HEARTBEAT_INTERVAL seconds and are
+    # considered gone once HEARTBEAT_TIMEOUT seconds pass without one
+    HEARTBEAT_INTERVAL = 15
+    HEARTBEAT_TIMEOUT = 60
+
+    # Task counters are kept in hourly buckets for a day
+    WINDOW_HOURS = 24
+    COUNTER_TIMEOUT = (WINDOW_HOURS + 1) * 3600
+
+    # Registries of worker hostnames and queue names
+    REGISTRY_TIMEOUT = 7 * 86400
+
+    # Start times of the tasks running in this process, by task id
+    _started = {}
+
+    @classmethod
+    def _key(cls, *parts) -> str:
+        return ':'.join([cls.CACHE_PREFIX, *map(str, parts)])
+
+    @classmethod
+    def _hour(cls, moment: Optional[datetime] = None) -> str:
+        return (moment or timezone.now()).strftime('%Y%m%d%H')
+
+    @classmethod
+    def _incr(cls, key: str, delta: int = 1, timeout: Optional[int] = None) -> int:
+        timeout = timeout or cls.COUNTER_TIMEOUT
+        cache.add(key, 0, timeout)
+        try:
+            return cache.incr(key, delta)
+        except ValueError:
+            # Expired between the add and the incr
+            cache.set(key, delta, timeout)
+            return delta
+
+    @classmethod
+    def _register(cls, registry: str, name: str):
+        key = cls._key(registry)
+        names = cache.get(key) or []
+        if name not in names:
+            cache.set(key, names + [name], cls.REGISTRY_TIMEOUT)
+
+    # Worker side
+
+    @classmethod
+    def heartbeat(cls, hostname: str, queues: Iterable[str] = (), **info):
+        """
+        Record that a worker is alive.
+
+        Args:
+            hostname: Worker hostname, for example celery@web-1
+            queues: Queues the worker consumes from
+            **info: Extra details to show for the worker
+        """
+        cache.set(cls._key('worker', hostname), {
+            'hostname': hostname,
+            'queues': list(queues),
+            'last_seen': time.time(),
+            **info,
+        }, cls.HEARTBEAT_TIMEOUT)
+        cls._register('workers', hostname)
+
+    @classmethod
+    def worker_stopped(cls, hostname: str):
+        """
+        Forget a worker that shut down cleanly.
+
+        Args:
+            hostname: Worker hostname
+        """
+        cache.delete_many([cls._key('worker', hostname), cls._key('active', hostname)])
+
+    @classmethod
+    def task_published(cls, queue: str):
+        """
+        Count a task sent to a queue.
+
+        Args:
+            queue: Queue (routing key) the task was sent to
+        """
+        cls._incr(cls._key('queued', queue))
+        cls._register('queues', queue)
+
+    @classmethod
+    def task_started(cls, hostname: str, task_id: str, queue: Optional[str] = None):
+        """
+        Count a task a worker started running.
+
+        Args:
+            hostname: Worker hostname
+            task_id: Id of the task
+            queue: Queue the task was received from
+        """
+        cls._started[task_id] = time.monotonic()
+        cls._incr(cls._key('active', hostname))
+        if queue:
+            cls._incr(cls._key('queued', queue), -1)
+
+    @classmethod
+    def task_finished(cls, hostname: str, task_id: str, state: Optional[str]):
+        """
+        Count a task a worker finished running.
+
+        Args:
+            hostname: Worker hostname
+            task_id: Id of the task
+            state: Final state of the task, for example SUCCESS or FAILURE
+        """
+        cls._incr(cls._key('active', hostname), -1)
+
+        hour = cls._hour()
+        cls._incr(cls._key('tasks', hour, 'total'))
+        cls._incr(cls._key('tasks', hour, state or 'UNKNOWN'))
+
+        started = cls._started.pop(task_id, None)
+        if started is not None:
+            cls._incr(cls._key('tasks', hour, 'runtime_ms'), int((time.monotonic() - started) * 1000))
+
+    # Reader side
+
+    @classmethod
+    def workers(cls) -> List[Dict[str, Any]]:
+        """
+        Get the workers that sent a heartbeat recently.
+
+        Returns:
+            List of worker entries with their number of active tasks
+        """
+        hostnames = cache.get(cls._key('workers')) or []
+        if not hostnames:
+            return []
+
+        keys = [cls._key('worker', hostname) for hostname in hostnames]
+        keys += [cls._key('active', hostname) for hostname in hostnames]
+        values = cache.get_many(keys)
+
+        workers = []
+        for hostname in hostnames:
+            entry = values.get(cls._key('worker', hostname))
+            if entry:
+                workers.append({**entry, 'active_tasks': max(0, values.get(cls._key('active', hostname), 0))})
+        return workers
+
+    @classmethod
+    def queue_depths(cls) -> Dict[str, int]:
+        """
+        Get the estimated number of tasks waiting in each queue.
+
+        Returns:
+            dict: Queue name to number of tasks sent but not yet started
+        """
+        queues = cache.get(cls._key('queues')) or []
+        values = cache.get_many([cls._key('queued', queue) for queue in queues])
+        return {queue: max(0, values.get(cls._key('queued', queue), 0)) for queue in queues}
+
+    @classmethod
+    def task_counts(cls, hours: Optional[int] = None, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Get the number of tasks finished in the last hours by state.
+
+        Args:
+            hours: Size of the window, defaults to WINDOW_HOURS
+            now: End of the window, defaults to now
+
+        Returns:
+            dict: 'total', 'runtime_ms' and one count per task state
+        """
+        hours = min(hours or cls.WINDOW_HOURS, cls.WINDOW_HOURS)
+        now = now or timezone.now()
+        prefix = cls._key('tasks')
+
+        keys = []
+        for offset in range(hours):
+            hour = cls._hour(now - timedelta(hours=offset))
+            keys += [cls._key('tasks', hour, name)
+                     for name in ('total', 'runtime_ms', 'SUCCESS', 'FAILURE', 'RETRY', 'REVOKED')]
+
+        counts = {'total': 0, 'runtime_ms': 0}
+        for key, value in cache.get_many(keys).items():
+            name = key[len(prefix) + 1:].split(':', 1)[1]
+            counts[name] = counts.get(name, 0) + value
+        return counts
+
+    @classmethod
+    def snapshot(cls) -> Dict[str, Any]:
+        """
+        Get everything the workers published.
+
+        Returns:
+            dict: Live workers, active tasks, queue depths and the task
+            counts of the last day
+        """
+        workers = cls.workers()
+        return {
+            'workers': workers,
+            'active_tasks': sum(worker['active_tasks'] for worker in workers),
+            'queues': cls.queue_depths(),
+            'tasks': cls.task_counts(),
+        }
+
+
+class HeartbeatThread(threading.Thread):
+    """Daemon thread that sends the heartbeat of a worker until stopped"""
+
+    def __init__(self, hostname: str, queues: Iterable[str] = (), interval: Optional[int] = None):
+        super().__init__(name=f'worker-telemetry-{hostname}', daemon=True)
+        self.hostname = hostname
+        self.queues = list(queues)
+        self.interval = interval or WorkerTelemetry.HEARTBEAT_INTERVAL
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                WorkerTelemetry.heartbeat(self.hostname, self.queues)
+            except Exception as e:
+                logger.warning(f"Could not send worker heartbeat: {str(e)}")
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
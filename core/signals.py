@@ -0,0 +1,123 @@
+"""
+Django signals for the admin dashboard snapshots and Celery signals for the
+worker telemetry.
+
+Saving or deleting a post, category, page, template or user marks the
+dashboard snapshots stale, so the next dashboard load queues a refresh
+while still being served the current snapshot.
+
+Celery workers send a heartbeat from the moment they are ready until they
+shut down and count the tasks they publish, start and finish, so the
+health checks can read worker state from the cache.
+"""
+
+import logging
+from celery.signals import (
+    after_task_publish, heartbeat_sent, task_postrun, task_prerun, worker_ready, worker_shutdown
+)
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+
+from blog.models import Category, Post
+from .models import Page, Template
+from .services.dashboard_snapshot_service import DashboardSnapshotService
+from .services.worker_telemetry import HeartbeatThread, WorkerTelemetry
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MODELS = (Post, Category, Page, Template, User)
+
+
+def mark_dashboard_stale(sender, instance, **kwargs):
+    """
+    Mark the dashboard snapshots stale when one of their models changes.
+
+    Args:
+        sender: The model class
+        instance: The instance being saved or deleted
+        **kwargs: Additional keyword arguments
+    """
+    # Logins only update last_login, which the dashboard doesn't show
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+
+    try:
+        DashboardSnapshotService.mark_stale()
+    except Exception as e:
+        logger.error(f"Error marking dashboard snapshots stale: {str(e)}")
+
+
+for model in SNAPSHOT_MODELS:
+    post_save.connect(mark_dashboard_stale, sender=model, dispatch_uid=f'dashboard_stale_save_{model.__name__}')
+    post_delete.connect(mark_dashboard_stale, sender=model, dispatch_uid=f'dashboard_stale_delete_{model.__name__}')
+
+
+# Heartbeat threads of the workers running in this process, by hostname
+heartbeat_threads = {}
+
+
+@worker_ready.connect(dispatch_uid='worker_telemetry_ready')
+def start_worker_heartbeat(sender=None, **kwargs):
+    """Start sending the heartbeat of a worker once it is ready to consume."""
+    try:
+        hostname = sender.hostname
+        queues = list(sender.app.amqp.queues.consume_from)
+        thread = HeartbeatThread(hostname, queues)
+        heartbeat_threads[hostname] = thread
+        thread.start()
+    except Exception as e:
+        logger.error(f"Error starting worker heartbeat: {str(e)}")
+
+
+@worker_shutdown.connect(dispatch_uid='worker_telemetry_shutdown')
+def stop_worker_heartbeat(sender=None, **kwargs):
+    """Stop the heartbeat of a worker and forget it."""
+    try:
+        thread = heartbeat_threads.pop(sender.hostname, None)
+        if thread:
+            thread.stop()
+        WorkerTelemetry.worker_stopped(sender.hostname)
+    except Exception as e:
+        logger.error(f"Error stopping worker heartbeat: {str(e)}")
+
+
+@heartbeat_sent.connect(dispatch_uid='worker_telemetry_heartbeat')
+def record_worker_heartbeat(sender=None, **kwargs):
+    """Refresh the heartbeat of a worker that sends event heartbeats."""
+    try:
+        hostname = sender.eventer.hostname
+        thread = heartbeat_threads.get(hostname)
+        WorkerTelemetry.heartbeat(hostname, thread.queues if thread else ())
+    except Exception as e:
+        logger.error(f"Error recording worker heartbeat: {str(e)}")
+
+
+@after_task_publish.connect(dispatch_uid='worker_telemetry_publish')
+def record_task_published(sender=None, routing_key=None, **kwargs):
+    """Count a task sent to a queue."""
+    try:
+        if routing_key:
+            WorkerTelemetry.task_published(routing_key)
+    except Exception as e:
+        logger.error(f"Error recording published task: {str(e)}")
+
+
+@task_prerun.connect(dispatch_uid='worker_telemetry_prerun')
+def record_task_started(sender=None, task_id=None, task=None, **kwargs):
+    """Count a task a worker started running."""
+    try:
+        request = task.request
+        queue = (request.delivery_info or {}).get('routing_key')
+        WorkerTelemetry.task_started(request.hostname or 'unknown', task_id, queue)
+    except Exception as e:
+        logger.error(f"Error recording started task: {str(e)}")
+
+
+@task_postrun.connect(dispatch_uid='worker_telemetry_postrun')
+def record_task_finished(sender=None, task_id=None, task=None, state=None, **kwargs):
+    """Count a task a worker finished running."""
+    try:
+        WorkerTelemetry.task_finished(task.request.hostname or 'unknown', task_id, state)
+    except Exception as e:
+        logger.error(f"Error recording finished task: {str(e)}")
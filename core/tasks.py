@@ -0,0 +1,56 @@
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def rollup_health_metrics():
+    """
+    Fold new health metric samples into the minute, hour and day tiers.
+    This task should be run every minute so ranges served from the minute
+    tier stay current.
+    """
+    from .services.health_metrics_service import HealthMetricStore
+
+    try:
+        return HealthMetricStore.rollup()
+    except Exception as e:
+        logger.error(f"Failed to roll up health metrics: {str(e)}")
+        raise
+
+
+@shared_task
+def prune_health_metrics():
+    """
+    Delete health metric samples and rollups past their retention.
+    This task should be run daily. It rolls up first so that no sample is
+    deleted before it has been folded into the minute tier.
+    """
+    from .services.health_metrics_service import HealthMetricStore
+
+    try:
+        HealthMetricStore.rollup()
+        summary = HealthMetricStore.prune()
+        logger.info(f"Health metrics pruned: {summary}")
+        return summary
+    except Exception as e:
+        logger.error(f"Failed to prune health metrics: {str(e)}")
+        raise
+
+
+@shared_task
+def refresh_dashboard_snapshots(role=None):
+    """
+    Rebuild the admin dashboard snapshots.
+    This task should be run every 5 minutes so staff are served a fresh
+    snapshot; `manage.py setup_dashboard_tasks` schedules it. Dashboard loads queue it for a single role when they are
+    served a stale one.
+    """
+    from .services.dashboard_snapshot_service import DashboardSnapshotService
+
+    try:
+        return DashboardSnapshotService.refresh_all([role] if role else None)
+    except Exception as e:
+        logger.error(f"Failed to refresh dashboard snapshots: {str(e)}")
+        raise
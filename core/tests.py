@@ -3,6 +3,7 @@ Tests for the core application, including health service tests.
 """
 
 import time
+from collections import Counter
 from datetime import timedelta
 from unittest.mock import patch, MagicMock
 from django.test import TestCase
@@ -24,6 +25,16 @@ from core.services.health_service import (
     HealthService,
     health_service
 )
+from core.services.health_metrics_service import metric_writer
+
+
+class MetricWriterTestMixin:
+    """Write queued health samples inside the test and stop the writer thread."""
+
+    def tearDown(self):
+        metric_writer.stop()
+        metric_writer.flush()
+        super().tearDown()
 
 
 class HealthCheckResultTest(TestCase):
@@ -133,7 +144,7 @@ class CacheHealthCheckerTest(TestCase):
         self.assertIn('backend', info)
 
 
-class HealthServiceTest(TestCase):
+class HealthServiceTest(MetricWriterTestMixin, TestCase):
     """Test cases for HealthService."""
     
     def setUp(self):
@@ -200,7 +211,7 @@ class HealthServiceTest(TestCase):
         self.assertEqual(health['checks']['cache']['status'], 'warning')
 
 
-class HealthServiceIntegrationTest(TestCase):
+class HealthServiceIntegrationTest(MetricWriterTestMixin, TestCase):
     """Integration tests for the health service."""
     
     def test_global_health_service_instance(self):
@@ -364,7 +375,7 @@ class LogHealthCheckerTest(TestCase):
         self.assertGreater(result.details['error_count'], 5)
 
 
-class ResourceMonitoringIntegrationTest(TestCase):
+class ResourceMonitoringIntegrationTest(MetricWriterTestMixin, TestCase):
     """Integration tests for resource monitoring components."""
     
     def test_system_resources_method(self):
@@ -527,38 +538,40 @@ class APIHealthCheckerTest(TestCase):
     
     def test_api_statistics_collection_structure(self):
         """Test that API statistics collection returns expected structure."""
-        # Create mock API models
+        # Create mock API models and usage log service
         MockAPIClient = MagicMock()
         MockAPIKey = MagicMock()
-        MockAPIUsageLog = MagicMock()
+        MockUsageLogs = MagicMock()
         
         # Mock the counts and queries
         MockAPIClient.objects.count.return_value = 10
         MockAPIClient.objects.filter.return_value.count.return_value = 8
+        MockAPIClient.objects.filter.return_value.values_list.return_value = [(1, 'Client One')]
         MockAPIKey.objects.count.return_value = 15
         MockAPIKey.objects.filter.return_value.count.return_value = 12
         
-        # Mock usage log queries
-        mock_usage_24h = MagicMock()
-        mock_usage_1h = MagicMock()
-        MockAPIUsageLog.objects.filter.side_effect = [mock_usage_24h, mock_usage_1h]
-        
-        mock_usage_24h.count.return_value = 1000
-        mock_usage_1h.count.return_value = 50
-        mock_usage_24h.filter.return_value.count.side_effect = [100, 5]  # errors, rate limited
-        mock_usage_1h.filter.return_value.count.side_effect = [5, 1]    # errors, rate limited
-        mock_usage_24h.aggregate.return_value = {'avg_time': 0.25}
-        mock_usage_1h.aggregate.return_value = {'avg_time': 0.30}
-        mock_usage_24h.values.return_value.annotate.return_value.order_by.return_value.__getitem__.return_value = []
-        mock_usage_24h.values.return_value.distinct.return_value.count.return_value = 5
-        mock_usage_1h.values.return_value.distinct.return_value.count.return_value = 3
+        # Mock usage log summaries
+        def summary(total, errors, rate_limited, avg_time):
+            return {
+                'total_requests': total,
+                'successful_requests': total - errors,
+                'error_requests': errors,
+                'rate_limited_requests': rate_limited,
+                'average_response_time': avg_time,
+                'endpoints': Counter({('/api/v1/posts/', 'GET'): total}),
+                'status_codes': Counter({200: total - errors, 500: errors}),
+                'clients': Counter({1: total}),
+            }
+        
+        MockUsageLogs.summary.side_effect = [summary(1000, 100, 5, 0.25), summary(50, 5, 1, 0.30)]
+        MockUsageLogs.recent.return_value = []
         
         now = timezone.now()
         twenty_four_hours_ago = now - timedelta(hours=24)
         one_hour_ago = now - timedelta(hours=1)
         
         stats = self.checker._collect_api_statistics(
-            MockAPIClient, MockAPIKey, MockAPIUsageLog,
+            MockAPIClient, MockAPIKey, MockUsageLogs,
             now, twenty_four_hours_ago, one_hour_ago
         )
         
@@ -577,9 +590,11 @@ class APIHealthCheckerTest(TestCase):
         self.assertEqual(stats['active_clients'], 8)
         self.assertEqual(stats['error_rate_24h'], 10.0)  # 100/1000 * 100
         self.assertEqual(stats['success_rate_24h'], 90.0)  # (1000-100)/1000 * 100
+        self.assertEqual(stats['top_clients_24h'], [{'client__name': 'Client One', 'request_count': 1000}])
+        self.assertEqual(stats['active_clients_1h'], 1)
 
 
-class APIIntegrationTest(TestCase):
+class APIIntegrationTest(MetricWriterTestMixin, TestCase):
     """Integration tests for API health monitoring."""
     
     def test_api_health_in_system_health(self):
@@ -716,30 +731,26 @@ class CeleryHealthCheckerTest(TestCase):
     
     def test_celery_statistics_collection_structure(self):
         """Test that Celery statistics collection returns expected structure."""
-        # Create mock Celery components
+        from django_celery_results.models import TaskResult
+        from django_celery_beat.models import PeriodicTask
+        from core.services.worker_telemetry import WorkerTelemetry
+        
+        cache.clear()
+        
+        # Workers publish their heartbeats and task counts
+        WorkerTelemetry.heartbeat('worker1')
+        WorkerTelemetry.heartbeat('worker2')
+        WorkerTelemetry.task_started('worker1', 'task-1')
+        
+        # Task results
+        for i, status in enumerate(['SUCCESS'] * 80 + ['FAILURE'] * 15 + ['PENDING'] * 3 + ['RETRY'] * 2):
+            TaskResult.objects.create(task_id=f'task-{i}', status=status)
+        
         mock_celery_app = MagicMock()
-        mock_task_result = MagicMock()
-        mock_periodic_task = MagicMock()
-        
-        # Mock inspect functionality
-        mock_inspect = MagicMock()
-        mock_celery_app.control.inspect.return_value = mock_inspect
-        mock_inspect.active.return_value = {'worker1': [], 'worker2': []}
-        mock_inspect.registered.return_value = {'worker1': ['task1', 'task2']}
-        
-        # Mock task results
-        mock_queryset = MagicMock()
-        mock_task_result.objects.filter.return_value = mock_queryset
-        mock_queryset.count.return_value = 100
-        mock_queryset.filter.return_value.count.side_effect = [80, 15, 3, 2]  # success, fail, pending, retry
-        mock_queryset.aggregate.return_value = {'avg_time': 2.5}
-        
-        # Mock periodic tasks
-        mock_periodic_task.objects.all.return_value = mock_queryset
-        mock_queryset.filter.return_value.values_list.return_value.__getitem__.return_value = ['task1', 'task2']
+        mock_celery_app.tasks = {'task1': None, 'task2': None, 'celery.chord': None}
         
         stats = self.checker._collect_celery_statistics(
-            mock_celery_app, mock_task_result, mock_periodic_task
+            mock_celery_app, TaskResult, PeriodicTask
         )
         
         # Verify expected structure
@@ -753,7 +764,11 @@ class CeleryHealthCheckerTest(TestCase):
         
         # Verify calculated values
         self.assertEqual(stats['active_workers'], 2)
+        self.assertEqual(stats['active_tasks'], 1)
+        self.assertEqual(stats['registered_tasks'], 2)
         self.assertEqual(stats['total_tasks_24h'], 100)
+        self.assertEqual(stats['failed_tasks_24h'], 15)
+        self.assertEqual(stats['success_rate_24h'], 80.0)
 
 
 class RedisHealthCheckerTest(TestCase):
@@ -887,7 +902,7 @@ class RedisHealthCheckerTest(TestCase):
         self.assertEqual(stats['basic_operations'], 'working')
 
 
-class CeleryRedisIntegrationTest(TestCase):
+class CeleryRedisIntegrationTest(MetricWriterTestMixin, TestCase):
     """Integration tests for Celery and Redis health monitoring."""
     
     def test_celery_redis_in_system_health(self):
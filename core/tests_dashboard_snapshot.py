@@ -0,0 +1,198 @@
+"""
+Tests for the role-scoped dashboard snapshots.
+
+Covers plain-data snapshots per role, one computation for concurrent staff
+loads, stale-while-revalidate after model changes and age, and the API and
+export views reading the same snapshot.
+"""
+
+import json
+import threading
+import time
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Model, QuerySet
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django_celery_beat.models import PeriodicTask
+
+from blog.models import Post
+from core.services.dashboard_snapshot_service import DashboardSnapshotService
+from core.views import DashboardAPIView, DashboardExportView, dashboard_callback
+
+
+def contains_lazy_data(value):
+    """Check whether a snapshot holds querysets or model instances anywhere."""
+    if isinstance(value, (QuerySet, Model)):
+        return True
+    if isinstance(value, dict):
+        return any(contains_lazy_data(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(contains_lazy_data(item) for item in value)
+    return False
+
+
+class DashboardSnapshotTestCase(TestCase):
+    """Shared fixtures for dashboard snapshot tests."""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='testpass123')
+        self.staff = [
+            User.objects.create_user(username=f'staff{i}', password='testpass123', is_staff=True)
+            for i in range(8)
+        ]
+        Post.objects.create(title='First Post', slug='first-post', author=self.admin, content='Body', status='published')
+
+    def request_for(self, user, params=None):
+        request = self.factory.get('/', params or {})
+        request.user = user
+        return request
+
+    def counting_build(self, delay=0.0):
+        """Replace build() with a slow stand-in that counts its calls."""
+        calls = []
+        # Built up front, as the stand-in may run in threads without the test database
+        snapshots = {role: DashboardSnapshotService.build(role) for role in DashboardSnapshotService.ROLES}
+
+        def fake_build(role, now=None):
+            calls.append(role)
+            time.sleep(delay)
+            return {**snapshots[role], 'build_number': len(calls)}
+
+        patcher = patch.object(DashboardSnapshotService, 'build', side_effect=fake_build)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return calls
+
+
+class SnapshotContentTest(DashboardSnapshotTestCase):
+    """Test the contents of the snapshots."""
+
+    def test_snapshot_is_plain_data(self):
+        snapshot = DashboardSnapshotService.get('superuser')
+
+        self.assertFalse(contains_lazy_data(snapshot))
+        json.dumps(snapshot, cls=DjangoJSONEncoder)
+        self.assertEqual(snapshot['recent_posts'][0]['title'], 'First Post')
+        self.assertEqual(snapshot['metrics'][1]['value'], 1)
+
+    def test_sections_follow_the_role(self):
+        self.assertIn('recent_users', DashboardSnapshotService.get('superuser')['analytics_data'])
+        self.assertNotIn('recent_users', DashboardSnapshotService.get('staff')['analytics_data'])
+
+    def test_dashboard_renders_from_the_snapshot(self):
+        self.client.force_login(self.admin)
+
+        response = self.client.get('/open/admin/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'First Post')
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'dashboard-snapshot-tests',
+    }
+})
+class SharedSnapshotTest(DashboardSnapshotTestCase):
+    """Test that users of a role share one computation."""
+
+    def test_concurrent_staff_loads_compute_once(self):
+        calls = self.counting_build(delay=0.2)
+        results = []
+
+        def load(user):
+            results.append(dashboard_callback(self.request_for(user), {})['build_number'])
+
+        threads = [threading.Thread(target=load, args=(user,)) for user in self.staff]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(calls, ['staff'])
+        self.assertEqual(results, [1] * len(self.staff))
+
+    @override_settings(CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'cache_table',
+        }
+    })
+    def test_expired_lock_is_taken_by_insert(self):
+        # DatabaseCache.add() updates an expired row without a check, so two
+        # requests could both take the lock. It must insert a new row instead
+        lock_key = DashboardSnapshotService._key('staff', ':lock')
+        cache.set(lock_key, 1, timeout=-10)
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertTrue(DashboardSnapshotService._acquire_lock('staff'))
+        self.assertFalse(DashboardSnapshotService._acquire_lock('staff'))
+
+        writes = [query['sql'] for query in context.captured_queries if 'cache_table' in query['sql']]
+        self.assertTrue(any(sql.startswith('INSERT') for sql in writes))
+        self.assertFalse(any(sql.startswith('UPDATE') for sql in writes))
+
+    def test_views_read_the_same_snapshot(self):
+        calls = self.counting_build()
+
+        dashboard_callback(self.request_for(self.staff[0]), {})
+        api = json.loads(DashboardAPIView.as_view()(self.request_for(self.staff[1])).content)
+        export = json.loads(DashboardExportView.as_view()(self.request_for(self.staff[2], {'format': 'json'})).content)
+
+        self.assertEqual(calls, ['staff'])
+        self.assertEqual(api['data']['recent_posts'][0]['title'], 'First Post')
+        self.assertEqual(export['build_number'], 1)
+
+
+class RevalidationTest(DashboardSnapshotTestCase):
+    """Test serving stale snapshots while they are refreshed."""
+
+    def test_change_serves_stale_and_queues_one_refresh(self):
+        DashboardSnapshotService.get('staff')
+
+        Post.objects.create(title='Second Post', slug='second-post', author=self.admin, content='Body')
+        with patch('core.tasks.refresh_dashboard_snapshots.delay') as delay:
+            first = DashboardSnapshotService.get('staff')
+            DashboardSnapshotService.get('staff')
+
+        delay.assert_called_once_with('staff')
+        self.assertEqual(first['metrics'][1]['value'], 1)
+
+        DashboardSnapshotService.refresh_all(['staff'])
+        with patch('core.tasks.refresh_dashboard_snapshots.delay') as delay:
+            self.assertEqual(DashboardSnapshotService.get('staff')['metrics'][1]['value'], 2)
+        delay.assert_not_called()
+
+    def test_old_snapshot_is_revalidated(self):
+        DashboardSnapshotService.get('staff')
+
+        with patch.object(DashboardSnapshotService, 'FRESH_SECONDS', -1), \
+                patch('core.tasks.refresh_dashboard_snapshots.delay') as delay:
+            DashboardSnapshotService.get('staff')
+
+        delay.assert_called_once_with('staff')
+
+    def test_logins_do_not_mark_stale(self):
+        DashboardSnapshotService.get('staff')
+
+        self.client.force_login(self.staff[0])
+        self.client.login(username='staff1', password='testpass123')
+
+        self.assertIsNone(cache.get('dashboard_snapshot:staff:stale'))
+
+    def test_refresh_is_scheduled(self):
+        call_command('setup_dashboard_tasks', stdout=StringIO())
+
+        task = PeriodicTask.objects.get(task='core.tasks.refresh_dashboard_snapshots')
+        self.assertTrue(task.enabled)
+        self.assertEqual(task.interval.every, 5)
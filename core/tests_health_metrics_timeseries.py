@@ -0,0 +1,287 @@
+"""
+Tests for the health metrics time series.
+
+Covers batched writes from the metric writer, rollups into minute, hour and
+day tiers, tiered retention, serving a range at a fitting resolution and a
+benchmark over 30 days of 10-second samples.
+"""
+
+import json
+import os
+import time
+from datetime import timedelta
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.db.models import Avg, Max, Min
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import HealthMetric, HealthMetricRollup, SystemAlert
+from core.services.health_metrics_service import HealthMetricStore, HealthMetricWriter
+from core.services.health_service import HealthService
+
+
+BENCHMARK_METRICS = int(os.environ.get('HEALTH_METRICS_BENCHMARK_METRICS', 1))
+BENCHMARK_DAYS = 30
+SAMPLE_INTERVAL = timedelta(seconds=10)
+
+
+class HealthMetricsTestCase(TestCase):
+    """Shared fixtures for time series tests."""
+
+    def setUp(self):
+        self.now = HealthMetricStore.bucket_start(timezone.now(), 'minute')
+        self.writer = HealthMetricWriter(autostart=False)
+
+    def samples(self, count, metric_name='memory', end=None, status='healthy'):
+        """Write one sample every 10 seconds up to end, with values 0 to count - 1."""
+        end = end or self.now
+        for i in range(count):
+            self.writer.submit(
+                metric_name, status, 'Memory usage', details={'percent_used': i},
+                response_time=1.0, timestamp=end - SAMPLE_INTERVAL * (count - i)
+            )
+            if self.writer.queue.qsize() >= HealthMetricWriter.BATCH_SIZE:
+                self.writer.flush()
+        self.writer.flush()
+
+
+class MetricWriterTest(HealthMetricsTestCase):
+    """Test queueing and batch writes."""
+
+    def test_values_are_extracted(self):
+        self.writer.submit('memory', 'healthy', 'Memory usage normal', details={'percent_used': 41.5})
+        self.writer.submit('logs', 'warning', 'Errors in log', details={'recent_errors': ['a', 'b']})
+
+        self.assertEqual(HealthMetric.objects.count(), 0)
+        self.assertEqual(self.writer.flush(), 2)
+
+        memory = HealthMetric.objects.get(metric_name='memory')
+        logs = HealthMetric.objects.get(metric_name='logs')
+        self.assertEqual((memory.value, memory.metric_value), (41.5, {}))
+        self.assertEqual((logs.value, logs.metric_value), (2.0, {'recent_errors': ['a', 'b']}))
+
+    def test_critical_samples_alert_once(self):
+        for _ in range(3):
+            self.writer.submit('disk', 'critical', 'Disk full', details={'percent_used': 99})
+        self.writer.flush()
+        self.writer.submit('disk', 'critical', 'Disk full', details={'percent_used': 99})
+        self.writer.flush()
+
+        self.assertEqual(SystemAlert.objects.filter(source_metric='disk', resolved=False).count(), 1)
+
+    def test_autostart_follows_the_setting(self):
+        self.assertFalse(HealthMetricWriter().autostart)
+        with override_settings(HEALTH_METRIC_WRITER_AUTOSTART=True):
+            self.assertTrue(HealthMetricWriter().autostart)
+        self.assertTrue(HealthMetricWriter(autostart=True).autostart)
+
+    def test_stop_writes_taken_samples_and_ends_the_thread(self):
+        writer = HealthMetricWriter(autostart=True)
+        with patch.object(writer, '_write') as write:
+            writer.submit('memory', 'healthy', 'Memory usage normal', details={'percent_used': 41.5})
+            self.assertTrue(writer.running)
+            self.assertTrue(writer.stop())
+
+        self.assertFalse(writer.running)
+        self.assertEqual([sample.value for sample in write.call_args.args[0]], [41.5])
+
+    def test_health_service_queues_every_check(self):
+        with patch('core.services.health_service.metric_writer.submit') as submit:
+            service = HealthService()
+            service.get_system_health(force_refresh=True)
+
+        names = [call.kwargs['metric_name'] for call in submit.call_args_list]
+        self.assertEqual(sorted(names), sorted(['overall', *service.checkers]))
+
+
+class RollupTest(HealthMetricsTestCase):
+    """Test folding samples into tiers."""
+
+    def test_tiers_match_the_samples(self):
+        # Three hours of samples
+        self.samples(3 * 360)
+
+        summary = HealthMetricStore.rollup(now=self.now)
+
+        self.assertEqual(summary['minute'], 180)
+        raw = HealthMetric.objects.aggregate(Min('value'), Max('value'), Avg('value'))
+        for resolution in ('hour', 'day'):
+            buckets = HealthMetricRollup.objects.filter(resolution=resolution)
+            self.assertEqual(sum(bucket.sample_count for bucket in buckets), 3 * 360)
+            self.assertEqual(min(bucket.value_min for bucket in buckets), raw['value__min'])
+            self.assertEqual(max(bucket.value_max for bucket in buckets), raw['value__max'])
+            self.assertAlmostEqual(
+                sum(bucket.value_sum for bucket in buckets) / sum(bucket.value_count for bucket in buckets),
+                raw['value__avg']
+            )
+
+        minute = HealthMetricRollup.objects.get(resolution='minute', bucket_start=self.now - timedelta(minutes=1))
+        self.assertEqual((minute.sample_count, minute.value_min, minute.value_max, minute.value_avg),
+                         (6, 1074, 1079, 1076.5))
+
+    def test_rerun_updates_open_buckets_only(self):
+        self.samples(60)
+        HealthMetricStore.rollup(now=self.now)
+        first_bucket = HealthMetricRollup.objects.filter(resolution='minute').order_by('bucket_start').first()
+
+        # A late sample in the last minute and a new warning
+        self.writer.submit('memory', 'healthy', 'Memory usage', details={'percent_used': 500},
+                           timestamp=self.now - timedelta(seconds=5))
+        self.writer.submit('memory', 'warning', 'Memory usage high', details={'percent_used': 90},
+                           timestamp=self.now + timedelta(seconds=5))
+        self.writer.flush()
+        summary = HealthMetricStore.rollup(now=self.now + timedelta(seconds=30))
+
+        self.assertLessEqual(summary['minute'], 7)
+        self.assertTrue(HealthMetricRollup.objects.filter(pk=first_bucket.pk).exists())
+        self.assertEqual(
+            HealthMetricRollup.objects.get(resolution='minute', bucket_start=self.now - timedelta(minutes=1)).value_max,
+            500
+        )
+        self.assertEqual(HealthMetricRollup.objects.get(resolution='minute', bucket_start=self.now).status, 'warning')
+        self.assertEqual(sum(HealthMetricRollup.objects.filter(resolution='day').values_list('sample_count', flat=True)), 62)
+
+
+class RetentionTest(HealthMetricsTestCase):
+    """Test the retention of each tier."""
+
+    def test_prune(self):
+        old = self.now - timedelta(days=HealthMetricStore.RAW_RETENTION_DAYS['healthy'] + 1)
+        self.samples(6, end=old)
+        self.samples(6, end=old, status='critical')
+        self.samples(6)
+
+        # Nothing is pruned before it is rolled up
+        self.assertEqual(HealthMetricStore.prune(now=self.now)['raw'], 0)
+
+        HealthMetricStore.rollup(now=self.now)
+        summary = HealthMetricStore.prune(now=self.now)
+
+        self.assertEqual(summary['raw'], 6)
+        self.assertEqual(HealthMetric.objects.filter(status='critical').count(), 6)
+        self.assertEqual(summary['minute'], 0)
+
+        later = self.now + timedelta(days=15)
+        summary = HealthMetricStore.prune(now=later)
+        self.assertEqual(summary['minute'], 2)
+        self.assertEqual(HealthMetricRollup.objects.filter(resolution='hour').count(), 2)
+
+
+class SeriesTest(HealthMetricsTestCase):
+    """Test serving ranges."""
+
+    def test_resolution_follows_the_range(self):
+        now = timezone.now()
+        cases = {
+            timedelta(minutes=30): 'raw',
+            timedelta(hours=6): 'minute',
+            timedelta(days=1): 'minute',
+            timedelta(days=7): 'hour',
+            timedelta(days=365): 'day',
+        }
+        for span, resolution in cases.items():
+            with self.subTest(span=span):
+                self.assertEqual(HealthMetricStore.resolution_for(now - span, now, now=now), resolution)
+
+        self.assertEqual(HealthMetricStore.resolution_for(now - timedelta(days=1), now, max_points=100, now=now), 'hour')
+
+    def test_series_points(self):
+        self.samples(360)
+        HealthMetricStore.rollup(now=self.now)
+
+        raw = HealthMetricStore.series('memory', self.now - timedelta(minutes=10), self.now)
+        minutes = HealthMetricStore.series('memory', self.now - timedelta(hours=2), self.now)
+
+        self.assertEqual((raw['resolution'], len(raw['points'])), ('raw', 60))
+        self.assertEqual((minutes['resolution'], len(minutes['points'])), ('minute', 60))
+        self.assertEqual(minutes['points'][0], {
+            'timestamp': (self.now - timedelta(hours=1)).isoformat(), 'avg': 2.5, 'min': 0, 'max': 5,
+            'response_time': 1.0, 'samples': 6, 'status': 'healthy',
+        })
+
+    def test_api_serves_the_series(self):
+        admin = User.objects.create_superuser(username='admin', email='admin@test.com', password='testpass123')
+        self.client.force_login(admin)
+        self.samples(360)
+        HealthMetricStore.rollup(now=self.now)
+
+        response = self.client.get(
+            reverse('core:health_metrics_type_api', kwargs={'metric_type': 'memory'}),
+            {'start': (self.now - timedelta(hours=3)).isoformat(), 'end': self.now.isoformat()}
+        )
+
+        data = json.loads(response.content)
+        self.assertEqual(data['series']['resolution'], 'minute')
+        self.assertEqual(len(data['series']['points']), 60)
+        self.assertEqual(data['metrics'][0]['metric_name'], 'memory')
+
+
+@skipUnless(
+    'HEALTH_METRICS_BENCHMARK_METRICS' in os.environ,
+    'Set HEALTH_METRICS_BENCHMARK_METRICS to run the benchmark'
+)
+class HealthMetricsBenchmarkTest(HealthMetricsTestCase):
+    """
+    Benchmark writes, rollups, retention and range queries over 30 days of
+    10-second samples.
+
+    Runs when HEALTH_METRICS_BENCHMARK_METRICS is set to the number of
+    metrics sampled (for example 10).
+    """
+
+    METRICS = ['memory', 'disk', 'system_load', 'api', 'celery', 'redis', 'logs', 'database', 'cache', 'overall']
+
+    def timed(self, function, repeat=1):
+        start_time = time.perf_counter()
+        for _ in range(repeat):
+            result = function()
+        return (time.perf_counter() - start_time) / repeat, result
+
+    def write_samples(self):
+        count = BENCHMARK_DAYS * 86400 // SAMPLE_INTERVAL.seconds
+        start = self.now - SAMPLE_INTERVAL * count
+        for metric_name in self.METRICS[:BENCHMARK_METRICS]:
+            for i in range(count):
+                self.writer.submit(metric_name, 'healthy', 'Sample', details={'percent_used': i % 100},
+                                   response_time=float(i % 7), value=float(i % 100),
+                                   timestamp=start + SAMPLE_INTERVAL * i)
+                if self.writer.queue.qsize() >= HealthMetricWriter.QUEUE_SIZE - 1:
+                    self.writer.flush()
+        self.writer.flush()
+        return count * BENCHMARK_METRICS
+
+    def test_benchmark(self):
+        write_time, samples = self.timed(self.write_samples)
+        rollup_time, summary = self.timed(lambda: HealthMetricStore.rollup(now=self.now))
+        self.writer.submit('memory', 'healthy', 'Sample', value=1.0, timestamp=self.now)
+        self.writer.flush()
+        incremental_time, _ = self.timed(lambda: HealthMetricStore.rollup(now=self.now + timedelta(seconds=30)))
+
+        ranges = {
+            '1 hour (raw)': timedelta(hours=1),
+            '24 hours (minute)': timedelta(days=1),
+            '7 days (hour)': timedelta(days=7),
+            '30 days (hour)': timedelta(days=30),
+        }
+        end = timezone.now()
+
+        print(f"\nHealth Metrics Benchmark ({BENCHMARK_METRICS} metrics x {BENCHMARK_DAYS} days "
+              f"of 10s samples = {samples:,} samples):")
+        print(f"  Batched writes:     {samples / write_time:12,.0f} samples/s")
+        print(f"  Initial rollup:     {rollup_time:8.2f}s  {summary}")
+        print(f"  Incremental rollup: {incremental_time * 1000:8.2f}ms")
+        for name, span in ranges.items():
+            latency, series = self.timed(lambda: HealthMetricStore.series('memory', end - span, end), repeat=5)
+            print(f"  series {name:<18} {latency * 1000:8.2f}ms  {len(series['points']):6} points")
+        raw_latency, rows = self.timed(lambda: len(HealthMetric.get_metrics_by_type('memory', hours=24 * 30)), repeat=1)
+        print(f"  raw rows 30 days (before)  {raw_latency * 1000:8.2f}ms  {rows:6} points")
+
+        prune_time, pruned = self.timed(lambda: HealthMetricStore.prune(now=self.now))
+        print(f"  Prune:              {prune_time:8.2f}s  {pruned}")
+
+        self.assertEqual(summary['minute'], BENCHMARK_DAYS * 1440 * BENCHMARK_METRICS)
+        self.assertLess(incremental_time, rollup_time)
@@ -0,0 +1,273 @@
+"""
+Tests for the Celery worker telemetry and the cached Celery and Redis checks.
+
+Covers heartbeats and task counters published to the cache, a real worker
+consuming from an in-memory broker, the pooled Redis client and the Redis
+check against an in-memory stand-in for the server.
+"""
+
+import os
+import time
+from datetime import timedelta
+from unittest import skipUnless
+from unittest.mock import patch
+
+import redis
+from celery import Celery
+from celery.contrib.testing.worker import start_worker
+from celery.signals import worker_ready, worker_shutdown
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django_celery_beat.models import PeriodicTask
+from django_celery_results.models import TaskResult
+
+from core.services.health_service import CeleryHealthChecker, RedisHealthChecker, get_redis_client
+from core.services.worker_telemetry import WorkerTelemetry
+
+
+BENCHMARK_WORKERS = int(os.environ.get('WORKER_TELEMETRY_BENCHMARK_WORKERS', 20))
+
+
+class FakeRedis:
+    """In-memory stand-in for a Redis server, counting the commands it receives."""
+
+    def __init__(self, info=None, down=False):
+        self.data = {}
+        self.commands = []
+        self.down = down
+        self._info = info or {
+            'redis_version': '7.2.0',
+            'used_memory': 512000,
+            'maxmemory': 1024000,
+            'connected_clients': 12,
+            'keyspace_hits': 90,
+            'keyspace_misses': 10,
+        }
+
+    def _command(self, name):
+        if self.down:
+            raise redis.ConnectionError('Error 111 connecting to 127.0.0.1:6379. Connection refused.')
+        self.commands.append(name)
+
+    def info(self):
+        self._command('INFO')
+        return dict(self._info)
+
+    def set(self, key, value, ex=None):
+        self._command('SET')
+        self.data[key] = str(value).encode()
+        return True
+
+    def get(self, key):
+        self._command('GET')
+        return self.data.get(key)
+
+    def delete(self, key):
+        self._command('DEL')
+        return 1 if self.data.pop(key, None) is not None else 0
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'worker-telemetry-tests',
+    }
+})
+class WorkerTelemetryTest(TestCase):
+    """Test publishing and reading worker telemetry."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_heartbeats(self):
+        WorkerTelemetry.heartbeat('celery@web-1', ['celery'])
+        WorkerTelemetry.heartbeat('celery@web-2', ['celery', 'exports'])
+        WorkerTelemetry.heartbeat('celery@web-1', ['celery'])
+
+        self.assertEqual(sorted(worker['hostname'] for worker in WorkerTelemetry.workers()),
+                         ['celery@web-1', 'celery@web-2'])
+
+        # A worker that stops sending heartbeats drops out once they expire
+        cache.delete(WorkerTelemetry._key('worker', 'celery@web-2'))
+        self.assertEqual([worker['hostname'] for worker in WorkerTelemetry.workers()], ['celery@web-1'])
+
+        WorkerTelemetry.worker_stopped('celery@web-1')
+        self.assertEqual(WorkerTelemetry.workers(), [])
+
+    def test_task_counters(self):
+        WorkerTelemetry.heartbeat('celery@web-1')
+        for i in range(3):
+            WorkerTelemetry.task_published('celery')
+        for i in range(2):
+            WorkerTelemetry.task_started('celery@web-1', f'task-{i}', 'celery')
+        WorkerTelemetry.task_finished('celery@web-1', 'task-0', 'SUCCESS')
+
+        # A task finished more than a day ago is out of the window
+        with patch('core.services.worker_telemetry.timezone.now', return_value=timezone.now() - timedelta(hours=25)):
+            WorkerTelemetry.task_finished('celery@web-1', 'task-old', 'FAILURE')
+
+        snapshot = WorkerTelemetry.snapshot()
+        self.assertEqual(snapshot['active_tasks'], 0)
+        self.assertEqual(snapshot['queues'], {'celery': 1})
+        self.assertEqual(snapshot['tasks']['total'], 1)
+        self.assertEqual(snapshot['tasks']['SUCCESS'], 1)
+        self.assertNotIn('FAILURE', snapshot['tasks'])
+
+    def test_checker_reads_telemetry(self):
+        WorkerTelemetry.heartbeat('celery@web-1')
+        TaskResult.objects.create(task_id='a', status='SUCCESS')
+        TaskResult.objects.create(task_id='b', status='FAILURE')
+
+        checker = CeleryHealthChecker()
+        with self.assertNumQueries(3):
+            first = checker.check()
+        with self.assertNumQueries(0):
+            checker.check()
+
+        self.assertEqual(first.details['worker_names'], ['celery@web-1'])
+        self.assertEqual(first.details['total_tasks_24h'], 2)
+        self.assertEqual(first.status, 'critical')
+        self.assertIn('50.0%', first.message)
+
+    def test_no_workers(self):
+        result = CeleryHealthChecker().check()
+
+        self.assertEqual(result.status, 'critical')
+        self.assertIn('No active Celery workers', result.message)
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'worker-telemetry-tests',
+    }
+})
+class InMemoryBrokerTest(TestCase):
+    """Test the telemetry a real worker publishes, using an in-memory broker."""
+
+    def setUp(self):
+        cache.clear()
+        self.app = Celery('telemetry_test', broker='memory://', backend='cache+memory://')
+        self.app.conf.task_default_queue = 'telemetry'
+
+        @self.app.task
+        def add(x, y):
+            return x + y
+
+        @self.app.task
+        def fail():
+            raise ValueError('Task failed')
+
+        self.add, self.failing = add, fail
+
+    def test_worker_publishes_telemetry(self):
+        with start_worker(self.app, perform_ping_check=False) as worker:
+            # `celery worker` sends worker_ready once it consumes and
+            # worker_shutdown at exit, the test controller sends neither
+            worker_ready.send(sender=worker.consumer)
+
+            results = [self.add.delay(i, i) for i in range(5)] + [self.failing.delay()]
+            self.assertEqual([result.get(timeout=10) for result in results[:5]], [0, 2, 4, 6, 8])
+            with self.assertRaises(ValueError):
+                results[5].get(timeout=10, propagate=True)
+
+            # The postrun signal is sent after the result is stored
+            deadline = time.monotonic() + 5
+            while WorkerTelemetry.task_counts()['total'] < 6 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            snapshot = WorkerTelemetry.snapshot()
+            self.assertEqual([entry['hostname'] for entry in snapshot['workers']], [worker.hostname])
+            self.assertEqual(snapshot['workers'][0]['queues'], ['telemetry'])
+            self.assertEqual(snapshot['queues'], {'telemetry': 0})
+            self.assertEqual(snapshot['active_tasks'], 0)
+            self.assertEqual((snapshot['tasks']['SUCCESS'], snapshot['tasks']['FAILURE']), (5, 1))
+
+            stats = CeleryHealthChecker()._collect_celery_statistics(self.app, TaskResult, PeriodicTask)
+            self.assertEqual(stats['active_workers'], 1)
+            self.assertEqual(stats['processed_tasks_24h'], 6)
+
+            worker_shutdown.send(sender=worker)
+
+        self.assertEqual(WorkerTelemetry.workers(), [])
+
+
+class RedisCheckTest(TestCase):
+    """Test the Redis check against an in-memory stand-in."""
+
+    def test_client_is_pooled(self):
+        client = get_redis_client('redis://127.0.0.1:6399/5')
+
+        self.assertIs(get_redis_client('redis://127.0.0.1:6399/5'), client)
+        self.assertIsNot(get_redis_client('redis://127.0.0.1:6399/6'), client)
+        self.assertEqual(client.connection_pool.max_connections, 4)
+
+    def test_statistics_are_cached(self):
+        server = FakeRedis()
+        checker = RedisHealthChecker()
+        with patch('core.services.health_service.get_redis_client', return_value=server):
+            results = [checker.check() for _ in range(5)]
+
+        self.assertEqual(server.commands, ['INFO', 'SET', 'GET', 'DEL'])
+        self.assertEqual({result.status for result in results}, {'healthy'})
+        self.assertEqual(results[-1].details['used_memory_percentage'], 50.0)
+        self.assertEqual(results[-1].details['basic_operations'], 'working')
+
+    def test_unreachable_server(self):
+        with patch('core.services.health_service.get_redis_client', return_value=FakeRedis(down=True)):
+            result = RedisHealthChecker().check()
+
+        self.assertEqual(result.status, 'critical')
+        self.assertIn('Redis connection failed', result.message)
+        self.assertIsNotNone(result.response_time)
+
+
+@skipUnless(
+    'WORKER_TELEMETRY_BENCHMARK_WORKERS' in os.environ,
+    'Set WORKER_TELEMETRY_BENCHMARK_WORKERS to run the benchmark'
+)
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'worker-telemetry-tests',
+    }
+})
+class WorkerTelemetryBenchmarkTest(TestCase):
+    """
+    Benchmark reading worker state from telemetry.
+
+    Runs when WORKER_TELEMETRY_BENCHMARK_WORKERS is set to the number of
+    workers (for example 100).
+    """
+
+    def test_benchmark(self):
+        cache.clear()
+        for i in range(BENCHMARK_WORKERS):
+            hostname = f'celery@worker-{i}'
+            WorkerTelemetry.heartbeat(hostname, ['celery'])
+            for j in range(10):
+                WorkerTelemetry.task_started(hostname, f'{i}-{j}', 'celery')
+                WorkerTelemetry.task_finished(hostname, f'{i}-{j}', 'SUCCESS')
+
+        checker = CeleryHealthChecker()
+        checker.check()
+
+        repeat = 100
+        start_time = time.perf_counter()
+        for _ in range(repeat):
+            snapshot = WorkerTelemetry.snapshot()
+        snapshot_time = (time.perf_counter() - start_time) / repeat
+
+        start_time = time.perf_counter()
+        for _ in range(repeat):
+            checker.check()
+        check_time = (time.perf_counter() - start_time) / repeat
+
+        print(f"\nWorker Telemetry Benchmark ({BENCHMARK_WORKERS} workers):")
+        print(f"  Telemetry snapshot: {snapshot_time * 1000:8.3f}ms")
+        print(f"  Celery check:       {check_time * 1000:8.3f}ms (cached task statistics)")
+        print("  inspect() waits up to its 1s reply timeout per call")
+
+        self.assertEqual(len(snapshot['workers']), BENCHMARK_WORKERS)
+        self.assertEqual(snapshot['tasks']['total'], BENCHMARK_WORKERS * 10)
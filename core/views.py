@@ -2,194 +2,39 @@
 import json
 import logging
 from datetime import datetime, timedelta
-from django.db.models import Sum, Count, Q
-from django.contrib.auth.models import User
+from django.db.models import Q
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views import View
 from django.http import Http404, JsonResponse, HttpResponseNotAllowed
 from django.utils.translation import gettext as _
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.core.cache import cache
 from django.contrib.admin.views.decorators import staff_member_required
 from django.utils.decorators import method_decorator
 from django.contrib.auth.decorators import user_passes_test
 from django.conf import settings
 
-from blog.models import Post, Category
-from .models import Page, Template, Component, HealthMetric, SystemAlert
+from blog.models import Post
+from blog.services.export_service import ExportService
+from .models import Page, Component, HealthMetric, SystemAlert
 from .services.health_service import health_service
+from .services.health_metrics_service import HealthMetricStore
+from .services.dashboard_snapshot_service import DashboardSnapshotService
 
 logger = logging.getLogger(__name__)
 
 
 def dashboard_callback(request, context):
     """
-    Enhanced callback that prepares comprehensive data for the custom dashboard template.
-    Includes caching, performance metrics, and better data organization.
+    Callback that prepares the data for the custom dashboard template.
+    The data comes from the snapshot shared by all users of the same role.
     """
-    # Check cache first
-    cache_key = f"dashboard_data_{request.user.id}"
-    cached_data = cache.get(cache_key)
-    
-    if cached_data:
-        context.update(cached_data)
-        return context
-    
-    # Calculate date ranges for comparisons
-    now = timezone.now()
-    thirty_days_ago = now - timedelta(days=30)
-    sixty_days_ago = now - timedelta(days=60)
-    
-    # 1. Fetch current metrics
-    total_users = User.objects.count()
-    total_posts = Post.objects.count()
-    total_post_views = Post.objects.aggregate(Sum('view_count'))['view_count__sum'] or 0
-    total_categories = Category.objects.count()
-    total_pages = Page.objects.count()
-    total_templates = Template.objects.count()
-    
-    # 2. Calculate changes (for the last 30 days vs previous 30 days)
-    try:
-        # Posts change
-        posts_last_30 = Post.objects.filter(created_at__gte=thirty_days_ago).count()
-        posts_prev_30 = Post.objects.filter(
-            created_at__gte=sixty_days_ago, 
-            created_at__lt=thirty_days_ago
-        ).count()
-        posts_change = calculate_percentage_change(posts_last_30, posts_prev_30)
-        
-        # Users change
-        users_last_30 = User.objects.filter(date_joined__gte=thirty_days_ago).count()
-        users_prev_30 = User.objects.filter(
-            date_joined__gte=sixty_days_ago,
-            date_joined__lt=thirty_days_ago
-        ).count()
-        users_change = calculate_percentage_change(users_last_30, users_prev_30)
-        
-        # Views change (if you have a date field for views)
-        views_change = 0  # Placeholder - implement based on your view tracking
-        
-    except Exception as e:
-        # Fallback if date calculations fail
-        posts_change = users_change = views_change = 0
-    
-    # 3. Create enhanced metrics with icons and changes
-    metrics = [
-        {
-            'label': _('Total Users'),
-            'value': total_users,
-            'icon': 'group',
-            'change': users_change,
-            'color': 'blue'
-        },
-        {
-            'label': _('Total Posts'),
-            'value': total_posts,
-            'icon': 'article',
-            'change': posts_change,
-            'color': 'green'
-        },
-        {
-            'label': _('Total Views'),
-            'value': total_post_views,
-            'icon': 'visibility',
-            'change': views_change,
-            'color': 'purple'
-        },
-        {
-            'label': _('Categories'),
-            'value': total_categories,
-            'icon': 'folder',
-            'change': 0,
-            'color': 'orange'
-        },
-        {
-            'label': _('Pages'),
-            'value': total_pages,
-            'icon': 'layers',
-            'change': 0,
-            'color': 'red'
-        },
-        {
-            'label': _('Templates'),
-            'value': total_templates,
-            'icon': 'dashboard_customize',
-            'change': 0,
-            'color': 'indigo'
-        },
-    ]
-    
-    # 4. Enhanced chart data with better labels
-    chart_data = {
-        'labels': [_("Posts"), _("Categories"), _("Pages"), _("Templates")],
-        'values': [total_posts, total_categories, total_pages, total_templates],
-    }
-    
-    # 5. Fetch recent posts with better data
-    recent_posts = Post.objects.select_related('author').prefetch_related('categories').order_by('-updated_at')[:8]
-    
-    # 6. Additional analytics data - Fixed the category field issue
-    try:
-        # Get posts by status
-        posts_by_status = Post.objects.values('status').annotate(count=Count('id'))
-        
-        # Get posts by category - Fixed to use the many-to-many relationship
-        posts_by_category = Post.objects.filter(categories__isnull=False).values('categories__name').annotate(count=Count('id')).order_by('-count')[:5]
-        
-        # Get recent users
-        recent_users = User.objects.order_by('-date_joined')[:5]
-        
-        # Get popular posts
-        popular_posts = Post.objects.order_by('-view_count')[:5]
-        
-        analytics_data = {
-            'posts_by_status': posts_by_status,
-            'posts_by_category': posts_by_category,
-            'recent_users': recent_users,
-            'popular_posts': popular_posts,
-        }
-    except Exception as e:
-        # Fallback analytics data if queries fail
-        analytics_data = {
-            'posts_by_status': [],
-            'posts_by_category': [],
-            'recent_users': [],
-            'popular_posts': [],
-        }
-    
-    # 7. System health metrics
-    system_health = {
-        'database_connection': True,  # You can add actual health checks
-        'cache_status': True,
-        'last_backup': None,  # Add your backup status
-    }
-    
-    # Prepare context update
-    dashboard_data = {
-        "metrics": metrics,
-        "chart_data": chart_data,
-        "recent_posts": recent_posts,
-        "analytics_data": analytics_data,
-        "system_health": system_health,
-        "dashboard_title": _("Digital Architect Dashboard"),
-        "last_updated": now.isoformat(),
-    }
-    
-    # Cache the data for 5 minutes
-    cache.set(cache_key, dashboard_data, 300)
-    
-    # 8. Update the context
-    context.update(dashboard_data)
+    role = DashboardSnapshotService.role_for(request.user)
+    context.update(DashboardSnapshotService.get(role))
     return context
 
 
-def calculate_percentage_change(current, previous):
-    """Calculate percentage change between two values"""
-    if previous == 0:
-        return 100 if current > 0 else 0
-    return round(((current - previous) / previous) * 100, 1)
-
-
 class DashboardAPIView(View):
     """
     API endpoint for dashboard data updates (for AJAX refreshes)
@@ -198,27 +43,26 @@ class DashboardAPIView(View):
         if not request.user.is_authenticated or not request.user.is_staff:
             return JsonResponse({'error': 'Unauthorized'}, status=401)
         
-        # Get fresh data (bypassing cache)
-        context = {}
-        updated_context = dashboard_callback(request, context)
+        snapshot = DashboardSnapshotService.get(DashboardSnapshotService.role_for(request.user))
         
         # Return JSON response
         return JsonResponse({
             'success': True,
             'data': {
-                'metrics': updated_context['metrics'],
-                'chart_data': updated_context['chart_data'],
+                'metrics': snapshot['metrics'],
+                'chart_data': snapshot['chart_data'],
+                'views_trend': snapshot['views_trend'],
                 'recent_posts': [
                     {
-                        'id': post.id,
-                        'title': post.title,
-                        'status': post.status,
-                        'updated_at': post.updated_at.isoformat(),
-                        'url': f"/admin/blog/post/{post.id}/change/",
+                        'id': post['id'],
+                        'title': post['title'],
+                        'status': post['status'],
+                        'updated_at': post['updated_at'].isoformat(),
+                        'url': f"/admin/blog/post/{post['id']}/change/",
                     }
-                    for post in updated_context['recent_posts']
+                    for post in snapshot['recent_posts']
                 ],
-                'last_updated': updated_context['last_updated'],
+                'last_updated': snapshot['last_updated'],
             }
         })
 
@@ -355,35 +199,19 @@ class DashboardExportView(View):
         export_format = request.GET.get('format', 'json')
         
         # Get dashboard data
-        context = {}
-        dashboard_data = dashboard_callback(request, context)
+        dashboard_data = DashboardSnapshotService.get(DashboardSnapshotService.role_for(request.user))
         
         if export_format == 'json':
             return JsonResponse(dashboard_data)
-        elif export_format == 'csv':
-            return self._export_csv(dashboard_data)
+        elif export_format in ExportService.ENCODERS:
+            rows = [
+                {'label': metric['label'], 'value': metric['value'], 'change': metric.get('change', 0)}
+                for metric in dashboard_data['metrics']
+            ]
+            compress = request.GET.get('compress') == 'gzip'
+            return ExportService.stream_response('dashboard_metrics', rows, export_format, compress)
         else:
             return JsonResponse({'error': 'Unsupported format'}, status=400)
-    
-    def _export_csv(self, data):
-        """Export metrics data as CSV"""
-        import csv
-        from django.http import HttpResponse
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="dashboard_metrics.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['Metric', 'Value', 'Change'])
-        
-        for metric in data['metrics']:
-            writer.writerow([
-                metric['label'],
-                metric['value'],
-                metric.get('change', 0)
-            ])
-        
-        return response
 
 
 
@@ -752,7 +580,16 @@ class HealthMetricsAPIView(View):
         
         hours = int(request.GET.get('hours', 24))
         limit = int(request.GET.get('limit', 100))
+        points = int(request.GET.get('points', HealthMetricStore.MAX_POINTS))
         
+        # Range of the series, either start/end or the last N hours
+        end = parse_datetime(request.GET.get('end', '')) or timezone.now()
+        start = parse_datetime(request.GET.get('start', '')) or end - timedelta(hours=hours)
+        if timezone.is_naive(end):
+            end = timezone.make_aware(end)
+        if timezone.is_naive(start):
+            start = timezone.make_aware(start)
+
         if metric_type:
             # Get specific metric type
             metrics = HealthMetric.get_metrics_by_type(metric_type, hours=hours)[:limit]
@@ -772,12 +609,14 @@ class HealthMetricsAPIView(View):
                     'metric_display': metric.get_metric_name_display(),
                     'status': metric.status,
                     'message': metric.message,
+                    'value': metric.value,
                     'response_time': metric.response_time,
                     'timestamp': metric.timestamp.isoformat(),
                     'metric_value': metric.metric_value,
                 }
                 for metric in metrics
-            ]
+            ],
+            'series': HealthMetricStore.series(metric_type or 'overall', start, end, max_points=max(points, 1)),
         }
         
         return JsonResponse(response_data)
@@ -1,4 +1,5 @@
 import os
+import sys
 from dotenv import load_dotenv
 from django.templatetags.static import static
 from django.urls import reverse_lazy
@@ -25,6 +26,15 @@ ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', '').split(',')
 if DEBUG:
     ALLOWED_HOSTS.extend(['testserver', '127.0.0.1', 'localhost'])
 
+# Running `manage.py test`
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
+# Write health metric samples from a background thread. Off under tests, where
+# samples are only written by an explicit flush() inside the test's transaction.
+HEALTH_METRIC_WRITER_AUTOSTART = os.getenv(
+    'HEALTH_METRIC_WRITER_AUTOSTART', str(not TESTING)
+).lower() in ('true', '1', 't')
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -196,6 +206,8 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_DIRS = [os.path.join(BASE_DIR, "static")]
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Admin export files, kept out of MEDIA_ROOT since they hold emails
+EXPORT_STORAGE_ROOT = os.getenv('EXPORT_STORAGE_ROOT', os.path.join(BASE_DIR, 'private', 'exports'))
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -730,6 +742,7 @@ BLOG_CACHE_TIMEOUT_TAG_CLOUD = 7200  # 2 hours
 BLOG_CACHE_TIMEOUT_SEARCH_RESULTS = 900  # 15 minutes
 BLOG_VIEW_COUNT_BATCH_SIZE = 10
 BLOG_VIEW_COUNT_FLUSH_INTERVAL = 300  # 5 minutes
+BLOG_SHARE_COUNT_FLUSH_INTERVAL = 60  # 1 minute
 
 # CORS Settings (if needed for frontend integration)
 CORS_ALLOWED_ORIGINS = [
@@ -3,18 +3,29 @@ Sitemap Generator Service for the Site Files Updater.
 
 This module provides functionality to generate an XML sitemap based on the URLs
 discovered by the URL Discovery Service.
+
+Large sites use the sharded layout written by update_sharded_sitemap(): blog
+posts are split into shards of at most SITEMAP_SHARD_SIZE URLs by post ID,
+other pages go into their own shard, and sitemap_index.xml lists them all.
+Shards are streamed to disk, and only shards whose posts changed since the
+last run are rewritten.
 """
+import json
 import logging
 import os
 import shutil
-import xml.dom.minidom
+import tempfile
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from xml.sax.saxutils import escape
 from django.conf import settings
 from .url_discovery import URLDiscoveryService, URLInfo
 
 logger = logging.getLogger(__name__)
 
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>'
+SITEMAP_NAMESPACE = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
 class SitemapGenerator:
     """
     Service for generating an XML sitemap based on discovered URLs.
@@ -32,6 +43,11 @@ class SitemapGenerator:
         self.url_discovery_service = url_discovery_service or URLDiscoveryService(site_url=self.site_url)
         self.default_sitemap_path = getattr(settings, 'SITEMAP_PATH', 'static/Sitemap.xml')
         self.backup_dir = getattr(settings, 'SITEMAP_BACKUP_DIR', 'static/backups')
+        self.sitemap_dir = getattr(settings, 'SITEMAP_SHARD_DIR', 'static/sitemaps')
+        self.sitemap_base_url = getattr(
+            settings, 'SITEMAP_SHARD_URL', f"{self.site_url.rstrip('/')}/static/sitemaps/"
+        )
+        self.shard_size = getattr(settings, 'SITEMAP_SHARD_SIZE', 50000)
         
     def generate_sitemap(self) -> str:
         """
@@ -55,44 +71,80 @@ class SitemapGenerator:
             logger.error(f"Error generating sitemap: {e}")
             raise
     
-    def _generate_xml_content(self, urls: List[URLInfo]) -> str:
+    def _generate_xml_content(self, urls: Iterable[URLInfo]) -> str:
         """
         Generate the XML content for the sitemap.
         
         Args:
-            urls: A list of URLInfo objects
+            urls: An iterable of URLInfo objects
             
         Returns:
             The XML content as a string
         """
-        # Start with the XML declaration and opening tags
-        xml_parts = [
-            '<?xml version="1.0" encoding="UTF-8"?>',
-            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
-        ]
+        return ''.join(self._iter_xml_content(urls))
+    
+    def _iter_xml_content(self, urls: Iterable[URLInfo]) -> Iterator[str]:
+        """
+        Incrementally generate the XML content for a sitemap.
         
-        # Add each URL as a sitemap element
+        Elements are already indented, so the output needs no pretty-printing
+        pass and can be written to disk as it is produced.
+        
+        Args:
+            urls: An iterable of URLInfo objects
+            
+        Returns:
+            An iterator of XML fragments
+        """
+        yield f'{XML_DECLARATION}\n<urlset xmlns="{SITEMAP_NAMESPACE}">\n'
         for url_info in urls:
-            xml_parts.append(url_info.to_sitemap_element(self.site_url))
+            yield url_info.to_sitemap_element(self.site_url) + '\n'
+        yield '</urlset>'
+    
+    def _iter_index_content(self, shards: List[Dict[str, Any]]) -> Iterator[str]:
+        """
+        Incrementally generate the XML content for a sitemap index.
+        
+        Args:
+            shards: Dicts with the shard file name and lastmod
+            
+        Returns:
+            An iterator of XML fragments
+        """
+        yield f'{XML_DECLARATION}\n<sitemapindex xmlns="{SITEMAP_NAMESPACE}">\n'
+        for shard in shards:
+            yield f'  <sitemap>\n    <loc>{escape(self.sitemap_base_url + shard["name"])}</loc>\n'
+            if shard['lastmod']:
+                yield f'    <lastmod>{shard["lastmod"].isoformat(timespec="seconds")}</lastmod>\n'
+            yield '  </sitemap>\n'
+        yield '</sitemapindex>'
+    
+    def _write_atomic(self, file_path: str, chunks: Iterable[str]):
+        """
+        Write chunks to a temporary file and rename it over file_path.
         
-        # Add the closing tag
-        xml_parts.append('</urlset>')
+        Readers see either the old file or the complete new one, never a
+        partially written file.
         
-        # Join all parts with newlines
-        xml_content = '\n'.join(xml_parts)
+        Args:
+            file_path: The path to write to
+            chunks: An iterable of strings to write
+        """
+        directory = os.path.dirname(file_path) or '.'
+        os.makedirs(directory, exist_ok=True)
         
-        # Pretty print the XML for better readability
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(file_path)}.", suffix='.tmp')
         try:
-            dom = xml.dom.minidom.parseString(xml_content)
-            pretty_xml = dom.toprettyxml(indent="  ")
-            
-            # Remove empty lines that minidom sometimes adds
-            pretty_xml = '\n'.join([line for line in pretty_xml.split('\n') if line.strip()])
-            
-            return pretty_xml
-        except Exception as e:
-            logger.warning(f"Could not pretty-print XML: {e}. Returning raw XML.")
-            return xml_content
+            with open(fd, 'w', encoding='utf-8') as f:
+                f.writelines(chunks)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
             
     def write_sitemap(self, sitemap_content: str, file_path: Optional[str] = None) -> bool:
         """
@@ -113,18 +165,13 @@ class SitemapGenerator:
             if os.path.exists(file_path):
                 self._create_backup(file_path)
             
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            
-            # Write the new sitemap
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(sitemap_content)
+            # Write the new sitemap; the existing file is untouched on failure
+            self._write_atomic(file_path, [sitemap_content])
             
             logger.info(f"Successfully wrote sitemap to {file_path}")
             return True
         except Exception as e:
             logger.error(f"Error writing sitemap to {file_path}: {e}")
-            self._restore_backup(file_path)
             return False
     
     def _create_backup(self, file_path: str) -> Optional[str]:
@@ -207,4 +254,92 @@ class SitemapGenerator:
             return success
         except Exception as e:
             logger.error(f"Error updating sitemap: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    def update_sharded_sitemap(self, output_dir: Optional[str] = None, force: bool = False) -> Dict[str, Any]:
+        """
+        Write the sharded sitemap and its index, rewriting only changed shards.
+        
+        A manifest next to the shards records each post shard's post count,
+        ID checksum and max(updated_at). Shards with the same signature as the
+        last run are left alone; new, changed and removed shards are written
+        or deleted. The non-post shard is small and always rewritten.
+        
+        Args:
+            output_dir: Directory for the shards and index (defaults to settings.SITEMAP_SHARD_DIR)
+            force: Rewrite every shard regardless of the manifest
+            
+        Returns:
+            A dict with the index path, URL count and the shards written and skipped
+        """
+        output_dir = output_dir or self.sitemap_dir
+        manifest_path = os.path.join(output_dir, 'sitemap_manifest.json')
+        manifest = {} if force else self._load_manifest(manifest_path)
+        previous = manifest.get('shards', {}) if manifest.get('shard_size') == self.shard_size else {}
+        
+        logger.info(f"Updating sharded sitemap in {output_dir}")
+        
+        # Pages, categories and other non-post URLs
+        page_urls = self.url_discovery_service.get_non_post_urls()
+        self._write_atomic(os.path.join(output_dir, 'sitemap-pages.xml'), self._iter_xml_content(page_urls))
+        lastmods = [url.lastmod for url in page_urls if url.lastmod]
+        index_entries = [{'name': 'sitemap-pages.xml', 'lastmod': max(lastmods) if lastmods else None}]
+        
+        signatures = {}
+        written, skipped = ['sitemap-pages.xml'], []
+        url_count = len(page_urls)
+        for shard in self.url_discovery_service.get_blog_post_shards(self.shard_size):
+            name = f"sitemap-posts-{shard['shard']}.xml"
+            lastmod = shard['lastmod']
+            signature = f"{shard['count']}:{shard['pk_sum']}:{lastmod.isoformat() if lastmod else ''}"
+            signatures[name] = signature
+            url_count += shard['count']
+            index_entries.append({'name': name, 'lastmod': lastmod})
+            
+            shard_path = os.path.join(output_dir, name)
+            if previous.get(name) == signature and os.path.exists(shard_path):
+                skipped.append(name)
+                continue
+            
+            pk_min = shard['shard'] * self.shard_size
+            urls = self.url_discovery_service.iter_blog_post_urls(pk_min=pk_min, pk_max=pk_min + self.shard_size - 1)
+            self._write_atomic(shard_path, self._iter_xml_content(urls))
+            written.append(name)
+        
+        # Shards whose posts are all gone
+        for name in set(previous) - set(signatures):
+            shard_path = os.path.join(output_dir, name)
+            if os.path.exists(shard_path):
+                os.remove(shard_path)
+        
+        index_path = os.path.join(output_dir, 'sitemap_index.xml')
+        self._write_atomic(index_path, self._iter_index_content(index_entries))
+        self._write_atomic(manifest_path, [json.dumps({'shard_size': self.shard_size, 'shards': signatures})])
+        
+        logger.info(
+            f"Sharded sitemap: {url_count} URLs in {len(index_entries)} shards, "
+            f"{len(written)} written, {len(skipped)} unchanged"
+        )
+        return {
+            'index_path': index_path,
+            'urls': url_count,
+            'shards': len(index_entries),
+            'written': written,
+            'skipped': skipped,
+        }
+    
+    def _load_manifest(self, manifest_path: str) -> Dict[str, Any]:
+        """
+        Load the shard manifest written by the previous run.
+        
+        Args:
+            manifest_path: The path to the manifest file
+            
+        Returns:
+            The manifest dict, or an empty dict if missing or unreadable
+        """
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
@@ -6,7 +6,7 @@ including static URLs from URL patterns and dynamic URLs from database content.
 """
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 from django.urls import URLPattern, URLResolver
 from django.conf import settings
 import logging
@@ -338,21 +338,10 @@ class URLDiscoveryService:
             from blog.models import Post
             
             logger.info("Discovering blog post URLs")
-            urls = []
-            
-            # Get all published blog posts
-            posts = Post.objects.filter(status='published')
             
-            for post in posts:
-                url_info = URLInfo(
-                    url=f"blog/{post.slug}/",
-                    lastmod=post.updated_at,
-                    changefreq='weekly',
-                    priority=0.7,
-                    title=post.title,
-                    type='blog'
-                )
-                urls.append(url_info)
+            # Only the columns a URL needs, never the post content
+            rows = Post.objects.filter(status='published').values_list('slug', 'title', 'updated_at')
+            urls = [self._blog_post_url(slug, updated_at, title) for slug, title, updated_at in rows]
             
             logger.info(f"Discovered {len(urls)} blog post URLs")
             return urls
@@ -360,6 +349,92 @@ class URLDiscoveryService:
             logger.error(f"Error discovering blog post URLs: {e}")
             return []
     
+    def _blog_post_url(self, slug: str, updated_at: Optional[datetime], title: Optional[str] = None) -> URLInfo:
+        """
+        Build the URLInfo for a blog post.
+        
+        Args:
+            slug: The post slug
+            updated_at: When the post was last modified
+            title: The post title, if needed
+            
+        Returns:
+            A URLInfo object for the post
+        """
+        return URLInfo(
+            url=f"blog/{slug}/",
+            lastmod=updated_at,
+            changefreq='weekly',
+            priority=0.7,
+            title=title,
+            type='blog'
+        )
+    
+    def iter_blog_post_urls(self, pk_min: Optional[int] = None, pk_max: Optional[int] = None,
+                            chunk_size: int = 2000) -> Iterator[URLInfo]:
+        """
+        Stream URLs for published blog posts in primary key order.
+        
+        Only slug and updated_at are fetched, in chunks, so memory stays flat
+        however many posts there are.
+        
+        Args:
+            pk_min: Lowest post ID to include
+            pk_max: Highest post ID to include
+            chunk_size: Rows fetched from the database at a time
+            
+        Returns:
+            An iterator of URLInfo objects for blog posts
+        """
+        from blog.models import Post
+        
+        posts = Post.objects.filter(status='published')
+        if pk_min is not None:
+            posts = posts.filter(pk__gte=pk_min)
+        if pk_max is not None:
+            posts = posts.filter(pk__lte=pk_max)
+        
+        rows = posts.order_by('pk').values_list('slug', 'updated_at').iterator(chunk_size=chunk_size)
+        for slug, updated_at in rows:
+            yield self._blog_post_url(slug, updated_at)
+    
+    def get_blog_post_shards(self, shard_size: int) -> List[Dict[str, Any]]:
+        """
+        Summarize published blog posts per block of shard_size post IDs.
+        
+        Posts with IDs in [n * shard_size, (n + 1) * shard_size) belong to
+        shard n, so a shard never holds more than shard_size URLs and a post
+        only ever affects the shard it lives in. The summary is computed in a
+        single grouped query.
+        
+        Args:
+            shard_size: Number of post IDs per shard
+            
+        Returns:
+            A list of dicts with shard, count, pk_sum and lastmod, ordered by shard
+        """
+        from blog.models import Post
+        from django.db.models import Count, F, IntegerField, Max, Sum
+        from django.db.models.functions import Cast, Floor
+        
+        return list(
+            Post.objects.filter(status='published')
+            .annotate(shard=Cast(Floor(F('pk') / shard_size), IntegerField()))
+            .values('shard')
+            .annotate(count=Count('pk'), pk_sum=Sum('pk'), lastmod=Max('updated_at'))
+            .order_by('shard')
+        )
+    
+    def get_non_post_urls(self) -> List[URLInfo]:
+        """
+        Get all public URLs except blog posts.
+        
+        Returns:
+            A list of URLInfo objects for URL patterns, pages and categories
+        """
+        urls = self._extract_url_patterns() + self._get_page_urls() + self._get_blog_category_urls()
+        return list({url.url: url for url in urls}.values())
+    
     def _get_blog_category_urls(self) -> List[URLInfo]:
         """
         Get URLs for all blog categories.
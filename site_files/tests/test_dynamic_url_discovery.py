@@ -53,19 +53,11 @@ class DynamicURLDiscoveryTestCase(TestCase):
     @mock.patch('blog.models.Post.objects.filter')
     def test_get_blog_post_urls(self, mock_filter):
         """Test getting blog post URLs."""
-        # Create mock posts
-        mock_post1 = mock.MagicMock()
-        mock_post1.slug = 'post-1'
-        mock_post1.updated_at = datetime(2023, 1, 1)
-        mock_post1.title = 'Post 1'
-        
-        mock_post2 = mock.MagicMock()
-        mock_post2.slug = 'post-2'
-        mock_post2.updated_at = datetime(2023, 1, 2)
-        mock_post2.title = 'Post 2'
-        
-        # Set up mock return value
-        mock_filter.return_value = [mock_post1, mock_post2]
+        # Set up mock rows; only slug, title and updated_at are fetched
+        mock_filter.return_value.values_list.return_value = [
+            ('post-1', 'Post 1', datetime(2023, 1, 1)),
+            ('post-2', 'Post 2', datetime(2023, 1, 2)),
+        ]
         
         # Call the method
         urls = self.service._get_blog_post_urls()
@@ -85,6 +77,7 @@ class DynamicURLDiscoveryTestCase(TestCase):
         
         # Check that the filter was called with the correct arguments
         mock_filter.assert_called_once_with(status='published')
+        mock_filter.return_value.values_list.assert_called_once_with('slug', 'title', 'updated_at')
     
     @mock.patch('blog.models.Category.objects.all')
     def test_get_blog_category_urls(self, mock_all):
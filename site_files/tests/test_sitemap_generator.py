@@ -4,12 +4,19 @@ Tests for the Sitemap Generator Service.
 import os
 import shutil
 import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
 from datetime import datetime
-from unittest import mock
+from unittest import mock, skipUnless
+from django.contrib.auth.models import User
 from django.test import TestCase
-from site_files.services.url_discovery import URLInfo
+from blog.models import Post
+from site_files.services.url_discovery import URLDiscoveryService, URLInfo
 from site_files.services.sitemap_generator import SitemapGenerator
 
+SITEMAP_NS = {'sm': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
+
 
 class SitemapGeneratorTestCase(TestCase):
     """Test case for the SitemapGenerator."""
@@ -323,6 +330,154 @@ class SitemapGeneratorTestCase(TestCase):
         self.assertFalse(result)
 
 
+    def test_write_sitemap_is_atomic(self):
+        """Test that a failed write leaves the existing sitemap intact."""
+        self.generator.write_sitemap('<test>original</test>')
+        
+        with mock.patch('site_files.services.sitemap_generator.os.replace', side_effect=OSError("Disk full")):
+            result = self.generator.write_sitemap('<test>new</test>')
+        
+        self.assertFalse(result)
+        with open(self.sitemap_path, 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), '<test>original</test>')
+        self.assertEqual([name for name in os.listdir(self.temp_dir) if name.endswith('.tmp')], [])
+
+
+def create_published_posts(count, prefix='post'):
+    """Bulk create published posts and return them in ID order."""
+    author = User.objects.create_user(username=f'{prefix}_author', password='testpass123')
+    batch_size = 5000
+    for start in range(0, count, batch_size):
+        Post.objects.bulk_create([
+            Post(title=f'{prefix} {i}', slug=f'{prefix}-{i}', author=author, content='Content', status='published')
+            for i in range(start, min(start + batch_size, count))
+        ])
+    return Post.objects.filter(slug__startswith=f'{prefix}-').order_by('pk')
+
+
+class ShardedSitemapTestCase(TestCase):
+    """Test case for the sharded sitemap and its index."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        
+        self.url_discovery_service = URLDiscoveryService(site_url='https://example.com')
+        self.url_discovery_service._extract_url_patterns = mock.Mock(return_value=[URLInfo(url='about/')])
+        self.generator = SitemapGenerator(url_discovery_service=self.url_discovery_service, site_url='https://example.com')
+        self.generator.sitemap_base_url = 'https://example.com/static/sitemaps/'
+        self.generator.shard_size = 10
+        
+        self.posts = list(create_published_posts(25))
+    
+    def _read_locs(self, name):
+        tree = ET.parse(os.path.join(self.temp_dir, name))
+        return [loc.text for loc in tree.getroot().iterfind('.//sm:loc', SITEMAP_NS)]
+    
+    def _post_shard(self, post):
+        return f'sitemap-posts-{post.pk // self.generator.shard_size}.xml'
+    
+    def test_index_lists_every_shard(self):
+        """Test that posts are split into shards listed by the index."""
+        result = self.generator.update_sharded_sitemap(self.temp_dir)
+        
+        shard_names = sorted({self._post_shard(post) for post in self.posts})
+        self.assertEqual(result['urls'], 26)
+        self.assertEqual(result['shards'], len(shard_names) + 1)
+        self.assertEqual(
+            self._read_locs('sitemap_index.xml'),
+            [f'https://example.com/static/sitemaps/{name}' for name in ['sitemap-pages.xml'] + sorted(shard_names, key=lambda name: int(name[14:-4]))]
+        )
+        self.assertEqual(self._read_locs('sitemap-pages.xml'), ['https://example.com/about/'])
+        
+        post_locs = []
+        for name in shard_names:
+            locs = self._read_locs(name)
+            self.assertLessEqual(len(locs), self.generator.shard_size)
+            post_locs.extend(locs)
+        self.assertCountEqual(post_locs, [f'https://example.com/blog/{post.slug}/' for post in self.posts])
+    
+    def test_only_changed_shards_are_rewritten(self):
+        """Test that unchanged shards are skipped on the next run."""
+        first = self.generator.update_sharded_sitemap(self.temp_dir)
+        second = self.generator.update_sharded_sitemap(self.temp_dir)
+        self.assertEqual(second['written'], ['sitemap-pages.xml'])
+        self.assertEqual(len(second['skipped']), first['shards'] - 1)
+        
+        post = self.posts[-1]
+        post.slug = 'renamed-post'
+        post.save()
+        third = self.generator.update_sharded_sitemap(self.temp_dir)
+        
+        self.assertEqual(third['written'], ['sitemap-pages.xml', self._post_shard(post)])
+        self.assertIn('https://example.com/blog/renamed-post/', self._read_locs(self._post_shard(post)))
+    
+    def test_unpublished_posts_update_their_shard(self):
+        """Test that unpublishing posts rewrites or removes their shard."""
+        self.generator.update_sharded_sitemap(self.temp_dir)
+        first_shard = self._post_shard(self.posts[0])
+        first_shard_posts = [post.pk for post in self.posts if self._post_shard(post) == first_shard]
+        
+        # Queryset updates leave updated_at alone; the shard checksum still changes
+        Post.objects.filter(pk=self.posts[-1].pk).update(status='draft')
+        Post.objects.filter(pk__in=first_shard_posts).update(status='draft')
+        result = self.generator.update_sharded_sitemap(self.temp_dir)
+        
+        self.assertIn(self._post_shard(self.posts[-1]), result['written'])
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, first_shard)))
+        self.assertNotIn(
+            f'https://example.com/static/sitemaps/{first_shard}', self._read_locs('sitemap_index.xml')
+        )
+    
+    def test_force_rewrites_all_shards(self):
+        """Test that force ignores the manifest."""
+        first = self.generator.update_sharded_sitemap(self.temp_dir)
+        forced = self.generator.update_sharded_sitemap(self.temp_dir, force=True)
+        
+        self.assertEqual(forced['written'], first['written'])
+        self.assertEqual(forced['skipped'], [])
+
+
+@skipUnless('SITEMAP_BENCHMARK_POSTS' in os.environ, 'Set SITEMAP_BENCHMARK_POSTS to run the benchmark')
+class ShardedSitemapBenchmarkTestCase(TestCase):
+    """
+    Benchmark the sharded sitemap against many published posts.
+    
+    Runs when SITEMAP_BENCHMARK_POSTS is set to the number of posts (for
+    example 250000).
+    """
+    
+    POST_COUNT = int(os.environ.get('SITEMAP_BENCHMARK_POSTS', 250000))
+    
+    def test_250k_posts_benchmark(self):
+        """Test time and peak memory for a full and an incremental run."""
+        posts = create_published_posts(self.POST_COUNT, prefix='bench')
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        
+        url_discovery_service = URLDiscoveryService(site_url='https://example.com')
+        generator = SitemapGenerator(url_discovery_service=url_discovery_service, site_url='https://example.com')
+        
+        tracemalloc.start()
+        start = time.perf_counter()
+        full = generator.update_sharded_sitemap(temp_dir)
+        full_time = time.perf_counter() - start
+        _, full_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        post = posts.last()
+        post.save()
+        start = time.perf_counter()
+        incremental = generator.update_sharded_sitemap(temp_dir)
+        incremental_time = time.perf_counter() - start
+        
+        self.assertGreaterEqual(full['urls'], self.POST_COUNT)
+        self.assertLessEqual(full_peak, 32 * 1024 * 1024)
+        self.assertEqual(incremental['written'], ['sitemap-pages.xml', f'sitemap-posts-{post.pk // 50000}.xml'])
+        self.assertLess(incremental_time, full_time)
+
+
 if __name__ == '__main__':
     from django.test import runner
     runner.main()
\ No newline at end of file